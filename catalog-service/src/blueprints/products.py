@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from src.commands.get_products import GetProducts
 from src.commands.get_product_by_id import GetProductById
 from src.commands.get_product_by_sku import GetProductBySKU
+from src.commands.get_products_batch import GetProductsBatch
 from src.commands.create_product import CreateProduct
 from src.commands.update_product import UpdateProduct
 from src.commands.delete_product import DeleteProduct
@@ -144,6 +145,47 @@ def create_product():
         raise ApiError(f"Error creating product: {str(e)}", status_code=500)
 
 
+@products_bp.route('/batch', methods=['POST'])
+def get_products_batch():
+    """
+    POST /products/batch
+    
+    Resolve many products by SKU or by ID in a single call
+    
+    Request Body:
+    {
+        "skus": ["JER-001", "VAC-001"],          // or "ids": [1, 2] (max 5000)
+        "fields": ["unit_price", "physical_dimensions"]  // optional projection
+    }
+    
+    Returns:
+    - 200: {"products": {sku: product}, "not_found": [...], "total", "requested"}
+    - 400: Validation error
+    - 500: Server error
+    """
+    try:
+        data = request.get_json(silent=True)
+        
+        if not isinstance(data, dict):
+            raise ValidationError("Request body must be a JSON object")
+        
+        command = GetProductsBatch(
+            skus=data.get('skus'),
+            ids=data.get('ids'),
+            fields=data.get('fields')
+        )
+        result = command.execute()
+        
+        return jsonify(result), 200
+        
+    except ApiError as e:
+        raise e
+    except ValueError as e:
+        raise ValidationError(str(e))
+    except Exception as e:
+        raise ApiError(f"Error retrieving products: {str(e)}", status_code=500)
+
+
 @products_bp.route('/<int:product_id>', methods=['GET'])
 def get_product_by_id(product_id):
     """
@@ -264,20 +306,24 @@ def get_product_by_sku(sku):
     """
     GET /products/<sku>
     
-    Get a product by SKU
+    Get a product by SKU. The response carries an ETag; clients that send
+    it back in If-None-Match get a 304 while the product is unchanged.
     
     Args:
     - sku: Product SKU
     
     Returns:
     - 200: Product details
+    - 304: Product unchanged (If-None-Match)
     - 404: Product not found
     - 500: Server error
     """
     try:
         command = GetProductBySKU(sku)
         result = command.execute()
-        return jsonify(result), 200
+        response = jsonify(result)
+        response.add_etag()
+        return response.make_conditional(request)
     except ApiError as e:
         raise e
     except Exception as e:
@@ -0,0 +1,97 @@
+from sqlalchemy.orm import joinedload, selectinload, noload
+from src.models.product import Product
+from src.session import db
+
+MAX_BATCH_SIZE = 5000
+
+# Campos de primer nivel de Product.to_dict_detailed() que se pueden proyectar
+PRODUCT_FIELDS = [
+    'name', 'description', 'category', 'subcategory', 'unit_price', 'currency',
+    'unit_of_measure', 'supplier_id', 'supplier_name', 'requires_cold_chain',
+    'storage_conditions', 'regulatory_info', 'physical_dimensions', 'manufacturer',
+    'country_of_origin', 'barcode', 'image_url', 'is_active', 'is_discontinued',
+    'created_at', 'updated_at', 'certifications', 'regulatory_conditions',
+]
+
+
+class GetProductsBatch:
+    """
+    Resuelve muchos productos por SKU o por ID en una sola consulta IN.
+
+    El proveedor se trae en la misma consulta (JOIN) y las certificaciones y
+    condiciones regulatorias con una consulta por relación para todo el lote
+    (selectinload), solo si la proyección las incluye. `id` y `sku` siempre
+    se devuelven.
+    """
+
+    def __init__(self, skus=None, ids=None, fields=None):
+        if (skus is None) == (ids is None):
+            raise ValueError("Provide either 'skus' or 'ids'")
+
+        values = skus if skus is not None else ids
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"'{'skus' if skus is not None else 'ids'}' must be a non-empty list")
+        if len(values) > MAX_BATCH_SIZE:
+            raise ValueError(f"At most {MAX_BATCH_SIZE} products per batch")
+
+        if skus is not None:
+            if not all(isinstance(sku, str) and sku.strip() for sku in skus):
+                raise ValueError("'skus' must contain non-empty strings")
+            self.skus = list(dict.fromkeys(sku.strip().upper() for sku in skus))
+            self.ids = None
+        else:
+            if not all(isinstance(product_id, int) and not isinstance(product_id, bool) for product_id in ids):
+                raise ValueError("'ids' must contain integers")
+            self.ids = list(dict.fromkeys(ids))
+            self.skus = None
+
+        if fields is not None:
+            if isinstance(fields, str):
+                fields = [field.strip() for field in fields.split(',') if field.strip()]
+            if not isinstance(fields, list) or not fields:
+                raise ValueError("'fields' must be a non-empty list")
+            unknown = [field for field in fields if field not in PRODUCT_FIELDS + ['id', 'sku']]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(map(str, unknown))}")
+        self.fields = fields
+
+    def _wants(self, field):
+        return self.fields is None or field in self.fields
+
+    def execute(self):
+        query = Product.query.options(
+            joinedload(Product.supplier) if self._wants('supplier_name') else noload(Product.supplier),
+            selectinload(Product.certifications) if self._wants('certifications') else noload(Product.certifications),
+            selectinload(Product.regulatory_conditions) if self._wants('regulatory_conditions')
+            else noload(Product.regulatory_conditions),
+        )
+
+        if self.skus is not None:
+            requested = self.skus
+            products = query.filter(Product.sku.in_(self.skus)).all()
+            found = {product.sku for product in products}
+        else:
+            requested = self.ids
+            products = query.filter(Product.id.in_(self.ids)).all()
+            found = {product.id for product in products}
+
+        return {
+            'products': {product.sku: self._serialize(product) for product in products},
+            'not_found': [value for value in requested if value not in found],
+            'total': len(products),
+            'requested': len(requested),
+        }
+
+    def _serialize(self, product):
+        if self.fields is None:
+            return product.to_dict_detailed()
+
+        data = product.to_dict()
+        if 'certifications' in self.fields:
+            data['certifications'] = [cert.to_dict() for cert in product.certifications]
+        if 'regulatory_conditions' in self.fields:
+            data['regulatory_conditions'] = [rc.to_dict() for rc in product.regulatory_conditions]
+
+        projected = {'id': data['id'], 'sku': data['sku']}
+        projected.update((field, data[field]) for field in self.fields if field not in projected)
+        return projected
@@ -40,6 +40,7 @@ def create_app(config=None):
             'status': 'running',
             'endpoints': {
                 'products': '/api/products',
+                'products_batch': '/api/products/batch',
                 'products_bulk_upload': '/api/products/bulk-upload',
                 'suppliers': '/api/suppliers',
                 'suppliers_bulk_upload': '/api/suppliers/bulk-upload',
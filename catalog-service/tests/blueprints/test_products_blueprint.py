@@ -135,6 +135,35 @@ class TestProductsBlueprint:
         
         assert response.status_code == 404  # Flask returns 404 for invalid route params
 
+    def test_get_product_by_sku_etag(self, client, sample_product):
+        """Test GET /products/<sku> returns an ETag and honours If-None-Match"""
+        response = client.get('/products/TEST-001')
+        
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        
+        response = client.get('/products/TEST-001', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_get_products_batch(self, client, multiple_products):
+        """Test POST /products/batch returns products keyed by SKU"""
+        response = client.post('/products/batch', json={
+            'skus': ['JER-001', 'VAC-001', 'MISSING-1'],
+            'fields': ['unit_price']
+        })
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['products']['VAC-001'] == {'id': multiple_products[2].id, 'sku': 'VAC-001', 'unit_price': 45.0}
+        assert data['not_found'] == ['MISSING-1']
+    
+    def test_get_products_batch_validation(self, client):
+        """Test POST /products/batch rejects invalid bodies"""
+        assert client.post('/products/batch', json={'skus': 'JER-001'}).status_code == 400
+        assert client.post('/products/batch', data='x').status_code == 400
+
     def test_update_product_success(self, client, sample_product):
         """Test PUT /products/<id> updates product"""
         update_data = {
@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import event
+from src.commands.get_products_batch import GetProductsBatch
+from src.models.certification import Certification
+
+
+def _count_queries(db):
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    return statements
+
+
+class TestGetProductsBatchCommand:
+    
+    def test_batch_by_sku_with_not_found(self, db, multiple_products, sample_product_with_relationships):
+        command = GetProductsBatch(skus=['jer-001', ' VAC-001 ', 'TEST-001', 'NOPE-1', 'JER-001'])
+        result = command.execute()
+        
+        assert set(result['products']) == {'JER-001', 'VAC-001', 'TEST-001'}
+        assert result['not_found'] == ['NOPE-1']
+        assert (result['total'], result['requested']) == (3, 4)
+        assert result['products']['TEST-001'] == sample_product_with_relationships.to_dict_detailed()
+    
+    def test_batch_by_id(self, db, multiple_products):
+        ids = [product.id for product in multiple_products]
+        
+        result = GetProductsBatch(ids=ids + [9999]).execute()
+        
+        assert set(result['products']) == {'JER-001', 'GUANTE-001', 'VAC-001', 'INACTIVE-001'}
+        assert result['products']['INACTIVE-001']['is_active'] is False
+        assert result['not_found'] == [9999]
+    
+    def test_relationships_load_in_constant_queries(self, db, multiple_products, sample_supplier):
+        for product in multiple_products:
+            db.session.add(Certification(
+                product_id=product.id, certification_type='INVIMA', certification_number=f'C-{product.id}',
+                issuing_authority='INVIMA', country='Colombia', issue_date=product.created_at.date()
+            ))
+        db.session.commit()
+        skus = [product.sku for product in multiple_products]
+        db.session.expunge_all()
+        
+        statements = _count_queries(db)
+        result = GetProductsBatch(skus=skus).execute()
+        
+        # productos + proveedor (JOIN), certificaciones, condiciones regulatorias
+        assert len(statements) == 3
+        assert all(len(product['certifications']) == 1 for product in result['products'].values())
+        assert result['products']['JER-001']['supplier_name'] == 'MedSupply Inc'
+    
+    def test_field_projection_skips_relationships(self, db, multiple_products):
+        vaccine_id = multiple_products[2].id
+        db.session.expunge_all()
+        
+        statements = _count_queries(db)
+        result = GetProductsBatch(skus=['VAC-001'], fields='unit_price,physical_dimensions').execute()
+        
+        assert len(statements) == 1
+        assert result['products']['VAC-001'] == {
+            'id': vaccine_id,
+            'sku': 'VAC-001',
+            'unit_price': 45.0,
+            'physical_dimensions': {'weight_kg': None, 'length_cm': None, 'width_cm': None, 'height_cm': None},
+        }
+    
+    @pytest.mark.parametrize('kwargs', [
+        {},
+        {'skus': ['A'], 'ids': [1]},
+        {'skus': []},
+        {'skus': ['A', '']},
+        {'ids': ['1']},
+        {'skus': ['A'] * 5001},
+        {'skus': ['A'], 'fields': ['price']},
+    ])
+    def test_validation(self, kwargs):
+        with pytest.raises(ValueError):
+            GetProductsBatch(**kwargs)
@@ -0,0 +1,6 @@
+"""
+Benchmarks del servicio de logística.
+
+Se ejecutan desde la raíz del servicio, p. ej.:
+    python -m benchmarks.bench_stock_protocol
+"""
@@ -0,0 +1,123 @@
+"""
+Benchmark: conteo cíclico masivo contra un PUT por SKU/centro.
+
+Siembra N filas de inventario (SKUs x 4 centros), arma un CSV de conteo con
+~30% de cantidades distintas y mide:
+
+- BulkInventoryAdjustment en dry run y aplicado (staging + diff + UPDATE)
+- PUT /inventory/<sku>/update sobre una muestra, extrapolado a N filas
+
+Uso:
+    python -m benchmarks.bench_bulk_adjustment --rows 100000 --put-sample 500
+"""
+
+import argparse
+import io
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from src.main import create_app
+from src.session import db
+from src.models.distribution_center import DistributionCenter
+from src.models.inventory import Inventory
+from src.commands.bulk_inventory_adjustment import BulkInventoryAdjustment
+
+CENTERS = 4
+CHUNK = 50000
+
+
+def _seed(rows, rng):
+    centers = [
+        DistributionCenter(code=f'DC-{n}', name=f'Centro {n}', city='Bogotá',
+                           country='Colombia', is_active=True)
+        for n in range(CENTERS)
+    ]
+    db.session.add_all(centers)
+    db.session.flush()
+    center_ids = [center.id for center in centers]
+
+    now = datetime.utcnow()
+    keys = []
+    for start in range(0, rows, CHUNK):
+        batch = []
+        for n in range(start, min(start + CHUNK, rows)):
+            sku, dc_id = f'SKU-{n // CENTERS:06d}', center_ids[n % CENTERS]
+            quantity = rng.randint(0, 1000)
+            keys.append((sku, dc_id, quantity))
+            batch.append({
+                'product_sku': sku, 'distribution_center_id': dc_id,
+                'quantity_available': quantity, 'quantity_reserved': 0, 'quantity_in_transit': 0,
+                'minimum_stock_level': 10, 'created_at': now, 'updated_at': now
+            })
+        db.session.execute(Inventory.__table__.insert(), batch)
+    db.session.commit()
+    return keys
+
+
+def _count_file(keys, rng):
+    lines = ['product_sku,distribution_center_id,quantity']
+    for sku, dc_id, quantity in keys:
+        counted = max(0, quantity + rng.randint(-5, 5)) if rng.random() < 0.3 else quantity
+        lines.append(f'{sku},{dc_id},{counted}')
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def run(rows, put_sample):
+    rng = random.Random(11)
+    path = os.path.join(tempfile.mkdtemp(), 'bench_bulk_adjustment.db')
+    app, _ = create_app(config={
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False
+    })
+
+    with app.app_context():
+        db.create_all()
+        keys = _seed(rows, rng)
+        payload = _count_file(keys, rng)
+
+        dry, dry_s = _timed(lambda: BulkInventoryAdjustment(io.BytesIO(payload), dry_run=True).execute())
+        applied, apply_s = _timed(lambda: BulkInventoryAdjustment(io.BytesIO(payload)).execute())
+
+        client = app.test_client()
+        sample = rng.sample(keys, min(put_sample, len(keys)))
+
+        def put_all():
+            for sku, dc_id, quantity in sample:
+                client.put(f'/inventory/{sku}/update', json={
+                    'distribution_center_id': dc_id, 'quantity_available': quantity + 1
+                })
+
+        _, put_s = _timed(put_all)
+
+    return {
+        'rows': rows,
+        'changed': applied['changed'],
+        'events': applied['events_recorded'],
+        'dry_s': dry_s,
+        'apply_s': apply_s,
+        'put_per_row_ms': put_s / len(sample) * 1000,
+        'put_extrapolated_s': put_s / len(sample) * rows,
+        'dry_changed': dry['changed'],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--put-sample', type=int, default=500)
+    args = parser.parse_args()
+
+    r = run(args.rows, args.put_sample)
+    print(f"Conteo de {r['rows']} filas ({r['changed']} con cambios, {r['events']} eventos)")
+    print(f"  bulk dry run: {r['dry_s']:.2f}s | bulk aplicado: {r['apply_s']:.2f}s")
+    print(f"  PUT por fila: {r['put_per_row_ms']:.1f} ms → ~{r['put_extrapolated_s']:.0f}s para {r['rows']} filas")
@@ -0,0 +1,144 @@
+"""
+Benchmark: barrido nocturno de vencimientos sobre N lotes.
+
+Siembra N lotes con vencimientos repartidos entre -60 y +400 días (así ~13%
+están vencidos), mide el barrido completo (marcado por tramos + resumen de
+próximos a vencer) y compara el reporte de próximos a vencer a 90 días
+leído del resumen contra el cálculo ad hoc sobre product_batches.
+
+Uso:
+    python -m benchmarks.bench_expiry_sweep --batches 1000000 --chunk 5000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func
+
+from src.main import create_app
+from src.session import db
+from src.models.distribution_center import DistributionCenter
+from src.models.warehouse_location import WarehouseLocation
+from src.models.product_batch import ProductBatch
+from src.commands.expiry_sweep import SweepExpiredBatches, GetNearExpiry
+
+CHUNK = 50000
+
+
+def _seed(batch_count, rng):
+    centers = [
+        DistributionCenter(code=f'DC-{n}', name=f'Centro {n}', city='Bogotá',
+                           country='Colombia', is_active=True)
+        for n in range(4)
+    ]
+    db.session.add_all(centers)
+    db.session.flush()
+
+    locations = [
+        WarehouseLocation(distribution_center_id=center.id, zone_type='ambient',
+                          aisle=f'A{aisle}', shelf='E1', level_position='N1', is_active=True)
+        for center in centers for aisle in range(50)
+    ]
+    db.session.add_all(locations)
+    db.session.flush()
+
+    today = date.today()
+    now = datetime.utcnow()
+    for start in range(0, batch_count, CHUNK):
+        rows = []
+        for n in range(start, min(start + CHUNK, batch_count)):
+            location = locations[n % len(locations)]
+            rows.append({
+                'product_sku': f'SKU-{n % 20000:05d}',
+                'distribution_center_id': location.distribution_center_id,
+                'location_id': location.id,
+                'batch_number': f'L{n:07d}',
+                'quantity': rng.randint(1, 500),
+                'expiry_date': today + timedelta(days=rng.randint(-60, 400)),
+                'is_quarantine': False,
+                'is_expired': False,
+                'is_available': True,
+                'created_at': now,
+                'updated_at': now
+            })
+        db.session.execute(ProductBatch.__table__.insert(), rows)
+    db.session.commit()
+
+
+def _adhoc_near_expiry(days):
+    today = date.today()
+    return (
+        db.session.query(
+            ProductBatch.product_sku,
+            ProductBatch.distribution_center_id,
+            func.count(ProductBatch.id),
+            func.sum(ProductBatch.quantity),
+            func.min(ProductBatch.expiry_date)
+        )
+        .filter(
+            ProductBatch.is_expired == False,
+            ProductBatch.quantity > 0,
+            ProductBatch.expiry_date >= today,
+            ProductBatch.expiry_date <= today + timedelta(days=days)
+        )
+        .group_by(ProductBatch.product_sku, ProductBatch.distribution_center_id)
+        .all()
+    )
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def run(batch_count, chunk_size):
+    rng = random.Random(3)
+    path = os.path.join(tempfile.mkdtemp(), 'bench_expiry_sweep.db')
+    app, _ = create_app(config={
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False
+    })
+
+    with app.app_context():
+        db.create_all()
+        _, seed_ms = _timed(lambda: _seed(batch_count, rng))
+
+        digest, sweep_ms = _timed(
+            lambda: SweepExpiredBatches(chunk_size=chunk_size, notify=False).execute()
+        )
+        _, second_ms = _timed(
+            lambda: SweepExpiredBatches(chunk_size=chunk_size, notify=False).execute()
+        )
+        adhoc, adhoc_ms = _timed(lambda: _adhoc_near_expiry(90))
+        summary, summary_ms = _timed(lambda: GetNearExpiry(days=90).execute())
+
+    return {
+        'seed_s': seed_ms / 1000,
+        'expired_batches': digest['expired_batches'],
+        'sweep_ms': sweep_ms,
+        'second_sweep_ms': second_ms,
+        'adhoc_ms': adhoc_ms,
+        'adhoc_rows': len(adhoc),
+        'summary_ms': summary_ms,
+        'summary_rows': summary['total_items'],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--batches', type=int, default=1000000)
+    parser.add_argument('--chunk', type=int, default=5000)
+    args = parser.parse_args()
+
+    r = run(args.batches, args.chunk)
+    print(f"🌱 {args.batches} lotes sembrados en {r['seed_s']:.1f}s")
+    print(f"Barrido: {r['expired_batches']} vencidos en {r['sweep_ms']:.0f} ms "
+          f"(segunda corrida sin cambios: {r['second_sweep_ms']:.0f} ms)")
+    print(f"Próximos a vencer 90 días: ad hoc {r['adhoc_ms']:.0f} ms ({r['adhoc_rows']} filas) | "
+          f"resumen {r['summary_ms']:.0f} ms ({r['summary_rows']} filas)")
@@ -0,0 +1,137 @@
+"""
+Benchmark: escrituras concurrentes sobre un SKU caliente.
+
+Varios hilos reservan de a 1 unidad el mismo SKU/centro con
+ReserveInventoryForOrder, en dos modos:
+
+- fila: lee y actualiza la fila de `inventory` (camino actual)
+- ledger: agrega un movimiento a `inventory_movements`, con la compactación
+  corriendo en paralelo
+
+Reporta reservas/segundo, errores y reservas perdidas (saldo final contra
+lo esperado). Por defecto usa SQLite en un archivo temporal, que serializa
+todas las escrituras; con --database-url se puede correr contra PostgreSQL,
+donde el camino por fila compite por el bloqueo de la fila.
+
+Uso:
+    python -m benchmarks.bench_inventory_ledger --threads 8 --ops 200
+    python -m benchmarks.bench_inventory_ledger --database-url postgresql://... --threads 32
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from src.main import create_app
+from src.session import db
+from src.models.distribution_center import DistributionCenter
+from src.models.inventory import Inventory
+from src.commands.reserve_inventory_for_order import ReserveInventoryForOrder
+from src.services.inventory_ledger import compact_ledger, get_balance
+
+SKU = 'VAC-HOT'
+INITIAL_STOCK = 10_000_000
+
+
+def _make_app(database_url, use_ledger):
+    options = {'connect_args': {'timeout': 30}} if database_url.startswith('sqlite') else {'pool_size': 64}
+    app, _ = create_app(config={
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'SQLALCHEMY_ENGINE_OPTIONS': options,
+        'INVENTORY_LEDGER_ENABLED': use_ledger
+    })
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        center = DistributionCenter(code='DC-HOT', name='Centro Hot', city='Bogotá',
+                                    country='Colombia', is_active=True)
+        db.session.add(center)
+        db.session.flush()
+        db.session.add(Inventory(product_sku=SKU, distribution_center_id=center.id,
+                                 quantity_available=INITIAL_STOCK, quantity_reserved=0))
+        db.session.commit()
+        center_id = center.id
+    return app, center_id
+
+
+def _worker(app, center_id, worker, ops, counters, lock):
+    with app.app_context():
+        done = errors = 0
+        for n in range(ops):
+            try:
+                ReserveInventoryForOrder(
+                    f'BENCH-{worker}-{n}',
+                    [{'product_sku': SKU, 'quantity': 1, 'distribution_center_id': center_id}]
+                ).execute()
+                done += 1
+            except Exception:
+                db.session.rollback()
+                errors += 1
+        with lock:
+            counters['done'] += done
+            counters['errors'] += errors
+
+
+def _compactor(app, stop):
+    with app.app_context():
+        while not stop.is_set():
+            compact_ledger(settle_seconds=0.2, notify=False)
+            stop.wait(0.5)
+
+
+def run(database_url, use_ledger, threads, ops):
+    app, center_id = _make_app(database_url, use_ledger)
+    counters = {'done': 0, 'errors': 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    compactor = threading.Thread(target=_compactor, args=(app, stop)) if use_ledger else None
+    workers = [
+        threading.Thread(target=_worker, args=(app, center_id, n, ops, counters, lock))
+        for n in range(threads)
+    ]
+
+    started = time.perf_counter()
+    if compactor:
+        compactor.start()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    if compactor:
+        compactor.join()
+
+    with app.app_context():
+        if use_ledger:
+            reserved = get_balance(SKU, center_id)['quantity_reserved']
+        else:
+            reserved = Inventory.query.filter_by(product_sku=SKU).one().quantity_reserved
+
+    return {
+        'ops_per_s': counters['done'] / elapsed,
+        'done': counters['done'],
+        'errors': counters['errors'],
+        'lost': counters['done'] - reserved,
+        'elapsed_s': elapsed
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--ops', type=int, default=200, help='Reservas por hilo')
+    parser.add_argument('--database-url', default=None)
+    args = parser.parse_args()
+
+    database_url = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_ledger.db')
+
+    for label, use_ledger in (('fila', False), ('ledger', True)):
+        r = run(database_url, use_ledger, args.threads, args.ops)
+        print(f"{label:>6}: {r['ops_per_s']:.0f} reservas/s | {r['done']} ok, {r['errors']} errores, "
+              f"{r['lost']} perdidas ({r['elapsed_s']:.1f}s)")
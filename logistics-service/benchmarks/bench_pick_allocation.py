@@ -0,0 +1,116 @@
+"""
+Benchmark: asignación FEFO de una ola de picking.
+
+Siembra un centro con N SKUs, varios lotes por SKU repartidos en ubicaciones
+refrigeradas y de ambiente, y mide la asignación de olas de 50, 500 y 2000
+líneas (carga del índice + asignación en memoria).
+
+Uso:
+    python -m benchmarks.bench_pick_allocation --skus 1000 --lots 6
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from src.main import create_app
+from src.session import db
+from src.models.distribution_center import DistributionCenter
+from src.models.warehouse_location import WarehouseLocation
+from src.models.product_batch import ProductBatch
+from src.commands.allocate_pick_list import AllocatePickList
+
+
+def _seed(sku_count, lots_per_sku, rng):
+    center = DistributionCenter(code='DC-BENCH', name='Centro Bench', city='Bogotá',
+                                country='Colombia', is_active=True)
+    db.session.add(center)
+    db.session.flush()
+
+    locations = [
+        WarehouseLocation(
+            distribution_center_id=center.id,
+            zone_type='refrigerated' if aisle < 2 else 'ambient',
+            aisle=f'A{aisle}', shelf=f'E{shelf}', level_position='N1',
+            temperature_min=2 if aisle < 2 else None,
+            temperature_max=8 if aisle < 2 else None,
+            current_temperature=5 if aisle < 2 else None,
+            is_active=True
+        )
+        for aisle in range(10) for shelf in range(20)
+    ]
+    db.session.add_all(locations)
+    db.session.flush()
+
+    cold = [loc for loc in locations if loc.zone_type == 'refrigerated']
+    ambient = [loc for loc in locations if loc.zone_type == 'ambient']
+    batches = []
+    for n in range(sku_count):
+        is_cold = n % 5 == 0
+        for lot in range(lots_per_sku):
+            batches.append(ProductBatch(
+                product_sku=f'SKU-{n:05d}',
+                distribution_center_id=center.id,
+                location_id=rng.choice(cold if is_cold else ambient).id,
+                batch_number=f'L{n}-{lot}',
+                quantity=rng.randint(20, 200),
+                expiry_date=date.today() + timedelta(days=rng.randint(-10, 400)),
+                required_temperature_max=8 if is_cold else None,
+                is_available=True,
+                is_quarantine=rng.random() < 0.03
+            ))
+    db.session.bulk_save_objects(batches)
+    db.session.commit()
+    return center.id
+
+
+def run(sku_count, lots_per_sku, waves, repeat):
+    rng = random.Random(11)
+    path = os.path.join(tempfile.mkdtemp(), 'bench_pick_allocation.db')
+    app, _ = create_app(config={
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False
+    })
+
+    results = []
+    with app.app_context():
+        db.create_all()
+        center_id = _seed(sku_count, lots_per_sku, rng)
+
+        for size in waves:
+            lines = [
+                {'order_id': f'ORD-{i // 5}', 'product_sku': f'SKU-{rng.randrange(sku_count):05d}',
+                 'quantity': rng.randint(1, 60)}
+                for i in range(size)
+            ]
+            samples = []
+            for _ in range(repeat):
+                db.session.remove()
+                started = time.perf_counter()
+                result = AllocatePickList(lines=lines, distribution_center_id=center_id).execute()
+                samples.append((time.perf_counter() - started) * 1000)
+            results.append({
+                'lines': size,
+                'median_ms': statistics.median(samples),
+                'locations': result['summary']['locations'],
+                'fill_rate': result['summary']['fill_rate'],
+            })
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--skus', type=int, default=1000)
+    parser.add_argument('--lots', type=int, default=6)
+    parser.add_argument('--waves', type=int, nargs='+', default=[50, 500, 2000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'líneas':>7} {'ms':>8} {'ubicaciones':>12} {'fill rate':>10}")
+    for row in run(args.skus, args.lots, args.waves, args.repeat):
+        print(f"{row['lines']:>7} {row['median_ms']:>8.2f} {row['locations']:>12} {row['fill_rate']:>10.3f}")
@@ -0,0 +1,129 @@
+"""
+Benchmark: distancia caminada con olas de picking vs. recoger pedido por pedido.
+
+Genera bodegas sintéticas (pasillos x estanterías, con un bloque de pasillos
+refrigerados), un SKU por ubicación, y un día de pedidos con salidas de ruta
+repartidas en la mañana. Compara la distancia de las olas secuenciadas con
+TSP contra un recorrido por pedido en el orden de llegada de las líneas.
+
+Uso:
+    python -m benchmarks.bench_pick_waves --layouts 10x20 20x30 --orders 300
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from src.main import create_app
+from src.session import db
+from src.models.distribution_center import DistributionCenter
+from src.models.warehouse_location import WarehouseLocation
+from src.models.product_batch import ProductBatch
+from src.commands.pick_waves import PlanPickWaves
+
+
+def _seed(aisles, shelves, cold_aisles):
+    center = DistributionCenter(code='DC-BENCH', name='Centro Bench', city='Bogotá',
+                                country='Colombia', is_active=True)
+    db.session.add(center)
+    db.session.flush()
+
+    locations = [
+        WarehouseLocation(
+            distribution_center_id=center.id,
+            zone_type='refrigerated' if aisle < cold_aisles else 'ambient',
+            aisle=f'P{aisle:02d}', shelf=f'E{shelf}', level_position='N1',
+            temperature_min=2 if aisle < cold_aisles else None,
+            temperature_max=8 if aisle < cold_aisles else None,
+            current_temperature=5 if aisle < cold_aisles else None,
+            is_active=True
+        )
+        for aisle in range(aisles) for shelf in range(1, shelves + 1)
+    ]
+    db.session.add_all(locations)
+    db.session.flush()
+
+    batches = [
+        ProductBatch(
+            product_sku=f'SKU-{n:05d}',
+            distribution_center_id=center.id,
+            location_id=location.id,
+            batch_number=f'L{n}',
+            quantity=100000,
+            expiry_date=date.today() + timedelta(days=365),
+            required_temperature_max=8 if location.zone_type == 'refrigerated' else None,
+            is_available=True
+        )
+        for n, location in enumerate(locations)
+    ]
+    db.session.bulk_save_objects(batches)
+    db.session.commit()
+    return center.id, len(locations)
+
+
+def _orders(count, sku_count, rng):
+    start = datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=6)
+    return [
+        {
+            'order_id': n,
+            'departure_time': (start + timedelta(minutes=15 * rng.randrange(24))).isoformat(),
+            'lines': [
+                {'product_sku': f'SKU-{rng.randrange(sku_count):05d}', 'quantity': rng.randint(1, 10)}
+                for _ in range(rng.randint(1, 8))
+            ]
+        }
+        for n in range(count)
+    ]
+
+
+def run(layouts, order_count, max_orders_per_wave):
+    results = []
+    for aisles, shelves in layouts:
+        rng = random.Random(7)
+        path = os.path.join(tempfile.mkdtemp(), 'bench_pick_waves.db')
+        app, _ = create_app(config={
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        })
+
+        with app.app_context():
+            db.create_all()
+            center_id, sku_count = _seed(aisles, shelves, cold_aisles=max(1, aisles // 5))
+            orders = _orders(order_count, sku_count, rng)
+
+            started = time.perf_counter()
+            result = PlanPickWaves(
+                center_id, orders=orders, persist=False,
+                max_orders_per_wave=max_orders_per_wave
+            ).execute()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+        summary = result['summary']
+        results.append({
+            'layout': f'{aisles}x{shelves}',
+            'waves': summary['total_waves'],
+            'baseline_m': summary['baseline_distance_m'],
+            'waves_m': summary['total_distance_m'],
+            'saved_pct': summary['distance_saved_pct'],
+            'ms': elapsed_ms
+        })
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--layouts', nargs='+', default=['10x20', '20x30', '40x40'])
+    parser.add_argument('--orders', type=int, default=300)
+    parser.add_argument('--max-orders-per-wave', type=int, default=20)
+    args = parser.parse_args()
+
+    layouts = [tuple(int(part) for part in layout.split('x')) for layout in args.layouts]
+
+    print(f"{'layout':>8} {'olas':>5} {'por pedido m':>13} {'olas m':>10} {'ahorro %':>9} {'ms':>8}")
+    for row in run(layouts, args.orders, args.max_orders_per_wave):
+        print(f"{row['layout']:>8} {row['waves']:>5} {row['baseline_m']:>13.1f} "
+              f"{row['waves_m']:>10.1f} {row['saved_pct']:>9.1f} {row['ms']:>8.0f}")
@@ -0,0 +1,116 @@
+"""
+Benchmark: exportación de hojas de ruta de un centro/día.
+
+Siembra R rutas con S paradas (un pedido por parada) y mide:
+
+- PDF de una ruta sin caché y servido desde el caché (re-descargas)
+- CSV completo de una ruta
+- ZIP del día renderizando en serie (EXPORT_RENDER_WORKERS=1) y con el
+  pool de procesos
+
+Uso:
+    python -m benchmarks.bench_route_exports --routes 40 --stops 25 --workers 4
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+
+from src.main import create_app
+from src.session import db
+from src.models.distribution_center import DistributionCenter
+from src.models.vehicle import Vehicle
+from src.models.delivery_route import DeliveryRoute
+from src.models.route_stop import RouteStop
+from src.models.route_assignment import RouteAssignment
+from src.services.export_service import ExportService, route_pdf_cache, shutdown_render_pool
+
+
+def _seed(routes, stops):
+    center = DistributionCenter(code='DC-B', name='Centro Bench', city='Bogotá',
+                                country='Colombia', is_active=True)
+    db.session.add(center)
+    db.session.flush()
+    vehicle = Vehicle(plate='BEN-001', vehicle_type='van', capacity_kg=Decimal('1000'),
+                      capacity_m3=Decimal('10'), cost_per_km=Decimal('3'),
+                      home_distribution_center_id=center.id, is_available=True, is_active=True)
+    db.session.add(vehicle)
+    db.session.flush()
+
+    for r in range(routes):
+        route = DeliveryRoute(route_code=f'R-{r:03d}', vehicle_id=vehicle.id, planned_date=date.today(),
+                              status='active', total_stops=stops, total_orders=stops,
+                              distribution_center_id=center.id)
+        db.session.add(route)
+        db.session.flush()
+        for s in range(stops):
+            stop = RouteStop(route_id=route.id, sequence_order=s, stop_type='delivery',
+                             customer_name=f'Cliente {r}-{s}', delivery_address=f'Calle {s} # {r}-10',
+                             city='Bogotá', latitude=Decimal('4.6'), longitude=Decimal('-74.0'))
+            db.session.add(stop)
+            db.session.flush()
+            db.session.add(RouteAssignment(route_id=route.id, stop_id=stop.id, order_id=r * 1000 + s,
+                                           order_number=f'ORD-{r:03d}-{s:03d}',
+                                           total_weight_kg=Decimal('12.5'), status='assigned'))
+    db.session.commit()
+    return center.id
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def run(routes, stops, workers):
+    path = os.path.join(tempfile.mkdtemp(), 'bench_route_exports.db')
+    app, _ = create_app(config={
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False
+    })
+
+    with app.app_context():
+        db.create_all()
+        center_id = _seed(routes, stops)
+        route_id = DeliveryRoute.query.order_by(DeliveryRoute.id).first().id
+
+        _, pdf_cold_s = _timed(lambda: ExportService.export_route_to_pdf(route_id))
+        _, pdf_cached_s = _timed(lambda: ExportService.export_route_to_pdf(route_id))
+        _, csv_s = _timed(lambda: ExportService.export_route_to_csv(route_id))
+
+        def bundle(worker_count):
+            route_pdf_cache.clear()
+            os.environ['EXPORT_RENDER_WORKERS'] = str(worker_count)
+            return len(b''.join(ExportService.export_routes_bundle(center_id, date.today())))
+
+        size, serial_s = _timed(lambda: bundle(1))
+        try:
+            # Arranque del pool (spawn) fuera de la medición: en el servidor vive todo el proceso
+            bundle(workers)
+            _, pool_s = _timed(lambda: bundle(workers))
+        finally:
+            shutdown_render_pool()
+
+    return {
+        'routes': routes, 'stops': stops, 'workers': workers,
+        'pdf_cold_ms': pdf_cold_s * 1000, 'pdf_cached_ms': pdf_cached_s * 1000, 'csv_ms': csv_s * 1000,
+        'zip_bytes': size, 'serial_s': serial_s, 'pool_s': pool_s,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--routes', type=int, default=40)
+    parser.add_argument('--stops', type=int, default=25)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    r = run(args.routes, args.stops, args.workers)
+    print(f"{r['routes']} rutas x {r['stops']} paradas")
+    print(f"  PDF sin caché: {r['pdf_cold_ms']:.1f} ms | desde caché: {r['pdf_cached_ms']:.2f} ms | CSV: {r['csv_ms']:.1f} ms")
+    print(f"  ZIP del día ({r['zip_bytes'] / 1024:.0f} KB): en serie {r['serial_s']:.2f}s | "
+          f"pool de {r['workers']} procesos {r['pool_s']:.2f}s")
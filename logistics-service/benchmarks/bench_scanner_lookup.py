@@ -0,0 +1,147 @@
+"""
+Benchmark: resolución de escaneos con el índice product_codes.
+
+Siembra N lotes con código de barras, QR y código interno, reconstruye el
+índice y mide la latencia por escaneo (p50/p99) de:
+
+- or_ sobre las columnas de ProductBatch (búsqueda anterior, sin índice)
+- índice product_codes sin caché (una consulta)
+- índice con LRU caliente
+
+Uso:
+    python -m benchmarks.bench_scanner_lookup --batches 1000000 --scans 2000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import or_
+
+from src.main import create_app
+from src.session import db
+from src.models.distribution_center import DistributionCenter
+from src.models.warehouse_location import WarehouseLocation
+from src.models.product_batch import ProductBatch
+from src.models.product_code import rebuild_product_code_index
+from src.services.scanner_code_index import lookup_code, scanner_code_cache
+
+CHUNK = 50000
+
+
+def _seed(batch_count):
+    center = DistributionCenter(code='DC-BENCH', name='Centro Bench', city='Bogotá',
+                                country='Colombia', is_active=True)
+    db.session.add(center)
+    db.session.flush()
+
+    locations = [
+        WarehouseLocation(distribution_center_id=center.id, zone_type='ambient',
+                          aisle=f'A{aisle}', shelf=f'E{shelf}', level_position='N1', is_active=True)
+        for aisle in range(20) for shelf in range(50)
+    ]
+    db.session.add_all(locations)
+    db.session.flush()
+    location_ids = [loc.id for loc in locations]
+
+    # Inserción con Core: los eventos del mapper no corren, el índice se
+    # reconstruye al final como en una carga masiva real
+    expiry = date.today() + timedelta(days=180)
+    for start in range(0, batch_count, CHUNK):
+        db.session.execute(ProductBatch.__table__.insert(), [
+            {
+                'product_sku': f'SKU-{n % 5000:05d}',
+                'distribution_center_id': center.id,
+                'location_id': location_ids[n % len(location_ids)],
+                'batch_number': f'L{n:07d}',
+                'quantity': 10,
+                'expiry_date': expiry,
+                'barcode': f'770{n:010d}',
+                'qr_code': f'QR|L{n:07d}|{n * 7919 % 1000003}',
+                'internal_code': f'INT-{n:07d}',
+                'is_quarantine': False,
+                'is_expired': False,
+                'is_available': True,
+                'created_at': expiry,
+                'updated_at': expiry
+            }
+            for n in range(start, min(start + CHUNK, batch_count))
+        ])
+    rebuild_product_code_index()
+    db.session.commit()
+
+
+def _legacy_lookup(code):
+    return (
+        db.session.query(ProductBatch.id)
+        .filter(or_(ProductBatch.barcode == code, ProductBatch.qr_code == code,
+                    ProductBatch.internal_code == code))
+        .all()
+    )
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def _measure(fn, codes):
+    samples = []
+    for code in codes:
+        started = time.perf_counter()
+        fn(code)
+        samples.append((time.perf_counter() - started) * 1000)
+    return _percentiles(samples)
+
+
+def run(batch_count, scans, legacy_scans):
+    rng = random.Random(5)
+    path = os.path.join(tempfile.mkdtemp(), 'bench_scanner_lookup.db')
+    app, _ = create_app(config={
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False
+    })
+
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        _seed(batch_count)
+        print(f"🌱 {batch_count} lotes sembrados en {time.perf_counter() - started:.1f}s")
+
+        def random_code():
+            n = rng.randrange(batch_count)
+            return rng.choice([f'770{n:010d}', f'QR|L{n:07d}|{n * 7919 % 1000003}', f'INT-{n:07d}'])
+
+        codes = [random_code() for _ in range(scans)]
+
+        results = {'or_ (sin índice)': _measure(_legacy_lookup, codes[:legacy_scans])}
+
+        scanner_code_cache.clear()
+        results['índice, sin caché'] = _measure(lambda code: lookup_code(code, use_cache=False), codes)
+
+        # Turno de bodega: los mismos lotes se escanean varias veces
+        for code in codes:
+            lookup_code(code)
+        results['índice + LRU'] = _measure(lookup_code, codes)
+        results['_stats'] = scanner_code_cache.get_stats()
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--batches', type=int, default=1000000)
+    parser.add_argument('--scans', type=int, default=2000)
+    parser.add_argument('--legacy-scans', type=int, default=20)
+    args = parser.parse_args()
+
+    results = run(args.batches, args.scans, args.legacy_scans)
+    stats = results.pop('_stats')
+    print(f"{'búsqueda':>20} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, (p50, p99) in results.items():
+        print(f"{name:>20} {p50:>9.3f} {p99:>9.3f}")
+    print(f"LRU: {stats['size']} entradas, hit ratio {stats['hit_ratio']}")
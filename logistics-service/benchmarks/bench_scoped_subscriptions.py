@@ -0,0 +1,109 @@
+"""
+Benchmark: egress de broadcast global vs suscripciones por alcance.
+
+Simula un mix de dashboards en un servidor python-socketio real (sin red):
+- dashboards por centro de distribución (un solo DC)
+- dashboards por categoría
+- consolas de alertas (solo low_stock / out_of_stock)
+
+Escenario "global": todos en `all_inventory_updates` y filtran en el cliente.
+Escenario "scoped": cada uno se une a sus rooms de alcance y el servidor
+emite una vez a los rooms del evento (cada cliente lo recibe una sola vez).
+
+Uso:
+    python -m benchmarks.bench_scoped_subscriptions --clients 1000 --events 2000
+"""
+
+import argparse
+import json
+import random
+import time
+
+import socketio
+
+from src.websockets.subscription_scopes import rooms_for_event, rooms_for_subscription
+
+CATEGORIES = ['VACUNAS', 'JERINGAS', 'GUANTES', 'MEDICAMENTOS', 'EQUIPOS']
+EVENT_MIX = ['sale'] * 60 + ['reservation'] * 20 + ['restock'] * 10 + \
+            ['adjustment'] * 6 + ['low_stock'] * 3 + ['out_of_stock'] * 1
+
+
+def _counting_server():
+    server = socketio.Server(async_mode='threading')
+    stats = {'packets': 0, 'bytes': 0}
+
+    def send(eio_sid, pkt):
+        stats['packets'] += 1
+        stats['bytes'] += len(pkt.encode())
+
+    server._send_eio_packet = send
+    return server, stats
+
+
+def _dashboards(count, dc_count, rng):
+    dashboards = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            dashboards.append(rooms_for_subscription([rng.randint(1, dc_count)]))
+        elif kind < 0.9:
+            dashboards.append(rooms_for_subscription(categories=[rng.choice(CATEGORIES)]))
+        else:
+            dashboards.append(rooms_for_subscription(event_types=['low_stock', 'out_of_stock']))
+    return dashboards
+
+
+def _events(count, dc_count, rng):
+    events = []
+    for n in range(count):
+        dc = rng.randint(1, dc_count)
+        payload = {
+            'product_sku': f'SKU-{n % 500:04d}',
+            'change_type': rng.choice(EVENT_MIX),
+            'stock_data': {'total_available': rng.randint(0, 1000), 'updated_center_id': dc},
+        }
+        events.append((dc, rng.choice(CATEGORIES), payload))
+    return events
+
+
+def run(clients, events, dc_count, seed=7):
+    rng = random.Random(seed)
+    dashboards = _dashboards(clients, dc_count, rng)
+    stream = _events(events, dc_count, rng)
+    results = {}
+
+    for scenario in ('global', 'scoped'):
+        server, stats = _counting_server()
+        for i, rooms in enumerate(dashboards):
+            sid = server.manager.connect(f'client-{i}', '/')
+            for room in (['all_inventory_updates'] if scenario == 'global' else rooms):
+                server.manager.enter_room(sid, '/', room)
+
+        started = time.perf_counter()
+        for dc, category, payload in stream:
+            if scenario == 'global':
+                server.emit('stock_updated', payload, to='all_inventory_updates')
+            else:
+                server.emit('stock_updated', payload,
+                            to=rooms_for_event([dc], category, payload['change_type']))
+        elapsed = time.perf_counter() - started
+
+        results[scenario] = {
+            'packets': stats['packets'],
+            'mb': stats['bytes'] / 1_000_000,
+            'cpu_ms_per_event': elapsed * 1000 / events,
+        }
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--events', type=int, default=2000)
+    parser.add_argument('--dcs', type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.clients, args.events, args.dcs)
+    print(json.dumps(results, indent=2))
+    reduction = 1 - results['scoped']['mb'] / results['global']['mb']
+    print(f"Reducción de egress: {reduction:.1%}")
@@ -0,0 +1,127 @@
+"""
+Benchmark: latencia de GetStockLevels para 1, 50 y 500 SKUs.
+
+Compara, sobre una base SQLite con N SKUs x M centros:
+- orm: carga de objetos Inventory + sumas en Python + acceso lazy a
+  distribution_center (implementación anterior, reproducida aquí)
+- per_sku: una llamada GetStockLevels(product_sku=...) por SKU (como
+  consulta hoy sales-service)
+- grouped: una llamada GetStockLevels(product_skus=[...]) (GROUP BY + join)
+- batch: GetStockLevelsBatch (solo totales, columnar)
+
+Uso:
+    python -m benchmarks.bench_stock_levels --skus 2000 --centers 5 --repeat 20
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from src.main import create_app
+from src.session import db
+from src.models.inventory import Inventory
+from src.models.distribution_center import DistributionCenter
+from src.commands.get_stock_levels import GetStockLevels, GetStockLevelsBatch
+
+
+def _seed(sku_count, center_count):
+    centers = [
+        DistributionCenter(code=f'DC-{i:03d}', name=f'Centro {i}', city='Bogotá',
+                           country='Colombia', is_active=True)
+        for i in range(center_count)
+    ]
+    db.session.add_all(centers)
+    db.session.flush()
+
+    db.session.bulk_save_objects([
+        Inventory(
+            product_sku=f'SKU-{n:05d}',
+            distribution_center_id=center.id,
+            quantity_available=100 + n % 50,
+            quantity_reserved=n % 7,
+            quantity_in_transit=n % 3,
+            minimum_stock_level=20
+        )
+        for n in range(sku_count)
+        for center in centers
+    ])
+    db.session.commit()
+
+
+def _orm(skus):
+    """Implementación anterior: objetos ORM, sumas en Python y lazy load por fila."""
+    items = (
+        Inventory.query.join(DistributionCenter)
+        .filter(Inventory.product_sku.in_(skus), DistributionCenter.is_active == True)
+        .order_by(Inventory.product_sku.asc(), DistributionCenter.name.asc())
+        .all()
+    )
+    products = {}
+    for item in items:
+        product = products.setdefault(item.product_sku, {
+            'total_available': 0, 'total_physical': 0, 'distribution_centers': []
+        })
+        product['total_available'] += item.quantity_available - item.quantity_reserved
+        product['total_physical'] += item.quantity_available
+        product['distribution_centers'].append({
+            'distribution_center_code': item.distribution_center.code,
+            'distribution_center_name': item.distribution_center.name,
+            'is_low_stock': item.is_low_stock,
+        })
+    return products
+
+
+def _measure(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        db.session.expire_all()
+        db.session.remove()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run(sku_count, center_count, sizes, repeat):
+    path = os.path.join(tempfile.mkdtemp(), 'bench_stock_levels.db')
+    app, _ = create_app(config={
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False
+    })
+
+    results = []
+    with app.app_context():
+        db.create_all()
+        _seed(sku_count, center_count)
+
+        for size in sizes:
+            skus = [f'SKU-{n:05d}' for n in range(0, sku_count, max(1, sku_count // size))][:size]
+            results.append({
+                'skus': size,
+                'orm_ms': _measure(lambda: _orm(skus), repeat),
+                'per_sku_ms': _measure(
+                    lambda: [GetStockLevels(product_sku=sku).execute() for sku in skus], repeat
+                ),
+                'grouped_ms': _measure(lambda: GetStockLevels(product_skus=skus).execute(), repeat),
+                'batch_ms': _measure(lambda: GetStockLevelsBatch(product_skus=skus).execute(), repeat),
+            })
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--skus', type=int, default=2000)
+    parser.add_argument('--centers', type=int, default=5)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 50, 500])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'skus':>6} {'orm ms':>9} {'per_sku ms':>11} {'grouped ms':>11} {'batch ms':>9}")
+    for row in run(args.skus, args.centers, args.sizes, args.repeat):
+        print(
+            f"{row['skus']:>6} {row['orm_ms']:>9.2f} {row['per_sku_ms']:>11.2f} "
+            f"{row['grouped_ms']:>11.2f} {row['batch_ms']:>9.2f}"
+        )
@@ -0,0 +1,147 @@
+"""
+Benchmark: protocolo v1 (stock_updated completo) vs v2 (deltas JSON/MessagePack).
+
+Simula N clientes suscritos a un SKU en un servidor python-socketio real
+(sin red) y mide, por broadcast:
+- bytes enviados por cliente
+- tiempo de CPU del servidor (construir payload + emitir a N clientes)
+
+Uso:
+    python -m benchmarks.bench_stock_protocol --clients 1000 --updates 200
+"""
+
+import argparse
+import random
+import time
+
+import socketio
+
+from src.websockets.stock_protocol import (
+    ENCODING_JSON,
+    ENCODING_MSGPACK,
+    StockSequenceTracker,
+    build_delta_message,
+    compact_stock,
+    encode_message,
+    msgpack,
+)
+
+
+def _stock_data(centers, sku='VAC-001'):
+    total_physical = sum(c['quantity_physical'] for c in centers)
+    total_reserved = sum(c['quantity_reserved'] for c in centers)
+    return {
+        'product_sku': sku,
+        'total_available': total_physical - total_reserved,
+        'total_physical': total_physical,
+        'total_reserved': total_reserved,
+        'total_in_transit': None,
+        'distribution_centers': centers,
+        'quantity_change': -5,
+        'previous_quantity': 100,
+        'new_quantity': 95,
+        'updated_center_id': 1,
+        'updated_center_code': 'DC-001',
+    }
+
+
+def _initial_centers(count):
+    return [
+        {
+            'distribution_center_id': i,
+            'distribution_center_code': f'DC-{i:03d}',
+            'distribution_center_name': f'Centro de Distribución {i}',
+            'city': 'Bogotá',
+            'quantity_available': 900,
+            'quantity_physical': 1000,
+            'quantity_reserved': 100,
+            'is_low_stock': False,
+            'is_out_of_stock': False,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _mutate(centers):
+    center = random.choice(centers)
+    center['quantity_reserved'] += random.randint(1, 10)
+    center['quantity_available'] = center['quantity_physical'] - center['quantity_reserved']
+    return centers
+
+
+class _CountingServer:
+    """Servidor Socket.IO con N participantes falsos que cuenta bytes enviados."""
+
+    def __init__(self, clients, room):
+        self.server = socketio.Server(async_mode='threading')
+        self.bytes_sent = 0
+        self.server._send_eio_packet = self._count
+
+        for i in range(clients):
+            eio_sid = f'eio-{i}'
+            sid = self.server.manager.connect(eio_sid, '/')
+            self.server.manager.enter_room(sid, '/', room)
+
+    def _count(self, eio_sid, eio_pkt):
+        data = eio_pkt.data
+        self.bytes_sent += len(data) if isinstance(data, (bytes, str)) else 0
+
+
+def run(clients, updates, centers_count):
+    random.seed(42)
+    room = 'product_VAC-001'
+    results = {}
+
+    scenarios = [('v1-json', None), ('v2-json', ENCODING_JSON)]
+    if msgpack is not None:
+        scenarios.append(('v2-msgpack', ENCODING_MSGPACK))
+
+    for name, encoding in scenarios:
+        centers = _initial_centers(centers_count)
+        counting = _CountingServer(clients, room)
+        tracker = StockSequenceTracker()
+        tracker.seed('VAC-001', compact_stock(_stock_data(centers)), encoding)
+
+        cpu_start = time.process_time()
+        for _ in range(updates):
+            stock_data = _stock_data(_mutate(centers))
+            if encoding is None:
+                payload = {
+                    'product_sku': 'VAC-001',
+                    'change_type': 'reservation',
+                    'timestamp': '2025-10-30T14:30:00',
+                    'stock_data': stock_data,
+                }
+                counting.server.emit('stock_updated', payload, room=room)
+            else:
+                seq, delta, _ = tracker.advance('VAC-001', compact_stock(stock_data))
+                message = build_delta_message(
+                    'VAC-001', seq, delta, 'reservation', '2025-10-30T14:30:00'
+                )
+                counting.server.emit('stock_delta', encode_message(message, encoding), room=room)
+        cpu_seconds = time.process_time() - cpu_start
+
+        results[name] = {
+            'bytes_per_update_per_client': counting.bytes_sent / (updates * clients),
+            'cpu_ms_per_broadcast': cpu_seconds * 1000 / updates,
+        }
+
+    baseline = results['v1-json']
+    print(f"{clients} clientes, {updates} actualizaciones, {centers_count} centros por SKU")
+    print(f"{'protocolo':<12} {'bytes/update':>14} {'cpu ms/broadcast':>18} {'ahorro bytes':>14}")
+    for name, r in results.items():
+        saving = 1 - r['bytes_per_update_per_client'] / baseline['bytes_per_update_per_client']
+        print(
+            f"{name:<12} {r['bytes_per_update_per_client']:>14.1f} "
+            f"{r['cpu_ms_per_broadcast']:>18.3f} {saving:>13.0%}"
+        )
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--updates', type=int, default=200)
+    parser.add_argument('--centers', type=int, default=5)
+    args = parser.parse_args()
+    run(args.clients, args.updates, args.centers)
@@ -0,0 +1,135 @@
+"""
+Benchmark: planificación en lote de rutas de visitas (todos los vendedores de
+un día) frente a un POST /routes/visits/generate por vendedor.
+
+Simula R vendedores con C clientes cada uno alrededor de una oficina común.
+sales-service se reemplaza por un cliente en memoria que cuenta las llamadas.
+
+- Lote: POST /routes/visits/generate/batch (una llamada de clientes, matriz
+  compartida, TSP en el pool con límite VISIT_PLANNING_TSP_SECONDS)
+- Línea base: un POST /routes/visits/generate por vendedor, sobre una muestra
+  (TSP con el límite fijo de 10 s del endpoint individual)
+
+Con un solo núcleo el pool no aporta; el tiempo del lote escala con
+R * límite / workers.
+
+Uso:
+    python -m benchmarks.bench_visit_planning_batch --salespeople 40 --customers 25 --workers 4
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from src.main import create_app
+from src.session import db
+from src.commands.plan_visit_routes_batch import shutdown_planning_pool
+
+OFFICE = {'name': 'Oficina Central', 'latitude': 4.6097, 'longitude': -74.0817}
+
+
+class InMemorySalesClient:
+    """Cartera de clientes en memoria; cuenta las llamadas a sales-service."""
+
+    def __init__(self, customers):
+        self.customers = {customer['id']: customer for customer in customers}
+        self.calls = 0
+
+    def get_customers_by_ids(self, customer_ids):
+        self.calls += 1
+        return {
+            'customers': [self.customers[cid] for cid in customer_ids if cid in self.customers],
+            'not_found': [cid for cid in customer_ids if cid not in self.customers],
+        }
+
+
+def _portfolios(salespeople, customers, rng):
+    rows, portfolios = [], {}
+    customer_id = 1
+    for salesperson_id in range(1, salespeople + 1):
+        center_lat, center_lng = 4.6 + rng.uniform(-0.1, 0.1), -74.08 + rng.uniform(-0.1, 0.1)
+        for _ in range(customers):
+            rows.append({
+                'id': customer_id, 'business_name': f'Cliente {customer_id}', 'salesperson_id': salesperson_id,
+                'latitude': center_lat + rng.uniform(-0.03, 0.03), 'longitude': center_lng + rng.uniform(-0.03, 0.03),
+            })
+            portfolios.setdefault(salesperson_id, []).append(customer_id)
+            customer_id += 1
+    return rows, portfolios
+
+
+def run(salespeople, customers, workers, tsp_seconds, baseline_sample):
+    rng = random.Random(42)
+    path = os.path.join(tempfile.mkdtemp(), 'bench_visit_planning.db')
+    app, _ = create_app(config={
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'VISIT_PLANNING_WORKERS': workers,
+        'VISIT_PLANNING_TSP_SECONDS': tsp_seconds,
+    })
+    with app.app_context():
+        db.create_all()
+
+    rows, portfolios = _portfolios(salespeople, customers, rng)
+    sales = InMemorySalesClient(rows)
+    client = app.test_client()
+    planned_date = (date.today() + timedelta(days=1)).isoformat()
+
+    with patch('src.commands.plan_visit_routes_batch.get_sales_service_client', return_value=sales), \
+            patch('src.commands.generate_visit_routes.get_sales_service_client', return_value=sales):
+        started = time.perf_counter()
+        response = client.post('/routes/visits/generate/batch', json={
+            'planned_date': planned_date,
+            'salespeople': [
+                {'salesperson_id': sid, 'customer_ids': ids} for sid, ids in portfolios.items()
+            ],
+            'start_location': OFFICE,
+        })
+        batch_s = time.perf_counter() - started
+        job = response.get_json()
+        assert job['status'] == 'completed', job
+        batch_calls = sales.calls
+
+        sales.calls = 0
+        sample = list(portfolios.items())[:baseline_sample]
+        started = time.perf_counter()
+        for salesperson_id, ids in sample:
+            response = client.post('/routes/visits/generate', json={
+                'salesperson_id': salesperson_id, 'customer_ids': ids,
+                'planned_date': planned_date, 'start_location': OFFICE,
+            })
+            assert response.status_code == 200, response.get_json()
+        baseline_s = time.perf_counter() - started
+
+    shutdown_planning_pool()
+
+    return {
+        'salespeople': salespeople,
+        'customers': salespeople * customers,
+        'batch_s': batch_s,
+        'batch_calls': batch_calls,
+        'baseline_per_rep_s': baseline_s / len(sample),
+        'baseline_calls_per_rep': sales.calls / len(sample),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--salespeople', type=int, default=40)
+    parser.add_argument('--customers', type=int, default=25)
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--tsp-seconds', type=int, default=2)
+    parser.add_argument('--baseline-sample', type=int, default=2)
+    args = parser.parse_args()
+
+    r = run(args.salespeople, args.customers, args.workers, args.tsp_seconds, args.baseline_sample)
+    print(f"{r['salespeople']} vendedores, {r['customers']} clientes ({args.workers} workers)")
+    print(f"  lote: {r['batch_s']:.1f} s, {r['batch_calls']} llamada(s) a sales-service")
+    print(f"  un request por vendedor: {r['baseline_per_rep_s']:.1f} s/vendedor "
+          f"(~{r['baseline_per_rep_s'] * r['salespeople']:.0f} s para todos), "
+          f"{r['baseline_calls_per_rep']:.0f} llamada(s) por vendedor")
@@ -0,0 +1,109 @@
+"""
+Benchmark: planificación semanal de visitas (VRP periódico) sobre carteras de
+200 clientes.
+
+Cada cartera mezcla frecuencias (1, 2 y 3 visitas por semana) y un 15 % de
+clientes con ventana de mañana (08:00-12:00). Compara, con el mismo
+presupuesto de tiempo para la semana:
+
+- Planificador semanal: asignación por patrones + cada día arrancado desde la
+  solución del día anterior
+- Mismo reparto sin arranque en caliente (cada día en frío)
+- Línea base "a mano": clientes repartidos por turno (cliente i al día i % 5,
+  las visitas repetidas cada 2 días) y cada día resuelto en frío
+
+Mide visitas programadas, visitas que no caben, km de la semana y tiempo.
+
+Uso:
+    python -m benchmarks.bench_weekly_visit_planning --portfolios 3 --customers 200 --budget 10
+"""
+
+import argparse
+import random
+from datetime import time
+
+from src.utils.periodic_visit_planner import WeeklyVisitPlanner
+
+OFFICE = {'latitude': 4.6097, 'longitude': -74.0817}
+DAYS = 5
+
+
+def _portfolio(customers, rng):
+    portfolio = []
+    for n in range(customers):
+        customer = {
+            'customer_id': n + 1,
+            'latitude': 4.6 + rng.uniform(-0.08, 0.08),
+            'longitude': -74.08 + rng.uniform(-0.08, 0.08),
+            'visits_per_week': rng.choices([1, 2, 3], [0.75, 0.2, 0.05])[0],
+        }
+        if rng.random() < 0.15:
+            customer['time_window_start'] = time(8, 0)
+            customer['time_window_end'] = time(12, 0)
+        portfolio.append(customer)
+    return portfolio
+
+
+def _round_robin(portfolio):
+    days = [[] for _ in range(DAYS)]
+    for index, customer in enumerate(portfolio):
+        for visit in range(customer['visits_per_week']):
+            days[(index + visit * 2) % DAYS].append(index)
+    return days
+
+
+def _summary(plan):
+    return {
+        'visits': sum(len(day['sequence']) for day in plan['days']),
+        'dropped': sum(len(day['dropped']) for day in plan['days']) + len(plan['unassigned']),
+        'km': plan['total_distance_km'],
+        'seconds': plan['solve_seconds'],
+    }
+
+
+def run(portfolios, customers, budget, service_minutes):
+    rng = random.Random(43)
+    results = {'weekly': [], 'cold': [], 'round_robin': []}
+    required = 0
+    for _ in range(portfolios):
+        portfolio = _portfolio(customers, rng)
+        required += sum(customer['visits_per_week'] for customer in portfolio)
+        planner = WeeklyVisitPlanner(portfolio, DAYS, time(8, 0), time(18, 0), service_minutes,
+                                     start_location=OFFICE)
+        days, unassigned = planner.assign_days()
+
+        weekly = planner.plan(budget, days=[list(day) for day in days])
+        weekly['unassigned'] = unassigned
+        results['weekly'].append(_summary(weekly))
+
+        cold = planner.plan(budget, warm_start=False, days=[list(day) for day in days])
+        cold['unassigned'] = unassigned
+        results['cold'].append(_summary(cold))
+
+        results['round_robin'].append(_summary(planner.plan(budget, warm_start=False, days=_round_robin(portfolio))))
+
+    return required, {
+        name: {key: sum(r[key] for r in rows) / len(rows) for key in rows[0]}
+        for name, rows in results.items()
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--portfolios', type=int, default=3)
+    parser.add_argument('--customers', type=int, default=200)
+    parser.add_argument('--budget', type=float, default=10)
+    parser.add_argument('--service-minutes', type=int, default=5)
+    args = parser.parse_args()
+
+    required, averages = run(args.portfolios, args.customers, args.budget, args.service_minutes)
+    print(f"{args.portfolios} carteras de {args.customers} clientes, "
+          f"{required / args.portfolios:.0f} visitas requeridas por semana, presupuesto {args.budget} s")
+    labels = {
+        'weekly': 'planificador semanal (arranque en caliente)',
+        'cold': 'mismo reparto, cada día en frío',
+        'round_robin': 'reparto por turno, cada día en frío',
+    }
+    for name, r in averages.items():
+        print(f"  {labels[name]}: {r['visits']:.0f} visitas, {r['dropped']:.1f} sin programar, "
+              f"{r['km']:.1f} km, {r['seconds']:.2f} s")
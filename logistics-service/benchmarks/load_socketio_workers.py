@@ -0,0 +1,156 @@
+"""
+Load test: conexiones concurrentes y latencia de broadcast con 1, 2 y 4 workers.
+
+Levanta N procesos `python -m src.main` (uno por puerto) conectados al mismo
+backplane Redis, reparte los clientes entre ellos (round-robin, como un
+balanceador con sticky sessions), los suscribe a `all_inventory_updates` y
+dispara broadcasts desde el worker 0 con POST /websocket/test-notification.
+La latencia es el tiempo hasta que el ÚLTIMO cliente recibe cada mensaje.
+
+Requisitos: un servidor Redis (o compatible) y `python-socketio[client]`.
+
+Uso:
+    python -m benchmarks.load_socketio_workers --redis redis://localhost:6379/0 \
+        --workers 1 2 4 --clients 500 --broadcasts 20
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+import socketio
+
+BASE_PORT = 3200
+
+
+def _start_workers(count, redis_url, database_url):
+    processes = []
+    for i in range(count):
+        env = dict(
+            os.environ,
+            PORT=str(BASE_PORT + i),
+            HOST='127.0.0.1',
+            FLASK_ENV='production',
+            SOCKETIO_ASYNC_MODE='eventlet',
+            SOCKETIO_MESSAGE_QUEUE=redis_url,
+            BACKGROUND_JOBS_ENABLED='false',
+            INVENTORY_EVENTS_ASYNC='false',
+            DATABASE_URL=database_url,
+        )
+        processes.append(subprocess.Popen(
+            [sys.executable, '-m', 'src.main'],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        ))
+
+    for i in range(count):
+        url = f'http://127.0.0.1:{BASE_PORT + i}/health'
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            try:
+                if requests.get(url, timeout=1).status_code == 200:
+                    break
+            except requests.RequestException:
+                time.sleep(0.2)
+        else:
+            raise RuntimeError(f'Worker {i} no respondió en {url}')
+    return processes
+
+
+def _stop_workers(processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.wait(timeout=10)
+
+
+def _connect_clients(count, workers):
+    received = {}
+    lock = threading.Lock()
+    clients = []
+
+    for i in range(count):
+        client = socketio.Client(reconnection=False)
+
+        @client.on('stock_updated')
+        def on_stock_updated(data, client_id=i):
+            with lock:
+                received.setdefault(data['stock_data']['product_sku'], {})[client_id] = time.perf_counter()
+
+        port = BASE_PORT + (i % workers)
+        try:
+            client.connect(f'http://127.0.0.1:{port}', transports=['websocket'])
+            client.emit('subscribe_all_products', {})
+            clients.append(client)
+        except socketio.exceptions.ConnectionError:
+            break
+
+    return clients, received, lock
+
+
+def run_scenario(workers, clients_count, broadcasts, redis_url, database_url):
+    processes = _start_workers(workers, redis_url, database_url)
+    try:
+        clients, received, lock = _connect_clients(clients_count, workers)
+        connected = len(clients)
+        time.sleep(1.0)
+
+        latencies = []
+        for n in range(broadcasts):
+            sku = f'LOAD-{workers}-{n}'
+            sent_at = time.perf_counter()
+            requests.post(
+                f'http://127.0.0.1:{BASE_PORT}/websocket/test-notification',
+                json={'product_sku': sku},
+                timeout=10
+            )
+            deadline = time.time() + 10
+            while time.time() < deadline:
+                with lock:
+                    done = len(received.get(sku, {})) >= connected
+                if done:
+                    break
+                time.sleep(0.005)
+            with lock:
+                arrivals = list(received.get(sku, {}).values())
+            if arrivals:
+                latencies.append((max(arrivals) - sent_at) * 1000)
+
+        for client in clients:
+            client.disconnect()
+
+        return {
+            'workers': workers,
+            'connected': connected,
+            'p50_ms': statistics.median(latencies) if latencies else None,
+            'p99_ms': (
+                statistics.quantiles(latencies, n=100)[98]
+                if len(latencies) >= 2 else (latencies[0] if latencies else None)
+            ),
+        }
+    finally:
+        _stop_workers(processes)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--redis', default='redis://localhost:6379/0')
+    parser.add_argument('--database-url', default='sqlite:////tmp/logistics_load.db')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--broadcasts', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'conectados':>11} {'p50 ms':>9} {'p99 ms':>9}")
+    for workers in args.workers:
+        result = run_scenario(workers, args.clients, args.broadcasts, args.redis, args.database_url)
+        print(
+            f"{result['workers']:>8} {result['connected']:>11} "
+            f"{result['p50_ms'] or 0:>9.1f} {result['p99_ms'] or 0:>9.1f}"
+        )
@@ -19,6 +19,7 @@ from flask import Flask
 from src.session import db
 from src.models.visit_route import VisitRoute
 from src.models.visit_route_stop import VisitRouteStop
+from src.models.visit_planning_job import VisitPlanningJob
 
 def create_tables():
     """Crea las tablas de visit_routes y visit_route_stops."""
@@ -43,6 +44,9 @@ def create_tables():
         VisitRouteStop.__table__.create(db.engine, checkfirst=True)
         print("✅ Tabla 'visit_route_stops' creada")
         
+        VisitPlanningJob.__table__.create(db.engine, checkfirst=True)
+        print("✅ Tabla 'visit_planning_jobs' creada")
+        
         print("\n✅ Todas las tablas de rutas de visitas han sido creadas exitosamente!")
         print("\n📝 Estructura de las tablas:")
         print("\nvisit_routes:")
@@ -70,6 +74,13 @@ def create_tables():
         print("  - is_completed, is_skipped, completed_at, skipped_at")
         print("  - notes, skip_reason")
         print("  - timestamps (created_at, updated_at)")
+        
+        print("\nvisit_planning_jobs:")
+        print("  - id (PK, UUID hex)")
+        print("  - planned_date, status")
+        print("  - total/completed/failed_salespeople")
+        print("  - progress (JSON por vendedor), warnings, error")
+        print("  - timestamps (created_at, started_at, finished_at)")
 
 if __name__ == '__main__':
     try:
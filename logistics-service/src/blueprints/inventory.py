@@ -1,8 +1,15 @@
 from flask import Blueprint, request, jsonify
-from src.commands.get_stock_levels import GetStockLevels
+from src.commands.get_stock_levels import GetStockLevels, GetStockLevelsBatch
 from src.commands.get_product_location import GetProductLocation
+from src.commands.allocate_pick_list import AllocatePickList
+from src.commands.scan_code import ScanCode
+from src.commands.expiry_sweep import GetNearExpiry
+from src.commands.inventory_ledger import RecordInventoryMovement, GetInventoryLedger
+from src.commands.bulk_inventory_adjustment import BulkInventoryAdjustment
 from src.errors.errors import ApiError, ValidationError, NotFoundError
 from src.models.inventory import Inventory
+from src.models.inventory_movement import InventoryMovement
+from src.services.inventory_ledger import ledger_enabled, lock_balance, get_balance, append_movement
 from src.session import db
 from datetime import datetime
 
@@ -71,6 +78,265 @@ def get_stock_levels():
         raise ApiError(f"Error retrieving stock levels: {str(e)}", status_code=500)
 
 
+@inventory_bp.route('/stock-levels/batch', methods=['POST'])
+def get_stock_levels_batch():
+    """
+    POST /inventory/stock-levels/batch
+    
+    Consulta el stock de muchos SKUs en una sola llamada (respuesta columnar).
+    
+    Body:
+    {
+        "product_skus": ["JER-001", "VAC-001", ...],   // máximo 1000
+        "distribution_center_id": 1,                   // opcional
+        "only_available": false,                       // opcional
+        "include_centers": false                       // opcional
+    }
+    
+    Returns:
+    - 200: Totales por SKU en columnas paralelas + not_found
+    - 400: Parámetros inválidos
+    - 500: Error del servidor
+    """
+    data = request.get_json(silent=True) or {}
+    product_skus = data.get('product_skus')
+    
+    if not isinstance(product_skus, list) or not product_skus:
+        raise ValidationError("Se requiere 'product_skus' como lista no vacía")
+    
+    if not all(isinstance(sku, str) for sku in product_skus):
+        raise ValidationError("'product_skus' debe contener solo strings")
+    
+    try:
+        command = GetStockLevelsBatch(
+            product_skus=product_skus,
+            distribution_center_id=data.get('distribution_center_id'),
+            only_available=bool(data.get('only_available', False)),
+            include_centers=bool(data.get('include_centers', False))
+        )
+        return jsonify(command.execute()), 200
+        
+    except ValueError as e:
+        raise ValidationError(str(e))
+    except Exception as e:
+        raise ApiError(f"Error retrieving stock levels: {str(e)}", status_code=500)
+
+
+@inventory_bp.route('/pick-lists/allocate', methods=['POST'])
+def allocate_pick_list():
+    """
+    POST /inventory/pick-lists/allocate
+    
+    Asigna lotes en orden FEFO a un conjunto de líneas de pedido y devuelve la
+    lista de picking agrupada por ubicación. No modifica el inventario.
+    
+    Body:
+    {
+        "distribution_center_id": 1,          // opcional, centro por defecto
+        "min_shelf_life_days": 0,             // opcional
+        "lines": [
+            {"order_id": "ORD-001", "product_sku": "VAC-001", "quantity": 30,
+             "zone_type": "refrigerated"}
+        ]
+    }
+    
+    Returns:
+    - 200: pick_list por ubicación, asignación por línea, faltantes y resumen
+    - 400: Parámetros inválidos
+    - 500: Error del servidor
+    """
+    data = request.get_json(silent=True)
+    
+    if not data:
+        raise ValidationError("Se requiere el body de la petición")
+    
+    min_shelf_life_days = data.get('min_shelf_life_days', 0)
+    if not isinstance(min_shelf_life_days, int) or min_shelf_life_days < 0:
+        raise ValidationError("'min_shelf_life_days' debe ser un entero no negativo")
+    
+    try:
+        command = AllocatePickList(
+            lines=data.get('lines'),
+            distribution_center_id=data.get('distribution_center_id'),
+            min_shelf_life_days=min_shelf_life_days
+        )
+        return jsonify(command.execute()), 200
+        
+    except ApiError:
+        raise
+    except Exception as e:
+        raise ApiError(f"Error allocating pick list: {str(e)}", status_code=500)
+
+
+@inventory_bp.route('/scan', methods=['GET'])
+def scan_code():
+    """
+    GET /inventory/scan
+    
+    Resuelve un código escaneado a lote, ubicación y centro de distribución
+    con una búsqueda por índice (tabla product_codes + LRU en memoria).
+    
+    Query Parameters:
+    - code: Código leído (barras, QR o código interno)
+    - code_type: barcode, qr_code o internal_code (opcional)
+    
+    Returns:
+    - 200: Lotes que tienen el código, en orden FEFO
+    - 400: Parámetros inválidos
+    - 404: Código no encontrado
+    """
+    command = ScanCode(
+        code=request.args.get('code', type=str),
+        code_type=request.args.get('code_type', type=str)
+    )
+    return jsonify(command.execute()), 200
+
+
+@inventory_bp.route('/near-expiry', methods=['GET'])
+def get_near_expiry():
+    """
+    GET /inventory/near-expiry
+    
+    Lotes disponibles próximos a vencer por SKU y centro, leídos del resumen
+    que recalcula el barrido nocturno de vencimientos.
+    
+    Query Parameters:
+    - days: 30, 60 o 90 (default: 30, acumulativo)
+    - distribution_center_id: ID del centro (opcional)
+    - product_sku: SKU del producto (opcional)
+    
+    Returns:
+    - 200: Lotes por vencer agrupados por SKU y centro
+    - 400: Parámetros inválidos
+    """
+    command = GetNearExpiry(
+        days=request.args.get('days', 30, type=int),
+        distribution_center_id=request.args.get('distribution_center_id', type=int),
+        product_sku=request.args.get('product_sku', type=str)
+    )
+    return jsonify(command.execute()), 200
+
+
+@inventory_bp.route('/movements', methods=['POST'])
+def record_inventory_movement():
+    """
+    POST /inventory/movements
+    
+    Registra un movimiento de inventario en el ledger (solo inserción). El
+    saldo se deriva del último snapshot más los movimientos posteriores; la
+    fila de inventory se actualiza en la siguiente compactación.
+    
+    Body (JSON):
+    {
+        "product_sku": "VAC-001",
+        "distribution_center_id": 1,
+        "movement_type": "receipt",   # receipt, reservation, release, dispatch, adjustment
+        "quantity": 50,               # en adjustment, con signo
+        "reference": "REC-2025-001",  # opcional
+        "from_reservation": true      # opcional, solo dispatch
+    }
+    
+    Returns:
+    - 201: Movimiento registrado, con el saldo resultante
+    - 400: Parámetros inválidos
+    - 404: Producto no encontrado en inventario
+    - 409: Stock insuficiente
+    """
+    data = request.get_json(silent=True)
+    if not data:
+        raise ValidationError("Se requiere el body de la petición")
+
+    try:
+        command = RecordInventoryMovement(
+            product_sku=data.get('product_sku'),
+            distribution_center_id=data.get('distribution_center_id'),
+            movement_type=data.get('movement_type'),
+            quantity=data.get('quantity'),
+            reference=data.get('reference'),
+            from_reservation=data.get('from_reservation', True),
+            details=data.get('details')
+        )
+        return jsonify(command.execute()), 201
+    except ApiError:
+        db.session.rollback()
+        raise
+    except Exception as e:
+        db.session.rollback()
+        raise ApiError(f"Error registrando movimiento: {str(e)}", status_code=500)
+
+
+@inventory_bp.route('/adjustments/bulk', methods=['POST'])
+def bulk_inventory_adjustment():
+    """
+    POST /inventory/adjustments/bulk
+    
+    Aplica un conteo cíclico masivo: el archivo se carga por stream a una
+    tabla de staging, el diff contra inventory se calcula en SQL y se aplica
+    en una sola transacción, con un evento de cambio por SKU afectado.
+    
+    Body: archivo en multipart (campo 'file') o el contenido directo.
+    - CSV con encabezado: product_sku,distribution_center_id,quantity
+    - NDJSON: {"product_sku": "VAC-001", "distribution_center_id": 1, "quantity": 120}
+    
+    Query Parameters:
+    - dry_run: Solo calcular el diff (default: false)
+    - format: csv o ndjson (default: según el nombre o Content-Type del archivo)
+    - reference: Identificador del conteo (opcional)
+    - preview_limit: Cambios detallados en la respuesta (default: 1000)
+    
+    Returns:
+    - 200: Resumen del diff (y si se aplicó)
+    - 400: Archivo inválido o con filas inválidas (no se aplica nada)
+    """
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+
+    file_format = request.args.get('format', type=str)
+    if not file_format:
+        name = (upload.filename or '') if upload else ''
+        content_type = (upload.mimetype if upload else request.mimetype) or ''
+        file_format = 'ndjson' if name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in content_type else 'csv'
+
+    try:
+        command = BulkInventoryAdjustment(
+            stream=stream,
+            file_format=file_format,
+            dry_run=request.args.get('dry_run', 'false').lower() == 'true',
+            reference=request.args.get('reference', type=str),
+            preview_limit=request.args.get('preview_limit', 1000, type=int)
+        )
+        return jsonify(command.execute()), 200
+    except ApiError:
+        raise
+    except Exception as e:
+        raise ApiError(f"Error aplicando ajuste masivo: {str(e)}", status_code=500)
+
+
+@inventory_bp.route('/<product_sku>/ledger', methods=['GET'])
+def get_inventory_ledger(product_sku):
+    """
+    GET /inventory/<product_sku>/ledger
+    
+    Saldo actual (último snapshot + cola del ledger) y últimos movimientos
+    de un producto en un centro.
+    
+    Query Parameters:
+    - distribution_center_id: ID del centro (requerido)
+    - limit: Movimientos a devolver (default: 50, máximo 500)
+    
+    Returns:
+    - 200: Saldo y movimientos
+    - 400: Parámetros inválidos
+    - 404: Producto no encontrado en inventario
+    """
+    command = GetInventoryLedger(
+        product_sku=product_sku,
+        distribution_center_id=request.args.get('distribution_center_id', type=int),
+        limit=request.args.get('limit', 50, type=int)
+    )
+    return jsonify(command.execute()), 200
+
+
 @inventory_bp.route('/product-location', methods=['GET'])
 def get_product_location():
     """
@@ -269,6 +535,10 @@ def update_inventory(product_sku):
     Esta actualización dispara automáticamente una notificación WebSocket 
     cuando se modifica quantity_available.
     
+    Con INVENTORY_LEDGER_ENABLED, las cantidades (disponible, reservada, en
+    tránsito) se registran como un movimiento 'adjustment' en el ledger y la
+    notificación sale en la compactación siguiente.
+    
     Path Parameters:
     - product_sku: SKU del producto a actualizar
     
@@ -372,12 +642,27 @@ def update_inventory(product_sku):
         changes = {}
         old_quantity_available = inventory.quantity_available
         
+        # Con el ledger activo, las cantidades se registran como un ajuste
+        # (la fila se actualiza en la siguiente compactación)
+        use_ledger = ledger_enabled()
+        balance = None
+        if use_ledger:
+            lock_balance(inventory.product_sku, inventory.distribution_center_id)
+            balance = get_balance(inventory.product_sku, inventory.distribution_center_id)
+        ledger_deltas = {}
+        
         # Actualizar campos
         if quantity_available is not None:
             if not isinstance(quantity_available, (int, float)) or quantity_available < 0:
                 raise ValidationError("'quantity_available' debe ser un número no negativo")
             
-            if trigger_websocket:
+            if use_ledger:
+                ledger_deltas['delta_available'] = int(quantity_available) - balance['quantity_available']
+                changes['quantity_available'] = {
+                    'old': balance['quantity_available'],
+                    'new': quantity_available
+                }
+            elif trigger_websocket:
                 # Usar el método que dispara WebSocket
                 inventory.update_quantity_available(quantity_available, auto_notify=True)
             else:
@@ -385,28 +670,43 @@ def update_inventory(product_sku):
                 inventory.quantity_available = quantity_available
                 inventory.last_movement_date = datetime.utcnow()
             
-            changes['quantity_available'] = {
-                'old': old_quantity_available,
-                'new': inventory.quantity_available
-            }
+            if not use_ledger:
+                changes['quantity_available'] = {
+                    'old': old_quantity_available,
+                    'new': inventory.quantity_available
+                }
         
         if quantity_reserved is not None:
             if not isinstance(quantity_reserved, (int, float)) or quantity_reserved < 0:
                 raise ValidationError("'quantity_reserved' debe ser un número no negativo")
-            changes['quantity_reserved'] = {
-                'old': inventory.quantity_reserved,
-                'new': quantity_reserved
-            }
-            inventory.quantity_reserved = quantity_reserved
+            if use_ledger:
+                ledger_deltas['delta_reserved'] = int(quantity_reserved) - balance['quantity_reserved']
+                changes['quantity_reserved'] = {
+                    'old': balance['quantity_reserved'],
+                    'new': quantity_reserved
+                }
+            else:
+                changes['quantity_reserved'] = {
+                    'old': inventory.quantity_reserved,
+                    'new': quantity_reserved
+                }
+                inventory.quantity_reserved = quantity_reserved
         
         if quantity_in_transit is not None:
             if not isinstance(quantity_in_transit, (int, float)) or quantity_in_transit < 0:
                 raise ValidationError("'quantity_in_transit' debe ser un número no negativo")
-            changes['quantity_in_transit'] = {
-                'old': inventory.quantity_in_transit,
-                'new': quantity_in_transit
-            }
-            inventory.quantity_in_transit = quantity_in_transit
+            if use_ledger:
+                ledger_deltas['delta_in_transit'] = int(quantity_in_transit) - balance['quantity_in_transit']
+                changes['quantity_in_transit'] = {
+                    'old': balance['quantity_in_transit'],
+                    'new': quantity_in_transit
+                }
+            else:
+                changes['quantity_in_transit'] = {
+                    'old': inventory.quantity_in_transit,
+                    'new': quantity_in_transit
+                }
+                inventory.quantity_in_transit = quantity_in_transit
         
         if minimum_stock_level is not None:
             if not isinstance(minimum_stock_level, (int, float)) or minimum_stock_level < 0:
@@ -444,8 +744,27 @@ def update_inventory(product_sku):
             }
             inventory.unit_cost = unit_cost
         
+        movement = None
+        if any(ledger_deltas.values()):
+            movement = append_movement(
+                inventory.product_sku,
+                inventory.distribution_center_id,
+                InventoryMovement.TYPE_ADJUSTMENT,
+                reference='inventory-update',
+                **ledger_deltas
+            )
+        
         db.session.commit()
         
+        current_state = inventory.to_dict(include_center=False)
+        if use_ledger:
+            balance = get_balance(inventory.product_sku, inventory.distribution_center_id)
+            current_state.update({
+                field: balance[field]
+                for field in ('quantity_available', 'quantity_reserved', 'quantity_in_transit')
+            })
+            current_state['ledger_movement_id'] = movement.id if movement else None
+        
         return jsonify({
             'success': True,
             'message': f'Inventario actualizado para {product_sku}',
@@ -454,8 +773,8 @@ def update_inventory(product_sku):
                 'distribution_center_id': inventory.distribution_center_id,
                 'distribution_center': inventory.distribution_center.to_dict() if inventory.distribution_center else None,
                 'changes': changes,
-                'current_state': inventory.to_dict(include_center=False),
-                'websocket_notification_sent': trigger_websocket and quantity_available is not None
+                'current_state': current_state,
+                'websocket_notification_sent': trigger_websocket and quantity_available is not None and not use_ledger
             }
         }), 200
         
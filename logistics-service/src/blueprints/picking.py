@@ -0,0 +1,120 @@
+"""
+Blueprint de picking: olas de recogida y secuencia de recorrido en bodega.
+"""
+
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from src.commands.pick_waves import PlanPickWaves, GetPickWaves, GetPickWaveById
+from src.errors.errors import ApiError, ValidationError
+
+picking_bp = Blueprint('picking', __name__, url_prefix='/picking')
+
+
+def _parse_date(value, field):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValidationError(f"'{field}' debe tener formato YYYY-MM-DD")
+
+
+@picking_bp.route('/waves', methods=['POST'])
+def plan_pick_waves():
+    """
+    POST /picking/waves
+
+    Agrupa los pedidos del día de un centro en olas (por zona, cadena de frío
+    y hora de salida de ruta) y secuencia las ubicaciones de cada ola.
+
+    Body:
+    {
+        "distribution_center_id": 1,
+        "planned_date": "2025-11-20",          // opcional, default hoy
+        "departure_window_minutes": 60,        // opcional
+        "max_orders_per_wave": 20,             // opcional
+        "max_units_per_wave": 500,             // opcional
+        "min_shelf_life_days": 0,              // opcional
+        "persist": true,                       // opcional
+        "orders": [                            // opcional, default pedidos en rutas de la fecha
+            {"order_id": 101, "departure_time": "2025-11-20T08:00:00",
+             "lines": [{"product_sku": "VAC-001", "quantity": 30}]}
+        ]
+    }
+
+    Returns:
+    - 200: Olas con su secuencia, faltantes y distancia ahorrada
+    - 400: Parámetros inválidos
+    - 500: Error del servidor
+    """
+    data = request.get_json(silent=True)
+
+    if not data:
+        raise ValidationError("Se requiere el body de la petición")
+
+    planned_date = data.get('planned_date')
+    if planned_date is not None:
+        planned_date = _parse_date(planned_date, 'planned_date')
+
+    for field in ('departure_window_minutes', 'min_shelf_life_days'):
+        value = data.get(field)
+        if value is not None and (not isinstance(value, int) or value < 0):
+            raise ValidationError(f"'{field}' debe ser un entero no negativo")
+
+    try:
+        command = PlanPickWaves(
+            distribution_center_id=data.get('distribution_center_id'),
+            orders=data.get('orders'),
+            planned_date=planned_date,
+            departure_window_minutes=data.get('departure_window_minutes', 60),
+            max_orders_per_wave=data.get('max_orders_per_wave', 20),
+            max_units_per_wave=data.get('max_units_per_wave'),
+            min_shelf_life_days=data.get('min_shelf_life_days', 0),
+            persist=bool(data.get('persist', True))
+        )
+        return jsonify(command.execute()), 200
+
+    except ApiError:
+        raise
+    except Exception as e:
+        raise ApiError(f"Error planning pick waves: {str(e)}", status_code=500)
+
+
+@picking_bp.route('/waves', methods=['GET'])
+def get_pick_waves():
+    """
+    GET /picking/waves
+
+    Query Parameters:
+    - distribution_center_id: Filtrar por centro (opcional)
+    - planned_date: Fecha YYYY-MM-DD (opcional)
+    - status: planned, in_progress, completed, cancelled (opcional)
+    - limit: Límite de resultados (default: 50, máx 200)
+    - offset: Offset para paginación (default: 0)
+
+    Returns:
+    - 200: Olas sin la secuencia de recogida
+    - 400: Parámetros inválidos
+    """
+    planned_date = request.args.get('planned_date')
+    if planned_date:
+        planned_date = _parse_date(planned_date, 'planned_date')
+
+    command = GetPickWaves(
+        distribution_center_id=request.args.get('distribution_center_id', type=int),
+        planned_date=planned_date or None,
+        status=request.args.get('status'),
+        limit=min(request.args.get('limit', 50, type=int), 200),
+        offset=request.args.get('offset', 0, type=int)
+    )
+    return jsonify(command.execute()), 200
+
+
+@picking_bp.route('/waves/<int:wave_id>', methods=['GET'])
+def get_pick_wave(wave_id):
+    """
+    GET /picking/waves/<wave_id>
+
+    Returns:
+    - 200: Ola con su secuencia de recogida
+    - 404: Ola no encontrada
+    """
+    return jsonify(GetPickWaveById(wave_id).execute()), 200
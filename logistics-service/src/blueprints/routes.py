@@ -13,14 +13,17 @@ Endpoints:
 - GET /vehicles/available - Vehículos disponibles
 - GET /vehicles/<id> - Detalle de vehículo
 - PUT /vehicles/<id>/availability - Actualizar disponibilidad
+- GET /routes/<id>/export - Exportar ruta (PDF/CSV)
+- GET /routes/export/daily-summary - Resumen diario en PDF
+- GET /routes/export/bundle - ZIP con las hojas de ruta del día
 """
 
-from flask import Blueprint, request, jsonify, make_response
+from flask import Blueprint, Response, request, jsonify, make_response
 from datetime import datetime
 import logging
 
 from src.commands.generate_routes import GenerateRoutesCommand, CancelRoute, UpdateRouteStatus
-from src.commands.get_routes import GetRoutes, GetRouteById, GetRoutesByDate
+from src.commands.get_routes import GetRoutes, GetRouteById, GetRoutesByDate, decode_route_cursor
 from src.commands.get_vehicles import (
     GetVehicles,
     GetVehicleById,
@@ -207,8 +210,15 @@ def generate_routes():
 def get_routes():
     """
     GET /routes?distribution_center_id=1&planned_date=2025-11-05&status=active&limit=50&offset=0
+    GET /routes?limit=50&cursor=2025-11-05:120
     
     Lista rutas con filtros y paginación.
+    
+    Query params de paginación:
+    - cursor: `next_cursor` de la página anterior (keyset sobre planned_date, id).
+              Con cursor se ignora offset y no se calcula total.
+    - offset: paginación por desplazamiento (legado)
+    - include_total: true/false para forzar o evitar el COUNT de total
     """
     try:
         # Obtener parámetros de query
@@ -218,6 +228,18 @@ def get_routes():
         vehicle_id = request.args.get('vehicle_id', type=int)
         limit = request.args.get('limit', 50, type=int)
         offset = request.args.get('offset', 0, type=int)
+        cursor_str = request.args.get('cursor')
+        include_total_str = request.args.get('include_total')
+        include_total = None if include_total_str is None else include_total_str.lower() == 'true'
+        
+        cursor = None
+        if cursor_str:
+            try:
+                cursor = decode_route_cursor(cursor_str)
+            except ValueError:
+                return jsonify({
+                    'error': 'cursor inválido (use el next_cursor de la página anterior)'
+                }), 400
         
         # Parsear fecha si existe
         planned_date = None
@@ -236,7 +258,9 @@ def get_routes():
             status=status,
             vehicle_id=vehicle_id,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor,
+            include_total=include_total
         )
         
         # Ejecutar
@@ -732,10 +756,10 @@ def export_route(route_id):
         elif export_format == 'csv':
             # Exportar a CSV
             try:
-                csv_content = export_service.export_route_to_csv(route_id)
+                csv_rows = export_service.stream_route_csv(route_id)
                 
-                # Crear respuesta con CSV
-                response = make_response(csv_content)
+                # Respuesta en streaming: las filas salen de la ruta ya cargada
+                response = Response(csv_rows, mimetype='text/csv')
                 response.headers['Content-Type'] = 'text/csv; charset=utf-8'
                 response.headers['Content-Disposition'] = f'attachment; filename=ruta_{route_id}.csv'
                 
@@ -826,3 +850,80 @@ def export_daily_summary():
             'error': 'Error interno del servidor',
             'message': str(e)
         }), 500
+
+
+@routes_bp.route('/export/bundle', methods=['GET'])
+def export_routes_bundle():
+    """
+    GET /routes/export/bundle?distribution_center_id=1&date=2025-11-05&format=pdf|csv|all
+    
+    Descarga en un ZIP las hojas de ruta (PDF y/o CSV) de todas las rutas
+    de un centro en una fecha. Los PDFs se renderizan en paralelo en un pool
+    de procesos (reutilizando los cacheados) y el ZIP se envía en streaming.
+    
+    Query Parameters:
+    - distribution_center_id: ID del centro de distribución (requerido)
+    - date: Fecha en formato YYYY-MM-DD (requerido)
+    - format: pdf, csv o all (default: all)
+    
+    Response:
+    - Content-Type: application/zip
+    - Content-Disposition: attachment con nombre de archivo
+    """
+    try:
+        distribution_center_id = request.args.get('distribution_center_id', type=int)
+        date_str = request.args.get('date')
+        export_format = request.args.get('format', 'all').lower()
+        
+        if not distribution_center_id:
+            return jsonify({
+                'error': 'distribution_center_id es requerido'
+            }), 400
+        
+        if not date_str:
+            return jsonify({
+                'error': 'date es requerido'
+            }), 400
+        
+        formats = {'pdf': ('pdf',), 'csv': ('csv',), 'all': ('pdf', 'csv')}.get(export_format)
+        if formats is None:
+            return jsonify({
+                'error': 'Formato no soportado. Use pdf, csv o all'
+            }), 400
+        
+        try:
+            planned_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({
+                'error': 'date debe estar en formato YYYY-MM-DD'
+            }), 400
+        
+        export_service = get_export_service()
+        
+        try:
+            chunks = export_service.export_routes_bundle(
+                distribution_center_id=distribution_center_id,
+                planned_date=planned_date,
+                formats=formats
+            )
+        except ValueError as e:
+            return jsonify({
+                'error': str(e)
+            }), 404
+        
+        response = Response(chunks, mimetype='application/zip')
+        response.headers['Content-Disposition'] = (
+            f'attachment; filename=rutas_dc{distribution_center_id}_{date_str}.zip'
+        )
+        
+        logger.info(
+            f"ZIP de rutas exportado para DC {distribution_center_id} fecha {date_str}"
+        )
+        return response
+    
+    except Exception as e:
+        logger.exception(f"Error exportando ZIP de rutas: {e}")
+        return jsonify({
+            'error': 'Error interno del servidor',
+            'message': str(e)
+        }), 500
@@ -0,0 +1,104 @@
+"""
+Blueprint de telemetría: posiciones GPS de los conductores.
+"""
+
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from src.errors.errors import ApiError, NotFoundError, ValidationError
+from src.models.vehicle import Vehicle
+from src.models.vehicle_position import VehiclePosition
+from src.services.telemetry_ingestion import get_telemetry_buffer, ingest_positions, leg_matrix_cache
+from src.session import db
+
+telemetry_bp = Blueprint('telemetry', __name__, url_prefix='/telemetry')
+
+
+@telemetry_bp.route('/positions', methods=['POST'])
+def post_positions():
+    """
+    POST /telemetry/positions
+
+    Recibe un lote de posiciones GPS. Las posiciones se escriben por lotes en
+    segundo plano; la última de cada vehículo se copia a `vehicles` y las
+    ETAs de sus rutas se recalculan y emiten por Socket.IO
+    (`route_eta_updated`).
+
+    Body:
+    {
+        "positions": [
+            {"vehicle_id": 5, "latitude": 4.6097, "longitude": -74.0817,
+             "recorded_at": "2025-11-02T14:30:05Z", "speed_kmh": 32.5,
+             "heading": 180, "route_id": 12}
+        ]
+    }
+
+    Returns:
+    - 202: Posiciones aceptadas (con las rechazadas por índice)
+    - 400: Lote vacío, demasiado grande o sin posiciones válidas
+    - 503: Cola de telemetría llena (reintentar)
+    """
+    data = request.get_json(silent=True)
+
+    if not data:
+        raise ValidationError("Se requiere el body de la petición")
+
+    try:
+        return jsonify(ingest_positions(data)), 202
+
+    except ApiError:
+        raise
+    except Exception as e:
+        raise ApiError(f"Error ingesting positions: {str(e)}", status_code=500)
+
+
+@telemetry_bp.route('/vehicles/<int:vehicle_id>/positions', methods=['GET'])
+def get_vehicle_positions(vehicle_id):
+    """
+    GET /telemetry/vehicles/<vehicle_id>/positions
+
+    Query Parameters:
+    - since: Desde (ISO 8601, opcional)
+    - limit: Límite de resultados (default: 100, máx 1000)
+
+    Returns:
+    - 200: Posiciones más recientes primero
+    - 404: Vehículo no encontrado
+    """
+    if db.session.get(Vehicle, vehicle_id) is None:
+        raise NotFoundError(f"Vehículo {vehicle_id} no encontrado")
+
+    query = VehiclePosition.query.filter(VehiclePosition.vehicle_id == vehicle_id)
+
+    since = request.args.get('since')
+    if since:
+        try:
+            query = query.filter(VehiclePosition.recorded_at >= datetime.fromisoformat(since))
+        except ValueError:
+            raise ValidationError("'since' debe tener formato ISO 8601")
+
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    positions = query.order_by(VehiclePosition.recorded_at.desc()).limit(limit).all()
+
+    return jsonify({
+        'vehicle_id': vehicle_id,
+        'positions': [position.to_dict() for position in positions],
+        'count': len(positions)
+    }), 200
+
+
+@telemetry_bp.route('/stats', methods=['GET'])
+def telemetry_stats():
+    """
+    GET /telemetry/stats
+
+    Métricas del buffer de telemetría: profundidad de la cola, posiciones
+    escritas/descartadas, latencias de flush y de ETAs, caché de tramos.
+
+    Returns:
+    - 200: Métricas (mode='sync' si el buffer está desactivado)
+    """
+    buffer = get_telemetry_buffer()
+    if buffer is None:
+        return jsonify({'mode': 'sync', 'leg_cache': leg_matrix_cache.get_stats()}), 200
+
+    return jsonify({'mode': 'async', **buffer.get_stats()}), 200
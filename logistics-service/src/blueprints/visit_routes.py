@@ -10,6 +10,9 @@ from datetime import datetime, date, time
 import logging
 
 from src.commands.generate_visit_routes import GenerateVisitRoutesCommand
+from src.commands.plan_visit_routes_batch import GetVisitPlanningJob, PlanVisitRoutesBatch
+from src.commands.plan_weekly_visit_routes import PlanWeeklyVisitRoutesCommand
+from src.errors.errors import ApiError
 from src.models.visit_route import VisitRoute, VisitRouteStatus
 from src.models.visit_route_stop import VisitRouteStop
 from src.session import Session
@@ -192,6 +195,224 @@ def generate_visit_route():
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
+@visit_routes_bp.route('/generate/batch', methods=['POST'])
+def generate_visit_routes_batch():
+    """
+    POST /routes/visits/generate/batch
+    
+    Planifica en lote las rutas de visitas de varios vendedores para una fecha.
+    Los clientes se obtienen con una sola llamada a sales-service, las
+    distancias se calculan una vez sobre la unión de ubicaciones y cada
+    vendedor se optimiza en paralelo. Responde de inmediato con el trabajo;
+    el avance se consulta en GET /routes/visits/jobs/{job_id}.
+    
+    Request Body (carteras explícitas):
+    {
+        "planned_date": "2025-11-24",
+        "salespeople": [
+            {"salesperson_id": 2, "customer_ids": [1, 5, 12], "salesperson_name": "Maria Gonzalez"},
+            {"salesperson_id": 3, "customer_ids": [7, 9]}
+        ],
+        "start_location": {...},  # opcional, por defecto para todos
+        "work_hours": {"start": "08:00", "end": "18:00"},  # opcional
+        "service_time_per_visit_minutes": 30  # opcional
+    }
+    
+    Request Body (agrupado por el vendedor asignado a cada cliente):
+    {
+        "planned_date": "2025-11-24",
+        "salespeople": "all",  # o [2, 3]
+        "customer_ids": [1, 5, 7, 9, 12]
+    }
+    
+    Response Body (202 Accepted):
+    {
+        "job_id": "3f2c...",
+        "status": "queued",
+        "total_salespeople": 0,
+        "progress_percentage": 0.0,
+        "salespeople": []
+    }
+    
+    Error Responses:
+    - 400: Datos inválidos
+    - 500: Error interno del servidor
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'Request body is required'}), 400
+        
+        for field in ['planned_date', 'salespeople']:
+            if field not in data:
+                return jsonify({'error': f'{field} is required'}), 400
+        
+        try:
+            planned_date = datetime.strptime(data['planned_date'], '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return jsonify({'error': 'planned_date must be in format YYYY-MM-DD'}), 400
+        
+        if planned_date < date.today():
+            return jsonify({'error': 'planned_date cannot be in the past'}), 400
+        
+        work_hours = data.get('work_hours', {})
+        try:
+            work_start_time = datetime.strptime(work_hours.get('start', '08:00'), '%H:%M').time()
+            work_end_time = datetime.strptime(work_hours.get('end', '18:00'), '%H:%M').time()
+        except ValueError:
+            return jsonify({'error': 'work_hours times must be in format HH:MM'}), 400
+        
+        command = PlanVisitRoutesBatch(
+            planned_date=planned_date,
+            salespeople=data['salespeople'],
+            customer_ids=data.get('customer_ids'),
+            optimization_strategy=data.get('optimization_strategy', 'minimize_distance'),
+            start_location=data.get('start_location'),
+            work_start_time=work_start_time,
+            work_end_time=work_end_time,
+            service_time_per_visit_minutes=data.get('service_time_per_visit_minutes', 30),
+            created_by=data.get('created_by')
+        )
+        
+        logger.info(f"Planning visit routes batch for {planned_date}")
+        return jsonify(command.execute()), 202
+        
+    except ApiError as e:
+        return jsonify({'error': e.message}), e.status_code
+    except Exception as e:
+        logger.error(f"Error planning visit routes batch: {e}", exc_info=True)
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@visit_routes_bp.route('/generate/week', methods=['POST'])
+def generate_weekly_visit_routes():
+    """
+    POST /routes/visits/generate/week
+    
+    Planifica la semana de un vendedor: reparte los clientes en los días de
+    trabajo según su frecuencia de visita, respeta ventanas horarias y la
+    jornada, y genera una ruta de visitas por día. La búsqueda de toda la
+    semana se limita a `time_budget_seconds`.
+    
+    Request Body:
+    {
+        "salesperson_id": 2,
+        "salesperson_name": "Maria Gonzalez",  # opcional
+        "week_start": "2025-11-24",
+        "working_days": [0, 1, 2, 3, 4],  # opcional (0 = lunes)
+        "customers": [
+            {"customer_id": 1, "visits_per_week": 2},
+            {"customer_id": 5, "time_window": {"start": "09:00", "end": "12:00"}},
+            {"customer_id": 12, "allowed_days": [1, 3]}
+        ],
+        "start_location": {...},  # opcional
+        "work_hours": {"start": "08:00", "end": "18:00"},  # opcional
+        "service_time_per_visit_minutes": 30,  # opcional
+        "time_budget_seconds": 10  # opcional (máx 60)
+    }
+    
+    Response Body (200 OK):
+    {
+        "status": "success" | "partial",
+        "routes": [{"id": 123, "planned_date": "2025-11-24", ...}],
+        "days": [{"date": "2025-11-24", "weekday": "monday", "stops": 12, "distance_km": 41.3, "warm_started": true}],
+        "unscheduled": [{"customer_id": 7, "date": "2025-11-25", "reason": "..."}],
+        "warnings": [],
+        "computation_time_seconds": 10.4
+    }
+    
+    Error Responses:
+    - 400: Datos inválidos o ningún cliente planificable
+    - 500: Error interno del servidor
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'Request body is required'}), 400
+        
+        for field in ['salesperson_id', 'week_start', 'customers']:
+            if field not in data:
+                return jsonify({'error': f'{field} is required'}), 400
+        
+        salesperson_id = data['salesperson_id']
+        
+        try:
+            week_start = datetime.strptime(data['week_start'], '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return jsonify({'error': 'week_start must be in format YYYY-MM-DD'}), 400
+        
+        if week_start < date.today():
+            return jsonify({'error': 'week_start cannot be in the past'}), 400
+        
+        work_hours = data.get('work_hours', {})
+        try:
+            work_start_time = datetime.strptime(work_hours.get('start', '08:00'), '%H:%M').time()
+            work_end_time = datetime.strptime(work_hours.get('end', '18:00'), '%H:%M').time()
+        except ValueError:
+            return jsonify({'error': 'work_hours times must be in format HH:MM'}), 400
+        
+        command = PlanWeeklyVisitRoutesCommand(
+            salesperson_id=salesperson_id,
+            salesperson_name=data.get('salesperson_name', f'Vendedor {salesperson_id}'),
+            salesperson_employee_id=data.get('salesperson_employee_id', f'SALES-{salesperson_id:03d}'),
+            week_start=week_start,
+            customers=data['customers'],
+            working_days=data.get('working_days'),
+            optimization_strategy=data.get('optimization_strategy', 'minimize_distance'),
+            start_location=data.get('start_location'),
+            end_location=data.get('end_location'),
+            work_start_time=work_start_time,
+            work_end_time=work_end_time,
+            service_time_per_visit_minutes=data.get('service_time_per_visit_minutes', 30),
+            time_budget_seconds=data.get('time_budget_seconds')
+        )
+        
+        logger.info(f"Planning weekly visit routes for salesperson {salesperson_id} from {week_start}")
+        result = command.execute()
+        
+        if result['status'] == 'failed':
+            return jsonify({
+                'status': 'error',
+                'errors': result['errors'],
+                'warnings': result['warnings']
+            }), 400
+        
+        return jsonify({
+            **result,
+            'routes': [route.to_dict(include_stops=False) for route in result['routes']]
+        }), 200
+        
+    except ApiError as e:
+        return jsonify({'error': e.message}), e.status_code
+    except Exception as e:
+        logger.error(f"Error planning weekly visit routes: {e}", exc_info=True)
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
+@visit_routes_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_visit_planning_job(job_id):
+    """
+    GET /routes/visits/jobs/{job_id}
+    
+    Estado de un lote de planificación con el avance por vendedor
+    (pending, solving, completed, failed) y la ruta generada de cada uno.
+    
+    Error Responses:
+    - 404: Trabajo no encontrado
+    - 500: Error interno
+    """
+    try:
+        return jsonify(GetVisitPlanningJob(job_id).execute()), 200
+        
+    except ApiError as e:
+        return jsonify({'error': e.message}), e.status_code
+    except Exception as e:
+        logger.error(f"Error getting visit planning job: {e}")
+        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+
+
 @visit_routes_bp.route('/<int:route_id>', methods=['GET'])
 def get_visit_route(route_id):
     """
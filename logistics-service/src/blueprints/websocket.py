@@ -85,6 +85,46 @@ def test_notification():
     }), 200
 
 
+@websocket_bp.route('/publisher-stats', methods=['GET'])
+def publisher_stats():
+    """
+    GET /websocket/publisher-stats
+    
+    Métricas del buffer de eventos de inventario: profundidad de la cola,
+    latencia de flush y ratio de coalescencia.
+    
+    Returns:
+    - 200: Métricas del publicador (mode='sync' si el buffer está desactivado)
+    """
+    from src.websockets.inventory_event_buffer import get_event_buffer
+    
+    buffer = get_event_buffer()
+    if buffer is None:
+        return jsonify({'mode': 'sync'}), 200
+    
+    return jsonify({'mode': 'async', **buffer.get_stats()}), 200
+
+
+@websocket_bp.route('/outbox-stats', methods=['GET'])
+def outbox_stats():
+    """
+    GET /websocket/outbox-stats
+    
+    Estado del outbox de inventario: eventos pendientes/fallidos, antigüedad
+    del pendiente más viejo y métricas del relay si corre en este proceso.
+    
+    Returns:
+    - 200: Métricas del outbox (relay=null si el relay corre en otro worker)
+    """
+    from src.websockets.inventory_outbox import get_outbox_backlog, get_outbox_relay
+    
+    relay = get_outbox_relay()
+    return jsonify({
+        **get_outbox_backlog(),
+        'relay': relay.get_stats() if relay is not None else None
+    }), 200
+
+
 @websocket_bp.route('/info', methods=['GET'])
 def websocket_info():
     """
@@ -102,16 +142,30 @@ def websocket_info():
             'client_events': {
                 'connect': 'Conectar al servidor',
                 'disconnect': 'Desconectar del servidor',
-                'subscribe_products': 'Suscribirse a productos específicos (enviar: {product_skus: []})',
+                'subscribe_products': 'Suscribirse a productos específicos (enviar: {product_skus: [], protocol?: 2, encoding?: "json"|"msgpack"})',
+                'resync_products': 'Pedir snapshot v2 tras detectar un salto en seq (enviar: {product_skus: []})',
                 'unsubscribe_products': 'Desuscribirse de productos',
-                'subscribe_all_products': 'Suscribirse a todos los productos',
+                'subscribe_all_products': 'Suscribirse a todos los productos (enviar: {batch?: true} para recibir stock_updated_batch)',
+                'subscribe_scope': 'Suscribirse por alcance (enviar: {distribution_center_ids?: [], categories?: [], event_types?: []})',
+                'unsubscribe_scope': 'Desuscribirse de un alcance (mismo payload que subscribe_scope)',
+                'subscribe_route': 'Suscribirse a las ETAs en vivo de rutas (enviar: {route_ids: []})',
+                'unsubscribe_route': 'Desuscribirse de rutas (mismo payload que subscribe_route)',
+                'position_update': 'Conductor: posición GPS o lote {positions: []} (el ack trae accepted/rejected)',
                 'ping': 'Ping para mantener conexión'
             },
             'server_events': {
                 'connection_established': 'Confirmación de conexión exitosa',
                 'stock_updated': 'Notificación de cambio de stock',
+                'stock_updated_batch': 'Lote de cambios de stock (suscriptores de todos los productos con batch: true)',
+                'stock_delta': 'Protocolo v2: solo campos cambiados, con seq por SKU (JSON o MessagePack)',
+                'stock_snapshot': 'Protocolo v2: snapshot compacto en respuesta a resync_products',
                 'subscribed': 'Confirmación de suscripción a productos',
                 'subscribed_all': 'Confirmación de suscripción global',
+                'subscribed_scope': 'Confirmación de suscripción por alcance',
+                'unsubscribed_scope': 'Confirmación de desuscripción de un alcance',
+                'subscribed_routes': 'Confirmación de suscripción a rutas',
+                'unsubscribed_routes': 'Confirmación de desuscripción de rutas',
+                'route_eta_updated': 'Posición del vehículo y ETAs recalculadas de las paradas pendientes de la ruta',
                 'unsubscribed': 'Confirmación de desuscripción',
                 'pong': 'Respuesta a ping',
                 'error': 'Error en operación'
@@ -121,6 +175,19 @@ def websocket_info():
             'subscribe_products': {
                 'product_skus': ['JER-001', 'VAC-001', 'GUANTE-001']
             },
+            'subscribe_scope': {
+                'distribution_center_ids': [1],
+                'categories': ['Vacunas'],
+                'event_types': ['low_stock', 'out_of_stock']
+            },
+            'stock_delta': {
+                'v': 2,
+                'sku': 'JER-001',
+                'seq': 42,
+                'ct': 'reservation',
+                'ts': '2025-10-30T14:30:00',
+                'd': {'ta': 400, 'tr': 100, 'c': {'1': {'a': 250, 'r': 100}}}
+            },
             'stock_updated': {
                 'product_sku': 'JER-001',
                 'change_type': 'update',
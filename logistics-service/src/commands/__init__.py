@@ -1,5 +1,8 @@
-from .get_stock_levels import GetStockLevels
+from .get_stock_levels import GetStockLevels, GetStockLevelsBatch
 from .get_product_location import GetProductLocation
+from .scan_code import ScanCode
+from .allocate_pick_list import AllocatePickList
+from .pick_waves import PlanPickWaves, GetPickWaves, GetPickWaveById
 
 # Route optimization commands
 from .generate_routes import (
@@ -18,7 +21,13 @@ from .reassign_order import ReassignOrder
 
 __all__ = [
     'GetStockLevels',
+    'GetStockLevelsBatch',
     'GetProductLocation',
+    'ScanCode',
+    'AllocatePickList',
+    'PlanPickWaves',
+    'GetPickWaves',
+    'GetPickWaveById',
     'GenerateRoutesCommand',
     'CancelRoute',
     'UpdateRouteStatus',
@@ -0,0 +1,384 @@
+"""
+Asignación FEFO (First-Expire-First-Out) de lotes para armar listas de picking.
+
+Dado un conjunto de líneas de pedido, asigna cantidades desde los lotes
+(`ProductBatch`) disponibles, no vencidos y fuera de cuarentena, empezando
+por el que vence primero. Una línea puede repartirse entre varios lotes y
+ubicaciones. El resultado es una lista de picking agrupada por
+`WarehouseLocation`.
+
+Rendimiento: todos los lotes candidatos de la ola se cargan con UNA consulta
+de columnas y se indexan por (SKU, centro) ya ordenados por vencimiento. La
+asignación recorre esos índices en memoria con un cursor por clave, así que
+una ola de cientos de líneas no hace una consulta por línea.
+
+La asignación es un plan: no modifica cantidades de lotes ni de inventario.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+from src.session import db
+from src.models.product_batch import ProductBatch
+from src.models.warehouse_location import WarehouseLocation
+from src.errors.errors import ValidationError
+
+# Temperatura máxima (°C) a partir de la cual un lote exige cadena de frío
+COLD_CHAIN_MAX_TEMPERATURE = 8.0
+
+ZONE_REFRIGERATED = 'refrigerated'
+ZONE_AMBIENT = 'ambient'
+VALID_ZONES = {ZONE_REFRIGERATED, ZONE_AMBIENT}
+
+# Máximo de líneas por llamada
+MAX_LINES = 2000
+
+
+class BatchSlot:
+    """Lote candidato con su saldo pendiente dentro de la asignación."""
+
+    __slots__ = (
+        'batch_id', 'batch_number', 'product_sku', 'distribution_center_id',
+        'expiry_date', 'remaining', 'location_id', 'zone_type',
+        'aisle', 'shelf', 'level_position', 'requires_cold_chain'
+    )
+
+    def __init__(self, batch_id, batch_number, product_sku, distribution_center_id,
+                 expiry_date, quantity, location_id, zone_type, aisle, shelf,
+                 level_position, requires_cold_chain):
+        self.batch_id = batch_id
+        self.batch_number = batch_number
+        self.product_sku = product_sku
+        self.distribution_center_id = distribution_center_id
+        self.expiry_date = expiry_date
+        self.remaining = quantity
+        self.location_id = location_id
+        self.zone_type = zone_type
+        self.aisle = aisle
+        self.shelf = shelf
+        self.level_position = level_position
+        self.requires_cold_chain = requires_cold_chain
+
+    @property
+    def location_code(self) -> str:
+        return f"{self.aisle}-{self.shelf}-{self.level_position}"
+
+    def sort_key(self):
+        return (self.expiry_date, self.aisle, self.shelf, self.level_position, self.batch_id)
+
+
+class FefoBatchIndex:
+    """
+    Índice en memoria de lotes por (SKU, centro), ordenado por vencimiento.
+
+    Cada clave tiene un cursor al primer lote con saldo, de modo que los lotes
+    agotados no se vuelven a recorrer en las líneas siguientes.
+    """
+
+    def __init__(self, slots_by_key: Dict[Tuple[str, int], List[BatchSlot]]):
+        self._slots = slots_by_key
+        self._cursor = {key: 0 for key in slots_by_key}
+
+    @classmethod
+    def load(cls, keys, min_expiry_date: date) -> 'FefoBatchIndex':
+        """
+        Carga con una sola consulta los lotes asignables de las claves pedidas.
+
+        Args:
+            keys: Iterable de (product_sku, distribution_center_id)
+            min_expiry_date: Solo lotes que vencen en esta fecha o después
+        """
+        keys = list(set(keys))
+        slots_by_key: Dict[Tuple[str, int], List[BatchSlot]] = {key: [] for key in keys}
+        if not keys:
+            return cls(slots_by_key)
+
+        rows = (
+            db.session.query(
+                ProductBatch.id,
+                ProductBatch.batch_number,
+                ProductBatch.product_sku,
+                ProductBatch.distribution_center_id,
+                ProductBatch.expiry_date,
+                ProductBatch.quantity,
+                ProductBatch.location_id,
+                ProductBatch.required_temperature_max,
+                WarehouseLocation.zone_type,
+                WarehouseLocation.aisle,
+                WarehouseLocation.shelf,
+                WarehouseLocation.level_position,
+                WarehouseLocation.current_temperature,
+                WarehouseLocation.temperature_min,
+                WarehouseLocation.temperature_max
+            )
+            .join(WarehouseLocation, WarehouseLocation.id == ProductBatch.location_id)
+            .filter(
+                and_(
+                    # IN por columna usa idx_sku_dc_expiry; las combinaciones
+                    # que no se pidieron se descartan al indexar
+                    ProductBatch.product_sku.in_({sku for sku, _ in keys}),
+                    ProductBatch.distribution_center_id.in_({dc for _, dc in keys}),
+                    ProductBatch.is_available == True,
+                    or_(ProductBatch.is_expired == False, ProductBatch.is_expired.is_(None)),
+                    or_(ProductBatch.is_quarantine == False, ProductBatch.is_quarantine.is_(None)),
+                    ProductBatch.quantity > 0,
+                    ProductBatch.expiry_date >= min_expiry_date,
+                    WarehouseLocation.is_active == True
+                )
+            )
+            .all()
+        )
+
+        for (batch_id, batch_number, sku, dc_id, expiry_date, quantity, location_id,
+             required_max, zone_type, aisle, shelf, level_position,
+             current_temperature, temperature_min, temperature_max) in rows:
+            slots = slots_by_key.get((sku, dc_id))
+            if slots is None:
+                continue
+            requires_cold_chain = (
+                required_max is not None and required_max <= COLD_CHAIN_MAX_TEMPERATURE
+            )
+            if requires_cold_chain and not _cold_location_ok(
+                zone_type, current_temperature, temperature_min, temperature_max
+            ):
+                continue
+            slots.append(BatchSlot(
+                batch_id, batch_number, sku, dc_id, expiry_date, quantity, location_id,
+                zone_type, aisle, shelf, level_position, requires_cold_chain
+            ))
+
+        for slots in slots_by_key.values():
+            slots.sort(key=BatchSlot.sort_key)
+
+        return cls(slots_by_key)
+
+    def take(self, product_sku: str, distribution_center_id: int, quantity: int,
+             zone_type: Optional[str] = None) -> List[Tuple[BatchSlot, int]]:
+        """
+        Asigna hasta `quantity` unidades en orden FEFO.
+
+        Returns:
+            Lista de (lote, cantidad tomada)
+        """
+        key = (product_sku, distribution_center_id)
+        slots = self._slots.get(key)
+        if not slots:
+            return []
+
+        taken = []
+        position = self._cursor[key]
+
+        # Sin filtro de zona se avanza el cursor sobre lotes agotados
+        while position < len(slots) and slots[position].remaining == 0:
+            position += 1
+        self._cursor[key] = position
+
+        for i in range(position, len(slots)):
+            if quantity == 0:
+                break
+            slot = slots[i]
+            if slot.remaining == 0 or (zone_type and slot.zone_type != zone_type):
+                continue
+            amount = min(slot.remaining, quantity)
+            slot.remaining -= amount
+            quantity -= amount
+            taken.append((slot, amount))
+
+        return taken
+
+    def available(self, product_sku: str, distribution_center_id: int) -> int:
+        return sum(slot.remaining for slot in self._slots.get((product_sku, distribution_center_id), []))
+
+
+def _cold_location_ok(zone_type, current_temperature, temperature_min, temperature_max) -> bool:
+    """
+    Un lote que exige cadena de frío solo se puede despachar desde una zona
+    refrigerada cuya temperatura actual esté dentro de rango.
+    """
+    if zone_type != ZONE_REFRIGERATED:
+        return False
+    if current_temperature is None:
+        return True
+    if temperature_min is not None and current_temperature < temperature_min:
+        return False
+    if temperature_max is not None and current_temperature > temperature_max:
+        return False
+    return True
+
+
+class AllocatePickList:
+    """
+    Comando para asignar lotes FEFO a un conjunto de líneas de pedido.
+
+    Formato de líneas:
+        [
+            {
+                "order_id": "ORD-001",          # opcional
+                "line_id": "1",                 # opcional
+                "product_sku": "VAC-001",
+                "quantity": 30,
+                "distribution_center_id": 1,    # opcional si se pasa al comando
+                "zone_type": "refrigerated"     # opcional
+            },
+            ...
+        ]
+    """
+
+    def __init__(self, lines: List[Dict], distribution_center_id: Optional[int] = None,
+                 min_shelf_life_days: int = 0, today: Optional[date] = None):
+        """
+        Args:
+            lines: Líneas de pedido a asignar
+            distribution_center_id: Centro por defecto para las líneas sin centro
+            min_shelf_life_days: Días mínimos de vida útil restantes del lote
+            today: Fecha de referencia (por defecto hoy)
+        """
+        self.lines = lines
+        self.distribution_center_id = distribution_center_id
+        self.min_shelf_life_days = min_shelf_life_days
+        self.today = today or date.today()
+
+    def execute(self) -> Dict:
+        lines = self._normalize_lines()
+
+        # Un lote se considera vencido a partir del día siguiente a expiry_date
+        min_expiry_date = self.today + timedelta(days=max(self.min_shelf_life_days, 0))
+        index = FefoBatchIndex.load(
+            ((line['product_sku'], line['distribution_center_id']) for line in lines),
+            min_expiry_date
+        )
+
+        allocations = []
+        shortages = []
+        locations: Dict[int, Dict] = {}
+
+        for line in lines:
+            taken = index.take(
+                line['product_sku'],
+                line['distribution_center_id'],
+                line['quantity'],
+                line['zone_type']
+            )
+            allocated = sum(amount for _, amount in taken)
+
+            allocations.append({
+                'order_id': line['order_id'],
+                'line_id': line['line_id'],
+                'product_sku': line['product_sku'],
+                'distribution_center_id': line['distribution_center_id'],
+                'quantity_requested': line['quantity'],
+                'quantity_allocated': allocated,
+                'status': (
+                    'allocated' if allocated == line['quantity']
+                    else 'partial' if allocated > 0 else 'unallocated'
+                ),
+                'batches': [
+                    {
+                        'batch_id': slot.batch_id,
+                        'batch_number': slot.batch_number,
+                        'expiry_date': slot.expiry_date.isoformat(),
+                        'location_id': slot.location_id,
+                        'quantity': amount
+                    }
+                    for slot, amount in taken
+                ]
+            })
+
+            if allocated < line['quantity']:
+                shortages.append({
+                    'order_id': line['order_id'],
+                    'line_id': line['line_id'],
+                    'product_sku': line['product_sku'],
+                    'distribution_center_id': line['distribution_center_id'],
+                    'quantity_missing': line['quantity'] - allocated
+                })
+
+            for slot, amount in taken:
+                location = locations.get(slot.location_id)
+                if location is None:
+                    location = locations[slot.location_id] = {
+                        'location_id': slot.location_id,
+                        'distribution_center_id': slot.distribution_center_id,
+                        'zone_type': slot.zone_type,
+                        'aisle': slot.aisle,
+                        'shelf': slot.shelf,
+                        'level_position': slot.level_position,
+                        'location_code': slot.location_code,
+                        'total_units': 0,
+                        'picks': []
+                    }
+                location['total_units'] += amount
+                location['picks'].append({
+                    'order_id': line['order_id'],
+                    'line_id': line['line_id'],
+                    'product_sku': slot.product_sku,
+                    'batch_id': slot.batch_id,
+                    'batch_number': slot.batch_number,
+                    'expiry_date': slot.expiry_date.isoformat(),
+                    'quantity': amount
+                })
+
+        pick_list = sorted(
+            locations.values(),
+            key=lambda loc: (loc['distribution_center_id'], loc['zone_type'],
+                             loc['aisle'], loc['shelf'], loc['level_position'])
+        )
+
+        total_requested = sum(line['quantity'] for line in lines)
+        total_allocated = sum(a['quantity_allocated'] for a in allocations)
+
+        return {
+            'pick_list': pick_list,
+            'lines': allocations,
+            'shortages': shortages,
+            'summary': {
+                'total_lines': len(lines),
+                'lines_fully_allocated': sum(1 for a in allocations if a['status'] == 'allocated'),
+                'total_requested': total_requested,
+                'total_allocated': total_allocated,
+                'locations': len(pick_list),
+                'fill_rate': round(total_allocated / total_requested, 4) if total_requested else 1.0
+            }
+        }
+
+    def _normalize_lines(self) -> List[Dict]:
+        if not isinstance(self.lines, list) or not self.lines:
+            raise ValidationError("Se requiere 'lines' como lista no vacía")
+        if len(self.lines) > MAX_LINES:
+            raise ValidationError(f"Máximo {MAX_LINES} líneas por asignación")
+
+        normalized = []
+        for position, line in enumerate(self.lines):
+            if not isinstance(line, dict):
+                raise ValidationError(f"Línea {position}: formato inválido")
+
+            sku = line.get('product_sku')
+            if not sku or not isinstance(sku, str):
+                raise ValidationError(f"Línea {position}: 'product_sku' es requerido")
+
+            quantity = line.get('quantity')
+            if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+                raise ValidationError(f"Línea {position}: 'quantity' debe ser un entero positivo")
+
+            distribution_center_id = line.get('distribution_center_id') or self.distribution_center_id
+            if not distribution_center_id:
+                raise ValidationError(f"Línea {position}: 'distribution_center_id' es requerido")
+
+            zone_type = line.get('zone_type')
+            if zone_type is not None and zone_type not in VALID_ZONES:
+                raise ValidationError(
+                    f"Línea {position}: 'zone_type' debe ser 'refrigerated' o 'ambient'"
+                )
+
+            normalized.append({
+                'order_id': line.get('order_id'),
+                'line_id': line.get('line_id', position),
+                'product_sku': sku.strip().upper(),
+                'quantity': quantity,
+                'distribution_center_id': int(distribution_center_id),
+                'zone_type': zone_type
+            })
+
+        return normalized
@@ -0,0 +1,441 @@
+"""
+Ajuste masivo de inventario desde un archivo de conteo cíclico.
+
+El archivo (CSV con encabezado o NDJSON) trae la cantidad contada por SKU y
+centro. Flujo, en UNA transacción:
+
+1. Se lee el archivo como stream y se carga en `inventory_adjustment_staging`
+   por tramos: COPY ... FROM STDIN en PostgreSQL, INSERT de varias filas en
+   otros motores. Las filas inválidas se informan con su número de línea.
+2. El diff contra `inventory` se calcula en SQL (duplicados, SKU/centro
+   inexistentes, sin cambios, con cambios). Con el ledger activo, el diff
+   es contra el saldo (snapshot + cola) y los SKU/centro del archivo quedan
+   bloqueados (`lock_balances`) hasta el fin de la transacción; la
+   compactación queda para el job periódico.
+3. Sin `dry_run` y sin errores: un UPDATE ... FROM staging ajusta
+   `quantity_available` (con el ledger activo, un INSERT ... SELECT de
+   movimientos `adjustment`), se escribe un evento por SKU afectado en el
+   outbox y se borra el staging.
+
+Con `dry_run` (o con errores) se hace rollback y nada cambia.
+"""
+
+import csv
+import io
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, literal, select
+
+from src.session import db
+from src.models.inventory import Inventory
+from src.models.inventory_adjustment_staging import InventoryAdjustmentStaging
+from src.models.inventory_movement import InventoryMovement
+from src.services.inventory_ledger import ledger_enabled, lock_balances, balances
+from src.websockets.inventory_events import InventoryEventDetector
+from src.websockets.inventory_outbox import record_outbox_events
+from src.errors.errors import ValidationError
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('csv', 'ndjson')
+QUANTITY_COLUMNS = ('quantity', 'counted_quantity', 'quantity_available')
+
+LOAD_CHUNK_SIZE = 10000
+MAX_ROWS = 500000
+MAX_REPORTED_ERRORS = 100
+DEFAULT_PREVIEW_LIMIT = 1000
+
+_COPY_SQL = (
+    "COPY inventory_adjustment_staging "
+    "(import_id, line_number, product_sku, distribution_center_id, counted_quantity) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+
+class BulkInventoryAdjustment:
+    """
+    Comando para aplicar (o simular) un conteo cíclico masivo.
+    """
+
+    def __init__(self, stream, file_format: str = 'csv', dry_run: bool = False,
+                 reference: Optional[str] = None, preview_limit: int = DEFAULT_PREVIEW_LIMIT):
+        """
+        Args:
+            stream: Archivo binario (se lee una sola vez, sin cargarlo entero)
+            file_format: 'csv' o 'ndjson'
+            dry_run: Calcular el diff sin aplicar cambios
+            reference: Identificador del conteo (se guarda en los movimientos)
+            preview_limit: Máximo de cambios detallados en la respuesta
+        """
+        self.stream = stream
+        self.file_format = (file_format or 'csv').lower()
+        self.dry_run = dry_run
+        self.reference = reference
+        self.preview_limit = preview_limit
+        self.use_ledger = ledger_enabled()
+
+        self.import_id = str(uuid.uuid4())
+        self.staging = InventoryAdjustmentStaging.__table__
+        self.inventory = Inventory.__table__
+        # Cantidad actual contra la que se calcula el diff: la fila, o el
+        # saldo del ledger (se define tras cargar el staging)
+        self.current = self.inventory
+
+    def execute(self) -> Dict:
+        if self.file_format not in FORMATS:
+            raise ValidationError("format debe ser 'csv' o 'ndjson'")
+        if self.stream is None:
+            raise ValidationError("Se requiere el archivo de conteo")
+
+        started = datetime.utcnow()
+
+        try:
+            received, errors = self._load()
+            if received == 0 and not errors:
+                raise ValidationError("El archivo no tiene filas")
+
+            if self.use_ledger:
+                keys = (
+                    select(self.staging.c.product_sku, self.staging.c.distribution_center_id)
+                    .where(self.staging.c.import_id == self.import_id)
+                    .distinct()
+                    .subquery()
+                )
+                lock_balances(keys)
+                self.current = balances(keys)
+
+            rows_received = received + len(errors)
+            errors.extend(self._duplicate_errors())
+            result = self._diff()
+            result.update({
+                'import_id': self.import_id,
+                'dry_run': self.dry_run,
+                'reference': self.reference,
+                'write_path': 'ledger' if self.use_ledger else 'row',
+                'rows_received': rows_received,
+                'rows_invalid': len(errors),
+                'errors': errors[:MAX_REPORTED_ERRORS],
+                'applied': False,
+                'events_recorded': 0
+            })
+
+            if errors and not self.dry_run:
+                db.session.rollback()
+                raise ValidationError(
+                    f"El archivo tiene {len(errors)} filas inválidas; no se aplicó ningún ajuste",
+                    payload={'errors': errors[:MAX_REPORTED_ERRORS], 'rows_invalid': len(errors)}
+                )
+
+            if self.dry_run:
+                db.session.rollback()
+            else:
+                result['events_recorded'] = self._apply()
+                result['applied'] = True
+                db.session.execute(self.staging.delete().where(self.staging.c.import_id == self.import_id))
+                db.session.commit()
+
+        except Exception:
+            db.session.rollback()
+            raise
+
+        result['duration_ms'] = round((datetime.utcnow() - started).total_seconds() * 1000, 1)
+        logger.info(
+            f"📋 Ajuste masivo {self.import_id} ({'simulado' if self.dry_run else 'aplicado'}): "
+            f"{result['rows_received']} filas, {result['changed']} con cambios, "
+            f"{result['not_found']['count']} sin inventario ({result['duration_ms']} ms)"
+        )
+        return result
+
+    # ------------------------------------------------------------------
+    # Carga
+    # ------------------------------------------------------------------
+
+    def _load(self) -> Tuple[int, List[Dict]]:
+        """Lee el archivo y lo carga al staging por tramos."""
+        loaded = 0
+        errors: List[Dict] = []
+        chunk: List[Tuple] = []
+
+        for line_number, record in self._records():
+            if loaded + len(errors) >= MAX_ROWS:
+                raise ValidationError(f"El archivo supera el máximo de {MAX_ROWS} filas")
+            try:
+                chunk.append((line_number, *_parse_record(record)))
+            except ValueError as e:
+                errors.append({'line': line_number, 'error': str(e)})
+                continue
+
+            if len(chunk) >= LOAD_CHUNK_SIZE:
+                self._copy_chunk(chunk)
+                loaded += len(chunk)
+                chunk = []
+
+        if chunk:
+            self._copy_chunk(chunk)
+            loaded += len(chunk)
+        return loaded, errors
+
+    def _records(self) -> Iterator[Tuple[int, object]]:
+        text = io.TextIOWrapper(self.stream, encoding='utf-8-sig', newline='')
+
+        if self.file_format == 'ndjson':
+            for line_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError:
+                    yield line_number, None
+            return
+
+        reader = csv.DictReader(text)
+        columns = {(name or '').strip() for name in (reader.fieldnames or [])}
+        if not {'product_sku', 'distribution_center_id'} <= columns or not columns & set(QUANTITY_COLUMNS):
+            raise ValidationError(
+                "El CSV debe tener encabezado con product_sku, distribution_center_id y quantity"
+            )
+        for record in reader:
+            # La línea 1 es el encabezado
+            yield reader.line_num, {(key or '').strip(): value for key, value in record.items()}
+
+    def _copy_chunk(self, chunk: List[Tuple]):
+        if db.session.get_bind().dialect.name == 'postgresql':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in chunk:
+                writer.writerow((self.import_id, *row))
+            buffer.seek(0)
+            cursor = db.session.connection().connection.cursor()
+            try:
+                cursor.copy_expert(_COPY_SQL, buffer)
+            finally:
+                cursor.close()
+            return
+
+        db.session.execute(self.staging.insert(), [
+            {
+                'import_id': self.import_id,
+                'line_number': line_number,
+                'product_sku': sku,
+                'distribution_center_id': dc_id,
+                'counted_quantity': quantity
+            }
+            for line_number, sku, dc_id, quantity in chunk
+        ])
+
+    # ------------------------------------------------------------------
+    # Diff
+    # ------------------------------------------------------------------
+
+    def _join(self):
+        return self.staging.outerjoin(self.current, and_(
+            self.current.c.product_sku == self.staging.c.product_sku,
+            self.current.c.distribution_center_id == self.staging.c.distribution_center_id
+        ))
+
+    def _changed(self):
+        return and_(
+            self.staging.c.import_id == self.import_id,
+            self.current.c.id.isnot(None),
+            self.staging.c.counted_quantity != self.current.c.quantity_available
+        )
+
+    def _duplicate_errors(self) -> List[Dict]:
+        """SKU/centro repetidos en el archivo: se informan todas sus líneas salvo la primera."""
+        staging = self.staging
+        first_lines = (
+            select(
+                staging.c.product_sku,
+                staging.c.distribution_center_id,
+                func.min(staging.c.line_number).label('first_line')
+            )
+            .where(staging.c.import_id == self.import_id)
+            .group_by(staging.c.product_sku, staging.c.distribution_center_id)
+            .having(func.count(staging.c.id) > 1)
+            .subquery()
+        )
+        rows = db.session.execute(
+            select(staging.c.line_number, staging.c.product_sku, staging.c.distribution_center_id,
+                   first_lines.c.first_line)
+            .join(first_lines, and_(
+                first_lines.c.product_sku == staging.c.product_sku,
+                first_lines.c.distribution_center_id == staging.c.distribution_center_id
+            ))
+            .where(staging.c.import_id == self.import_id, staging.c.line_number != first_lines.c.first_line)
+            .order_by(staging.c.line_number)
+        ).all()
+        return [
+            {
+                'line': line_number,
+                'error': f"{sku} en centro {dc_id} ya aparece en la línea {first_line}"
+            }
+            for line_number, sku, dc_id, first_line in rows
+        ]
+
+    def _diff(self) -> Dict:
+        staging, inventory = self.staging, self.current
+        missing = inventory.c.id.is_(None)
+        delta = staging.c.counted_quantity - inventory.c.quantity_available
+
+        totals = db.session.execute(
+            select(
+                func.sum(case((missing, 1), else_=0)),
+                func.sum(case((and_(~missing, delta == 0), 1), else_=0)),
+                func.sum(case((and_(~missing, delta != 0), 1), else_=0)),
+                func.sum(case((and_(~missing, delta != 0), delta), else_=0))
+            )
+            .select_from(self._join())
+            .where(staging.c.import_id == self.import_id)
+        ).one()
+
+        not_found = db.session.execute(
+            select(staging.c.line_number, staging.c.product_sku, staging.c.distribution_center_id)
+            .select_from(self._join())
+            .where(staging.c.import_id == self.import_id, missing)
+            .order_by(staging.c.line_number)
+            .limit(MAX_REPORTED_ERRORS)
+        ).all()
+
+        changes = db.session.execute(
+            select(
+                staging.c.product_sku,
+                staging.c.distribution_center_id,
+                inventory.c.quantity_available,
+                staging.c.counted_quantity
+            )
+            .select_from(self._join())
+            .where(self._changed())
+            .order_by(staging.c.product_sku, staging.c.distribution_center_id)
+            .limit(self.preview_limit)
+        ).all()
+
+        return {
+            'not_found': {
+                'count': int(totals[0] or 0),
+                'items': [
+                    {'line': line, 'product_sku': sku, 'distribution_center_id': dc_id}
+                    for line, sku, dc_id in not_found
+                ]
+            },
+            'unchanged': int(totals[1] or 0),
+            'changed': int(totals[2] or 0),
+            'units_delta': int(totals[3] or 0),
+            'changes': [
+                {
+                    'product_sku': sku,
+                    'distribution_center_id': dc_id,
+                    'previous_quantity': previous,
+                    'counted_quantity': counted,
+                    'delta': counted - previous
+                }
+                for sku, dc_id, previous, counted in changes
+            ]
+        }
+
+    # ------------------------------------------------------------------
+    # Aplicación
+    # ------------------------------------------------------------------
+
+    def _apply(self) -> int:
+        """Aplica el diff y registra un evento por SKU. Devuelve los eventos escritos."""
+        staging, inventory = self.staging, self.inventory
+        now = datetime.utcnow()
+
+        if self.use_ledger:
+            db.session.execute(
+                InventoryMovement.__table__.insert().from_select(
+                    ['product_sku', 'distribution_center_id', 'movement_type', 'delta_available',
+                     'delta_reserved', 'delta_in_transit', 'reference', 'created_at'],
+                    select(
+                        staging.c.product_sku,
+                        staging.c.distribution_center_id,
+                        literal(InventoryMovement.TYPE_ADJUSTMENT),
+                        staging.c.counted_quantity - self.current.c.quantity_available,
+                        literal(0),
+                        literal(0),
+                        literal(self.reference or f'bulk:{self.import_id}'),
+                        literal(now)
+                    )
+                    .select_from(self._join())
+                    .where(self._changed())
+                )
+            )
+            # El evento sale en la compactación, cuando se proyecta el saldo
+            return 0
+
+        per_sku = db.session.execute(
+            select(
+                staging.c.product_sku,
+                func.sum(inventory.c.quantity_available),
+                func.sum(staging.c.counted_quantity),
+                func.count(inventory.c.id),
+                func.min(inventory.c.distribution_center_id)
+            )
+            .select_from(self._join())
+            .where(self._changed())
+            .group_by(staging.c.product_sku)
+        ).all()
+
+        db.session.execute(
+            inventory.update()
+            .where(
+                staging.c.import_id == self.import_id,
+                inventory.c.product_sku == staging.c.product_sku,
+                inventory.c.distribution_center_id == staging.c.distribution_center_id,
+                inventory.c.quantity_available != staging.c.counted_quantity
+            )
+            .values(
+                quantity_available=staging.c.counted_quantity,
+                last_movement_date=now,
+                updated_at=now
+            )
+        )
+
+        events = [
+            InventoryEventDetector.create_event(
+                product_sku=sku,
+                previous_quantity=int(previous),
+                new_quantity=int(counted),
+                distribution_center_id=dc_id if centers == 1 else None,
+                metadata={
+                    'source': 'bulk_adjustment',
+                    'import_id': self.import_id,
+                    'reference': self.reference,
+                    'centers_adjusted': centers
+                }
+            )
+            for sku, previous, counted, centers, dc_id in per_sku
+        ]
+        return record_outbox_events(events)
+
+
+def _parse_record(record) -> Tuple[str, int, int]:
+    """Valida una fila y devuelve (sku, centro, cantidad contada)."""
+    if not isinstance(record, dict):
+        raise ValueError("Fila inválida (se esperaba un objeto JSON)")
+
+    sku = str(record.get('product_sku') or '').strip().upper()
+    if not sku or len(sku) > 50:
+        raise ValueError("product_sku es requerido (máximo 50 caracteres)")
+
+    try:
+        dc_id = int(str(record.get('distribution_center_id')).strip())
+    except (TypeError, ValueError):
+        raise ValueError("distribution_center_id debe ser un entero")
+
+    raw_quantity = next(
+        (record[column] for column in QUANTITY_COLUMNS if record.get(column) not in (None, '')),
+        None
+    )
+    try:
+        quantity = int(str(raw_quantity).strip())
+    except (TypeError, ValueError):
+        raise ValueError("quantity debe ser un entero")
+    if quantity < 0:
+        raise ValueError("quantity no puede ser negativa")
+
+    return sku, dc_id, quantity
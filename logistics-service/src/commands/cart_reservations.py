@@ -6,6 +6,10 @@ Estos comandos permiten:
 - Liberar stock cuando se remueve del carrito
 - Actualizar cantidades reservadas
 - Expirar reservas automáticamente
+
+Los eventos WebSocket se escriben en el outbox de la misma transacción que
+la reserva; el relay los publica tras el commit con el stock recalculado
+(incluidas las reservas de carrito).
 """
 
 from datetime import datetime
@@ -15,11 +19,36 @@ from src.session import db
 from src.models.cart_reservation import CartReservation
 from src.models.inventory import Inventory
 from src.errors.errors import ValidationError, NotFoundError, ConflictError
-from src.websockets.inventory_events import InventoryChangeType
+from src.websockets.inventory_events import InventoryChangeType, InventoryEvent
+from src.websockets.inventory_outbox import record_outbox_event
 import logging
 
 logger = logging.getLogger(__name__)
 
+CART_RESERVATION_EXPIRED = 'cart_reservation_expired'
+
+
+def _record_cart_event(
+    product_sku: str,
+    change_type: str,
+    previous_reserved: int,
+    new_reserved: int,
+    distribution_center_id: Optional[int] = None
+):
+    """
+    Escribe en el outbox de la transacción actual un cambio de reservas de
+    carrito. previous/new_quantity son las unidades reservadas en carrito
+    afectadas; el stock publicado lo recalcula el relay.
+    """
+    record_outbox_event(InventoryEvent(
+        product_sku=product_sku,
+        change_type=change_type,
+        previous_quantity=previous_reserved,
+        new_quantity=new_reserved,
+        distribution_center_id=distribution_center_id,
+        metadata={'source': 'cart'}
+    ))
+
 
 class ReserveStockCommand:
     """
@@ -84,6 +113,7 @@ class ReserveStockCommand:
                     f"Disponible: {available_stock}"
                 )
             
+            previous_reserved = existing_reservation.quantity_reserved
             existing_reservation.quantity_reserved = new_quantity
             existing_reservation.expires_at = CartReservation.get_default_expiration(self.ttl_minutes)
             existing_reservation.updated_at = datetime.utcnow()
@@ -101,15 +131,18 @@ class ReserveStockCommand:
                 is_active=True
             )
             db.session.add(reservation)
+            previous_reserved = 0
+        
+        _record_cart_event(
+            self.product_sku, InventoryChangeType.RESERVATION,
+            previous_reserved, reservation.quantity_reserved, self.distribution_center_id
+        )
         
         try:
             db.session.commit()
             
-            # Obtener stock actualizado para el evento WebSocket
-            updated_stock = self._get_stock_for_websocket()
-            
-            # Emitir evento WebSocket
-            self._emit_websocket_event(updated_stock, InventoryChangeType.RESERVATION)
+            # Stock actualizado para la respuesta
+            updated_stock = self._get_updated_stock()
             
             logger.info(
                 f"✅ Stock reservado: {self.product_sku} - "
@@ -187,8 +220,8 @@ class ReserveStockCommand:
         
         return max(0, total_available - total_cart_reserved)
     
-    def _get_stock_for_websocket(self) -> Dict:
-        """Obtiene información de stock para evento WebSocket."""
+    def _get_updated_stock(self) -> Dict:
+        """Stock del SKU descontando las reservas de carrito activas."""
         from src.commands.get_stock_levels import GetStockLevels
         
         command = GetStockLevels(product_sku=self.product_sku)
@@ -213,19 +246,6 @@ class ReserveStockCommand:
         )
         
         return stock_result
-    
-    def _emit_websocket_event(self, stock_data: Dict, change_type: str):
-        """Emite evento WebSocket de cambio de stock."""
-        from src.websockets.websocket_manager import InventoryNotifier
-        
-        try:
-            InventoryNotifier.notify_stock_change(
-                product_sku=self.product_sku,
-                stock_data=stock_data,
-                change_type=change_type
-            )
-        except Exception as e:
-            logger.warning(f"⚠️ No se pudo emitir evento WebSocket: {str(e)}")
 
 
 class ReleaseStockCommand:
@@ -277,6 +297,8 @@ class ReleaseStockCommand:
         # Reducir cantidad o desactivar reserva
         released_quantity = self.quantity
         remaining_quantity = 0
+        previous_reserved = reservation.quantity_reserved
+        distribution_center_id = reservation.distribution_center_id
         
         if self.quantity >= reservation.quantity_reserved:
             # Liberar toda la reserva - eliminarla de la base de datos
@@ -289,14 +311,16 @@ class ReleaseStockCommand:
             reservation.updated_at = datetime.utcnow()
             remaining_quantity = reservation.quantity_reserved
         
+        _record_cart_event(
+            self.product_sku, InventoryChangeType.RESERVATION_RELEASED,
+            previous_reserved, remaining_quantity, distribution_center_id
+        )
+        
         try:
             db.session.commit()
             
-            # Obtener stock actualizado
-            updated_stock = self._get_stock_for_websocket()
-            
-            # Emitir evento WebSocket
-            self._emit_websocket_event(updated_stock, InventoryChangeType.RESERVATION_RELEASED)
+            # Stock actualizado para la respuesta
+            updated_stock = self._get_updated_stock()
             
             logger.info(
                 f"✅ Stock liberado: {self.product_sku} - "
@@ -317,8 +341,8 @@ class ReleaseStockCommand:
             logger.error(f"❌ Error liberando stock: {str(e)}")
             raise
     
-    def _get_stock_for_websocket(self) -> Dict:
-        """Obtiene información de stock para evento WebSocket."""
+    def _get_updated_stock(self) -> Dict:
+        """Stock del SKU descontando las reservas de carrito activas."""
         from src.commands.get_stock_levels import GetStockLevels
         
         command = GetStockLevels(product_sku=self.product_sku)
@@ -342,19 +366,6 @@ class ReleaseStockCommand:
         )
         
         return stock_result
-    
-    def _emit_websocket_event(self, stock_data: Dict, change_type: str):
-        """Emite evento WebSocket de cambio de stock."""
-        from src.websockets.websocket_manager import InventoryNotifier
-        
-        try:
-            InventoryNotifier.notify_stock_change(
-                product_sku=self.product_sku,
-                stock_data=stock_data,
-                change_type=change_type
-            )
-        except Exception as e:
-            logger.warning(f"⚠️ No se pudo emitir evento WebSocket: {str(e)}")
 
 
 class ExpireCartReservationsCommand:
@@ -395,13 +406,13 @@ class ExpireCartReservationsCommand:
             reservation.is_active = False
             reservation.updated_at = datetime.utcnow()
         
+        # Un evento por producto afectado, en la misma transacción
+        for product_sku, quantity in products_affected.items():
+            _record_cart_event(product_sku, CART_RESERVATION_EXPIRED, quantity, 0)
+        
         try:
             db.session.commit()
             
-            # Emitir eventos WebSocket para cada producto afectado
-            for product_sku, quantity in products_affected.items():
-                self._emit_websocket_event_for_product(product_sku)
-            
             logger.info(
                 f"✅ Expiradas {len(expired_reservations)} reservas de carrito - "
                 f"Productos afectados: {len(products_affected)}"
@@ -418,45 +429,6 @@ class ExpireCartReservationsCommand:
             db.session.rollback()
             logger.error(f"❌ Error expirando reservas: {str(e)}")
             raise
-    
-    def _emit_websocket_event_for_product(self, product_sku: str):
-        """Emite evento WebSocket para un producto cuyo stock cambió."""
-        from src.commands.get_stock_levels import GetStockLevels
-        from src.websockets.websocket_manager import InventoryNotifier
-        
-        try:
-            # Obtener stock actualizado
-            command = GetStockLevels(product_sku=product_sku)
-            stock_result = command.execute()
-            
-            # Calcular reservas de carrito
-            total_cart_reserved = CartReservation.query.filter(
-                and_(
-                    CartReservation.product_sku == product_sku,
-                    CartReservation.is_active == True,
-                    CartReservation.expires_at > datetime.utcnow()
-                )
-            ).with_entities(
-                db.func.sum(CartReservation.quantity_reserved)
-            ).scalar() or 0
-            
-            stock_result['total_cart_reserved'] = int(total_cart_reserved)
-            stock_result['total_available'] = max(
-                0,
-                stock_result.get('total_available', 0) - int(total_cart_reserved)
-            )
-            
-            # Emitir evento
-            InventoryNotifier.notify_stock_change(
-                product_sku=product_sku,
-                stock_data=stock_result,
-                change_type='cart_reservation_expired'
-            )
-            
-        except Exception as e:
-            logger.warning(
-                f"⚠️ No se pudo emitir evento WebSocket para {product_sku}: {str(e)}"
-            )
 
 
 class ClearUserCartReservationsCommand:
@@ -491,18 +463,22 @@ class ClearUserCartReservationsCommand:
             }
         
         # Agrupar productos afectados y eliminar reservas
-        products_affected = set()
+        products_affected = {}
         for reservation in reservations:
-            products_affected.add(reservation.product_sku)
+            if reservation.is_active:
+                products_affected[reservation.product_sku] = (
+                    products_affected.get(reservation.product_sku, 0) + reservation.quantity_reserved
+                )
+            else:
+                products_affected.setdefault(reservation.product_sku, 0)
             db.session.delete(reservation)
         
+        for product_sku, quantity in products_affected.items():
+            _record_cart_event(product_sku, InventoryChangeType.RESERVATION_RELEASED, quantity, 0)
+        
         try:
             db.session.commit()
             
-            # Emitir eventos WebSocket
-            for product_sku in products_affected:
-                self._emit_websocket_event_for_product(product_sku)
-            
             logger.info(
                 f"✅ Limpiadas {len(reservations)} reservas del usuario {self.user_id}"
             )
@@ -518,37 +494,3 @@ class ClearUserCartReservationsCommand:
             db.session.rollback()
             logger.error(f"❌ Error limpiando reservas: {str(e)}")
             raise
-    
-    def _emit_websocket_event_for_product(self, product_sku: str):
-        """Emite evento WebSocket para un producto."""
-        from src.commands.get_stock_levels import GetStockLevels
-        from src.websockets.websocket_manager import InventoryNotifier
-        
-        try:
-            command = GetStockLevels(product_sku=product_sku)
-            stock_result = command.execute()
-            
-            total_cart_reserved = CartReservation.query.filter(
-                and_(
-                    CartReservation.product_sku == product_sku,
-                    CartReservation.is_active == True,
-                    CartReservation.expires_at > datetime.utcnow()
-                )
-            ).with_entities(
-                db.func.sum(CartReservation.quantity_reserved)
-            ).scalar() or 0
-            
-            stock_result['total_cart_reserved'] = int(total_cart_reserved)
-            stock_result['total_available'] = max(
-                0,
-                stock_result.get('total_available', 0) - int(total_cart_reserved)
-            )
-            
-            InventoryNotifier.notify_stock_change(
-                product_sku=product_sku,
-                stock_data=stock_result,
-                change_type=InventoryChangeType.RESERVATION_RELEASED
-            )
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Error emitiendo evento WebSocket: {str(e)}")
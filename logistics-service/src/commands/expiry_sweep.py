@@ -0,0 +1,283 @@
+"""
+Barrido de vencimientos de lotes y resumen de próximos a vencer.
+
+`SweepExpiredBatches` corre cada noche (background_jobs):
+
+1. Marca en lotes de `chunk_size` los lotes vencidos (`expiry_date < hoy`)
+   como `is_expired = True, is_available = False`, con un commit por lote
+   para no sostener bloqueos largos. Cada lote de ids sale del índice
+   parcial de disponibles, así que el siguiente no vuelve a leerlos.
+2. Corrige en el mismo esquema los lotes ya no disponibles con
+   `is_expired` desactualizado.
+3. Reconstruye `near_expiry_summary` (tramos 30/60/90 días por SKU y
+   centro) con un único INSERT ... SELECT agrupado.
+4. Emite un solo evento `expiry_digest` con el resultado.
+
+Con `is_available` al día, las consultas de lotes vigentes filtran por
+disponibilidad y fecha sin depender de `is_expired`.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, literal, or_, select
+
+from src.session import db
+from src.models.product_batch import ProductBatch
+from src.models.near_expiry_summary import NearExpirySummary
+from src.errors.errors import ValidationError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Máximo de SKUs por centro incluidos en el resumen emitido
+DIGEST_TOP_SKUS = 20
+
+
+class SweepExpiredBatches:
+    """
+    Comando del barrido nocturno de vencimientos.
+    """
+
+    def __init__(self, today: Optional[date] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 notify: bool = True):
+        """
+        Args:
+            today: Fecha de referencia (por defecto hoy)
+            chunk_size: Lotes actualizados por transacción
+            notify: Emitir el evento expiry_digest
+        """
+        self.today = today or date.today()
+        self.chunk_size = chunk_size
+        self.notify = notify
+
+    def execute(self) -> Dict:
+        started = datetime.utcnow()
+
+        expired, by_center = self._flag_expired_available()
+        corrected = self._flag_stale_unavailable()
+        near_expiry = self._rebuild_near_expiry()
+
+        digest = {
+            'swept_at': started.isoformat(),
+            'reference_date': self.today.isoformat(),
+            'expired_batches': expired,
+            'expired_units': sum(center['expired_units'] for center in by_center),
+            'corrected_flags': corrected,
+            'by_center': by_center,
+            'near_expiry': near_expiry,
+            'duration_ms': round((datetime.utcnow() - started).total_seconds() * 1000, 1)
+        }
+
+        logger.info(
+            f"🗓️ Barrido de vencimientos: {expired} lotes vencidos, {corrected} corregidos, "
+            f"{sum(near_expiry['batches'].values())} próximos a vencer ({digest['duration_ms']} ms)"
+        )
+
+        if self.notify:
+            from src.websockets.websocket_manager import InventoryNotifier
+            InventoryNotifier.notify_expiry_digest(digest)
+
+        return digest
+
+    def _flag_expired_available(self):
+        """Lotes disponibles vencidos → vencidos y no disponibles, por tramos."""
+        table = ProductBatch.__table__
+        total = 0
+        centers: Dict[int, Dict] = {}
+
+        while True:
+            rows = db.session.execute(
+                select(table.c.id, table.c.product_sku, table.c.distribution_center_id, table.c.quantity)
+                .where(table.c.is_available == True, table.c.expiry_date < self.today)
+                .order_by(table.c.expiry_date, table.c.id)
+                .limit(self.chunk_size)
+            ).all()
+            if not rows:
+                break
+
+            db.session.execute(
+                table.update()
+                .where(table.c.id.in_([row.id for row in rows]))
+                .values(is_expired=True, is_available=False, updated_at=datetime.utcnow())
+            )
+            db.session.commit()
+            total += len(rows)
+
+            for _, sku, dc_id, quantity in rows:
+                center = centers.setdefault(dc_id, {'expired_batches': 0, 'expired_units': 0, 'skus': {}})
+                center['expired_batches'] += 1
+                center['expired_units'] += quantity or 0
+                center['skus'][sku] = center['skus'].get(sku, 0) + (quantity or 0)
+
+            if len(rows) < self.chunk_size:
+                break
+
+        by_center = []
+        for dc_id in sorted(centers):
+            center = centers[dc_id]
+            top = sorted(center['skus'].items(), key=lambda item: (-item[1], item[0]))[:DIGEST_TOP_SKUS]
+            by_center.append({
+                'distribution_center_id': dc_id,
+                'expired_batches': center['expired_batches'],
+                'expired_units': center['expired_units'],
+                'skus_affected': len(center['skus']),
+                'top_skus': [{'product_sku': sku, 'expired_units': units} for sku, units in top]
+            })
+        return total, by_center
+
+    def _flag_stale_unavailable(self) -> int:
+        """Lotes ya no disponibles y vencidos con `is_expired` desactualizado."""
+        table = ProductBatch.__table__
+        total = 0
+
+        while True:
+            ids = db.session.execute(
+                select(table.c.id)
+                .where(
+                    table.c.expiry_date < self.today,
+                    or_(table.c.is_available == False, table.c.is_available.is_(None)),
+                    or_(table.c.is_expired == False, table.c.is_expired.is_(None))
+                )
+                .limit(self.chunk_size)
+            ).scalars().all()
+            if not ids:
+                break
+
+            db.session.execute(
+                table.update().where(table.c.id.in_(ids)).values(is_expired=True, is_available=False)
+            )
+            db.session.commit()
+            total += len(ids)
+
+            if len(ids) < self.chunk_size:
+                break
+
+        return total
+
+    def _rebuild_near_expiry(self) -> Dict:
+        """Reconstruye near_expiry_summary con un INSERT ... SELECT agrupado."""
+        batches = ProductBatch.__table__
+        summary = NearExpirySummary.__table__
+        limits = {days: self.today + timedelta(days=days) for days in NearExpirySummary.BUCKETS}
+
+        bucket = case(
+            (batches.c.expiry_date <= limits[30], 30),
+            (batches.c.expiry_date <= limits[60], 60),
+            else_=90
+        ).label('bucket_days')
+
+        grouped = (
+            select(
+                batches.c.product_sku,
+                batches.c.distribution_center_id,
+                bucket,
+                func.count(batches.c.id),
+                func.sum(batches.c.quantity),
+                func.min(batches.c.expiry_date),
+                literal(datetime.utcnow())
+            )
+            .where(
+                batches.c.is_available == True,
+                batches.c.quantity > 0,
+                batches.c.expiry_date >= self.today,
+                batches.c.expiry_date <= limits[90]
+            )
+            .group_by(batches.c.product_sku, batches.c.distribution_center_id, bucket)
+        )
+
+        db.session.execute(summary.delete())
+        db.session.execute(
+            summary.insert().from_select(
+                ['product_sku', 'distribution_center_id', 'bucket_days', 'batch_count',
+                 'total_quantity', 'earliest_expiry_date', 'computed_at'],
+                grouped
+            )
+        )
+        db.session.commit()
+
+        totals = (
+            db.session.query(
+                NearExpirySummary.bucket_days,
+                func.sum(NearExpirySummary.batch_count),
+                func.sum(NearExpirySummary.total_quantity)
+            )
+            .group_by(NearExpirySummary.bucket_days)
+            .all()
+        )
+        result = {
+            'batches': {str(days): 0 for days in NearExpirySummary.BUCKETS},
+            'units': {str(days): 0 for days in NearExpirySummary.BUCKETS}
+        }
+        for bucket_days, batch_count, quantity in totals:
+            result['batches'][str(bucket_days)] = int(batch_count or 0)
+            result['units'][str(bucket_days)] = int(quantity or 0)
+        return result
+
+
+class GetNearExpiry:
+    """
+    Comando para consultar lotes próximos a vencer desde el resumen
+    precalculado. Los tramos son acumulativos: days=60 incluye 0-30 y 31-60.
+    """
+
+    def __init__(self, days: int = 30, distribution_center_id: Optional[int] = None,
+                 product_sku: Optional[str] = None):
+        self.days = days
+        self.distribution_center_id = distribution_center_id
+        self.product_sku = product_sku
+
+    def execute(self) -> Dict:
+        if self.days not in NearExpirySummary.BUCKETS:
+            raise ValidationError("days debe ser 30, 60 o 90")
+
+        filters = [NearExpirySummary.bucket_days <= self.days]
+        if self.distribution_center_id:
+            filters.append(NearExpirySummary.distribution_center_id == self.distribution_center_id)
+        if self.product_sku:
+            filters.append(NearExpirySummary.product_sku == self.product_sku.upper())
+
+        rows = (
+            db.session.query(
+                NearExpirySummary.product_sku,
+                NearExpirySummary.distribution_center_id,
+                func.sum(NearExpirySummary.batch_count).label('batch_count'),
+                func.sum(NearExpirySummary.total_quantity).label('total_quantity'),
+                func.min(NearExpirySummary.earliest_expiry_date).label('earliest_expiry_date'),
+                func.max(NearExpirySummary.computed_at).label('computed_at')
+            )
+            .filter(*filters)
+            .group_by(NearExpirySummary.product_sku, NearExpirySummary.distribution_center_id)
+            .order_by(func.min(NearExpirySummary.earliest_expiry_date).asc(), NearExpirySummary.product_sku.asc())
+            .all()
+        )
+
+        items = [
+            {
+                'product_sku': row.product_sku,
+                'distribution_center_id': row.distribution_center_id,
+                'batch_count': int(row.batch_count),
+                'total_quantity': int(row.total_quantity or 0),
+                'earliest_expiry_date': _iso(row.earliest_expiry_date)
+            }
+            for row in rows
+        ]
+
+        computed_at = max((row.computed_at for row in rows if row.computed_at), default=None)
+
+        return {
+            'days': self.days,
+            'items': items,
+            'total_items': len(items),
+            'total_quantity': sum(item['total_quantity'] for item in items),
+            'computed_at': _iso(computed_at)
+        }
+
+
+def _iso(value):
+    if value is None:
+        return None
+    # SQLite devuelve los agregados de fecha como texto
+    return value if isinstance(value, str) else value.isoformat()
@@ -443,6 +443,8 @@ class GenerateVisitRoutesCommand:
         
         current_time = datetime.combine(self.planned_date, self.work_start_time)
         previous_index = 0
+        # Llegadas calculadas por el solver (incluyen esperas por ventanas horarias)
+        arrival_minutes = optimized_sequence.get('arrival_minutes')
         
         for order, customer_index in enumerate(sequence, start=1):
             customer_data = customers[customer_index]
@@ -456,7 +458,10 @@ class GenerateVisitRoutesCommand:
                 travel_time = float(durations[previous_index][customer_index])
             
             # Calcular tiempos estimados
-            current_time += timedelta(minutes=travel_time)
+            if arrival_minutes:
+                current_time = datetime.combine(self.planned_date, time.min) + timedelta(minutes=arrival_minutes[order - 1])
+            else:
+                current_time += timedelta(minutes=travel_time)
             arrival_time = current_time
             departure_time = arrival_time + timedelta(minutes=self.service_time_per_visit_minutes)
             
@@ -3,6 +3,7 @@ from src.models.product_batch import ProductBatch
 from src.models.warehouse_location import WarehouseLocation
 from src.models.distribution_center import DistributionCenter
 from src.errors.errors import NotFoundError, ValidationError
+from src.services.scanner_code_index import batch_ids_for_code
 from datetime import date, datetime
 from sqlalchemy import or_, and_
 
@@ -159,14 +160,17 @@ class GetProductLocation:
             if self.product_sku:
                 query = query.filter(ProductBatch.product_sku == self.product_sku)
             
+            # Los códigos escaneables se resuelven por el índice product_codes
             if self.barcode:
-                query = query.filter(ProductBatch.barcode == self.barcode)
+                query = query.filter(ProductBatch.id.in_(batch_ids_for_code(self.barcode, 'barcode')))
             
             if self.qr_code:
-                query = query.filter(ProductBatch.qr_code == self.qr_code)
+                query = query.filter(ProductBatch.id.in_(batch_ids_for_code(self.qr_code, 'qr_code')))
             
             if self.internal_code:
-                query = query.filter(ProductBatch.internal_code == self.internal_code)
+                query = query.filter(
+                    ProductBatch.id.in_(batch_ids_for_code(self.internal_code, 'internal_code'))
+                )
         
         return query
     
@@ -193,7 +197,8 @@ class GetProductLocation:
             expiry_to = datetime.strptime(self.expiry_date_to, '%Y-%m-%d').date()
             query = query.filter(ProductBatch.expiry_date <= expiry_to)
         
-        # Filtro por estado de vencimiento
+        # Filtro por estado de vencimiento: is_expired lo marca el barrido
+        # nocturno; la fecha cubre los que vencieron desde el último barrido
         if not self.include_expired:
             query = query.filter(
                 and_(
@@ -2,19 +2,51 @@
 Comandos para consultar y gestionar rutas de entrega.
 """
 
-from typing import Optional, Dict
-from datetime import date
+from typing import Optional, Dict, Tuple
+from datetime import date, datetime
 import logging
 
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import selectinload
+
 from src.models.delivery_route import DeliveryRoute
+from src.services.route_view_cache import route_view_cache
 from src.session import Session
 
 logger = logging.getLogger(__name__)
 
 
+def encode_route_cursor(route: DeliveryRoute) -> str:
+    """Cursor opaco de la última ruta de una página: 'YYYY-MM-DD:id'."""
+    return f"{route.planned_date.isoformat()}:{route.id}"
+
+
+def decode_route_cursor(cursor: str) -> Tuple[date, int]:
+    """
+    Parsea un cursor de GET /routes.
+    
+    Raises:
+        ValueError: Si el cursor no tiene el formato 'YYYY-MM-DD:id'
+    """
+    planned_date_str, _, route_id = (cursor or '').partition(':')
+    return datetime.strptime(planned_date_str, '%Y-%m-%d').date(), int(route_id)
+
+
+def _eager_route_options(include_assignments: bool = False):
+    """Carga vehículo y paradas (y asignaciones) en una consulta por relación."""
+    options = [selectinload(DeliveryRoute.vehicle), selectinload(DeliveryRoute.stop_list)]
+    if include_assignments:
+        options.append(selectinload(DeliveryRoute.assignment_list))
+    return options
+
+
 class GetRoutes:
     """
     Comando para consultar rutas con filtros.
+    
+    Paginación por keyset sobre (planned_date, id): con `cursor` la página
+    siguiente se obtiene con un rango indexado en lugar de recorrer `offset`
+    filas. `offset` se mantiene para clientes existentes.
     """
     
     def __init__(
@@ -24,7 +56,9 @@ class GetRoutes:
         status: Optional[str] = None,
         vehicle_id: Optional[int] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[Tuple[date, int]] = None,
+        include_total: Optional[bool] = None
     ):
         """
         Args:
@@ -33,14 +67,18 @@ class GetRoutes:
             status: Filtrar por estado (draft, active, in_progress, completed, cancelled)
             vehicle_id: Filtrar por vehículo
             limit: Límite de resultados
-            offset: Offset para paginación
+            offset: Offset para paginación (legado; ignorado si hay cursor)
+            cursor: (planned_date, id) de la última ruta de la página anterior
+            include_total: Calcular `total` con COUNT (por defecto solo sin cursor)
         """
         self.distribution_center_id = distribution_center_id
         self.planned_date = planned_date
         self.status = status
         self.vehicle_id = vehicle_id
         self.limit = limit
-        self.offset = offset
+        self.offset = 0 if cursor else offset
+        self.cursor = cursor
+        self.include_total = cursor is None if include_total is None else include_total
     
     def execute(self) -> Dict:
         """
@@ -67,14 +105,28 @@ class GetRoutes:
             if self.vehicle_id:
                 query = query.filter(DeliveryRoute.vehicle_id == self.vehicle_id)
             
+            # Contar total (solo si se pide: en páginas por cursor no hace falta)
+            total = query.order_by(None).count() if self.include_total else None
+            
+            if self.cursor:
+                cursor_date, cursor_id = self.cursor
+                query = query.filter(or_(
+                    DeliveryRoute.planned_date < cursor_date,
+                    and_(DeliveryRoute.planned_date == cursor_date, DeliveryRoute.id < cursor_id)
+                ))
+            
             # Ordenar por fecha planeada (más recientes primero)
             query = query.order_by(DeliveryRoute.planned_date.desc(), DeliveryRoute.id.desc())
             
-            # Contar total
-            total = query.count()
-            
-            # Aplicar paginación
-            routes = query.limit(self.limit).offset(self.offset).all()
+            # Una fila extra indica si hay página siguiente
+            routes = (
+                query.options(*_eager_route_options())
+                .limit(self.limit + 1)
+                .offset(self.offset)
+                .all()
+            )
+            has_more = len(routes) > self.limit
+            routes = routes[:self.limit]
             
             # Serializar
             routes_data = [route.to_dict(include_vehicle=True) for route in routes]
@@ -85,7 +137,8 @@ class GetRoutes:
                 'total': total,
                 'limit': self.limit,
                 'offset': self.offset,
-                'has_more': (self.offset + len(routes)) < total
+                'has_more': has_more,
+                'next_cursor': encode_route_cursor(routes[-1]) if has_more else None
             }
         
         except Exception as e:
@@ -130,7 +183,12 @@ class GetRouteById:
             Dict con datos completos de la ruta (o resumidos si summary_mode=True)
         """
         try:
-            route = Session.query(DeliveryRoute).get(self.route_id)
+            route = (
+                Session.query(DeliveryRoute)
+                .options(*_eager_route_options(include_assignments=True))
+                .filter(DeliveryRoute.id == self.route_id)
+                .one_or_none()
+            )
             
             if not route:
                 return {
@@ -165,20 +223,23 @@ class GetRouteById:
         """
         Construye un resumen compacto de la ruta con solo información esencial.
         """
-        # Obtener paradas ordenadas
-        stops = sorted(route.stops, key=lambda s: s.sequence_order)
+        # Paradas (ya ordenadas por sequence_order) y asignaciones precargadas
+        stops = route.stop_list
         
         # Filtrar solo paradas de entrega (excluir depot y return)
         delivery_stops = [s for s in stops if s.stop_type == 'delivery']
         
-        # Obtener todas las asignaciones (ejecutar la query lazy)
-        all_assignments = list(route.assignments)
+        all_assignments = route.assignment_list
+        
+        # Agrupar asignaciones por parada en una pasada
+        assignments_by_stop = {}
+        for assignment in all_assignments:
+            assignments_by_stop.setdefault(assignment.stop_id, []).append(assignment)
         
         # Construir lista de paradas resumidas
         stops_summary = []
         for stop in delivery_stops:
-            # Obtener asignaciones de esta parada
-            stop_assignments = [a for a in all_assignments if a.stop_id == stop.id]
+            stop_assignments = assignments_by_stop.get(stop.id, [])
             
             stop_info = {
                 'sequence': stop.sequence_order,
@@ -249,21 +310,36 @@ class GetRouteById:
 class GetRoutesByDate:
     """
     Comando para obtener todas las rutas de una fecha específica.
+    
+    La vista se sirve del caché por centro/día (route_view_cache), que se
+    invalida al confirmar cambios en las rutas del día.
     """
     
-    def __init__(self, distribution_center_id: int, planned_date: date):
+    def __init__(self, distribution_center_id: int, planned_date: date, use_cache: bool = True):
         self.distribution_center_id = distribution_center_id
         self.planned_date = planned_date
+        self.use_cache = use_cache
     
     def execute(self) -> Dict:
         """
         Obtiene rutas de una fecha con métricas resumidas.
         """
         try:
-            routes = Session.query(DeliveryRoute).filter(
-                DeliveryRoute.distribution_center_id == self.distribution_center_id,
-                DeliveryRoute.planned_date == self.planned_date
-            ).all()
+            if self.use_cache:
+                cached = route_view_cache.get(self.distribution_center_id, self.planned_date)
+                if cached is not None:
+                    return cached
+            
+            routes = (
+                Session.query(DeliveryRoute)
+                .options(*_eager_route_options())
+                .filter(
+                    DeliveryRoute.distribution_center_id == self.distribution_center_id,
+                    DeliveryRoute.planned_date == self.planned_date
+                )
+                .order_by(DeliveryRoute.id)
+                .all()
+            )
             
             # Calcular métricas agregadas
             total_routes = len(routes)
@@ -276,7 +352,7 @@ class GetRoutesByDate:
             
             routes_data = [route.to_dict(include_vehicle=True) for route in routes]
             
-            return {
+            result = {
                 'status': 'success',
                 'date': self.planned_date.isoformat(),
                 'distribution_center_id': self.distribution_center_id,
@@ -288,6 +364,12 @@ class GetRoutesByDate:
                     'status_counts': status_counts
                 }
             }
+            
+            if self.use_cache:
+                route_view_cache.put(
+                    self.distribution_center_id, self.planned_date, result, [route.id for route in routes]
+                )
+            return result
         
         except Exception as e:
             logger.exception(f"Error obteniendo rutas por fecha: {e}")
@@ -1,10 +1,38 @@
 from src.models.inventory import Inventory
 from src.models.distribution_center import DistributionCenter
 from src.session import db
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func
+
+# Máximo de SKUs por llamada en modo batch
+MAX_BATCH_SKUS = 1000
+
+
+def _build_filters(product_skus, distribution_center_id, only_available):
+    """Filtros comunes (Inventory + DistributionCenter ya unidos)."""
+    filters = [DistributionCenter.is_active == True]
+
+    if product_skus:
+        filters.append(Inventory.product_sku.in_(product_skus))
+
+    if distribution_center_id:
+        filters.append(Inventory.distribution_center_id == distribution_center_id)
+
+    if only_available:
+        filters.append(Inventory.quantity_available > 0)
+
+    return filters
+
 
 class GetStockLevels:
-    def __init__(self, product_sku=None, product_skus=None, distribution_center_id=None, 
+    """
+    Niveles de stock por producto y centro.
+
+    Los totales por SKU se calculan en la base de datos (agregado por SKU con
+    ventana) en la misma consulta de columnas que trae el detalle por centro;
+    no se cargan objetos ORM ni se accede a `distribution_center` por fila.
+    """
+
+    def __init__(self, product_sku=None, product_skus=None, distribution_center_id=None,
                  only_available=False, include_reserved=True, include_in_transit=False):
         self.product_sku = product_sku
         self.product_skus = product_skus or []
@@ -12,137 +40,234 @@ class GetStockLevels:
         self.only_available = only_available
         self.include_reserved = include_reserved
         self.include_in_transit = include_in_transit
-    
+
     def execute(self):
-        query = Inventory.query.join(DistributionCenter)
-        
-        filters = []
-        
+        skus = [sku.upper() for sku in self.product_skus]
         if self.product_sku:
-            filters.append(Inventory.product_sku == self.product_sku.upper())
-        
-        if self.product_skus:
-            skus_upper = [sku.upper() for sku in self.product_skus]
-            filters.append(Inventory.product_sku.in_(skus_upper))
-        
-        if self.distribution_center_id:
-            filters.append(Inventory.distribution_center_id == self.distribution_center_id)
-        
-        filters.append(DistributionCenter.is_active == True)
-        
-        if self.only_available:
-            filters.append(Inventory.quantity_available > 0)
-        
-        if filters:
-            query = query.filter(and_(*filters))
-        
-        query = query.order_by(
-            Inventory.product_sku.asc(),
-            DistributionCenter.name.asc()
+            skus = [self.product_sku.upper()] + skus
+
+        filters = _build_filters(skus, self.distribution_center_id, self.only_available)
+
+        # Totales por SKU calculados en SQL (SUM ... OVER PARTITION BY) junto
+        # con las filas por centro: una sola pasada, sin subconsulta agrupada
+        per_sku = {'partition_by': Inventory.product_sku}
+
+        rows = (
+            db.session.query(
+                Inventory.product_sku,
+                Inventory.distribution_center_id,
+                Inventory.quantity_available,
+                Inventory.quantity_reserved,
+                Inventory.quantity_in_transit,
+                Inventory.minimum_stock_level,
+                DistributionCenter.code,
+                DistributionCenter.name,
+                DistributionCenter.city,
+                func.sum(Inventory.quantity_available).over(**per_sku).label('total_physical'),
+                func.sum(Inventory.quantity_reserved).over(**per_sku).label('total_reserved'),
+                func.sum(Inventory.quantity_in_transit).over(**per_sku).label('total_in_transit')
+            )
+            .join(DistributionCenter, DistributionCenter.id == Inventory.distribution_center_id)
+            .filter(and_(*filters))
+            .order_by(Inventory.product_sku.asc(), DistributionCenter.name.asc())
+            .all()
         )
-        
-        inventory_items = query.all()
-        
+
         if self.product_sku or (self.product_skus and len(self.product_skus) == 1):
-            return self._format_single_product_response(inventory_items)
+            return self._format_single_product_response(rows)
         else:
-            return self._format_multiple_products_response(inventory_items)
-    
-    def _format_single_product_response(self, inventory_items):
-        if not inventory_items:
+            return self._format_multiple_products_response(rows)
+
+    def _center_data(self, row):
+        # Stock disponible para venta en este centro = físico - reservado
+        available_for_sale = row.quantity_available - row.quantity_reserved
+
+        center_data = {
+            'distribution_center_id': row.distribution_center_id,
+            'distribution_center_code': row.code,
+            'distribution_center_name': row.name,
+            'city': row.city,
+            'quantity_available': available_for_sale,  # Stock disponible para venta
+            'quantity_physical': row.quantity_available,  # Stock físico en almacén
+            'is_low_stock': row.quantity_available <= (row.minimum_stock_level or 0),
+            'is_out_of_stock': available_for_sale <= 0,  # Sin stock si no hay disponible para venta
+        }
+
+        if self.include_reserved:
+            center_data['quantity_reserved'] = row.quantity_reserved
+
+        if self.include_in_transit:
+            center_data['quantity_in_transit'] = row.quantity_in_transit
+
+        return center_data
+
+    def _product_data(self, row):
+        total_physical = int(row.total_physical or 0)
+        total_reserved = int(row.total_reserved or 0)
+
+        return {
+            'product_sku': row.product_sku,
+            'total_available': total_physical - total_reserved,  # Stock disponible para venta
+            'total_physical': total_physical,  # Stock físico total
+            'total_reserved': total_reserved if self.include_reserved else None,
+            'total_in_transit': int(row.total_in_transit or 0) if self.include_in_transit else None,
+            'distribution_centers': []
+        }
+
+    def _format_single_product_response(self, rows):
+        if not rows:
             return {
                 'product_sku': self.product_sku or (self.product_skus[0] if self.product_skus else None),
                 'total_available': 0,
+                'total_physical': 0,
                 'total_reserved': 0,
                 'total_in_transit': 0,
                 'distribution_centers': []
             }
-        
-        product_sku = inventory_items[0].product_sku
-        total_quantity_available = sum(item.quantity_available for item in inventory_items)
-        total_reserved = sum(item.quantity_reserved for item in inventory_items)
-        total_in_transit = sum(item.quantity_in_transit for item in inventory_items)
-        
-        # Stock realmente disponible para venta = quantity_available - quantity_reserved
-        total_available_for_sale = total_quantity_available - total_reserved
-        
-        centers = []
-        for item in inventory_items:
-            # Stock disponible para venta en este centro
-            available_for_sale = item.quantity_available - item.quantity_reserved
-            
-            center_data = {
-                'distribution_center_id': item.distribution_center_id,
-                'distribution_center_code': item.distribution_center.code,
-                'distribution_center_name': item.distribution_center.name,
-                'city': item.distribution_center.city,
-                'quantity_available': available_for_sale,  # Stock disponible para venta
-                'quantity_physical': item.quantity_available,  # Stock físico en almacén
-                'is_low_stock': item.is_low_stock,
-                'is_out_of_stock': available_for_sale <= 0,  # Sin stock si no hay disponible para venta
-            }
-            
-            if self.include_reserved:
-                center_data['quantity_reserved'] = item.quantity_reserved
-            
-            if self.include_in_transit:
-                center_data['quantity_in_transit'] = item.quantity_in_transit
-            
-            centers.append(center_data)
-        
-        return {
-            'product_sku': product_sku,
-            'total_available': total_available_for_sale,  # Stock disponible para venta
-            'total_physical': total_quantity_available,  # Stock físico total
-            'total_reserved': total_reserved if self.include_reserved else None,
-            'total_in_transit': total_in_transit if self.include_in_transit else None,
-            'distribution_centers': centers
-        }
-    
-    def _format_multiple_products_response(self, inventory_items):
+
+        product = self._product_data(rows[0])
+        product['distribution_centers'] = [self._center_data(row) for row in rows]
+        return product
+
+    def _format_multiple_products_response(self, rows):
         products_dict = {}
-        
-        for item in inventory_items:
-            sku = item.product_sku
-            
-            if sku not in products_dict:
-                products_dict[sku] = {
-                    'product_sku': sku,
-                    'total_available': 0,
-                    'total_physical': 0,
-                    'total_reserved': 0,
-                    'total_in_transit': 0,
-                    'distribution_centers': []
-                }
-            
-            # Stock disponible para venta = quantity_available - quantity_reserved
-            available_for_sale = item.quantity_available - item.quantity_reserved
-            
-            products_dict[sku]['total_available'] += available_for_sale
-            products_dict[sku]['total_physical'] += item.quantity_available
-            products_dict[sku]['total_reserved'] += item.quantity_reserved
-            products_dict[sku]['total_in_transit'] += item.quantity_in_transit
-            
-            center_data = {
-                'distribution_center_id': item.distribution_center_id,
-                'distribution_center_code': item.distribution_center.code,
-                'distribution_center_name': item.distribution_center.name,
-                'city': item.distribution_center.city,
-                'quantity_available': available_for_sale,  # Stock disponible para venta
-                'quantity_physical': item.quantity_available,  # Stock físico en almacén
-                'is_low_stock': item.is_low_stock,
-                'is_out_of_stock': available_for_sale <= 0,
-            }
-            
-            if self.include_reserved:
-                center_data['quantity_reserved'] = item.quantity_reserved
-            
-            if self.include_in_transit:
-                center_data['quantity_in_transit'] = item.quantity_in_transit
-            
-            products_dict[sku]['distribution_centers'].append(center_data)
-        
+
+        for row in rows:
+            product = products_dict.get(row.product_sku)
+            if product is None:
+                product = products_dict[row.product_sku] = self._product_data(row)
+                # En la respuesta múltiple los totales siempre se informan
+                product['total_reserved'] = int(row.total_reserved or 0)
+                product['total_in_transit'] = int(row.total_in_transit or 0)
+            product['distribution_centers'].append(self._center_data(row))
+
         return {
             'products': list(products_dict.values()),
             'total_products': len(products_dict)
         }
+
+
+class GetStockLevelsBatch:
+    """
+    Stock de cientos de SKUs en una sola llamada, en formato columnar.
+
+    Los totales salen de un único GROUP BY por SKU. Con include_centers se
+    agrega una segunda consulta de columnas con el detalle por centro.
+
+    Respuesta:
+    {
+        "product_skus": [...],          # en el orden pedido
+        "total_available": [...],       # físico - reservado
+        "total_physical": [...],
+        "total_reserved": [...],
+        "total_in_transit": [...],
+        "center_count": [...],
+        "not_found": [...],
+        "centers": {                    # solo con include_centers
+            "product_index": [...], "distribution_center_id": [...],
+            "quantity_available": [...], "quantity_physical": [...],
+            "quantity_reserved": [...], "quantity_in_transit": [...]
+        }
+    }
+    """
+
+    def __init__(self, product_skus, distribution_center_id=None, only_available=False,
+                 include_centers=False):
+        self.product_skus = product_skus or []
+        self.distribution_center_id = distribution_center_id
+        self.only_available = only_available
+        self.include_centers = include_centers
+
+    def execute(self):
+        # Normalizar conservando el orden pedido y sin duplicados
+        skus = list(dict.fromkeys(sku.strip().upper() for sku in self.product_skus if sku and sku.strip()))
+
+        if not skus:
+            raise ValueError("Se requiere al menos un SKU")
+        if len(skus) > MAX_BATCH_SKUS:
+            raise ValueError(f"Máximo {MAX_BATCH_SKUS} SKUs por consulta")
+
+        filters = _build_filters(skus, self.distribution_center_id, self.only_available)
+
+        totals = {
+            row.product_sku: row
+            for row in (
+                db.session.query(
+                    Inventory.product_sku,
+                    func.sum(Inventory.quantity_available).label('total_physical'),
+                    func.sum(Inventory.quantity_reserved).label('total_reserved'),
+                    func.sum(Inventory.quantity_in_transit).label('total_in_transit'),
+                    func.count(Inventory.id).label('center_count')
+                )
+                .join(DistributionCenter, DistributionCenter.id == Inventory.distribution_center_id)
+                .filter(and_(*filters))
+                .group_by(Inventory.product_sku)
+                .all()
+            )
+        }
+
+        result = {
+            'product_skus': [],
+            'total_available': [],
+            'total_physical': [],
+            'total_reserved': [],
+            'total_in_transit': [],
+            'center_count': [],
+            'not_found': []
+        }
+
+        for sku in skus:
+            row = totals.get(sku)
+            if row is None:
+                result['not_found'].append(sku)
+                continue
+            physical = int(row.total_physical or 0)
+            reserved = int(row.total_reserved or 0)
+            result['product_skus'].append(sku)
+            result['total_available'].append(physical - reserved)
+            result['total_physical'].append(physical)
+            result['total_reserved'].append(reserved)
+            result['total_in_transit'].append(int(row.total_in_transit or 0))
+            result['center_count'].append(int(row.center_count))
+
+        if self.include_centers:
+            result['centers'] = self._centers(filters, result['product_skus'])
+
+        return result
+
+    def _centers(self, filters, found_skus):
+        index = {sku: i for i, sku in enumerate(found_skus)}
+        centers = {
+            'product_index': [],
+            'distribution_center_id': [],
+            'quantity_available': [],
+            'quantity_physical': [],
+            'quantity_reserved': [],
+            'quantity_in_transit': []
+        }
+        if not found_skus:
+            return centers
+
+        rows = (
+            db.session.query(
+                Inventory.product_sku,
+                Inventory.distribution_center_id,
+                Inventory.quantity_available,
+                Inventory.quantity_reserved,
+                Inventory.quantity_in_transit
+            )
+            .join(DistributionCenter, DistributionCenter.id == Inventory.distribution_center_id)
+            .filter(and_(*filters))
+            .order_by(Inventory.product_sku.asc(), Inventory.distribution_center_id.asc())
+            .all()
+        )
+
+        for row in rows:
+            centers['product_index'].append(index[row.product_sku])
+            centers['distribution_center_id'].append(row.distribution_center_id)
+            centers['quantity_available'].append(row.quantity_available - row.quantity_reserved)
+            centers['quantity_physical'].append(row.quantity_available)
+            centers['quantity_reserved'].append(row.quantity_reserved)
+            centers['quantity_in_transit'].append(row.quantity_in_transit)
+
+        return centers
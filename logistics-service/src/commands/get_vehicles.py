@@ -7,6 +7,7 @@ from datetime import datetime, date
 import logging
 
 from src.models.vehicle import Vehicle
+from src.models.vehicle_occupancy import available_vehicles_query
 from src.session import Session
 
 logger = logging.getLogger(__name__)
@@ -207,28 +208,13 @@ class GetAvailableVehicles:
         Un vehículo está disponible si:
         - is_available = True
         - No tiene rutas activas o en progreso para la fecha
+          (calendario vehicle_occupancy, una sola consulta con anti-join)
         """
         try:
-            from src.models.delivery_route import DeliveryRoute
-            
-            # Obtener vehículos básicamente disponibles
-            vehicles = Session.query(Vehicle).filter(
-                Vehicle.home_distribution_center_id == self.distribution_center_id,
-                Vehicle.is_available == True
+            available_vehicles = available_vehicles_query(
+                self.distribution_center_id, self.planned_date
             ).all()
             
-            # Filtrar vehículos con rutas activas en la fecha
-            available_vehicles = []
-            for vehicle in vehicles:
-                active_routes = Session.query(DeliveryRoute).filter(
-                    DeliveryRoute.vehicle_id == vehicle.id,
-                    DeliveryRoute.planned_date == self.planned_date,
-                    DeliveryRoute.status.in_(['active', 'in_progress'])
-                ).count()
-                
-                if active_routes == 0:
-                    available_vehicles.append(vehicle)
-            
             vehicles_data = [v.to_dict() for v in available_vehicles]
             
             # Calcular capacidad total disponible
@@ -0,0 +1,151 @@
+"""
+Comandos del ledger de movimientos de inventario.
+
+- RecordInventoryMovement: agrega un movimiento (solo inserción) y devuelve
+  el saldo resultante.
+- GetInventoryLedger: saldo actual (snapshot + cola) y últimos movimientos.
+"""
+
+import logging
+from typing import Dict, Optional
+
+from src.session import db
+from src.models.inventory import Inventory
+from src.models.inventory_movement import InventoryMovement
+from src.services.inventory_ledger import append_movement, get_balance, lock_balance, movement_deltas
+from src.errors.errors import ValidationError, NotFoundError
+
+logger = logging.getLogger(__name__)
+
+MAX_MOVEMENTS_LIMIT = 500
+
+
+class RecordInventoryMovement:
+    """
+    Comando para registrar un movimiento de inventario en el ledger.
+    """
+
+    def __init__(self, product_sku: str, distribution_center_id: int, movement_type: str,
+                 quantity: int, reference: Optional[str] = None, from_reservation: bool = True,
+                 details: Optional[Dict] = None):
+        """
+        Args:
+            product_sku: SKU del producto
+            distribution_center_id: ID del centro de distribución
+            movement_type: receipt, reservation, release, dispatch o adjustment
+            quantity: Unidades (positivas; en adjustment, con signo)
+            reference: Orden, recepción o ajuste que origina el movimiento
+            from_reservation: En dispatch, consumir también la reserva
+            details: Datos adicionales guardados con el movimiento
+        """
+        self.product_sku = (product_sku or '').upper()
+        self.distribution_center_id = distribution_center_id
+        self.movement_type = movement_type
+        self.quantity = quantity
+        self.reference = reference
+        self.from_reservation = from_reservation
+        self.details = details
+
+    def execute(self) -> Dict:
+        self._validate()
+
+        exists = db.session.query(Inventory.id).filter_by(
+            product_sku=self.product_sku,
+            distribution_center_id=self.distribution_center_id
+        ).first()
+        if not exists:
+            raise NotFoundError(
+                f"No se encontró inventario para {self.product_sku} "
+                f"en centro de distribución {self.distribution_center_id}"
+            )
+
+        # El saldo se lee con el SKU/centro bloqueado hasta el commit
+        lock_balance(self.product_sku, self.distribution_center_id)
+        balance = get_balance(self.product_sku, self.distribution_center_id)
+        delta_available, delta_reserved, delta_in_transit = movement_deltas(
+            self.movement_type, int(self.quantity), balance, self.from_reservation
+        )
+
+        movement = append_movement(
+            self.product_sku,
+            self.distribution_center_id,
+            self.movement_type,
+            delta_available=delta_available,
+            delta_reserved=delta_reserved,
+            delta_in_transit=delta_in_transit,
+            reference=self.reference,
+            details=self.details
+        )
+        db.session.commit()
+
+        logger.info(
+            f"📒 Movimiento {self.movement_type} {self.product_sku} DC:{self.distribution_center_id} "
+            f"({delta_available:+d} disp, {delta_reserved:+d} res)"
+        )
+
+        return {
+            'movement': movement.to_dict(),
+            'balance': {
+                **balance,
+                'quantity_available': balance['quantity_available'] + delta_available,
+                'quantity_reserved': balance['quantity_reserved'] + delta_reserved,
+                'quantity_in_transit': balance['quantity_in_transit'] + delta_in_transit,
+                'tail_movements': balance['tail_movements'] + 1,
+                'last_movement_id': movement.id
+            }
+        }
+
+    def _validate(self):
+        if not self.product_sku:
+            raise ValidationError("product_sku es requerido")
+        if not self.distribution_center_id:
+            raise ValidationError("distribution_center_id es requerido")
+        if self.movement_type not in InventoryMovement.MOVEMENT_TYPES:
+            raise ValidationError(
+                f"movement_type debe ser uno de: {', '.join(InventoryMovement.MOVEMENT_TYPES)}"
+            )
+        if isinstance(self.quantity, bool) or not isinstance(self.quantity, int):
+            raise ValidationError("quantity debe ser un número entero")
+        if self.movement_type == InventoryMovement.TYPE_ADJUSTMENT:
+            if self.quantity == 0:
+                raise ValidationError("quantity no puede ser 0 en un ajuste")
+        elif self.quantity <= 0:
+            raise ValidationError("quantity debe ser un número positivo")
+
+
+class GetInventoryLedger:
+    """
+    Comando para consultar el saldo de un SKU en un centro y sus últimos
+    movimientos (más recientes primero).
+    """
+
+    def __init__(self, product_sku: str, distribution_center_id: int, limit: int = 50):
+        self.product_sku = (product_sku or '').upper()
+        self.distribution_center_id = distribution_center_id
+        self.limit = limit
+
+    def execute(self) -> Dict:
+        if not self.distribution_center_id:
+            raise ValidationError("distribution_center_id es requerido")
+        if self.limit < 1 or self.limit > MAX_MOVEMENTS_LIMIT:
+            raise ValidationError(f"limit debe estar entre 1 y {MAX_MOVEMENTS_LIMIT}")
+
+        balance = get_balance(self.product_sku, self.distribution_center_id)
+        if balance is None:
+            raise NotFoundError(
+                f"No se encontró inventario para {self.product_sku} "
+                f"en centro de distribución {self.distribution_center_id}"
+            )
+
+        movements = (
+            InventoryMovement.query
+            .filter_by(product_sku=self.product_sku, distribution_center_id=self.distribution_center_id)
+            .order_by(InventoryMovement.id.desc())
+            .limit(self.limit)
+            .all()
+        )
+
+        return {
+            'balance': balance,
+            'movements': [movement.to_dict() for movement in movements]
+        }
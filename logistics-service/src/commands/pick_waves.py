@@ -0,0 +1,508 @@
+"""
+Planificación de olas de picking y secuencia de recorrido en bodega.
+
+Los pedidos del día de un centro de distribución se asignan FEFO (ver
+`allocate_pick_list`) y sus recogidas se separan por zona (refrigerada /
+ambiente) y cadena de frío. Dentro de cada grupo, los pedidos ordenados por
+hora de salida de su ruta se cortan en olas: una ola no supera
+`max_orders_per_wave` pedidos ni `max_units_per_wave` unidades, y todos sus
+pedidos salen dentro de `departure_window_minutes` desde el primero.
+
+Las ubicaciones de cada ola se recorren en el orden que devuelve el TSP sobre
+el modelo de distancias de `src.utils.pick_path`. La línea base es la forma
+actual de trabajo: un recorrido por pedido, visitando las ubicaciones en el
+orden en que llegaron las líneas.
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+
+from src.session import db
+from src.models.pick_wave import PickWave
+from src.models.warehouse_location import WarehouseLocation
+from src.models.delivery_route import DeliveryRoute
+from src.models.route_assignment import RouteAssignment
+from src.commands.allocate_pick_list import FefoBatchIndex, MAX_LINES
+from src.utils.pick_path import WarehouseLayout, sequence_pick_path
+from src.errors.errors import ValidationError, NotFoundError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEPARTURE_WINDOW_MINUTES = 60
+DEFAULT_MAX_ORDERS_PER_WAVE = 20
+
+# Máximo de pedidos por planificación
+MAX_ORDERS = 1000
+
+# Tiempo máximo del TSP por ola
+TSP_TIME_LIMIT_MS = 200
+
+
+class PlanPickWaves:
+    """
+    Comando para agrupar los pedidos del día en olas y secuenciar su recogida.
+
+    Formato de pedidos:
+        [
+            {
+                "order_id": 101,
+                "order_number": "ORD-2025-101",         # opcional
+                "departure_time": "2025-11-20T08:00:00", # opcional
+                "lines": [{"product_sku": "VAC-001", "quantity": 30}]
+            },
+            ...
+        ]
+
+    Si no se envían pedidos se toman los asignados a rutas del centro para la
+    fecha (`RouteAssignment` + `DeliveryRoute.estimated_start_time`) y sus
+    líneas se piden a sales-service en una sola llamada.
+    """
+
+    def __init__(self, distribution_center_id: int, orders: Optional[List[Dict]] = None,
+                 planned_date: Optional[date] = None,
+                 departure_window_minutes: int = DEFAULT_DEPARTURE_WINDOW_MINUTES,
+                 max_orders_per_wave: int = DEFAULT_MAX_ORDERS_PER_WAVE,
+                 max_units_per_wave: Optional[int] = None,
+                 min_shelf_life_days: int = 0, persist: bool = True,
+                 sales_client=None):
+        """
+        Args:
+            distribution_center_id: Centro de distribución
+            orders: Pedidos a recoger (opcional, ver docstring de la clase)
+            planned_date: Fecha de despacho (por defecto hoy)
+            departure_window_minutes: Ventana de salida máxima dentro de una ola
+            max_orders_per_wave: Pedidos máximos por ola
+            max_units_per_wave: Unidades máximas por ola (opcional)
+            min_shelf_life_days: Días mínimos de vida útil del lote
+            persist: Guardar las olas en pick_waves
+            sales_client: Cliente de sales-service (solo si no se envían pedidos)
+        """
+        self.distribution_center_id = distribution_center_id
+        self.orders = orders
+        self.planned_date = planned_date or date.today()
+        self.departure_window = timedelta(minutes=departure_window_minutes)
+        self.max_orders_per_wave = max_orders_per_wave
+        self.max_units_per_wave = max_units_per_wave
+        self.min_shelf_life_days = min_shelf_life_days
+        self.persist = persist
+        self.sales_client = sales_client
+
+    def execute(self) -> Dict:
+        self._validate_params()
+
+        orders = self._normalize_orders(
+            self.orders if self.orders is not None else self._orders_from_routes()
+        )
+        # Los pedidos que salen antes reciben primero los lotes FEFO
+        orders.sort(key=lambda o: (o['departure_time'] is None, o['departure_time'] or datetime.min, o['position']))
+
+        index = FefoBatchIndex.load(
+            ((line['product_sku'], self.distribution_center_id)
+             for order in orders for line in order['lines']),
+            self.planned_date + timedelta(days=self.min_shelf_life_days)
+        )
+
+        groups, shortages = self._allocate(orders, index)
+        layouts = self._load_layouts()
+
+        waves = []
+        for (zone_type, cold_chain), tasks in sorted(groups.items(), key=lambda item: (item[0][0], item[0][1])):
+            for chunk in self._chunk(tasks):
+                waves.append(self._build_wave(zone_type, cold_chain, chunk, layouts[zone_type]))
+
+        if self.persist and waves:
+            self._persist(waves)
+
+        total_distance = sum(w['total_distance_m'] for w in waves)
+        baseline_distance = sum(w['baseline_distance_m'] for w in waves)
+
+        logger.info(
+            f"🧺 {len(waves)} olas de picking para centro {self.distribution_center_id}: "
+            f"{total_distance:.1f} m vs {baseline_distance:.1f} m por pedido"
+        )
+
+        return {
+            'distribution_center_id': self.distribution_center_id,
+            'planned_date': self.planned_date.isoformat(),
+            'waves': waves,
+            'shortages': shortages,
+            'summary': {
+                'total_orders': len(orders),
+                'total_waves': len(waves),
+                'total_distance_m': round(total_distance, 2),
+                'baseline_distance_m': round(baseline_distance, 2),
+                'distance_saved_m': round(baseline_distance - total_distance, 2),
+                'distance_saved_pct': (
+                    round((baseline_distance - total_distance) / baseline_distance * 100, 2)
+                    if baseline_distance else 0.0
+                )
+            }
+        }
+
+    def _validate_params(self):
+        if not self.distribution_center_id:
+            raise ValidationError("'distribution_center_id' es requerido")
+        if self.departure_window.total_seconds() < 0:
+            raise ValidationError("'departure_window_minutes' debe ser no negativo")
+        if not isinstance(self.max_orders_per_wave, int) or self.max_orders_per_wave <= 0:
+            raise ValidationError("'max_orders_per_wave' debe ser un entero positivo")
+        if self.max_units_per_wave is not None and (
+            not isinstance(self.max_units_per_wave, int) or self.max_units_per_wave <= 0
+        ):
+            raise ValidationError("'max_units_per_wave' debe ser un entero positivo")
+
+    def _orders_from_routes(self) -> List[Dict]:
+        """Pedidos asignados a rutas del centro para la fecha, con líneas de sales-service."""
+        rows = (
+            db.session.query(
+                RouteAssignment.order_id,
+                RouteAssignment.order_number,
+                DeliveryRoute.estimated_start_time
+            )
+            .join(DeliveryRoute, DeliveryRoute.id == RouteAssignment.route_id)
+            .filter(
+                DeliveryRoute.distribution_center_id == self.distribution_center_id,
+                DeliveryRoute.planned_date == self.planned_date,
+                DeliveryRoute.status != 'cancelled',
+                RouteAssignment.status != 'cancelled'
+            )
+            .all()
+        )
+        if not rows:
+            return []
+
+        if self.sales_client is None:
+            from src.services.sales_service_client import get_sales_service_client
+            self.sales_client = get_sales_service_client()
+
+        details = {
+            order['id']: order
+            for order in self.sales_client.get_orders_by_ids([row.order_id for row in rows]).get('orders', [])
+        }
+
+        orders = []
+        for order_id, order_number, departure in rows:
+            order = details.get(order_id)
+            if order is None:
+                logger.warning(f"⚠️ Pedido {order_id} no encontrado en sales-service, se omite del picking")
+                continue
+            orders.append({
+                'order_id': order_id,
+                'order_number': order_number,
+                'departure_time': departure,
+                'lines': [
+                    {'product_sku': item['product_sku'], 'quantity': int(item['quantity'])}
+                    for item in order.get('items', [])
+                ]
+            })
+        return orders
+
+    def _normalize_orders(self, orders) -> List[Dict]:
+        if not isinstance(orders, list):
+            raise ValidationError("'orders' debe ser una lista")
+        if len(orders) > MAX_ORDERS:
+            raise ValidationError(f"Máximo {MAX_ORDERS} pedidos por planificación")
+
+        normalized = []
+        total_lines = 0
+        for position, order in enumerate(orders):
+            if not isinstance(order, dict) or order.get('order_id') is None:
+                raise ValidationError(f"Pedido {position}: 'order_id' es requerido")
+
+            lines = order.get('lines')
+            if not isinstance(lines, list):
+                raise ValidationError(f"Pedido {position}: 'lines' debe ser una lista")
+            total_lines += len(lines)
+            if total_lines > MAX_LINES:
+                raise ValidationError(f"Máximo {MAX_LINES} líneas por planificación")
+
+            normalized_lines = []
+            for line_position, line in enumerate(lines):
+                sku = line.get('product_sku') if isinstance(line, dict) else None
+                quantity = line.get('quantity') if isinstance(line, dict) else None
+                if not sku or not isinstance(sku, str):
+                    raise ValidationError(f"Pedido {position}, línea {line_position}: 'product_sku' es requerido")
+                if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+                    raise ValidationError(
+                        f"Pedido {position}, línea {line_position}: 'quantity' debe ser un entero positivo"
+                    )
+                normalized_lines.append({
+                    'line_id': line.get('line_id', line_position),
+                    'product_sku': sku.strip().upper(),
+                    'quantity': quantity
+                })
+
+            normalized.append({
+                'position': position,
+                'order_id': order['order_id'],
+                'order_number': order.get('order_number'),
+                'departure_time': self._parse_departure(order.get('departure_time'), position),
+                'lines': normalized_lines
+            })
+
+        return normalized
+
+    def _parse_departure(self, value, position) -> Optional[datetime]:
+        if value is None or isinstance(value, datetime):
+            return value
+        try:
+            # Se acepta fecha-hora ISO o solo la hora ("08:30") del día planeado
+            if isinstance(value, str) and 'T' not in value and len(value) <= 8:
+                return datetime.combine(self.planned_date, time.fromisoformat(value))
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValidationError(f"Pedido {position}: 'departure_time' inválido")
+
+    def _allocate(self, orders, index):
+        """
+        Asigna lotes por pedido y separa las recogidas por (zona, cadena de frío).
+
+        Returns:
+            (tareas por grupo en orden de salida, faltantes)
+        """
+        groups: Dict[tuple, List[Dict]] = {}
+        shortages = []
+
+        for order in orders:
+            tasks = {}
+            for line in order['lines']:
+                taken = index.take(line['product_sku'], self.distribution_center_id, line['quantity'])
+                allocated = sum(amount for _, amount in taken)
+                if allocated < line['quantity']:
+                    shortages.append({
+                        'order_id': order['order_id'],
+                        'line_id': line['line_id'],
+                        'product_sku': line['product_sku'],
+                        'quantity_missing': line['quantity'] - allocated
+                    })
+                for slot, amount in taken:
+                    key = (slot.zone_type, slot.requires_cold_chain)
+                    task = tasks.get(key)
+                    if task is None:
+                        task = tasks[key] = {
+                            'order_id': order['order_id'],
+                            'order_number': order['order_number'],
+                            'departure_time': order['departure_time'],
+                            'units': 0,
+                            'lines': set(),
+                            'picks': []
+                        }
+                    task['units'] += amount
+                    task['lines'].add(line['line_id'])
+                    task['picks'].append((slot, amount, line['line_id']))
+
+            for key, task in tasks.items():
+                groups.setdefault(key, []).append(task)
+
+        return groups, shortages
+
+    def _load_layouts(self) -> Dict[str, WarehouseLayout]:
+        """Un modelo de distancias por zona con todas las ubicaciones activas del centro."""
+        rows = (
+            db.session.query(
+                WarehouseLocation.id,
+                WarehouseLocation.zone_type,
+                WarehouseLocation.aisle,
+                WarehouseLocation.shelf
+            )
+            .filter(
+                WarehouseLocation.distribution_center_id == self.distribution_center_id,
+                WarehouseLocation.is_active == True
+            )
+            .all()
+        )
+
+        by_zone: Dict[str, List[Dict]] = {}
+        for location_id, zone_type, aisle, shelf in rows:
+            by_zone.setdefault(zone_type, []).append(
+                {'location_id': location_id, 'aisle': aisle, 'shelf': shelf}
+            )
+        return {zone: WarehouseLayout(locations) for zone, locations in by_zone.items()}
+
+    def _chunk(self, tasks: List[Dict]) -> List[List[Dict]]:
+        """Corta las tareas (ya en orden de salida) en olas."""
+        chunks = []
+        current: List[Dict] = []
+        units = 0
+
+        for task in tasks:
+            if current:
+                first_departure = current[0]['departure_time']
+                departure = task['departure_time']
+                outside_window = (
+                    (first_departure is None) != (departure is None)
+                    or (departure is not None and departure - first_departure > self.departure_window)
+                )
+                if (
+                    len(current) >= self.max_orders_per_wave
+                    or outside_window
+                    or (self.max_units_per_wave and units + task['units'] > self.max_units_per_wave)
+                ):
+                    chunks.append(current)
+                    current, units = [], 0
+            current.append(task)
+            units += task['units']
+
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _build_wave(self, zone_type, cold_chain, tasks, layout: WarehouseLayout) -> Dict:
+        stops: Dict[int, Dict] = {}
+        baseline = 0.0
+
+        for task in tasks:
+            # Línea base: un recorrido por pedido en el orden de llegada de las líneas
+            walk = []
+            for slot, amount, line_id in task['picks']:
+                if not walk or walk[-1] != slot.location_id:
+                    walk.append(slot.location_id)
+
+                stop = stops.get(slot.location_id)
+                if stop is None:
+                    stop = stops[slot.location_id] = {
+                        'location_id': slot.location_id,
+                        'location_code': slot.location_code,
+                        'aisle': slot.aisle,
+                        'shelf': slot.shelf,
+                        'level_position': slot.level_position,
+                        'total_units': 0,
+                        'picks': []
+                    }
+                stop['total_units'] += amount
+                stop['picks'].append({
+                    'order_id': task['order_id'],
+                    'line_id': line_id,
+                    'product_sku': slot.product_sku,
+                    'batch_id': slot.batch_id,
+                    'batch_number': slot.batch_number,
+                    'expiry_date': slot.expiry_date.isoformat(),
+                    'quantity': amount
+                })
+            baseline += layout.tour_distance(walk)
+
+        route = sequence_pick_path(layout, list(stops), time_limit_ms=TSP_TIME_LIMIT_MS)
+        sequence = []
+        for position, location_id in enumerate(route, start=1):
+            stop = stops[location_id]
+            stop['stop'] = position
+            sequence.append(stop)
+
+        total_distance = layout.tour_distance(route)
+        departures = [t['departure_time'] for t in tasks if t['departure_time'] is not None]
+
+        return {
+            'id': None,
+            'wave_code': None,
+            'zone_type': zone_type,
+            'requires_cold_chain': cold_chain,
+            'departure_time': min(departures).isoformat() if departures else None,
+            'order_ids': [task['order_id'] for task in tasks],
+            'orders_count': len(tasks),
+            'lines_count': sum(len(task['lines']) for task in tasks),
+            'total_units': sum(task['units'] for task in tasks),
+            'total_distance_m': round(total_distance, 2),
+            'baseline_distance_m': round(baseline, 2),
+            'distance_saved_m': round(baseline - total_distance, 2),
+            'sequence': sequence
+        }
+
+    def _persist(self, waves: List[Dict]):
+        """
+        Guarda las olas. Una nueva planificación reemplaza las olas aún no
+        iniciadas del mismo centro y fecha.
+        """
+        previous = PickWave.query.filter(
+            PickWave.distribution_center_id == self.distribution_center_id,
+            PickWave.planned_date == self.planned_date
+        )
+        number = previous.count()
+        previous.filter(PickWave.status == PickWave.STATUS_PLANNED).update(
+            {PickWave.status: PickWave.STATUS_CANCELLED}, synchronize_session=False
+        )
+
+        models = []
+        for wave in waves:
+            number += 1
+            zone_code = 'R' if wave['zone_type'] == 'refrigerated' else 'A'
+            model = PickWave(
+                wave_code=(
+                    f"PW-{self.distribution_center_id}-{self.planned_date:%Y%m%d}-"
+                    f"{zone_code}{'C' if wave['requires_cold_chain'] else ''}-{number:03d}"
+                ),
+                distribution_center_id=self.distribution_center_id,
+                planned_date=self.planned_date,
+                zone_type=wave['zone_type'],
+                requires_cold_chain=wave['requires_cold_chain'],
+                departure_time=datetime.fromisoformat(wave['departure_time']) if wave['departure_time'] else None,
+                orders_count=wave['orders_count'],
+                lines_count=wave['lines_count'],
+                total_units=wave['total_units'],
+                total_distance_m=wave['total_distance_m'],
+                baseline_distance_m=wave['baseline_distance_m'],
+                sequence=wave['sequence']
+            )
+            db.session.add(model)
+            models.append(model)
+
+        db.session.commit()
+
+        for wave, model in zip(waves, models):
+            wave['id'] = model.id
+            wave['wave_code'] = model.wave_code
+
+
+class GetPickWaves:
+    """
+    Comando para consultar olas de picking con filtros.
+    """
+
+    def __init__(self, distribution_center_id: Optional[int] = None,
+                 planned_date: Optional[date] = None, status: Optional[str] = None,
+                 limit: int = 50, offset: int = 0):
+        self.distribution_center_id = distribution_center_id
+        self.planned_date = planned_date
+        self.status = status
+        self.limit = limit
+        self.offset = offset
+
+    def execute(self) -> Dict:
+        query = PickWave.query
+
+        if self.distribution_center_id:
+            query = query.filter(PickWave.distribution_center_id == self.distribution_center_id)
+        if self.planned_date:
+            query = query.filter(PickWave.planned_date == self.planned_date)
+        if self.status:
+            query = query.filter(PickWave.status == self.status)
+
+        total = query.count()
+        waves = (
+            query.order_by(PickWave.planned_date.desc(), PickWave.departure_time.asc(), PickWave.id.asc())
+            .limit(self.limit)
+            .offset(self.offset)
+            .all()
+        )
+
+        return {
+            'waves': [wave.to_dict(include_sequence=False) for wave in waves],
+            'total': total,
+            'limit': self.limit,
+            'offset': self.offset
+        }
+
+
+class GetPickWaveById:
+    """
+    Comando para obtener una ola de picking con su secuencia de recogida.
+    """
+
+    def __init__(self, wave_id: int):
+        self.wave_id = wave_id
+
+    def execute(self) -> Dict:
+        wave = db.session.get(PickWave, self.wave_id)
+        if wave is None:
+            raise NotFoundError(f"Ola de picking {self.wave_id} no encontrada")
+        return wave.to_dict()
@@ -0,0 +1,557 @@
+"""
+Comando para planificar en lote las rutas de visitas de varios vendedores
+(p. ej. todos los vendedores del lunes).
+
+A diferencia de GenerateVisitRoutesCommand (un vendedor por request):
+
+1. Obtiene TODOS los clientes del lote con una sola llamada a
+   `get_customers_by_ids`.
+2. Calcula las distancias sobre la unión de ubicaciones
+   (SharedLocationMatrix): un punto compartido, como la oficina de salida,
+   se calcula una sola vez para todos los vendedores.
+3. Resuelve el TSP de cada vendedor en paralelo en un pool de procesos
+   (OR-Tools es CPU puro y retiene el GIL).
+4. Guarda cada ruta apenas se resuelve y deja el avance por vendedor en
+   `visit_planning_jobs`; el request solo devuelve el ID del trabajo.
+"""
+
+import os
+import uuid
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+
+from src.commands.generate_visit_routes import GenerateVisitRoutesCommand
+from src.errors.errors import NotFoundError, ValidationError
+from src.models.visit_planning_job import (
+    STATUS_COMPLETED,
+    STATUS_FAILED,
+    STATUS_PARTIAL,
+    STATUS_QUEUED,
+    STATUS_RUNNING,
+    VisitPlanningJob,
+)
+from src.services.sales_service_client import get_sales_service_client
+from src.session import db
+from src.utils.geo import haversine_km
+from src.utils.vrp_solver import VRPSolver
+
+logger = logging.getLogger(__name__)
+
+ALL_SALESPEOPLE = 'all'
+MAX_CUSTOMERS_PER_SALESPERSON = 50  # Mismo límite que POST /routes/visits/generate
+DEFAULT_MAX_CUSTOMERS = 5000
+DEFAULT_MAX_SALESPEOPLE = 100
+DEFAULT_TSP_SECONDS = 2
+DEFAULT_PLANNING_WORKERS = min(4, os.cpu_count() or 1)
+MINUTES_PER_KM = 2  # ~30 km/h, igual que el cálculo de una sola ruta
+
+_planning_pool: Optional[ProcessPoolExecutor] = None
+_planning_pool_lock = threading.Lock()
+
+
+class SharedLocationMatrix:
+    """
+    Matriz de distancias (km) sobre la unión de ubicaciones del lote.
+    Las ubicaciones repetidas (misma coordenada a 1e-6°) comparten índice y
+    cada par se calcula una sola vez, sin importar cuántos vendedores lo usen.
+    """
+
+    def __init__(self):
+        self.coordinates: List[Tuple[float, float]] = []
+        self._index: Dict[Tuple[float, float], int] = {}
+        self._distances: Dict[Tuple[int, int], float] = {}
+        self.pairs_computed = 0
+        self.pairs_reused = 0
+
+    def add(self, latitude, longitude) -> int:
+        key = (round(float(latitude), 6), round(float(longitude), 6))
+        index = self._index.get(key)
+        if index is None:
+            index = len(self.coordinates)
+            self._index[key] = index
+            self.coordinates.append(key)
+        return index
+
+    def distance(self, i: int, j: int) -> float:
+        if i == j:
+            return 0.0
+        key = (i, j) if i < j else (j, i)
+        value = self._distances.get(key)
+        if value is None:
+            value = haversine_km(*self.coordinates[i], *self.coordinates[j])
+            self._distances[key] = value
+            self.pairs_computed += 1
+        else:
+            self.pairs_reused += 1
+        return value
+
+    def submatrix(self, indices: List[int]) -> List[List[float]]:
+        return [[self.distance(i, j) for j in indices] for i in indices]
+
+    def get_stats(self) -> Dict:
+        return {
+            'locations': len(self.coordinates),
+            'pairs_computed': self.pairs_computed,
+            'pairs_reused': self.pairs_reused,
+        }
+
+
+def solve_visit_sequence(distances: List[List[float]], return_to_start: bool, time_limit_seconds: int) -> Dict:
+    """
+    Resuelve el TSP de un vendedor. No accede a la base de datos: se puede
+    ejecutar en otro proceso.
+    """
+    return VRPSolver.solve_tsp(
+        distance_matrix=distances,
+        start_index=0,
+        return_to_start=return_to_start,
+        time_limit_seconds=time_limit_seconds
+    )
+
+
+def _setting(key: str, default):
+    """app.config primero, luego variable de entorno."""
+    value = current_app.config.get(key)
+    if value is None:
+        value = os.getenv(key, default)
+    return value
+
+
+def get_planning_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Pool de procesos para los TSP del lote. Se crea al primer uso con
+    contexto 'spawn'. None si VISIT_PLANNING_WORKERS <= 1.
+    """
+    global _planning_pool
+    if workers <= 1:
+        return None
+    with _planning_pool_lock:
+        if _planning_pool is None:
+            _planning_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            logger.info(f"🧮 Pool de planificación de visitas iniciado ({workers} procesos)")
+        return _planning_pool
+
+
+def shutdown_planning_pool():
+    """Detiene el pool de planificación (registrado con atexit)."""
+    global _planning_pool
+    with _planning_pool_lock:
+        if _planning_pool is not None:
+            _planning_pool.shutdown(wait=False, cancel_futures=True)
+            _planning_pool = None
+            logger.info("🛑 Pool de planificación de visitas detenido")
+
+
+class PlanVisitRoutesBatch:
+    """
+    Planifica las rutas de visitas de varios vendedores para una fecha.
+
+    `salespeople` admite:
+    - Lista de vendedores con su cartera:
+      [{"salesperson_id": 2, "customer_ids": [1, 5], "salesperson_name": "...",
+        "start_location": {...}}]
+    - Lista de IDs o "all" junto con `customer_ids`: los clientes se agrupan
+      por el `salesperson_id` que les asigna sales-service.
+
+    Un lote admite hasta VISIT_PLANNING_MAX_SALESPEOPLE vendedores. Con "all"
+    los vendedores salen de la cartera, así que los clientes se consultan en
+    el request para validar el límite antes de crear el trabajo.
+    """
+
+    def __init__(
+        self,
+        planned_date: date,
+        salespeople,
+        customer_ids: Optional[List[int]] = None,
+        optimization_strategy: str = 'minimize_distance',
+        start_location: Optional[Dict] = None,
+        work_start_time: time = time(8, 0),
+        work_end_time: time = time(18, 0),
+        service_time_per_visit_minutes: int = 30,
+        created_by: Optional[str] = None
+    ):
+        self.planned_date = planned_date
+        self.salespeople = salespeople
+        self.customer_ids = customer_ids
+        self.optimization_strategy = optimization_strategy
+        self.start_location = start_location
+        self.work_start_time = work_start_time
+        self.work_end_time = work_end_time
+        self.service_time_per_visit_minutes = service_time_per_visit_minutes
+        self.created_by = created_by
+
+    def execute(self) -> Dict:
+        """
+        Valida el lote, crea el trabajo y lo lanza en segundo plano
+        (o lo ejecuta en el request si VISIT_PLANNING_ASYNC está desactivado).
+
+        Returns:
+            Estado del trabajo (VisitPlanningJob.to_dict)
+        """
+        self._validate()
+
+        customers = None
+        if self.salespeople == ALL_SALESPEOPLE:
+            customers = self._fetch_customers()
+            salespeople = {
+                customer.get('salesperson_id') for customer in customers[0].values()
+            } - {None}
+            self._validate_salespeople_count(len(salespeople))
+
+        job = VisitPlanningJob(
+            id=uuid.uuid4().hex,
+            planned_date=self.planned_date,
+            status=STATUS_QUEUED,
+            created_by=self.created_by
+        )
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.id
+
+        if self._run_async():
+            app = current_app._get_current_object()
+            thread = threading.Thread(
+                target=self._run_in_context,
+                args=(app, job_id, customers),
+                name=f'visit-planning-{job_id[:8]}',
+                daemon=True
+            )
+            thread.start()
+            logger.info(f"🚀 Planificación de visitas {job_id} lanzada en segundo plano")
+            return job.to_dict()
+
+        self.run(job_id, customers)
+        return GetVisitPlanningJob(job_id).execute()
+
+    # ------------------------------------------------------------------
+    # Validación
+    # ------------------------------------------------------------------
+
+    def _validate(self):
+        if not isinstance(self.planned_date, date):
+            raise ValidationError("planned_date debe ser una fecha")
+
+        if self.salespeople == ALL_SALESPEOPLE or (
+            isinstance(self.salespeople, list) and self.salespeople
+            and all(isinstance(item, int) for item in self.salespeople)
+        ):
+            if not isinstance(self.customer_ids, list) or not self.customer_ids:
+                raise ValidationError(
+                    "customer_ids es requerido cuando salespeople es 'all' o una lista de IDs"
+                )
+            total = len(self.customer_ids)
+        elif isinstance(self.salespeople, list) and self.salespeople:
+            total = 0
+            seen = set()
+            for item in self.salespeople:
+                if not isinstance(item, dict) or not isinstance(item.get('salesperson_id'), int):
+                    raise ValidationError("Cada vendedor requiere salesperson_id entero")
+                if item['salesperson_id'] in seen:
+                    raise ValidationError(f"Vendedor {item['salesperson_id']} repetido")
+                seen.add(item['salesperson_id'])
+                ids = item.get('customer_ids')
+                if not isinstance(ids, list) or not ids:
+                    raise ValidationError(
+                        f"customer_ids del vendedor {item['salesperson_id']} debe ser una lista no vacía"
+                    )
+                if len(ids) > MAX_CUSTOMERS_PER_SALESPERSON:
+                    raise ValidationError(
+                        f"Máximo {MAX_CUSTOMERS_PER_SALESPERSON} clientes por vendedor "
+                        f"(vendedor {item['salesperson_id']})"
+                    )
+                total += len(ids)
+        else:
+            raise ValidationError("salespeople debe ser 'all', una lista de IDs o una lista de vendedores")
+
+        if self.salespeople != ALL_SALESPEOPLE:
+            self._validate_salespeople_count(len(self.salespeople))
+
+        max_customers = int(_setting('VISIT_PLANNING_MAX_CUSTOMERS', DEFAULT_MAX_CUSTOMERS))
+        if total > max_customers:
+            raise ValidationError(f"Máximo {max_customers} clientes por lote")
+
+    def _validate_salespeople_count(self, count: int):
+        max_salespeople = int(_setting('VISIT_PLANNING_MAX_SALESPEOPLE', DEFAULT_MAX_SALESPEOPLE))
+        if count > max_salespeople:
+            raise ValidationError(
+                f"Máximo {max_salespeople} vendedores por lote ({count} solicitados); "
+                f"divida la planificación en varios lotes"
+            )
+
+    def _run_async(self) -> bool:
+        enabled = current_app.config.get('VISIT_PLANNING_ASYNC')
+        if enabled is None:
+            enabled = (
+                not current_app.config.get('TESTING', False)
+                and os.getenv('VISIT_PLANNING_ASYNC', 'true').lower() in ['true', '1', 'yes']
+            )
+        return bool(enabled)
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    def _run_in_context(self, app, job_id: str, customers: Optional[Tuple[Dict, set]] = None):
+        with app.app_context():
+            self.run(job_id, customers)
+
+    def _fetch_customers(self) -> Tuple[Dict[int, Dict], set]:
+        """Clientes del lote en una sola llamada: ({id: cliente}, ids no encontrados)."""
+        result = get_sales_service_client().get_customers_by_ids(self._customer_ids_to_fetch())
+        customers_by_id = {customer['id']: customer for customer in result.get('customers', [])}
+        return customers_by_id, set(result.get('not_found', []))
+
+    def run(self, job_id: str, customers: Optional[Tuple[Dict, set]] = None):
+        """
+        Ejecuta el trabajo: clientes, matriz compartida, TSP en paralelo y persistencia.
+
+        Args:
+            job_id: Trabajo a ejecutar
+            customers: Clientes ya consultados en el request (modo "all")
+        """
+        job = db.session.get(VisitPlanningJob, job_id)
+        job.status = STATUS_RUNNING
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+
+        try:
+            customers_by_id, not_found = customers or self._fetch_customers()
+            logger.info(
+                f"📥 Lote {job_id}: {len(customers_by_id)} clientes obtenidos en una llamada "
+                f"({len(not_found)} no encontrados)"
+            )
+
+            plans, job_warnings = self._build_plans(customers_by_id, not_found)
+            job.total_salespeople = len(plans)
+            job.warnings = job_warnings
+            for plan in plans:
+                job.set_salesperson_progress(
+                    plan['salesperson_id'],
+                    status='pending',
+                    customers=len(plan['customers']),
+                    warnings=plan['warnings']
+                )
+            db.session.commit()
+
+            matrix = SharedLocationMatrix()
+            tasks = {}
+            for plan in plans:
+                if not plan['locations']:
+                    self._record_failure(job, plan, ["No hay clientes con coordenadas para visitar"])
+                    continue
+                tasks[plan['salesperson_id']] = self._prepare_task(plan, matrix)
+            logger.info(f"🗺️ Lote {job_id}: matriz compartida {matrix.get_stats()}")
+
+            plans_by_id = {plan['salesperson_id']: plan for plan in plans}
+            for salesperson_id, solution, error in self._solve_all(job, tasks):
+                plan = plans_by_id[salesperson_id]
+                if error is not None:
+                    self._record_failure(job, plan, [f"Error optimizando la secuencia: {error}"])
+                    continue
+                self._persist_route(job, plan, tasks[salesperson_id], solution)
+
+            job.status = STATUS_COMPLETED if not job.failed_salespeople else (
+                STATUS_PARTIAL if job.completed_salespeople else STATUS_FAILED
+            )
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(VisitPlanningJob, job_id)
+            logger.error(f"❌ Error en planificación de visitas {job_id}: {e}", exc_info=True)
+            job.status = STATUS_FAILED
+            job.error = str(e)
+
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        logger.info(
+            f"🎉 Lote {job_id} terminado ({job.status}): {job.completed_salespeople} rutas, "
+            f"{job.failed_salespeople} fallidas"
+        )
+
+    def _explicit_portfolios(self) -> bool:
+        return isinstance(self.salespeople, list) and isinstance(self.salespeople[0], dict)
+
+    def _customer_ids_to_fetch(self) -> List[int]:
+        if self._explicit_portfolios():
+            ids = [customer_id for item in self.salespeople for customer_id in item['customer_ids']]
+        else:
+            ids = list(self.customer_ids)
+        return list(dict.fromkeys(ids))
+
+    def _build_plans(self, customers_by_id: Dict[int, Dict], not_found: set) -> Tuple[List[Dict], List[str]]:
+        """Cartera de cada vendedor con sus clientes ya resueltos."""
+        job_warnings = []
+        if self._explicit_portfolios():
+            specs = self.salespeople
+        else:
+            wanted = None if self.salespeople == ALL_SALESPEOPLE else set(self.salespeople)
+            grouped: Dict[int, List[int]] = {}
+            unassigned = []
+            for customer_id in dict.fromkeys(self.customer_ids):
+                customer = customers_by_id.get(customer_id)
+                if customer is None:
+                    continue
+                salesperson_id = customer.get('salesperson_id')
+                if salesperson_id is None:
+                    unassigned.append(customer_id)
+                elif wanted is None or salesperson_id in wanted:
+                    grouped.setdefault(salesperson_id, []).append(customer_id)
+            if unassigned:
+                job_warnings.append(f"Clientes sin vendedor asignado: {unassigned}")
+            if not_found:
+                job_warnings.append(f"Clientes no encontrados: {sorted(not_found)}")
+            specs = [
+                {'salesperson_id': salesperson_id, 'customer_ids': ids}
+                for salesperson_id, ids in sorted(grouped.items())
+            ]
+            for salesperson_id in sorted((wanted or set()) - set(grouped)):
+                specs.append({'salesperson_id': salesperson_id, 'customer_ids': []})
+
+        plans = []
+        for spec in specs:
+            salesperson_id = spec['salesperson_id']
+            command = GenerateVisitRoutesCommand(
+                salesperson_id=salesperson_id,
+                salesperson_name=spec.get('salesperson_name', f'Vendedor {salesperson_id}'),
+                salesperson_employee_id=spec.get('salesperson_employee_id', f'SALES-{salesperson_id:03d}'),
+                customer_ids=spec['customer_ids'],
+                planned_date=self.planned_date,
+                optimization_strategy=self.optimization_strategy,
+                start_location=spec.get('start_location', self.start_location),
+                end_location=spec.get('end_location'),
+                work_start_time=self.work_start_time,
+                work_end_time=self.work_end_time,
+                service_time_per_visit_minutes=self.service_time_per_visit_minutes
+            )
+            customers = [customers_by_id[cid] for cid in spec['customer_ids'] if cid in customers_by_id]
+            locations, location_errors = command._prepare_locations(customers)
+            by_id = {customer['id']: customer for customer in customers}
+            warnings = list(location_errors)
+            missing = [cid for cid in spec['customer_ids'] if cid not in customers_by_id]
+            if missing:
+                warnings.append(f"Clientes no encontrados: {missing}")
+            plans.append({
+                'salesperson_id': salesperson_id,
+                'command': command,
+                'customers': customers,
+                # Clientes con coordenadas, en el mismo orden que la matriz
+                'located_customers': [by_id[loc['customer_id']] for loc in locations],
+                'locations': locations,
+                'warnings': warnings,
+            })
+        return plans, job_warnings
+
+    def _prepare_task(self, plan: Dict, matrix: SharedLocationMatrix) -> Dict:
+        """Submatriz del vendedor (la salida, si hay, va en el índice 0)."""
+        command = plan['command']
+        indices = []
+        if command.start_location:
+            indices.append(matrix.add(command.start_location['latitude'], command.start_location['longitude']))
+        offset = len(indices)
+        indices.extend(matrix.add(loc['latitude'], loc['longitude']) for loc in plan['locations'])
+        return {
+            'distances': matrix.submatrix(indices),
+            'offset': offset,
+            'return_to_start': bool(command.end_location),
+        }
+
+    def _solve_all(self, job: VisitPlanningJob, tasks: Dict[int, Dict]) -> Iterable[Tuple[int, Optional[Dict], Optional[str]]]:
+        """Resuelve los TSP (en el pool si hay más de un worker) a medida que terminan."""
+        time_limit = int(_setting('VISIT_PLANNING_TSP_SECONDS', DEFAULT_TSP_SECONDS))
+        workers = int(_setting('VISIT_PLANNING_WORKERS', DEFAULT_PLANNING_WORKERS))
+
+        for salesperson_id in tasks:
+            job.set_salesperson_progress(salesperson_id, status='solving')
+        db.session.commit()
+
+        pool = get_planning_pool(workers) if len(tasks) > 1 else None
+        pending = dict(tasks)
+        if pool is not None:
+            try:
+                futures = {
+                    pool.submit(solve_visit_sequence, task['distances'], task['return_to_start'], time_limit): salesperson_id
+                    for salesperson_id, task in tasks.items()
+                }
+                for future in as_completed(futures):
+                    salesperson_id = futures[future]
+                    pending.pop(salesperson_id, None)
+                    try:
+                        yield salesperson_id, future.result(), None
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        yield salesperson_id, None, str(e)
+            except BrokenProcessPool:
+                logger.warning("⚠️ Pool de planificación caído, resolviendo el resto en el proceso")
+                shutdown_planning_pool()
+
+        for salesperson_id, task in pending.items():
+            try:
+                yield salesperson_id, solve_visit_sequence(task['distances'], task['return_to_start'], time_limit), None
+            except Exception as e:
+                yield salesperson_id, None, str(e)
+
+    def _persist_route(self, job: VisitPlanningJob, plan: Dict, task: Dict, solution: Dict):
+        offset = task['offset']
+        sequence = [index - offset for index in solution.get('sequence', []) if index >= offset]
+        distances = [row[offset:] for row in task['distances'][offset:]]
+        try:
+            route = plan['command']._create_route_objects(
+                plan['located_customers'],
+                {
+                    'sequence': sequence,
+                    'total_distance_km': solution.get('total_distance', 0),
+                    'total_time_minutes': solution.get('total_time', 0),
+                },
+                {
+                    'distances_km': distances,
+                    'durations_minutes': [[d * MINUTES_PER_KM for d in row] for row in distances],
+                }
+            )
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"❌ Error guardando ruta del vendedor {plan['salesperson_id']}: {e}", exc_info=True)
+            self._record_failure(job, plan, [f"Error guardando la ruta: {str(e)}"])
+            return
+
+        job.set_salesperson_progress(
+            plan['salesperson_id'],
+            status='completed',
+            route_id=route.id,
+            route_code=route.route_code,
+            metrics={
+                'total_stops': route.total_stops,
+                'total_distance_km': float(route.total_distance_km or 0),
+                'estimated_duration_minutes': route.estimated_duration_minutes,
+            }
+        )
+        job.completed_salespeople += 1
+        db.session.commit()
+
+    def _record_failure(self, job: VisitPlanningJob, plan: Dict, errors: List[str]):
+        job = db.session.get(VisitPlanningJob, job.id)
+        job.set_salesperson_progress(plan['salesperson_id'], status='failed', errors=errors)
+        job.failed_salespeople += 1
+        db.session.commit()
+
+
+class GetVisitPlanningJob:
+    """Obtiene el estado y avance por vendedor de un lote de planificación."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+
+    def execute(self) -> Dict:
+        job = db.session.get(VisitPlanningJob, self.job_id)
+        if job is None:
+            raise NotFoundError(f"Trabajo de planificación {self.job_id} no encontrado")
+        return job.to_dict()
@@ -0,0 +1,280 @@
+"""
+Comando para planificar la semana de visitas de un vendedor.
+
+Reparte la cartera en los días de trabajo según la frecuencia de visita de
+cada cliente (VRP periódico, ver src/utils/periodic_visit_planner.py),
+respetando ventanas horarias y la jornada, secuencia cada día partiendo de la
+solución del día anterior y guarda una ruta de visitas por día.
+"""
+
+import os
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+
+from flask import current_app
+
+from src.commands.generate_visit_routes import GenerateVisitRoutesCommand
+from src.errors.errors import ValidationError
+from src.services.sales_service_client import get_sales_service_client
+from src.utils.periodic_visit_planner import MINUTES_PER_KM, WeeklyVisitPlanner
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKING_DAYS = [0, 1, 2, 3, 4]  # Lunes a viernes
+DEFAULT_TIME_BUDGET_SECONDS = 10
+MAX_TIME_BUDGET_SECONDS = 60
+MAX_CUSTOMERS = 500
+WEEKDAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def _parse_time(value, field: str) -> Optional[time]:
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, '%H:%M').time()
+    except (TypeError, ValueError):
+        raise ValidationError(f"{field} debe tener formato HH:MM")
+
+
+class PlanWeeklyVisitRoutesCommand:
+    """
+    Planifica las rutas de visitas de un vendedor para una semana.
+
+    Cada cliente de `customers` admite:
+    {
+        "customer_id": 12,
+        "visits_per_week": 2,                            # default 1
+        "time_window": {"start": "09:00", "end": "12:00"},  # opcional
+        "allowed_days": [0, 2, 4]                        # opcional (0 = lunes)
+    }
+    """
+
+    def __init__(
+        self,
+        salesperson_id: int,
+        salesperson_name: str,
+        salesperson_employee_id: str,
+        week_start: date,
+        customers: List[Dict],
+        working_days: Optional[List[int]] = None,
+        optimization_strategy: str = 'minimize_distance',
+        start_location: Optional[Dict] = None,
+        end_location: Optional[Dict] = None,
+        work_start_time: time = time(8, 0),
+        work_end_time: time = time(18, 0),
+        service_time_per_visit_minutes: int = 30,
+        time_budget_seconds: Optional[float] = None
+    ):
+        self.salesperson_id = salesperson_id
+        self.salesperson_name = salesperson_name
+        self.salesperson_employee_id = salesperson_employee_id
+        self.week_start = week_start
+        self.customers = customers
+        self.working_days = sorted(set(working_days if working_days is not None else DEFAULT_WORKING_DAYS))
+        self.optimization_strategy = optimization_strategy
+        self.start_location = start_location
+        self.end_location = end_location
+        self.work_start_time = work_start_time
+        self.work_end_time = work_end_time
+        self.service_time_per_visit_minutes = service_time_per_visit_minutes
+        self.time_budget_seconds = time_budget_seconds
+
+    def execute(self) -> Dict:
+        """
+        Returns:
+            {
+                'status': 'success' | 'partial' | 'failed',
+                'routes': [rutas creadas, una por día con visitas],
+                'days': [{'date', 'weekday', 'stops', 'distance_km', 'warm_started'}],
+                'unscheduled': [{'customer_id', 'reason', 'date'?}],
+                'warnings': [...],
+                'solve_seconds': float,
+                'computation_time_seconds': float
+            }
+        """
+        start_time = datetime.now()
+        self._validate()
+
+        dates = [
+            self.week_start + timedelta(days=offset) for offset in range(7)
+            if (self.week_start + timedelta(days=offset)).weekday() in self.working_days
+        ]
+        day_index = {day.weekday(): position for position, day in enumerate(dates)}
+
+        customer_ids = [item['customer_id'] for item in self.customers]
+        result = get_sales_service_client().get_customers_by_ids(customer_ids)
+        customers_by_id = {customer['id']: customer for customer in result.get('customers', [])}
+        warnings = []
+        if result.get('not_found'):
+            warnings.append(f"Clientes no encontrados: {result['not_found']}")
+
+        planner_customers, customer_data = [], []
+        for item in self.customers:
+            customer = customers_by_id.get(item['customer_id'])
+            if customer is None:
+                continue
+            if not customer.get('latitude') or not customer.get('longitude'):
+                warnings.append(f"Cliente {customer['id']} ({customer.get('business_name')}) sin coordenadas GPS")
+                continue
+            window = item.get('time_window') or {}
+            allowed = item.get('allowed_days')
+            planner_customers.append({
+                'customer_id': customer['id'],
+                'latitude': float(customer['latitude']),
+                'longitude': float(customer['longitude']),
+                'visits_per_week': item.get('visits_per_week', 1),
+                'time_window_start': _parse_time(window.get('start'), 'time_window.start'),
+                'time_window_end': _parse_time(window.get('end'), 'time_window.end'),
+                'allowed_days': None if allowed is None else [day_index[d] for d in allowed if d in day_index],
+            })
+            customer_data.append(customer)
+
+        if not planner_customers:
+            return self._build_error_response(["No hay clientes con coordenadas para planificar"], warnings, start_time)
+
+        planner = WeeklyVisitPlanner(
+            planner_customers,
+            num_days=len(dates),
+            work_start_time=self.work_start_time,
+            work_end_time=self.work_end_time,
+            service_time_minutes=self.service_time_per_visit_minutes,
+            start_location=self.start_location,
+            return_to_start=bool(self.end_location)
+        )
+        budget = self._time_budget()
+        logger.info(
+            f"🗓️ Planificando semana de {self.week_start} para vendedor {self.salesperson_id}: "
+            f"{len(planner_customers)} clientes, {len(dates)} días, presupuesto {budget} s"
+        )
+        plan = planner.plan(time_budget_seconds=budget)
+
+        unscheduled = [
+            {'customer_id': planner_customers[item['index']]['customer_id'], 'reason': item['reason']}
+            for item in plan['unassigned']
+        ]
+        routes, days = [], []
+        for position, day_plan in enumerate(plan['days']):
+            planned_date = dates[position]
+            unscheduled.extend(
+                {
+                    'customer_id': planner_customers[index]['customer_id'],
+                    'date': planned_date.isoformat(),
+                    'reason': 'No cabe en su ventana horaria o en la jornada'
+                }
+                for index in day_plan['dropped']
+            )
+            days.append({
+                'date': planned_date.isoformat(),
+                'weekday': WEEKDAY_NAMES[planned_date.weekday()],
+                'stops': len(day_plan['sequence']),
+                'distance_km': day_plan['distance_km'],
+                'warm_started': day_plan['warm_started'],
+            })
+            if day_plan['sequence']:
+                routes.append(self._create_day_route(planned_date, planner, customer_data, day_plan))
+
+        computation_time = (datetime.now() - start_time).total_seconds()
+        logger.info(
+            f"🎉 Semana planificada: {len(routes)} rutas, {sum(day['stops'] for day in days)} visitas, "
+            f"{len(unscheduled)} sin programar en {computation_time:.2f}s"
+        )
+
+        return {
+            'status': 'partial' if unscheduled else 'success',
+            'routes': routes,
+            'days': days,
+            'unscheduled': unscheduled,
+            'total_distance_km': plan['total_distance_km'],
+            'warnings': warnings,
+            'solve_seconds': plan['solve_seconds'],
+            'computation_time_seconds': computation_time
+        }
+
+    def _validate(self):
+        if not isinstance(self.week_start, date):
+            raise ValidationError("week_start debe ser una fecha")
+        if not self.working_days or any(not isinstance(d, int) or not 0 <= d <= 6 for d in self.working_days):
+            raise ValidationError("working_days debe ser una lista de días de la semana (0 = lunes ... 6 = domingo)")
+        if not isinstance(self.customers, list) or not self.customers:
+            raise ValidationError("customers debe ser una lista no vacía")
+        if len(self.customers) > MAX_CUSTOMERS:
+            raise ValidationError(f"Máximo {MAX_CUSTOMERS} clientes por semana")
+        if self.work_start_time >= self.work_end_time:
+            raise ValidationError("work_hours.start debe ser anterior a work_hours.end")
+
+        seen = set()
+        for item in self.customers:
+            if not isinstance(item, dict) or not isinstance(item.get('customer_id'), int):
+                raise ValidationError("Cada cliente requiere customer_id entero")
+            if item['customer_id'] in seen:
+                raise ValidationError(f"Cliente {item['customer_id']} repetido")
+            seen.add(item['customer_id'])
+            frequency = item.get('visits_per_week', 1)
+            if not isinstance(frequency, int) or not 1 <= frequency <= len(self.working_days):
+                raise ValidationError(
+                    f"visits_per_week del cliente {item['customer_id']} debe estar entre 1 y {len(self.working_days)}"
+                )
+            window = item.get('time_window') or {}
+            window_start = _parse_time(window.get('start'), 'time_window.start')
+            window_end = _parse_time(window.get('end'), 'time_window.end')
+            if window_start and window_end and window_start >= window_end:
+                raise ValidationError(f"time_window del cliente {item['customer_id']} debe terminar después de empezar")
+            allowed = item.get('allowed_days')
+            if allowed is not None and (not isinstance(allowed, list) or not set(allowed) & set(self.working_days)):
+                raise ValidationError(
+                    f"allowed_days del cliente {item['customer_id']} debe incluir algún día de trabajo"
+                )
+
+    def _time_budget(self) -> float:
+        budget = self.time_budget_seconds
+        if budget is None:
+            budget = current_app.config.get('VISIT_WEEK_TIME_BUDGET_SECONDS')
+        if budget is None:
+            budget = os.getenv('VISIT_WEEK_TIME_BUDGET_SECONDS', DEFAULT_TIME_BUDGET_SECONDS)
+        return min(max(float(budget), 0.5), MAX_TIME_BUDGET_SECONDS)
+
+    def _create_day_route(self, planned_date: date, planner: WeeklyVisitPlanner,
+                          customer_data: List[Dict], day_plan: Dict):
+        """Guarda la ruta del día con las llegadas calculadas por el solver."""
+        sequence = day_plan['sequence']
+        nodes = [index + 1 for index in sequence]
+        distances = [[planner.distances[a][b] for b in nodes] for a in nodes]
+
+        command = GenerateVisitRoutesCommand(
+            salesperson_id=self.salesperson_id,
+            salesperson_name=self.salesperson_name,
+            salesperson_employee_id=self.salesperson_employee_id,
+            customer_ids=[customer_data[index]['id'] for index in sequence],
+            planned_date=planned_date,
+            optimization_strategy=self.optimization_strategy,
+            start_location=self.start_location,
+            end_location=self.end_location,
+            work_start_time=self.work_start_time,
+            work_end_time=self.work_end_time,
+            service_time_per_visit_minutes=self.service_time_per_visit_minutes
+        )
+        return command._create_route_objects(
+            [customer_data[index] for index in sequence],
+            {
+                'sequence': list(range(len(sequence))),
+                'arrival_minutes': day_plan['arrival_minutes'],
+                'total_distance_km': day_plan['distance_km'],
+                'total_time_minutes': day_plan['distance_km'] * MINUTES_PER_KM,
+            },
+            {
+                'distances_km': distances,
+                'durations_minutes': [[d * MINUTES_PER_KM for d in row] for row in distances],
+            }
+        )
+
+    def _build_error_response(self, errors: List[str], warnings: List[str], start_time: datetime) -> Dict:
+        return {
+            'status': 'failed',
+            'routes': [],
+            'days': [],
+            'unscheduled': [],
+            'errors': errors,
+            'warnings': warnings,
+            'computation_time_seconds': (datetime.now() - start_time).total_seconds()
+        }
@@ -12,6 +12,12 @@ Flujo:
 1. Orden creada → Reservar inventario (quantity_reserved += quantity)
 2. Orden despachada → Reducir quantity_available
 3. Orden cancelada → Liberar reserva (quantity_reserved -= quantity)
+
+Sin ledger, el evento WebSocket de cada item se escribe en el outbox de la
+misma transacción (lo publica el relay tras el commit). Con
+INVENTORY_LEDGER_ENABLED, la reserva y la liberación se agregan como
+movimientos al ledger (sin actualizar la fila de inventory); el evento
+WebSocket sale cuando la compactación proyecta el saldo.
 """
 
 from datetime import datetime
@@ -20,7 +26,12 @@ from sqlalchemy import and_
 from src.session import db
 from src.models.inventory import Inventory
 from src.errors.errors import ValidationError, NotFoundError, ConflictError
-from src.websockets.inventory_events import InventoryChangeType
+from src.models.inventory_movement import InventoryMovement
+from src.services.inventory_ledger import (
+    ledger_enabled, lock_balance, get_balance, movement_deltas, append_movement
+)
+from src.websockets.inventory_events import InventoryChangeType, InventoryEvent
+from src.websockets.inventory_outbox import record_outbox_event
 import logging
 
 logger = logging.getLogger(__name__)
@@ -51,6 +62,7 @@ class ReserveInventoryForOrder:
         self.order_id = order_id
         self.items = items
         self.reserved_items = []  # Para tracking
+        self.use_ledger = ledger_enabled()
     
     def execute(self) -> Dict:
         """
@@ -79,13 +91,9 @@ class ReserveInventoryForOrder:
             for item in self.items:
                 self._reserve_item(item)
             
-            # Commit de la transacción completa
+            # Commit de la transacción completa (incluye los eventos del outbox)
             db.session.commit()
             
-            # Emitir eventos WebSocket para cada item
-            for reserved_item in self.reserved_items:
-                self._emit_websocket_event(reserved_item)
-            
             logger.info(
                 f"✅ Inventario reservado para orden {self.order_id}: "
                 f"{len(self.reserved_items)} items"
@@ -158,6 +166,10 @@ class ReserveInventoryForOrder:
                 f"en centro de distribución {distribution_center_id}"
             )
         
+        if self.use_ledger:
+            self._reserve_item_in_ledger(product_sku, quantity, distribution_center_id)
+            return
+        
         # Validar que hay suficiente stock disponible
         # quantity_available debe ser suficiente para la reserva
         if inventory.quantity_available < quantity:
@@ -183,6 +195,9 @@ class ReserveInventoryForOrder:
         }
         
         self.reserved_items.append(reserved_item)
+        _record_reservation_event(
+            inventory, InventoryChangeType.RESERVATION, old_quantity_reserved, self.order_id
+        )
         
         logger.info(
             f"📦 Reservando inventario: {product_sku} - "
@@ -190,34 +205,29 @@ class ReserveInventoryForOrder:
             f"Reserved antes: {old_quantity_reserved} → después: {inventory.quantity_reserved}"
         )
     
-    def _emit_websocket_event(self, reserved_item: Dict):
-        """Emite evento WebSocket de reserva de inventario."""
-        try:
-            from src.websockets.websocket_manager import InventoryNotifier
-            from src.commands.get_stock_levels import GetStockLevels
-            
-            # Obtener stock actualizado (con el cálculo correcto de disponible)
-            stock_command = GetStockLevels(
-                product_sku=reserved_item['product_sku'],
-                include_reserved=True,
-                include_in_transit=False
-            )
-            stock_data = stock_command.execute()
-            
-            # Emitir notificación WebSocket
-            InventoryNotifier.notify_stock_change(
-                product_sku=reserved_item['product_sku'],
-                stock_data=stock_data,
-                change_type=InventoryChangeType.RESERVATION
-            )
-            
-            logger.info(
-                f"📡 WebSocket: Notificado cambio de stock para {reserved_item['product_sku']} "
-                f"(disponible: {stock_data.get('total_available')})"
-            )
-        except Exception as e:
-            # No fallar si el WebSocket falla
-            logger.warning(f"⚠️ Error emitiendo evento WebSocket: {str(e)}")
+    def _reserve_item_in_ledger(self, product_sku: str, quantity: int, distribution_center_id: int):
+        """Agrega la reserva como movimiento del ledger."""
+        lock_balance(product_sku, distribution_center_id)
+        balance = get_balance(product_sku, distribution_center_id)
+        _, delta_reserved, _ = movement_deltas(InventoryMovement.TYPE_RESERVATION, quantity, balance)
+        append_movement(
+            product_sku,
+            distribution_center_id,
+            InventoryMovement.TYPE_RESERVATION,
+            delta_reserved=delta_reserved,
+            reference=str(self.order_id)
+        )
+        
+        self.reserved_items.append({
+            'product_sku': product_sku,
+            'quantity_reserved': quantity,
+            'distribution_center_id': distribution_center_id,
+            'quantity_reserved_before': balance['quantity_reserved'],
+            'quantity_reserved_after': balance['quantity_reserved'] + delta_reserved,
+            'quantity_available': balance['quantity_available']
+        })
+        
+        logger.info(f"📒 Reserva en ledger: {product_sku} - Cantidad: {quantity} - Orden: {self.order_id}")
 
 
 class ReleaseInventoryForOrder:
@@ -244,6 +254,7 @@ class ReleaseInventoryForOrder:
         self.order_id = order_id
         self.items = items
         self.released_items = []
+        self.use_ledger = ledger_enabled()
     
     def execute(self) -> Dict:
         """
@@ -264,10 +275,6 @@ class ReleaseInventoryForOrder:
             
             db.session.commit()
             
-            # Emitir eventos WebSocket
-            for released_item in self.released_items:
-                self._emit_websocket_event(released_item)
-            
             logger.info(
                 f"✅ Inventario liberado para orden {self.order_id}: "
                 f"{len(self.released_items)} items"
@@ -316,6 +323,10 @@ class ReleaseInventoryForOrder:
                 f"en centro de distribución {distribution_center_id}"
             )
         
+        if self.use_ledger:
+            self._release_item_in_ledger(product_sku, quantity, distribution_center_id)
+            return
+        
         # Validar que hay suficiente quantity_reserved
         if inventory.quantity_reserved < quantity:
             logger.warning(
@@ -340,6 +351,9 @@ class ReleaseInventoryForOrder:
         }
         
         self.released_items.append(released_item)
+        _record_reservation_event(
+            inventory, InventoryChangeType.RESERVATION_RELEASED, old_quantity_reserved, self.order_id
+        )
         
         logger.info(
             f"🔓 Liberando inventario: {product_sku} - "
@@ -347,30 +361,48 @@ class ReleaseInventoryForOrder:
             f"Reserved antes: {old_quantity_reserved} → después: {inventory.quantity_reserved}"
         )
     
-    def _emit_websocket_event(self, released_item: Dict):
-        """Emite evento WebSocket de liberación de inventario."""
-        try:
-            from src.websockets.websocket_manager import InventoryNotifier
-            from src.commands.get_stock_levels import GetStockLevels
-            
-            # Obtener stock actualizado (con el cálculo correcto de disponible)
-            stock_command = GetStockLevels(
-                product_sku=released_item['product_sku'],
-                include_reserved=True,
-                include_in_transit=False
-            )
-            stock_data = stock_command.execute()
-            
-            # Emitir notificación WebSocket
-            InventoryNotifier.notify_stock_change(
-                product_sku=released_item['product_sku'],
-                stock_data=stock_data,
-                change_type=InventoryChangeType.RESERVATION_RELEASED
-            )
-            
-            logger.info(
-                f"📡 WebSocket: Notificado liberación de stock para {released_item['product_sku']} "
-                f"(disponible: {stock_data.get('total_available')})"
+    def _release_item_in_ledger(self, product_sku: str, quantity: int, distribution_center_id: int):
+        """Agrega la liberación como movimiento del ledger (hasta lo reservado)."""
+        lock_balance(product_sku, distribution_center_id)
+        balance = get_balance(product_sku, distribution_center_id)
+        _, delta_reserved, _ = movement_deltas(InventoryMovement.TYPE_RELEASE, quantity, balance)
+        if -delta_reserved < quantity:
+            logger.warning(
+                f"⚠️ Intentando liberar {quantity} unidades de {product_sku}, "
+                f"pero solo hay {balance['quantity_reserved']} reservadas. "
+                f"Liberando solo {-delta_reserved}."
             )
-        except Exception as e:
-            logger.warning(f"⚠️ Error emitiendo evento WebSocket: {str(e)}")
+        append_movement(
+            product_sku,
+            distribution_center_id,
+            InventoryMovement.TYPE_RELEASE,
+            delta_reserved=delta_reserved,
+            reference=str(self.order_id)
+        )
+        
+        self.released_items.append({
+            'product_sku': product_sku,
+            'quantity_released': -delta_reserved,
+            'distribution_center_id': distribution_center_id,
+            'quantity_reserved_before': balance['quantity_reserved'],
+            'quantity_reserved_after': balance['quantity_reserved'] + delta_reserved,
+            'quantity_available': balance['quantity_available']
+        })
+        
+        logger.info(f"📒 Liberación en ledger: {product_sku} - Cantidad: {-delta_reserved} - Orden: {self.order_id}")
+
+
+def _record_reservation_event(inventory: Inventory, change_type: str, old_quantity_reserved: int, order_id):
+    """
+    Escribe en el outbox de la transacción actual el cambio de stock
+    disponible para venta (disponible - reservado) de la fila de inventario.
+    """
+    record_outbox_event(InventoryEvent(
+        product_sku=inventory.product_sku,
+        change_type=change_type,
+        previous_quantity=inventory.quantity_available - old_quantity_reserved,
+        new_quantity=inventory.quantity_available - inventory.quantity_reserved,
+        distribution_center_id=inventory.distribution_center_id,
+        distribution_center_code=inventory.distribution_center.code if inventory.distribution_center else None,
+        metadata={'order_id': str(order_id), 'inventory_id': inventory.id}
+    ))
@@ -0,0 +1,37 @@
+from src.models.product_code import CODE_TYPES
+from src.services.scanner_code_index import lookup_code
+from src.errors.errors import NotFoundError, ValidationError
+
+
+class ScanCode:
+    """
+    Comando para resolver un código escaneado (barras, QR o interno) a lote,
+    ubicación y centro de distribución con una búsqueda por índice.
+    """
+
+    def __init__(self, code, code_type=None):
+        """
+        Args:
+            code: Código leído por el escáner
+            code_type: barcode, qr_code o internal_code (opcional)
+        """
+        self.code = code
+        self.code_type = code_type
+
+    def execute(self):
+        if not self.code or not str(self.code).strip():
+            raise ValidationError("Se requiere 'code'")
+        if self.code_type and self.code_type not in CODE_TYPES:
+            raise ValidationError("code_type debe ser 'barcode', 'qr_code' o 'internal_code'")
+
+        matches, cached = lookup_code(self.code, self.code_type)
+        if not matches:
+            raise NotFoundError(f"Código {self.code} no encontrado")
+
+        return {
+            'code': str(self.code).strip(),
+            'code_type': self.code_type,
+            'total_matches': len(matches),
+            'matches': matches,
+            'cached': cached
+        }
@@ -3,12 +3,23 @@ Background jobs para el servicio de logística.
 
 Jobs:
 - expire_cart_reservations: Expira reservas de carrito antiguas cada minuto
+- cleanup_inventory_outbox: Borra eventos de outbox ya publicados (cada hora)
+- expiry_sweep: Marca lotes vencidos y recalcula próximos a vencer (cada noche)
+- compact_inventory_ledger: Compacta el ledger de movimientos en snapshots (cada 10 segundos)
+- maintain_vehicle_positions: Crea particiones diarias de posiciones GPS y aplica la retención (cada noche)
 """
 
+import os
 import logging
+from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from src.commands.cart_reservations import ExpireCartReservationsCommand
+from src.websockets.inventory_outbox import cleanup_published
+from src.commands.expiry_sweep import SweepExpiredBatches
+from src.services.inventory_ledger import compact_ledger
+from src.models.vehicle_position import drop_position_partitions_before, ensure_position_partitions
+from src.session import db
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +51,77 @@ def expire_cart_reservations_job():
         logger.error(f"❌ Error en job de expiración de reservas: {str(e)}", exc_info=True)
 
 
+def cleanup_inventory_outbox_job():
+    """
+    Job que borra los eventos de outbox publicados que superaron la retención.
+    
+    Se ejecuta cada hora.
+    """
+    try:
+        deleted = cleanup_published()
+        if deleted > 0:
+            logger.info(f"🧹 Outbox de inventario: {deleted} eventos publicados eliminados")
+    except Exception as e:
+        logger.error(f"❌ Error en limpieza del outbox de inventario: {str(e)}", exc_info=True)
+
+
+def expiry_sweep_job():
+    """
+    Job que marca los lotes vencidos, recalcula el resumen de próximos a
+    vencer y emite el evento expiry_digest.
+    
+    Se ejecuta cada noche.
+    """
+    try:
+        logger.info("🔄 Ejecutando barrido de vencimientos...")
+        digest = SweepExpiredBatches().execute()
+        logger.info(
+            f"✅ Barrido de vencimientos: {digest['expired_batches']} lotes vencidos "
+            f"en {digest['duration_ms']} ms"
+        )
+    except Exception as e:
+        logger.error(f"❌ Error en barrido de vencimientos: {str(e)}", exc_info=True)
+
+
+def compact_inventory_ledger_job():
+    """
+    Job que suma la cola del ledger de inventario a snapshots nuevos y
+    actualiza las filas de inventory.
+    
+    Se ejecuta cada 10 segundos.
+    """
+    try:
+        result = compact_ledger()
+        if result['movements_folded'] > 0:
+            logger.debug(
+                f"Ledger de inventario: {result['movements_folded']} movimientos compactados "
+                f"en {result['keys_compacted']} SKU/centro"
+            )
+    except Exception as e:
+        logger.error(f"❌ Error compactando el ledger de inventario: {str(e)}", exc_info=True)
+
+
+def maintain_vehicle_positions_job():
+    """
+    Job que crea las particiones diarias de `vehicle_positions` de los
+    próximos días y elimina las que superaron la retención
+    (TELEMETRY_RETENTION_DAYS, default 30).
+    
+    Se ejecuta cada noche.
+    """
+    try:
+        retention_days = int(os.getenv('TELEMETRY_RETENTION_DAYS', 30))
+        today = datetime.utcnow().date()
+        ensure_position_partitions(today, days_ahead=3)
+        dropped = drop_position_partitions_before(today - timedelta(days=retention_days))
+        db.session.commit()
+        if dropped:
+            logger.info(f"🧹 Posiciones GPS: {len(dropped)} particiones eliminadas por retención")
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"❌ Error manteniendo particiones de posiciones GPS: {str(e)}", exc_info=True)
+
+
 def init_background_jobs(app):
     """
     Inicializa y configura los background jobs.
@@ -73,11 +155,71 @@ def init_background_jobs(app):
         max_instances=1  # Solo una instancia del job a la vez
     )
     
+    def run_outbox_cleanup_with_context():
+        with app.app_context():
+            cleanup_inventory_outbox_job()
+    
+    # Limpieza del outbox de inventario (cada hora)
+    scheduler.add_job(
+        func=run_outbox_cleanup_with_context,
+        trigger=CronTrigger(minute=0),
+        id='cleanup_inventory_outbox',
+        name='Limpiar outbox de inventario',
+        replace_existing=True,
+        max_instances=1
+    )
+    
+    def run_expiry_sweep_with_context():
+        with app.app_context():
+            expiry_sweep_job()
+    
+    # Barrido de vencimientos (cada noche, 00:15)
+    scheduler.add_job(
+        func=run_expiry_sweep_with_context,
+        trigger=CronTrigger(hour=0, minute=15),
+        id='expiry_sweep',
+        name='Barrido de vencimientos de lotes',
+        replace_existing=True,
+        max_instances=1
+    )
+    
+    def run_ledger_compaction_with_context():
+        with app.app_context():
+            compact_inventory_ledger_job()
+    
+    # Compactación del ledger de inventario (cada 10 segundos)
+    scheduler.add_job(
+        func=run_ledger_compaction_with_context,
+        trigger=CronTrigger(second='*/10'),
+        id='compact_inventory_ledger',
+        name='Compactar ledger de inventario',
+        replace_existing=True,
+        max_instances=1
+    )
+    
+    def run_positions_maintenance_with_context():
+        with app.app_context():
+            maintain_vehicle_positions_job()
+    
+    # Particiones y retención de posiciones GPS (cada noche, 00:05)
+    scheduler.add_job(
+        func=run_positions_maintenance_with_context,
+        trigger=CronTrigger(hour=0, minute=5),
+        id='maintain_vehicle_positions',
+        name='Mantener particiones de posiciones GPS',
+        replace_existing=True,
+        max_instances=1
+    )
+    
     # Iniciar scheduler
     scheduler.start()
     
     logger.info("✅ Background jobs iniciados correctamente")
     logger.info("  - expire_cart_reservations: Cada minuto")
+    logger.info("  - cleanup_inventory_outbox: Cada hora")
+    logger.info("  - expiry_sweep: Cada noche (00:15)")
+    logger.info("  - compact_inventory_ledger: Cada 10 segundos")
+    logger.info("  - maintain_vehicle_positions: Cada noche (00:05)")
     
     return scheduler
 
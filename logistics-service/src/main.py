@@ -1,4 +1,13 @@
 import os
+
+# eventlet debe parchear la stdlib antes de importar cualquier otro módulo
+_async_mode = os.getenv('SOCKETIO_ASYNC_MODE') or (
+    'eventlet' if os.getenv('FLASK_ENV') == 'production' else 'threading'
+)
+if _async_mode == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+
 import atexit
 from flask import Flask
 from flask_cors import CORS
@@ -8,9 +17,16 @@ from src.blueprints.websocket import websocket_bp
 from src.blueprints.routes import routes_bp, vehicles_bp
 from src.blueprints.cart import cart_bp
 from src.blueprints.visit_routes import visit_routes_bp
+from src.blueprints.picking import picking_bp
+from src.blueprints.telemetry import telemetry_bp
 from src.websockets.websocket_manager import init_socketio
+from src.websockets.inventory_event_buffer import init_inventory_event_buffer, shutdown_inventory_event_buffer
+from src.websockets.inventory_outbox import init_inventory_outbox_relay, shutdown_inventory_outbox_relay
 from src.errors.errors import register_error_handlers
 from src.jobs.background_jobs import init_background_jobs, shutdown_background_jobs
+from src.services.export_service import shutdown_render_pool
+from src.services.telemetry_ingestion import init_telemetry_buffer, shutdown_telemetry_buffer
+from src.commands.plan_visit_routes_batch import shutdown_planning_pool
 
 def create_app(config=None):
     app = Flask(__name__)
@@ -38,15 +54,30 @@ def create_app(config=None):
     app.register_blueprint(vehicles_bp)
     app.register_blueprint(cart_bp)
     app.register_blueprint(visit_routes_bp)  # Rutas de visitas a clientes
+    app.register_blueprint(picking_bp)  # Olas de picking en bodega
+    app.register_blueprint(telemetry_bp)  # Posiciones GPS de conductores
     
     # Inicializar WebSocket
     socketio = init_socketio(app)
     
-    # Inicializar background jobs
-    init_background_jobs(app)
+    # Inicializar publicación de eventos de inventario fuera del request
+    init_inventory_event_buffer(app)
+    
+    # Inicializar escritura por lotes de posiciones GPS y recálculo de ETAs
+    init_telemetry_buffer(app)
+    
+    # Inicializar background jobs y relay del outbox (con varios workers, solo en uno de ellos)
+    if os.getenv('BACKGROUND_JOBS_ENABLED', 'true').lower() in ['true', '1', 'yes']:
+        init_background_jobs(app)
+        init_inventory_outbox_relay(app)
     
     # Registrar cleanup al cerrar
     atexit.register(shutdown_background_jobs)
+    atexit.register(shutdown_inventory_event_buffer)
+    atexit.register(shutdown_inventory_outbox_relay)
+    atexit.register(shutdown_render_pool)
+    atexit.register(shutdown_telemetry_buffer)
+    atexit.register(shutdown_planning_pool)
     
     register_error_handlers(app)
     
@@ -62,5 +93,9 @@ if __name__ == '__main__':
     port = int(os.getenv('PORT', 3002))
     host = os.getenv('HOST', '0.0.0.0')
     
-    # Usar socketio.run en lugar de app.run para soportar WebSockets
-    socketio.run(app, host=host, port=port, debug=True, allow_unsafe_werkzeug=True)
+    debug = os.getenv('FLASK_ENV', 'development') == 'development'
+    
+    # Usar socketio.run en lugar de app.run para soportar WebSockets.
+    # Con async_mode='eventlet' corre sobre el servidor de eventlet.
+    run_options = {'allow_unsafe_werkzeug': True} if socketio.async_mode == 'threading' else {}
+    socketio.run(app, host=host, port=port, debug=debug, **run_options)
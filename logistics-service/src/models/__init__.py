@@ -8,3 +8,13 @@ from .route_stop import RouteStop
 from .route_assignment import RouteAssignment
 from .geocoded_address import GeocodedAddress
 from .cart_reservation import CartReservation
+from .inventory_outbox import InventoryOutboxEvent
+from .pick_wave import PickWave
+from .product_code import ProductCode
+from .near_expiry_summary import NearExpirySummary
+from .inventory_movement import InventoryMovement
+from .inventory_snapshot import InventorySnapshot
+from .inventory_adjustment_staging import InventoryAdjustmentStaging
+from .vehicle_occupancy import VehicleOccupancy
+from .vehicle_position import VehiclePosition
+from .visit_planning_job import VisitPlanningJob
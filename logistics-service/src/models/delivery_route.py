@@ -82,10 +82,22 @@ class DeliveryRoute(db.Model):
         cascade='all, delete-orphan'
     )
     
+    # Vistas de solo lectura de las mismas relaciones, cargables con
+    # selectinload (las dinámicas ejecutan una consulta por ruta)
+    stop_list = db.relationship('RouteStop', viewonly=True, order_by='RouteStop.sequence_order')
+    assignment_list = db.relationship(
+        'RouteAssignment',
+        foreign_keys='RouteAssignment.route_id',
+        viewonly=True,
+        order_by='RouteAssignment.id'
+    )
+    
     # Índices compuestos
     __table_args__ = (
         db.Index('idx_route_planned_date', 'distribution_center_id', 'planned_date', 'status'),
         db.Index('idx_route_vehicle', 'vehicle_id', 'status'),
+        # Paginación por keyset (planned_date DESC, id DESC)
+        db.Index('idx_route_planned_date_id', 'planned_date', 'id'),
     )
     
     @property
@@ -103,7 +115,10 @@ class DeliveryRoute(db.Model):
         """Calcula el porcentaje de completitud basado en paradas completadas"""
         if self.total_stops == 0:
             return 0
-        completed_stops = self.stops.filter_by(status='completed').count()
+        if 'stop_list' in self.__dict__:
+            completed_stops = sum(1 for stop in self.stop_list if stop.status == 'completed')
+        else:
+            completed_stops = self.stops.filter_by(status='completed').count()
         return (completed_stops / self.total_stops) * 100
     
     @property
@@ -169,10 +184,20 @@ class DeliveryRoute(db.Model):
             data['vehicle'] = self.vehicle.to_dict()
         
         if include_stops:
-            data['stops'] = [stop.to_dict() for stop in self.stops.order_by('sequence_order')]
+            if 'stop_list' in self.__dict__ and 'assignment_list' in self.__dict__:
+                # Con stops y asignaciones precargadas, el conteo por parada sale de un dict
+                order_counts = {}
+                for assignment in self.assignment_list:
+                    order_counts[assignment.stop_id] = order_counts.get(assignment.stop_id, 0) + 1
+                data['stops'] = [
+                    stop.to_dict(order_count=order_counts.get(stop.id, 0)) for stop in self.stop_list
+                ]
+            else:
+                data['stops'] = [stop.to_dict() for stop in self.stops.order_by('sequence_order')]
         
         if include_assignments:
-            data['assignments'] = [assignment.to_dict() for assignment in self.assignments]
+            assignments = self.assignment_list if 'assignment_list' in self.__dict__ else self.assignments
+            data['assignments'] = [assignment.to_dict() for assignment in assignments]
         
         return data
     
@@ -73,11 +73,13 @@ class Inventory(db.Model):
     
     def update_quantity_available(self, new_quantity: int, auto_notify: bool = True):
         """
-        Actualiza quantity_available y dispara evento de WebSocket si hay cambio significativo.
+        Actualiza quantity_available y, si el cambio es significativo, escribe
+        el evento en el outbox de la misma transacción. El relay lo publica
+        vía WebSocket después del commit (nada se publica si hay rollback).
         
         Args:
             new_quantity: Nueva cantidad disponible
-            auto_notify: Si True, notifica automáticamente el cambio vía WebSocket
+            auto_notify: Si True, registra el evento para notificar el cambio
         """
         from src.websockets.inventory_events import track_inventory_change
         
@@ -86,7 +88,7 @@ class Inventory(db.Model):
         self.last_movement_date = datetime.utcnow()
         
         if auto_notify:
-            # Rastrear y notificar el cambio
+            # Rastrear el cambio y dejarlo en el outbox transaccional
             track_inventory_change(
                 product_sku=self.product_sku,
                 previous_quantity=previous_quantity,
@@ -100,7 +102,8 @@ class Inventory(db.Model):
                     'quantity_reserved': self.quantity_reserved,
                     'quantity_in_transit': self.quantity_in_transit
                 },
-                auto_publish=True
+                auto_publish=True,
+                use_outbox=True
             )
     
     def __repr__(self):
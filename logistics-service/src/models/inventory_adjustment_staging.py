@@ -0,0 +1,34 @@
+"""
+Tabla de staging para ajustes masivos de inventario (conteos cíclicos).
+
+Cada importación carga sus filas con un `import_id` propio (COPY en
+PostgreSQL, inserts por lotes en otros motores), calcula la diferencia
+contra `inventory` con SQL por conjuntos y borra sus filas en la misma
+transacción: fuera de una importación en curso la tabla queda vacía.
+"""
+
+from src.session import db
+
+
+class InventoryAdjustmentStaging(db.Model):
+    """
+    Fila de un archivo de conteo: cantidad contada por SKU y centro.
+    """
+    __tablename__ = 'inventory_adjustment_staging'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    import_id = db.Column(db.String(36), nullable=False)
+    line_number = db.Column(db.Integer, nullable=False)
+
+    product_sku = db.Column(db.String(50), nullable=False)
+    # Sin FK: el centro se valida en el diff (los desconocidos se informan)
+    distribution_center_id = db.Column(db.Integer, nullable=False)
+    counted_quantity = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_adjustment_staging_import_key', 'import_id', 'product_sku', 'distribution_center_id'),
+    )
+
+    def __repr__(self):
+        return f'<InventoryAdjustmentStaging {self.import_id}:{self.line_number} {self.product_sku}>'
@@ -0,0 +1,70 @@
+"""
+Libro mayor (ledger) de movimientos de inventario.
+
+Cada movimiento (recepción, reserva, liberación, despacho, ajuste) se agrega
+como una fila nueva con sus deltas; las filas nunca se actualizan ni se
+borran. El saldo de un SKU en un centro es el último snapshot
+(`InventorySnapshot`) más la suma de los movimientos posteriores (la cola).
+"""
+
+from datetime import datetime
+from src.session import db
+
+
+class InventoryMovement(db.Model):
+    """
+    Movimiento de inventario (solo inserción).
+    """
+    __tablename__ = 'inventory_movements'
+
+    TYPE_RECEIPT = 'receipt'
+    TYPE_RESERVATION = 'reservation'
+    TYPE_RELEASE = 'release'
+    TYPE_DISPATCH = 'dispatch'
+    TYPE_ADJUSTMENT = 'adjustment'
+
+    MOVEMENT_TYPES = (TYPE_RECEIPT, TYPE_RESERVATION, TYPE_RELEASE, TYPE_DISPATCH, TYPE_ADJUSTMENT)
+
+    # El id es la posición en el ledger: los snapshots guardan hasta qué id cubren
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    product_sku = db.Column(db.String(50), nullable=False)
+    distribution_center_id = db.Column(
+        db.Integer,
+        db.ForeignKey('distribution_centers.id'),
+        nullable=False
+    )
+    movement_type = db.Column(db.String(20), nullable=False)
+
+    delta_available = db.Column(db.Integer, nullable=False, default=0)
+    delta_reserved = db.Column(db.Integer, nullable=False, default=0)
+    delta_in_transit = db.Column(db.Integer, nullable=False, default=0)
+
+    # Orden, recepción o ajuste que originó el movimiento
+    reference = db.Column(db.String(100))
+    details = db.Column(db.JSON)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Cola del ledger por SKU/centro: id > último snapshot
+        db.Index('idx_inventory_movement_sku_dc_id', 'product_sku', 'distribution_center_id', 'id'),
+        db.Index('idx_inventory_movement_reference', 'reference'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'product_sku': self.product_sku,
+            'distribution_center_id': self.distribution_center_id,
+            'movement_type': self.movement_type,
+            'delta_available': self.delta_available,
+            'delta_reserved': self.delta_reserved,
+            'delta_in_transit': self.delta_in_transit,
+            'reference': self.reference,
+            'details': self.details,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def __repr__(self):
+        return f'<InventoryMovement {self.id} {self.movement_type} {self.product_sku} DC:{self.distribution_center_id}>'
@@ -0,0 +1,80 @@
+"""
+Modelo de outbox transaccional para eventos de inventario.
+
+El evento se inserta en la misma transacción que el cambio de stock; si la
+transacción hace rollback el evento desaparece con ella. Un relay en segundo
+plano lee los eventos pendientes en orden de `id` y los publica por WebSocket.
+"""
+
+from datetime import datetime
+from src.session import db
+
+
+class InventoryOutboxEvent(db.Model):
+    """
+    Evento de inventario pendiente de publicar.
+
+    Estados:
+    - pending: escrito, aún no publicado
+    - publishing: reclamado por el relay (claimed_at); si el relay muere,
+      se vuelve a reclamar al vencer el plazo
+    - published: publicado por el relay (se borra al vencer la retención)
+    - failed: superó el máximo de intentos
+    """
+    __tablename__ = 'inventory_outbox'
+
+    STATUS_PENDING = 'pending'
+    STATUS_PUBLISHING = 'publishing'
+    STATUS_PUBLISHED = 'published'
+    STATUS_FAILED = 'failed'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    product_sku = db.Column(db.String(50), nullable=False)
+    change_type = db.Column(db.String(30), nullable=False)
+
+    # InventoryEvent.to_dict()
+    payload = db.Column(db.JSON, nullable=False)
+
+    status = db.Column(db.String(20), nullable=False, default=STATUS_PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    claimed_at = db.Column(db.DateTime)
+    published_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        # El relay drena por (status, id); la limpieza por (status, published_at)
+        db.Index('idx_inventory_outbox_status_id', 'status', 'id'),
+        db.Index('idx_inventory_outbox_status_published', 'status', 'published_at'),
+        db.Index('idx_inventory_outbox_sku_id', 'product_sku', 'id'),
+    )
+
+    @classmethod
+    def from_event(cls, event) -> 'InventoryOutboxEvent':
+        """Crea la fila de outbox para un InventoryEvent."""
+        return cls(
+            product_sku=event.product_sku,
+            change_type=event.change_type,
+            payload=event.to_dict(),
+            status=cls.STATUS_PENDING,
+            attempts=0
+        )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'product_sku': self.product_sku,
+            'change_type': self.change_type,
+            'payload': self.payload,
+            'status': self.status,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'claimed_at': self.claimed_at.isoformat() if self.claimed_at else None,
+            'published_at': self.published_at.isoformat() if self.published_at else None,
+        }
+
+    def __repr__(self):
+        return f'<InventoryOutboxEvent {self.id} {self.product_sku} {self.status}>'
@@ -0,0 +1,56 @@
+"""
+Snapshots del ledger de inventario.
+
+La compactación periódica suma la cola de movimientos de cada SKU/centro al
+último snapshot y guarda el resultado como un snapshot nuevo, junto con el
+id del último movimiento incluido. Los snapshots también son solo inserción;
+la compactación conserva los más recientes de cada SKU/centro.
+"""
+
+from datetime import datetime
+from src.session import db
+
+
+class InventorySnapshot(db.Model):
+    """
+    Saldo de un SKU en un centro hasta `last_movement_id` (inclusive).
+    """
+    __tablename__ = 'inventory_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    product_sku = db.Column(db.String(50), nullable=False)
+    distribution_center_id = db.Column(
+        db.Integer,
+        db.ForeignKey('distribution_centers.id'),
+        nullable=False
+    )
+
+    quantity_available = db.Column(db.Integer, nullable=False, default=0)
+    quantity_reserved = db.Column(db.Integer, nullable=False, default=0)
+    quantity_in_transit = db.Column(db.Integer, nullable=False, default=0)
+
+    last_movement_id = db.Column(db.Integer, nullable=False)
+    movements_folded = db.Column(db.Integer, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_inventory_snapshot_sku_dc_last', 'product_sku', 'distribution_center_id', 'last_movement_id'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'product_sku': self.product_sku,
+            'distribution_center_id': self.distribution_center_id,
+            'quantity_available': self.quantity_available,
+            'quantity_reserved': self.quantity_reserved,
+            'quantity_in_transit': self.quantity_in_transit,
+            'last_movement_id': self.last_movement_id,
+            'movements_folded': self.movements_folded,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def __repr__(self):
+        return f'<InventorySnapshot {self.product_sku} DC:{self.distribution_center_id} @{self.last_movement_id}>'
@@ -0,0 +1,57 @@
+"""
+Resumen precalculado de lotes próximos a vencer.
+
+Lo reconstruye el barrido nocturno de vencimientos: una fila por SKU, centro
+y tramo de días (0-30, 31-60, 61-90) con la cantidad de lotes disponibles,
+las unidades y la fecha de vencimiento más cercana. Los reportes de próximos
+a vencer leen esta tabla en vez de recorrer `product_batches` por fecha.
+"""
+
+from datetime import datetime
+from src.session import db
+
+
+class NearExpirySummary(db.Model):
+    """
+    Lotes disponibles por vencer, agrupados por SKU, centro y tramo.
+    """
+    __tablename__ = 'near_expiry_summary'
+
+    BUCKETS = (30, 60, 90)
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    product_sku = db.Column(db.String(50), nullable=False)
+    distribution_center_id = db.Column(
+        db.Integer,
+        db.ForeignKey('distribution_centers.id'),
+        nullable=False
+    )
+    # Límite superior del tramo en días: 30 = vence en 0-30 días, 60 = 31-60, 90 = 61-90
+    bucket_days = db.Column(db.Integer, nullable=False)
+
+    batch_count = db.Column(db.Integer, nullable=False, default=0)
+    total_quantity = db.Column(db.Integer, nullable=False, default=0)
+    earliest_expiry_date = db.Column(db.Date, nullable=False)
+
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('product_sku', 'distribution_center_id', 'bucket_days',
+                            name='uix_near_expiry_sku_dc_bucket'),
+        db.Index('idx_near_expiry_dc_bucket', 'distribution_center_id', 'bucket_days'),
+    )
+
+    def to_dict(self):
+        return {
+            'product_sku': self.product_sku,
+            'distribution_center_id': self.distribution_center_id,
+            'bucket_days': self.bucket_days,
+            'batch_count': self.batch_count,
+            'total_quantity': self.total_quantity,
+            'earliest_expiry_date': self.earliest_expiry_date.isoformat() if self.earliest_expiry_date else None,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None,
+        }
+
+    def __repr__(self):
+        return f'<NearExpirySummary {self.product_sku} DC:{self.distribution_center_id} {self.bucket_days}d>'
@@ -0,0 +1,92 @@
+"""
+Modelo de ola de picking.
+
+Una ola agrupa pedidos de un centro de distribución que se recogen en un solo
+recorrido: misma zona (refrigerada/ambiente), mismo requisito de cadena de
+frío y salidas de ruta cercanas. Guarda la secuencia de ubicaciones calculada
+y la distancia comparada con recoger pedido por pedido.
+"""
+
+from datetime import datetime
+from src.session import db
+
+
+class PickWave(db.Model):
+    """
+    Ola de picking planificada.
+
+    Estados:
+    - planned: secuencia calculada, pendiente de recoger
+    - in_progress: el operario está recogiendo
+    - completed: recogida terminada
+    - cancelled: ola anulada
+    """
+    __tablename__ = 'pick_waves'
+
+    STATUS_PLANNED = 'planned'
+    STATUS_IN_PROGRESS = 'in_progress'
+    STATUS_COMPLETED = 'completed'
+    STATUS_CANCELLED = 'cancelled'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    wave_code = db.Column(db.String(60), unique=True, nullable=False)
+
+    distribution_center_id = db.Column(
+        db.Integer,
+        db.ForeignKey('distribution_centers.id'),
+        nullable=False
+    )
+    planned_date = db.Column(db.Date, nullable=False)
+    zone_type = db.Column(db.String(50), nullable=False)  # refrigerated, ambient
+    requires_cold_chain = db.Column(db.Boolean, default=False, nullable=False)
+
+    # Primera salida de ruta de los pedidos de la ola
+    departure_time = db.Column(db.DateTime)
+
+    status = db.Column(db.String(20), nullable=False, default=STATUS_PLANNED)
+
+    orders_count = db.Column(db.Integer, nullable=False, default=0)
+    lines_count = db.Column(db.Integer, nullable=False, default=0)
+    total_units = db.Column(db.Integer, nullable=False, default=0)
+
+    # Distancias en metros: recorrido de la ola vs. un recorrido por pedido
+    total_distance_m = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    baseline_distance_m = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+
+    # Lista de paradas en orden de visita (ver PlanPickWaves)
+    sequence = db.Column(db.JSON, nullable=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_pick_wave_dc_date', 'distribution_center_id', 'planned_date', 'status'),
+    )
+
+    @property
+    def distance_saved_m(self) -> float:
+        return float(self.baseline_distance_m or 0) - float(self.total_distance_m or 0)
+
+    def to_dict(self, include_sequence=True):
+        data = {
+            'id': self.id,
+            'wave_code': self.wave_code,
+            'distribution_center_id': self.distribution_center_id,
+            'planned_date': self.planned_date.isoformat() if self.planned_date else None,
+            'zone_type': self.zone_type,
+            'requires_cold_chain': self.requires_cold_chain,
+            'departure_time': self.departure_time.isoformat() if self.departure_time else None,
+            'status': self.status,
+            'orders_count': self.orders_count,
+            'lines_count': self.lines_count,
+            'total_units': self.total_units,
+            'total_distance_m': float(self.total_distance_m or 0),
+            'baseline_distance_m': float(self.baseline_distance_m or 0),
+            'distance_saved_m': round(self.distance_saved_m, 2),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+        if include_sequence:
+            data['sequence'] = self.sequence
+        return data
+
+    def __repr__(self):
+        return f'<PickWave {self.wave_code} ({self.status})>'
@@ -56,6 +56,11 @@ class ProductBatch(db.Model):
         db.Index('idx_sku_dc_expiry', 'product_sku', 'distribution_center_id', 'expiry_date'),
         db.Index('idx_location_available', 'location_id', 'is_available'),
         db.Index('idx_expiry_available', 'expiry_date', 'is_available'),
+        # Parcial: solo lotes disponibles. El barrido nocturno marca los
+        # vencidos como no disponibles, así que salen de este índice
+        db.Index('idx_batch_available_sku_expiry', 'product_sku', 'expiry_date',
+                 postgresql_where=db.text('is_available'),
+                 sqlite_where=db.text('is_available = 1')),
     )
     
     @property
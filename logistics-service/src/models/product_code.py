@@ -0,0 +1,157 @@
+"""
+Índice de códigos escaneables de lotes (código de barras, QR y código interno).
+
+`ProductBatch` guarda los códigos en columnas sin índice; un escaneo que
+busca por `or_` sobre esas columnas recorre toda la tabla. Esta tabla tiene
+una fila por (código, tipo, lote) con índice único que empieza por `code`,
+así que un escaneo es una búsqueda por índice.
+
+Las filas se mantienen con eventos de mapper de `ProductBatch` dentro de la
+misma transacción que el lote (insert/update/delete por el ORM). Las cargas
+masivas que no pasan por el mapper (`bulk_save_objects`, SQL directo) deben
+reconstruir el índice con `rebuild_product_code_index`.
+"""
+
+from sqlalchemy import event as sa_event, func, inspect, literal, select
+from sqlalchemy.orm import object_session
+
+from src.session import db
+from src.models.product_batch import ProductBatch
+
+CODE_TYPES = ('barcode', 'qr_code', 'internal_code')
+
+# Cambios en estos campos alteran lo que resuelve un escaneo
+_RESOLUTION_FIELDS = (
+    'product_sku', 'batch_number', 'expiry_date', 'location_id', 'distribution_center_id'
+)
+
+# Marca en session.info: códigos cuyo resultado de escaneo cambió
+CHANGED_CODES_KEY = 'product_codes_changed'
+
+
+class ProductCode(db.Model):
+    """
+    Código escaneable de un lote.
+    """
+    __tablename__ = 'product_codes'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    code = db.Column(db.String(255), nullable=False)
+    code_type = db.Column(db.String(20), nullable=False)  # barcode, qr_code, internal_code
+    batch_id = db.Column(
+        db.Integer,
+        db.ForeignKey('product_batches.id', ondelete='CASCADE'),
+        nullable=False
+    )
+
+    __table_args__ = (
+        db.UniqueConstraint('code', 'code_type', 'batch_id', name='uix_product_code'),
+        db.Index('idx_product_code_batch', 'batch_id'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'code': self.code,
+            'code_type': self.code_type,
+            'batch_id': self.batch_id,
+        }
+
+    def __repr__(self):
+        return f'<ProductCode {self.code_type}:{self.code} batch:{self.batch_id}>'
+
+
+def normalize_code(value):
+    """Código tal como se indexa: sin espacios alrededor; vacío → None."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _mark_changed(target, codes):
+    codes = {code for code in codes if code}
+    session = object_session(target)
+    if codes and session is not None:
+        session.info.setdefault(CHANGED_CODES_KEY, set()).update(codes)
+
+
+@sa_event.listens_for(ProductBatch, 'after_insert')
+def _index_codes_after_insert(mapper, connection, target):
+    rows = [
+        {'code': code, 'code_type': code_type, 'batch_id': target.id}
+        for code_type in CODE_TYPES
+        for code in [normalize_code(getattr(target, code_type))]
+        if code
+    ]
+    if rows:
+        connection.execute(ProductCode.__table__.insert(), rows)
+        _mark_changed(target, [row['code'] for row in rows])
+
+
+@sa_event.listens_for(ProductBatch, 'after_update')
+def _index_codes_after_update(mapper, connection, target):
+    state = inspect(target)
+    table = ProductCode.__table__
+    changed = []
+
+    for code_type in CODE_TYPES:
+        history = state.attrs[code_type].history
+        if not history.has_changes():
+            continue
+        # El valor anterior no está en el historial si el atributo estaba
+        # expirado; se leen los códigos indexados del lote
+        old = set(connection.execute(
+            select(table.c.code).where(table.c.batch_id == target.id, table.c.code_type == code_type)
+        ).scalars())
+        new = normalize_code(getattr(target, code_type))
+        stale = old - {new}
+        if stale:
+            connection.execute(
+                table.delete().where(
+                    table.c.batch_id == target.id,
+                    table.c.code_type == code_type,
+                    table.c.code.in_(stale)
+                )
+            )
+        if new and new not in old:
+            connection.execute(table.insert(), [{'code': new, 'code_type': code_type, 'batch_id': target.id}])
+        changed.extend(stale)
+        changed.append(new)
+
+    if any(state.attrs[field].history.has_changes() for field in _RESOLUTION_FIELDS):
+        changed.extend(normalize_code(getattr(target, code_type)) for code_type in CODE_TYPES)
+
+    _mark_changed(target, changed)
+
+
+@sa_event.listens_for(ProductBatch, 'before_delete')
+def _unindex_codes_before_delete(mapper, connection, target):
+    table = ProductCode.__table__
+    connection.execute(table.delete().where(table.c.batch_id == target.id))
+    _mark_changed(target, [normalize_code(getattr(target, code_type)) for code_type in CODE_TYPES])
+
+
+def rebuild_product_code_index() -> dict:
+    """
+    Reconstruye todo el índice desde `product_batches` con un INSERT ... SELECT
+    por tipo de código. No hace commit.
+
+    Returns:
+        Filas indexadas por tipo de código
+    """
+    table = ProductCode.__table__
+    db.session.execute(table.delete())
+
+    counts = {}
+    for code_type in CODE_TYPES:
+        column = func.trim(getattr(ProductBatch, code_type))
+        result = db.session.execute(
+            table.insert().from_select(
+                ['code', 'code_type', 'batch_id'],
+                select(column, literal(code_type), ProductBatch.id)
+                .where(getattr(ProductBatch, code_type).isnot(None), column != '')
+            )
+        )
+        counts[code_type] = result.rowcount
+    return counts
@@ -128,8 +128,15 @@ class RouteStop(db.Model):
         """Cuenta cuántos pedidos se entregan en esta parada"""
         return self.assignments.count()
     
-    def to_dict(self, include_assignments=False):
-        """Convierte la parada a diccionario"""
+    def to_dict(self, include_assignments=False, order_count=None):
+        """
+        Convierte la parada a diccionario.
+        
+        Args:
+            include_assignments: Incluir las asignaciones de la parada
+            order_count: Pedidos de la parada ya contados por quien llama
+                (evita una consulta COUNT por parada)
+        """
         data = {
             'id': self.id,
             'route_id': self.route_id,
@@ -189,7 +196,7 @@ class RouteStop(db.Model):
                 'has_issues': self.has_issues,
                 'description': self.issue_description,
             } if self.has_issues else None,
-            'order_count': self.order_count,
+            'order_count': self.order_count if order_count is None else order_count,
             'notes': self.notes,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
@@ -0,0 +1,144 @@
+"""
+Calendario de ocupación de vehículos: una fila por ruta activa o en progreso
+(vehículo, fecha, ruta).
+
+Responder "qué vehículos están libres el día D en el centro X" es un
+anti-join de `vehicles` contra esta tabla por (vehicle_id, planned_date),
+una búsqueda por índice, en lugar de contar rutas vehículo por vehículo.
+
+Las filas se mantienen con eventos de mapper de `DeliveryRoute` dentro de la
+misma transacción que la ruta (alta, cambio de estado, vehículo o fecha,
+cancelación, borrado). Los cambios que no pasan por el ORM (`query.update`,
+SQL directo) deben reconstruir el calendario con `rebuild_vehicle_occupancy`.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import event as sa_event, exists, inspect, select
+
+from src.session import db
+from src.models.delivery_route import DeliveryRoute
+from src.models.vehicle import Vehicle
+
+# Estados de ruta que ocupan el vehículo en su fecha
+OCCUPYING_STATUSES = ('active', 'in_progress')
+
+_OCCUPANCY_FIELDS = ('status', 'vehicle_id', 'planned_date', 'distribution_center_id')
+
+
+class VehicleOccupancy(db.Model):
+    """
+    Día ocupado de un vehículo por una ruta.
+    """
+    __tablename__ = 'vehicle_occupancy'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicles.id'), nullable=False)
+    planned_date = db.Column(db.Date, nullable=False)
+    route_id = db.Column(
+        db.Integer,
+        db.ForeignKey('delivery_routes.id', ondelete='CASCADE'),
+        nullable=False,
+        unique=True
+    )
+    distribution_center_id = db.Column(db.Integer, nullable=False)
+    route_status = db.Column(db.String(50), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_vehicle_occupancy_vehicle_date', 'vehicle_id', 'planned_date'),
+        db.Index('idx_vehicle_occupancy_dc_date', 'distribution_center_id', 'planned_date'),
+    )
+
+    def to_dict(self):
+        return {
+            'vehicle_id': self.vehicle_id,
+            'planned_date': self.planned_date.isoformat() if self.planned_date else None,
+            'route_id': self.route_id,
+            'distribution_center_id': self.distribution_center_id,
+            'route_status': self.route_status,
+        }
+
+    def __repr__(self):
+        return f'<VehicleOccupancy vehicle:{self.vehicle_id} {self.planned_date} route:{self.route_id}>'
+
+
+def _occupancy_row(route):
+    return {
+        'vehicle_id': route.vehicle_id,
+        'planned_date': route.planned_date,
+        'route_id': route.id,
+        'distribution_center_id': route.distribution_center_id,
+        'route_status': route.status,
+        'updated_at': datetime.utcnow(),
+    }
+
+
+@sa_event.listens_for(DeliveryRoute, 'after_insert')
+def _occupy_after_insert(mapper, connection, target):
+    if target.status in OCCUPYING_STATUSES:
+        connection.execute(VehicleOccupancy.__table__.insert(), [_occupancy_row(target)])
+
+
+@sa_event.listens_for(DeliveryRoute, 'after_update')
+def _occupy_after_update(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in _OCCUPANCY_FIELDS):
+        return
+
+    table = VehicleOccupancy.__table__
+    connection.execute(table.delete().where(table.c.route_id == target.id))
+    if target.status in OCCUPYING_STATUSES:
+        connection.execute(table.insert(), [_occupancy_row(target)])
+
+
+@sa_event.listens_for(DeliveryRoute, 'before_delete')
+def _release_before_delete(mapper, connection, target):
+    table = VehicleOccupancy.__table__
+    connection.execute(table.delete().where(table.c.route_id == target.id))
+
+
+def available_vehicles_query(distribution_center_id: int, planned_date):
+    """
+    Vehículos del centro con `is_available` y sin ruta activa o en progreso
+    en la fecha: un anti-join (NOT EXISTS) contra el calendario.
+    """
+    occupied = exists().where(
+        VehicleOccupancy.vehicle_id == Vehicle.id,
+        VehicleOccupancy.planned_date == planned_date
+    )
+    return (
+        db.session.query(Vehicle)
+        .filter(
+            Vehicle.home_distribution_center_id == distribution_center_id,
+            Vehicle.is_available == True,
+            ~occupied
+        )
+        .order_by(Vehicle.id)
+    )
+
+
+def rebuild_vehicle_occupancy() -> int:
+    """
+    Reconstruye el calendario desde `delivery_routes` con un INSERT ... SELECT.
+    No hace commit.
+
+    Returns:
+        Filas insertadas
+    """
+    table = VehicleOccupancy.__table__
+    db.session.execute(table.delete())
+    result = db.session.execute(
+        table.insert().from_select(
+            ['vehicle_id', 'planned_date', 'route_id', 'distribution_center_id', 'route_status', 'updated_at'],
+            select(
+                DeliveryRoute.vehicle_id,
+                DeliveryRoute.planned_date,
+                DeliveryRoute.id,
+                DeliveryRoute.distribution_center_id,
+                DeliveryRoute.status,
+                DeliveryRoute.updated_at
+            ).where(DeliveryRoute.status.in_(OCCUPYING_STATUSES))
+        )
+    )
+    return result.rowcount
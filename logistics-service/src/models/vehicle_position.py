@@ -0,0 +1,192 @@
+"""
+Historial de posiciones GPS de los vehículos (telemetría de conductores).
+
+Es una tabla de solo inserción y alto volumen: cada conductor activo envía
+una posición cada pocos segundos. Las filas se escriben por lotes desde el
+buffer de telemetría (src/services/telemetry_ingestion.py); la última
+posición de cada vehículo se copia además a `vehicles`.
+
+En PostgreSQL la tabla se crea particionada por rango de `recorded_at`
+(una partición por día, create_vehicle_positions_table.py) para que la
+retención sea un DROP de particiones viejas y no un DELETE masivo. Una
+partición DEFAULT recibe las filas sin partición diaria (por ejemplo, si el
+job de particiones se atrasó): al crear la partición del día, sus filas se
+mueven desde la DEFAULT. En otros motores (SQLite en tests) es una tabla
+normal.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import List
+
+from sqlalchemy import text
+
+from src.session import db
+
+POSITIONS_TABLE = 'vehicle_positions'
+DEFAULT_PARTITION = f'{POSITIONS_TABLE}_default'
+
+
+class VehiclePosition(db.Model):
+    """
+    Posición reportada por el conductor de un vehículo.
+    """
+    __tablename__ = POSITIONS_TABLE
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    vehicle_id = db.Column(db.Integer, nullable=False)
+    route_id = db.Column(db.Integer)  # Ruta activa del vehículo al momento del ping (si se conoce)
+
+    latitude = db.Column(db.Numeric(10, 7), nullable=False)
+    longitude = db.Column(db.Numeric(10, 7), nullable=False)
+    speed_kmh = db.Column(db.Numeric(6, 2))
+    heading = db.Column(db.Numeric(5, 2))  # Grados (0-360)
+    accuracy_m = db.Column(db.Numeric(7, 2))
+
+    recorded_at = db.Column(db.DateTime, nullable=False)  # Hora del dispositivo (UTC)
+    received_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_vehicle_position_vehicle_time', 'vehicle_id', 'recorded_at'),
+        db.Index('idx_vehicle_position_route_time', 'route_id', 'recorded_at'),
+    )
+
+    def to_dict(self):
+        return {
+            'vehicle_id': self.vehicle_id,
+            'route_id': self.route_id,
+            'latitude': float(self.latitude) if self.latitude is not None else None,
+            'longitude': float(self.longitude) if self.longitude is not None else None,
+            'speed_kmh': float(self.speed_kmh) if self.speed_kmh is not None else None,
+            'heading': float(self.heading) if self.heading is not None else None,
+            'accuracy_m': float(self.accuracy_m) if self.accuracy_m is not None else None,
+            'recorded_at': self.recorded_at.isoformat() if self.recorded_at else None,
+        }
+
+    def __repr__(self):
+        return f'<VehiclePosition vehicle:{self.vehicle_id} {self.recorded_at}>'
+
+
+# ----------------------------------------------------------------------
+# Particiones diarias (solo PostgreSQL)
+# ----------------------------------------------------------------------
+
+_PARTITIONED_DDL = f"""
+CREATE TABLE IF NOT EXISTS {POSITIONS_TABLE} (
+    id BIGSERIAL,
+    vehicle_id INTEGER NOT NULL,
+    route_id INTEGER,
+    latitude NUMERIC(10, 7) NOT NULL,
+    longitude NUMERIC(10, 7) NOT NULL,
+    speed_kmh NUMERIC(6, 2),
+    heading NUMERIC(5, 2),
+    accuracy_m NUMERIC(7, 2),
+    recorded_at TIMESTAMP NOT NULL,
+    received_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, recorded_at)
+) PARTITION BY RANGE (recorded_at)
+"""
+
+_PARTITIONED_INDEXES = (
+    f"CREATE INDEX IF NOT EXISTS idx_vehicle_position_vehicle_time ON {POSITIONS_TABLE} (vehicle_id, recorded_at)",
+    f"CREATE INDEX IF NOT EXISTS idx_vehicle_position_route_time ON {POSITIONS_TABLE} (route_id, recorded_at)",
+)
+
+
+def partition_name(day: date) -> str:
+    return f"{POSITIONS_TABLE}_{day.strftime('%Y%m%d')}"
+
+
+def _is_postgresql() -> bool:
+    return db.engine.dialect.name == 'postgresql'
+
+
+def create_partitioned_positions_table():
+    """
+    Crea la tabla particionada por `recorded_at` en PostgreSQL; en otros
+    motores la crea como tabla normal. No hace commit.
+    """
+    if not _is_postgresql():
+        VehiclePosition.__table__.create(db.engine, checkfirst=True)
+        return
+    db.session.execute(text(_PARTITIONED_DDL))
+    db.session.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {POSITIONS_TABLE} DEFAULT"
+    ))
+    for ddl in _PARTITIONED_INDEXES:
+        db.session.execute(text(ddl))
+
+
+def ensure_position_partitions(start: date = None, days_ahead: int = 3) -> List[str]:
+    """
+    Crea las particiones diarias de `start` (hoy por defecto) a
+    `start + days_ahead`. Las filas de ese día que hayan caído en la
+    partición DEFAULT se mueven a la nueva antes de adjuntarla (con filas
+    del rango en la DEFAULT, CREATE ... PARTITION OF fallaría). No-op fuera
+    de PostgreSQL. No hace commit.
+
+    Returns:
+        Nombres de las particiones verificadas
+    """
+    if not _is_postgresql():
+        return []
+
+    start = start or datetime.utcnow().date()
+    names = []
+    for offset in range(days_ahead + 1):
+        day = start + timedelta(days=offset)
+        name = partition_name(day)
+        names.append(name)
+        if db.session.execute(text("SELECT to_regclass(:name)"), {'name': name}).scalar():
+            continue
+
+        bounds = {'start': day, 'end': day + timedelta(days=1)}
+        db.session.execute(text(
+            f"CREATE TABLE {name} (LIKE {POSITIONS_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        db.session.execute(text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE recorded_at >= :start AND recorded_at < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ), bounds)
+        db.session.execute(text(
+            f"ALTER TABLE {POSITIONS_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+        ))
+    return names
+
+
+def drop_position_partitions_before(cutoff: date) -> List[str]:
+    """
+    Elimina las particiones diarias anteriores a `cutoff` (retención) y
+    borra las filas anteriores de la partición DEFAULT. Fuera de PostgreSQL
+    borra las filas. No hace commit.
+
+    Returns:
+        Particiones eliminadas (vacío fuera de PostgreSQL)
+    """
+    if not _is_postgresql():
+        db.session.execute(
+            VehiclePosition.__table__.delete().where(
+                VehiclePosition.recorded_at < datetime.combine(cutoff, datetime.min.time())
+            )
+        )
+        return []
+
+    rows = db.session.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+        "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+        "WHERE parent.relname = :parent"
+    ), {'parent': POSITIONS_TABLE}).scalars().all()
+
+    db.session.execute(
+        text(f"DELETE FROM {DEFAULT_PARTITION} WHERE recorded_at < :cutoff"),
+        {'cutoff': datetime.combine(cutoff, datetime.min.time())}
+    )
+
+    dropped = []
+    for name in sorted(rows):
+        if name != DEFAULT_PARTITION and name < partition_name(cutoff):
+            db.session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+    return dropped
@@ -0,0 +1,90 @@
+"""
+Trabajo de planificación masiva de rutas de visitas (todos los vendedores de
+una fecha).
+
+El endpoint de lote responde con el ID del trabajo; la planificación corre en
+segundo plano y va guardando aquí el avance por vendedor, de modo que
+cualquier worker puede responder la consulta de progreso.
+"""
+
+from datetime import datetime
+
+from src.session import db
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_COMPLETED = 'completed'
+STATUS_PARTIAL = 'partial'  # Terminó con vendedores fallidos
+STATUS_FAILED = 'failed'
+
+FINISHED_STATUSES = (STATUS_COMPLETED, STATUS_PARTIAL, STATUS_FAILED)
+
+
+class VisitPlanningJob(db.Model):
+    """
+    Avance de un lote de rutas de visitas. `progress` guarda una entrada por
+    vendedor: {salesperson_id: {status, customers, route_id, route_code, metrics, warnings, errors}}.
+    """
+    __tablename__ = 'visit_planning_jobs'
+
+    id = db.Column(db.String(32), primary_key=True)
+    planned_date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=STATUS_QUEUED, index=True)
+
+    total_salespeople = db.Column(db.Integer, nullable=False, default=0)
+    completed_salespeople = db.Column(db.Integer, nullable=False, default=0)
+    failed_salespeople = db.Column(db.Integer, nullable=False, default=0)
+    progress = db.Column(db.JSON, nullable=False, default=dict)
+    warnings = db.Column(db.JSON, nullable=False, default=list)
+    error = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    created_by = db.Column(db.String(100))
+
+    @property
+    def is_finished(self):
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def progress_percentage(self):
+        if not self.total_salespeople:
+            return 100.0 if self.is_finished else 0.0
+        done = self.completed_salespeople + self.failed_salespeople
+        return round(done / self.total_salespeople * 100, 1)
+
+    def set_salesperson_progress(self, salesperson_id, **fields):
+        """Actualiza la entrada de un vendedor (reasigna el JSON para que se detecte el cambio)."""
+        progress = dict(self.progress or {})
+        entry = dict(progress.get(str(salesperson_id), {}))
+        entry.update(fields)
+        progress[str(salesperson_id)] = entry
+        self.progress = progress
+
+    def to_dict(self):
+        elapsed = None
+        if self.started_at:
+            elapsed = ((self.finished_at or datetime.utcnow()) - self.started_at).total_seconds()
+        return {
+            'job_id': self.id,
+            'planned_date': self.planned_date.isoformat() if self.planned_date else None,
+            'status': self.status,
+            'total_salespeople': self.total_salespeople,
+            'completed_salespeople': self.completed_salespeople,
+            'failed_salespeople': self.failed_salespeople,
+            'progress_percentage': self.progress_percentage,
+            'salespeople': [
+                {'salesperson_id': int(salesperson_id), **entry}
+                for salesperson_id, entry in sorted((self.progress or {}).items(), key=lambda item: int(item[0]))
+            ],
+            'warnings': self.warnings or [],
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'elapsed_seconds': round(elapsed, 2) if elapsed is not None else None,
+        }
+
+    def __repr__(self):
+        return f'<VisitPlanningJob {self.id} ({self.status})>'
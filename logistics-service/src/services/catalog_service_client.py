@@ -0,0 +1,154 @@
+"""
+Cliente HTTP para consultar datos de productos en catalog-service.
+
+Logística solo conoce SKUs; la categoría del producto (para enrutar
+notificaciones por categoría) vive en el catálogo. Los SKUs faltantes se
+resuelven con una sola llamada a POST /products/batch y las respuestas se
+cachean en memoria con TTL, incluyendo los SKUs no encontrados.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.services.sales_service_client import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogServiceClient:
+    """
+    Cliente HTTP para catalog-service con caché de categorías por SKU.
+    """
+
+    CATALOG_SERVICE_URL = os.getenv('CATALOG_SERVICE_URL', 'http://localhost:3001')
+
+    # Timeouts cortos: se usa al enrutar notificaciones
+    CONNECTION_TIMEOUT = float(os.getenv('CATALOG_SERVICE_TIMEOUT', '1'))
+    READ_TIMEOUT = float(os.getenv('CATALOG_SERVICE_READ_TIMEOUT', '2'))
+
+    CATEGORY_CACHE_TTL = int(os.getenv('CATALOG_CATEGORY_CACHE_TTL', '600'))
+    CATEGORY_BATCH_SIZE = 500
+
+    def __init__(self):
+        self.base_url = self.CATALOG_SERVICE_URL.rstrip('/')
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.circuit_breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=30)
+        self._category_cache: Dict[str, tuple] = {}
+        self._prefetching: set = set()
+        self._lock = threading.Lock()
+
+    def _get_products_batch(self, skus: List[str]) -> Dict:
+        def _execute_request():
+            response = self.session.post(
+                f"{self.base_url}/products/batch",
+                json={'skus': skus, 'fields': ['category']},
+                timeout=(self.CONNECTION_TIMEOUT, self.READ_TIMEOUT)
+            )
+            response.raise_for_status()
+            return response.json()
+
+        return self.circuit_breaker.call(_execute_request)
+
+    def get_product_categories(
+        self,
+        skus: Iterable[str],
+        fetch_missing: bool = True,
+        prefetch: bool = True
+    ) -> Dict[str, Optional[str]]:
+        """
+        Obtiene la categoría de cada SKU (None si no existe o no se pudo consultar).
+
+        Args:
+            skus: SKUs a resolver
+            fetch_missing: Si False, no espera al catálogo: devuelve solo lo
+                cacheado y resuelve los faltantes en un hilo aparte
+            prefetch: Con fetch_missing=False, si False tampoco lanza el hilo
+                (el llamador resolverá los faltantes por su cuenta)
+
+        Returns:
+            {sku: categoría}
+        """
+        now = time.time()
+        result: Dict[str, Optional[str]] = {}
+        missing = []
+
+        with self._lock:
+            for sku in {s.upper() for s in skus}:
+                cached = self._category_cache.get(sku)
+                if cached is not None and cached[1] > now:
+                    result[sku] = cached[0]
+                else:
+                    missing.append(sku)
+
+        if missing and fetch_missing:
+            result.update(self._fetch_categories(missing))
+        elif missing and prefetch:
+            self._prefetch_categories(missing)
+
+        return result
+
+    def _fetch_categories(self, skus: List[str]) -> Dict[str, Optional[str]]:
+        """Consulta las categorías en lotes de CATEGORY_BATCH_SIZE y las cachea."""
+        result: Dict[str, Optional[str]] = {}
+
+        for start in range(0, len(skus), self.CATEGORY_BATCH_SIZE):
+            chunk = skus[start:start + self.CATEGORY_BATCH_SIZE]
+            try:
+                data = self._get_products_batch(chunk)
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudieron obtener las categorías de {len(chunk)} SKUs: {str(e)}")
+                result.update({sku: None for sku in chunk})
+                continue
+
+            products = {sku.upper(): product for sku, product in (data.get('products') or {}).items()}
+            expires_at = time.time() + self.CATEGORY_CACHE_TTL
+            with self._lock:
+                for sku in chunk:
+                    category = (products.get(sku) or {}).get('category')
+                    result[sku] = category
+                    self._category_cache[sku] = (category, expires_at)
+
+        return result
+
+    def _prefetch_categories(self, skus: List[str]):
+        with self._lock:
+            pending = [sku for sku in skus if sku not in self._prefetching]
+            self._prefetching.update(pending)
+        if not pending:
+            return
+
+        def _run():
+            try:
+                self._fetch_categories(pending)
+            finally:
+                with self._lock:
+                    self._prefetching.difference_update(pending)
+
+        threading.Thread(target=_run, name='catalog-category-prefetch', daemon=True).start()
+
+    def clear_cache(self):
+        with self._lock:
+            self._category_cache.clear()
+
+
+# Instancia singleton del cliente
+_client_instance = None
+
+
+def get_catalog_service_client() -> CatalogServiceClient:
+    """Retorna instancia singleton del cliente."""
+    global _client_instance
+
+    if _client_instance is None:
+        _client_instance = CatalogServiceClient()
+
+    return _client_instance
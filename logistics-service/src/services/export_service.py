@@ -1,552 +1,860 @@
-"""
-Servicio de exportación de rutas a PDF y CSV.
-
-Este módulo proporciona funcionalidades para exportar rutas de entrega
-en diferentes formatos para conductores y personal logístico.
-"""
-
-import os
-import io
-import csv
-import logging
-from datetime import datetime
-
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.units import inch
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-)
-from reportlab.lib import colors
-
-from src.models.delivery_route import DeliveryRoute
-from src.models.route_stop import RouteStop
-from src.models.route_assignment import RouteAssignment
-from src.models.vehicle import Vehicle
-from src.session import Session
-
-logger = logging.getLogger(__name__)
-
-
-class ExportService:
-    """
-    Servicio para exportar rutas en diferentes formatos.
-    
-    Formatos soportados:
-    - PDF: Hoja de ruta detallada para conductores
-    - CSV: Datos tabulares para análisis
-    - JSON: Datos estructurados (ya implementado en to_dict())
-    """
-    
-    # URL para Google Static Maps API
-    GOOGLE_MAPS_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY', '')
-    STATIC_MAPS_BASE_URL = 'https://maps.googleapis.com/maps/api/staticmap'
-    
-    @staticmethod
-    def export_route_to_pdf(route_id: int) -> bytes:
-        """
-        Exporta una ruta a PDF con formato profesional.
-        
-        El PDF incluye:
-        - Encabezado con información del vehículo y conductor
-        - Lista secuencial de paradas con detalles
-        - Mapa estático de la ruta (si API key disponible)
-        - Instrucciones especiales
-        - Footer con fecha de generación
-        
-        Args:
-            route_id: ID de la ruta a exportar
-        
-        Returns:
-            bytes: Contenido del PDF
-        
-        Raises:
-            ValueError: Si la ruta no existe
-        """
-        # Obtener ruta con todas las relaciones
-        route = Session.query(DeliveryRoute).filter_by(id=route_id).first()
-        
-        if not route:
-            raise ValueError(f"Ruta {route_id} no encontrada")
-        
-        # Obtener vehículo
-        vehicle = Session.query(Vehicle).filter_by(id=route.vehicle_id).first()
-        
-        # Obtener paradas ordenadas
-        stops = Session.query(RouteStop).filter_by(
-            route_id=route_id
-        ).order_by(RouteStop.sequence_order).all()
-        
-        # Crear buffer para PDF
-        buffer = io.BytesIO()
-        
-        # Crear documento PDF
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=letter,
-            rightMargin=0.5*inch,
-            leftMargin=0.5*inch,
-            topMargin=0.5*inch,
-            bottomMargin=0.5*inch
-        )
-        
-        # Estilos
-        styles = getSampleStyleSheet()
-        
-        # Estilo personalizado para título
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            textColor=colors.HexColor('#1a237e'),
-            spaceAfter=12,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        # Estilo para subtítulos
-        subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#283593'),
-            spaceAfter=10,
-            fontName='Helvetica-Bold'
-        )
-        
-        # Estilo para texto normal
-        normal_style = styles['Normal']
-        
-        # Construir elementos del PDF
-        elements = []
-        
-        # ========== ENCABEZADO ==========
-        elements.append(Paragraph("🚚 HOJA DE RUTA DE ENTREGA", title_style))
-        elements.append(Spacer(1, 0.2*inch))
-        
-        # Información general en tabla
-        general_info = [
-            ['Código de Ruta:', route.route_code or f"ROUTE-{route.id}"],
-            ['Fecha Planeada:', route.planned_date.strftime('%d/%m/%Y') if route.planned_date else 'N/A'],
-            ['Estado:', route.status.upper()],
-            ['Generado:', datetime.now().strftime('%d/%m/%Y %H:%M')]
-        ]
-        
-        general_table = Table(general_info, colWidths=[2*inch, 4*inch])
-        general_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e3f2fd')),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#1565c0')),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
-        
-        elements.append(general_table)
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # ========== INFORMACIÓN DEL VEHÍCULO ==========
-        if vehicle:
-            elements.append(Paragraph("🚐 INFORMACIÓN DEL VEHÍCULO", subtitle_style))
-            elements.append(Spacer(1, 0.1*inch))
-            
-            vehicle_info = [
-                ['Placa:', vehicle.plate or 'N/A'],
-                ['Tipo:', vehicle.vehicle_type or 'N/A'],
-                ['Conductor:', vehicle.driver_name or 'N/A'],
-                ['Teléfono:', vehicle.driver_phone or 'N/A'],
-                ['Capacidad:', f"{vehicle.capacity_kg} kg / {vehicle.capacity_m3} m³" if vehicle.capacity_kg else 'N/A'],
-                ['Refrigeración:', '✅ Sí' if vehicle.has_refrigeration else '❌ No']
-            ]
-            
-            vehicle_table = Table(vehicle_info, colWidths=[2*inch, 4*inch])
-            vehicle_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#fff3e0')),
-                ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#e65100')),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ]))
-            
-            elements.append(vehicle_table)
-            elements.append(Spacer(1, 0.3*inch))
-        
-        # ========== RESUMEN DE LA RUTA ==========
-        elements.append(Paragraph("📊 RESUMEN DE LA RUTA", subtitle_style))
-        elements.append(Spacer(1, 0.1*inch))
-        
-        summary_info = [
-            ['Total de Paradas:', str(route.total_stops or len(stops))],
-            ['Total de Pedidos:', str(route.total_orders or 0)],
-            ['Distancia Total:', f"{route.total_distance_km or 0:.2f} km" if route.total_distance_km else 'N/A'],
-            ['Duración Estimada:', f"{route.estimated_duration_minutes or 0} minutos" if route.estimated_duration_minutes else 'N/A'],
-            ['Cadena de Frío:', '✅ Sí' if route.has_cold_chain_products else '❌ No'],
-            ['Score de Optimización:', f"{route.optimization_score or 0:.1f}/100" if route.optimization_score else 'N/A']
-        ]
-        
-        summary_table = Table(summary_info, colWidths=[2*inch, 4*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8f5e9')),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#2e7d32')),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 8),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
-        
-        elements.append(summary_table)
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # ========== LISTA DE PARADAS ==========
-        elements.append(Paragraph("📍 PARADAS DE ENTREGA", subtitle_style))
-        elements.append(Spacer(1, 0.1*inch))
-        
-        if stops:
-            for stop in stops:
-                # Obtener asignaciones de esta parada
-                assignments = Session.query(RouteAssignment).filter_by(
-                    stop_id=stop.id
-                ).all()
-                
-                # Encabezado de parada
-                stop_header = f"<b>Parada #{stop.sequence_order}</b> - {stop.customer_name or 'Cliente'}"
-                if stop.clinical_priority:
-                    priority_text = {1: '🔴 CRÍTICO', 2: '🟡 ALTO', 3: '🟢 NORMAL'}.get(stop.clinical_priority, '')
-                    stop_header += f" ({priority_text})"
-                
-                elements.append(Paragraph(stop_header, styles['Heading3']))
-                elements.append(Spacer(1, 0.05*inch))
-                
-                # Detalles de parada
-                stop_details = [
-                    ['📍 Dirección:', stop.delivery_address or 'N/A'],
-                    ['🏙️ Ciudad:', stop.city or 'N/A'],
-                    ['🕐 Ventana de Entrega:', 
-                     f"{stop.time_window_start.strftime('%H:%M') if stop.time_window_start else 'N/A'} - "
-                     f"{stop.time_window_end.strftime('%H:%M') if stop.time_window_end else 'N/A'}"],
-                    ['⏰ Llegada Estimada:', 
-                     stop.estimated_arrival_time.strftime('%H:%M') if stop.estimated_arrival_time else 'N/A'],
-                    ['📦 Pedidos:', ', '.join([a.order_number for a in assignments]) if assignments else 'N/A'],
-                    ['⚖️ Peso Total:', 
-                     f"{sum([a.total_weight_kg or 0 for a in assignments]):.2f} kg" if assignments else 'N/A'],
-                ]
-                
-                # Agregar instrucciones especiales si existen
-                if stop.notes:
-                    stop_details.append(['📝 Instrucciones:', stop.notes])
-                
-                stop_table = Table(stop_details, colWidths=[1.8*inch, 5*inch])
-                stop_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f5f5f5')),
-                    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 8),
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.lightgrey),
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                    ('TOPPADDING', (0, 0), (-1, -1), 4),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-                ]))
-                
-                elements.append(stop_table)
-                elements.append(Spacer(1, 0.15*inch))
-        else:
-            elements.append(Paragraph("No hay paradas registradas para esta ruta.", normal_style))
-        
-        # ========== NOTAS ADICIONALES ==========
-        if route.notes:
-            elements.append(Spacer(1, 0.2*inch))
-            elements.append(Paragraph("📝 NOTAS ADICIONALES", subtitle_style))
-            elements.append(Spacer(1, 0.1*inch))
-            elements.append(Paragraph(route.notes, normal_style))
-        
-        # ========== FOOTER ==========
-        elements.append(Spacer(1, 0.3*inch))
-        footer_text = f"<i>Documento generado automáticamente por MediSupply - {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}</i>"
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=colors.grey,
-            alignment=TA_CENTER
-        )
-        elements.append(Paragraph(footer_text, footer_style))
-        
-        # Construir PDF
-        doc.build(elements)
-        
-        # Obtener contenido del buffer
-        pdf_content = buffer.getvalue()
-        buffer.close()
-        
-        logger.info(f"PDF generado para ruta {route_id}: {len(pdf_content)} bytes")
-        
-        return pdf_content
-    
-    @staticmethod
-    def export_route_to_csv(route_id: int) -> str:
-        """
-        Exporta una ruta a CSV con datos tabulares.
-        
-        Columnas:
-        - Secuencia
-        - Tipo de Parada
-        - Cliente
-        - Dirección
-        - Ciudad
-        - Coordenadas
-        - Ventana de Entrega (Inicio)
-        - Ventana de Entrega (Fin)
-        - Hora Estimada de Llegada
-        - Pedidos
-        - Peso Total (kg)
-        - Volumen Total (m³)
-        - Prioridad Clínica
-        - Instrucciones
-        
-        Args:
-            route_id: ID de la ruta a exportar
-        
-        Returns:
-            str: Contenido CSV
-        
-        Raises:
-            ValueError: Si la ruta no existe
-        """
-        # Obtener ruta
-        route = Session.query(DeliveryRoute).filter_by(id=route_id).first()
-        
-        if not route:
-            raise ValueError(f"Ruta {route_id} no encontrada")
-        
-        # Obtener paradas ordenadas
-        stops = Session.query(RouteStop).filter_by(
-            route_id=route_id
-        ).order_by(RouteStop.sequence_order).all()
-        
-        # Crear CSV en memoria
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Encabezado del CSV
-        writer.writerow([
-            'Secuencia',
-            'Tipo',
-            'Cliente',
-            'Dirección',
-            'Ciudad',
-            'Latitud',
-            'Longitud',
-            'Ventana Inicio',
-            'Ventana Fin',
-            'Llegada Estimada',
-            'Pedidos',
-            'Peso Total (kg)',
-            'Volumen Total (m³)',
-            'Prioridad',
-            'Instrucciones'
-        ])
-        
-        # Datos de las paradas
-        for stop in stops:
-            # Obtener asignaciones
-            assignments = Session.query(RouteAssignment).filter_by(
-                stop_id=stop.id
-            ).all()
-            
-            # Calcular totales
-            total_weight = sum([a.total_weight_kg or 0 for a in assignments])
-            total_volume = sum([a.total_volume_m3 or 0 for a in assignments])
-            order_numbers = ', '.join([a.order_number for a in assignments])
-            
-            # Prioridad
-            priority_map = {1: 'Crítico', 2: 'Alto', 3: 'Normal'}
-            priority = priority_map.get(stop.clinical_priority, 'N/A')
-            
-            writer.writerow([
-                stop.sequence_order,
-                stop.stop_type or 'delivery',
-                stop.customer_name or '',
-                stop.delivery_address or '',
-                stop.city or '',
-                f"{stop.latitude:.7f}" if stop.latitude else '',
-                f"{stop.longitude:.7f}" if stop.longitude else '',
-                stop.time_window_start.strftime('%H:%M') if stop.time_window_start else '',
-                stop.time_window_end.strftime('%H:%M') if stop.time_window_end else '',
-                stop.estimated_arrival_time.strftime('%H:%M') if stop.estimated_arrival_time else '',
-                order_numbers,
-                f"{total_weight:.2f}",
-                f"{total_volume:.3f}",
-                priority,
-                stop.notes or ''
-            ])
-        
-        csv_content = output.getvalue()
-        output.close()
-        
-        logger.info(f"CSV generado para ruta {route_id}: {len(csv_content)} caracteres")
-        
-        return csv_content
-    
-    @staticmethod
-    def export_daily_routes_summary(
-        distribution_center_id: int,
-        planned_date
-    ) -> bytes:
-        """
-        Genera un resumen ejecutivo en PDF de todas las rutas del día.
-        
-        Incluye:
-        - Resumen general (total rutas, pedidos, distancia)
-        - Tabla con todas las rutas
-        - Estadísticas por vehículo
-        - Gráfico de distribución (si es posible)
-        
-        Args:
-            distribution_center_id: ID del centro de distribución
-            planned_date: Fecha de las rutas
-        
-        Returns:
-            bytes: Contenido del PDF
-        """
-        # Obtener todas las rutas del día
-        routes = Session.query(DeliveryRoute).filter_by(
-            distribution_center_id=distribution_center_id,
-            planned_date=planned_date
-        ).all()
-        
-        if not routes:
-            raise ValueError(f"No hay rutas para DC {distribution_center_id} en {planned_date}")
-        
-        # Crear buffer para PDF
-        buffer = io.BytesIO()
-        
-        # Crear documento PDF
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=0.5*inch,
-            leftMargin=0.5*inch,
-            topMargin=0.5*inch,
-            bottomMargin=0.5*inch
-        )
-        
-        # Estilos
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'Title',
-            parent=styles['Heading1'],
-            fontSize=16,
-            textColor=colors.HexColor('#1a237e'),
-            spaceAfter=12,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        elements = []
-        
-        # Título
-        elements.append(Paragraph(
-            f"📊 RESUMEN DIARIO DE RUTAS - {planned_date.strftime('%d/%m/%Y')}",
-            title_style
-        ))
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Calcular métricas
-        total_routes = len(routes)
-        total_orders = sum([r.total_orders or 0 for r in routes])
-        total_distance = sum([r.total_distance_km or 0 for r in routes])
-        total_stops = sum([r.total_stops or 0 for r in routes])
-        
-        # Tabla de resumen
-        summary = [
-            ['Métrica', 'Valor'],
-            ['Total de Rutas', str(total_routes)],
-            ['Total de Pedidos', str(total_orders)],
-            ['Total de Paradas', str(total_stops)],
-            ['Distancia Total', f"{total_distance:.2f} km"],
-            ['Distancia Promedio', f"{total_distance/total_routes:.2f} km" if total_routes > 0 else 'N/A']
-        ]
-        
-        summary_table = Table(summary, colWidths=[3*inch, 2*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1565c0')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ]))
-        
-        elements.append(summary_table)
-        elements.append(Spacer(1, 0.3*inch))
-        
-        # Tabla detallada de rutas
-        elements.append(Paragraph("📋 DETALLE DE RUTAS", styles['Heading2']))
-        elements.append(Spacer(1, 0.1*inch))
-        
-        route_data = [['Código', 'Vehículo', 'Paradas', 'Pedidos', 'Distancia', 'Estado']]
-        
-        for route in routes:
-            vehicle = Session.query(Vehicle).filter_by(id=route.vehicle_id).first()
-            route_data.append([
-                route.route_code or f"R-{route.id}",
-                vehicle.plate if vehicle else 'N/A',
-                str(route.total_stops or 0),
-                str(route.total_orders or 0),
-                f"{route.total_distance_km or 0:.1f} km",
-                route.status.upper()
-            ])
-        
-        route_table = Table(route_data, colWidths=[1.5*inch, 1*inch, 0.8*inch, 0.8*inch, 1*inch, 1*inch])
-        route_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-        ]))
-        
-        elements.append(route_table)
-        
-        # Construir PDF
-        doc.build(elements)
-        
-        pdf_content = buffer.getvalue()
-        buffer.close()
-        
-        logger.info(f"Resumen diario generado: {len(pdf_content)} bytes")
-        
-        return pdf_content
-
-
-# Instancia singleton
-_export_service_instance = None
-
-
-def get_export_service() -> ExportService:
-    """Retorna instancia singleton del servicio de exportación."""
-    global _export_service_instance
-    
-    if _export_service_instance is None:
-        _export_service_instance = ExportService()
-    
-    return _export_service_instance
+"""
+Servicio de exportación de rutas a PDF y CSV.
+
+Este módulo proporciona funcionalidades para exportar rutas de entrega
+en diferentes formatos para conductores y personal logístico.
+
+Cada exportación carga la ruta con una sola consulta por relación
+(vehículo, paradas, asignaciones) y la convierte en una instantánea de
+datos planos: el CSV se genera fila a fila desde ella y el PDF se renderiza
+sin tocar la base, lo que permite cachearlo por (route_id, versión) y
+renderizar las rutas de un día en un pool de procesos.
+"""
+
+import os
+import io
+import csv
+import logging
+import threading
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional
+
+from reportlab.lib.pagesizes import letter, A4
+from reportlab.lib.units import inch
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_CENTER
+from reportlab.platypus import (
+    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+)
+from reportlab.lib import colors
+from sqlalchemy.orm import selectinload
+
+from src.models.delivery_route import DeliveryRoute
+from src.session import Session
+from src.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PDF_CACHE_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_RENDER_WORKERS = min(4, os.cpu_count() or 1)
+
+CSV_HEADER = [
+    'Secuencia',
+    'Tipo',
+    'Cliente',
+    'Dirección',
+    'Ciudad',
+    'Latitud',
+    'Longitud',
+    'Ventana Inicio',
+    'Ventana Fin',
+    'Llegada Estimada',
+    'Pedidos',
+    'Peso Total (kg)',
+    'Volumen Total (m³)',
+    'Prioridad',
+    'Instrucciones'
+]
+
+
+# ===========================
+# INSTANTÁNEAS DE RUTAS
+# ===========================
+
+def _eager_routes_query():
+    return Session.query(DeliveryRoute).options(
+        selectinload(DeliveryRoute.vehicle),
+        selectinload(DeliveryRoute.stop_list),
+        selectinload(DeliveryRoute.assignment_list)
+    )
+
+
+def _route_snapshot(route: DeliveryRoute) -> SimpleNamespace:
+    """
+    Copia en datos planos (serializables con pickle) de una ruta cargada con
+    `_eager_routes_query`. `version` es el updated_at más reciente entre la
+    ruta, su vehículo, paradas y asignaciones: cambia con cualquier edición
+    que afecte al manifiesto.
+    """
+    assignments_by_stop = {}
+    for assignment in route.assignment_list:
+        assignments_by_stop.setdefault(assignment.stop_id, []).append(SimpleNamespace(
+            order_number=assignment.order_number,
+            total_weight_kg=assignment.total_weight_kg,
+            total_volume_m3=assignment.total_volume_m3
+        ))
+
+    vehicle = route.vehicle
+    stops = [
+        SimpleNamespace(
+            sequence_order=stop.sequence_order,
+            stop_type=stop.stop_type,
+            customer_name=stop.customer_name,
+            delivery_address=stop.delivery_address,
+            city=stop.city,
+            latitude=stop.latitude,
+            longitude=stop.longitude,
+            time_window_start=stop.time_window_start,
+            time_window_end=stop.time_window_end,
+            estimated_arrival_time=stop.estimated_arrival_time,
+            clinical_priority=stop.clinical_priority,
+            notes=stop.notes,
+            assignments=assignments_by_stop.get(stop.id, [])
+        )
+        for stop in route.stop_list
+    ]
+
+    timestamps = [route.updated_at]
+    timestamps.extend(stop.updated_at for stop in route.stop_list)
+    timestamps.extend(assignment.updated_at for assignment in route.assignment_list)
+    if vehicle:
+        timestamps.append(vehicle.updated_at)
+
+    return SimpleNamespace(
+        id=route.id,
+        route_code=route.route_code,
+        planned_date=route.planned_date,
+        status=route.status,
+        total_stops=route.total_stops,
+        total_orders=route.total_orders,
+        total_distance_km=route.total_distance_km,
+        estimated_duration_minutes=route.estimated_duration_minutes,
+        has_cold_chain_products=route.has_cold_chain_products,
+        optimization_score=route.optimization_score,
+        notes=route.notes,
+        vehicle=SimpleNamespace(
+            plate=vehicle.plate,
+            vehicle_type=vehicle.vehicle_type,
+            driver_name=vehicle.driver_name,
+            driver_phone=vehicle.driver_phone,
+            capacity_kg=vehicle.capacity_kg,
+            capacity_m3=vehicle.capacity_m3,
+            has_refrigeration=vehicle.has_refrigeration
+        ) if vehicle else None,
+        stops=stops,
+        version=max(ts for ts in timestamps if ts is not None)
+    )
+
+
+def load_route_snapshot(route_id: int) -> SimpleNamespace:
+    """
+    Carga una ruta para exportar.
+    
+    Raises:
+        ValueError: Si la ruta no existe
+    """
+    route = _eager_routes_query().filter(DeliveryRoute.id == route_id).one_or_none()
+    if not route:
+        raise ValueError(f"Ruta {route_id} no encontrada")
+    return _route_snapshot(route)
+
+
+def load_day_snapshots(distribution_center_id: int, planned_date) -> List[SimpleNamespace]:
+    """
+    Carga todas las rutas de un centro/día para exportar.
+    
+    Raises:
+        ValueError: Si no hay rutas
+    """
+    routes = (
+        _eager_routes_query()
+        .filter(
+            DeliveryRoute.distribution_center_id == distribution_center_id,
+            DeliveryRoute.planned_date == planned_date
+        )
+        .order_by(DeliveryRoute.id)
+        .all()
+    )
+    if not routes:
+        raise ValueError(f"No hay rutas para DC {distribution_center_id} en {planned_date}")
+    return [_route_snapshot(route) for route in routes]
+
+
+# ===========================
+# CACHÉ DE PDFs
+# ===========================
+
+class RoutePdfCache:
+    """
+    LRU de PDFs renderizados por (route_id, versión), acotado en bytes. Una
+    edición de la ruta cambia la versión, así que las entradas viejas nunca se
+    sirven y salen por LRU.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_PDF_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._cache = TTLCache(max_weight=max_bytes)
+
+    def get(self, route_id: int, version) -> Optional[bytes]:
+        return self._cache.get((route_id, version))
+
+    def put(self, route_id: int, version, content: bytes):
+        self._cache.put((route_id, version), content)
+
+    def clear(self):
+        self._cache.clear()
+
+    def get_stats(self) -> Dict:
+        stats = self._cache.get_stats()
+        return {
+            'entries': stats['size'],
+            'size_bytes': stats['weight'],
+            'max_bytes': self.max_bytes,
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'hit_ratio': stats['hit_ratio']
+        }
+
+
+# Instancia global del caché del proceso
+route_pdf_cache = RoutePdfCache(
+    max_bytes=int(os.getenv('EXPORT_PDF_CACHE_MAX_BYTES', DEFAULT_PDF_CACHE_MAX_BYTES))
+)
+
+
+# ===========================
+# POOL DE RENDERIZADO
+# ===========================
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+
+def _render_workers() -> int:
+    return int(os.getenv('EXPORT_RENDER_WORKERS', DEFAULT_RENDER_WORKERS))
+
+
+def get_render_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Pool de procesos para renderizar PDFs (reportlab es CPU puro y retiene
+    el GIL). Se crea al primer uso con contexto 'spawn': los workers no
+    heredan conexiones ni hilos del proceso web. None si EXPORT_RENDER_WORKERS <= 1.
+    """
+    global _render_pool
+    workers = _render_workers()
+    if workers <= 1:
+        return None
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            logger.info(f"🖨️ Pool de renderizado de PDFs iniciado ({workers} procesos)")
+        return _render_pool
+
+
+def shutdown_render_pool():
+    """Detiene el pool de renderizado (registrado con atexit)."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False, cancel_futures=True)
+            _render_pool = None
+            logger.info("🛑 Pool de renderizado de PDFs detenido")
+
+
+# ===========================
+# RENDERIZADO
+# ===========================
+
+def render_route_pdf(route: SimpleNamespace) -> bytes:
+    """
+    Renderiza la hoja de ruta de una instantánea (`load_route_snapshot`).
+    No accede a la base de datos: se puede ejecutar en otro proceso.
+    """
+    stops = route.stops
+    vehicle = route.vehicle
+    
+    # Crear buffer para PDF
+    buffer = io.BytesIO()
+    
+    # Crear documento PDF
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=0.5*inch,
+        leftMargin=0.5*inch,
+        topMargin=0.5*inch,
+        bottomMargin=0.5*inch
+    )
+    
+    # Estilos
+    styles = getSampleStyleSheet()
+    
+    # Estilo personalizado para título
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        textColor=colors.HexColor('#1a237e'),
+        spaceAfter=12,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    )
+    
+    # Estilo para subtítulos
+    subtitle_style = ParagraphStyle(
+        'CustomSubtitle',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=colors.HexColor('#283593'),
+        spaceAfter=10,
+        fontName='Helvetica-Bold'
+    )
+    
+    # Estilo para texto normal
+    normal_style = styles['Normal']
+    
+    # Construir elementos del PDF
+    elements = []
+    
+    # ========== ENCABEZADO ==========
+    elements.append(Paragraph("🚚 HOJA DE RUTA DE ENTREGA", title_style))
+    elements.append(Spacer(1, 0.2*inch))
+    
+    # Información general en tabla
+    general_info = [
+        ['Código de Ruta:', route.route_code or f"ROUTE-{route.id}"],
+        ['Fecha Planeada:', route.planned_date.strftime('%d/%m/%Y') if route.planned_date else 'N/A'],
+        ['Estado:', route.status.upper()],
+        ['Generado:', datetime.now().strftime('%d/%m/%Y %H:%M')]
+    ]
+    
+    general_table = Table(general_info, colWidths=[2*inch, 4*inch])
+    general_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e3f2fd')),
+        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#1565c0')),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ]))
+    
+    elements.append(general_table)
+    elements.append(Spacer(1, 0.3*inch))
+    
+    # ========== INFORMACIÓN DEL VEHÍCULO ==========
+    if vehicle:
+        elements.append(Paragraph("🚐 INFORMACIÓN DEL VEHÍCULO", subtitle_style))
+        elements.append(Spacer(1, 0.1*inch))
+        
+        vehicle_info = [
+            ['Placa:', vehicle.plate or 'N/A'],
+            ['Tipo:', vehicle.vehicle_type or 'N/A'],
+            ['Conductor:', vehicle.driver_name or 'N/A'],
+            ['Teléfono:', vehicle.driver_phone or 'N/A'],
+            ['Capacidad:', f"{vehicle.capacity_kg} kg / {vehicle.capacity_m3} m³" if vehicle.capacity_kg else 'N/A'],
+            ['Refrigeración:', '✅ Sí' if vehicle.has_refrigeration else '❌ No']
+        ]
+        
+        vehicle_table = Table(vehicle_info, colWidths=[2*inch, 4*inch])
+        vehicle_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#fff3e0')),
+            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#e65100')),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]))
+        
+        elements.append(vehicle_table)
+        elements.append(Spacer(1, 0.3*inch))
+    
+    # ========== RESUMEN DE LA RUTA ==========
+    elements.append(Paragraph("📊 RESUMEN DE LA RUTA", subtitle_style))
+    elements.append(Spacer(1, 0.1*inch))
+    
+    summary_info = [
+        ['Total de Paradas:', str(route.total_stops or len(stops))],
+        ['Total de Pedidos:', str(route.total_orders or 0)],
+        ['Distancia Total:', f"{route.total_distance_km or 0:.2f} km" if route.total_distance_km else 'N/A'],
+        ['Duración Estimada:', f"{route.estimated_duration_minutes or 0} minutos" if route.estimated_duration_minutes else 'N/A'],
+        ['Cadena de Frío:', '✅ Sí' if route.has_cold_chain_products else '❌ No'],
+        ['Score de Optimización:', f"{route.optimization_score or 0:.1f}/100" if route.optimization_score else 'N/A']
+    ]
+    
+    summary_table = Table(summary_info, colWidths=[2*inch, 4*inch])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8f5e9')),
+        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#2e7d32')),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ]))
+    
+    elements.append(summary_table)
+    elements.append(Spacer(1, 0.3*inch))
+    
+    # ========== LISTA DE PARADAS ==========
+    elements.append(Paragraph("📍 PARADAS DE ENTREGA", subtitle_style))
+    elements.append(Spacer(1, 0.1*inch))
+    
+    if stops:
+        for stop in stops:
+            assignments = stop.assignments
+            
+            # Encabezado de parada
+            stop_header = f"<b>Parada #{stop.sequence_order}</b> - {stop.customer_name or 'Cliente'}"
+            if stop.clinical_priority:
+                priority_text = {1: '🔴 CRÍTICO', 2: '🟡 ALTO', 3: '🟢 NORMAL'}.get(stop.clinical_priority, '')
+                stop_header += f" ({priority_text})"
+            
+            elements.append(Paragraph(stop_header, styles['Heading3']))
+            elements.append(Spacer(1, 0.05*inch))
+            
+            # Detalles de parada
+            stop_details = [
+                ['📍 Dirección:', stop.delivery_address or 'N/A'],
+                ['🏙️ Ciudad:', stop.city or 'N/A'],
+                ['🕐 Ventana de Entrega:', 
+                 f"{stop.time_window_start.strftime('%H:%M') if stop.time_window_start else 'N/A'} - "
+                 f"{stop.time_window_end.strftime('%H:%M') if stop.time_window_end else 'N/A'}"],
+                ['⏰ Llegada Estimada:', 
+                 stop.estimated_arrival_time.strftime('%H:%M') if stop.estimated_arrival_time else 'N/A'],
+                ['📦 Pedidos:', ', '.join([a.order_number for a in assignments]) if assignments else 'N/A'],
+                ['⚖️ Peso Total:', 
+                 f"{sum([a.total_weight_kg or 0 for a in assignments]):.2f} kg" if assignments else 'N/A'],
+            ]
+            
+            # Agregar instrucciones especiales si existen
+            if stop.notes:
+                stop_details.append(['📝 Instrucciones:', stop.notes])
+            
+            stop_table = Table(stop_details, colWidths=[1.8*inch, 5*inch])
+            stop_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f5f5f5')),
+                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 8),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.lightgrey),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                ('LEFTPADDING', (0, 0), (-1, -1), 6),
+                ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+                ('TOPPADDING', (0, 0), (-1, -1), 4),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+            ]))
+            
+            elements.append(stop_table)
+            elements.append(Spacer(1, 0.15*inch))
+    else:
+        elements.append(Paragraph("No hay paradas registradas para esta ruta.", normal_style))
+    
+    # ========== NOTAS ADICIONALES ==========
+    if route.notes:
+        elements.append(Spacer(1, 0.2*inch))
+        elements.append(Paragraph("📝 NOTAS ADICIONALES", subtitle_style))
+        elements.append(Spacer(1, 0.1*inch))
+        elements.append(Paragraph(route.notes, normal_style))
+    
+    # ========== FOOTER ==========
+    elements.append(Spacer(1, 0.3*inch))
+    footer_text = f"<i>Documento generado automáticamente por MediSupply - {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}</i>"
+    footer_style = ParagraphStyle(
+        'Footer',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=colors.grey,
+        alignment=TA_CENTER
+    )
+    elements.append(Paragraph(footer_text, footer_style))
+    
+    # Construir PDF
+    doc.build(elements)
+    
+    # Obtener contenido del buffer
+    pdf_content = buffer.getvalue()
+    buffer.close()
+    
+    return pdf_content
+
+
+def iter_route_csv(route: SimpleNamespace) -> Iterator[str]:
+    """
+    Genera el CSV de una instantánea (`load_route_snapshot`) línea a línea.
+    """
+    line = io.StringIO()
+    writer = csv.writer(line)
+    priority_map = {1: 'Crítico', 2: 'Alto', 3: 'Normal'}
+    
+    def emit(row):
+        writer.writerow(row)
+        value = line.getvalue()
+        line.seek(0)
+        line.truncate(0)
+        return value
+    
+    yield emit(CSV_HEADER)
+    
+    for stop in route.stops:
+        assignments = stop.assignments
+        
+        # Calcular totales
+        total_weight = sum([a.total_weight_kg or 0 for a in assignments])
+        total_volume = sum([a.total_volume_m3 or 0 for a in assignments])
+        order_numbers = ', '.join([a.order_number for a in assignments])
+        
+        yield emit([
+            stop.sequence_order,
+            stop.stop_type or 'delivery',
+            stop.customer_name or '',
+            stop.delivery_address or '',
+            stop.city or '',
+            f"{stop.latitude:.7f}" if stop.latitude else '',
+            f"{stop.longitude:.7f}" if stop.longitude else '',
+            stop.time_window_start.strftime('%H:%M') if stop.time_window_start else '',
+            stop.time_window_end.strftime('%H:%M') if stop.time_window_end else '',
+            stop.estimated_arrival_time.strftime('%H:%M') if stop.estimated_arrival_time else '',
+            order_numbers,
+            f"{total_weight:.2f}",
+            f"{total_volume:.3f}",
+            priority_map.get(stop.clinical_priority, 'N/A'),
+            stop.notes or ''
+        ])
+
+
+class _ZipStream:
+    """Destino no posicionable para ZipFile: acumula bloques para el generador."""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _iter_routes_zip(routes: List[SimpleNamespace], formats) -> Iterator[bytes]:
+    """Arma el ZIP de un día: CSVs y PDFs cacheados primero, el resto según terminan."""
+    stream = _ZipStream()
+    bundle = zipfile.ZipFile(stream, mode='w', compression=zipfile.ZIP_DEFLATED)
+    
+    def add(name, content):
+        bundle.writestr(name, content)
+        return stream.drain()
+    
+    pending = []
+    for route in routes:
+        name = f"ruta_{route.route_code or route.id}"
+        if 'csv' in formats:
+            yield add(f"{name}.csv", ''.join(iter_route_csv(route)).encode('utf-8'))
+        if 'pdf' in formats:
+            cached = route_pdf_cache.get(route.id, route.version)
+            if cached is not None:
+                yield add(f"{name}.pdf", cached)
+            else:
+                pending.append((name, route))
+    
+    pool = get_render_pool() if len(pending) > 1 else None
+    if pool is None:
+        for name, route in pending:
+            content = render_route_pdf(route)
+            route_pdf_cache.put(route.id, route.version, content)
+            yield add(f"{name}.pdf", content)
+    else:
+        futures = {pool.submit(render_route_pdf, route): (name, route) for name, route in pending}
+        for future in as_completed(futures):
+            name, route = futures[future]
+            content = future.result()
+            route_pdf_cache.put(route.id, route.version, content)
+            yield add(f"{name}.pdf", content)
+    
+    bundle.close()
+    yield stream.drain()
+    logger.info(f"📦 ZIP de rutas generado: {len(routes)} rutas, {len(pending)} PDFs renderizados")
+
+
+class ExportService:
+    """
+    Servicio para exportar rutas en diferentes formatos.
+    
+    Formatos soportados:
+    - PDF: Hoja de ruta detallada para conductores
+    - CSV: Datos tabulares para análisis
+    - JSON: Datos estructurados (ya implementado en to_dict())
+    """
+    
+    # URL para Google Static Maps API
+    GOOGLE_MAPS_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY', '')
+    STATIC_MAPS_BASE_URL = 'https://maps.googleapis.com/maps/api/staticmap'
+    
+    @staticmethod
+    def export_route_to_pdf(route_id: int) -> bytes:
+        """
+        Exporta una ruta a PDF con formato profesional.
+        
+        El PDF incluye:
+        - Encabezado con información del vehículo y conductor
+        - Lista secuencial de paradas con detalles
+        - Mapa estático de la ruta (si API key disponible)
+        - Instrucciones especiales
+        - Footer con fecha de generación
+        
+        Args:
+            route_id: ID de la ruta a exportar
+        
+        Returns:
+            bytes: Contenido del PDF
+        
+        Raises:
+            ValueError: Si la ruta no existe
+        """
+        route = load_route_snapshot(route_id)
+        
+        pdf_content = route_pdf_cache.get(route.id, route.version)
+        if pdf_content is None:
+            pdf_content = render_route_pdf(route)
+            route_pdf_cache.put(route.id, route.version, pdf_content)
+            logger.info(f"PDF generado para ruta {route_id}: {len(pdf_content)} bytes")
+        
+        return pdf_content
+    
+    @staticmethod
+    def export_route_to_csv(route_id: int) -> str:
+        """
+        Exporta una ruta a CSV con datos tabulares.
+        
+        Columnas:
+        - Secuencia
+        - Tipo de Parada
+        - Cliente
+        - Dirección
+        - Ciudad
+        - Coordenadas
+        - Ventana de Entrega (Inicio)
+        - Ventana de Entrega (Fin)
+        - Hora Estimada de Llegada
+        - Pedidos
+        - Peso Total (kg)
+        - Volumen Total (m³)
+        - Prioridad Clínica
+        - Instrucciones
+        
+        Args:
+            route_id: ID de la ruta a exportar
+        
+        Returns:
+            str: Contenido CSV
+        
+        Raises:
+            ValueError: Si la ruta no existe
+        """
+        csv_content = ''.join(iter_route_csv(load_route_snapshot(route_id)))
+        
+        logger.info(f"CSV generado para ruta {route_id}: {len(csv_content)} caracteres")
+        
+        return csv_content
+    
+    @staticmethod
+    def stream_route_csv(route_id: int) -> Iterator[str]:
+        """
+        Exporta una ruta a CSV como generador de filas, para respuestas en
+        streaming. La ruta se carga antes de devolver el generador (los errores
+        se levantan aquí) y las filas salen de la instantánea, sin consultas.
+        
+        Raises:
+            ValueError: Si la ruta no existe
+        """
+        return iter_route_csv(load_route_snapshot(route_id))
+    
+    @staticmethod
+    def export_routes_bundle(
+        distribution_center_id: int,
+        planned_date,
+        formats=('pdf', 'csv')
+    ) -> Iterator[bytes]:
+        """
+        Exporta todas las rutas de un centro/día como un ZIP en streaming
+        (ruta_<código>.pdf / .csv por ruta).
+        
+        Los PDFs que no están en caché se renderizan en el pool de procesos
+        y cada archivo se agrega al ZIP en cuanto termina.
+        
+        Args:
+            distribution_center_id: ID del centro de distribución
+            planned_date: Fecha de las rutas
+            formats: Formatos a incluir ('pdf', 'csv')
+        
+        Returns:
+            Generador de bloques de bytes del ZIP
+        
+        Raises:
+            ValueError: Si no hay rutas para el centro/día
+        """
+        routes = load_day_snapshots(distribution_center_id, planned_date)
+        return _iter_routes_zip(routes, formats)
+    
+    @staticmethod
+    def export_daily_routes_summary(
+        distribution_center_id: int,
+        planned_date
+    ) -> bytes:
+        """
+        Genera un resumen ejecutivo en PDF de todas las rutas del día.
+        
+        Incluye:
+        - Resumen general (total rutas, pedidos, distancia)
+        - Tabla con todas las rutas
+        - Estadísticas por vehículo
+        - Gráfico de distribución (si es posible)
+        
+        Args:
+            distribution_center_id: ID del centro de distribución
+            planned_date: Fecha de las rutas
+        
+        Returns:
+            bytes: Contenido del PDF
+        """
+        # Obtener todas las rutas del día
+        routes = Session.query(DeliveryRoute).options(
+            selectinload(DeliveryRoute.vehicle)
+        ).filter_by(
+            distribution_center_id=distribution_center_id,
+            planned_date=planned_date
+        ).all()
+        
+        if not routes:
+            raise ValueError(f"No hay rutas para DC {distribution_center_id} en {planned_date}")
+        
+        # Crear buffer para PDF
+        buffer = io.BytesIO()
+        
+        # Crear documento PDF
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=A4,
+            rightMargin=0.5*inch,
+            leftMargin=0.5*inch,
+            topMargin=0.5*inch,
+            bottomMargin=0.5*inch
+        )
+        
+        # Estilos
+        styles = getSampleStyleSheet()
+        title_style = ParagraphStyle(
+            'Title',
+            parent=styles['Heading1'],
+            fontSize=16,
+            textColor=colors.HexColor('#1a237e'),
+            spaceAfter=12,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        )
+        
+        elements = []
+        
+        # Título
+        elements.append(Paragraph(
+            f"📊 RESUMEN DIARIO DE RUTAS - {planned_date.strftime('%d/%m/%Y')}",
+            title_style
+        ))
+        elements.append(Spacer(1, 0.3*inch))
+        
+        # Calcular métricas
+        total_routes = len(routes)
+        total_orders = sum([r.total_orders or 0 for r in routes])
+        total_distance = sum([r.total_distance_km or 0 for r in routes])
+        total_stops = sum([r.total_stops or 0 for r in routes])
+        
+        # Tabla de resumen
+        summary = [
+            ['Métrica', 'Valor'],
+            ['Total de Rutas', str(total_routes)],
+            ['Total de Pedidos', str(total_orders)],
+            ['Total de Paradas', str(total_stops)],
+            ['Distancia Total', f"{total_distance:.2f} km"],
+            ['Distancia Promedio', f"{total_distance/total_routes:.2f} km" if total_routes > 0 else 'N/A']
+        ]
+        
+        summary_table = Table(summary, colWidths=[3*inch, 2*inch])
+        summary_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1565c0')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ]))
+        
+        elements.append(summary_table)
+        elements.append(Spacer(1, 0.3*inch))
+        
+        # Tabla detallada de rutas
+        elements.append(Paragraph("📋 DETALLE DE RUTAS", styles['Heading2']))
+        elements.append(Spacer(1, 0.1*inch))
+        
+        route_data = [['Código', 'Vehículo', 'Paradas', 'Pedidos', 'Distancia', 'Estado']]
+        
+        for route in routes:
+            vehicle = route.vehicle
+            route_data.append([
+                route.route_code or f"R-{route.id}",
+                vehicle.plate if vehicle else 'N/A',
+                str(route.total_stops or 0),
+                str(route.total_orders or 0),
+                f"{route.total_distance_km or 0:.1f} km",
+                route.status.upper()
+            ])
+        
+        route_table = Table(route_data, colWidths=[1.5*inch, 1*inch, 0.8*inch, 0.8*inch, 1*inch, 1*inch])
+        route_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+        ]))
+        
+        elements.append(route_table)
+        
+        # Construir PDF
+        doc.build(elements)
+        
+        pdf_content = buffer.getvalue()
+        buffer.close()
+        
+        logger.info(f"Resumen diario generado: {len(pdf_content)} bytes")
+        
+        return pdf_content
+
+
+# Instancia singleton
+_export_service_instance = None
+
+
+def get_export_service() -> ExportService:
+    """Retorna instancia singleton del servicio de exportación."""
+    global _export_service_instance
+    
+    if _export_service_instance is None:
+        _export_service_instance = ExportService()
+    
+    return _export_service_instance
@@ -0,0 +1,492 @@
+"""
+Ledger de movimientos de inventario con snapshots compactados.
+
+Con INVENTORY_LEDGER_ENABLED, las reservas, liberaciones y ajustes no
+actualizan la fila de `inventory`: agregan una fila en `inventory_movements`
+(solo inserción). Escrituras concurrentes sobre un mismo SKU ya no compiten
+por la misma fila, y queda el historial completo de movimientos.
+
+Saldo = último snapshot + suma de la cola (movimientos con id posterior al
+snapshot). Sin snapshot, la base es la fila de `inventory` tal como quedó
+antes de activar el ledger (o en la última compactación).
+
+Las escrituras de un mismo SKU/centro se serializan con `lock_balance`
+(advisory lock de transacción en PostgreSQL, SELECT ... FOR UPDATE de la
+fila de `inventory` en otros motores): quien valida contra el saldo toma el
+lock antes de leerlo, y `append_movement` también lo toma. Así no hay
+sobreventa entre lectura y escritura, y dentro de un SKU/centro los ids se
+confirman en orden.
+
+`compact_ledger` (job periódico) suma la cola de cada SKU/centro al último
+snapshot, guarda un snapshot nuevo, proyecta el saldo en la fila de
+`inventory` (que siguen leyendo los reportes de stock) y deja el evento de
+cambio en el outbox. Cada snapshot cubre hasta el mayor id confirmado de
+SU SKU/centro (no un corte global): un id menor de otro SKU que confirme
+tarde queda en la cola de su propio SKU y entra en la compactación
+siguiente.
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import and_, func, or_, select, tuple_
+
+from src.session import db
+from src.models.inventory import Inventory
+from src.models.inventory_movement import InventoryMovement
+from src.models.inventory_snapshot import InventorySnapshot
+from src.errors.errors import ConflictError, ValidationError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTLE_SECONDS = 2.0
+
+# SKU/centro por consulta al cargar bases y filas de inventario
+KEYS_PER_CHUNK = 500
+
+
+def ledger_enabled() -> bool:
+    """Indica si los movimientos de stock se escriben en el ledger."""
+    if has_app_context() and 'INVENTORY_LEDGER_ENABLED' in current_app.config:
+        return bool(current_app.config['INVENTORY_LEDGER_ENABLED'])
+    return os.getenv('INVENTORY_LEDGER_ENABLED', 'false').lower() in ['true', '1', 'yes']
+
+
+def _is_postgres() -> bool:
+    return db.session.get_bind().dialect.name == 'postgresql'
+
+
+def lock_balance(product_sku: str, distribution_center_id: int):
+    """
+    Serializa las escrituras de un SKU/centro hasta el fin de la transacción.
+    Se toma antes de `get_balance` cuando el movimiento se valida contra el
+    saldo.
+    """
+    if _is_postgres():
+        db.session.execute(select(
+            func.pg_advisory_xact_lock(distribution_center_id, func.hashtext(product_sku))
+        ))
+        return
+    db.session.execute(
+        select(Inventory.id)
+        .where(Inventory.product_sku == product_sku,
+               Inventory.distribution_center_id == distribution_center_id)
+        .with_for_update()
+    )
+
+
+def lock_balances(keys):
+    """
+    Igual que `lock_balance` para muchos SKU/centro en una sola consulta.
+
+    Args:
+        keys: Subconsulta con columnas product_sku y distribution_center_id
+    """
+    if _is_postgres():
+        # Orden fijo para no cruzarse con otro lote que bloquee los mismos SKU
+        db.session.execute(
+            select(func.pg_advisory_xact_lock(keys.c.distribution_center_id, func.hashtext(keys.c.product_sku)))
+            .order_by(keys.c.distribution_center_id, keys.c.product_sku)
+        )
+        return
+    db.session.execute(
+        select(Inventory.id)
+        .where(tuple_(Inventory.product_sku, Inventory.distribution_center_id).in_(
+            select(keys.c.product_sku, keys.c.distribution_center_id)
+        ))
+        .order_by(Inventory.id)
+        .with_for_update()
+    )
+
+
+def append_movement(product_sku: str, distribution_center_id: int, movement_type: str,
+                    delta_available: int = 0, delta_reserved: int = 0, delta_in_transit: int = 0,
+                    reference: Optional[str] = None, details: Optional[Dict] = None) -> InventoryMovement:
+    """
+    Agrega un movimiento a la sesión actual. No hace commit: el movimiento se
+    confirma junto con el resto de la transacción. Toma el lock del SKU/centro
+    (si ya se tomó para leer el saldo, no espera).
+    """
+    lock_balance(product_sku, distribution_center_id)
+    movement = InventoryMovement(
+        product_sku=product_sku,
+        distribution_center_id=distribution_center_id,
+        movement_type=movement_type,
+        delta_available=delta_available,
+        delta_reserved=delta_reserved,
+        delta_in_transit=delta_in_transit,
+        reference=reference,
+        details=details
+    )
+    db.session.add(movement)
+    return movement
+
+
+def movement_deltas(movement_type: str, quantity: int, balance: Dict,
+                    from_reservation: bool = True) -> Tuple[int, int, int]:
+    """
+    Deltas (disponible, reservado, en tránsito) de un movimiento contra el
+    saldo actual. Valida con las mismas reglas que el camino por fila.
+
+    Args:
+        movement_type: receipt, reservation, release, dispatch o adjustment
+        quantity: Unidades (en adjustment puede ser negativa)
+        balance: Saldo actual (get_balance)
+        from_reservation: En dispatch, consumir también la reserva
+    """
+    sku = balance['product_sku']
+    available = balance['quantity_available']
+    reserved = balance['quantity_reserved']
+
+    if movement_type == InventoryMovement.TYPE_RECEIPT:
+        return quantity, 0, 0
+
+    if movement_type == InventoryMovement.TYPE_RESERVATION:
+        if available < quantity:
+            raise ConflictError(
+                f"Stock insuficiente para {sku}. Disponible: {available}, Solicitado: {quantity}"
+            )
+        return 0, quantity, 0
+
+    if movement_type == InventoryMovement.TYPE_RELEASE:
+        return 0, -min(quantity, reserved), 0
+
+    if movement_type == InventoryMovement.TYPE_DISPATCH:
+        if available < quantity:
+            raise ConflictError(
+                f"Stock insuficiente para despachar {sku}. Disponible: {available}, Solicitado: {quantity}"
+            )
+        return -quantity, -min(quantity, reserved) if from_reservation else 0, 0
+
+    if movement_type == InventoryMovement.TYPE_ADJUSTMENT:
+        if available + quantity < 0:
+            raise ValidationError(
+                f"El ajuste dejaría {sku} con cantidad disponible negativa ({available + quantity})"
+            )
+        return quantity, 0, 0
+
+    raise ValidationError(
+        f"movement_type debe ser uno de: {', '.join(InventoryMovement.MOVEMENT_TYPES)}"
+    )
+
+
+def get_balance(product_sku: str, distribution_center_id: int) -> Optional[Dict]:
+    """
+    Saldo actual de un SKU en un centro: último snapshot + cola del ledger.
+
+    Returns:
+        Dict con las cantidades, o None si el SKU no tiene inventario ni
+        movimientos en el centro
+    """
+    snapshot = (
+        InventorySnapshot.query
+        .filter_by(product_sku=product_sku, distribution_center_id=distribution_center_id)
+        .order_by(InventorySnapshot.last_movement_id.desc())
+        .first()
+    )
+
+    inventory = None
+    if snapshot is not None:
+        base = (snapshot.quantity_available, snapshot.quantity_reserved, snapshot.quantity_in_transit)
+        since = snapshot.last_movement_id
+    else:
+        inventory = Inventory.query.filter_by(
+            product_sku=product_sku,
+            distribution_center_id=distribution_center_id
+        ).first()
+        base = (
+            (inventory.quantity_available, inventory.quantity_reserved, inventory.quantity_in_transit)
+            if inventory else (0, 0, 0)
+        )
+        since = 0
+
+    count, available, reserved, in_transit, last_id = (
+        db.session.query(
+            func.count(InventoryMovement.id),
+            func.coalesce(func.sum(InventoryMovement.delta_available), 0),
+            func.coalesce(func.sum(InventoryMovement.delta_reserved), 0),
+            func.coalesce(func.sum(InventoryMovement.delta_in_transit), 0),
+            func.max(InventoryMovement.id)
+        )
+        .filter(
+            InventoryMovement.product_sku == product_sku,
+            InventoryMovement.distribution_center_id == distribution_center_id,
+            InventoryMovement.id > since
+        )
+        .one()
+    )
+
+    if snapshot is None and inventory is None and count == 0:
+        return None
+
+    return {
+        'product_sku': product_sku,
+        'distribution_center_id': distribution_center_id,
+        'quantity_available': base[0] + int(available),
+        'quantity_reserved': base[1] + int(reserved),
+        'quantity_in_transit': base[2] + int(in_transit),
+        'snapshot_movement_id': since,
+        'tail_movements': count,
+        'last_movement_id': last_id or since
+    }
+
+
+def _last_snapshots():
+    """Id del último movimiento cubierto por snapshot, por SKU/centro."""
+    snapshots = InventorySnapshot.__table__
+    return (
+        select(
+            snapshots.c.product_sku,
+            snapshots.c.distribution_center_id,
+            func.max(snapshots.c.last_movement_id).label('last_movement_id')
+        )
+        .group_by(snapshots.c.product_sku, snapshots.c.distribution_center_id)
+        .subquery()
+    )
+
+
+def balances(keys=None):
+    """
+    `get_balance` en SQL para muchos SKU/centro: subconsulta con id de
+    inventario, product_sku, distribution_center_id y quantity_available
+    (snapshot o fila + cola), para cruzarla con otras tablas.
+
+    Args:
+        keys: Subconsulta con columnas product_sku y distribution_center_id
+            para limitar los SKU/centro (por defecto, todo el inventario)
+    """
+    inventory = Inventory.__table__
+    movements = InventoryMovement.__table__
+    snapshots = InventorySnapshot.__table__
+    last_snapshot = _last_snapshots()
+
+    tails = (
+        select(
+            movements.c.product_sku,
+            movements.c.distribution_center_id,
+            func.sum(movements.c.delta_available).label('delta_available')
+        )
+        .select_from(movements.outerjoin(last_snapshot, and_(
+            last_snapshot.c.product_sku == movements.c.product_sku,
+            last_snapshot.c.distribution_center_id == movements.c.distribution_center_id
+        )))
+        .where(movements.c.id > func.coalesce(last_snapshot.c.last_movement_id, 0))
+        .group_by(movements.c.product_sku, movements.c.distribution_center_id)
+    )
+    if keys is not None:
+        tails = tails.where(tuple_(movements.c.product_sku, movements.c.distribution_center_id).in_(
+            select(keys.c.product_sku, keys.c.distribution_center_id)
+        ))
+    tails = tails.subquery()
+
+    snapshot = (
+        select(snapshots.c.product_sku, snapshots.c.distribution_center_id, snapshots.c.quantity_available)
+        .join(last_snapshot, and_(
+            last_snapshot.c.product_sku == snapshots.c.product_sku,
+            last_snapshot.c.distribution_center_id == snapshots.c.distribution_center_id,
+            last_snapshot.c.last_movement_id == snapshots.c.last_movement_id
+        ))
+        .subquery()
+    )
+
+    query = (
+        select(
+            inventory.c.id,
+            inventory.c.product_sku,
+            inventory.c.distribution_center_id,
+            (
+                func.coalesce(snapshot.c.quantity_available, inventory.c.quantity_available)
+                + func.coalesce(tails.c.delta_available, 0)
+            ).label('quantity_available')
+        )
+        .select_from(
+            inventory
+            .outerjoin(snapshot, and_(
+                snapshot.c.product_sku == inventory.c.product_sku,
+                snapshot.c.distribution_center_id == inventory.c.distribution_center_id
+            ))
+            .outerjoin(tails, and_(
+                tails.c.product_sku == inventory.c.product_sku,
+                tails.c.distribution_center_id == inventory.c.distribution_center_id
+            ))
+        )
+    )
+    if keys is not None:
+        query = query.where(tuple_(inventory.c.product_sku, inventory.c.distribution_center_id).in_(
+            select(keys.c.product_sku, keys.c.distribution_center_id)
+        ))
+    return query.subquery()
+
+
+def compact_ledger(settle_seconds: float = DEFAULT_SETTLE_SECONDS, notify: bool = True) -> Dict:
+    """
+    Suma la cola del ledger a un snapshot nuevo por cada SKU/centro con
+    movimientos pendientes y actualiza la proyección en `inventory`.
+
+    Args:
+        settle_seconds: Antigüedad mínima de los movimientos a compactar
+            (margen adicional; el orden por SKU/centro lo da `lock_balance`)
+        notify: Dejar en el outbox el evento de cambio de stock
+
+    Returns:
+        {'keys_compacted', 'movements_folded', 'cutoff_movement_id', 'snapshots_pruned'}
+    """
+    result = {'keys_compacted': 0, 'movements_folded': 0, 'cutoff_movement_id': None, 'snapshots_pruned': 0}
+
+    settled_before = datetime.utcnow() - timedelta(seconds=settle_seconds)
+    cutoff = db.session.query(func.max(InventoryMovement.id)).filter(
+        InventoryMovement.created_at <= settled_before
+    ).scalar()
+    if cutoff is None:
+        return result
+    result['cutoff_movement_id'] = cutoff
+
+    movements = InventoryMovement.__table__
+    last_snapshot = _last_snapshots()
+
+    tails = db.session.execute(
+        select(
+            movements.c.product_sku,
+            movements.c.distribution_center_id,
+            func.count(movements.c.id),
+            func.sum(movements.c.delta_available),
+            func.sum(movements.c.delta_reserved),
+            func.sum(movements.c.delta_in_transit),
+            func.max(movements.c.id)
+        )
+        .select_from(movements.outerjoin(last_snapshot, and_(
+            last_snapshot.c.product_sku == movements.c.product_sku,
+            last_snapshot.c.distribution_center_id == movements.c.distribution_center_id
+        )))
+        .where(
+            movements.c.id > func.coalesce(last_snapshot.c.last_movement_id, 0),
+            movements.c.id <= cutoff
+        )
+        .group_by(movements.c.product_sku, movements.c.distribution_center_id)
+    ).all()
+    if not tails:
+        return result
+
+    now = datetime.utcnow()
+    for start in range(0, len(tails), KEYS_PER_CHUNK):
+        chunk = tails[start:start + KEYS_PER_CHUNK]
+        keys = [(row[0], row[1]) for row in chunk]
+        bases = _load_bases(keys)
+        inventories = {
+            (inv.product_sku, inv.distribution_center_id): inv
+            for inv in Inventory.query.filter(_keys_filter(Inventory, keys)).all()
+        }
+
+        for sku, dc_id, count, d_available, d_reserved, d_in_transit, last_id in chunk:
+            inventory = inventories.get((sku, dc_id))
+            base = bases.get((sku, dc_id))
+            if base is None:
+                base = (
+                    (inventory.quantity_available, inventory.quantity_reserved, inventory.quantity_in_transit)
+                    if inventory else (0, 0, 0)
+                )
+
+            available = base[0] + int(d_available or 0)
+            reserved = base[1] + int(d_reserved or 0)
+            in_transit = base[2] + int(d_in_transit or 0)
+
+            db.session.add(InventorySnapshot(
+                product_sku=sku,
+                distribution_center_id=dc_id,
+                quantity_available=available,
+                quantity_reserved=reserved,
+                quantity_in_transit=in_transit,
+                # Las escrituras del SKU/centro van serializadas: todo id
+                # suyo que confirme después será mayor que last_id
+                last_movement_id=last_id,
+                movements_folded=count,
+                created_at=now
+            ))
+
+            if inventory is not None:
+                _project(inventory, available, reserved, in_transit, count, now, notify)
+
+            result['keys_compacted'] += 1
+            result['movements_folded'] += count
+
+        db.session.flush()
+        result['snapshots_pruned'] += _prune_superseded_snapshots(keys)
+
+    db.session.commit()
+
+    logger.info(
+        f"🗜️ Ledger compactado: {result['movements_folded']} movimientos en "
+        f"{result['keys_compacted']} SKU/centro (hasta id {cutoff})"
+    )
+    return result
+
+
+def _project(inventory: Inventory, available: int, reserved: int, in_transit: int,
+             movements: int, now: datetime, notify: bool):
+    """Actualiza la fila de `inventory` con el saldo compactado."""
+    from src.websockets.inventory_events import track_inventory_change
+
+    previous_for_sale = inventory.quantity_available - inventory.quantity_reserved
+    inventory.quantity_available = available
+    inventory.quantity_reserved = reserved
+    inventory.quantity_in_transit = in_transit
+    inventory.last_movement_date = now
+
+    if notify:
+        track_inventory_change(
+            product_sku=inventory.product_sku,
+            previous_quantity=previous_for_sale,
+            new_quantity=available - reserved,
+            distribution_center_id=inventory.distribution_center_id,
+            distribution_center_code=inventory.distribution_center.code if inventory.distribution_center else None,
+            minimum_stock_level=inventory.minimum_stock_level,
+            reorder_point=inventory.reorder_point,
+            metadata={
+                'inventory_id': inventory.id,
+                'quantity_reserved': reserved,
+                'quantity_in_transit': in_transit,
+                'ledger_movements': movements
+            },
+            auto_publish=True,
+            use_outbox=True
+        )
+
+
+def _keys_filter(model, keys: List[Tuple[str, int]]):
+    return or_(*[
+        and_(model.product_sku == sku, model.distribution_center_id == dc_id)
+        for sku, dc_id in keys
+    ])
+
+
+def _load_bases(keys: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Tuple[int, int, int]]:
+    """Último snapshot de cada SKU/centro."""
+    bases = {}
+    rows = (
+        InventorySnapshot.query
+        .filter(_keys_filter(InventorySnapshot, keys))
+        .order_by(InventorySnapshot.last_movement_id.asc())
+        .all()
+    )
+    for row in rows:
+        bases[(row.product_sku, row.distribution_center_id)] = (
+            row.quantity_available, row.quantity_reserved, row.quantity_in_transit
+        )
+    return bases
+
+
+def _prune_superseded_snapshots(keys: List[Tuple[str, int]]) -> int:
+    """Borra los snapshots que ya no son el último de su SKU/centro."""
+    latest = (
+        db.session.query(func.max(InventorySnapshot.id))
+        .filter(_keys_filter(InventorySnapshot, keys))
+        .group_by(InventorySnapshot.product_sku, InventorySnapshot.distribution_center_id)
+    )
+    return (
+        InventorySnapshot.query
+        .filter(_keys_filter(InventorySnapshot, keys), InventorySnapshot.id.notin_(latest))
+        .delete(synchronize_session=False)
+    )
@@ -19,6 +19,7 @@ from src.models.delivery_route import DeliveryRoute
 from src.models.route_stop import RouteStop
 from src.models.route_assignment import RouteAssignment
 from src.models.distribution_center import DistributionCenter
+from src.models.vehicle_occupancy import available_vehicles_query
 from src.services.google_maps_service import get_google_maps_service
 from src.utils.vrp_solver import VRPSolver
 from src.session import Session
@@ -102,7 +103,7 @@ class RouteOptimizerService:
                 raise ValueError(f"Centro de distribución {distribution_center_id} no encontrado")
             
             # 2. Obtener vehículos disponibles
-            vehicles = RouteOptimizerService._get_available_vehicles(distribution_center_id)
+            vehicles = RouteOptimizerService._get_available_vehicles(distribution_center_id, planned_date)
             if not vehicles:
                 return {
                     'status': 'failed',
@@ -268,12 +269,20 @@ class RouteOptimizerService:
             }
     
     @staticmethod
-    def _get_available_vehicles(distribution_center_id: int) -> List[Vehicle]:
-        """Obtiene vehículos disponibles para el centro de distribución."""
-        vehicles = Session.query(Vehicle).filter_by(
-            home_distribution_center_id=distribution_center_id,
-            is_available=True
-        ).all()
+    def _get_available_vehicles(distribution_center_id: int, planned_date: Optional[date] = None) -> List[Vehicle]:
+        """
+        Obtiene vehículos disponibles para el centro de distribución.
+        
+        Con `planned_date` se excluyen los vehículos ya ocupados ese día por
+        una ruta activa o en progreso (anti-join contra vehicle_occupancy).
+        """
+        if planned_date is not None:
+            vehicles = available_vehicles_query(distribution_center_id, planned_date).all()
+        else:
+            vehicles = Session.query(Vehicle).filter_by(
+                home_distribution_center_id=distribution_center_id,
+                is_available=True
+            ).all()
         
         logger.info(f"Encontrados {len(vehicles)} vehículos disponibles")
         return vehicles
@@ -0,0 +1,137 @@
+"""
+Caché de la vista de rutas por centro de distribución y día
+(GET /routes/date/<fecha>).
+
+El tablero de despacho consulta esa vista cada pocos segundos; el LRU con
+TTL corto (ROUTE_VIEW_CACHE_TTL) absorbe esos refrescos. Las escrituras
+confirmadas en este proceso sobre rutas, paradas o asignaciones
+(cambios de estado, reasignaciones, cancelaciones, generación) invalidan
+las vistas afectadas al hacer commit; en otros workers la entrada vence
+por TTL.
+"""
+
+import os
+import logging
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event as sa_event
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session as OrmSession
+
+from src.models.delivery_route import DeliveryRoute
+from src.models.route_stop import RouteStop
+from src.models.route_assignment import RouteAssignment
+from src.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL = 10  # segundos
+
+# Claves de session.info con lo modificado en la transacción en curso
+CHANGED_VIEWS_KEY = 'route_view_changed_days'
+CHANGED_ROUTES_KEY = 'route_view_changed_routes'
+
+
+class RouteViewCache:
+    """
+    LRU con TTL de (centro, fecha) → vista serializada. Cada entrada guarda
+    los IDs de sus rutas para invalidarla cuando cambia una parada o
+    asignación sin tener que resolver a qué día pertenece.
+
+    Las vistas devueltas se comparten entre peticiones: no modificarlas.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    def get(self, distribution_center_id: int, planned_date) -> Optional[Dict]:
+        entry = self._cache.get((distribution_center_id, planned_date))
+        return entry[0] if entry is not None else None
+
+    def put(self, distribution_center_id: int, planned_date, view: Dict, route_ids: Iterable[int]):
+        self._cache.put((distribution_center_id, planned_date), (view, frozenset(route_ids)))
+
+    def invalidate(self, days=(), route_ids=()):
+        """
+        Descarta las vistas de los (centro, fecha) indicados y las que
+        contienen alguna de las rutas indicadas.
+        """
+        days = set(days)
+        route_ids = set(route_ids)
+        stale = self._cache.invalidate_where(
+            lambda key, entry: key in days or not route_ids.isdisjoint(entry[1])
+        )
+        if stale:
+            logger.debug(f"🧹 Vistas de rutas invalidadas: {stale}")
+
+    def clear(self):
+        self._cache.clear()
+
+    def get_stats(self) -> Dict:
+        stats = self._cache.get_stats()
+        return {
+            'size': stats['size'],
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl,
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'hit_ratio': stats['hit_ratio']
+        }
+
+
+# Instancia global del caché del proceso
+route_view_cache = RouteViewCache(
+    max_size=int(os.getenv('ROUTE_VIEW_CACHE_SIZE', DEFAULT_CACHE_SIZE)),
+    ttl=float(os.getenv('ROUTE_VIEW_CACHE_TTL', DEFAULT_CACHE_TTL))
+)
+
+
+def _route_days(route: DeliveryRoute):
+    """(centro, fecha) actuales y anteriores de una ruta modificada."""
+    days = {(route.distribution_center_id, route.planned_date)}
+    state = sa_inspect(route)
+    dc_history = state.attrs.distribution_center_id.history
+    date_history = state.attrs.planned_date.history
+    for dc_id in (dc_history.deleted or ()):
+        days.add((dc_id, route.planned_date))
+    for planned_date in (date_history.deleted or ()):
+        days.add((route.distribution_center_id, planned_date))
+    return days
+
+
+@sa_event.listens_for(OrmSession, 'after_flush')
+def _collect_changed_views(session, flush_context):
+    """Anota en la sesión los días y rutas tocados por el flush."""
+    days = set()
+    route_ids = set()
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, DeliveryRoute):
+            days |= _route_days(instance)
+            route_ids.add(instance.id)
+        elif isinstance(instance, (RouteStop, RouteAssignment)):
+            route_ids.add(instance.route_id)
+            if isinstance(instance, RouteAssignment):
+                history = sa_inspect(instance).attrs.route_id.history
+                route_ids.update(history.deleted or ())
+
+    if days:
+        session.info.setdefault(CHANGED_VIEWS_KEY, set()).update(days)
+    if route_ids:
+        session.info.setdefault(CHANGED_ROUTES_KEY, set()).update(route_ids)
+
+
+@sa_event.listens_for(OrmSession, 'after_commit')
+def _invalidate_after_commit(session):
+    days = session.info.pop(CHANGED_VIEWS_KEY, None)
+    route_ids = session.info.pop(CHANGED_ROUTES_KEY, None)
+    if days or route_ids:
+        route_view_cache.invalidate(days or (), route_ids or ())
+
+
+@sa_event.listens_for(OrmSession, 'after_rollback')
+def _clear_changed_after_rollback(session):
+    session.info.pop(CHANGED_VIEWS_KEY, None)
+    session.info.pop(CHANGED_ROUTES_KEY, None)
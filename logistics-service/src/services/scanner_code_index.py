@@ -0,0 +1,182 @@
+"""
+Resolución de escaneos (código de barras, QR o código interno) a lote,
+ubicación y centro de distribución.
+
+Cada escaneo es UNA consulta: búsqueda por índice en `product_codes` y joins
+por clave primaria a lote, ubicación y centro. Delante hay un LRU en memoria
+con TTL. Los cambios de lotes confirmados en este proceso invalidan sus
+códigos al hacer commit; en otros workers la entrada vence por TTL
+(SCANNER_CODE_CACHE_TTL).
+
+Solo se cachea la identidad del lote (SKU, número, vencimiento, ubicación,
+centro); cantidades y estado se consultan con /inventory/product-location.
+"""
+
+import os
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session as OrmSession
+
+from src.session import db
+from src.models.product_batch import ProductBatch
+from src.models.product_code import ProductCode, CODE_TYPES, CHANGED_CODES_KEY, normalize_code
+from src.models.warehouse_location import WarehouseLocation
+from src.models.distribution_center import DistributionCenter
+from src.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 50000
+DEFAULT_CACHE_TTL = 300  # segundos
+
+
+class ScannerCodeCache:
+    """
+    LRU con TTL de código → lotes resueltos. Los códigos desconocidos no se
+    cachean: un lote recién creado en otro worker se encuentra en el
+    siguiente escaneo.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    def get(self, code: str, code_type: Optional[str]) -> Optional[List[Dict]]:
+        return self._cache.get((code, code_type))
+
+    def put(self, code: str, code_type: Optional[str], matches: List[Dict]):
+        self._cache.put((code, code_type), matches)
+
+    def invalidate(self, codes):
+        self._cache.invalidate(
+            (code, code_type) for code in codes for code_type in (None, *CODE_TYPES)
+        )
+
+    def clear(self):
+        self._cache.clear()
+
+    def get_stats(self) -> Dict:
+        stats = self._cache.get_stats()
+        return {
+            'size': stats['size'],
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl,
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'hit_ratio': stats['hit_ratio']
+        }
+
+
+# Instancia global del caché del proceso
+scanner_code_cache = ScannerCodeCache(
+    max_size=int(os.getenv('SCANNER_CODE_CACHE_SIZE', DEFAULT_CACHE_SIZE)),
+    ttl=float(os.getenv('SCANNER_CODE_CACHE_TTL', DEFAULT_CACHE_TTL))
+)
+
+
+@sa_event.listens_for(OrmSession, 'after_commit')
+def _invalidate_after_commit(session):
+    """Invalida los códigos de los lotes modificados en la transacción."""
+    codes = session.info.pop(CHANGED_CODES_KEY, None)
+    if codes:
+        scanner_code_cache.invalidate(codes)
+
+
+@sa_event.listens_for(OrmSession, 'after_rollback')
+def _clear_changed_after_rollback(session):
+    session.info.pop(CHANGED_CODES_KEY, None)
+
+
+def _query_code(code: str, code_type: Optional[str]) -> List[Dict]:
+    filters = [ProductCode.code == code]
+    if code_type:
+        filters.append(ProductCode.code_type == code_type)
+
+    rows = (
+        db.session.query(
+            ProductCode.code_type,
+            ProductBatch.id,
+            ProductBatch.product_sku,
+            ProductBatch.batch_number,
+            ProductBatch.expiry_date,
+            WarehouseLocation.id,
+            WarehouseLocation.aisle,
+            WarehouseLocation.shelf,
+            WarehouseLocation.level_position,
+            WarehouseLocation.zone_type,
+            DistributionCenter.id,
+            DistributionCenter.code,
+            DistributionCenter.name
+        )
+        .join(ProductBatch, ProductBatch.id == ProductCode.batch_id)
+        .join(WarehouseLocation, WarehouseLocation.id == ProductBatch.location_id)
+        .join(DistributionCenter, DistributionCenter.id == ProductBatch.distribution_center_id)
+        .filter(*filters)
+        .order_by(ProductBatch.expiry_date.asc(), ProductBatch.id.asc())
+        .all()
+    )
+
+    return [
+        {
+            'code_type': matched_type,
+            'batch': {
+                'id': batch_id,
+                'product_sku': sku,
+                'batch_number': batch_number,
+                'expiry_date': expiry_date.isoformat() if expiry_date else None
+            },
+            'location': {
+                'id': location_id,
+                'location_code': f"{aisle}-{shelf}-{level_position}",
+                'aisle': aisle,
+                'shelf': shelf,
+                'level_position': level_position,
+                'zone_type': zone_type
+            },
+            'distribution_center': {
+                'id': dc_id,
+                'code': dc_code,
+                'name': dc_name
+            }
+        }
+        for (matched_type, batch_id, sku, batch_number, expiry_date, location_id, aisle, shelf,
+             level_position, zone_type, dc_id, dc_code, dc_name) in rows
+    ]
+
+
+def lookup_code(code: str, code_type: Optional[str] = None, use_cache: bool = True):
+    """
+    Resuelve un código escaneado.
+
+    Args:
+        code: Código leído por el escáner
+        code_type: barcode, qr_code o internal_code (None = cualquiera)
+        use_cache: Consultar/poblar el LRU
+
+    Returns:
+        (coincidencias en orden FEFO, si vino del caché)
+    """
+    code = normalize_code(code)
+    if code is None:
+        return [], False
+
+    if use_cache:
+        cached = scanner_code_cache.get(code, code_type)
+        if cached is not None:
+            return cached, True
+
+    matches = _query_code(code, code_type)
+    if matches and use_cache:
+        scanner_code_cache.put(code, code_type, matches)
+    return matches, False
+
+
+def batch_ids_for_code(code: str, code_type: str):
+    """Subconsulta de IDs de lote para un código (filtro indexado)."""
+    return (
+        db.session.query(ProductCode.batch_id)
+        .filter(ProductCode.code == normalize_code(code), ProductCode.code_type == code_type)
+    )
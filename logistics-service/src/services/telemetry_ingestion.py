@@ -0,0 +1,897 @@
+"""
+Ingesta de posiciones GPS de conductores y recálculo de ETAs en vivo.
+
+Los conductores activos envían su posición cada pocos segundos por HTTP
+(POST /telemetry/positions, en lotes) o por Socket.IO (`position_update`).
+El request solo valida y encola; un hilo en segundo plano, cada
+`flush_interval` segundos:
+
+1. Inserta todas las posiciones pendientes en `vehicle_positions` con un
+   único INSERT por lote (executemany, multi-VALUES en PostgreSQL).
+2. Copia a `vehicles` solo la última posición de cada vehículo (un UPDATE
+   por vehículo en un executemany, y solo si es más reciente que la
+   guardada).
+3. Cada `eta_interval` segundos recalcula la hora estimada de llegada de
+   las paradas pendientes de las rutas que recibieron posiciones, usando la
+   matriz de tramos en caché de cada ruta, y emite `route_eta_updated` al
+   room `route_<id>`.
+
+Sin buffer (TESTING o TELEMETRY_ASYNC=false) las mismas operaciones se
+ejecutan de forma síncrona en el request.
+"""
+
+import os
+import threading
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, or_, select, update
+
+from src.session import db
+from src.errors.errors import ApiError, ValidationError
+from src.models.delivery_route import DeliveryRoute
+from src.models.route_stop import RouteStop
+from src.models.vehicle import Vehicle
+from src.models.vehicle_occupancy import OCCUPYING_STATUSES, VehicleOccupancy
+from src.models.vehicle_position import VehiclePosition
+from src.utils.geo import haversine_km
+from src.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 1.0  # segundos
+DEFAULT_ETA_INTERVAL = 5.0  # segundos
+DEFAULT_MAX_QUEUE = 200000  # posiciones pendientes antes de rechazar con 503
+DEFAULT_MAX_BATCH = 1000  # posiciones por request
+DEFAULT_LEG_CACHE_SIZE = 2048
+DEFAULT_LEG_CACHE_TTL = 300  # segundos
+DEFAULT_SPEED_KMH = 40.0
+
+# Ventana aceptada para `recorded_at` respecto a la recepción: pings más
+# viejos (reenvíos de un dispositivo que estuvo sin red) o del futuro (reloj
+# del dispositivo adelantado) se rechazan. Un ping del futuro dejaría fija la
+# última posición del vehículo y caería fuera de las particiones diarias.
+MAX_PING_AGE_HOURS = 24
+MAX_PING_CLOCK_SKEW_SECONDS = 300
+
+# Estados de parada que todavía esperan llegada / en los que el vehículo está detenido
+PENDING_STOP_STATUSES = ('pending',)
+AT_STOP_STATUSES = ('arrived', 'in_service')
+
+# Instancia global del buffer (será inicializada desde main.py)
+telemetry_buffer: Optional['TelemetryBuffer'] = None
+
+
+class PositionPing:
+    """Posición validada de un vehículo."""
+
+    __slots__ = (
+        'vehicle_id', 'route_id', 'latitude', 'longitude', 'speed_kmh',
+        'heading', 'accuracy_m', 'recorded_at', 'received_at'
+    )
+
+    def __init__(self, vehicle_id, latitude, longitude, recorded_at, route_id=None,
+                 speed_kmh=None, heading=None, accuracy_m=None, received_at=None):
+        self.vehicle_id = vehicle_id
+        self.route_id = route_id
+        self.latitude = latitude
+        self.longitude = longitude
+        self.speed_kmh = speed_kmh
+        self.heading = heading
+        self.accuracy_m = accuracy_m
+        self.recorded_at = recorded_at
+        self.received_at = received_at or datetime.utcnow()
+
+    def to_row(self) -> Dict:
+        return {
+            'vehicle_id': self.vehicle_id,
+            'route_id': self.route_id,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'speed_kmh': self.speed_kmh,
+            'heading': self.heading,
+            'accuracy_m': self.accuracy_m,
+            'recorded_at': self.recorded_at,
+            'received_at': self.received_at,
+        }
+
+
+# ----------------------------------------------------------------------
+# Validación
+# ----------------------------------------------------------------------
+
+def _optional_float(data: Dict, key: str, low: float = None, high: float = None):
+    value = data.get(key)
+    if value is None:
+        return None
+    value = float(value)
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise ValueError(f"{key} fuera de rango")
+    return value
+
+
+def _parse_timestamp(value) -> datetime:
+    """ISO 8601 o epoch en segundos → datetime UTC naive."""
+    if value is None:
+        return datetime.utcnow()
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc).replace(tzinfo=None)
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_position(data: Dict, received_at: datetime = None) -> PositionPing:
+    """
+    Valida una posición.
+
+    Formato:
+    {
+        "vehicle_id": 5,
+        "latitude": 4.6097,
+        "longitude": -74.0817,
+        "recorded_at": "2025-11-02T14:30:05Z",  // opcional (ISO o epoch), default: ahora
+                                                 // (de las últimas 24 h, hasta 5 min adelantado)
+        "route_id": 12,                          // opcional
+        "speed_kmh": 32.5, "heading": 180, "accuracy_m": 8  // opcionales
+    }
+
+    Raises:
+        ValueError: Si falta un campo o está fuera de rango
+    """
+    if not isinstance(data, dict):
+        raise ValueError("La posición debe ser un objeto")
+    for field in ('vehicle_id', 'latitude', 'longitude'):
+        if data.get(field) is None:
+            raise ValueError(f"{field} es requerido")
+
+    try:
+        vehicle_id = int(data['vehicle_id'])
+        route_id = int(data['route_id']) if data.get('route_id') is not None else None
+        latitude = _optional_float(data, 'latitude', -90, 90)
+        longitude = _optional_float(data, 'longitude', -180, 180)
+        speed_kmh = _optional_float(data, 'speed_kmh', 0, 400)
+        heading = _optional_float(data, 'heading', 0, 360)
+        accuracy_m = _optional_float(data, 'accuracy_m', 0)
+        recorded_at = _parse_timestamp(data.get('recorded_at'))
+    except (TypeError, ValueError, OverflowError, OSError) as e:
+        raise ValueError(str(e) or "Valor inválido")
+
+    reference = received_at or datetime.utcnow()
+    if recorded_at < reference - timedelta(hours=MAX_PING_AGE_HOURS):
+        raise ValueError(f"recorded_at tiene más de {MAX_PING_AGE_HOURS} horas")
+    if recorded_at > reference + timedelta(seconds=MAX_PING_CLOCK_SKEW_SECONDS):
+        raise ValueError("recorded_at está en el futuro")
+
+    return PositionPing(
+        vehicle_id=vehicle_id,
+        route_id=route_id,
+        latitude=latitude,
+        longitude=longitude,
+        speed_kmh=speed_kmh,
+        heading=heading,
+        accuracy_m=accuracy_m,
+        recorded_at=recorded_at,
+        received_at=received_at
+    )
+
+
+def parse_positions(items: Iterable[Dict]) -> Tuple[List[PositionPing], List[Dict]]:
+    """
+    Valida un lote de posiciones. Las inválidas se reportan por índice y no
+    detienen el resto del lote.
+
+    Returns:
+        (posiciones válidas, [{index, error}])
+    """
+    received_at = datetime.utcnow()
+    pings, rejected = [], []
+    for index, item in enumerate(items):
+        try:
+            pings.append(parse_position(item, received_at))
+        except ValueError as e:
+            rejected.append({'index': index, 'error': str(e)})
+    return pings, rejected
+
+
+# ----------------------------------------------------------------------
+# Escritura de posiciones
+# ----------------------------------------------------------------------
+
+def _latest_by_vehicle(pings: List[PositionPing]) -> Dict[int, PositionPing]:
+    latest: Dict[int, PositionPing] = {}
+    for ping in pings:
+        current = latest.get(ping.vehicle_id)
+        if current is None or ping.recorded_at >= current.recorded_at:
+            latest[ping.vehicle_id] = ping
+    return latest
+
+
+def _resolve_routes(pings: List[PositionPing], vehicle_ids):
+    """
+    Completa `route_id` de las posiciones que no lo traen con la ruta activa
+    del vehículo ese día, en una sola consulta al calendario de ocupación.
+    """
+    missing = [ping for ping in pings if ping.route_id is None]
+    if not missing:
+        return
+
+    days = {ping.recorded_at.date() for ping in missing}
+    rows = db.session.execute(
+        select(
+            VehicleOccupancy.vehicle_id,
+            VehicleOccupancy.planned_date,
+            VehicleOccupancy.route_id,
+            VehicleOccupancy.route_status
+        ).where(
+            VehicleOccupancy.vehicle_id.in_(vehicle_ids),
+            VehicleOccupancy.planned_date.in_(days)
+        )
+    ).all()
+
+    # Con varias rutas el mismo día, la que está en progreso gana
+    routes = {}
+    for vehicle_id, planned_date, route_id, route_status in rows:
+        key = (vehicle_id, planned_date)
+        if key not in routes or route_status == 'in_progress':
+            routes[key] = route_id
+
+    for ping in missing:
+        ping.route_id = routes.get((ping.vehicle_id, ping.recorded_at.date()))
+
+
+def persist_positions(pings: List[PositionPing]) -> Dict:
+    """
+    Inserta un lote de posiciones y actualiza la última posición de cada
+    vehículo. Las posiciones de vehículos inexistentes se descartan. Hace
+    commit. Debe ejecutarse dentro de un app context.
+
+    Returns:
+        {'written', 'dropped', 'vehicles_updated', 'latest_by_route': {route_id: PositionPing}}
+    """
+    if not pings:
+        return {'written': 0, 'dropped': 0, 'vehicles_updated': 0, 'latest_by_route': {}}
+
+    vehicle_ids = {ping.vehicle_id for ping in pings}
+    known = set(db.session.execute(
+        select(Vehicle.id).where(Vehicle.id.in_(vehicle_ids))
+    ).scalars())
+    valid = [ping for ping in pings if ping.vehicle_id in known]
+    dropped = len(pings) - len(valid)
+    if not valid:
+        return {'written': 0, 'dropped': dropped, 'vehicles_updated': 0, 'latest_by_route': {}}
+
+    _resolve_routes(valid, known)
+
+    db.session.execute(VehiclePosition.__table__.insert(), [ping.to_row() for ping in valid])
+
+    latest = _latest_by_vehicle(valid)
+    vehicles = Vehicle.__table__
+    result = db.session.execute(
+        update(vehicles)
+        .where(
+            vehicles.c.id == bindparam('b_id'),
+            or_(
+                vehicles.c.last_location_update.is_(None),
+                vehicles.c.last_location_update < bindparam('b_recorded_at')
+            )
+        )
+        # La posición no es un cambio del maestro de vehículos: updated_at se conserva
+        .values(
+            current_location_lat=bindparam('b_lat'),
+            current_location_lng=bindparam('b_lng'),
+            last_location_update=bindparam('b_recorded_at'),
+            updated_at=vehicles.c.updated_at
+        ),
+        [
+            {'b_id': ping.vehicle_id, 'b_lat': ping.latitude, 'b_lng': ping.longitude,
+             'b_recorded_at': ping.recorded_at}
+            for ping in latest.values()
+        ]
+    )
+    db.session.commit()
+
+    latest_by_route = {}
+    for ping in latest.values():
+        if ping.route_id is not None:
+            current = latest_by_route.get(ping.route_id)
+            if current is None or ping.recorded_at >= current.recorded_at:
+                latest_by_route[ping.route_id] = ping
+
+    return {
+        'written': len(valid),
+        'dropped': dropped,
+        'vehicles_updated': max(result.rowcount, 0),
+        'latest_by_route': latest_by_route
+    }
+
+
+# ----------------------------------------------------------------------
+# Matriz de tramos y ETAs
+# ----------------------------------------------------------------------
+
+class RouteLegs:
+    """
+    Geometría de las paradas de una ruta y matriz de minutos de viaje entre
+    ellas. Entre paradas consecutivas usa el tiempo planificado
+    (time_from_previous_minutes); el resto sale de haversine a la velocidad
+    promedio del vehículo.
+    """
+
+    __slots__ = ('stop_ids', 'sequence', 'stop_types', 'coordinates', 'service_minutes',
+                 'speed_kmh', 'minutes', 'index')
+
+    def __init__(self, stops: List, speed_kmh: float):
+        self.stop_ids = tuple(stop.id for stop in stops)
+        self.sequence = tuple(stop.sequence_order for stop in stops)
+        self.stop_types = tuple(stop.stop_type for stop in stops)
+        self.coordinates = tuple((float(stop.latitude), float(stop.longitude)) for stop in stops)
+        self.service_minutes = tuple(stop.estimated_service_time_minutes or 0 for stop in stops)
+        self.speed_kmh = speed_kmh or DEFAULT_SPEED_KMH
+        self.index = {stop_id: i for i, stop_id in enumerate(self.stop_ids)}
+
+        n = len(stops)
+        self.minutes = [[0.0] * n for _ in range(n)]
+        for i in range(n):
+            for j in range(n):
+                if i != j:
+                    self.minutes[i][j] = self.travel_minutes(*self.coordinates[i], j)
+        for i in range(1, n):
+            planned = stops[i].time_from_previous_minutes
+            if planned:
+                self.minutes[i - 1][i] = float(planned)
+
+    def travel_minutes(self, lat: float, lng: float, to_index: int) -> float:
+        km = haversine_km(lat, lng, *self.coordinates[to_index])
+        return km / self.speed_kmh * 60
+
+    def estimate(self, ping: PositionPing, statuses: Dict[int, str]) -> List[Tuple[int, datetime]]:
+        """
+        ETAs de las paradas pendientes (sin el depósito de salida) a partir
+        de la posición actual.
+
+        Returns:
+            [(stop_id, eta)] en orden de secuencia
+        """
+        remaining = [
+            i for i, stop_id in enumerate(self.stop_ids)
+            if statuses.get(stop_id) in PENDING_STOP_STATUSES
+            and not (self.stop_types[i] == 'depot' and i == 0)
+        ]
+        if not remaining:
+            return []
+
+        clock = ping.recorded_at
+        # Si el vehículo está en una parada, primero termina el servicio
+        for i, stop_id in enumerate(self.stop_ids):
+            if statuses.get(stop_id) in AT_STOP_STATUSES and i < remaining[0]:
+                clock += timedelta(minutes=self.service_minutes[i])
+                break
+
+        first = remaining[0]
+        clock += timedelta(minutes=self.travel_minutes(float(ping.latitude), float(ping.longitude), first))
+        etas = [(self.stop_ids[first], clock)]
+        previous = first
+        for i in remaining[1:]:
+            clock += timedelta(minutes=self.service_minutes[previous] + self.minutes[previous][i])
+            etas.append((self.stop_ids[i], clock))
+            previous = i
+        return etas
+
+
+class LegMatrixCache:
+    """
+    LRU con TTL de ruta → RouteLegs. Si cambia el conjunto de paradas de la
+    ruta (re-planificación) la entrada se reconstruye.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_LEG_CACHE_SIZE, ttl: float = DEFAULT_LEG_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def get(self, route_id: int, stop_ids=None) -> Optional[RouteLegs]:
+        if stop_ids is None:
+            return self._cache.get(route_id)
+        stop_ids = set(stop_ids)
+        return self._cache.get(route_id, accept=lambda legs: set(legs.stop_ids) == stop_ids)
+
+    def put(self, route_id: int, legs: RouteLegs):
+        self._cache.put(route_id, legs)
+
+    def invalidate(self, route_ids: Iterable[int]):
+        self._cache.invalidate(route_ids)
+
+    def clear(self):
+        self._cache.clear()
+
+    def get_stats(self) -> Dict:
+        stats = self._cache.get_stats()
+        return {
+            'size': stats['size'],
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl,
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'hit_ratio': stats['hit_ratio']
+        }
+
+
+# Instancia global del caché de tramos del proceso
+leg_matrix_cache = LegMatrixCache(
+    max_size=int(os.getenv('TELEMETRY_LEG_CACHE_SIZE', DEFAULT_LEG_CACHE_SIZE)),
+    ttl=float(os.getenv('TELEMETRY_LEG_CACHE_TTL', DEFAULT_LEG_CACHE_TTL))
+)
+
+
+def _load_route_legs(routes: Dict[int, int]) -> Dict[int, RouteLegs]:
+    """Construye RouteLegs de varias rutas con una consulta de paradas y una de vehículos."""
+    if not routes:
+        return {}
+
+    speeds = dict(db.session.execute(
+        select(Vehicle.id, Vehicle.avg_speed_kmh).where(Vehicle.id.in_(set(routes.values())))
+    ).all())
+    stops_by_route: Dict[int, List] = {}
+    for stop in db.session.execute(
+        select(
+            RouteStop.id, RouteStop.route_id, RouteStop.sequence_order, RouteStop.stop_type,
+            RouteStop.latitude, RouteStop.longitude, RouteStop.estimated_service_time_minutes,
+            RouteStop.time_from_previous_minutes
+        )
+        .where(RouteStop.route_id.in_(routes.keys()))
+        .order_by(RouteStop.route_id, RouteStop.sequence_order)
+    ).all():
+        stops_by_route.setdefault(stop.route_id, []).append(stop)
+
+    legs = {}
+    for route_id, stops in stops_by_route.items():
+        speed = speeds.get(routes[route_id])
+        legs[route_id] = RouteLegs(stops, float(speed) if speed else DEFAULT_SPEED_KMH)
+        leg_matrix_cache.put(route_id, legs[route_id])
+    return legs
+
+
+def recompute_route_etas(latest_by_route: Dict[int, PositionPing], notify: bool = True) -> List[Dict]:
+    """
+    Recalcula y guarda la ETA de las paradas pendientes de las rutas
+    activas o en progreso indicadas, y emite `route_eta_updated` por ruta.
+    Hace commit. Debe ejecutarse dentro de un app context.
+
+    Returns:
+        Payloads emitidos (uno por ruta con paradas pendientes)
+    """
+    if not latest_by_route:
+        return []
+
+    routes = dict(db.session.execute(
+        select(DeliveryRoute.id, DeliveryRoute.vehicle_id).where(
+            DeliveryRoute.id.in_(latest_by_route.keys()),
+            DeliveryRoute.status.in_(OCCUPYING_STATUSES)
+        )
+    ).all())
+    if not routes:
+        return []
+
+    statuses: Dict[int, Dict[int, str]] = {route_id: {} for route_id in routes}
+    for stop_id, route_id, status in db.session.execute(
+        select(RouteStop.id, RouteStop.route_id, RouteStop.status)
+        .where(RouteStop.route_id.in_(routes.keys()))
+    ).all():
+        statuses[route_id][stop_id] = status
+
+    legs_by_route = {}
+    missing = {}
+    for route_id, vehicle_id in routes.items():
+        legs = leg_matrix_cache.get(route_id, statuses[route_id].keys())
+        if legs is None:
+            missing[route_id] = vehicle_id
+        else:
+            legs_by_route[route_id] = legs
+    legs_by_route.update(_load_route_legs(missing))
+
+    updates, payloads = [], []
+    timestamp = datetime.utcnow().isoformat()
+    for route_id, legs in legs_by_route.items():
+        ping = latest_by_route[route_id]
+        etas = legs.estimate(ping, statuses[route_id])
+        if not etas:
+            continue
+        updates.extend({'b_id': stop_id, 'b_eta': eta} for stop_id, eta in etas)
+        payloads.append({
+            'route_id': route_id,
+            'vehicle_id': routes[route_id],
+            'position': {
+                'latitude': ping.latitude,
+                'longitude': ping.longitude,
+                'speed_kmh': ping.speed_kmh,
+                'heading': ping.heading,
+                'recorded_at': ping.recorded_at.isoformat(),
+            },
+            'stops': [
+                {
+                    'stop_id': stop_id,
+                    'sequence_order': legs.sequence[legs.index[stop_id]],
+                    'estimated_arrival_time': eta.isoformat(),
+                }
+                for stop_id, eta in etas
+            ],
+            'timestamp': timestamp,
+        })
+
+    if updates:
+        stops = RouteStop.__table__
+        # La ETA es un dato en vivo: no cuenta como edición de la parada (updated_at)
+        db.session.execute(
+            update(stops)
+            .where(stops.c.id == bindparam('b_id'))
+            .values(estimated_arrival_time=bindparam('b_eta'), updated_at=stops.c.updated_at),
+            updates
+        )
+        db.session.commit()
+
+    if notify and payloads:
+        from src.websockets.websocket_manager import RouteNotifier
+        RouteNotifier.notify_route_etas(payloads)
+
+    return payloads
+
+
+# ----------------------------------------------------------------------
+# Buffer
+# ----------------------------------------------------------------------
+
+class TelemetryBuffer:
+    """
+    Buffer de posiciones que escribe por lotes y recalcula ETAs fuera del
+    hilo del request.
+    """
+
+    def __init__(self, app=None, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 eta_interval: float = DEFAULT_ETA_INTERVAL, max_queue: int = DEFAULT_MAX_QUEUE):
+        self.app = app
+        self.flush_interval = flush_interval
+        self.eta_interval = eta_interval
+        self.max_queue = max_queue
+        self._pending: List[PositionPing] = []
+        self._routes_due: Dict[int, PositionPing] = {}
+        self._last_eta_run = time.monotonic()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Métricas
+        self.pings_enqueued = 0
+        self.pings_rejected = 0
+        self.pings_written = 0
+        self.pings_dropped = 0
+        self.pings_failed = 0
+        self.flush_count = 0
+        self.flush_errors = 0
+        self.eta_runs = 0
+        self.eta_routes_updated = 0
+        self.last_flush_latency_ms = 0.0
+        self.max_flush_latency_ms = 0.0
+        self.total_flush_latency_ms = 0.0
+        self.last_eta_latency_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Inicia el hilo de flush periódico."""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name='telemetry-buffer',
+            daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"✅ Buffer de telemetría iniciado (flush cada {self.flush_interval}s, "
+            f"ETAs cada {self.eta_interval}s)"
+        )
+
+    def stop(self, flush: bool = True):
+        """Detiene el hilo y, opcionalmente, escribe lo pendiente."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(self.flush_interval * 2, 1.0))
+            self._thread = None
+        if flush:
+            self.flush(force_eta=True)
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    # ------------------------------------------------------------------
+    # Encolado y flush
+    # ------------------------------------------------------------------
+
+    def enqueue_many(self, pings: List[PositionPing]) -> bool:
+        """
+        Encola un lote completo. Es la única operación en el hilo del request.
+
+        Returns:
+            False si el lote no cabe en la cola (el cliente debe reintentar)
+        """
+        with self._lock:
+            if len(self._pending) + len(pings) > self.max_queue:
+                self.pings_rejected += len(pings)
+                return False
+            self._pending.extend(pings)
+            self.pings_enqueued += len(pings)
+            return True
+
+    def flush(self, force_eta: bool = False) -> int:
+        """
+        Escribe las posiciones pendientes y, si toca, recalcula ETAs.
+
+        Returns:
+            Número de posiciones escritas
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending = self._pending
+                self._pending = []
+
+            if pending:
+                started = time.perf_counter()
+                with self._context():
+                    try:
+                        result = persist_positions(pending)
+                    except Exception as e:
+                        db.session.rollback()
+                        self.flush_errors += 1
+                        logger.error(
+                            f"❌ Error en flush de telemetría ({len(pending)} posiciones), "
+                            f"reintentando una por una: {str(e)}",
+                            exc_info=True
+                        )
+                        result = self._persist_one_by_one(pending)
+
+                latency_ms = (time.perf_counter() - started) * 1000
+                self.flush_count += 1
+                self.pings_written += result['written']
+                self.pings_dropped += result['dropped']
+                self.last_flush_latency_ms = latency_ms
+                self.max_flush_latency_ms = max(self.max_flush_latency_ms, latency_ms)
+                self.total_flush_latency_ms += latency_ms
+                self._merge_routes_due(result['latest_by_route'])
+                logger.debug(
+                    f"📍 Flush de telemetría: {result['written']} posiciones, "
+                    f"{result['vehicles_updated']} vehículos en {latency_ms:.1f}ms"
+                )
+
+            if force_eta or time.monotonic() - self._last_eta_run >= self.eta_interval:
+                self._run_etas()
+
+            return result['written'] if pending else 0
+
+    def _persist_one_by_one(self, pings: List[PositionPing]) -> Dict:
+        """
+        Escribe un lote que falló como INSERT único, posición por posición,
+        para conservar las válidas. Las que vuelven a fallar se descartan.
+        """
+        result = {'written': 0, 'dropped': 0, 'vehicles_updated': 0, 'latest_by_route': {}}
+        for ping in pings:
+            try:
+                single = persist_positions([ping])
+            except Exception as e:
+                db.session.rollback()
+                self.pings_failed += 1
+                logger.warning(
+                    f"⚠️ Posición descartada (vehículo {ping.vehicle_id}, {ping.recorded_at}): {str(e)}"
+                )
+                continue
+            result['written'] += single['written']
+            result['dropped'] += single['dropped']
+            result['vehicles_updated'] += single['vehicles_updated']
+            for route_id, latest in single['latest_by_route'].items():
+                current = result['latest_by_route'].get(route_id)
+                if current is None or latest.recorded_at >= current.recorded_at:
+                    result['latest_by_route'][route_id] = latest
+        return result
+
+    def _merge_routes_due(self, latest_by_route: Dict[int, PositionPing]):
+        for route_id, ping in latest_by_route.items():
+            current = self._routes_due.get(route_id)
+            if current is None or ping.recorded_at >= current.recorded_at:
+                self._routes_due[route_id] = ping
+
+    def _run_etas(self):
+        self._last_eta_run = time.monotonic()
+        if not self._routes_due:
+            return
+        routes_due, self._routes_due = self._routes_due, {}
+
+        started = time.perf_counter()
+        with self._context():
+            try:
+                payloads = recompute_route_etas(routes_due)
+            except Exception as e:
+                db.session.rollback()
+                self.flush_errors += 1
+                logger.error(f"❌ Error recalculando ETAs: {str(e)}", exc_info=True)
+                return
+
+        self.eta_runs += 1
+        self.eta_routes_updated += len(payloads)
+        self.last_eta_latency_ms = (time.perf_counter() - started) * 1000
+
+    def _context(self):
+        if self.app is not None:
+            return self.app.app_context()
+        return _NullContext()
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            queue_depth = len(self._pending)
+
+        return {
+            'running': self.is_running,
+            'flush_interval_ms': int(self.flush_interval * 1000),
+            'eta_interval_ms': int(self.eta_interval * 1000),
+            'queue_depth': queue_depth,
+            'max_queue': self.max_queue,
+            'routes_due': len(self._routes_due),
+            'pings_enqueued': self.pings_enqueued,
+            'pings_rejected': self.pings_rejected,
+            'pings_written': self.pings_written,
+            'pings_dropped': self.pings_dropped,
+            'pings_failed': self.pings_failed,
+            'flush_count': self.flush_count,
+            'flush_errors': self.flush_errors,
+            'eta_runs': self.eta_runs,
+            'eta_routes_updated': self.eta_routes_updated,
+            'last_flush_latency_ms': round(self.last_flush_latency_ms, 2),
+            'max_flush_latency_ms': round(self.max_flush_latency_ms, 2),
+            'avg_flush_latency_ms': (
+                round(self.total_flush_latency_ms / self.flush_count, 2)
+                if self.flush_count else None
+            ),
+            'last_eta_latency_ms': round(self.last_eta_latency_ms, 2),
+            'leg_cache': leg_matrix_cache.get_stats(),
+        }
+
+
+class _NullContext:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+# ----------------------------------------------------------------------
+# Punto de entrada (HTTP y Socket.IO)
+# ----------------------------------------------------------------------
+
+def _max_batch() -> int:
+    from flask import current_app
+    return int(current_app.config.get(
+        'TELEMETRY_MAX_BATCH', os.getenv('TELEMETRY_MAX_BATCH', DEFAULT_MAX_BATCH)
+    ))
+
+
+def ingest_positions(items) -> Dict:
+    """
+    Valida y encola (o escribe, sin buffer) un lote de posiciones.
+
+    Raises:
+        ValidationError: Lote vacío, demasiado grande o sin posiciones válidas
+        ApiError (503): La cola del buffer está llena
+
+    Returns:
+        {'accepted', 'rejected', 'mode'}
+    """
+    if isinstance(items, dict):
+        items = items.get('positions', [items])
+    if not isinstance(items, list) or not items:
+        raise ValidationError("Se requiere al menos una posición")
+
+    max_batch = _max_batch()
+    if len(items) > max_batch:
+        raise ValidationError(f"Máximo {max_batch} posiciones por lote")
+
+    pings, rejected = parse_positions(items)
+    if not pings:
+        raise ValidationError("Ninguna posición válida", payload={'rejected': rejected})
+
+    buffer = get_telemetry_buffer()
+    if buffer is not None:
+        if not buffer.enqueue_many(pings):
+            raise ApiError(
+                "Buffer de telemetría lleno, reintente en unos segundos",
+                status_code=503,
+                payload={'retry_after_seconds': max(1, int(buffer.flush_interval))}
+            )
+        return {'accepted': len(pings), 'rejected': rejected, 'mode': 'async'}
+
+    result = persist_positions(pings)
+    recompute_route_etas(result['latest_by_route'])
+    return {
+        'accepted': len(pings),
+        'rejected': rejected,
+        'mode': 'sync',
+        'written': result['written'],
+        'dropped': result['dropped'],
+    }
+
+
+def init_telemetry_buffer(app) -> Optional[TelemetryBuffer]:
+    """
+    Inicializa el buffer de telemetría.
+
+    Se desactiva con TELEMETRY_ASYNC=false (y por defecto en TESTING); en ese
+    caso las posiciones se escriben de forma síncrona en el request.
+
+    Args:
+        app: Instancia de Flask app
+    """
+    global telemetry_buffer
+
+    enabled = app.config.get('TELEMETRY_ASYNC')
+    if enabled is None:
+        enabled = (
+            not app.config.get('TESTING', False)
+            and os.getenv('TELEMETRY_ASYNC', 'true').lower() in ['true', '1', 'yes']
+        )
+
+    if not enabled:
+        return None
+
+    if telemetry_buffer is not None and telemetry_buffer.is_running:
+        logger.warning("⚠️ Buffer de telemetría ya está inicializado")
+        return telemetry_buffer
+
+    def setting(key, default):
+        return float(app.config.get(key, os.getenv(key, default)))
+
+    telemetry_buffer = TelemetryBuffer(
+        app=app,
+        flush_interval=setting('TELEMETRY_FLUSH_MS', DEFAULT_FLUSH_INTERVAL * 1000) / 1000.0,
+        eta_interval=setting('TELEMETRY_ETA_INTERVAL_MS', DEFAULT_ETA_INTERVAL * 1000) / 1000.0,
+        max_queue=int(setting('TELEMETRY_MAX_QUEUE', DEFAULT_MAX_QUEUE))
+    )
+    telemetry_buffer.start()
+    return telemetry_buffer
+
+
+def shutdown_telemetry_buffer():
+    """Detiene el buffer escribiendo las posiciones pendientes."""
+    global telemetry_buffer
+
+    if telemetry_buffer is not None:
+        telemetry_buffer.stop(flush=True)
+        telemetry_buffer = None
+        logger.info("✅ Buffer de telemetría detenido")
+
+
+def get_telemetry_buffer() -> Optional[TelemetryBuffer]:
+    """Obtiene la instancia del buffer (None si se escribe de forma síncrona)."""
+    return telemetry_buffer
@@ -0,0 +1,15 @@
+"""
+Utilidades geográficas compartidas por la planificación de rutas y la
+telemetría.
+"""
+
+from math import asin, cos, radians, sin, sqrt
+
+EARTH_RADIUS_KM = 6371
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> float:
+    """Distancia en km por la superficie entre dos coordenadas (grados)."""
+    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * asin(sqrt(a)) * EARTH_RADIUS_KM
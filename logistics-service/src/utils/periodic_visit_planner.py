@@ -0,0 +1,466 @@
+"""
+Planificación semanal de visitas de un vendedor (VRP periódico) con OR-Tools.
+
+Dos fases:
+
+1. Asignación a días: cada cliente recibe un patrón de días compatible con su
+   frecuencia (`visits_per_week`), sus días permitidos y su ventana horaria.
+   Los patrones reparten las visitas espaciadas (2 visitas en 5 días: lunes y
+   miércoles, lunes y jueves, ...). Se asignan primero los clientes más
+   restringidos; cada patrón se evalúa por la distancia del cliente al más
+   cercano ya asignado ese día (agrupa zonas) y se descarta si excede la
+   capacidad estimada del día (jornada de trabajo).
+2. Secuencia de cada día: TSP con ventanas horarias y jornada
+   (`work_start_time`/`work_end_time`). Cada día arranca desde la solución
+   del día anterior (mismo orden para los clientes repetidos, inserción más
+   barata de los nuevos) y recibe una parte del presupuesto de tiempo que
+   queda, de modo que la semana completa respeta un presupuesto fijo.
+
+Los tiempos se manejan en minutos desde medianoche; las distancias en km
+(haversine) y el viaje a MINUTES_PER_KM minutos por km.
+"""
+
+import logging
+import time as _time
+from datetime import time
+from itertools import combinations
+from math import ceil
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ortools.constraint_solver import routing_enums_pb2
+from ortools.constraint_solver import pywrapcp
+
+from src.utils.geo import haversine_km
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_KM = 2  # ~30 km/h, igual que la ruta de un día
+MIN_DAY_TIME_LIMIT_MS = 100
+
+# Las visitas solo se descartan si no caben en su ventana o en la jornada
+_DROP_PENALTY = 10_000_000
+# Margen de la capacidad estimada del día al asignar (el viaje real varía)
+_DAY_FILL_FACTOR = 0.85
+# Km equivalentes a tener un día (o una ventana) lleno: reparte la carga
+_BALANCE_KM = 5.0
+
+
+def time_to_minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def day_patterns(frequency: int, days: Sequence[int]) -> List[Tuple[int, ...]]:
+    """
+    Combinaciones de `frequency` días entre `days` con las visitas espaciadas
+    al menos len(days) // frequency días. Si los días permitidos no admiten
+    ese espaciado, se aceptan todas las combinaciones.
+    """
+    days = sorted(set(days))
+    if frequency > len(days):
+        return []
+    candidates = list(combinations(days, frequency))
+    if frequency == 1:
+        return candidates
+    min_gap = max(1, len(days) // frequency)
+    spaced = [
+        pattern for pattern in candidates
+        if all(b - a >= min_gap for a, b in zip(pattern, pattern[1:]))
+    ]
+    return spaced or candidates
+
+
+class WeeklyVisitPlanner:
+    """
+    VRP periódico de un vendedor: reparte los clientes en los días de trabajo
+    y secuencia cada día.
+    """
+
+    def __init__(
+        self,
+        customers: List[Dict],
+        num_days: int,
+        work_start_time: time = time(8, 0),
+        work_end_time: time = time(18, 0),
+        service_time_minutes: int = 30,
+        start_location: Optional[Dict] = None,
+        return_to_start: bool = False,
+        minutes_per_km: float = MINUTES_PER_KM
+    ):
+        """
+        Args:
+            customers: Clientes con 'customer_id', 'latitude', 'longitude' y
+                opcionalmente 'visits_per_week' (default 1), 'allowed_days'
+                (índices de día), 'time_window_start'/'time_window_end'
+                (datetime.time) y 'service_time_minutes'
+            num_days: Días de trabajo de la semana (índices 0..num_days-1)
+            start_location: Punto de salida ({'latitude', 'longitude'}); sin
+                él la ruta empieza en el primer cliente
+            return_to_start: Si la ruta vuelve al punto de salida
+        """
+        self.customers = customers
+        self.num_days = num_days
+        self.work_start = time_to_minutes(work_start_time)
+        self.work_end = time_to_minutes(work_end_time)
+        self.service_time_minutes = service_time_minutes
+        self.start_location = start_location
+        self.return_to_start = bool(start_location) and return_to_start
+        self.minutes_per_km = minutes_per_km
+
+        # Nodo 0: salida (o depósito virtual a distancia 0 de todos)
+        points = [(c['latitude'], c['longitude']) for c in customers]
+        self._has_depot = bool(start_location)
+        size = len(points) + 1
+        self.distances = [[0.0] * size for _ in range(size)]
+        for i in range(len(points)):
+            for j in range(i + 1, len(points)):
+                d = haversine_km(*points[i], *points[j])
+                self.distances[i + 1][j + 1] = self.distances[j + 1][i + 1] = d
+            if self._has_depot:
+                d = haversine_km(start_location['latitude'], start_location['longitude'], *points[i])
+                self.distances[0][i + 1] = self.distances[i + 1][0] = d
+
+    # ------------------------------------------------------------------
+    # Datos por cliente
+    # ------------------------------------------------------------------
+
+    def service_minutes(self, index: int) -> int:
+        return int(self.customers[index].get('service_time_minutes') or self.service_time_minutes)
+
+    def window(self, index: int) -> Tuple[int, int]:
+        """Ventana de llegada del cliente recortada a la jornada."""
+        customer = self.customers[index]
+        start, end = self.work_start, self.work_end - self.service_minutes(index)
+        if customer.get('time_window_start'):
+            start = max(start, time_to_minutes(customer['time_window_start']))
+        if customer.get('time_window_end'):
+            end = min(end, time_to_minutes(customer['time_window_end']))
+        return start, end
+
+    def travel_minutes(self, i: int, j: int) -> int:
+        """Minutos de viaje entre nodos (0 = salida)."""
+        if j == 0 and not self.return_to_start:
+            return 0
+        return int(ceil(self.distances[i][j] * self.minutes_per_km))
+
+    # ------------------------------------------------------------------
+    # Fase 1: asignación a días
+    # ------------------------------------------------------------------
+
+    def assign_days(self) -> Tuple[List[List[int]], List[Dict]]:
+        """
+        Returns:
+            (days, unassigned)
+            - days: índices de cliente asignados a cada día
+            - unassigned: [{'index', 'reason'}] clientes sin patrón factible
+        """
+        capacity = (self.work_end - self.work_start) * _DAY_FILL_FACTOR
+        days: List[List[int]] = [[] for _ in range(self.num_days)]
+        # Minutos estimados (servicio + viaje desde el vecino más cercano) por cliente y día
+        load: List[Dict[int, float]] = [{} for _ in range(self.num_days)]
+        unassigned = []
+
+        candidates = {}
+        for index, customer in enumerate(self.customers):
+            start, end = self.window(index)
+            if start > end:
+                unassigned.append({'index': index, 'reason': 'Ventana horaria fuera de la jornada'})
+                continue
+            allowed = customer.get('allowed_days')
+            allowed = range(self.num_days) if allowed is None else [d for d in allowed if 0 <= d < self.num_days]
+            patterns = day_patterns(int(customer.get('visits_per_week') or 1), allowed)
+            if not patterns:
+                unassigned.append({'index': index, 'reason': 'Frecuencia mayor que los días permitidos'})
+                continue
+            candidates[index] = patterns
+
+        # Más restringidos primero: frecuencia alta, pocos patrones, ventana angosta
+        order = sorted(candidates, key=lambda i: (
+            -len(candidates[i][0]), len(candidates[i]), self.window(i)[1] - self.window(i)[0]
+        ))
+
+        for index in order:
+            best = None
+            for pattern in candidates[index]:
+                cost = 0.0
+                for day in pattern:
+                    nearest, added = self._day_insertion(index, days[day], load)
+                    day_fill = (sum(load[day].values()) + added) / capacity
+                    window_fill = self._window_fill(index, day, days, load, added)
+                    if day_fill > 1 or window_fill > 1:
+                        break
+                    # Km al vecino más cercano, más un recargo por ocupación del día y de la ventana
+                    cost += nearest + _BALANCE_KM * (day_fill + window_fill)
+                else:
+                    if best is None or cost < best[0]:
+                        best = (cost, pattern)
+
+            if best is None:
+                unassigned.append({'index': index, 'reason': 'No cabe en la jornada de los días permitidos'})
+                continue
+            for day in best[1]:
+                load[day][index] = self._day_insertion(index, days[day], load)[1]
+                days[day].append(index)
+
+        return days, unassigned
+
+    def _day_insertion(self, index: int, day_customers: List[int], load) -> Tuple[float, float]:
+        """(km al cliente más cercano del día o a la salida, minutos que agrega al día)."""
+        node = index + 1
+        nearest = min(
+            (self.distances[node][other + 1] for other in day_customers),
+            default=self.distances[node][0]
+        )
+        return nearest, self.service_minutes(index) + nearest * self.minutes_per_km
+
+    def _window_fill(self, index: int, day: int, days: List[List[int]], load, added: float) -> float:
+        """
+        Ocupación de la ventana del candidato con los clientes del día cuya
+        ventana cae dentro de ella (0 si el cliente no tiene ventana propia).
+        """
+        start, end = self.window(index)
+        if (start, end) == (self.work_start, self.work_end - self.service_minutes(index)):
+            return 0.0
+        inside = sum(
+            load[day][other] for other in days[day]
+            if start <= self.window(other)[0] and self.window(other)[1] <= end
+        )
+        return (inside + added) / ((end - start + self.service_minutes(index)) * _DAY_FILL_FACTOR)
+
+    # ------------------------------------------------------------------
+    # Fase 2: secuencia de cada día
+    # ------------------------------------------------------------------
+
+    def _warm_order(self, day_customers: List[int], previous_order: List[int]) -> List[int]:
+        """
+        Orden inicial del día: los clientes que ya estaban en el día anterior
+        conservan su orden y los nuevos (ventanas más estrechas primero) se
+        insertan en la posición más barata que respete las ventanas.
+        """
+        members = set(day_customers)
+        order = [index for index in previous_order if index in members]
+        placed = set(order)
+        pending = sorted((i for i in day_customers if i not in placed), key=lambda i: self.window(i)[1])
+        for index in pending:
+            positions = sorted(
+                range(len(order) + 1),
+                key=lambda position: self.order_distance(order[:position] + [index] + order[position:])
+            )
+            best = positions[0]
+            for position in positions:
+                candidate = order[:position] + [index] + order[position:]
+                if len(self._feasible_subsequence(candidate)) == len(candidate):
+                    best = position
+                    break
+            order.insert(best, index)
+        return order
+
+    def sequence_day(self, day_customers: List[int], initial_order: Optional[List[int]] = None,
+                     time_limit_ms: int = 1000) -> Dict:
+        """
+        TSP con ventanas horarias de un día.
+
+        Returns:
+            {
+                'sequence': [índices de cliente en orden],
+                'arrival_minutes': [llegada a cada uno, minutos desde medianoche],
+                'dropped': [índices que no caben en su ventana/jornada],
+                'distance_km': float,
+                'warm_started': bool
+            }
+        """
+        if not day_customers:
+            return {'sequence': [], 'arrival_minutes': [], 'dropped': [], 'distance_km': 0.0, 'warm_started': False}
+
+        nodes = [0] + [index + 1 for index in day_customers]
+        size = len(nodes)
+        manager = pywrapcp.RoutingIndexManager(size, 1, 0)
+        routing = pywrapcp.RoutingModel(manager)
+
+        def arc_meters(a, b):
+            if b == 0 and not self.return_to_start:
+                return 0
+            if a == 0 and not self._has_depot:
+                return 0
+            return int(self.distances[a][b] * 1000)
+
+        cost_matrix = [[arc_meters(nodes[i], nodes[j]) for j in range(size)] for i in range(size)]
+        time_matrix = [
+            [
+                (self.service_minutes(nodes[i] - 1) if i else 0)
+                + (0 if (i == 0 and not self._has_depot) else self.travel_minutes(nodes[i], nodes[j]))
+                for j in range(size)
+            ]
+            for i in range(size)
+        ]
+
+        def distance_callback(from_index, to_index):
+            return cost_matrix[manager.IndexToNode(from_index)][manager.IndexToNode(to_index)]
+
+        def time_callback(from_index, to_index):
+            return time_matrix[manager.IndexToNode(from_index)][manager.IndexToNode(to_index)]
+
+        routing.SetArcCostEvaluatorOfAllVehicles(routing.RegisterTransitCallback(distance_callback))
+        time_index = routing.RegisterTransitCallback(time_callback)
+        day_length = self.work_end - self.work_start
+        routing.AddDimension(time_index, day_length, self.work_end, False, 'Time')
+        time_dimension = routing.GetDimensionOrDie('Time')
+
+        time_dimension.CumulVar(routing.Start(0)).SetRange(self.work_start, self.work_end)
+        time_dimension.CumulVar(routing.End(0)).SetRange(self.work_start, self.work_end)
+        for position, index in enumerate(day_customers, start=1):
+            start, end = self.window(index)
+            routing_index = manager.NodeToIndex(position)
+            time_dimension.CumulVar(routing_index).SetRange(start, end)
+            routing.AddDisjunction([routing_index], _DROP_PENALTY)
+        routing.AddVariableMinimizedByFinalizer(time_dimension.CumulVar(routing.Start(0)))
+        routing.AddVariableMinimizedByFinalizer(time_dimension.CumulVar(routing.End(0)))
+
+        search_parameters = pywrapcp.DefaultRoutingSearchParameters()
+        search_parameters.first_solution_strategy = (
+            routing_enums_pb2.FirstSolutionStrategy.PARALLEL_CHEAPEST_INSERTION
+        )
+        search_parameters.local_search_metaheuristic = (
+            routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+        )
+        search_parameters.time_limit.FromMilliseconds(max(MIN_DAY_TIME_LIMIT_MS, int(time_limit_ms)))
+
+        solution = None
+        warm_started = False
+        if initial_order:
+            position_of = {index: position for position, index in enumerate(day_customers, start=1)}
+            routing.CloseModelWithParameters(search_parameters)
+            initial = routing.ReadAssignmentFromRoutes(
+                [[position_of[i] for i in self._feasible_subsequence(initial_order)]], True
+            )
+            if initial is not None:
+                solution = routing.SolveFromAssignmentWithParameters(initial, search_parameters)
+                warm_started = solution is not None
+        if solution is None:
+            solution = routing.SolveWithParameters(search_parameters)
+
+        if not solution:
+            logger.warning("⚠️ Día sin solución factible, se usa el orden inicial sin ventanas")
+            order = initial_order or list(day_customers)
+            return {
+                'sequence': order,
+                'arrival_minutes': self._naive_arrivals(order),
+                'dropped': [],
+                'distance_km': round(self.order_distance(order), 2),
+                'warm_started': False
+            }
+
+        sequence, arrivals = [], []
+        index = solution.Value(routing.NextVar(routing.Start(0)))
+        while not routing.IsEnd(index):
+            sequence.append(day_customers[manager.IndexToNode(index) - 1])
+            arrivals.append(solution.Min(time_dimension.CumulVar(index)))
+            index = solution.Value(routing.NextVar(index))
+
+        visited = set(sequence)
+        return {
+            'sequence': sequence,
+            'arrival_minutes': arrivals,
+            'dropped': [i for i in day_customers if i not in visited],
+            'distance_km': round(self.order_distance(sequence), 2),
+            'warm_started': warm_started
+        }
+
+    def _feasible_subsequence(self, order: List[int]) -> List[int]:
+        """
+        Recorre `order` con las ventanas horarias y deja fuera los clientes a
+        los que se llegaría tarde; el solver los reinserta si caben.
+        """
+        kept, current, previous = [], self.work_start, 0 if self._has_depot else None
+        for index in order:
+            arrival = current + (self.travel_minutes(previous, index + 1) if previous is not None else 0)
+            start, end = self.window(index)
+            arrival = max(arrival, start)
+            if arrival > end:
+                continue
+            kept.append(index)
+            current = arrival + self.service_minutes(index)
+            previous = index + 1
+        if self.return_to_start and previous is not None and current + self.travel_minutes(previous, 0) > self.work_end:
+            kept.pop()
+        return kept
+
+    def _allowed_on(self, index: int, day: int) -> bool:
+        allowed = self.customers[index].get('allowed_days')
+        return allowed is None or day in allowed
+
+    def order_distance(self, order: List[int]) -> float:
+        """Km recorridos siguiendo `order` (desde la salida si existe)."""
+        nodes = ([0] if self._has_depot else []) + [i + 1 for i in order]
+        if self.return_to_start and order:
+            nodes.append(0)
+        return sum(self.distances[a][b] for a, b in zip(nodes, nodes[1:]))
+
+    def _naive_arrivals(self, order: List[int]) -> List[int]:
+        arrivals, current, previous = [], self.work_start, 0 if self._has_depot else None
+        for index in order:
+            if previous is not None:
+                current += self.travel_minutes(previous, index + 1)
+            current = max(current, self.window(index)[0])
+            arrivals.append(current)
+            current += self.service_minutes(index)
+            previous = index + 1
+        return arrivals
+
+    def plan(self, time_budget_seconds: float = 10.0, warm_start: bool = True,
+             days: Optional[List[List[int]]] = None) -> Dict:
+        """
+        Planifica la semana dentro de `time_budget_seconds`.
+
+        Args:
+            warm_start: Arrancar cada día desde la solución del día anterior
+            days: Asignación ya calculada (por defecto assign_days())
+
+        Returns:
+            {
+                'days': [sequence_day() de cada día],
+                'unassigned': [{'index', 'reason'}],
+                'total_distance_km': float,
+                'solve_seconds': float
+            }
+        """
+        started = _time.perf_counter()
+        unassigned = []
+        if days is None:
+            days, unassigned = self.assign_days()
+        unassigned = list(unassigned)
+
+        results = []
+        previous_order: List[int] = []
+        carried: List[int] = []
+        for day, day_customers in enumerate(days):
+            # Visitas semanales únicas que no cupieron pasan al siguiente día
+            # permitido; si hoy no lo es, siguen esperando
+            waiting = [index for index in carried if not self._allowed_on(index, day)]
+            day_customers = day_customers + [index for index in carried if index not in waiting]
+            initial = self._warm_order(day_customers, previous_order) if warm_start and day_customers else None
+            remaining = time_budget_seconds - (_time.perf_counter() - started)
+            day_limit_ms = remaining / (self.num_days - day) * 1000
+            result = self.sequence_day(day_customers, initial, day_limit_ms)
+            results.append(result)
+            if result['sequence']:
+                previous_order = result['sequence']
+            moved = [
+                index for index in result['dropped']
+                if int(self.customers[index].get('visits_per_week') or 1) == 1 and day < self.num_days - 1
+            ]
+            result['dropped'] = [index for index in result['dropped'] if index not in moved]
+            result['carried_over'] = moved
+            carried = moved + waiting
+
+        # Pospuestas sin ningún día permitido después del que no cupieron
+        unassigned.extend(
+            {'index': index, 'reason': 'No cupo en su día y no queda otro día permitido en la semana'}
+            for index in carried
+        )
+
+        return {
+            'days': results,
+            'unassigned': unassigned,
+            'total_distance_km': round(sum(result['distance_km'] for result in results), 2),
+            'solve_seconds': round(_time.perf_counter() - started, 3)
+        }
@@ -0,0 +1,168 @@
+"""
+Modelo de distancias de bodega y secuenciación de picking (TSP) con OR-Tools.
+
+Layout: los pasillos (`aisle`) son paralelos y se recorren a lo largo de sus
+estanterías (`shelf`); hay un pasillo transversal al frente (donde está el
+muelle de despacho) y otro al fondo. Las coordenadas se derivan de las
+etiquetas de la ubicación:
+
+- x: posición del pasillo entre los pasillos de la zona (orden natural de
+  las etiquetas: A < B < B1 < B2 < C-02 ...), por AISLE_SPACING_M
+- y: número de la estantería dentro del pasillo (E1 → 1, Rack-05 → 5), por
+  SHELF_LENGTH_M
+
+El nivel (`level_position`) no cambia la distancia caminada.
+
+Distancia entre dos ubicaciones:
+- mismo pasillo: |y1 - y2|
+- distinto pasillo: |x1 - x2| + el menor desvío por el pasillo transversal
+  del frente (y1 + y2) o del fondo (2L - y1 - y2)
+"""
+
+import re
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ortools.constraint_solver import routing_enums_pb2
+from ortools.constraint_solver import pywrapcp
+
+logger = logging.getLogger(__name__)
+
+AISLE_SPACING_M = 3.0
+SHELF_LENGTH_M = 1.5
+
+# Las distancias se pasan a OR-Tools como enteros (centímetros)
+_SCALE = 100
+
+_NUMBER = re.compile(r'(\d+)')
+
+
+def _natural_key(label: str):
+    """Clave de orden natural: 'B2' < 'B10', 'C-02' < 'C-10'."""
+    return [int(part) if part.isdigit() else part.lower() for part in _NUMBER.split(str(label)) if part]
+
+
+def shelf_number(shelf: str) -> Optional[int]:
+    """Número de estantería dentro del pasillo (último número de la etiqueta)."""
+    numbers = _NUMBER.findall(str(shelf))
+    return int(numbers[-1]) if numbers else None
+
+
+class WarehouseLayout:
+    """
+    Coordenadas y distancias de caminata entre ubicaciones de una zona.
+    """
+
+    def __init__(self, locations: Sequence[Dict], aisle_spacing_m: float = AISLE_SPACING_M,
+                 shelf_length_m: float = SHELF_LENGTH_M):
+        """
+        Args:
+            locations: Ubicaciones con 'location_id', 'aisle' y 'shelf'
+        """
+        self.aisle_spacing_m = aisle_spacing_m
+        self.shelf_length_m = shelf_length_m
+
+        aisles = sorted({str(loc['aisle']) for loc in locations}, key=_natural_key)
+        self._aisle_index = {aisle: i + 1 for i, aisle in enumerate(aisles)}
+
+        # Estanterías sin número: se ordenan por etiqueta dentro del pasillo
+        unnumbered: Dict[str, List[str]] = {}
+        for loc in locations:
+            if shelf_number(loc['shelf']) is None:
+                unnumbered.setdefault(str(loc['aisle']), []).append(str(loc['shelf']))
+        self._unnumbered_rank = {
+            (aisle, shelf): i + 1
+            for aisle, shelves in unnumbered.items()
+            for i, shelf in enumerate(sorted(set(shelves), key=_natural_key))
+        }
+
+        self._coordinates: Dict[int, Tuple[float, float]] = {}
+        for loc in locations:
+            self._coordinates[loc['location_id']] = self._coordinate(loc['aisle'], loc['shelf'])
+
+        max_y = max((y for _, y in self._coordinates.values()), default=0.0)
+        # El pasillo transversal del fondo queda una estantería detrás de la última
+        self.aisle_length_m = max_y + self.shelf_length_m
+
+    def _coordinate(self, aisle, shelf) -> Tuple[float, float]:
+        number = shelf_number(shelf)
+        if number is None:
+            number = self._unnumbered_rank[(str(aisle), str(shelf))]
+        return (
+            self._aisle_index[str(aisle)] * self.aisle_spacing_m,
+            number * self.shelf_length_m
+        )
+
+    def coordinate(self, location_id: Optional[int]) -> Tuple[float, float]:
+        """Coordenada de una ubicación; None es el muelle de despacho (0, 0)."""
+        if location_id is None:
+            return (0.0, 0.0)
+        return self._coordinates[location_id]
+
+    def distance(self, a: Optional[int], b: Optional[int]) -> float:
+        """Distancia caminada en metros entre dos ubicaciones (None = muelle)."""
+        (x1, y1), (x2, y2) = self.coordinate(a), self.coordinate(b)
+        if x1 == x2:
+            return abs(y1 - y2)
+        front = y1 + y2
+        back = 2 * self.aisle_length_m - y1 - y2
+        return abs(x1 - x2) + min(front, back)
+
+    def tour_distance(self, location_ids: Sequence[int]) -> float:
+        """Distancia de muelle → ubicaciones en el orden dado → muelle."""
+        stops = [None, *location_ids, None]
+        return sum(self.distance(stops[i], stops[i + 1]) for i in range(len(stops) - 1))
+
+
+def sequence_pick_path(layout: WarehouseLayout, location_ids: Sequence[int],
+                       time_limit_ms: int = 500) -> List[int]:
+    """
+    Ordena las ubicaciones para minimizar la caminata (TSP desde el muelle).
+
+    Args:
+        layout: Modelo de distancias de la zona
+        location_ids: Ubicaciones a visitar (sin repetir)
+        time_limit_ms: Tiempo máximo de búsqueda local
+
+    Returns:
+        Ubicaciones en orden de visita
+    """
+    location_ids = list(dict.fromkeys(location_ids))
+    if len(location_ids) <= 2:
+        return location_ids
+
+    nodes = [None, *location_ids]
+    size = len(nodes)
+    matrix = [
+        [int(round(layout.distance(nodes[i], nodes[j]) * _SCALE)) for j in range(size)]
+        for i in range(size)
+    ]
+
+    manager = pywrapcp.RoutingIndexManager(size, 1, 0)
+    routing = pywrapcp.RoutingModel(manager)
+
+    def distance_callback(from_index, to_index):
+        return matrix[manager.IndexToNode(from_index)][manager.IndexToNode(to_index)]
+
+    transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+    routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
+
+    search_parameters = pywrapcp.DefaultRoutingSearchParameters()
+    search_parameters.first_solution_strategy = (
+        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    )
+    search_parameters.time_limit.FromMilliseconds(time_limit_ms)
+
+    solution = routing.SolveWithParameters(search_parameters)
+    if not solution:
+        logger.warning("⚠️ TSP de picking sin solución, se usa el orden por ubicación")
+        return sorted(location_ids, key=lambda loc: layout.coordinate(loc))
+
+    order = []
+    index = routing.Start(0)
+    while not routing.IsEnd(index):
+        node = manager.IndexToNode(index)
+        if node != 0:
+            order.append(nodes[node])
+        index = solution.Value(routing.NextVar(index))
+    return order
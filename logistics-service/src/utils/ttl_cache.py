@@ -0,0 +1,112 @@
+"""
+LRU en memoria, thread-safe, con TTL opcional y límite por entradas o por
+peso (p. ej. bytes). Base de los cachés de proceso del servicio; cada uno
+solo define su clave y su invalidación.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+
+class TTLCache:
+    """
+    Args:
+        max_size: Máximo de entradas (None = sin límite)
+        ttl: Segundos de vigencia (None = sin vencimiento; <= 0 no guarda nada)
+        max_weight: Peso máximo total (None = sin límite); los valores más
+            pesados que el límite no se guardan
+        weigher: Peso de un valor cuando hay max_weight
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        ttl: Optional[float] = None,
+        max_weight: Optional[int] = None,
+        weigher: Callable[[Any], int] = len
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()  # clave -> (valor, vence_en, peso)
+        self._weight = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, accept: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """
+        Valor vigente de la clave o None. Si `accept` rechaza el valor, la
+        entrada se descarta y cuenta como fallo.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                entry is None
+                or (entry[1] is not None and entry[1] <= time.monotonic())
+                or (accept is not None and not accept(entry[0]))
+            ):
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        if self.ttl is not None and self.ttl <= 0:
+            return
+        weight = self.weigher(value) if self.max_weight is not None else 0
+        if self.max_weight is not None and weight > self.max_weight:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, expires_at, weight)
+            self._weight += weight
+            while (
+                (self.max_size is not None and len(self._entries) > self.max_size)
+                or (self.max_weight is not None and self._weight > self.max_weight)
+            ):
+                _, (_, _, evicted_weight) = self._entries.popitem(last=False)
+                self._weight -= evicted_weight
+
+    def invalidate(self, keys: Iterable[Hashable]):
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> List[Hashable]:
+        """Descarta las entradas para las que predicate(clave, valor) es True."""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if predicate(key, entry[0])]
+            for key in stale:
+                self._remove(key)
+        return stale
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._weight = 0
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'weight': self._weight,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._weight -= entry[2]
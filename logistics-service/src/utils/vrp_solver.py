@@ -611,7 +611,8 @@ class VRPSolver:
     def solve_tsp(
         distance_matrix: List[List[float]],
         start_index: int = 0,
-        return_to_start: bool = False
+        return_to_start: bool = False,
+        time_limit_seconds: int = 10
     ) -> Dict:
         """
         Resuelve el Travelling Salesman Problem (TSP) - variante simple de VRP para un solo vehículo.
@@ -620,6 +621,8 @@ class VRPSolver:
             distance_matrix: Matriz de distancias entre ubicaciones
             start_index: Índice de la ubicación inicial
             return_to_start: Si debe regresar al punto de inicio
+            time_limit_seconds: Tiempo de búsqueda local (GUIDED_LOCAL_SEARCH
+                usa todo el límite)
         
         Returns:
             {
@@ -671,7 +674,7 @@ class VRPSolver:
         search_parameters.local_search_metaheuristic = (
             routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
         )
-        search_parameters.time_limit.seconds = 10
+        search_parameters.time_limit.seconds = time_limit_seconds
         
         # Resolver
         solution = routing.SolveWithParameters(search_parameters)
@@ -0,0 +1,144 @@
+"""
+Backplane de mensajería para Socket.IO con varios workers.
+
+Con un solo proceso los rooms y los emits son locales. Para correr varios
+workers (o emitir desde un proceso de jobs) todos se conectan a una cola
+pub/sub compartida:
+
+- `redis://` / `rediss://`: Redis (o cualquier servidor compatible con el
+  protocolo Redis) vía `InventoryRedisManager`.
+- `local://<canal>`: sustituto en memoria para tests y desarrollo; conecta
+  varios servidores Socket.IO dentro del mismo proceso.
+
+Además del `emit` estándar, el backplane transporta cambios de stock en
+crudo para que cada worker calcule los deltas del protocolo v2 con su
+propio tracker de secuencias (los clientes quedan fijados a un worker).
+"""
+
+import queue
+import threading
+import logging
+from functools import partial
+from typing import Dict, List, Optional
+
+import socketio
+
+logger = logging.getLogger(__name__)
+
+# Evento interno que viaja por el backplane; nunca se reenvía a clientes
+INVENTORY_STOCK_EVENT = '__inventory_stock_change__'
+
+
+class InventoryBackplaneMixin:
+    """
+    Agrega a un PubSubManager el transporte de cambios de stock para el
+    protocolo v2.
+    """
+
+    def publish_stock_change(self, product_sku: str, stock_data: Dict,
+                             change_type: str, timestamp: str):
+        """Publica un cambio de stock para que cada worker emita sus deltas."""
+        self._publish({
+            'method': 'emit',
+            'event': INVENTORY_STOCK_EVENT,
+            'data': {
+                'product_sku': product_sku,
+                'stock_data': stock_data,
+                'change_type': change_type,
+                'timestamp': timestamp
+            },
+            'namespace': '/',
+            'room': None,
+            'skip_sid': None,
+            'callback': None,
+            'host_id': self.host_id
+        })
+
+    def _handle_emit(self, message):
+        if message.get('event') != INVENTORY_STOCK_EVENT:
+            return super()._handle_emit(message)
+
+        from src.websockets.stock_protocol import emit_stock_delta
+
+        data = message['data']
+        emit_stock_delta(
+            partial(self.server.emit, ignore_queue=True),
+            data['product_sku'],
+            data['stock_data'],
+            data['change_type'],
+            data['timestamp']
+        )
+
+
+class InventoryRedisManager(InventoryBackplaneMixin, socketio.RedisManager):
+    """Backplane sobre Redis (o un servidor compatible con el protocolo Redis)."""
+    name = 'inventory-redis'
+
+
+class LocalPubSubManager(InventoryBackplaneMixin, socketio.PubSubManager):
+    """
+    Backplane en memoria: todos los managers del mismo canal dentro del
+    proceso reciben los mensajes publicados (como un canal Redis).
+    """
+    name = 'local'
+
+    _channels: Dict[str, List[queue.Queue]] = {}
+    _channels_lock = threading.Lock()
+
+    def __init__(self, url: str = 'local://', channel: str = 'flask-socketio',
+                 write_only: bool = False, logger=None):
+        super().__init__(channel=url[len('local://'):] or channel,
+                         write_only=write_only, logger=logger)
+        self._queue: queue.Queue = queue.Queue()
+        if not write_only:
+            with self._channels_lock:
+                self._channels.setdefault(self.channel, []).append(self._queue)
+
+    def _publish(self, data):
+        with self._channels_lock:
+            subscribers = list(self._channels.get(self.channel, []))
+        for subscriber in subscribers:
+            subscriber.put(data)
+
+    def _listen(self):
+        while True:
+            message = self._queue.get()
+            if message is None:
+                break
+            yield message
+
+    def close(self):
+        """Desconecta el manager del canal y termina su hilo de escucha."""
+        with self._channels_lock:
+            subscribers = self._channels.get(self.channel, [])
+            if self._queue in subscribers:
+                subscribers.remove(self._queue)
+        self._queue.put(None)
+
+    @classmethod
+    def reset(cls):
+        with cls._channels_lock:
+            for subscribers in cls._channels.values():
+                for subscriber in subscribers:
+                    subscriber.put(None)
+            cls._channels.clear()
+
+
+def create_client_manager(url: Optional[str], channel: str = 'flask-socketio',
+                          write_only: bool = False):
+    """
+    Crea el client manager de Socket.IO para la URL del backplane.
+
+    Returns:
+        Manager o None si no se configuró backplane (modo un solo proceso)
+    """
+    if not url:
+        return None
+
+    if url.startswith('local://'):
+        return LocalPubSubManager(url, channel=channel, write_only=write_only)
+
+    if url.startswith(('redis://', 'rediss://')):
+        return InventoryRedisManager(url, channel=channel, write_only=write_only)
+
+    raise ValueError(f"Backplane no soportado: {url} (usar redis://, rediss:// o local://)")
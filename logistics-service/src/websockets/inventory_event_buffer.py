@@ -0,0 +1,427 @@
+"""
+Buffer de coalescencia para eventos de inventario.
+
+El request HTTP solo encola el evento; un hilo en segundo plano agrupa los
+eventos por SKU y cada `flush_interval` segundos:
+
+1. Recalcula el stock de todos los SKUs "sucios" con UNA sola consulta
+   multi-SKU (`load_stock_payloads`, GetStockLevels con product_skus).
+2. Emite un `stock_updated` por SKU (a su room y a `all_inventory_updates`)
+   y un único `stock_updated_batch` a los clientes que lo pidieron.
+
+Cada SKU conserva el tipo de cambio más severo de la ventana (una alerta de
+agotado o stock bajo no se pierde por una actualización posterior). Si el
+flush falla, los eventos vuelven al buffer y se reintentan en el siguiente.
+
+Métricas expuestas en `get_stats()`: profundidad de la cola, latencia de
+flush y ratio de coalescencia (eventos recibidos / SKUs publicados).
+"""
+
+import os
+import threading
+import time
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 0.3  # segundos
+MAX_FLUSH_ATTEMPTS = 3
+
+# Severidad para coalescer: gana el tipo más severo visto en la ventana
+CHANGE_TYPE_SEVERITY = {
+    'out_of_stock': 3,
+    'low_stock': 2,
+    'restock': 1,
+}
+
+# Instancia global del buffer (será inicializada desde main.py)
+event_buffer: Optional['InventoryEventBuffer'] = None
+
+
+class _PendingSku:
+    """Eventos acumulados de un SKU dentro de una ventana de flush."""
+
+    __slots__ = ('first_event', 'last_event', 'event_count', 'center_ids', 'change_type', 'attempts')
+
+    def __init__(self, event):
+        self.first_event = event
+        self.last_event = event
+        self.event_count = 1
+        self.center_ids = {event.distribution_center_id}
+        self.change_type = event.change_type
+        self.attempts = 0
+
+    def add(self, event):
+        self.last_event = event
+        self.event_count += 1
+        self.center_ids.add(event.distribution_center_id)
+        self.change_type = _most_severe(self.change_type, event.change_type)
+
+    def merge_newer(self, newer: '_PendingSku'):
+        """Agrega los eventos de una ventana posterior del mismo SKU."""
+        self.last_event = newer.last_event
+        self.event_count += newer.event_count
+        self.center_ids |= newer.center_ids
+        self.change_type = _most_severe(self.change_type, newer.change_type)
+
+
+def _most_severe(current: str, candidate: str) -> str:
+    """Tipo de cambio a conservar; a igual severidad gana el más reciente."""
+    if CHANGE_TYPE_SEVERITY.get(candidate, 0) >= CHANGE_TYPE_SEVERITY.get(current, 0):
+        return candidate
+    return current
+
+
+class InventoryEventBuffer:
+    """
+    Buffer por SKU que publica los eventos de inventario fuera del hilo del request.
+    """
+
+    def __init__(self, app=None, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.app = app
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, _PendingSku] = {}
+        self._pending_events = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Métricas
+        self.events_enqueued = 0
+        self.events_flushed = 0
+        self.skus_published = 0
+        self.flush_count = 0
+        self.last_flush_latency_ms = 0.0
+        self.max_flush_latency_ms = 0.0
+        self.total_flush_latency_ms = 0.0
+        self.flush_errors = 0
+        self.events_dropped = 0
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Inicia el hilo de flush periódico."""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name='inventory-event-buffer',
+            daemon=True
+        )
+        self._thread.start()
+        logger.info(f"✅ Buffer de eventos de inventario iniciado (flush cada {self.flush_interval}s)")
+
+    def stop(self, flush: bool = True):
+        """Detiene el hilo y, opcionalmente, publica lo pendiente."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(self.flush_interval * 2, 1.0))
+            self._thread = None
+        if flush:
+            self.flush()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    # ------------------------------------------------------------------
+    # Encolado y flush
+    # ------------------------------------------------------------------
+
+    def enqueue(self, event):
+        """Agrega un evento al buffer. Es la única operación en el hilo del request."""
+        with self._lock:
+            pending = self._pending.get(event.product_sku)
+            if pending is None:
+                self._pending[event.product_sku] = _PendingSku(event)
+            else:
+                pending.add(event)
+            self._pending_events += 1
+            self.events_enqueued += 1
+
+    def enqueue_many(self, events):
+        for event in events:
+            self.enqueue(event)
+
+    def flush(self) -> int:
+        """
+        Publica todos los SKUs pendientes.
+
+        Returns:
+            Número de SKUs publicados
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                pending = self._pending
+                event_count = self._pending_events
+                self._pending = {}
+                self._pending_events = 0
+
+            started = time.perf_counter()
+            try:
+                if self.app is not None:
+                    with self.app.app_context():
+                        published = publish_coalesced(pending)
+                else:
+                    published = publish_coalesced(pending)
+            except Exception as e:
+                self.flush_errors += 1
+                logger.error(f"❌ Error en flush de eventos de inventario: {str(e)}", exc_info=True)
+                self._requeue(pending, event_count)
+                return 0
+
+            latency_ms = (time.perf_counter() - started) * 1000
+            self.flush_count += 1
+            self.events_flushed += event_count
+            self.skus_published += published
+            self.last_flush_latency_ms = latency_ms
+            self.max_flush_latency_ms = max(self.max_flush_latency_ms, latency_ms)
+            self.total_flush_latency_ms += latency_ms
+
+            logger.debug(
+                f"📤 Flush de inventario: {event_count} eventos → {published} SKUs "
+                f"en {latency_ms:.1f}ms"
+            )
+            return published
+
+    def _requeue(self, pending: Dict[str, _PendingSku], event_count: int):
+        """
+        Devuelve al buffer los eventos de un flush fallido, delante de los que
+        llegaron mientras tanto. Tras MAX_FLUSH_ATTEMPTS se descartan.
+        """
+        dropped = 0
+        with self._lock:
+            for sku, entry in pending.items():
+                entry.attempts += 1
+                if entry.attempts >= MAX_FLUSH_ATTEMPTS:
+                    dropped += entry.event_count
+                    continue
+                newer = self._pending.get(sku)
+                if newer is not None:
+                    entry.merge_newer(newer)
+                self._pending[sku] = entry
+            self._pending_events += event_count - dropped
+            self.events_dropped += dropped
+
+        if dropped:
+            logger.error(f"❌ {dropped} eventos de inventario descartados tras {MAX_FLUSH_ATTEMPTS} intentos")
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            queue_depth = self._pending_events
+            dirty_skus = len(self._pending)
+
+        return {
+            'running': self.is_running,
+            'flush_interval_ms': int(self.flush_interval * 1000),
+            'queue_depth': queue_depth,
+            'dirty_skus': dirty_skus,
+            'events_enqueued': self.events_enqueued,
+            'events_flushed': self.events_flushed,
+            'skus_published': self.skus_published,
+            'flush_count': self.flush_count,
+            'flush_errors': self.flush_errors,
+            'events_dropped': self.events_dropped,
+            'coalescing_ratio': (
+                round(self.events_flushed / self.skus_published, 2)
+                if self.skus_published else None
+            ),
+            'last_flush_latency_ms': round(self.last_flush_latency_ms, 2),
+            'max_flush_latency_ms': round(self.max_flush_latency_ms, 2),
+            'avg_flush_latency_ms': (
+                round(self.total_flush_latency_ms / self.flush_count, 2)
+                if self.flush_count else None
+            ),
+        }
+
+
+def coalesce_events(events) -> Dict[str, _PendingSku]:
+    """Agrupa una lista de eventos por SKU conservando el orden de llegada."""
+    pending: Dict[str, _PendingSku] = {}
+    for event in events:
+        entry = pending.get(event.product_sku)
+        if entry is None:
+            pending[event.product_sku] = _PendingSku(event)
+        else:
+            entry.add(event)
+    return pending
+
+
+def publish_coalesced(pending: Dict[str, _PendingSku]) -> int:
+    """
+    Recalcula el stock de los SKUs pendientes con una sola consulta y emite
+    las notificaciones agrupadas. Debe ejecutarse dentro de un app context.
+
+    Returns:
+        Número de SKUs publicados
+    """
+    from src.websockets.websocket_manager import InventoryNotifier
+
+    if not pending:
+        return 0
+
+    stock_by_sku = load_stock_payloads(list(pending.keys()))
+
+    changes = []
+    for sku, entry in pending.items():
+        changes.append({
+            'product_sku': sku,
+            'change_type': entry.change_type,
+            'stock_data': _build_stock_data(entry, stock_by_sku[sku])
+        })
+
+    InventoryNotifier.notify_stock_changes_batch(changes)
+    return len(changes)
+
+
+def load_stock_payloads(skus: List[str], include_missing: bool = True) -> Dict[str, Dict]:
+    """
+    Totales de stock publicables por SKU: una consulta GetStockLevels multi-SKU
+    más una consulta agrupada de reservas de carrito.
+
+    `total_available` es lo disponible para compra (descuenta las reservas de
+    carrito activas) y `total_cart_reserved` las expone aparte. Es la única
+    fuente del payload de stock para el buffer, la publicación síncrona y los
+    snapshots del protocolo v2. Debe ejecutarse dentro de un app context.
+
+    Con include_missing=False se omiten los SKUs sin inventario (en lugar de
+    devolverlos con totales en cero).
+    """
+    from src.commands.get_stock_levels import GetStockLevels
+
+    stock_by_sku = _index_stock_result(GetStockLevels(product_skus=skus).execute())
+    cart_reserved = _cart_reserved_by_sku(skus)
+
+    payloads = {}
+    for sku in skus:
+        stock_result = stock_by_sku.get(sku.upper())
+        if stock_result is None:
+            if not include_missing:
+                continue
+            stock_result = {}
+        reserved_in_carts = cart_reserved.get(sku, 0)
+        payloads[sku] = {
+            'product_sku': sku,
+            'total_available': max(0, stock_result.get('total_available', 0) - reserved_in_carts),
+            'total_physical': stock_result.get('total_physical', 0),
+            'total_reserved': stock_result.get('total_reserved', 0),
+            'total_cart_reserved': reserved_in_carts,
+            'total_in_transit': stock_result.get('total_in_transit', 0),
+            'distribution_centers': stock_result.get('distribution_centers', []),
+        }
+    return payloads
+
+
+def _index_stock_result(stock_result: Dict) -> Dict[str, Dict]:
+    """Normaliza la respuesta de GetStockLevels (uno o varios productos) a {sku: datos}."""
+    if 'products' in stock_result:
+        return {product['product_sku']: product for product in stock_result['products']}
+    if stock_result.get('product_sku'):
+        return {stock_result['product_sku'].upper(): stock_result}
+    return {}
+
+
+def _cart_reserved_by_sku(skus: List[str]) -> Dict[str, int]:
+    """Unidades en reservas de carrito activas por SKU (una consulta agrupada)."""
+    from datetime import datetime
+    from src.models.cart_reservation import CartReservation
+    from src.session import db
+
+    rows = (
+        db.session.query(CartReservation.product_sku, db.func.sum(CartReservation.quantity_reserved))
+        .filter(
+            CartReservation.product_sku.in_(skus),
+            CartReservation.is_active.is_(True),
+            CartReservation.expires_at > datetime.utcnow()
+        )
+        .group_by(CartReservation.product_sku)
+        .all()
+    )
+    return {sku: int(total or 0) for sku, total in rows}
+
+
+def _build_stock_data(entry: _PendingSku, stock_payload: Dict) -> Dict:
+    first, last = entry.first_event, entry.last_event
+
+    # Si todos los eventos son del mismo centro, el cambio neto es primero → último
+    if len(entry.center_ids) == 1:
+        previous_quantity = first.previous_quantity
+    else:
+        previous_quantity = last.previous_quantity
+
+    return {
+        **stock_payload,
+        'quantity_change': last.new_quantity - previous_quantity,
+        'previous_quantity': previous_quantity,
+        'new_quantity': last.new_quantity,
+        'updated_center_id': last.distribution_center_id,
+        'updated_center_code': last.distribution_center_code,
+        'updated_center_ids': sorted(c for c in entry.center_ids if c is not None),
+        'coalesced_events': entry.event_count
+    }
+
+
+def init_inventory_event_buffer(app) -> Optional[InventoryEventBuffer]:
+    """
+    Inicializa el buffer de eventos de inventario.
+
+    Se desactiva con INVENTORY_EVENTS_ASYNC=false (y por defecto en TESTING);
+    en ese caso los eventos se publican de forma síncrona.
+
+    Args:
+        app: Instancia de Flask app
+    """
+    global event_buffer
+
+    enabled = app.config.get('INVENTORY_EVENTS_ASYNC')
+    if enabled is None:
+        enabled = (
+            not app.config.get('TESTING', False)
+            and os.getenv('INVENTORY_EVENTS_ASYNC', 'true').lower() in ['true', '1', 'yes']
+        )
+
+    if not enabled:
+        return None
+
+    if event_buffer is not None and event_buffer.is_running:
+        logger.warning("⚠️ Buffer de eventos de inventario ya está inicializado")
+        return event_buffer
+
+    flush_interval_ms = app.config.get(
+        'INVENTORY_EVENTS_FLUSH_MS',
+        int(os.getenv('INVENTORY_EVENTS_FLUSH_MS', DEFAULT_FLUSH_INTERVAL * 1000))
+    )
+
+    event_buffer = InventoryEventBuffer(app=app, flush_interval=flush_interval_ms / 1000.0)
+    event_buffer.start()
+    return event_buffer
+
+
+def shutdown_inventory_event_buffer():
+    """Detiene el buffer publicando los eventos pendientes."""
+    global event_buffer
+
+    if event_buffer is not None:
+        event_buffer.stop(flush=True)
+        event_buffer = None
+        logger.info("✅ Buffer de eventos de inventario detenido")
+
+
+def get_event_buffer() -> Optional[InventoryEventBuffer]:
+    """Obtiene la instancia del buffer (None si se publica de forma síncrona)."""
+    return event_buffer
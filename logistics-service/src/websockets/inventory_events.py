@@ -22,6 +22,7 @@ class InventoryChangeType:
     RESERVATION_RELEASED = 'reservation_released'  # Liberación de reserva
     SALE = 'sale'                        # Venta
     ADJUSTMENT = 'adjustment'            # Ajuste manual
+    EXPIRY_DIGEST = 'expiry_digest'      # Resumen del barrido nocturno de vencimientos
 
 
 class InventoryEvent:
@@ -63,6 +64,22 @@ class InventoryEvent:
             'metadata': self.metadata
         }
     
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'InventoryEvent':
+        """Reconstruye un evento serializado con to_dict (p. ej. desde el outbox)."""
+        event = cls(
+            product_sku=data['product_sku'],
+            change_type=data['change_type'],
+            previous_quantity=data['previous_quantity'],
+            new_quantity=data['new_quantity'],
+            distribution_center_id=data.get('distribution_center_id'),
+            distribution_center_code=data.get('distribution_center_code'),
+            metadata=data.get('metadata')
+        )
+        if data.get('timestamp'):
+            event.timestamp = datetime.fromisoformat(data['timestamp'])
+        return event
+    
     def is_significant_change(self, threshold_percentage: float = 10.0) -> bool:
         """
         Determina si el cambio es significativo.
@@ -206,6 +223,9 @@ class InventoryEventDetector:
 class InventoryEventPublisher:
     """
     Publica eventos de inventario a través de WebSockets.
+    
+    Si el buffer de eventos está activo, `publish` solo encola el evento y el
+    recálculo de stock + emisión ocurren fuera del hilo del request.
     """
     
     @staticmethod
@@ -213,27 +233,34 @@ class InventoryEventPublisher:
         """
         Publica un evento de inventario.
         
+        Args:
+            event: InventoryEvent a publicar
+        """
+        from src.websockets.inventory_event_buffer import get_event_buffer
+        
+        buffer = get_event_buffer()
+        if buffer is not None:
+            buffer.enqueue(event)
+            return
+        
+        InventoryEventPublisher.publish_now(event)
+    
+    @staticmethod
+    def publish_now(event: InventoryEvent):
+        """
+        Publica un evento de inventario de forma síncrona.
+        
         Args:
             event: InventoryEvent a publicar
         """
         from src.websockets.websocket_manager import InventoryNotifier
-        from src.commands.get_stock_levels import GetStockLevels
+        from src.websockets.inventory_event_buffer import load_stock_payloads
         
         try:
-            # ✅ Obtener información actualizada del stock de TODOS los centros
-            stock_command = GetStockLevels(
-                product_sku=event.product_sku,
-                # ✅ NO pasar distribution_center_id para obtener todos los centros
-            )
-            stock_result = stock_command.execute()
-            
-            # Preparar datos del stock
+            # ✅ Stock de TODOS los centros, descontando reservas de carrito
+            # (mismo payload que el buffer y los snapshots v2)
             stock_data = {
-                'product_sku': event.product_sku,
-                'total_available': stock_result.get('total_available', 0),
-                'total_reserved': stock_result.get('total_reserved', 0),
-                'total_in_transit': stock_result.get('total_in_transit', 0),
-                'distribution_centers': stock_result.get('distribution_centers', []),
+                **load_stock_payloads([event.product_sku])[event.product_sku],
                 'quantity_change': event.quantity_change,
                 'previous_quantity': event.previous_quantity,
                 'new_quantity': event.new_quantity,
@@ -262,11 +289,29 @@ class InventoryEventPublisher:
         """
         Publica múltiples eventos en batch.
         
+        Con el buffer activo se encolan todos; sin buffer se agrupan por SKU y
+        se publican con una sola consulta de stock multi-SKU.
+        
         Args:
             events: Lista de InventoryEvents
         """
-        for event in events:
-            InventoryEventPublisher.publish(event)
+        from src.websockets.inventory_event_buffer import (
+            get_event_buffer, coalesce_events, publish_coalesced
+        )
+        
+        if not events:
+            return
+        
+        buffer = get_event_buffer()
+        if buffer is not None:
+            buffer.enqueue_many(events)
+            return
+        
+        try:
+            published = publish_coalesced(coalesce_events(events))
+            logger.info(f"📢 Batch publicado: {len(events)} eventos → {published} SKUs")
+        except Exception as e:
+            logger.error(f"❌ Error publicando batch de eventos: {str(e)}")
 
 
 def track_inventory_change(
@@ -278,7 +323,8 @@ def track_inventory_change(
     minimum_stock_level: int = 0,
     reorder_point: Optional[int] = None,
     metadata: Optional[Dict] = None,
-    auto_publish: bool = True
+    auto_publish: bool = True,
+    use_outbox: bool = False
 ) -> Optional[InventoryEvent]:
     """
     Helper function para rastrear y opcionalmente publicar cambios de inventario.
@@ -293,6 +339,9 @@ def track_inventory_change(
         reorder_point: Punto de reorden
         metadata: Metadatos adicionales
         auto_publish: Si True, publica automáticamente el evento
+        use_outbox: Si True (con auto_publish), escribe el evento en el outbox
+            de la transacción actual en vez de publicarlo; lo publica el relay
+            después del commit
     
     Returns:
         InventoryEvent si el cambio es significativo, None si no
@@ -320,7 +369,10 @@ def track_inventory_change(
     )
     
     # Publicar si está habilitado
-    if auto_publish:
+    if auto_publish and use_outbox:
+        from src.websockets.inventory_outbox import record_outbox_event
+        record_outbox_event(event)
+    elif auto_publish:
         InventoryEventPublisher.publish(event)
     
     return event
@@ -0,0 +1,466 @@
+"""
+Relay del outbox transaccional de eventos de inventario.
+
+El hilo del request solo inserta la fila en `inventory_outbox` dentro de su
+propia transacción (`record_outbox_event`); nada se publica si la
+transacción hace rollback. El relay, en segundo plano:
+
+1. Reclama un lote de eventos `pending` en orden de `id` (orden de commit):
+   `SELECT ... FOR UPDATE SKIP LOCKED`, los marca `publishing` y hace
+   commit. Los locks de fila duran solo ese UPDATE.
+2. Fuera de la transacción, los agrupa por SKU y los publica con
+   `publish_coalesced` (una consulta de stock multi-SKU y un emit por SKU).
+3. En otra transacción corta marca las filas `published` o las devuelve a
+   `pending` con el error.
+
+Orden por SKU: las filas se procesan en orden de `id` y un SKU que falla
+deja TODAS sus filas pendientes (incluidas las posteriores del lote), así
+que nunca se publica un evento de un SKU antes que otro anterior del mismo
+SKU. Solo debe correr un relay (el worker con BACKGROUND_JOBS_ENABLED). Si
+el relay muere con filas reclamadas, vuelven a reclamarse tras
+INVENTORY_OUTBOX_CLAIM_TIMEOUT_SECONDS (entrega al menos una vez).
+
+Las filas publicadas se borran al vencer la retención
+(`cleanup_published`, job horario en background_jobs).
+"""
+
+import os
+import threading
+import logging
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session as OrmSession
+
+from src.session import db
+from src.models.inventory_outbox import InventoryOutboxEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 0.5  # segundos
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETENTION_HOURS = 24
+DEFAULT_CLAIM_TIMEOUT_SECONDS = 60
+
+# Copia de una fila reclamada: se publica sin tocar la sesión
+ClaimedEvent = namedtuple('ClaimedEvent', ['id', 'product_sku', 'payload', 'created_at'])
+
+# Marca en session.info: la transacción escribió eventos al outbox
+_SESSION_FLAG = 'inventory_outbox_dirty'
+
+# Instancia global del relay (será inicializada desde main.py)
+outbox_relay: Optional['InventoryOutboxRelay'] = None
+
+
+def record_outbox_event(event) -> InventoryOutboxEvent:
+    """
+    Agrega el evento al outbox en la sesión actual. No hace commit: la fila
+    se confirma o se descarta junto con el cambio de stock.
+
+    Args:
+        event: InventoryEvent a publicar
+    """
+    row = InventoryOutboxEvent.from_event(event)
+    db.session.add(row)
+    db.session.info[_SESSION_FLAG] = True
+    return row
+
+
+def record_outbox_events(events) -> int:
+    """
+    Agrega varios eventos al outbox con un solo INSERT de varias filas, en
+    la transacción actual (importaciones masivas).
+
+    Args:
+        events: InventoryEvents a publicar
+    """
+    rows = [
+        {
+            'product_sku': event.product_sku,
+            'change_type': event.change_type,
+            'payload': event.to_dict(),
+            'status': InventoryOutboxEvent.STATUS_PENDING,
+            'attempts': 0,
+            'created_at': datetime.utcnow()
+        }
+        for event in events
+    ]
+    if rows:
+        db.session.execute(InventoryOutboxEvent.__table__.insert(), rows)
+        db.session.info[_SESSION_FLAG] = True
+    return len(rows)
+
+
+@sa_event.listens_for(OrmSession, 'after_commit')
+def _wake_relay_after_commit(session):
+    """Despierta al relay local en cuanto se confirman eventos nuevos."""
+    if session.info.pop(_SESSION_FLAG, False) and outbox_relay is not None:
+        outbox_relay.wake()
+
+
+@sa_event.listens_for(OrmSession, 'after_rollback')
+def _clear_flag_after_rollback(session):
+    session.info.pop(_SESSION_FLAG, None)
+
+
+class InventoryOutboxRelay:
+    """
+    Drena el outbox de inventario en lotes y publica por WebSocket.
+    """
+
+    def __init__(self, app=None, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 batch_size: int = DEFAULT_BATCH_SIZE, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 claim_timeout: float = DEFAULT_CLAIM_TIMEOUT_SECONDS):
+        self.app = app
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.claim_timeout = claim_timeout
+        self._drain_lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Métricas
+        self.events_published = 0
+        self.events_failed = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Inicia el hilo del relay."""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name='inventory-outbox-relay',
+            daemon=True
+        )
+        self._thread.start()
+        logger.info(f"✅ Relay de outbox de inventario iniciado (poll cada {self.poll_interval}s)")
+
+    def stop(self, drain: bool = True):
+        """Detiene el hilo y, opcionalmente, publica lo pendiente."""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(self.poll_interval * 2, 1.0))
+            self._thread = None
+        if drain:
+            self.drain()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def wake(self):
+        """Pide un drenado inmediato (sin esperar al siguiente poll)."""
+        self._wake_event.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wake_event.wait(self.poll_interval)
+            self._wake_event.clear()
+            if self._stop_event.is_set():
+                break
+            self.drain()
+
+    # ------------------------------------------------------------------
+    # Drenado
+    # ------------------------------------------------------------------
+
+    def drain(self) -> int:
+        """
+        Publica lotes hasta vaciar el outbox. Se detiene en el primer lote con
+        fallos para no gastar los reintentos en la misma pasada.
+
+        Returns:
+            Número de eventos publicados
+        """
+        total = 0
+        while True:
+            if self.app is not None:
+                with self.app.app_context():
+                    published, fetched = self.drain_once()
+            else:
+                published, fetched = self.drain_once()
+            total += published
+            if fetched < self.batch_size or published < fetched:
+                return total
+
+    def drain_once(self):
+        """
+        Procesa un lote. Debe ejecutarse dentro de un app context.
+
+        Returns:
+            (eventos publicados, filas leídas)
+        """
+        with self._drain_lock:
+            try:
+                claimed = self._claim_batch()
+            except Exception as e:
+                db.session.rollback()
+                self.errors += 1
+                logger.error(f"❌ Error reclamando eventos del outbox de inventario: {str(e)}", exc_info=True)
+                return 0, 0
+
+            if not claimed:
+                return 0, 0
+
+            # Sin transacción abierta: los emits (y las consultas al catálogo)
+            # no retienen locks sobre el outbox
+            published_ids, failures = _publish_rows(claimed)
+            db.session.rollback()
+
+            try:
+                now = self._finish_batch(claimed, published_ids, failures)
+            except Exception as e:
+                db.session.rollback()
+                self.errors += 1
+                logger.error(f"❌ Error cerrando lote del outbox de inventario: {str(e)}", exc_info=True)
+                return 0, 0
+
+            self.batches += 1
+            self.events_published += len(published_ids)
+            if published_ids:
+                oldest = min(row.created_at for row in claimed if row.id in published_ids)
+                self.last_lag_ms = (now - oldest).total_seconds() * 1000
+                self.max_lag_ms = max(self.max_lag_ms, self.last_lag_ms)
+                logger.debug(f"📤 Outbox: {len(published_ids)}/{len(claimed)} eventos publicados")
+
+            return len(published_ids), len(claimed)
+
+    def _claim_batch(self) -> List[ClaimedEvent]:
+        """Marca un lote como `publishing` y confirma de inmediato."""
+        now = datetime.utcnow()
+        rows = (
+            InventoryOutboxEvent.query
+            .filter(or_(
+                InventoryOutboxEvent.status == InventoryOutboxEvent.STATUS_PENDING,
+                and_(
+                    InventoryOutboxEvent.status == InventoryOutboxEvent.STATUS_PUBLISHING,
+                    InventoryOutboxEvent.claimed_at < now - timedelta(seconds=self.claim_timeout)
+                )
+            ))
+            .order_by(InventoryOutboxEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+        claimed = []
+        for row in rows:
+            row.status = InventoryOutboxEvent.STATUS_PUBLISHING
+            row.claimed_at = now
+            claimed.append(ClaimedEvent(row.id, row.product_sku, row.payload, row.created_at))
+        db.session.commit()
+        return claimed
+
+    def _finish_batch(self, claimed: List[ClaimedEvent], published_ids, failures) -> datetime:
+        """Registra el resultado de la publicación de un lote reclamado."""
+        now = datetime.utcnow()
+        rows = (
+            InventoryOutboxEvent.query
+            .filter(InventoryOutboxEvent.id.in_([row.id for row in claimed]))
+            .all()
+        )
+
+        for row in rows:
+            if row.id in published_ids:
+                row.status = InventoryOutboxEvent.STATUS_PUBLISHED
+                row.published_at = now
+                row.last_error = None
+            elif row.id in failures:
+                row.status = InventoryOutboxEvent.STATUS_PENDING
+                row.attempts += 1
+                row.last_error = failures[row.id][:500]
+                if row.attempts >= self.max_attempts:
+                    row.status = InventoryOutboxEvent.STATUS_FAILED
+                    self.events_failed += 1
+                    logger.error(
+                        f"❌ Evento de outbox {row.id} ({row.product_sku}) descartado "
+                        f"tras {row.attempts} intentos: {row.last_error}"
+                    )
+
+        db.session.commit()
+        return now
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict:
+        return {
+            'running': self.is_running,
+            'poll_interval_ms': int(self.poll_interval * 1000),
+            'batch_size': self.batch_size,
+            'events_published': self.events_published,
+            'events_failed': self.events_failed,
+            'batches': self.batches,
+            'errors': self.errors,
+            'last_lag_ms': round(self.last_lag_ms, 2),
+            'max_lag_ms': round(self.max_lag_ms, 2),
+        }
+
+
+def _publish_rows(rows: List[ClaimedEvent]):
+    """
+    Publica las filas agrupadas por SKU. Si el lote completo falla, reintenta
+    SKU por SKU para que un SKU con error no bloquee a los demás.
+
+    Returns:
+        (ids publicados, {id: error} de las filas que quedan pendientes)
+    """
+    from src.websockets.inventory_events import InventoryEvent
+    from src.websockets.inventory_event_buffer import coalesce_events, publish_coalesced
+
+    rows_by_sku: 'OrderedDict[str, List[InventoryOutboxEvent]]' = OrderedDict()
+    for row in rows:
+        rows_by_sku.setdefault(row.product_sku, []).append(row)
+
+    def events_for(sku_rows):
+        return [InventoryEvent.from_dict(row.payload) for row in sku_rows]
+
+    try:
+        publish_coalesced(coalesce_events(events_for(rows)))
+        return {row.id for row in rows}, {}
+    except Exception as e:
+        logger.warning(f"⚠️ Falló la publicación del lote de outbox, reintentando por SKU: {str(e)}")
+
+    published_ids = set()
+    failures = {}
+    for sku, sku_rows in rows_by_sku.items():
+        try:
+            publish_coalesced(coalesce_events(events_for(sku_rows)))
+            published_ids.update(row.id for row in sku_rows)
+        except Exception as e:
+            for row in sku_rows:
+                failures[row.id] = str(e)
+
+    return published_ids, failures
+
+
+def cleanup_published(retention_hours: Optional[float] = None) -> int:
+    """
+    Borra los eventos publicados más antiguos que la retención.
+    Debe ejecutarse dentro de un app context.
+
+    Returns:
+        Número de filas borradas
+    """
+    if retention_hours is None:
+        retention_hours = float(os.getenv('INVENTORY_OUTBOX_RETENTION_HOURS', DEFAULT_RETENTION_HOURS))
+
+    cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+    deleted = (
+        InventoryOutboxEvent.query
+        .filter(
+            InventoryOutboxEvent.status == InventoryOutboxEvent.STATUS_PUBLISHED,
+            InventoryOutboxEvent.published_at < cutoff
+        )
+        .delete(synchronize_session=False)
+    )
+    db.session.commit()
+    return deleted
+
+
+def get_outbox_backlog() -> Dict:
+    """Eventos pendientes (incluye reclamados)/fallidos y antigüedad del pendiente más viejo."""
+    pending = (
+        db.session.query(
+            db.func.count(InventoryOutboxEvent.id),
+            db.func.min(InventoryOutboxEvent.created_at)
+        )
+        .filter(InventoryOutboxEvent.status.in_([
+            InventoryOutboxEvent.STATUS_PENDING,
+            InventoryOutboxEvent.STATUS_PUBLISHING
+        ]))
+        .one()
+    )
+    failed = (
+        db.session.query(db.func.count(InventoryOutboxEvent.id))
+        .filter(InventoryOutboxEvent.status == InventoryOutboxEvent.STATUS_FAILED)
+        .scalar()
+    )
+    oldest = pending[1]
+    return {
+        'pending': pending[0],
+        'failed': failed,
+        'oldest_pending_age_ms': (
+            round((datetime.utcnow() - oldest).total_seconds() * 1000, 2) if oldest else None
+        ),
+    }
+
+
+def init_inventory_outbox_relay(app) -> Optional[InventoryOutboxRelay]:
+    """
+    Inicializa el relay del outbox. Se desactiva en TESTING o con
+    INVENTORY_OUTBOX_RELAY=false (p. ej. en workers sin background jobs).
+
+    Args:
+        app: Instancia de Flask app
+    """
+    global outbox_relay
+
+    enabled = app.config.get('INVENTORY_OUTBOX_RELAY')
+    if enabled is None:
+        enabled = (
+            not app.config.get('TESTING', False)
+            and os.getenv('INVENTORY_OUTBOX_RELAY', 'true').lower() in ['true', '1', 'yes']
+        )
+
+    if not enabled:
+        return None
+
+    if outbox_relay is not None and outbox_relay.is_running:
+        logger.warning("⚠️ Relay de outbox de inventario ya está inicializado")
+        return outbox_relay
+
+    poll_ms = app.config.get(
+        'INVENTORY_OUTBOX_POLL_MS',
+        int(os.getenv('INVENTORY_OUTBOX_POLL_MS', DEFAULT_POLL_INTERVAL * 1000))
+    )
+    batch_size = app.config.get(
+        'INVENTORY_OUTBOX_BATCH_SIZE',
+        int(os.getenv('INVENTORY_OUTBOX_BATCH_SIZE', DEFAULT_BATCH_SIZE))
+    )
+
+    claim_timeout = app.config.get(
+        'INVENTORY_OUTBOX_CLAIM_TIMEOUT_SECONDS',
+        float(os.getenv('INVENTORY_OUTBOX_CLAIM_TIMEOUT_SECONDS', DEFAULT_CLAIM_TIMEOUT_SECONDS))
+    )
+
+    outbox_relay = InventoryOutboxRelay(
+        app=app,
+        poll_interval=poll_ms / 1000.0,
+        batch_size=batch_size,
+        claim_timeout=claim_timeout
+    )
+    outbox_relay.start()
+    return outbox_relay
+
+
+def shutdown_inventory_outbox_relay():
+    """Detiene el relay publicando los eventos pendientes."""
+    global outbox_relay
+
+    if outbox_relay is not None:
+        outbox_relay.stop(drain=True)
+        outbox_relay = None
+        logger.info("✅ Relay de outbox de inventario detenido")
+
+
+def get_outbox_relay() -> Optional[InventoryOutboxRelay]:
+    """Obtiene la instancia del relay (None si no corre en este proceso)."""
+    return outbox_relay
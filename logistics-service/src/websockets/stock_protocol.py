@@ -0,0 +1,267 @@
+"""
+Protocolo v2 de actualizaciones de stock para clientes WebSocket.
+
+A diferencia del protocolo v1 (`stock_updated`, payload completo en cada
+mensaje), el v2:
+
+- Asigna a cada SKU un número de secuencia monótonamente creciente.
+- Al suscribirse entrega un snapshot compacto con su `seq` (seq 0 si el SKU
+  no tenía suscriptores v2).
+- Luego envía `stock_delta` con solo los campos que cambiaron.
+- Soporta codificación binaria MessagePack (opcional).
+- Si el cliente detecta un salto en `seq`, pide `resync_products` y recibe
+  un `stock_snapshot` nuevo.
+
+Formato compacto (claves cortas para reducir bytes):
+    ta/tp/tr/tt/tc: total disponible / físico / reservado / en tránsito / en carritos
+    c: {dc_id: {k: código, a: disponible, p: físico, r: reservado,
+                t: en tránsito, l: stock bajo, o: agotado}}
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependencia opcional
+    msgpack = None
+
+STOCK_PROTOCOL_VERSION = 2
+
+ENCODING_JSON = 'json'
+ENCODING_MSGPACK = 'msgpack'
+
+TOTAL_FIELDS = {
+    'total_available': 'ta',
+    'total_physical': 'tp',
+    'total_reserved': 'tr',
+    'total_in_transit': 'tt',
+    'total_cart_reserved': 'tc',
+}
+
+CENTER_FIELDS = {
+    'distribution_center_code': 'k',
+    'quantity_available': 'a',
+    'quantity_physical': 'p',
+    'quantity_reserved': 'r',
+    'quantity_in_transit': 't',
+    'is_low_stock': 'l',
+    'is_out_of_stock': 'o',
+}
+
+
+def supported_encodings() -> List[str]:
+    """Codificaciones disponibles en este servidor."""
+    if msgpack is not None:
+        return [ENCODING_JSON, ENCODING_MSGPACK]
+    return [ENCODING_JSON]
+
+
+def normalize_encoding(encoding: Optional[str]) -> str:
+    """Devuelve una codificación soportada (JSON por defecto)."""
+    if encoding in supported_encodings():
+        return encoding
+    return ENCODING_JSON
+
+
+def protocol_room(product_sku: str, encoding: str = ENCODING_JSON) -> str:
+    """Room de Socket.IO para suscriptores v2 de un SKU en una codificación."""
+    return f"product_v{STOCK_PROTOCOL_VERSION}_{encoding}_{product_sku.upper()}"
+
+
+def encode_message(message: Dict, encoding: str):
+    """Serializa un mensaje para la codificación indicada."""
+    if encoding == ENCODING_MSGPACK and msgpack is not None:
+        return msgpack.packb(message, use_bin_type=True)
+    return message
+
+
+def compact_stock(stock_data: Dict) -> Dict:
+    """
+    Convierte la respuesta de GetStockLevels (o el stock_data de un evento)
+    al formato compacto del protocolo v2.
+    """
+    compact = {}
+    for field, key in TOTAL_FIELDS.items():
+        value = stock_data.get(field)
+        if value is not None:
+            compact[key] = value
+
+    centers = {}
+    for center in stock_data.get('distribution_centers') or []:
+        center_id = center.get('distribution_center_id')
+        if center_id is None:
+            continue
+        centers[str(center_id)] = {
+            key: center[field]
+            for field, key in CENTER_FIELDS.items()
+            if center.get(field) is not None
+        }
+    compact['c'] = centers
+    return compact
+
+
+def diff_compact(previous: Dict, current: Dict) -> Dict:
+    """
+    Calcula el delta entre dos snapshots compactos.
+
+    Solo incluye los totales que cambiaron y, por centro, los campos que
+    cambiaron. Un total ausente en `current` se considera desconocido (no
+    cambiado). Un centro que desaparece se marca con None.
+    """
+    delta = {}
+    for key in TOTAL_FIELDS.values():
+        if key in current and current[key] != previous.get(key):
+            delta[key] = current[key]
+
+    previous_centers = previous.get('c', {})
+    current_centers = current.get('c', {})
+    center_delta = {}
+
+    for center_id, center in current_centers.items():
+        old_center = previous_centers.get(center_id)
+        if old_center is None:
+            center_delta[center_id] = center
+            continue
+        changed = {k: v for k, v in center.items() if old_center.get(k) != v}
+        changed.update({k: None for k in old_center if k not in center})
+        if changed:
+            center_delta[center_id] = changed
+
+    for center_id in previous_centers:
+        if center_id not in current_centers:
+            center_delta[center_id] = None
+
+    if center_delta:
+        delta['c'] = center_delta
+    return delta
+
+
+class StockSequenceTracker:
+    """
+    Mantiene el último snapshot compacto, el número de secuencia y las
+    codificaciones con suscriptores de cada SKU.
+
+    Solo se rastrean SKUs que algún cliente v2 pidió (vía snapshot); para el
+    resto no se calculan deltas ni se emite nada.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[str, List] = {}
+
+    def advance(self, product_sku: str, compact: Dict) -> Optional[Tuple[int, Dict, List[str]]]:
+        """
+        Registra un nuevo estado del SKU.
+
+        Returns:
+            (seq, delta, encodings) o None si el SKU no se rastrea o no cambió.
+        """
+        sku = product_sku.upper()
+        with self._lock:
+            state = self._state.get(sku)
+            if state is None:
+                return None
+
+            seq, previous_compact, encodings = state
+            delta = diff_compact(previous_compact, compact)
+            if not delta:
+                return None
+
+            seq += 1
+            # Los totales que no vinieron en este cambio conservan su último valor
+            self._state[sku] = [seq, {**previous_compact, **compact}, encodings]
+            return seq, delta, sorted(encodings)
+
+    def seed(self, product_sku: str, compact: Dict, encoding: Optional[str] = None) -> Tuple[int, Dict]:
+        """Registra un snapshot inicial si el SKU no se rastrea y devuelve el vigente."""
+        sku = product_sku.upper()
+        with self._lock:
+            state = self._state.setdefault(sku, [0, compact, set()])
+            if encoding:
+                state[2].add(encoding)
+            return state[0], state[1]
+
+    def snapshot(self, product_sku: str, encoding: Optional[str] = None) -> Optional[Tuple[int, Dict]]:
+        """Snapshot vigente (seq, compacto); registra la codificación si se indica."""
+        with self._lock:
+            state = self._state.get(product_sku.upper())
+            if state is None:
+                return None
+            if encoding:
+                state[2].add(encoding)
+            return state[0], state[1]
+
+    def missing(self, product_skus: Iterable[str]) -> List[str]:
+        with self._lock:
+            return [sku for sku in product_skus if sku.upper() not in self._state]
+
+    def reset(self):
+        with self._lock:
+            self._state.clear()
+
+
+# Tracker global del proceso
+sequence_tracker = StockSequenceTracker()
+
+
+def build_delta_message(product_sku: str, seq: int, delta: Dict,
+                        change_type: str, timestamp: str) -> Dict:
+    """Mensaje `stock_delta` del protocolo v2."""
+    return {
+        'v': STOCK_PROTOCOL_VERSION,
+        'sku': product_sku,
+        'seq': seq,
+        'ct': change_type,
+        'ts': timestamp,
+        'd': delta,
+    }
+
+
+def build_snapshots(product_skus: List[str], encoding: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Devuelve snapshots {sku: {seq, s}} para los SKUs indicados.
+
+    Los SKUs sin estado se consultan con una sola consulta multi-SKU
+    (`load_stock_payloads`, el mismo payload que los eventos) y se
+    registran con seq 0. Si se indica `encoding`, el SKU queda marcado para
+    emitir deltas en esa codificación. Debe ejecutarse dentro de un app context.
+    """
+    from src.websockets.inventory_event_buffer import load_stock_payloads
+
+    skus = [sku.upper() for sku in product_skus]
+    missing = sequence_tracker.missing(skus)
+
+    if missing:
+        payloads = load_stock_payloads(missing, include_missing=False)
+        for sku in missing:
+            sequence_tracker.seed(sku, compact_stock(payloads.get(sku, {})))
+
+    snapshots = {}
+    for sku in skus:
+        seq, compact = sequence_tracker.snapshot(sku, encoding)
+        snapshots[sku] = {'seq': seq, 's': compact}
+    return snapshots
+
+
+def emit_stock_delta(emit, product_sku: str, stock_data: Dict, change_type: str, timestamp: str):
+    """
+    Emite `stock_delta` con solo los campos que cambiaron respecto al último
+    estado enviado del SKU. No hace nada si ningún cliente v2 se suscribió.
+
+    Args:
+        emit: Función emit de Socket.IO (local o del backplane)
+    """
+    result = sequence_tracker.advance(product_sku, compact_stock(stock_data))
+    if result is None:
+        return
+
+    seq, delta, encodings = result
+    message = build_delta_message(product_sku, seq, delta, change_type, timestamp)
+
+    for encoding in encodings:
+        emit(
+            'stock_delta',
+            encode_message(message, encoding),
+            room=protocol_room(product_sku, encoding)
+        )
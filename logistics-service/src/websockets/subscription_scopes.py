@@ -0,0 +1,170 @@
+"""
+Suscripciones por alcance (centro de distribución, categoría y tipo de evento).
+
+Cada combinación (dc, categoría, tipo de evento) es un room; '*' significa
+"cualquiera". Un cliente que pide {dc: [1], event_types: [low_stock]} se une
+a `scope_dc:1|cat:*|ev:low_stock`.
+
+Para cada evento se calculan los rooms que lo aceptan (a lo sumo
+2 x 2 x 2 por centro afectado) y se emite UNA vez a la lista completa:
+Socket.IO deduplica participantes, así que cada suscriptor lo recibe
+exactamente una vez aunque esté en varios rooms que coinciden.
+"""
+
+import threading
+from itertools import product
+from typing import Dict, Iterable, List, Optional, Set
+
+from src.websockets.inventory_events import InventoryChangeType
+
+WILDCARD = '*'
+
+SCOPE_EVENT_TYPES = {
+    InventoryChangeType.UPDATE,
+    InventoryChangeType.LOW_STOCK,
+    InventoryChangeType.OUT_OF_STOCK,
+    InventoryChangeType.RESTOCK,
+    InventoryChangeType.RESERVATION,
+    InventoryChangeType.RESERVATION_RELEASED,
+    InventoryChangeType.SALE,
+    InventoryChangeType.ADJUSTMENT,
+    InventoryChangeType.EXPIRY_DIGEST,
+}
+
+
+def is_scope_room(room: str) -> bool:
+    return room.startswith('scope_dc:')
+
+
+def normalize_category(category: Optional[str]) -> Optional[str]:
+    if category is None:
+        return None
+    category = str(category).strip().upper()
+    return category or None
+
+
+def scope_room(distribution_center_id=WILDCARD, category=WILDCARD, event_type=WILDCARD) -> str:
+    """Nombre del room para una combinación de alcance."""
+    return f"scope_dc:{distribution_center_id}|cat:{category}|ev:{event_type}"
+
+
+def rooms_for_subscription(
+    distribution_center_ids: Optional[Iterable[int]] = None,
+    categories: Optional[Iterable[str]] = None,
+    event_types: Optional[Iterable[str]] = None
+) -> List[str]:
+    """
+    Rooms a los que debe unirse un cliente para el alcance pedido.
+
+    Raises:
+        ValueError: Si algún tipo de evento no es válido
+    """
+    dcs = [int(dc) for dc in distribution_center_ids] if distribution_center_ids else [WILDCARD]
+    cats = [normalize_category(c) for c in categories if normalize_category(c)] if categories else []
+    cats = cats or [WILDCARD]
+    events = list(event_types) if event_types else [WILDCARD]
+
+    invalid = [ev for ev in events if ev != WILDCARD and ev not in SCOPE_EVENT_TYPES]
+    if invalid:
+        raise ValueError(f"Tipos de evento no soportados: {', '.join(invalid)}")
+
+    return [scope_room(dc, cat, ev) for dc, cat, ev in product(dcs, cats, events)]
+
+
+def rooms_for_event(
+    distribution_center_ids: Iterable[int],
+    category: Optional[str],
+    change_type: str
+) -> List[str]:
+    """
+    Conjunto mínimo de rooms que aceptan un evento.
+
+    Args:
+        distribution_center_ids: Centros afectados por el cambio
+        category: Categoría del producto (None si se desconoce)
+        change_type: Tipo de cambio del evento
+    """
+    dcs: Set = set(distribution_center_ids) | {WILDCARD}
+    cats = {WILDCARD}
+    category = normalize_category(category)
+    if category:
+        cats.add(category)
+    events = {WILDCARD, change_type}
+
+    return sorted(scope_room(dc, cat, ev) for dc, cat, ev in product(dcs, cats, events))
+
+
+def affected_center_ids(stock_data: Dict) -> List[int]:
+    """
+    Centros afectados por un cambio: los indicados por el evento o, si no
+    vienen, todos los centros del stock_data.
+    """
+    if stock_data.get('updated_center_ids'):
+        return list(stock_data['updated_center_ids'])
+    if stock_data.get('updated_center_id') is not None:
+        return [stock_data['updated_center_id']]
+    return [
+        center['distribution_center_id']
+        for center in stock_data.get('distribution_centers') or []
+        if center.get('distribution_center_id') is not None
+    ]
+
+
+class ScopeRegistry:
+    """
+    Cuenta suscripciones por categoría en este proceso, para consultar la
+    categoría en el catálogo solo cuando alguien la necesita.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._category_subscriptions = 0
+
+    def add(self, rooms: List[str]):
+        with self._lock:
+            self._category_subscriptions += sum(1 for r in rooms if '|cat:*|' not in r)
+
+    def remove(self, rooms: List[str]):
+        with self._lock:
+            self._category_subscriptions = max(
+                0, self._category_subscriptions - sum(1 for r in rooms if '|cat:*|' not in r)
+            )
+
+    def has_category_scopes(self) -> bool:
+        with self._lock:
+            return self._category_subscriptions > 0
+
+    def reset(self):
+        with self._lock:
+            self._category_subscriptions = 0
+
+
+scope_registry = ScopeRegistry()
+
+
+def categories_needed(force: bool = False) -> bool:
+    """True si los eventos deben enrutarse también por categoría."""
+    return force or scope_registry.has_category_scopes()
+
+
+def resolve_categories(
+    product_skus: Iterable[str],
+    force: bool = False,
+    blocking: bool = True,
+    prefetch: bool = True
+) -> Dict[str, Optional[str]]:
+    """
+    Categoría por SKU desde el catálogo (cacheada). Si no hay suscripciones
+    por categoría y no se fuerza, no consulta nada.
+
+    Con blocking=False solo se usa el caché; los SKUs faltantes se consultan
+    en segundo plano (salvo prefetch=False) y no aparecen en el resultado.
+    """
+    skus = list(product_skus)
+    if not skus or not categories_needed(force):
+        return {}
+
+    from src.services.catalog_service_client import get_catalog_service_client
+    return get_catalog_service_client().get_product_categories(
+        skus, fetch_missing=blocking, prefetch=prefetch
+    )
@@ -5,20 +5,52 @@ Este módulo maneja las conexiones WebSocket y envía notificaciones
 en tiempo real cuando el inventario cambia.
 """
 
-from flask_socketio import SocketIO, emit, join_room, leave_room
-from typing import Dict, List, Optional
+from flask import has_request_context
+from flask_socketio import SocketIO, emit, join_room, leave_room, rooms as joined_rooms
+from typing import Dict, List, Optional, Tuple
+import os
 import logging
+import threading
+from src.websockets.inventory_events import InventoryChangeType
+from src.websockets.backplane import InventoryBackplaneMixin, create_client_manager
+from src.websockets.subscription_scopes import (
+    affected_center_ids,
+    categories_needed,
+    is_scope_room,
+    resolve_categories,
+    rooms_for_event,
+    rooms_for_subscription,
+    scope_registry
+)
+from src.websockets.stock_protocol import (
+    STOCK_PROTOCOL_VERSION,
+    build_snapshots,
+    emit_stock_delta,
+    normalize_encoding,
+    protocol_room,
+    supported_encodings
+)
 
 logger = logging.getLogger(__name__)
 
 # Instancia global de SocketIO (será inicializada desde main.py)
 socketio: Optional[SocketIO] = None
 
+# Suscriptores de todos los productos que pidieron `stock_updated_batch`
+ALL_INVENTORY_BATCH_ROOM = 'all_inventory_updates_batch'
+
 
 def init_socketio(app):
     """
     Inicializa Socket.IO con la aplicación Flask.
     
+    Configuración (app.config o variables de entorno):
+    - SOCKETIO_MESSAGE_QUEUE: URL del backplane (redis://, rediss:// o local://)
+      para correr varios workers. Sin valor, todo es local al proceso.
+    - SOCKETIO_ASYNC_MODE: 'threading' o 'eventlet'. Por defecto 'eventlet'
+      con FLASK_ENV=production y 'threading' en otro caso.
+    - SOCKETIO_LOGGER: logs por conexión/paquete de Socket.IO (default: false)
+    
     Args:
         app: Instancia de Flask
     
@@ -27,23 +59,47 @@ def init_socketio(app):
     """
     global socketio
     
+    message_queue = _config(app, 'SOCKETIO_MESSAGE_QUEUE')
+    async_mode = _config(app, 'SOCKETIO_ASYNC_MODE') or _default_async_mode()
+    verbose_logging = str(_config(app, 'SOCKETIO_LOGGER', 'false')).lower() in ['true', '1', 'yes']
+    
+    options = {}
+    client_manager = create_client_manager(message_queue)
+    if client_manager is not None:
+        options['client_manager'] = client_manager
+    
     socketio = SocketIO(
         app,
         cors_allowed_origins="*",  # En producción, especificar dominios permitidos
-        async_mode='threading',
-        logger=True,
-        engineio_logger=True,
+        async_mode=async_mode,
+        logger=verbose_logging,
+        engineio_logger=verbose_logging,
         ping_timeout=60,
-        ping_interval=25
+        ping_interval=25,
+        **options
     )
     
     # Registrar event handlers
     register_socket_events()
     
-    logger.info("✅ Socket.IO initialized successfully")
+    logger.info(
+        f"✅ Socket.IO initialized successfully (async_mode={async_mode}, "
+        f"backplane={'on' if client_manager is not None else 'off'})"
+    )
     return socketio
 
 
+def _config(app, key, default=None):
+    value = app.config.get(key)
+    if value is None:
+        value = os.getenv(key, default)
+    return value
+
+
+def _default_async_mode():
+    return 'eventlet' if os.getenv('FLASK_ENV') == 'production' else 'threading'
+
+
 def register_socket_events():
     """Registra los manejadores de eventos de Socket.IO."""
     
@@ -59,6 +115,8 @@ def register_socket_events():
     @socketio.on('disconnect')
     def handle_disconnect():
         """Maneja desconexión de cliente."""
+        # Socket.IO saca al cliente de sus rooms después de este handler
+        scope_registry.remove([room for room in joined_rooms() if is_scope_room(room)])
         logger.info(f"🔌 Cliente desconectado: {request.sid}")
     
     @socketio.on('subscribe_products')
@@ -68,7 +126,9 @@ def register_socket_events():
         
         Payload esperado:
         {
-            "product_skus": ["JER-001", "VAC-001"]
+            "product_skus": ["JER-001", "VAC-001"],
+            "protocol": 2,           // opcional, v2 = deltas con secuencia
+            "encoding": "msgpack"    // opcional (solo v2), default "json"
         }
         """
         try:
@@ -78,6 +138,24 @@ def register_socket_events():
                 emit('error', {'message': 'product_skus requerido'})
                 return
             
+            if data.get('protocol') == STOCK_PROTOCOL_VERSION:
+                encoding = normalize_encoding(data.get('encoding'))
+                for sku in product_skus:
+                    join_room(protocol_room(sku, encoding))
+                logger.info(
+                    f"📦 Cliente {request.sid} suscrito (v{STOCK_PROTOCOL_VERSION}/{encoding}) "
+                    f"a {len(product_skus)} productos"
+                )
+                
+                emit('subscribed', {
+                    'product_skus': product_skus,
+                    'protocol': STOCK_PROTOCOL_VERSION,
+                    'encoding': encoding,
+                    'snapshots': build_snapshots(product_skus, encoding),
+                    'message': f'Suscrito a {len(product_skus)} productos'
+                })
+                return
+            
             # Unir cliente a rooms por cada SKU
             for sku in product_skus:
                 room_name = f"product_{sku.upper()}"
@@ -93,6 +171,33 @@ def register_socket_events():
             logger.error(f"❌ Error en suscripción: {str(e)}")
             emit('error', {'message': str(e)})
     
+    @socketio.on('resync_products')
+    def handle_resync_products(data):
+        """
+        Reenvía el snapshot v2 de los productos indicados (tras detectar un
+        salto en la secuencia).
+        
+        Payload esperado:
+        {
+            "product_skus": ["JER-001"]
+        }
+        """
+        try:
+            product_skus = data.get('product_skus', [])
+            
+            if not product_skus:
+                emit('error', {'message': 'product_skus requerido'})
+                return
+            
+            emit('stock_snapshot', {
+                'v': STOCK_PROTOCOL_VERSION,
+                'snapshots': build_snapshots(product_skus)
+            })
+            
+        except Exception as e:
+            logger.error(f"❌ Error en resync: {str(e)}")
+            emit('error', {'message': str(e)})
+    
     @socketio.on('unsubscribe_products')
     def handle_unsubscribe_products(data):
         """
@@ -109,6 +214,8 @@ def register_socket_events():
             for sku in product_skus:
                 room_name = f"product_{sku.upper()}"
                 leave_room(room_name)
+                for encoding in supported_encodings():
+                    leave_room(protocol_room(sku, encoding))
                 logger.info(f"📦 Cliente {request.sid} desuscrito de {room_name}")
             
             emit('unsubscribed', {
@@ -121,12 +228,19 @@ def register_socket_events():
     
     @socketio.on('subscribe_all_products')
     def handle_subscribe_all(data=None):
-        """Suscribir cliente a TODOS los cambios de inventario."""
+        """
+        Suscribir cliente a TODOS los cambios de inventario.
+        
+        Por defecto recibe un `stock_updated` por producto; con
+        {"batch": true} recibe un único `stock_updated_batch` por flush.
+        """
         try:
-            join_room('all_inventory_updates')
-            logger.info(f"📦 Cliente {request.sid} suscrito a TODOS los productos")
+            batch = bool((data or {}).get('batch'))
+            join_room(ALL_INVENTORY_BATCH_ROOM if batch else 'all_inventory_updates')
+            logger.info(f"📦 Cliente {request.sid} suscrito a TODOS los productos (batch={batch})")
             
             emit('subscribed_all', {
+                'batch': batch,
                 'message': 'Suscrito a todas las actualizaciones de inventario'
             })
             
@@ -134,6 +248,145 @@ def register_socket_events():
             logger.error(f"❌ Error en suscripción global: {str(e)}")
             emit('error', {'message': str(e)})
     
+    @socketio.on('subscribe_scope')
+    def handle_subscribe_scope(data=None):
+        """
+        Suscribir cliente a cambios filtrados por alcance. Todos los campos
+        son opcionales; los omitidos significan "cualquiera".
+        
+        Payload esperado:
+        {
+            "distribution_center_ids": [1],
+            "categories": ["Vacunas"],
+            "event_types": ["low_stock", "out_of_stock"]
+        }
+        """
+        try:
+            data = data or {}
+            rooms = rooms_for_subscription(
+                data.get('distribution_center_ids'),
+                data.get('categories'),
+                data.get('event_types')
+            )
+            
+            # Solo cuentan los rooms nuevos del cliente (repetir la suscripción no suma)
+            already_joined = set(joined_rooms())
+            new_rooms = [room_name for room_name in rooms if room_name not in already_joined]
+            for room_name in new_rooms:
+                join_room(room_name)
+            scope_registry.add(new_rooms)
+            logger.info(f"📦 Cliente {request.sid} suscrito a {len(rooms)} rooms de alcance")
+            
+            emit('subscribed_scope', {
+                'distribution_center_ids': data.get('distribution_center_ids') or [],
+                'categories': data.get('categories') or [],
+                'event_types': data.get('event_types') or [],
+                'rooms': len(rooms)
+            })
+            
+        except ValueError as e:
+            emit('error', {'message': str(e)})
+        except Exception as e:
+            logger.error(f"❌ Error en suscripción por alcance: {str(e)}")
+            emit('error', {'message': str(e)})
+    
+    @socketio.on('unsubscribe_scope')
+    def handle_unsubscribe_scope(data=None):
+        """Desuscribir cliente de un alcance (mismo payload que subscribe_scope)."""
+        try:
+            data = data or {}
+            rooms = rooms_for_subscription(
+                data.get('distribution_center_ids'),
+                data.get('categories'),
+                data.get('event_types')
+            )
+            
+            already_joined = set(joined_rooms())
+            left_rooms = [room_name for room_name in rooms if room_name in already_joined]
+            for room_name in left_rooms:
+                leave_room(room_name)
+            scope_registry.remove(left_rooms)
+            
+            emit('unsubscribed_scope', {'rooms': len(rooms)})
+            
+        except ValueError as e:
+            emit('error', {'message': str(e)})
+        except Exception as e:
+            logger.error(f"❌ Error en desuscripción por alcance: {str(e)}")
+            emit('error', {'message': str(e)})
+    
+    @socketio.on('subscribe_route')
+    def handle_subscribe_route(data=None):
+        """
+        Suscribir cliente a las ETAs en vivo de rutas de entrega.
+        
+        Payload esperado:
+        {
+            "route_ids": [12, 15]
+        }
+        """
+        try:
+            route_ids = [int(route_id) for route_id in (data or {}).get('route_ids', [])]
+            
+            if not route_ids:
+                emit('error', {'message': 'route_ids requerido'})
+                return
+            
+            for route_id in route_ids:
+                join_room(route_room(route_id))
+            logger.info(f"🚚 Cliente {request.sid} suscrito a {len(route_ids)} rutas")
+            
+            emit('subscribed_routes', {'route_ids': route_ids})
+            
+        except (TypeError, ValueError):
+            emit('error', {'message': 'route_ids debe ser una lista de enteros'})
+        except Exception as e:
+            logger.error(f"❌ Error en suscripción a rutas: {str(e)}")
+            emit('error', {'message': str(e)})
+    
+    @socketio.on('unsubscribe_route')
+    def handle_unsubscribe_route(data=None):
+        """Desuscribir cliente de rutas (mismo payload que subscribe_route)."""
+        try:
+            route_ids = [int(route_id) for route_id in (data or {}).get('route_ids', [])]
+            
+            for route_id in route_ids:
+                leave_room(route_room(route_id))
+            
+            emit('unsubscribed_routes', {'route_ids': route_ids})
+            
+        except (TypeError, ValueError):
+            emit('error', {'message': 'route_ids debe ser una lista de enteros'})
+        except Exception as e:
+            logger.error(f"❌ Error en desuscripción de rutas: {str(e)}")
+            emit('error', {'message': str(e)})
+    
+    @socketio.on('position_update')
+    def handle_position_update(data=None):
+        """
+        Posición(es) GPS enviadas por la app del conductor. El resultado se
+        devuelve como ack del evento.
+        
+        Payload esperado (una posición o un lote):
+        {
+            "vehicle_id": 5, "latitude": 4.6097, "longitude": -74.0817,
+            "recorded_at": "2025-11-02T14:30:05Z"
+        }
+        {
+            "positions": [{...}, {...}]
+        }
+        """
+        from src.errors.errors import ApiError
+        from src.services.telemetry_ingestion import ingest_positions
+        
+        try:
+            return ingest_positions(data)
+        except ApiError as e:
+            return e.to_dict()
+        except Exception as e:
+            logger.error(f"❌ Error recibiendo posición: {str(e)}")
+            return {'error': str(e), 'status_code': 500}
+    
     @socketio.on('ping')
     def handle_ping():
         """Responde a ping del cliente (mantener conexión viva)."""
@@ -175,18 +428,27 @@ class InventoryNotifier:
                 'stock_data': stock_data
             }
             
-            # Notificar a suscriptores específicos del producto
-            socketio.emit(
-                'stock_updated',
-                payload,
-                room=room_name
+            # Un solo emit al producto, a TODOS los productos y a los rooms de
+            # alcance que aceptan el evento: cada cliente lo recibe una vez
+            categories, uncached = InventoryNotifier._resolve_categories([product_sku_upper])
+            if uncached:
+                InventoryNotifier._emit_when_categorized([{
+                    'product_sku': product_sku_upper,
+                    'stock_data': stock_data,
+                    'change_type': change_type
+                }])
+                return
+            
+            rooms = [room_name, 'all_inventory_updates'] + rooms_for_event(
+                affected_center_ids(stock_data),
+                categories.get(product_sku_upper),
+                change_type
             )
+            socketio.emit('stock_updated', payload, to=rooms)
             
-            # Notificar a suscriptores de TODOS los productos
-            socketio.emit(
-                'stock_updated',
-                payload,
-                room='all_inventory_updates'
+            # Notificar a suscriptores del protocolo v2 (deltas)
+            InventoryNotifier._emit_stock_delta(
+                product_sku_upper, stock_data, change_type, payload['timestamp']
             )
             
             logger.info(f"📤 Notificación enviada: {product_sku_upper} - {change_type}")
@@ -194,6 +456,66 @@ class InventoryNotifier:
         except Exception as e:
             logger.error(f"❌ Error enviando notificación: {str(e)}")
     
+    @staticmethod
+    def _resolve_categories(product_skus: List[str]) -> Tuple[Dict, List[str]]:
+        """
+        Categorías para enrutar por alcance. Con backplane siempre se
+        resuelven (los suscriptores pueden estar en otro worker).
+        
+        Dentro de un request (p. ej. publicación síncrona al confirmar un
+        cambio de inventario) solo se usa el caché para no esperar al
+        catálogo; el flush del buffer y el relay del outbox sí consultan.
+        
+        Returns:
+            (categorías por SKU, SKUs que aún no tienen categoría en caché)
+        """
+        try:
+            manager = getattr(socketio.server, 'manager', None)
+            force = isinstance(manager, InventoryBackplaneMixin)
+            if not has_request_context():
+                return resolve_categories(product_skus, force=force), []
+            
+            categories = resolve_categories(product_skus, force=force, blocking=False, prefetch=False)
+            if not categories_needed(force):
+                return categories, []
+            return categories, [sku for sku in product_skus if sku not in categories]
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudieron resolver categorías: {str(e)}")
+            return {}, []
+    
+    @staticmethod
+    def _emit_when_categorized(changes: List[Dict]) -> threading.Thread:
+        """
+        Emite fuera del request los cambios de SKUs sin categoría en caché.
+        
+        El hilo no tiene request context, así que consulta el catálogo y el
+        evento llega también a los rooms `scope_dc:*|cat:*` de su categoría
+        en lugar de emitirse sin ellos.
+        """
+        def _run():
+            if len(changes) == 1:
+                InventoryNotifier.notify_stock_change(**changes[0])
+            else:
+                InventoryNotifier.notify_stock_changes_batch(changes)
+        
+        thread = threading.Thread(target=_run, name='inventory-category-routing', daemon=True)
+        thread.start()
+        logger.debug(f"⏳ {len(changes)} notificaciones esperan la categoría del catálogo")
+        return thread
+    
+    @staticmethod
+    def _emit_stock_delta(product_sku: str, stock_data: Dict, change_type: str, timestamp: str):
+        """
+        Emite `stock_delta` (protocolo v2). Con backplane, el cambio se
+        publica una vez y cada worker calcula los deltas de sus clientes.
+        """
+        manager = getattr(socketio.server, 'manager', None)
+        if isinstance(manager, InventoryBackplaneMixin):
+            manager.publish_stock_change(product_sku, stock_data, change_type, timestamp)
+            return
+        
+        emit_stock_delta(socketio.emit, product_sku, stock_data, change_type, timestamp)
+    
     @staticmethod
     def notify_multiple_stock_changes(changes: List[Dict]):
         """
@@ -224,6 +546,99 @@ class InventoryNotifier:
         except Exception as e:
             logger.error(f"❌ Error enviando notificaciones batch: {str(e)}")
     
+    @staticmethod
+    def notify_stock_changes_batch(changes: List[Dict]):
+        """
+        Notifica cambios de stock ya agrupados por SKU.
+
+        Cada SKU recibe su `stock_updated` en su room y en
+        `all_inventory_updates` (como en v1); los clientes que pidieron el
+        lote reciben además un único `stock_updated_batch`.
+
+        Args:
+            changes: Lista de cambios (mismo formato que notify_multiple_stock_changes)
+        """
+        if not socketio:
+            logger.warning("⚠️ Socket.IO no inicializado")
+            return
+
+        if not changes:
+            return
+
+        try:
+            timestamp = datetime.utcnow().isoformat()
+            payloads = []
+            categories, uncached = InventoryNotifier._resolve_categories(
+                [change['product_sku'].upper() for change in changes]
+            )
+            if uncached:
+                uncached = set(uncached)
+                InventoryNotifier._emit_when_categorized(
+                    [change for change in changes if change['product_sku'].upper() in uncached]
+                )
+                changes = [change for change in changes if change['product_sku'].upper() not in uncached]
+                if not changes:
+                    return
+
+            for change in changes:
+                product_sku_upper = change['product_sku'].upper()
+                payload = {
+                    'product_sku': product_sku_upper,
+                    'change_type': change.get('change_type', 'update'),
+                    'timestamp': timestamp,
+                    'stock_data': change['stock_data']
+                }
+                payloads.append(payload)
+
+                rooms = [f"product_{product_sku_upper}", 'all_inventory_updates'] + rooms_for_event(
+                    affected_center_ids(payload['stock_data']),
+                    categories.get(product_sku_upper),
+                    payload['change_type']
+                )
+                socketio.emit('stock_updated', payload, to=rooms)
+                InventoryNotifier._emit_stock_delta(
+                    product_sku_upper, payload['stock_data'], payload['change_type'], timestamp
+                )
+
+            socketio.emit(
+                'stock_updated_batch',
+                {
+                    'timestamp': timestamp,
+                    'count': len(payloads),
+                    'updates': payloads
+                },
+                room=ALL_INVENTORY_BATCH_ROOM
+            )
+
+            logger.info(f"📤 Batch de {len(payloads)} notificaciones enviado")
+
+        except Exception as e:
+            logger.error(f"❌ Error enviando batch de notificaciones: {str(e)}")
+
+    @staticmethod
+    def notify_expiry_digest(digest: Dict):
+        """
+        Envía un único `expiry_digest` con el resultado del barrido de
+        vencimientos: a los suscriptores de todos los productos y a los
+        rooms de alcance de los centros afectados que aceptan el evento.
+
+        Args:
+            digest: Resultado de SweepExpiredBatches
+        """
+        if not socketio:
+            logger.warning("⚠️ Socket.IO no inicializado")
+            return
+
+        try:
+            center_ids = [center['distribution_center_id'] for center in digest.get('by_center', [])]
+            rooms = ['all_inventory_updates', ALL_INVENTORY_BATCH_ROOM] + rooms_for_event(
+                center_ids, None, InventoryChangeType.EXPIRY_DIGEST
+            )
+            socketio.emit('expiry_digest', digest, to=rooms)
+            logger.info(f"📤 Resumen de vencimientos enviado ({digest.get('expired_batches', 0)} lotes vencidos)")
+        except Exception as e:
+            logger.error(f"❌ Error enviando resumen de vencimientos: {str(e)}")
+
     @staticmethod
     def notify_low_stock_alert(product_sku: str, stock_data: Dict):
         """
@@ -270,6 +685,36 @@ class InventoryNotifier:
         )
 
 
+def route_room(route_id: int) -> str:
+    """Room de Socket.IO con los suscriptores de una ruta de entrega."""
+    return f"route_{route_id}"
+
+
+class RouteNotifier:
+    """
+    Notificaciones en vivo de rutas de entrega (posición y ETAs).
+    """
+    
+    @staticmethod
+    def notify_route_etas(updates: List[Dict]):
+        """
+        Emite `route_eta_updated` al room de cada ruta.
+        
+        Args:
+            updates: Payloads de recompute_route_etas (uno por ruta)
+        """
+        if not socketio:
+            logger.warning("⚠️ Socket.IO no inicializado")
+            return
+        
+        try:
+            for payload in updates:
+                socketio.emit('route_eta_updated', payload, to=route_room(payload['route_id']))
+            logger.debug(f"📤 ETAs enviadas para {len(updates)} rutas")
+        except Exception as e:
+            logger.error(f"❌ Error enviando ETAs de rutas: {str(e)}")
+
+
 # Importaciones necesarias para los decoradores
 from flask import request
 from datetime import datetime
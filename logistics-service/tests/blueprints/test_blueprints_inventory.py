@@ -73,6 +73,62 @@ class TestInventoryStockLevelsEndpoint:
         assert data['total_in_transit'] == 5
 
 
+class TestInventoryStockLevelsBatchEndpoint:
+    
+    def test_stock_levels_batch(self, client, multiple_inventory_items):
+        response = client.post('/inventory/stock-levels/batch', json={
+            'product_skus': ['JER-001', 'VAC-001', 'NOPE-001']
+        })
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['product_skus'] == ['JER-001', 'VAC-001']
+        assert data['total_available'] == [135, 30]
+        assert data['not_found'] == ['NOPE-001']
+    
+    def test_stock_levels_batch_missing_skus(self, client):
+        response = client.post('/inventory/stock-levels/batch', json={})
+        
+        assert response.status_code == 400
+    
+    def test_stock_levels_batch_invalid_skus(self, client):
+        response = client.post('/inventory/stock-levels/batch', json={'product_skus': [1, 2]})
+        
+        assert response.status_code == 400
+
+
+class TestAllocatePickListEndpoint:
+    
+    def test_allocate_endpoint(self, client, db, warehouse_location_ambient):
+        from datetime import date, timedelta
+        from src.models.product_batch import ProductBatch
+        
+        db.session.add(ProductBatch(
+            product_sku='JER-001',
+            distribution_center_id=warehouse_location_ambient.distribution_center_id,
+            location_id=warehouse_location_ambient.id,
+            batch_number='L1',
+            quantity=10,
+            expiry_date=date.today() + timedelta(days=30),
+            is_available=True
+        ))
+        db.session.commit()
+        
+        response = client.post('/inventory/pick-lists/allocate', json={
+            'distribution_center_id': warehouse_location_ambient.distribution_center_id,
+            'lines': [{'order_id': 'ORD-1', 'product_sku': 'JER-001', 'quantity': 4}]
+        })
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['pick_list'][0]['picks'][0]['quantity'] == 4
+    
+    def test_allocate_endpoint_invalid(self, client):
+        response = client.post('/inventory/pick-lists/allocate', json={'lines': []})
+        
+        assert response.status_code == 400
+
+
 class TestHealthCheckEndpoint:
     
     def test_health_check(self, client):
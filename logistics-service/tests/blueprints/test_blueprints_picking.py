@@ -0,0 +1,75 @@
+import pytest
+from datetime import date, timedelta
+
+from src.models.product_batch import ProductBatch
+
+
+@pytest.fixture
+def stocked_locations(db, warehouse_location, warehouse_location_ambient):
+    for location, sku in [(warehouse_location_ambient, 'GUANTE-001'), (warehouse_location, 'VAC-001')]:
+        db.session.add(ProductBatch(
+            product_sku=sku,
+            distribution_center_id=location.distribution_center_id,
+            location_id=location.id,
+            batch_number=f'L-{sku}',
+            quantity=50,
+            expiry_date=date.today() + timedelta(days=60),
+            required_temperature_min=2.0 if sku == 'VAC-001' else None,
+            required_temperature_max=8.0 if sku == 'VAC-001' else None,
+            is_available=True
+        ))
+    db.session.commit()
+    return warehouse_location.distribution_center_id
+
+
+class TestPickingEndpoints:
+
+    def test_plan_list_and_detail(self, client, stocked_locations):
+        response = client.post('/picking/waves', json={
+            'distribution_center_id': stocked_locations,
+            'orders': [
+                {'order_id': 1, 'departure_time': '08:00',
+                 'lines': [{'product_sku': 'GUANTE-001', 'quantity': 5},
+                           {'product_sku': 'VAC-001', 'quantity': 2}]}
+            ]
+        })
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['summary']['total_waves'] == 2
+        assert [w['zone_type'] for w in data['waves']] == ['ambient', 'refrigerated']
+
+        listing = client.get(f'/picking/waves?distribution_center_id={stocked_locations}'
+                             f'&planned_date={date.today().isoformat()}').get_json()
+        assert listing['total'] == 2
+
+        detail = client.get(f"/picking/waves/{data['waves'][0]['id']}")
+        assert detail.status_code == 200
+        assert detail.get_json()['sequence'][0]['location_code'] == 'B-E2-N2-P1'
+
+    def test_plan_without_persist(self, client, stocked_locations):
+        response = client.post('/picking/waves', json={
+            'distribution_center_id': stocked_locations,
+            'persist': False,
+            'orders': [{'order_id': 1, 'lines': [{'product_sku': 'GUANTE-001', 'quantity': 1}]}]
+        })
+
+        assert response.status_code == 200
+        assert response.get_json()['waves'][0]['id'] is None
+        assert client.get('/picking/waves').get_json()['total'] == 0
+
+    @pytest.mark.parametrize('body', [
+        None,
+        {'orders': []},
+        {'distribution_center_id': 1, 'planned_date': '20-11-2025', 'orders': []},
+        {'distribution_center_id': 1, 'departure_window_minutes': -5, 'orders': []},
+    ])
+    def test_plan_invalid(self, client, body):
+        response = client.post('/picking/waves', json=body)
+
+        assert response.status_code == 400
+
+    def test_wave_not_found(self, client):
+        response = client.get('/picking/waves/999')
+
+        assert response.status_code == 404
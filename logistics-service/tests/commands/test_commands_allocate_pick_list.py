@@ -0,0 +1,152 @@
+import pytest
+from datetime import date, timedelta
+
+from src.commands.allocate_pick_list import AllocatePickList, FefoBatchIndex
+from src.errors.errors import ValidationError
+from src.models.product_batch import ProductBatch
+from src.models.warehouse_location import WarehouseLocation
+
+
+def _batch(db, location, sku, number, quantity, days, **kwargs):
+    batch = ProductBatch(
+        product_sku=sku,
+        distribution_center_id=location.distribution_center_id,
+        location_id=location.id,
+        batch_number=number,
+        quantity=quantity,
+        expiry_date=date.today() + timedelta(days=days),
+        is_available=True,
+        **kwargs
+    )
+    db.session.add(batch)
+    db.session.commit()
+    return batch
+
+
+class TestAllocatePickList:
+    
+    def test_fefo_order_and_split_across_lots(self, db, warehouse_location, warehouse_location_ambient):
+        _batch(db, warehouse_location_ambient, 'GUANTE-001', 'L-LATE', 100, 200)
+        _batch(db, warehouse_location, 'GUANTE-001', 'L-EARLY', 30, 20)
+        _batch(db, warehouse_location_ambient, 'GUANTE-001', 'L-MID', 40, 90)
+        
+        result = AllocatePickList(lines=[
+            {'order_id': 'ORD-1', 'product_sku': 'guante-001', 'quantity': 50,
+             'distribution_center_id': warehouse_location.distribution_center_id}
+        ]).execute()
+        
+        line = result['lines'][0]
+        assert line['status'] == 'allocated'
+        assert [(b['batch_number'], b['quantity']) for b in line['batches']] == [('L-EARLY', 30), ('L-MID', 20)]
+        # Agrupado por ubicación, en orden de pasillo
+        assert [loc['location_code'] for loc in result['pick_list']] == ['B-E2-N2-P1', 'A-E1-N1-P1']
+        assert [loc['total_units'] for loc in result['pick_list']] == [20, 30]
+        assert result['summary']['fill_rate'] == 1.0
+    
+    def test_lots_are_consumed_across_lines(self, db, warehouse_location_ambient):
+        dc_id = warehouse_location_ambient.distribution_center_id
+        _batch(db, warehouse_location_ambient, 'JER-001', 'L1', 10, 30)
+        _batch(db, warehouse_location_ambient, 'JER-001', 'L2', 10, 60)
+        
+        result = AllocatePickList(distribution_center_id=dc_id, lines=[
+            {'order_id': 'A', 'product_sku': 'JER-001', 'quantity': 8},
+            {'order_id': 'B', 'product_sku': 'JER-001', 'quantity': 8},
+            {'order_id': 'C', 'product_sku': 'JER-001', 'quantity': 8},
+        ]).execute()
+        
+        batches = [[(b['batch_number'], b['quantity']) for b in line['batches']] for line in result['lines']]
+        assert batches == [[('L1', 8)], [('L1', 2), ('L2', 6)], [('L2', 4)]]
+        assert result['lines'][2]['status'] == 'partial'
+        assert result['shortages'] == [{
+            'order_id': 'C', 'line_id': 2, 'product_sku': 'JER-001',
+            'distribution_center_id': dc_id, 'quantity_missing': 4
+        }]
+    
+    def test_excludes_expired_quarantined_and_unavailable(self, db, warehouse_location_ambient):
+        dc_id = warehouse_location_ambient.distribution_center_id
+        _batch(db, warehouse_location_ambient, 'JER-001', 'EXPIRED', 10, -1)
+        _batch(db, warehouse_location_ambient, 'JER-001', 'FLAGGED', 10, 30, is_expired=True)
+        _batch(db, warehouse_location_ambient, 'JER-001', 'QUARANTINE', 10, 30, is_quarantine=True)
+        _batch(db, warehouse_location_ambient, 'JER-001', 'BLOCKED', 10, 30)
+        ProductBatch.query.filter_by(batch_number='BLOCKED').update({'is_available': False})
+        _batch(db, warehouse_location_ambient, 'JER-001', 'TODAY', 5, 0)
+        
+        result = AllocatePickList(distribution_center_id=dc_id, lines=[
+            {'product_sku': 'JER-001', 'quantity': 20}
+        ]).execute()
+        
+        assert [b['batch_number'] for b in result['lines'][0]['batches']] == ['TODAY']
+        assert result['lines'][0]['quantity_allocated'] == 5
+    
+    def test_min_shelf_life(self, db, warehouse_location_ambient):
+        dc_id = warehouse_location_ambient.distribution_center_id
+        _batch(db, warehouse_location_ambient, 'JER-001', 'SHORT', 10, 10)
+        _batch(db, warehouse_location_ambient, 'JER-001', 'LONG', 10, 100)
+        
+        result = AllocatePickList(distribution_center_id=dc_id, min_shelf_life_days=30, lines=[
+            {'product_sku': 'JER-001', 'quantity': 5}
+        ]).execute()
+        
+        assert result['lines'][0]['batches'][0]['batch_number'] == 'LONG'
+    
+    def test_cold_chain_batches_only_from_refrigerated_in_range(self, db, warehouse_location, warehouse_location_ambient):
+        dc_id = warehouse_location.distribution_center_id
+        _batch(db, warehouse_location_ambient, 'VAC-001', 'MISPLACED', 10, 10, required_temperature_max=8)
+        _batch(db, warehouse_location, 'VAC-001', 'COLD', 10, 60, required_temperature_max=8)
+        
+        result = AllocatePickList(distribution_center_id=dc_id, lines=[
+            {'product_sku': 'VAC-001', 'quantity': 15}
+        ]).execute()
+        
+        assert [b['batch_number'] for b in result['lines'][0]['batches']] == ['COLD']
+        
+        warehouse_location.current_temperature = 12
+        db.session.commit()
+        result = AllocatePickList(distribution_center_id=dc_id, lines=[
+            {'product_sku': 'VAC-001', 'quantity': 5}
+        ]).execute()
+        
+        assert result['lines'][0]['status'] == 'unallocated'
+    
+    def test_zone_type_filter(self, db, warehouse_location, warehouse_location_ambient):
+        dc_id = warehouse_location.distribution_center_id
+        _batch(db, warehouse_location_ambient, 'JER-001', 'AMB', 10, 10)
+        _batch(db, warehouse_location, 'JER-001', 'REF', 10, 60)
+        
+        result = AllocatePickList(distribution_center_id=dc_id, lines=[
+            {'product_sku': 'JER-001', 'quantity': 5, 'zone_type': 'refrigerated'}
+        ]).execute()
+        
+        assert result['lines'][0]['batches'][0]['batch_number'] == 'REF'
+        assert result['pick_list'][0]['zone_type'] == 'refrigerated'
+    
+    def test_single_query_for_wave(self, db, warehouse_location_ambient):
+        from sqlalchemy import event
+        
+        dc_id = warehouse_location_ambient.distribution_center_id
+        for n in range(5):
+            _batch(db, warehouse_location_ambient, f'SKU-{n}', f'L-{n}', 100, 30)
+        
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            AllocatePickList(distribution_center_id=dc_id, lines=[
+                {'product_sku': f'SKU-{n % 5}', 'quantity': 3} for n in range(50)
+            ]).execute()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        
+        assert len(statements) == 1
+    
+    @pytest.mark.parametrize('lines', [
+        [],
+        [{'product_sku': 'JER-001', 'quantity': 0, 'distribution_center_id': 1}],
+        [{'product_sku': 'JER-001', 'quantity': 1}],
+        [{'quantity': 1, 'distribution_center_id': 1}],
+        [{'product_sku': 'JER-001', 'quantity': 1, 'distribution_center_id': 1, 'zone_type': 'frozen'}],
+    ])
+    def test_invalid_lines(self, db, lines):
+        with pytest.raises(ValidationError):
+            AllocatePickList(lines=lines).execute()
+
@@ -0,0 +1,156 @@
+import io
+import json
+import pytest
+
+from src.commands.bulk_inventory_adjustment import BulkInventoryAdjustment
+from src.errors.errors import ValidationError
+from src.models.inventory import Inventory
+from src.models.inventory_adjustment_staging import InventoryAdjustmentStaging
+from src.models.inventory_movement import InventoryMovement
+from src.models.inventory_outbox import InventoryOutboxEvent
+from src.models.inventory_snapshot import InventorySnapshot
+from src.services.inventory_ledger import append_movement, compact_ledger, get_balance
+
+
+def _csv(*lines):
+    return io.BytesIO(('\n'.join(lines) + '\n').encode('utf-8'))
+
+
+def _quantities():
+    return {
+        (row.product_sku, row.distribution_center_id): row.quantity_available
+        for row in Inventory.query.all()
+    }
+
+
+@pytest.fixture
+def centers(multiple_inventory_items):
+    return multiple_inventory_items[0].distribution_center_id, multiple_inventory_items[1].distribution_center_id
+
+
+class TestBulkInventoryAdjustment:
+
+    def test_applies_diff_and_coalesces_events(self, db, centers):
+        dc1, dc2 = centers
+        stream = _csv(
+            'product_sku,distribution_center_id,quantity',
+            f'JER-001,{dc1},90',
+            f'jer-001,{dc2},40',
+            f'VAC-001,{dc1},30',
+            f'NOPE-001,{dc1},5'
+        )
+
+        result = BulkInventoryAdjustment(stream, reference='CC-2025-11').execute()
+
+        assert result['applied'] is True
+        assert (result['changed'], result['unchanged'], result['units_delta']) == (2, 1, -20)
+        assert result['not_found']['count'] == 1
+        assert result['not_found']['items'][0]['line'] == 5
+        assert _quantities()[('JER-001', dc1)] == 90
+        assert _quantities()[('JER-001', dc2)] == 40
+        # Un evento por SKU afectado (JER-001 en dos centros)
+        events = InventoryOutboxEvent.query.all()
+        assert [event.product_sku for event in events] == ['JER-001']
+        assert events[0].payload['previous_quantity'] == 150
+        assert events[0].payload['new_quantity'] == 130
+        assert InventoryAdjustmentStaging.query.count() == 0
+
+    def test_dry_run_changes_nothing(self, db, centers):
+        dc1, _ = centers
+        before = _quantities()
+
+        result = BulkInventoryAdjustment(
+            _csv('product_sku,distribution_center_id,quantity', f'GUANTE-001,{dc1},25'),
+            dry_run=True
+        ).execute()
+
+        assert result['applied'] is False
+        assert result['changes'] == [{
+            'product_sku': 'GUANTE-001', 'distribution_center_id': dc1,
+            'previous_quantity': 0, 'counted_quantity': 25, 'delta': 25
+        }]
+        assert _quantities() == before
+        assert InventoryOutboxEvent.query.count() == 0
+        assert InventoryAdjustmentStaging.query.count() == 0
+
+    def test_invalid_rows_reject_whole_file(self, db, centers):
+        dc1, _ = centers
+        before = _quantities()
+        stream = _csv(
+            'product_sku,distribution_center_id,quantity',
+            f'JER-001,{dc1},80',
+            f'VAC-001,{dc1},-3',
+            f'JER-001,{dc1},81'
+        )
+
+        with pytest.raises(ValidationError) as error:
+            BulkInventoryAdjustment(stream).execute()
+
+        lines = [item['line'] for item in error.value.payload['errors']]
+        assert lines == [3, 4]
+        assert _quantities() == before
+
+    def test_ndjson_with_ledger(self, app, db, centers):
+        dc1, _ = centers
+        app.config['INVENTORY_LEDGER_ENABLED'] = True
+        stream = io.BytesIO(b'\n'.join(json.dumps(row).encode() for row in [
+            {'product_sku': 'VAC-001', 'distribution_center_id': dc1, 'counted_quantity': 12},
+        ]))
+
+        try:
+            result = BulkInventoryAdjustment(stream, file_format='ndjson').execute()
+        finally:
+            app.config.pop('INVENTORY_LEDGER_ENABLED')
+
+        assert result['write_path'] == 'ledger'
+        movement = InventoryMovement.query.one()
+        assert (movement.movement_type, movement.delta_available) == ('adjustment', -18)
+        assert _quantities()[('VAC-001', dc1)] == 30
+
+    def test_ledger_diff_uses_balance_without_compacting(self, app, db, centers):
+        dc1, _ = centers
+        append_movement('JER-001', dc1, 'receipt', delta_available=20)
+        db.session.commit()
+        compact_ledger(settle_seconds=0)
+        append_movement('JER-001', dc1, 'adjustment', delta_available=-7)
+        append_movement('VAC-001', dc1, 'receipt', delta_available=5)
+        db.session.commit()
+        app.config['INVENTORY_LEDGER_ENABLED'] = True
+        csv_lines = ('product_sku,distribution_center_id,quantity', f'JER-001,{dc1},113', f'VAC-001,{dc1},40')
+
+        try:
+            preview = BulkInventoryAdjustment(_csv(*csv_lines), dry_run=True).execute()
+            snapshots_after_preview = InventorySnapshot.query.count()
+            result = BulkInventoryAdjustment(_csv(*csv_lines)).execute()
+        finally:
+            app.config.pop('INVENTORY_LEDGER_ENABLED')
+
+        # JER-001: snapshot 120 + cola -7 = 113 (sin cambios); VAC-001: 30 + 5
+        assert (preview['changed'], preview['unchanged']) == (1, 1)
+        assert preview['changes'][0]['previous_quantity'] == 35
+        assert snapshots_after_preview == 1
+        assert result['units_delta'] == 5
+        assert get_balance('VAC-001', dc1)['quantity_available'] == 40
+        assert _quantities()[('VAC-001', dc1)] == 30
+
+    def test_requires_header(self, db, centers):
+        with pytest.raises(ValidationError):
+            BulkInventoryAdjustment(_csv('JER-001,1,5')).execute()
+
+    def test_endpoint_multipart(self, client, db, centers):
+        dc1, _ = centers
+        data = {'file': (_csv('product_sku,distribution_center_id,quantity', f'VAC-001,{dc1},35'), 'count.csv')}
+
+        response = client.post('/inventory/adjustments/bulk?dry_run=true', data=data,
+                               content_type='multipart/form-data')
+
+        assert response.status_code == 200
+        assert response.get_json()['changed'] == 1
+        assert _quantities()[('VAC-001', dc1)] == 30
+
+    def test_endpoint_raw_ndjson_invalid(self, client, db, centers):
+        response = client.post('/inventory/adjustments/bulk', data=b'{"product_sku": "VAC-001"}\n',
+                               content_type='application/x-ndjson')
+
+        assert response.status_code == 400
+        assert response.get_json()['rows_invalid'] == 1
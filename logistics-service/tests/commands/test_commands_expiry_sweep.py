@@ -0,0 +1,124 @@
+import pytest
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from src.commands.expiry_sweep import SweepExpiredBatches, GetNearExpiry
+from src.errors.errors import ValidationError
+from src.jobs.background_jobs import expiry_sweep_job
+from src.models.near_expiry_summary import NearExpirySummary
+from src.models.product_batch import ProductBatch
+
+
+def _batch(db, location, sku, number, days, quantity=10, **kwargs):
+    batch = ProductBatch(
+        product_sku=sku,
+        distribution_center_id=location.distribution_center_id,
+        location_id=location.id,
+        batch_number=number,
+        quantity=quantity,
+        expiry_date=date.today() + timedelta(days=days),
+        **kwargs
+    )
+    db.session.add(batch)
+    db.session.commit()
+    return batch
+
+
+@pytest.fixture
+def batches(db, warehouse_location_ambient):
+    location = warehouse_location_ambient
+    return {
+        'expired_1': _batch(db, location, 'JER-001', 'E1', -5, quantity=7, is_available=True),
+        'expired_2': _batch(db, location, 'JER-001', 'E2', -1, quantity=3, is_available=True),
+        'expired_other': _batch(db, location, 'VAC-001', 'E3', -40, quantity=4, is_available=True),
+        'stale_flag': _batch(db, location, 'VAC-001', 'E4', -2, is_available=False, is_expired=False),
+        'today': _batch(db, location, 'JER-001', 'T0', 0, quantity=5, is_available=True),
+        'in_45': _batch(db, location, 'JER-001', 'N45', 45, quantity=20, is_available=True),
+        'in_80': _batch(db, location, 'VAC-001', 'N80', 80, quantity=30, is_available=True),
+        'in_200': _batch(db, location, 'VAC-001', 'FAR', 200, is_available=True),
+    }
+
+
+class TestSweepExpiredBatches:
+
+    def test_flags_expired_in_chunks(self, db, batches):
+        digest = SweepExpiredBatches(chunk_size=2, notify=False).execute()
+
+        assert digest['expired_batches'] == 3
+        assert digest['expired_units'] == 14
+        assert digest['corrected_flags'] == 1
+        for key in ('expired_1', 'expired_2', 'expired_other', 'stale_flag'):
+            batch = db.session.get(ProductBatch, batches[key].id)
+            assert (batch.is_expired, batch.is_available) == (True, False)
+        # Vence hoy: sigue vigente
+        assert db.session.get(ProductBatch, batches['today'].id).is_available is True
+
+        center = digest['by_center'][0]
+        assert center['skus_affected'] == 2
+        assert center['top_skus'][0] == {'product_sku': 'JER-001', 'expired_units': 10}
+
+    def test_second_run_is_idempotent(self, db, batches):
+        SweepExpiredBatches(notify=False).execute()
+
+        digest = SweepExpiredBatches(notify=False).execute()
+
+        assert digest['expired_batches'] == 0
+        assert digest['corrected_flags'] == 0
+
+    def test_rebuilds_near_expiry_buckets(self, db, batches):
+        digest = SweepExpiredBatches(notify=False).execute()
+
+        rows = {(r.product_sku, r.bucket_days): r for r in NearExpirySummary.query.all()}
+        assert set(rows) == {('JER-001', 30), ('JER-001', 60), ('VAC-001', 90)}
+        assert rows[('JER-001', 30)].total_quantity == 5
+        assert digest['near_expiry']['batches'] == {'30': 1, '60': 1, '90': 1}
+
+    def test_emits_single_digest(self, db, batches):
+        with patch('src.websockets.websocket_manager.socketio') as socketio:
+            digest = SweepExpiredBatches().execute()
+
+        socketio.emit.assert_called_once()
+        event, payload = socketio.emit.call_args[0]
+        assert event == 'expiry_digest'
+        assert payload is digest
+        rooms = socketio.emit.call_args[1]['to']
+        dc_id = batches['expired_1'].distribution_center_id
+        assert 'all_inventory_updates' in rooms
+        assert f'scope_dc:{dc_id}|cat:*|ev:expiry_digest' in rooms
+
+    def test_job_runs_sweep(self, db, batches):
+        with patch('src.jobs.background_jobs.SweepExpiredBatches') as command:
+            command.return_value.execute.return_value = {'expired_batches': 0, 'duration_ms': 1}
+            expiry_sweep_job()
+
+        command.return_value.execute.assert_called_once()
+
+
+class TestGetNearExpiry:
+
+    def test_cumulative_buckets(self, db, batches):
+        SweepExpiredBatches(notify=False).execute()
+
+        assert GetNearExpiry(days=30).execute()['total_quantity'] == 5
+        assert GetNearExpiry(days=60).execute()['total_quantity'] == 25
+        result = GetNearExpiry(days=90, product_sku='vac-001').execute()
+        assert result['items'] == [{
+            'product_sku': 'VAC-001',
+            'distribution_center_id': batches['in_80'].distribution_center_id,
+            'batch_count': 1,
+            'total_quantity': 30,
+            'earliest_expiry_date': (date.today() + timedelta(days=80)).isoformat()
+        }]
+
+    def test_invalid_days(self, db):
+        with pytest.raises(ValidationError):
+            GetNearExpiry(days=45).execute()
+
+    def test_endpoint(self, client, db, batches):
+        SweepExpiredBatches(notify=False).execute()
+
+        response = client.get('/inventory/near-expiry?days=60')
+
+        assert response.status_code == 200
+        assert response.get_json()['total_items'] == 1
+        assert client.get('/inventory/near-expiry?days=7').status_code == 400
@@ -268,6 +268,35 @@ class TestGetProductLocation:
         
         assert result['total_locations'] == 2
     
+    def test_batches_flagged_expired_are_excluded(self, db, warehouse_location):
+        """Un lote marcado is_expired se excluye aunque su fecha siga vigente"""
+        batch_flagged = ProductBatch(
+            product_sku='TEST-001',
+            distribution_center_id=warehouse_location.distribution_center_id,
+            location_id=warehouse_location.id,
+            batch_number='BATCH-001',
+            quantity=100,
+            expiry_date=date.today() + timedelta(days=30),
+            is_expired=True,
+            is_available=True
+        )
+        batch_valid = ProductBatch(
+            product_sku='TEST-001',
+            distribution_center_id=warehouse_location.distribution_center_id,
+            location_id=warehouse_location.id,
+            batch_number='BATCH-002',
+            quantity=50,
+            expiry_date=date.today() + timedelta(days=90),
+            is_available=True
+        )
+        db.session.add_all([batch_flagged, batch_valid])
+        db.session.commit()
+        
+        result = GetProductLocation(product_sku='TEST-001').execute()
+        
+        assert result['total_locations'] == 1
+        assert result['locations'][0]['batch']['batch_info']['batch_number'] == 'BATCH-002'
+    
     def test_only_available_filter(self, db, warehouse_location):
         """Verifica filtro de solo disponibles"""
         batch_available = ProductBatch(
@@ -3,12 +3,62 @@ Tests unitarios para los comandos de consulta de rutas.
 Basado en la estructura de tests del proyecto.
 """
 
+from contextlib import contextmanager
 from datetime import date, timedelta
 from decimal import Decimal
 
+import pytest
+from sqlalchemy import event
+
+from src.commands.generate_routes import CancelRoute, UpdateRouteStatus
 from src.commands.get_routes import GetRoutes, GetRouteById, GetRoutesByDate
+from src.commands.reassign_order import ReassignOrder
 from src.models.delivery_route import DeliveryRoute
+from src.models.route_stop import RouteStop
 from src.models.vehicle import Vehicle
+from src.services.route_view_cache import route_view_cache
+
+
+@contextmanager
+def count_queries(db):
+    """Cuenta las sentencias SQL ejecutadas dentro del bloque."""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def _create_routes_with_stops(db, dc_id, vehicle_id, count, stops_per_route=3, prefix='ROUTE-N1'):
+    routes = []
+    for i in range(count):
+        route = DeliveryRoute(
+            route_code=f'{prefix}-{i:03d}',
+            vehicle_id=vehicle_id,
+            planned_date=date.today() - timedelta(days=i % 4),
+            status='draft',
+            total_stops=stops_per_route,
+            distribution_center_id=dc_id
+        )
+        db.session.add(route)
+        db.session.flush()
+        for sequence in range(stops_per_route):
+            db.session.add(RouteStop(
+                route_id=route.id,
+                sequence_order=sequence,
+                stop_type='delivery',
+                latitude=Decimal('4.6'),
+                longitude=Decimal('-74.0'),
+                status='completed' if sequence == 0 else 'pending'
+            ))
+        routes.append(route)
+    db.session.commit()
+    return routes
 
 
 class TestGetRoutesCommand:
@@ -146,6 +196,47 @@ class TestGetRoutesCommand:
         assert 'has_more' in result2
 
 
+    def test_get_routes_keyset_pagination(self, db, sample_distribution_center, sample_vehicle):
+        """Test recorrido completo por cursor sin repetir ni saltar rutas."""
+        routes = _create_routes_with_stops(db, sample_distribution_center.id, sample_vehicle.id, 7, 0)
+        expected = [
+            r.id for r in sorted(routes, key=lambda r: (r.planned_date, r.id), reverse=True)
+        ]
+        
+        first = GetRoutes(limit=3).execute()
+        seen = [r['id'] for r in first['routes']]
+        assert first['total'] == 7
+        cursor = first['next_cursor']
+        
+        while cursor:
+            planned_date, route_id = cursor.split(':')
+            page = GetRoutes(
+                limit=3, cursor=(date.fromisoformat(planned_date), int(route_id))
+            ).execute()
+            assert page['total'] is None
+            seen.extend(r['id'] for r in page['routes'])
+            cursor = page['next_cursor']
+        
+        assert seen == expected
+    
+    def test_get_routes_query_count_is_constant(self, db, sample_distribution_center, sample_vehicle):
+        """Test que vehículo y paradas se cargan por lote (sin N+1)."""
+        _create_routes_with_stops(db, sample_distribution_center.id, sample_vehicle.id, 2)
+        db.session.expire_all()
+        with count_queries(db) as few:
+            few_result = GetRoutes().execute()
+        
+        _create_routes_with_stops(db, sample_distribution_center.id, sample_vehicle.id, 8, prefix='ROUTE-N2')
+        db.session.expire_all()
+        with count_queries(db) as many:
+            many_result = GetRoutes().execute()
+        
+        assert len(many_result['routes']) == 10
+        assert len(many) == len(few)
+        assert len(many) <= 4
+        assert few_result['routes'][0]['metrics']['completion_percentage'] == pytest.approx(100 / 3)
+
+
 class TestGetRouteByIdCommand:
     """Test suite para el comando GetRouteById."""
     
@@ -352,3 +443,83 @@ class TestGetRoutesByDateCommand:
         
         assert result2['status'] == 'success'
         assert all(r['distribution_center_id'] == sample_distribution_center_2.id for r in result2['routes'])
+
+
+class TestRouteViewCache:
+    """Test suite para el caché de la vista por centro/día."""
+    
+    def _view(self, dc_id):
+        return GetRoutesByDate(distribution_center_id=dc_id, planned_date=date.today()).execute()
+    
+    def test_second_read_is_cached(self, db, sample_distribution_center, sample_delivery_route):
+        """Test que la segunda lectura no consulta la base."""
+        self._view(sample_distribution_center.id)
+        
+        with count_queries(db) as statements:
+            result = self._view(sample_distribution_center.id)
+        
+        assert statements == []
+        assert result['summary']['total_routes'] == 1
+        assert route_view_cache.get_stats()['hits'] == 1
+    
+    def test_status_update_invalidates_view(self, db, sample_distribution_center, sample_delivery_route):
+        """Test invalidación al cambiar el estado de una ruta."""
+        self._view(sample_distribution_center.id)
+        
+        UpdateRouteStatus(sample_delivery_route.id, 'active', 'tester').execute()
+        
+        result = self._view(sample_distribution_center.id)
+        assert result['routes'][0]['status'] == 'active'
+    
+    def test_cancel_invalidates_view(self, db, sample_distribution_center, sample_delivery_route):
+        """Test invalidación al cancelar una ruta."""
+        self._view(sample_distribution_center.id)
+        
+        CancelRoute(sample_delivery_route.id, 'Vehículo averiado', 'tester').execute()
+        
+        result = self._view(sample_distribution_center.id)
+        assert result['summary']['status_counts'] == {'cancelled': 1}
+    
+    def test_reassign_invalidates_view(
+        self, db, sample_distribution_center, sample_delivery_route, sample_route_assignment
+    ):
+        """Test invalidación al reasignar un pedido a otro vehículo."""
+        other_vehicle = Vehicle(
+            plate='FRI-456',
+            vehicle_type='refrigerated_van',
+            capacity_kg=Decimal('1500.00'),
+            capacity_m3=Decimal('8.000'),
+            has_refrigeration=True,
+            cost_per_km=Decimal('3.00'),
+            home_distribution_center_id=sample_distribution_center.id,
+            is_available=True,
+            is_active=True
+        )
+        db.session.add(other_vehicle)
+        db.session.commit()
+        before = self._view(sample_distribution_center.id)
+        
+        result = ReassignOrder(
+            order_id=sample_route_assignment.order_id,
+            current_route_id=sample_delivery_route.id,
+            new_vehicle_id=other_vehicle.id,
+            reason='Balanceo de carga',
+            reassigned_by='tester'
+        ).execute()
+        
+        assert result['status'] == 'success'
+        after = self._view(sample_distribution_center.id)
+        assert before['summary']['total_routes'] == 1
+        assert after['summary']['total_routes'] == 2
+    
+    def test_stop_change_invalidates_view(self, db, sample_distribution_center, sample_route_stop):
+        """Test invalidación cuando cambia una parada de una ruta cacheada."""
+        sample_route_stop.route.total_stops = 1
+        db.session.commit()
+        assert self._view(sample_distribution_center.id)['routes'][0]['metrics']['completion_percentage'] == 0
+        
+        sample_route_stop.status = 'completed'
+        db.session.commit()
+        
+        result = self._view(sample_distribution_center.id)
+        assert result['routes'][0]['metrics']['completion_percentage'] == 100
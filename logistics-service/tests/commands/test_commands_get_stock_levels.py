@@ -1,4 +1,6 @@
-from src.commands.get_stock_levels import GetStockLevels
+import pytest
+
+from src.commands.get_stock_levels import GetStockLevels, GetStockLevelsBatch, MAX_BATCH_SKUS
 
 
 class TestGetStockLevelsCommand:
@@ -98,3 +100,60 @@ class TestGetStockLevelsCommand:
         result = command.execute()
         
         assert result['distribution_centers'][0]['is_low_stock'] is True
+    
+    def test_get_stock_single_query(self, db, multiple_inventory_items):
+        from sqlalchemy import event
+        
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            db.session.expire_all()
+            GetStockLevels(product_skus=['JER-001', 'VAC-001', 'GUANTE-001']).execute()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        
+        assert len(statements) == 1
+        assert 'PARTITION BY' in statements[0]
+
+
+class TestGetStockLevelsBatchCommand:
+    
+    def test_batch_columnar_totals(self, db, multiple_inventory_items):
+        result = GetStockLevelsBatch(product_skus=['vac-001', 'JER-001', 'NOPE-001']).execute()
+        
+        # Orden pedido, SKUs normalizados
+        assert result['product_skus'] == ['VAC-001', 'JER-001']
+        assert result['total_available'] == [30, 135]
+        assert result['total_physical'] == [30, 150]
+        assert result['total_reserved'] == [0, 15]
+        assert result['total_in_transit'] == [10, 5]
+        assert result['center_count'] == [1, 2]
+        assert result['not_found'] == ['NOPE-001']
+        assert 'centers' not in result
+    
+    def test_batch_include_centers(self, db, multiple_inventory_items):
+        result = GetStockLevelsBatch(product_skus=['JER-001', 'VAC-001'], include_centers=True).execute()
+        
+        centers = result['centers']
+        assert len(centers['product_index']) == 3
+        jer_rows = [i for i, idx in enumerate(centers['product_index']) if idx == 0]
+        assert sorted(centers['quantity_available'][i] for i in jer_rows) == [45, 90]
+    
+    def test_batch_filters_by_center(self, db, multiple_inventory_items, sample_distribution_center_2):
+        result = GetStockLevelsBatch(
+            product_skus=['JER-001', 'VAC-001'],
+            distribution_center_id=sample_distribution_center_2.id
+        ).execute()
+        
+        assert result['product_skus'] == ['JER-001']
+        assert result['total_physical'] == [50]
+        assert result['not_found'] == ['VAC-001']
+    
+    def test_batch_requires_skus(self, db):
+        with pytest.raises(ValueError):
+            GetStockLevelsBatch(product_skus=[' ']).execute()
+    
+    def test_batch_too_many_skus(self, db):
+        with pytest.raises(ValueError):
+            GetStockLevelsBatch(product_skus=[f'SKU-{i}' for i in range(MAX_BATCH_SKUS + 1)]).execute()
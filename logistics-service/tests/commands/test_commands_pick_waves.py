@@ -0,0 +1,201 @@
+import pytest
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+
+from src.commands.pick_waves import PlanPickWaves, GetPickWaves, GetPickWaveById
+from src.errors.errors import ValidationError, NotFoundError
+from src.models.delivery_route import DeliveryRoute
+from src.models.pick_wave import PickWave
+from src.models.product_batch import ProductBatch
+from src.models.route_assignment import RouteAssignment
+from src.models.route_stop import RouteStop
+from src.models.warehouse_location import WarehouseLocation
+
+
+def _location(db, dc_id, aisle, shelf, zone_type='ambient'):
+    location = WarehouseLocation(
+        distribution_center_id=dc_id,
+        zone_type=zone_type,
+        aisle=aisle,
+        shelf=shelf,
+        level_position='N1-P1',
+        temperature_min=2.0 if zone_type == 'refrigerated' else None,
+        temperature_max=8.0 if zone_type == 'refrigerated' else None,
+        current_temperature=5.0 if zone_type == 'refrigerated' else None,
+        is_active=True
+    )
+    db.session.add(location)
+    db.session.commit()
+    return location
+
+
+def _batch(db, location, sku, quantity=100, days=90, **kwargs):
+    batch = ProductBatch(
+        product_sku=sku,
+        distribution_center_id=location.distribution_center_id,
+        location_id=location.id,
+        batch_number=f'L-{sku}-{location.id}',
+        quantity=quantity,
+        expiry_date=date.today() + timedelta(days=days),
+        is_available=True,
+        **kwargs
+    )
+    db.session.add(batch)
+    db.session.commit()
+    return batch
+
+
+@pytest.fixture
+def picking_layout(db, sample_distribution_center):
+    """Cuatro pasillos ambiente con un SKU por estantería y un SKU refrigerado."""
+    dc_id = sample_distribution_center.id
+    for aisle in 'ABCD':
+        for shelf in range(1, 6):
+            location = _location(db, dc_id, aisle, f'E{shelf}')
+            _batch(db, location, f'SKU-{aisle}{shelf}')
+    cold = _location(db, dc_id, 'R1', 'E1', zone_type='refrigerated')
+    _batch(db, cold, 'VAC-001', required_temperature_min=2.0, required_temperature_max=8.0)
+    return dc_id
+
+
+def _order(order_id, departure, *skus):
+    return {
+        'order_id': order_id,
+        'departure_time': departure,
+        'lines': [{'product_sku': sku, 'quantity': 1} for sku in skus]
+    }
+
+
+class TestPlanPickWaves:
+
+    def test_batches_orders_and_saves_distance(self, db, picking_layout):
+        orders = [
+            _order(1, '08:00', 'SKU-D5', 'SKU-A1', 'SKU-C3'),
+            _order(2, '08:15', 'SKU-A2', 'SKU-D4', 'SKU-B1'),
+            _order(3, '08:30', 'SKU-C5', 'SKU-B2', 'SKU-A5'),
+        ]
+
+        result = PlanPickWaves(picking_layout, orders=orders, persist=False).execute()
+
+        assert result['summary']['total_waves'] == 1
+        wave = result['waves'][0]
+        assert wave['zone_type'] == 'ambient'
+        assert wave['orders_count'] == 3
+        assert wave['lines_count'] == 9
+        assert len(wave['sequence']) == 9
+        assert [stop['stop'] for stop in wave['sequence']] == list(range(1, 10))
+        assert wave['total_distance_m'] < wave['baseline_distance_m']
+        assert result['summary']['distance_saved_m'] > 0
+        assert result['shortages'] == []
+
+    def test_splits_by_zone_and_cold_chain(self, db, picking_layout):
+        result = PlanPickWaves(picking_layout, persist=False, orders=[
+            _order(1, '08:00', 'SKU-A1', 'VAC-001'),
+            _order(2, '08:00', 'SKU-B1'),
+        ]).execute()
+
+        keys = [(w['zone_type'], w['requires_cold_chain'], w['order_ids']) for w in result['waves']]
+        assert keys == [('ambient', False, [1, 2]), ('refrigerated', True, [1])]
+
+    def test_splits_by_departure_window_and_wave_size(self, db, picking_layout):
+        orders = [
+            _order(1, '06:00', 'SKU-A1'),
+            _order(2, '06:30', 'SKU-A2'),
+            _order(3, '09:00', 'SKU-A3'),
+            _order(4, '09:10', 'SKU-A4'),
+            _order(5, '09:20', 'SKU-A5'),
+        ]
+
+        result = PlanPickWaves(picking_layout, orders=orders, persist=False,
+                               departure_window_minutes=60, max_orders_per_wave=2).execute()
+
+        assert [w['order_ids'] for w in result['waves']] == [[1, 2], [3, 4], [5]]
+        assert result['waves'][1]['departure_time'].endswith('09:00:00')
+
+    def test_earlier_departure_gets_stock_first(self, db, sample_distribution_center):
+        location = _location(db, sample_distribution_center.id, 'A', 'E1')
+        _batch(db, location, 'JER-001', quantity=5)
+
+        result = PlanPickWaves(sample_distribution_center.id, persist=False, orders=[
+            {'order_id': 'LATE', 'departure_time': '2025-11-20T11:00:00',
+             'lines': [{'product_sku': 'JER-001', 'quantity': 5}]},
+            {'order_id': 'EARLY', 'departure_time': '2025-11-20T07:00:00',
+             'lines': [{'product_sku': 'JER-001', 'quantity': 5}]},
+        ]).execute()
+
+        assert result['waves'][0]['order_ids'] == ['EARLY']
+        assert result['shortages'] == [
+            {'order_id': 'LATE', 'line_id': 0, 'product_sku': 'JER-001', 'quantity_missing': 5}
+        ]
+
+    def test_persists_and_replaces_planned_waves(self, db, picking_layout):
+        orders = [_order(1, '08:00', 'SKU-A1'), _order(2, '08:00', 'SKU-B1', 'VAC-001')]
+
+        first = PlanPickWaves(picking_layout, orders=orders).execute()
+        second = PlanPickWaves(picking_layout, orders=orders).execute()
+
+        assert all(w['id'] for w in second['waves'])
+        assert {w['wave_code'] for w in first['waves']}.isdisjoint({w['wave_code'] for w in second['waves']})
+        statuses = {w.wave_code: w.status for w in PickWave.query.all()}
+        assert [statuses[w['wave_code']] for w in first['waves']] == ['cancelled', 'cancelled']
+        assert [statuses[w['wave_code']] for w in second['waves']] == ['planned', 'planned']
+
+    def test_loads_orders_from_routes(self, db, picking_layout, sample_vehicle):
+        route = DeliveryRoute(
+            route_code='ROUTE-PW-1',
+            vehicle_id=sample_vehicle.id,
+            driver_name='Juan',
+            distribution_center_id=picking_layout,
+            planned_date=date.today(),
+            estimated_start_time=datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=7),
+            status='active'
+        )
+        db.session.add(route)
+        db.session.flush()
+        stop = RouteStop(route_id=route.id, sequence_order=1, stop_type='delivery',
+                         customer_id=1, customer_name='Hospital', delivery_address='Calle 1',
+                         city='Bogotá', latitude=4.6, longitude=-74.0)
+        db.session.add(stop)
+        db.session.flush()
+        db.session.add(RouteAssignment(route_id=route.id, stop_id=stop.id, order_id=501,
+                                       order_number='ORD-501'))
+        db.session.commit()
+
+        sales_client = MagicMock()
+        sales_client.get_orders_by_ids.return_value = {'orders': [
+            {'id': 501, 'items': [{'product_sku': 'SKU-C2', 'quantity': 3}]}
+        ]}
+
+        result = PlanPickWaves(picking_layout, persist=False, sales_client=sales_client).execute()
+
+        sales_client.get_orders_by_ids.assert_called_once_with([501])
+        assert result['waves'][0]['order_ids'] == [501]
+        assert result['waves'][0]['total_units'] == 3
+
+    @pytest.mark.parametrize('kwargs', [
+        {'orders': 'x'},
+        {'orders': [{'lines': []}]},
+        {'orders': [{'order_id': 1, 'lines': [{'product_sku': 'A', 'quantity': 0}]}]},
+        {'orders': [{'order_id': 1, 'departure_time': 'mañana', 'lines': []}]},
+        {'orders': [], 'max_orders_per_wave': 0},
+    ])
+    def test_validation(self, db, sample_distribution_center, kwargs):
+        with pytest.raises(ValidationError):
+            PlanPickWaves(sample_distribution_center.id, persist=False, **kwargs).execute()
+
+
+class TestGetPickWaves:
+
+    def test_list_and_detail(self, db, picking_layout):
+        PlanPickWaves(picking_layout, orders=[_order(1, '08:00', 'SKU-A1', 'VAC-001')]).execute()
+
+        listing = GetPickWaves(distribution_center_id=picking_layout, planned_date=date.today()).execute()
+        assert listing['total'] == 2
+        assert 'sequence' not in listing['waves'][0]
+
+        detail = GetPickWaveById(listing['waves'][0]['id']).execute()
+        assert detail['sequence'][0]['picks'][0]['order_id'] == 1
+
+    def test_not_found(self, db):
+        with pytest.raises(NotFoundError):
+            GetPickWaveById(999).execute()
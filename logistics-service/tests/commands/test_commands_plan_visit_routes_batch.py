@@ -0,0 +1,169 @@
+"""
+Tests para la planificación en lote de rutas de visitas (PlanVisitRoutesBatch).
+"""
+
+from datetime import date, timedelta
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.commands.plan_visit_routes_batch import (
+    GetVisitPlanningJob,
+    PlanVisitRoutesBatch,
+    SharedLocationMatrix,
+)
+from src.errors.errors import NotFoundError, ValidationError
+from src.models.visit_planning_job import VisitPlanningJob
+from src.models.visit_route import VisitRoute
+
+OFFICE = {'name': 'Oficina Central', 'latitude': 4.6097, 'longitude': -74.0817}
+PLANNED_DATE = date.today() + timedelta(days=1)
+
+
+def _customer(customer_id, salesperson_id, lat=None, lng=None):
+    return {
+        'id': customer_id,
+        'business_name': f'Cliente {customer_id}',
+        'salesperson_id': salesperson_id,
+        'latitude': lat if lat is not None else 4.60 + customer_id * 0.01,
+        'longitude': lng if lng is not None else -74.08 + customer_id * 0.005,
+        'address': f'Calle {customer_id}',
+        'city': 'Bogotá',
+    }
+
+
+@pytest.fixture
+def fast_planning(app):
+    app.config['VISIT_PLANNING_WORKERS'] = 1
+    app.config['VISIT_PLANNING_TSP_SECONDS'] = 1
+
+
+@pytest.fixture
+def sales_client():
+    client = Mock()
+    with patch('src.commands.plan_visit_routes_batch.get_sales_service_client', return_value=client):
+        yield client
+
+
+class TestSharedLocationMatrix:
+
+    def test_deduplicates_locations_and_reuses_pairs(self):
+        matrix = SharedLocationMatrix()
+        office = matrix.add(4.6097, -74.0817)
+        a = matrix.add(4.65, -74.06)
+        b = matrix.add(4.70, -74.04)
+
+        assert matrix.add(4.6097000001, -74.0817) == office
+        first = matrix.submatrix([office, a])
+        second = matrix.submatrix([office, b, a])
+
+        assert first[0][1] == pytest.approx(second[0][2])
+        assert first[0][1] == pytest.approx(first[1][0])
+        assert matrix.get_stats() == {'locations': 3, 'pairs_computed': 3, 'pairs_reused': 5}
+
+
+class TestPlanVisitRoutesBatch:
+
+    def test_plans_explicit_portfolios_with_one_customers_call(self, db, fast_planning, sales_client):
+        sales_client.get_customers_by_ids.return_value = {
+            'customers': [_customer(n, 2 if n < 4 else 3) for n in range(1, 7)],
+            'not_found': [99],
+        }
+
+        job = PlanVisitRoutesBatch(
+            planned_date=PLANNED_DATE,
+            salespeople=[
+                {'salesperson_id': 2, 'customer_ids': [1, 2, 3], 'salesperson_name': 'Maria Gonzalez'},
+                {'salesperson_id': 3, 'customer_ids': [4, 5, 6, 99]},
+            ],
+            start_location=OFFICE
+        ).execute()
+
+        sales_client.get_customers_by_ids.assert_called_once_with([1, 2, 3, 4, 5, 6, 99])
+        assert (job['status'], job['completed_salespeople'], job['progress_percentage']) == ('completed', 2, 100.0)
+        progress = {entry['salesperson_id']: entry for entry in job['salespeople']}
+        assert progress[3]['warnings'] == ['Clientes no encontrados: [99]']
+
+        route = db.session.get(VisitRoute, progress[2]['route_id'])
+        assert route.salesperson_name == 'Maria Gonzalez'
+        assert route.start_location_name == 'Oficina Central'
+        assert sorted(stop.customer_id for stop in route.stops) == [1, 2, 3]
+        assert progress[2]['metrics']['total_stops'] == 3
+        assert VisitRoute.query.count() == 2
+
+    def test_groups_all_by_assigned_salesperson(self, db, fast_planning, sales_client):
+        sales_client.get_customers_by_ids.return_value = {
+            'customers': [
+                _customer(1, 2), _customer(2, 2), _customer(3, None),
+                {**_customer(4, 5), 'latitude': None},
+            ],
+            'not_found': [],
+        }
+
+        job = PlanVisitRoutesBatch(
+            planned_date=PLANNED_DATE, salespeople='all', customer_ids=[1, 2, 3, 4]
+        ).execute()
+
+        assert job['status'] == 'partial'
+        assert job['warnings'] == ['Clientes sin vendedor asignado: [3]']
+        progress = {entry['salesperson_id']: entry for entry in job['salespeople']}
+        assert progress[2]['status'] == 'completed'
+        assert progress[5]['status'] == 'failed'
+        assert progress[5]['errors'] == ['No hay clientes con coordenadas para visitar']
+
+    def test_validates_request(self, db):
+        with pytest.raises(ValidationError):
+            PlanVisitRoutesBatch(planned_date=PLANNED_DATE, salespeople='all').execute()
+        with pytest.raises(ValidationError):
+            PlanVisitRoutesBatch(
+                planned_date=PLANNED_DATE,
+                salespeople=[{'salesperson_id': 1, 'customer_ids': list(range(51))}]
+            ).execute()
+
+    def test_limits_salespeople_per_batch(self, app, db, sales_client):
+        app.config['VISIT_PLANNING_MAX_SALESPEOPLE'] = 2
+        sales_client.get_customers_by_ids.return_value = {
+            'customers': [_customer(1, 2), _customer(2, 3), _customer(3, 4)], 'not_found': []
+        }
+
+        try:
+            with pytest.raises(ValidationError):
+                PlanVisitRoutesBatch(planned_date=PLANNED_DATE, salespeople=[2, 3, 4], customer_ids=[1]).execute()
+            with pytest.raises(ValidationError) as error:
+                PlanVisitRoutesBatch(planned_date=PLANNED_DATE, salespeople='all', customer_ids=[1, 2, 3]).execute()
+        finally:
+            app.config.pop('VISIT_PLANNING_MAX_SALESPEOPLE')
+
+        assert '3 solicitados' in error.value.message
+        assert VisitPlanningJob.query.count() == 0
+
+    def test_get_job_not_found(self, db):
+        with pytest.raises(NotFoundError):
+            GetVisitPlanningJob('missing').execute()
+
+
+class TestVisitPlanningEndpoints:
+
+    def test_batch_endpoint_returns_job_and_progress(self, client, db, fast_planning, sales_client):
+        sales_client.get_customers_by_ids.return_value = {
+            'customers': [_customer(1, 2), _customer(2, 2)], 'not_found': []
+        }
+
+        response = client.post('/routes/visits/generate/batch', json={
+            'planned_date': PLANNED_DATE.isoformat(),
+            'salespeople': [2],
+            'customer_ids': [1, 2],
+        })
+
+        assert response.status_code == 202
+        job_id = response.get_json()['job_id']
+        body = client.get(f'/routes/visits/jobs/{job_id}').get_json()
+        assert body['status'] == 'completed'
+        assert body['salespeople'][0]['route_code'].startswith('VISIT-')
+
+    def test_batch_endpoint_errors(self, client, db):
+        response = client.post('/routes/visits/generate/batch', json={
+            'planned_date': PLANNED_DATE.isoformat(), 'salespeople': 'everyone'
+        })
+        assert response.status_code == 400
+        assert client.get('/routes/visits/jobs/missing').status_code == 404
@@ -0,0 +1,117 @@
+"""
+Tests para la planificación semanal de visitas (PlanWeeklyVisitRoutesCommand).
+"""
+
+from datetime import date, datetime, timedelta
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.commands.plan_weekly_visit_routes import PlanWeeklyVisitRoutesCommand
+from src.errors.errors import ValidationError
+from src.models.visit_route import VisitRoute
+
+OFFICE = {'name': 'Oficina Central', 'latitude': 4.6097, 'longitude': -74.0817}
+
+
+def _next_monday():
+    today = date.today()
+    return today + timedelta(days=7 - today.weekday())
+
+
+def _customer(customer_id, lat=None):
+    return {
+        'id': customer_id,
+        'business_name': f'Cliente {customer_id}',
+        'latitude': lat if lat is not None else 4.60 + customer_id * 0.004,
+        'longitude': -74.08 + (customer_id % 3) * 0.01,
+        'city': 'Bogotá',
+    }
+
+
+@pytest.fixture
+def sales_client():
+    client = Mock()
+    client.get_customers_by_ids.return_value = {
+        'customers': [_customer(n) for n in range(1, 9)] + [{**_customer(9), 'latitude': None}],
+        'not_found': [42],
+    }
+    with patch('src.commands.plan_weekly_visit_routes.get_sales_service_client', return_value=client):
+        yield client
+
+
+class TestPlanWeeklyVisitRoutesCommand:
+
+    def _command(self, customers, **kwargs):
+        return PlanWeeklyVisitRoutesCommand(
+            salesperson_id=2,
+            salesperson_name='Maria Gonzalez',
+            salesperson_employee_id='SALES-002',
+            week_start=_next_monday(),
+            customers=customers,
+            start_location=OFFICE,
+            time_budget_seconds=1,
+            **kwargs
+        )
+
+    def test_creates_one_route_per_day_respecting_frequency_and_windows(self, db, sales_client):
+        customers = [{'customer_id': n} for n in range(1, 10)] + [{'customer_id': 42}]
+        customers[0]['visits_per_week'] = 3
+        customers[1]['time_window'] = {'start': '10:00', 'end': '11:00'}
+        customers[2]['allowed_days'] = [2]
+
+        result = self._command(customers).execute()
+
+        sales_client.get_customers_by_ids.assert_called_once()
+        assert result['status'] == 'success'
+        assert result['warnings'] == [
+            'Clientes no encontrados: [42]', 'Cliente 9 (Cliente 9) sin coordenadas GPS'
+        ]
+        routes = VisitRoute.query.order_by(VisitRoute.planned_date).all()
+        assert len(routes) == len(result['routes'])
+        assert {route.planned_date.weekday() for route in routes} <= {0, 1, 2, 3, 4}
+
+        visits = {}
+        for route in routes:
+            for stop in route.stops:
+                visits.setdefault(stop.customer_id, []).append(route.planned_date)
+                if stop.customer_id == 2:
+                    assert datetime.combine(route.planned_date, datetime.min.time()).replace(hour=10) \
+                        <= stop.estimated_arrival_time <= stop.estimated_arrival_time.replace(hour=11, minute=0)
+        assert len(visits[1]) == 3
+        assert [day.weekday() for day in visits[3]] == [2]
+        assert all(len(visits[n]) == 1 for n in range(2, 9))
+
+    def test_validates_frequency_and_days(self, db):
+        with pytest.raises(ValidationError):
+            self._command([{'customer_id': 1, 'visits_per_week': 6}]).execute()
+        with pytest.raises(ValidationError):
+            self._command([{'customer_id': 1, 'allowed_days': [6]}]).execute()
+        with pytest.raises(ValidationError):
+            self._command([{'customer_id': 1, 'time_window': {'start': '9am'}}], working_days=[0]).execute()
+
+
+class TestWeeklyVisitRoutesEndpoint:
+
+    def test_generate_week(self, client, db, sales_client):
+        response = client.post('/routes/visits/generate/week', json={
+            'salesperson_id': 2,
+            'week_start': _next_monday().isoformat(),
+            'working_days': [0, 1, 2],
+            'customers': [{'customer_id': n, 'visits_per_week': 2 if n == 1 else 1} for n in range(1, 6)],
+            'start_location': OFFICE,
+            'time_budget_seconds': 1,
+        })
+
+        assert response.status_code == 200
+        body = response.get_json()
+        assert [day['weekday'] for day in body['days']] == ['monday', 'tuesday', 'wednesday']
+        assert sum(day['stops'] for day in body['days']) == 6
+        assert body['routes'][0]['route_code'].startswith('VISIT-')
+
+    def test_generate_week_errors(self, client, db):
+        assert client.post('/routes/visits/generate/week', json={'salesperson_id': 2}).status_code == 400
+        response = client.post('/routes/visits/generate/week', json={
+            'salesperson_id': 2, 'week_start': '2000-01-03', 'customers': [{'customer_id': 1}]
+        })
+        assert response.status_code == 400
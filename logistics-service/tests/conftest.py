@@ -18,6 +18,9 @@ from src.models.delivery_route import DeliveryRoute
 from src.models.route_stop import RouteStop
 from src.models.route_assignment import RouteAssignment
 from src.models.geocoded_address import GeocodedAddress
+from src.services.route_view_cache import route_view_cache
+from src.services.export_service import route_pdf_cache
+from src.services.telemetry_ingestion import leg_matrix_cache
 
 
 @pytest.fixture(scope='function')
@@ -33,6 +36,10 @@ def app():
         app = app_obj[0]
     else:
         app = app_obj
+    # Cachés de proceso: cada test parte de una base nueva
+    route_view_cache.clear()
+    route_pdf_cache.clear()
+    leg_matrix_cache.clear()
     with app.app_context():
         _db.create_all()
         yield app
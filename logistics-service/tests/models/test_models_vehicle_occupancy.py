@@ -0,0 +1,131 @@
+"""
+Tests del calendario de ocupación de vehículos (vehicle_occupancy).
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from src.commands.get_vehicles import GetAvailableVehicles
+from src.models.delivery_route import DeliveryRoute
+from src.models.vehicle import Vehicle
+from src.models.vehicle_occupancy import VehicleOccupancy, rebuild_vehicle_occupancy
+from src.services.route_optimizer_service import RouteOptimizerService
+
+
+def _route(db, vehicle, dc, status='draft', planned_date=None, code='ROUTE-OCC-001'):
+    route = DeliveryRoute(
+        route_code=code,
+        vehicle_id=vehicle.id,
+        planned_date=planned_date or date.today(),
+        status=status,
+        distribution_center_id=dc.id
+    )
+    db.session.add(route)
+    db.session.commit()
+    return route
+
+
+def _calendar():
+    return sorted(
+        (row.vehicle_id, row.planned_date, row.route_id, row.route_status)
+        for row in VehicleOccupancy.query.all()
+    )
+
+
+class TestVehicleOccupancyCalendar:
+
+    def test_follows_route_status_changes(self, db, sample_distribution_center, sample_vehicle):
+        route = _route(db, sample_vehicle, sample_distribution_center)
+        assert _calendar() == []
+
+        route.status = 'active'
+        db.session.commit()
+        assert _calendar() == [(sample_vehicle.id, date.today(), route.id, 'active')]
+
+        route.status = 'in_progress'
+        db.session.commit()
+        assert _calendar() == [(sample_vehicle.id, date.today(), route.id, 'in_progress')]
+
+        route.status = 'cancelled'
+        db.session.commit()
+        assert _calendar() == []
+
+    def test_follows_vehicle_and_date_changes(
+        self, db, sample_distribution_center, sample_vehicle, sample_vehicle_no_refrigeration
+    ):
+        tomorrow = date.today() + timedelta(days=1)
+        route = _route(db, sample_vehicle, sample_distribution_center, status='active')
+
+        route.vehicle_id = sample_vehicle_no_refrigeration.id
+        route.planned_date = tomorrow
+        db.session.commit()
+        assert _calendar() == [(sample_vehicle_no_refrigeration.id, tomorrow, route.id, 'active')]
+
+        db.session.delete(route)
+        db.session.commit()
+        assert _calendar() == []
+
+    def test_rebuild_matches_maintained_calendar(self, db, sample_distribution_center, sample_vehicle):
+        _route(db, sample_vehicle, sample_distribution_center, status='active')
+        _route(db, sample_vehicle, sample_distribution_center, status='completed', code='ROUTE-OCC-002')
+        maintained = _calendar()
+
+        assert rebuild_vehicle_occupancy() == 1
+        db.session.commit()
+        assert _calendar() == maintained
+
+
+class TestAvailableVehiclesLookup:
+
+    def test_single_query_anti_join(
+        self, db, sample_distribution_center, sample_vehicle, sample_vehicle_no_refrigeration
+    ):
+        tomorrow = date.today() + timedelta(days=1)
+        _route(db, sample_vehicle, sample_distribution_center, status='active', planned_date=tomorrow)
+        _route(db, sample_vehicle_no_refrigeration, sample_distribution_center, status='draft',
+               planned_date=tomorrow, code='ROUTE-OCC-002')
+        for n in range(5):
+            db.session.add(Vehicle(
+                plate=f'EXT-{n:03d}', vehicle_type='van', capacity_kg=Decimal('800'),
+                capacity_m3=Decimal('6'), cost_per_km=Decimal('2.5'),
+                home_distribution_center_id=sample_distribution_center.id,
+                is_available=True, is_active=True
+            ))
+        db.session.commit()
+        dc_id, busy_id, draft_id = sample_distribution_center.id, sample_vehicle.id, sample_vehicle_no_refrigeration.id
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            result = GetAvailableVehicles(dc_id, tomorrow).execute()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+        ids = [vehicle['id'] for vehicle in result['vehicles']]
+        assert len(statements) == 1
+        assert busy_id not in ids
+        # Una ruta en borrador no ocupa el vehículo
+        assert draft_id in ids
+        assert result['summary']['total_available'] == 6
+
+    def test_other_dates_do_not_block(self, db, sample_distribution_center, sample_vehicle):
+        _route(db, sample_vehicle, sample_distribution_center, status='active')
+
+        result = GetAvailableVehicles(sample_distribution_center.id, date.today() + timedelta(days=1)).execute()
+
+        assert [vehicle['id'] for vehicle in result['vehicles']] == [sample_vehicle.id]
+
+    def test_optimizer_skips_vehicles_busy_on_date(
+        self, db, sample_distribution_center, sample_vehicle, sample_vehicle_no_refrigeration
+    ):
+        _route(db, sample_vehicle, sample_distribution_center, status='in_progress')
+
+        vehicles = RouteOptimizerService._get_available_vehicles(sample_distribution_center.id, date.today())
+
+        assert [vehicle.id for vehicle in vehicles] == [sample_vehicle_no_refrigeration.id]
@@ -0,0 +1,223 @@
+import pytest
+from unittest.mock import patch
+
+from src.commands.inventory_ledger import RecordInventoryMovement, GetInventoryLedger
+from src.commands.reserve_inventory_for_order import ReserveInventoryForOrder, ReleaseInventoryForOrder
+from src.errors.errors import ConflictError, ValidationError, NotFoundError
+from src.jobs.background_jobs import compact_inventory_ledger_job
+from src.models.inventory import Inventory
+from src.models.inventory_movement import InventoryMovement
+from src.models.inventory_outbox import InventoryOutboxEvent
+from src.models.inventory_snapshot import InventorySnapshot
+from src.services.inventory_ledger import compact_ledger, get_balance
+
+
+@pytest.fixture
+def ledger_app(app):
+    app.config['INVENTORY_LEDGER_ENABLED'] = True
+    yield app
+    app.config.pop('INVENTORY_LEDGER_ENABLED', None)
+
+
+def _record(inventory, movement_type, quantity, **kwargs):
+    return RecordInventoryMovement(
+        product_sku=inventory.product_sku,
+        distribution_center_id=inventory.distribution_center_id,
+        movement_type=movement_type,
+        quantity=quantity,
+        **kwargs
+    ).execute()
+
+
+def _balance(inventory):
+    return get_balance(inventory.product_sku, inventory.distribution_center_id)
+
+
+class TestLedgerBalance:
+
+    def test_balance_is_base_row_plus_tail(self, db, sample_inventory):
+        _record(sample_inventory, 'receipt', 50, reference='REC-1')
+        _record(sample_inventory, 'reservation', 30, reference='ORD-1')
+        result = _record(sample_inventory, 'dispatch', 20, reference='ORD-1')
+
+        balance = _balance(sample_inventory)
+        assert (balance['quantity_available'], balance['quantity_reserved']) == (130, 20)
+        assert balance['tail_movements'] == 3
+        assert result['balance']['quantity_available'] == 130
+        # La fila no se toca hasta la compactación
+        assert db.session.get(Inventory, sample_inventory.id).quantity_available == 100
+
+    def test_movements_are_validated(self, db, sample_inventory):
+        with pytest.raises(ConflictError):
+            _record(sample_inventory, 'dispatch', 500)
+        with pytest.raises(ValidationError):
+            _record(sample_inventory, 'adjustment', -101)
+        with pytest.raises(ValidationError):
+            _record(sample_inventory, 'transfer', 5)
+        with pytest.raises(NotFoundError):
+            RecordInventoryMovement('NOPE-1', sample_inventory.distribution_center_id, 'receipt', 1).execute()
+
+        assert InventoryMovement.query.count() == 0
+
+    def test_release_caps_at_reserved(self, db, sample_inventory):
+        result = _record(sample_inventory, 'release', 25)
+
+        assert result['movement']['delta_reserved'] == -10
+        assert _balance(sample_inventory)['quantity_reserved'] == 0
+
+
+class TestLedgerCompaction:
+
+    def test_compaction_folds_tail_into_snapshot(self, db, sample_inventory):
+        _record(sample_inventory, 'receipt', 50)
+        _record(sample_inventory, 'adjustment', -5)
+
+        result = compact_ledger(settle_seconds=0)
+
+        assert result['keys_compacted'] == 1
+        assert result['movements_folded'] == 2
+        snapshot = InventorySnapshot.query.one()
+        assert snapshot.quantity_available == 145
+        inventory = db.session.get(Inventory, sample_inventory.id)
+        assert (inventory.quantity_available, inventory.quantity_reserved) == (145, 10)
+
+        balance = _balance(sample_inventory)
+        assert balance['quantity_available'] == 145
+        assert balance['tail_movements'] == 0
+        assert InventoryOutboxEvent.query.count() == 1
+
+    def test_second_compaction_uses_last_snapshot(self, db, sample_inventory):
+        _record(sample_inventory, 'receipt', 50)
+        compact_ledger(settle_seconds=0)
+        _record(sample_inventory, 'reservation', 40)
+
+        result = compact_ledger(settle_seconds=0)
+
+        assert result['movements_folded'] == 1
+        assert result['snapshots_pruned'] == 1
+        snapshot = InventorySnapshot.query.one()
+        assert (snapshot.quantity_available, snapshot.quantity_reserved) == (150, 50)
+        assert compact_ledger(settle_seconds=0)['keys_compacted'] == 0
+
+    def test_recent_movements_wait_for_next_compaction(self, db, sample_inventory):
+        _record(sample_inventory, 'receipt', 50)
+
+        result = compact_ledger(settle_seconds=60)
+
+        assert result['keys_compacted'] == 0
+        assert InventorySnapshot.query.count() == 0
+
+    def test_late_commit_of_lower_id_is_not_skipped(self, db, sample_inventory):
+        dc_id = sample_inventory.distribution_center_id
+        db.session.add(Inventory(product_sku='JER-002', distribution_center_id=dc_id, quantity_available=10))
+        # id 3 (JER-002) confirmó antes que id 2 (JER-001)
+        db.session.add_all([
+            InventoryMovement(id=1, product_sku='JER-001', distribution_center_id=dc_id,
+                              movement_type='receipt', delta_available=5),
+            InventoryMovement(id=3, product_sku='JER-002', distribution_center_id=dc_id,
+                              movement_type='receipt', delta_available=1),
+        ])
+        db.session.commit()
+        compact_ledger(settle_seconds=0)
+
+        db.session.add(InventoryMovement(id=2, product_sku='JER-001', distribution_center_id=dc_id,
+                                         movement_type='receipt', delta_available=7))
+        db.session.commit()
+
+        snapshot = InventorySnapshot.query.filter_by(product_sku='JER-001').one()
+        assert snapshot.last_movement_id == 1
+        assert _balance(sample_inventory)['quantity_available'] == 112
+        compact_ledger(settle_seconds=0)
+        assert db.session.get(Inventory, sample_inventory.id).quantity_available == 112
+
+    def test_job_runs_compaction(self, db):
+        with patch('src.jobs.background_jobs.compact_ledger') as compact:
+            compact.return_value = {'movements_folded': 0, 'keys_compacted': 0}
+            compact_inventory_ledger_job()
+
+        compact.assert_called_once()
+
+
+class TestLedgerWritePath:
+
+    def test_reserve_and_release_append_movements(self, ledger_app, db, sample_inventory):
+        item = {'product_sku': 'JER-001', 'quantity': 15,
+                'distribution_center_id': sample_inventory.distribution_center_id}
+
+        reserved = ReserveInventoryForOrder('ORD-9', [item]).execute()
+        released = ReleaseInventoryForOrder('ORD-9', [{**item, 'quantity': 5}]).execute()
+
+        assert reserved['items_reserved'][0]['quantity_reserved_after'] == 25
+        assert released['items_released'][0]['quantity_reserved_after'] == 20
+        assert [m.movement_type for m in InventoryMovement.query.order_by(InventoryMovement.id)] == [
+            'reservation', 'release'
+        ]
+        assert db.session.get(Inventory, sample_inventory.id).quantity_reserved == 10
+        assert _balance(sample_inventory)['quantity_reserved'] == 20
+
+    def test_reserve_checks_ledger_balance(self, ledger_app, db, sample_inventory):
+        _record(sample_inventory, 'dispatch', 95, from_reservation=False)
+        item = {'product_sku': 'JER-001', 'quantity': 10,
+                'distribution_center_id': sample_inventory.distribution_center_id}
+
+        with pytest.raises(ConflictError):
+            ReserveInventoryForOrder('ORD-10', [item]).execute()
+
+    def test_reserve_locks_key_before_reading_balance(self, ledger_app, db, sample_inventory):
+        calls = []
+        item = {'product_sku': 'JER-001', 'quantity': 5,
+                'distribution_center_id': sample_inventory.distribution_center_id}
+
+        with patch('src.commands.reserve_inventory_for_order.lock_balance',
+                   side_effect=lambda *args: calls.append(('lock', args))), \
+                patch('src.commands.reserve_inventory_for_order.get_balance',
+                      side_effect=lambda *args: calls.append(('balance', args)) or get_balance(*args)):
+            ReserveInventoryForOrder('ORD-11', [item]).execute()
+
+        key = ('JER-001', sample_inventory.distribution_center_id)
+        assert calls == [('lock', key), ('balance', key)]
+
+    def test_update_endpoint_records_adjustment(self, ledger_app, client, db, sample_inventory):
+        response = client.put('/inventory/JER-001/update', json={
+            'distribution_center_id': sample_inventory.distribution_center_id,
+            'quantity_available': 80,
+            'minimum_stock_level': 30
+        })
+
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        assert data['changes']['quantity_available'] == {'old': 100, 'new': 80}
+        assert data['current_state']['quantity_available'] == 80
+        assert data['current_state']['minimum_stock_level'] == 30
+        movement = InventoryMovement.query.one()
+        assert (movement.movement_type, movement.delta_available) == ('adjustment', -20)
+        assert db.session.get(Inventory, sample_inventory.id).quantity_available == 100
+
+
+class TestLedgerEndpoints:
+
+    def test_record_and_read_ledger(self, client, db, sample_inventory):
+        dc_id = sample_inventory.distribution_center_id
+        response = client.post('/inventory/movements', json={
+            'product_sku': 'jer-001', 'distribution_center_id': dc_id,
+            'movement_type': 'receipt', 'quantity': 12, 'reference': 'REC-7'
+        })
+        assert response.status_code == 201
+
+        response = client.get(f'/inventory/JER-001/ledger?distribution_center_id={dc_id}')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['balance']['quantity_available'] == 112
+        assert data['movements'][0]['reference'] == 'REC-7'
+
+    def test_record_rejects_invalid_body(self, client, db, sample_inventory):
+        response = client.post('/inventory/movements', json={
+            'product_sku': 'JER-001', 'distribution_center_id': sample_inventory.distribution_center_id,
+            'movement_type': 'receipt', 'quantity': 0
+        })
+        assert response.status_code == 400
+
+    def test_ledger_requires_center(self, db, sample_inventory):
+        with pytest.raises(ValidationError):
+            GetInventoryLedger('JER-001', None).execute()
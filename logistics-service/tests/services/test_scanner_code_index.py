@@ -0,0 +1,156 @@
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import event
+
+from src.commands.scan_code import ScanCode
+from src.errors.errors import NotFoundError, ValidationError
+from src.models.product_batch import ProductBatch
+from src.models.product_code import ProductCode, rebuild_product_code_index
+from src.services.scanner_code_index import ScannerCodeCache, lookup_code, scanner_code_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    scanner_code_cache.clear()
+    yield
+    scanner_code_cache.clear()
+
+
+def _batch(db, location, number='L-001', **codes):
+    batch = ProductBatch(
+        product_sku='VAC-001',
+        distribution_center_id=location.distribution_center_id,
+        location_id=location.id,
+        batch_number=number,
+        quantity=10,
+        expiry_date=date.today() + timedelta(days=60),
+        is_available=True,
+        **codes
+    )
+    db.session.add(batch)
+    db.session.commit()
+    return batch
+
+
+def _index(db):
+    return sorted((c.code, c.code_type, c.batch_id) for c in ProductCode.query.all())
+
+
+class TestCodeIndexMaintenance:
+
+    def test_insert_indexes_non_empty_codes(self, db, warehouse_location):
+        batch = _batch(db, warehouse_location, barcode=' 7701 ', qr_code='QR-1', internal_code='')
+
+        assert _index(db) == [('7701', 'barcode', batch.id), ('QR-1', 'qr_code', batch.id)]
+
+    def test_update_replaces_changed_codes(self, db, warehouse_location):
+        batch = _batch(db, warehouse_location, barcode='7701', qr_code='QR-1')
+
+        batch.barcode = '7702'
+        batch.qr_code = None
+        batch.internal_code = 'INT-9'
+        db.session.commit()
+
+        assert _index(db) == sorted([('7702', 'barcode', batch.id), ('INT-9', 'internal_code', batch.id)])
+
+    def test_delete_removes_codes(self, db, warehouse_location):
+        batch = _batch(db, warehouse_location, barcode='7701')
+
+        db.session.delete(batch)
+        db.session.commit()
+
+        assert _index(db) == []
+
+    def test_rebuild_from_batches(self, db, warehouse_location):
+        batch = _batch(db, warehouse_location, barcode='7701', internal_code='INT-1')
+        db.session.query(ProductCode).delete()
+        db.session.commit()
+
+        counts = rebuild_product_code_index()
+        db.session.commit()
+
+        assert counts == {'barcode': 1, 'qr_code': 0, 'internal_code': 1}
+        assert _index(db) == [('7701', 'barcode', batch.id), ('INT-1', 'internal_code', batch.id)]
+
+
+class TestLookupCode:
+
+    def test_single_query_resolves_batch_location_and_dc(self, db, warehouse_location):
+        batch = _batch(db, warehouse_location, qr_code='QR-ABC')
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        matches, cached = lookup_code('QR-ABC')
+
+        assert len(statements) == 1
+        assert cached is False
+        assert matches[0]['batch']['id'] == batch.id
+        assert matches[0]['code_type'] == 'qr_code'
+        assert matches[0]['location']['location_code'] == 'A-E1-N1-P1'
+        assert matches[0]['distribution_center']['id'] == warehouse_location.distribution_center_id
+
+    def test_cache_hit_and_invalidation_on_move(self, db, warehouse_location, warehouse_location_ambient):
+        batch = _batch(db, warehouse_location, barcode='7701')
+        lookup_code('7701')
+
+        matches, cached = lookup_code('7701')
+        assert cached is True
+
+        batch.location_id = warehouse_location_ambient.id
+        db.session.commit()
+
+        matches, cached = lookup_code('7701')
+        assert cached is False
+        assert matches[0]['location']['id'] == warehouse_location_ambient.id
+
+    def test_quantity_change_keeps_cache(self, db, warehouse_location):
+        batch = _batch(db, warehouse_location, barcode='7701')
+        lookup_code('7701')
+
+        batch.quantity = 3
+        db.session.commit()
+
+        assert lookup_code('7701')[1] is True
+
+    def test_code_type_filter(self, db, warehouse_location):
+        _batch(db, warehouse_location, barcode='SAME', internal_code='SAME')
+
+        assert len(lookup_code('SAME')[0]) == 2
+        assert [m['code_type'] for m in lookup_code('SAME', 'internal_code')[0]] == ['internal_code']
+
+    def test_lru_eviction_and_ttl(self):
+        cache = ScannerCodeCache(max_size=2, ttl=60)
+        cache.put('a', None, [1])
+        cache.put('b', None, [2])
+        cache.get('a', None)
+        cache.put('c', None, [3])
+
+        assert cache.get('b', None) is None
+        assert cache.get('a', None) == [1]
+
+        expired = ScannerCodeCache(ttl=0)
+        expired.put('a', None, [1])
+        assert expired.get('a', None) is None
+
+
+class TestScanCode:
+
+    def test_not_found(self, db):
+        with pytest.raises(NotFoundError):
+            ScanCode('NOPE').execute()
+
+    def test_validation(self, db):
+        with pytest.raises(ValidationError):
+            ScanCode(' ').execute()
+        with pytest.raises(ValidationError):
+            ScanCode('7701', code_type='sku').execute()
+
+    def test_endpoint(self, client, db, warehouse_location):
+        _batch(db, warehouse_location, barcode='7701')
+
+        response = client.get('/inventory/scan?code=7701&code_type=barcode')
+
+        assert response.status_code == 200
+        assert response.get_json()['matches'][0]['batch']['batch_number'] == 'L-001'
+        assert client.get('/inventory/scan?code=0000').status_code == 404
@@ -6,11 +6,57 @@ Basado en la estructura de tests del proyecto.
 import pytest
 import io
 import csv
+import zipfile
 from unittest.mock import patch
 from decimal import Decimal
 
-from src.services.export_service import ExportService
+from sqlalchemy import event
+
+from src.services.export_service import ExportService, route_pdf_cache, shutdown_render_pool
+from src.models.delivery_route import DeliveryRoute
 from src.models.route_stop import RouteStop
+from src.models.route_assignment import RouteAssignment
+
+
+def _add_stops(db, route, count, start=2):
+    for i in range(start, start + count):
+        stop = RouteStop(
+            route_id=route.id,
+            sequence_order=i,
+            customer_name=f'Cliente {i}',
+            delivery_address=f'Calle {100 + i}',
+            city='Bogotá',
+            latitude=Decimal('4.68'),
+            longitude=Decimal('-74.05'),
+            stop_type='delivery',
+            status='pending'
+        )
+        db.session.add(stop)
+        db.session.flush()
+        db.session.add(RouteAssignment(
+            route_id=route.id,
+            stop_id=stop.id,
+            order_id=5000 + i,
+            order_number=f'ORD-{i:04d}',
+            total_weight_kg=Decimal('10.00'),
+            total_volume_m3=Decimal('0.100'),
+            status='assigned'
+        ))
+    db.session.commit()
+
+
+def _count_statements(db, fn):
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return len(statements)
 
 
 class TestExportService:
@@ -198,6 +244,106 @@ class TestExportService:
         assert len(pdf_result) > 500
 
 
+class TestExportLoadingAndCache:
+    """Tests de carga con una consulta por relación, caché de PDFs y ZIP."""
+    
+    def test_export_queries_do_not_grow_with_stops(self, db, sample_delivery_route, sample_route_stop):
+        """Test que exportar no ejecuta una consulta por parada."""
+        route_id = sample_delivery_route.id
+        _add_stops(db, sample_delivery_route, 2)
+        db.session.expire_all()
+        few = _count_statements(db, lambda: ExportService.export_route_to_csv(route_id))
+        
+        _add_stops(db, sample_delivery_route, 10, start=10)
+        db.session.expire_all()
+        many = _count_statements(db, lambda: ExportService.export_route_to_csv(route_id))
+        
+        assert many == few
+        assert many <= 4
+    
+    def test_csv_stream_matches_full_export(self, db, sample_delivery_route, sample_route_stop):
+        """Test que el CSV en streaming es igual al completo."""
+        _add_stops(db, sample_delivery_route, 3)
+        
+        rows = list(ExportService.stream_route_csv(sample_delivery_route.id))
+        
+        assert len(rows) == 5
+        assert ''.join(rows) == ExportService.export_route_to_csv(sample_delivery_route.id)
+        assert 'ORD-0002' in rows[2]
+    
+    def test_stream_csv_not_found_raises_before_streaming(self, db):
+        """Test que la ruta inexistente falla al pedir el generador."""
+        with pytest.raises(ValueError, match="no encontrada"):
+            ExportService.stream_route_csv(99999)
+    
+    def test_pdf_cached_until_route_changes(self, db, sample_delivery_route, sample_route_stop):
+        """Test caché del PDF por (route_id, versión)."""
+        first = ExportService.export_route_to_pdf(sample_delivery_route.id)
+        second = ExportService.export_route_to_pdf(sample_delivery_route.id)
+        
+        assert second is first
+        assert route_pdf_cache.get_stats()['hits'] == 1
+        
+        sample_route_stop.customer_name = 'Clínica Nueva'
+        db.session.commit()
+        third = ExportService.export_route_to_pdf(sample_delivery_route.id)
+        
+        assert third is not first
+        assert route_pdf_cache.get_stats()['entries'] == 2
+    
+    def test_bundle_renders_day_in_process_pool(
+        self, db, monkeypatch, sample_distribution_center, sample_vehicle, sample_delivery_route, sample_route_stop
+    ):
+        """Test ZIP del día con PDFs renderizados en el pool de procesos."""
+        second = DeliveryRoute(
+            route_code='ROUTE-TEST-002',
+            vehicle_id=sample_vehicle.id,
+            planned_date=sample_delivery_route.planned_date,
+            status='draft',
+            distribution_center_id=sample_distribution_center.id
+        )
+        db.session.add(second)
+        db.session.commit()
+        _add_stops(db, second, 2)
+        monkeypatch.setenv('EXPORT_RENDER_WORKERS', '2')
+        
+        try:
+            chunks = ExportService.export_routes_bundle(
+                sample_distribution_center.id, sample_delivery_route.planned_date
+            )
+            payload = b''.join(chunks)
+        finally:
+            shutdown_render_pool()
+        
+        bundle = zipfile.ZipFile(io.BytesIO(payload))
+        assert sorted(bundle.namelist()) == [
+            'ruta_ROUTE-TEST-001.csv', 'ruta_ROUTE-TEST-001.pdf',
+            'ruta_ROUTE-TEST-002.csv', 'ruta_ROUTE-TEST-002.pdf'
+        ]
+        assert bundle.read('ruta_ROUTE-TEST-002.pdf')[:4] == b'%PDF'
+        assert route_pdf_cache.get_stats()['entries'] == 2
+    
+    def test_bundle_endpoint(self, client, db, sample_distribution_center, sample_delivery_route, sample_route_stop):
+        """Test endpoint GET /routes/export/bundle (solo CSV)."""
+        response = client.get(
+            f'/routes/export/bundle?distribution_center_id={sample_distribution_center.id}'
+            f'&date={sample_delivery_route.planned_date.isoformat()}&format=csv'
+        )
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/zip'
+        bundle = zipfile.ZipFile(io.BytesIO(response.data))
+        assert bundle.namelist() == ['ruta_ROUTE-TEST-001.csv']
+    
+    def test_bundle_endpoint_without_routes(self, client, db, sample_distribution_center):
+        """Test endpoint de ZIP sin rutas para el día."""
+        response = client.get(
+            f'/routes/export/bundle?distribution_center_id={sample_distribution_center.id}&date=2030-01-01'
+        )
+        
+        assert response.status_code == 404
+
+
 # Tests de resúmenes diarios eliminados - métodos no existen en ExportService
 # Los métodos export_daily_summary_to_pdf y export_daily_summary_to_csv
 # no están implementados en la clase ExportService actual.
@@ -0,0 +1,244 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from src.models.route_stop import RouteStop
+from src.models.vehicle import Vehicle
+from src.models.vehicle_position import VehiclePosition
+from src.services import telemetry_ingestion
+from src.services.telemetry_ingestion import (
+    TelemetryBuffer,
+    leg_matrix_cache,
+    parse_positions,
+    persist_positions,
+    recompute_route_etas,
+)
+from src.websockets import websocket_manager
+
+
+# Hace una hora: dentro de la ventana aceptada para recorded_at
+BASE_TIME = datetime.utcnow().replace(microsecond=0) - timedelta(hours=1)
+
+
+def _ping(vehicle_id, seconds=0, lat=4.65, lng=-74.08, **extra):
+    return {
+        'vehicle_id': vehicle_id,
+        'latitude': lat,
+        'longitude': lng,
+        'recorded_at': (BASE_TIME + timedelta(seconds=seconds)).isoformat(),
+        **extra
+    }
+
+
+@pytest.fixture
+def route_in_progress(db, sample_delivery_route):
+    """Ruta en progreso: depósito + 3 entregas, la primera ya completada."""
+    sample_delivery_route.status = 'in_progress'
+    coordinates = [(4.60, -74.10), (4.62, -74.08), (4.65, -74.06), (4.70, -74.04)]
+    for sequence, (lat, lng) in enumerate(coordinates):
+        db.session.add(RouteStop(
+            route_id=sample_delivery_route.id,
+            sequence_order=sequence,
+            stop_type='depot' if sequence == 0 else 'delivery',
+            latitude=Decimal(str(lat)),
+            longitude=Decimal(str(lng)),
+            estimated_service_time_minutes=0 if sequence == 0 else 15,
+            time_from_previous_minutes=10 if sequence == 3 else 0,
+            status='completed' if sequence == 1 else 'pending'
+        ))
+    db.session.commit()
+    return sample_delivery_route
+
+
+@pytest.fixture
+def emitted(monkeypatch):
+    calls = []
+    monkeypatch.setattr(websocket_manager.RouteNotifier, 'notify_route_etas', staticmethod(calls.extend))
+    return calls
+
+
+class TestParsePositions:
+
+    def test_rejects_invalid_by_index(self):
+        pings, rejected = parse_positions([
+            _ping(1),
+            {'vehicle_id': 1, 'latitude': 95, 'longitude': 0},
+            {'latitude': 1, 'longitude': 1},
+            _ping(2, recorded_at=(BASE_TIME + timedelta(hours=5)).isoformat() + '+05:00'),
+        ])
+
+        assert [ping.vehicle_id for ping in pings] == [1, 2]
+        assert [item['index'] for item in rejected] == [1, 2]
+        assert pings[1].recorded_at == BASE_TIME
+
+    def test_rejects_recorded_at_outside_window(self):
+        pings, rejected = parse_positions([
+            _ping(1, recorded_at=(datetime.utcnow() - timedelta(hours=25)).isoformat()),
+            _ping(1, recorded_at=(datetime.utcnow() + timedelta(minutes=10)).isoformat()),
+            _ping(1, recorded_at=(datetime.utcnow() + timedelta(minutes=2)).isoformat()),
+        ])
+
+        assert len(pings) == 1
+        assert [item['index'] for item in rejected] == [0, 1]
+        assert 'futuro' in rejected[1]['error']
+
+
+class TestPersistPositions:
+
+    def test_writes_batch_and_keeps_latest_on_vehicle(self, db, sample_vehicle):
+        updated_at = sample_vehicle.updated_at
+        pings, _ = parse_positions([
+            _ping(sample_vehicle.id, 10, lat=4.61),
+            _ping(sample_vehicle.id, 30, lat=4.63),
+            _ping(sample_vehicle.id, 20, lat=4.62),
+            _ping(9999, 5),
+        ])
+
+        result = persist_positions(pings)
+
+        assert (result['written'], result['dropped'], result['vehicles_updated']) == (3, 1, 1)
+        assert VehiclePosition.query.count() == 3
+        db.session.expire_all()
+        vehicle = db.session.get(Vehicle, sample_vehicle.id)
+        assert float(vehicle.current_location_lat) == pytest.approx(4.63)
+        assert vehicle.last_location_update == BASE_TIME + timedelta(seconds=30)
+        assert vehicle.updated_at == updated_at
+
+        # Una posición más vieja que la guardada no la pisa
+        persist_positions(parse_positions([_ping(sample_vehicle.id, 0, lat=4.0)])[0])
+        db.session.expire_all()
+        assert float(db.session.get(Vehicle, sample_vehicle.id).current_location_lat) == pytest.approx(4.63)
+
+    def test_resolves_active_route_from_occupancy(self, db, route_in_progress):
+        ping = _ping(route_in_progress.vehicle_id)
+        ping['recorded_at'] = datetime.combine(route_in_progress.planned_date, datetime.min.time()).isoformat()
+
+        result = persist_positions(parse_positions([ping])[0])
+
+        assert list(result['latest_by_route']) == [route_in_progress.id]
+        assert VehiclePosition.query.one().route_id == route_in_progress.id
+
+
+class TestRecomputeRouteEtas:
+
+    def test_updates_pending_stops_and_notifies(self, db, route_in_progress, emitted):
+        ping = parse_positions([_ping(route_in_progress.vehicle_id, lat=4.62, lng=-74.08)])[0][0]
+
+        payloads = recompute_route_etas({route_in_progress.id: ping})
+
+        assert emitted == payloads
+        assert [stop['sequence_order'] for stop in payloads[0]['stops']] == [2, 3]
+        stops = {stop.sequence_order: stop for stop in RouteStop.query.all()}
+        first_eta = stops[2].estimated_arrival_time
+        assert ping.recorded_at < first_eta
+        # Tramo 2→3 planificado (10 min) + 15 min de servicio en la parada 2
+        assert stops[3].estimated_arrival_time - first_eta == timedelta(minutes=25)
+        assert stops[1].estimated_arrival_time is None
+
+    def test_leg_matrix_is_cached_and_rebuilt_on_replan(self, db, route_in_progress, emitted):
+        ping = parse_positions([_ping(route_in_progress.vehicle_id)])[0][0]
+
+        recompute_route_etas({route_in_progress.id: ping})
+        recompute_route_etas({route_in_progress.id: ping})
+        assert (leg_matrix_cache.hits, leg_matrix_cache.misses) == (1, 1)
+
+        db.session.add(RouteStop(
+            route_id=route_in_progress.id, sequence_order=4, stop_type='delivery',
+            latitude=Decimal('4.75'), longitude=Decimal('-74.02'), status='pending'
+        ))
+        db.session.commit()
+        payloads = recompute_route_etas({route_in_progress.id: ping})
+
+        assert leg_matrix_cache.misses == 2
+        assert [stop['sequence_order'] for stop in payloads[0]['stops']] == [2, 3, 4]
+
+    def test_skips_routes_not_in_progress(self, db, sample_delivery_route, emitted):
+        ping = parse_positions([_ping(sample_delivery_route.vehicle_id)])[0][0]
+
+        assert recompute_route_etas({sample_delivery_route.id: ping}) == []
+        assert emitted == []
+
+
+class TestTelemetryBuffer:
+
+    def test_flush_writes_and_recomputes_etas(self, app, db, route_in_progress, emitted):
+        buffer = TelemetryBuffer(app=app, eta_interval=60, max_queue=3)
+        pings, _ = parse_positions([_ping(route_in_progress.vehicle_id, n, route_id=route_in_progress.id)
+                                    for n in range(3)])
+
+        assert buffer.enqueue_many(pings) is True
+        assert buffer.enqueue_many(pings[:1]) is False
+        assert buffer.flush() == 3
+        assert emitted == []
+
+        buffer.flush(force_eta=True)
+
+        stats = buffer.get_stats()
+        assert (stats['pings_written'], stats['pings_rejected'], stats['eta_routes_updated']) == (3, 1, 1)
+        assert len(emitted) == 1
+
+    def test_failed_batch_keeps_good_pings(self, app, db, sample_vehicle, monkeypatch):
+        buffer = TelemetryBuffer(app=app)
+        pings, _ = parse_positions([_ping(sample_vehicle.id, n) for n in range(3)])
+        original = telemetry_ingestion.persist_positions
+
+        def failing_persist(batch):
+            # El INSERT del lote falla, y la posición del medio también por separado
+            if len(batch) > 1 or batch[0] is pings[1]:
+                raise RuntimeError('insert rechazado')
+            return original(batch)
+
+        monkeypatch.setattr(telemetry_ingestion, 'persist_positions', failing_persist)
+        buffer.enqueue_many(pings)
+
+        assert buffer.flush() == 2
+        stats = buffer.get_stats()
+        assert (stats['flush_errors'], stats['pings_written'], stats['pings_failed']) == (1, 2, 1)
+        assert VehiclePosition.query.count() == 2
+
+
+class TestTelemetryEndpoints:
+
+    def test_post_positions_sync(self, client, db, sample_vehicle):
+        response = client.post('/telemetry/positions', json={'positions': [
+            _ping(sample_vehicle.id), {'vehicle_id': sample_vehicle.id}
+        ]})
+
+        assert response.status_code == 202
+        body = response.get_json()
+        assert (body['mode'], body['accepted'], body['written']) == ('sync', 1, 1)
+        assert body['rejected'][0]['index'] == 1
+
+        history = client.get(f'/telemetry/vehicles/{sample_vehicle.id}/positions').get_json()
+        assert history['count'] == 1
+
+    def test_post_positions_invalid(self, client, db):
+        assert client.post('/telemetry/positions', json={'positions': []}).status_code == 400
+        response = client.post('/telemetry/positions', json={'positions': [{'vehicle_id': 1}]})
+        assert response.status_code == 400
+        assert response.get_json()['rejected'][0]['index'] == 0
+
+    def test_post_positions_buffer_full(self, app, client, db, monkeypatch):
+        buffer = TelemetryBuffer(app=app, max_queue=1)
+        monkeypatch.setattr(telemetry_ingestion, 'telemetry_buffer', buffer)
+
+        response = client.post('/telemetry/positions', json={'positions': [_ping(1), _ping(1, 1)]})
+
+        assert response.status_code == 503
+        assert client.get('/telemetry/stats').get_json()['pings_rejected'] == 2
+
+    def test_socket_position_update_and_route_subscription(self, app, db, route_in_progress, emitted):
+        socket_client = websocket_manager.socketio.test_client(app)
+        socket_client.emit('subscribe_route', {'route_ids': [route_in_progress.id]})
+
+        ack = socket_client.emit(
+            'position_update', _ping(route_in_progress.vehicle_id, route_id=route_in_progress.id),
+            callback=True
+        )
+
+        assert (ack['accepted'], ack['written']) == (1, 1)
+        rooms = websocket_manager.socketio.server.manager.rooms['/']
+        assert f'route_{route_in_progress.id}' in rooms
+        assert [payload['route_id'] for payload in emitted] == [route_in_progress.id]
+        socket_client.disconnect()
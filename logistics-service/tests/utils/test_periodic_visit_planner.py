@@ -0,0 +1,123 @@
+import random
+from datetime import time
+
+from src.utils.periodic_visit_planner import WeeklyVisitPlanner, day_patterns
+
+OFFICE = {'latitude': 4.6097, 'longitude': -74.0817}
+
+
+def _portfolio(size, seed=7, window_every=5):
+    rng = random.Random(seed)
+    customers = []
+    for n in range(size):
+        customer = {
+            'customer_id': n + 1,
+            'latitude': 4.6 + rng.uniform(-0.05, 0.05),
+            'longitude': -74.08 + rng.uniform(-0.05, 0.05),
+            'visits_per_week': 2 if n % 4 == 0 else 1,
+        }
+        if window_every and n % window_every == 0:
+            customer['time_window_start'] = time(8, 0)
+            customer['time_window_end'] = time(11, 0)
+        customers.append(customer)
+    return customers
+
+
+class TestDayPatterns:
+
+    def test_spreads_visits_across_the_week(self):
+        assert day_patterns(2, range(5)) == [(0, 2), (0, 3), (0, 4), (1, 3), (1, 4), (2, 4)]
+        assert day_patterns(5, range(5)) == [(0, 1, 2, 3, 4)]
+        assert day_patterns(3, [1, 2]) == []
+
+    def test_relaxes_spacing_when_allowed_days_are_adjacent(self):
+        assert day_patterns(2, [3, 4]) == [(3, 4)]
+
+
+class TestWeeklyVisitPlanner:
+
+    def test_assigns_each_customer_as_often_as_required(self):
+        customers = _portfolio(30)
+        customers[1]['allowed_days'] = [3]
+        planner = WeeklyVisitPlanner(customers, 5, service_time_minutes=15, start_location=OFFICE)
+
+        days, unassigned = planner.assign_days()
+
+        assert unassigned == []
+        visits = {}
+        for day, indices in enumerate(days):
+            for index in indices:
+                visits.setdefault(index, []).append(day)
+        assert {index: len(v) for index, v in visits.items()} == {
+            index: customer['visits_per_week'] for index, customer in enumerate(customers)
+        }
+        assert visits[1] == [3]
+        assert all(v[1] - v[0] >= 2 for v in visits.values() if len(v) == 2)
+
+    def test_reports_customers_that_cannot_fit(self):
+        customers = _portfolio(3, window_every=0)
+        customers[0]['time_window_start'] = time(19, 0)
+        customers[1]['visits_per_week'] = 3
+        customers[1]['allowed_days'] = [0, 1]
+        planner = WeeklyVisitPlanner(customers, 5, start_location=OFFICE)
+
+        _, unassigned = planner.assign_days()
+
+        assert sorted(item['index'] for item in unassigned) == [0, 1]
+
+    def test_plan_respects_windows_work_hours_and_warm_starts(self):
+        customers = _portfolio(40)
+        planner = WeeklyVisitPlanner(customers, 5, time(8, 0), time(17, 0), service_time_minutes=20,
+                                     start_location=OFFICE)
+
+        plan = planner.plan(time_budget_seconds=1.5)
+
+        assert plan['solve_seconds'] < 3
+        assert all(day['warm_started'] for day in plan['days'])
+        scheduled = sum(len(day['sequence']) for day in plan['days'])
+        assert scheduled == sum(customer['visits_per_week'] for customer in customers)
+        for day in plan['days']:
+            assert day['arrival_minutes'] == sorted(day['arrival_minutes'])
+            for index, arrival in zip(day['sequence'], day['arrival_minutes']):
+                start, end = planner.window(index)
+                assert start <= arrival <= end
+                assert arrival + 20 <= 17 * 60
+
+    def test_overflow_waits_for_next_allowed_day(self):
+        customers = _portfolio(3, window_every=0)
+        for customer in customers:
+            customer['visits_per_week'] = 1
+            customer['allowed_days'] = [0, 2]
+        # Jornada de 2 h con visitas de 50 min: el lunes solo caben dos
+        planner = WeeklyVisitPlanner(customers, 3, time(8, 0), time(10, 0), service_time_minutes=50)
+
+        plan = planner.plan(time_budget_seconds=1, days=[[0, 1, 2], [], []])
+
+        monday, tuesday, wednesday = plan['days']
+        assert len(monday['sequence']) == 2 and len(monday['carried_over']) == 1
+        assert tuesday['sequence'] == []
+        assert wednesday['sequence'] == monday['carried_over']
+        assert plan['unassigned'] == []
+
+    def test_overflow_without_allowed_day_left_is_unassigned(self):
+        customers = _portfolio(3, window_every=0)
+        for customer in customers:
+            customer['visits_per_week'] = 1
+            customer['allowed_days'] = [0]
+        planner = WeeklyVisitPlanner(customers, 3, time(8, 0), time(10, 0), service_time_minutes=50)
+
+        plan = planner.plan(time_budget_seconds=1, days=[[0, 1, 2], [], []])
+
+        carried = plan['days'][0]['carried_over']
+        assert [item['index'] for item in plan['unassigned']] == carried
+        assert 'no queda otro día permitido' in plan['unassigned'][0]['reason']
+        assert sum(len(day['sequence']) for day in plan['days']) == 2
+
+    def test_warm_order_keeps_previous_day_order(self):
+        customers = _portfolio(6, window_every=0)
+        planner = WeeklyVisitPlanner(customers, 5, start_location=OFFICE)
+
+        order = planner._warm_order([0, 2, 4, 5], previous_order=[4, 1, 0, 3])
+
+        assert [index for index in order if index in (4, 0)] == [4, 0]
+        assert sorted(order) == [0, 2, 4, 5]
@@ -0,0 +1,79 @@
+import itertools
+
+from src.utils.pick_path import WarehouseLayout, sequence_pick_path, shelf_number
+
+
+def _grid_layout(aisles, shelves):
+    locations = []
+    location_id = 1
+    for aisle in aisles:
+        for shelf in range(1, shelves + 1):
+            locations.append({'location_id': location_id, 'aisle': aisle, 'shelf': f'E{shelf}'})
+            location_id += 1
+    return WarehouseLayout(locations), {(l['aisle'], l['shelf']): l['location_id'] for l in locations}
+
+
+class TestWarehouseLayout:
+
+    def test_shelf_number_uses_trailing_integer(self):
+        assert shelf_number('E1') == 1
+        assert shelf_number('Rack-05') == 5
+        assert shelf_number('Z1-E12') == 12
+        assert shelf_number('TOP') is None
+
+    def test_aisles_are_ranked_in_natural_order(self):
+        layout, ids = _grid_layout(['A10', 'A2', 'A1'], 1)
+        xs = [layout.coordinate(ids[(aisle, 'E1')])[0] for aisle in ['A1', 'A2', 'A10']]
+        assert xs == [3.0, 6.0, 9.0]
+
+    def test_same_aisle_distance_is_along_the_aisle(self):
+        layout, ids = _grid_layout(['A'], 10)
+        assert layout.distance(ids[('A', 'E2')], ids[('A', 'E7')]) == 7.5
+
+    def test_cross_aisle_uses_shorter_of_front_or_back(self):
+        layout, ids = _grid_layout(['A', 'B'], 10)
+        # Aisle length = 10 * 1.5 + 1.5 = 16.5
+        assert layout.distance(ids[('A', 'E1')], ids[('B', 'E1')]) == 3.0 + 3.0
+        assert layout.distance(ids[('A', 'E10')], ids[('B', 'E10')]) == 3.0 + 3.0
+        assert layout.distance(ids[('A', 'E1')], ids[('B', 'E10')]) == 3.0 + 16.5
+
+    def test_dock_is_origin_and_distance_is_symmetric(self):
+        layout, ids = _grid_layout(['A', 'B', 'C'], 5)
+        a, b = ids[('A', 'E3')], ids[('C', 'E4')]
+        assert layout.distance(None, ids[('A', 'E1')]) == 3.0 + 1.5
+        assert layout.distance(a, b) == layout.distance(b, a)
+
+    def test_unnumbered_shelves_are_ranked_by_label(self):
+        layout = WarehouseLayout([
+            {'location_id': 1, 'aisle': 'A', 'shelf': 'TOP'},
+            {'location_id': 2, 'aisle': 'A', 'shelf': 'BOTTOM'},
+        ])
+        assert layout.coordinate(2)[1] < layout.coordinate(1)[1]
+
+
+class TestSequencePickPath:
+
+    def test_trivial_inputs(self):
+        layout, ids = _grid_layout(['A'], 3)
+        assert sequence_pick_path(layout, []) == []
+        assert sequence_pick_path(layout, [ids[('A', 'E2')], ids[('A', 'E2')]]) == [ids[('A', 'E2')]]
+
+    def test_matches_brute_force_on_small_instance(self):
+        layout, ids = _grid_layout(['A', 'B', 'C', 'D'], 10)
+        stops = [ids[('D', 'E9')], ids[('A', 'E2')], ids[('C', 'E5')], ids[('B', 'E8')],
+                 ids[('A', 'E9')], ids[('D', 'E1')]]
+
+        route = sequence_pick_path(layout, stops)
+
+        best = min(layout.tour_distance(p) for p in itertools.permutations(stops))
+        assert sorted(route) == sorted(stops)
+        assert abs(layout.tour_distance(route) - best) < 1e-6
+
+    def test_improves_on_arrival_order(self):
+        layout, ids = _grid_layout(['A', 'B', 'C', 'D', 'E'], 20)
+        arrival = [ids[(a, f'E{s}')] for a, s in
+                   [('E', 3), ('A', 18), ('D', 7), ('B', 2), ('E', 19), ('A', 4), ('C', 11), ('B', 16)]]
+
+        route = sequence_pick_path(layout, arrival)
+
+        assert layout.tour_distance(route) < layout.tour_distance(arrival)
@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+from src.utils.ttl_cache import TTLCache
+
+
+class TestTTLCache:
+
+    def test_lru_eviction_by_size(self):
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert (cache.hits, cache.misses) == (2, 1)
+
+    def test_expired_entries_are_dropped(self):
+        cache = TTLCache(ttl=60)
+        cache.put('a', 1)
+
+        with patch('src.utils.ttl_cache.time.monotonic', return_value=10 ** 9):
+            assert cache.get('a') is None
+        assert cache.get_stats()['size'] == 0
+
+    def test_non_positive_ttl_stores_nothing(self):
+        cache = TTLCache(ttl=0)
+        cache.put('a', 1)
+
+        assert cache.get('a') is None
+
+    def test_rejected_entry_counts_as_miss(self):
+        cache = TTLCache(ttl=60)
+        cache.put('a', {1, 2})
+
+        assert cache.get('a', accept=lambda value: value == {1, 2, 3}) is None
+        assert cache.get('a') is None
+        assert cache.misses == 2
+
+    def test_weight_budget(self):
+        cache = TTLCache(max_weight=10)
+        cache.put('a', b'12345')
+        cache.put('b', b'12345')
+        cache.put('c', b'123')
+        cache.put('big', b'x' * 11)
+
+        assert cache.get('a') is None
+        assert cache.get('big') is None
+        assert cache.get_stats()['weight'] == 8
+
+    def test_invalidate_where(self):
+        cache = TTLCache()
+        cache.put(('dc', 1), {10})
+        cache.put(('dc', 2), {20})
+
+        assert cache.invalidate_where(lambda key, value: 20 in value) == [('dc', 2)]
+        assert cache.get(('dc', 1)) == {10}
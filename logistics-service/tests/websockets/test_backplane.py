@@ -0,0 +1,154 @@
+"""
+Tests para el backplane de Socket.IO (varios workers).
+"""
+
+import time
+import logging
+import pytest
+import socketio
+from flask import Flask
+from unittest.mock import patch
+
+from src.websockets.backplane import (
+    LocalPubSubManager,
+    InventoryRedisManager,
+    create_client_manager
+)
+from src.websockets.stock_protocol import (
+    ENCODING_JSON,
+    compact_stock,
+    protocol_room,
+    sequence_tracker
+)
+
+
+class _Worker:
+    """Servidor Socket.IO con participantes falsos que registra lo enviado."""
+
+    def __init__(self, url):
+        self.server = socketio.Server(
+            async_mode='threading',
+            client_manager=LocalPubSubManager(url)
+        )
+        self.sent = []
+        self.server._send_eio_packet = lambda eio_sid, pkt: self.sent.append((eio_sid, pkt.data))
+        self.server.manager.initialize()
+
+    def join(self, eio_sid, room):
+        sid = self.server.manager.connect(eio_sid, '/')
+        self.server.manager.enter_room(sid, '/', room)
+
+    def received_by(self, eio_sid):
+        return [data for sid, data in self.sent if sid == eio_sid]
+
+    def close(self):
+        self.server.manager.close()
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def workers():
+    created = []
+
+    def _create(count, url='local://test-backplane'):
+        for _ in range(count):
+            created.append(_Worker(url))
+        return created
+
+    yield _create
+    for worker in created:
+        worker.close()
+    LocalPubSubManager.reset()
+    sequence_tracker.reset()
+
+
+class TestCreateClientManager:
+    """Tests de selección del backplane por URL."""
+
+    def test_no_url_means_single_process(self):
+        assert create_client_manager(None) is None
+
+    def test_local_url(self):
+        manager = create_client_manager('local://unit')
+        try:
+            assert isinstance(manager, LocalPubSubManager)
+            assert manager.channel == 'unit'
+        finally:
+            manager.close()
+
+    def test_redis_url(self):
+        with patch('socketio.RedisManager._redis_connect'):
+            manager = create_client_manager('redis://localhost:6379/0')
+        assert isinstance(manager, InventoryRedisManager)
+
+    def test_unsupported_url(self):
+        with pytest.raises(ValueError):
+            create_client_manager('amqp://localhost')
+
+
+class TestLocalBackplane:
+    """Tests de fan-out entre workers con el backplane en memoria."""
+
+    def test_emit_reaches_clients_of_other_workers(self, workers):
+        worker_a, worker_b = workers(2)
+        worker_a.join('client-a', 'product_JER-001')
+        worker_b.join('client-b', 'product_JER-001')
+
+        worker_a.server.emit('stock_updated', {'product_sku': 'JER-001'}, room='product_JER-001')
+
+        assert _wait_for(lambda: worker_a.received_by('client-a') and worker_b.received_by('client-b'))
+        assert len(worker_b.received_by('client-b')) == 1
+
+    def test_write_only_emitter_reaches_workers(self, workers):
+        worker_a, = workers(1)
+        worker_a.join('client-a', 'all_inventory_updates')
+        emitter = LocalPubSubManager('local://test-backplane', write_only=True)
+
+        emitter.emit('stock_updated_batch', {'count': 1}, room='all_inventory_updates')
+
+        assert _wait_for(lambda: worker_a.received_by('client-a'))
+
+    def test_stock_change_computes_deltas_on_receiving_worker(self, workers):
+        # Los trackers de secuencia son por proceso; aquí el emisor es un
+        # proceso aparte (p. ej. el de jobs) sin tracker propio.
+        worker_b, = workers(1)
+        room = protocol_room('JER-001', ENCODING_JSON)
+        worker_b.join('client-b', room)
+        sequence_tracker.seed('JER-001', compact_stock({'total_available': 10}), ENCODING_JSON)
+        emitter = LocalPubSubManager('local://test-backplane', write_only=True)
+
+        emitter.publish_stock_change(
+            'JER-001', {'total_available': 7}, 'sale', '2025-01-01T00:00:00'
+        )
+
+        assert _wait_for(lambda: worker_b.received_by('client-b'))
+        # El evento interno no se reenvía a los clientes, solo el stock_delta
+        packets = worker_b.received_by('client-b')
+        assert len(packets) == 1
+        assert 'stock_delta' in packets[0]
+        assert '__inventory_stock_change__' not in packets[0]
+
+
+def test_init_socketio_with_local_backplane():
+    from src.websockets import websocket_manager
+
+    app = Flask(__name__)
+    app.config['SOCKETIO_MESSAGE_QUEUE'] = 'local://init-test'
+
+    sio = websocket_manager.init_socketio(app)
+    try:
+        assert isinstance(sio.server.manager, LocalPubSubManager)
+        # Logs por conexión desactivados por defecto
+        assert sio.server.logger.level == logging.ERROR
+        assert sio.server.eio.logger.level == logging.ERROR
+    finally:
+        sio.server.manager.close()
+        LocalPubSubManager.reset()
@@ -0,0 +1,258 @@
+"""
+Tests para el buffer de coalescencia de eventos de inventario.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from src.commands.get_stock_levels import GetStockLevels
+from src.websockets.inventory_events import InventoryEvent, InventoryEventPublisher
+from src.websockets.inventory_event_buffer import (
+    InventoryEventBuffer,
+    coalesce_events,
+    publish_coalesced
+)
+import src.websockets.inventory_event_buffer as buffer_module
+
+
+class TestCoalescing:
+    """Tests de agrupación de eventos por SKU."""
+
+    def test_coalesce_events_groups_by_sku(self):
+        events = [
+            InventoryEvent('JER-001', 'sale', 100, 90, 1, 'DC-001'),
+            InventoryEvent('JER-001', 'sale', 90, 70, 1, 'DC-001'),
+            InventoryEvent('VAC-001', 'restock', 0, 10, 1, 'DC-001'),
+        ]
+
+        pending = coalesce_events(events)
+
+        assert list(pending.keys()) == ['JER-001', 'VAC-001']
+        assert pending['JER-001'].event_count == 2
+        assert pending['JER-001'].first_event.previous_quantity == 100
+        assert pending['JER-001'].last_event.new_quantity == 70
+
+    def test_coalescing_keeps_most_severe_change_type(self):
+        pending = coalesce_events([
+            InventoryEvent('JER-001', 'low_stock', 20, 5, 1, 'DC-001'),
+            InventoryEvent('JER-001', 'sale', 5, 4, 1, 'DC-001'),
+            InventoryEvent('VAC-001', 'sale', 30, 20, 1, 'DC-001'),
+            InventoryEvent('VAC-001', 'update', 20, 20, 1, 'DC-001'),
+        ])
+
+        assert pending['JER-001'].change_type == 'low_stock'
+        assert pending['VAC-001'].change_type == 'update'
+
+    def test_publish_coalesced_single_query_and_batch_emit(self, db, multiple_inventory_items):
+        events = [
+            InventoryEvent('JER-001', 'sale', 100, 90, 1, 'DC-001'),
+            InventoryEvent('JER-001', 'sale', 90, 80, 1, 'DC-001'),
+            InventoryEvent('VAC-001', 'sale', 30, 20, 1, 'DC-001'),
+        ]
+
+        with patch.object(GetStockLevels, 'execute', autospec=True,
+                          side_effect=GetStockLevels.execute) as mock_execute, \
+             patch('src.websockets.websocket_manager.InventoryNotifier.notify_stock_changes_batch') as mock_notify:
+            published = publish_coalesced(coalesce_events(events))
+
+        assert published == 2
+        assert mock_execute.call_count == 1
+        changes = mock_notify.call_args[0][0]
+        jer = next(c for c in changes if c['product_sku'] == 'JER-001')
+        assert jer['stock_data']['previous_quantity'] == 100
+        assert jer['stock_data']['new_quantity'] == 80
+        assert jer['stock_data']['quantity_change'] == -20
+        assert jer['stock_data']['coalesced_events'] == 2
+        assert jer['stock_data']['total_physical'] == (
+            jer['stock_data']['total_available'] + jer['stock_data']['total_reserved']
+        )
+        assert len(jer['stock_data']['distribution_centers']) == 2
+
+
+class TestInventoryEventBuffer:
+    """Tests del buffer y sus métricas."""
+
+    def test_enqueue_does_not_publish(self):
+        buffer = InventoryEventBuffer()
+
+        with patch.object(buffer_module, 'publish_coalesced') as mock_publish:
+            buffer.enqueue(InventoryEvent('JER-001', 'sale', 10, 5))
+            buffer.enqueue(InventoryEvent('JER-001', 'sale', 5, 2))
+
+        mock_publish.assert_not_called()
+        stats = buffer.get_stats()
+        assert stats['queue_depth'] == 2
+        assert stats['dirty_skus'] == 1
+
+    def test_flush_publishes_once_per_sku_and_tracks_metrics(self):
+        buffer = InventoryEventBuffer()
+        buffer.enqueue_many([
+            InventoryEvent('JER-001', 'sale', 10, 5),
+            InventoryEvent('JER-001', 'sale', 5, 2),
+            InventoryEvent('JER-001', 'sale', 2, 1),
+            InventoryEvent('VAC-001', 'sale', 10, 1),
+        ])
+
+        with patch.object(buffer_module, 'publish_coalesced',
+                          side_effect=lambda pending: len(pending)) as mock_publish:
+            published = buffer.flush()
+
+        assert published == 2
+        mock_publish.assert_called_once()
+        stats = buffer.get_stats()
+        assert stats['queue_depth'] == 0
+        assert stats['events_flushed'] == 4
+        assert stats['skus_published'] == 2
+        assert stats['coalescing_ratio'] == 2.0
+        assert stats['flush_count'] == 1
+
+    def test_flush_empty_is_noop(self):
+        buffer = InventoryEventBuffer()
+
+        with patch.object(buffer_module, 'publish_coalesced') as mock_publish:
+            assert buffer.flush() == 0
+
+        mock_publish.assert_not_called()
+
+    def test_flush_error_is_counted(self):
+        buffer = InventoryEventBuffer()
+        buffer.enqueue(InventoryEvent('JER-001', 'sale', 10, 5))
+
+        with patch.object(buffer_module, 'publish_coalesced', side_effect=Exception('db down')):
+            assert buffer.flush() == 0
+
+        assert buffer.get_stats()['flush_errors'] == 1
+
+    def test_failed_flush_requeues_events(self):
+        buffer = InventoryEventBuffer()
+        buffer.enqueue(InventoryEvent('JER-001', 'out_of_stock', 5, 0))
+
+        with patch.object(buffer_module, 'publish_coalesced', side_effect=Exception('db down')):
+            buffer.flush()
+        buffer.enqueue(InventoryEvent('JER-001', 'restock', 0, 50))
+
+        published = []
+        with patch.object(buffer_module, 'publish_coalesced',
+                          side_effect=lambda pending: published.append(pending) or len(pending)):
+            assert buffer.flush() == 1
+
+        entry = published[0]['JER-001']
+        assert entry.event_count == 2
+        assert entry.first_event.previous_quantity == 5
+        assert entry.last_event.new_quantity == 50
+        assert entry.change_type == 'out_of_stock'
+        assert buffer.get_stats()['events_flushed'] == 2
+
+    def test_events_dropped_after_max_attempts(self):
+        buffer = InventoryEventBuffer()
+        buffer.enqueue(InventoryEvent('JER-001', 'sale', 10, 5))
+
+        with patch.object(buffer_module, 'publish_coalesced', side_effect=Exception('db down')):
+            for _ in range(buffer_module.MAX_FLUSH_ATTEMPTS):
+                buffer.flush()
+
+        stats = buffer.get_stats()
+        assert stats['queue_depth'] == 0
+        assert stats['events_dropped'] == 1
+
+    def test_publisher_enqueues_when_buffer_active(self, monkeypatch):
+        buffer = InventoryEventBuffer()
+        monkeypatch.setattr(buffer_module, 'event_buffer', buffer)
+
+        with patch.object(InventoryEventPublisher, 'publish_now') as mock_publish_now:
+            InventoryEventPublisher.publish(InventoryEvent('JER-001', 'sale', 10, 5))
+
+        mock_publish_now.assert_not_called()
+        assert buffer.get_stats()['queue_depth'] == 1
+
+    def test_start_and_stop_flushes_pending(self):
+        buffer = InventoryEventBuffer(flush_interval=0.05)
+        buffer.start()
+        assert buffer.is_running
+        buffer.enqueue(InventoryEvent('JER-001', 'sale', 10, 5))
+
+        with patch.object(buffer_module, 'publish_coalesced', side_effect=lambda p: len(p)):
+            buffer.stop(flush=True)
+
+        assert not buffer.is_running
+        assert buffer.get_stats()['queue_depth'] == 0
+
+
+def test_publisher_stats_endpoint_sync_mode(client):
+    response = client.get('/websocket/publisher-stats')
+
+    assert response.status_code == 200
+    assert response.get_json()['mode'] == 'sync'
+
+
+def test_batch_keeps_v1_per_product_updates(monkeypatch):
+    from unittest.mock import MagicMock
+    import src.websockets.websocket_manager as wsm
+
+    mock_socketio = MagicMock()
+    monkeypatch.setattr(wsm, 'socketio', mock_socketio)
+
+    wsm.InventoryNotifier.notify_stock_changes_batch([
+        {'product_sku': 'jer-001', 'change_type': 'low_stock', 'stock_data': {'updated_center_id': 1}},
+        {'product_sku': 'vac-001', 'change_type': 'sale', 'stock_data': {'updated_center_id': 1}},
+    ])
+
+    calls = mock_socketio.emit.call_args_list
+    per_product = [c for c in calls if c[0][0] == 'stock_updated']
+    batch = [c for c in calls if c[0][0] == 'stock_updated_batch']
+    assert len(per_product) == 2
+    assert all('all_inventory_updates' in c[1]['to'] for c in per_product)
+    assert per_product[0][0][1]['change_type'] == 'low_stock'
+    assert len(batch) == 1
+    assert batch[0][1]['room'] == wsm.ALL_INVENTORY_BATCH_ROOM
+
+
+class TestStockPayloads:
+    """El buffer, la publicación síncrona y los snapshots v2 publican el mismo stock."""
+
+    @pytest.fixture
+    def cart_reservation(self, db, multiple_inventory_items):
+        from datetime import datetime, timedelta
+        from src.models.cart_reservation import CartReservation
+
+        reservation = CartReservation(
+            product_sku='JER-001',
+            distribution_center_id=multiple_inventory_items[0].distribution_center_id,
+            user_id='user123',
+            session_id='session123',
+            quantity_reserved=15,
+            created_at=datetime.utcnow(),
+            expires_at=datetime.utcnow() + timedelta(minutes=10),
+            is_active=True
+        )
+        db.session.add(reservation)
+        db.session.commit()
+        return reservation
+
+    def test_all_paths_deduct_cart_reservations(self, cart_reservation):
+        from src.websockets.stock_protocol import build_snapshots, sequence_tracker
+
+        raw = GetStockLevels(product_sku='JER-001').execute()
+        payload = buffer_module.load_stock_payloads(['JER-001'])['JER-001']
+        assert payload['total_cart_reserved'] == 15
+        assert payload['total_available'] == raw['total_available'] - 15
+
+        event = InventoryEvent('JER-001', 'sale', 100, 90, 1, 'DC-001')
+        with patch('src.websockets.websocket_manager.InventoryNotifier.notify_stock_changes_batch') as mock_batch, \
+             patch('src.websockets.websocket_manager.InventoryNotifier.notify_stock_change') as mock_single:
+            publish_coalesced(coalesce_events([event]))
+            InventoryEventPublisher.publish_now(event)
+
+        buffered = mock_batch.call_args[0][0][0]['stock_data']
+        sync = mock_single.call_args[1]['stock_data']
+        for stock_data in (buffered, sync):
+            assert stock_data['total_available'] == payload['total_available']
+            assert stock_data['total_cart_reserved'] == 15
+
+        sequence_tracker.reset()
+        try:
+            snapshot = build_snapshots(['JER-001'])['JER-001']['s']
+        finally:
+            sequence_tracker.reset()
+        assert snapshot['ta'] == payload['total_available']
+        assert snapshot['tc'] == 15
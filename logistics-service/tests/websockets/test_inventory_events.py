@@ -41,8 +41,10 @@ def test_inventory_event_publisher_publish(monkeypatch):
 
 def test_inventory_event_publisher_publish_batch(monkeypatch):
     from src.websockets.inventory_events import InventoryEventPublisher, InventoryEvent
-    monkeypatch.setattr(InventoryEventPublisher, "publish", lambda e: setattr(e, "published", True))
+    import src.websockets.inventory_event_buffer as buffer_module
+    published = []
+    monkeypatch.setattr(buffer_module, "publish_coalesced", lambda pending: published.append(pending) or len(pending))
     events = [InventoryEvent("SKU-1", "update", 10, 20, 1, "DC-1"), InventoryEvent("SKU-2", "update", 5, 15, 2, "DC-2")]
     InventoryEventPublisher.publish_batch(events)
-    for e in events:
-        assert hasattr(e, "published")
+    assert len(published) == 1
+    assert set(published[0].keys()) == {"SKU-1", "SKU-2"}
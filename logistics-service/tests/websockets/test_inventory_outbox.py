@@ -0,0 +1,245 @@
+"""
+Tests para el outbox transaccional de eventos de inventario.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from src.models.inventory_outbox import InventoryOutboxEvent
+from src.websockets import inventory_outbox
+from src.websockets.inventory_outbox import (
+    InventoryOutboxRelay,
+    cleanup_published,
+    get_outbox_backlog
+)
+
+
+def _pending(db):
+    return InventoryOutboxEvent.query.filter_by(status=InventoryOutboxEvent.STATUS_PENDING).all()
+
+
+class TestRecordOutboxEvent:
+    """El evento se escribe en la transacción del cambio de stock."""
+
+    def test_update_writes_outbox_without_publishing(self, db, sample_inventory):
+        with patch('src.websockets.inventory_events.InventoryEventPublisher.publish') as mock_publish:
+            sample_inventory.update_quantity_available(0)
+            db.session.commit()
+
+        mock_publish.assert_not_called()
+        rows = _pending(db)
+        assert len(rows) == 1
+        assert rows[0].product_sku == sample_inventory.product_sku
+        assert rows[0].change_type == 'out_of_stock'
+        assert rows[0].payload['new_quantity'] == 0
+
+    def test_rollback_discards_event(self, db, sample_inventory):
+        sample_inventory.update_quantity_available(0)
+        db.session.rollback()
+
+        assert _pending(db) == []
+
+    def test_not_significant_change_is_not_recorded(self, db, sample_inventory):
+        sample_inventory.update_quantity_available(sample_inventory.quantity_available)
+        db.session.commit()
+
+        assert _pending(db) == []
+
+    def test_commit_wakes_local_relay(self, db, sample_inventory):
+        relay = InventoryOutboxRelay()
+        with patch.object(inventory_outbox, 'outbox_relay', relay), \
+                patch.object(relay, 'wake') as mock_wake:
+            sample_inventory.update_quantity_available(0)
+            db.session.commit()
+
+        mock_wake.assert_called_once()
+
+
+class TestInventoryOutboxRelay:
+    """Tests del drenado del outbox."""
+
+    def _record(self, db, inventory, quantities):
+        for quantity in quantities:
+            inventory.update_quantity_available(quantity)
+            db.session.commit()
+
+    def test_drain_publishes_in_order_and_marks_rows(self, db, sample_inventory):
+        self._record(db, sample_inventory, [50, 10, 0])
+        published = []
+
+        with patch('src.websockets.inventory_event_buffer.publish_coalesced',
+                   side_effect=lambda pending: published.append(pending) or len(pending)):
+            count = InventoryOutboxRelay(batch_size=2).drain()
+
+        assert count == 3
+        assert _pending(db) == []
+        # Dos lotes; dentro de cada SKU se conserva el orden de escritura
+        assert [p[sample_inventory.product_sku].event_count for p in published] == [2, 1]
+        assert published[1][sample_inventory.product_sku].last_event.new_quantity == 0
+
+        rows = InventoryOutboxEvent.query.order_by(InventoryOutboxEvent.id).all()
+        assert all(row.status == 'published' and row.published_at for row in rows)
+
+    def test_failed_sku_keeps_its_rows_pending(self, db, multiple_inventory_items):
+        sample_inventory = multiple_inventory_items[0]
+        other = next(i for i in multiple_inventory_items if i.product_sku != sample_inventory.product_sku)
+        self._record(db, sample_inventory, [50])
+        self._record(db, other, [0])
+        self._record(db, sample_inventory, [0])
+
+        def publish(pending):
+            if sample_inventory.product_sku in pending:
+                raise RuntimeError('socket caído')
+            return len(pending)
+
+        with patch('src.websockets.inventory_event_buffer.publish_coalesced', side_effect=publish):
+            count = InventoryOutboxRelay().drain()
+
+        assert count == 1
+        pending = _pending(db)
+        assert {row.product_sku for row in pending} == {sample_inventory.product_sku}
+        assert len(pending) == 2
+        assert all(row.attempts == 1 and 'socket caído' in row.last_error for row in pending)
+
+    def test_rows_fail_after_max_attempts(self, db, sample_inventory):
+        self._record(db, sample_inventory, [0])
+        relay = InventoryOutboxRelay(max_attempts=2)
+
+        with patch('src.websockets.inventory_event_buffer.publish_coalesced',
+                   side_effect=RuntimeError('error')):
+            relay.drain()
+            relay.drain()
+
+        row = InventoryOutboxEvent.query.one()
+        assert row.status == 'failed'
+        assert relay.events_failed == 1
+        assert get_outbox_backlog()['failed'] == 1
+
+    def test_drain_empty_outbox(self, db):
+        assert InventoryOutboxRelay().drain() == 0
+
+    def test_rows_are_claimed_and_committed_before_publishing(self, db, sample_inventory):
+        self._record(db, sample_inventory, [0])
+        seen = []
+
+        def publish(pending):
+            # El reclamo ya está confirmado: se ve desde fuera de la transacción del relay
+            with db.engine.connect() as connection:
+                seen.append(connection.execute(
+                    InventoryOutboxEvent.__table__.select().with_only_columns(InventoryOutboxEvent.status)
+                ).scalar())
+            return len(pending)
+
+        with patch('src.websockets.inventory_event_buffer.publish_coalesced', side_effect=publish):
+            assert InventoryOutboxRelay().drain() == 1
+
+        assert seen == ['publishing']
+        row = InventoryOutboxEvent.query.one()
+        assert row.status == 'published' and row.claimed_at is not None
+
+    def test_stale_claims_are_reclaimed(self, db, sample_inventory):
+        self._record(db, sample_inventory, [50, 0])
+        first, second = InventoryOutboxEvent.query.order_by(InventoryOutboxEvent.id).all()
+        first.status, first.claimed_at = 'publishing', datetime.utcnow() - timedelta(minutes=5)
+        second.status, second.claimed_at = 'publishing', datetime.utcnow()
+        db.session.commit()
+
+        with patch('src.websockets.inventory_event_buffer.publish_coalesced',
+                   side_effect=lambda pending: len(pending)):
+            assert InventoryOutboxRelay(claim_timeout=60).drain() == 1
+
+        statuses = [row.status for row in InventoryOutboxEvent.query.order_by(InventoryOutboxEvent.id)]
+        assert statuses == ['published', 'publishing']
+        assert get_outbox_backlog()['pending'] == 1
+
+
+class TestOutboxProducers:
+    """Las reservas de órdenes y de carrito escriben su evento en el outbox."""
+
+    def test_order_reservation_and_release_write_outbox(self, db, sample_inventory):
+        from src.commands.reserve_inventory_for_order import ReserveInventoryForOrder, ReleaseInventoryForOrder
+
+        item = {'product_sku': sample_inventory.product_sku, 'quantity': 5,
+                'distribution_center_id': sample_inventory.distribution_center_id}
+        with patch('src.websockets.websocket_manager.InventoryNotifier.notify_stock_change') as mock_notify:
+            ReserveInventoryForOrder('ORD-1', [item]).execute()
+            ReleaseInventoryForOrder('ORD-1', [item]).execute()
+
+        mock_notify.assert_not_called()
+        rows = InventoryOutboxEvent.query.order_by(InventoryOutboxEvent.id).all()
+        assert [row.change_type for row in rows] == ['reservation', 'reservation_released']
+        assert rows[0].payload['new_quantity'] == rows[0].payload['previous_quantity'] - 5
+        assert rows[0].payload['metadata']['order_id'] == 'ORD-1'
+
+    def test_failed_order_reservation_writes_nothing(self, db, sample_inventory):
+        from src.commands.reserve_inventory_for_order import ReserveInventoryForOrder
+        from src.errors.errors import ConflictError
+
+        items = [{'product_sku': sample_inventory.product_sku, 'quantity': 1,
+                  'distribution_center_id': sample_inventory.distribution_center_id},
+                 {'product_sku': sample_inventory.product_sku, 'quantity': 10 ** 6,
+                  'distribution_center_id': sample_inventory.distribution_center_id}]
+        with pytest.raises(ConflictError):
+            ReserveInventoryForOrder('ORD-2', items).execute()
+
+        assert InventoryOutboxEvent.query.count() == 0
+
+    def test_cart_commands_write_outbox(self, db, sample_inventory):
+        from src.commands.cart_reservations import (
+            ReserveStockCommand, ReleaseStockCommand, ClearUserCartReservationsCommand
+        )
+
+        ReserveStockCommand(sample_inventory.product_sku, 3, 'user-1', 'session-1',
+                            sample_inventory.distribution_center_id).execute()
+        ReleaseStockCommand(sample_inventory.product_sku, 1, 'user-1', 'session-1').execute()
+        ClearUserCartReservationsCommand('user-1', 'session-1').execute()
+
+        rows = InventoryOutboxEvent.query.order_by(InventoryOutboxEvent.id).all()
+        assert [(row.change_type, row.payload['previous_quantity'], row.payload['new_quantity'])
+                for row in rows] == [('reservation', 0, 3), ('reservation_released', 3, 2),
+                                     ('reservation_released', 2, 0)]
+
+    def test_relay_publishes_cart_adjusted_stock(self, db, sample_inventory):
+        from src.commands.cart_reservations import ReserveStockCommand
+
+        result = ReserveStockCommand(sample_inventory.product_sku, 3, 'user-1', 'session-1',
+                                     sample_inventory.distribution_center_id).execute()
+
+        with patch('src.websockets.websocket_manager.InventoryNotifier.notify_stock_changes_batch') as mock_notify:
+            assert InventoryOutboxRelay().drain() == 1
+
+        stock_data = mock_notify.call_args[0][0][0]['stock_data']
+        assert stock_data['total_cart_reserved'] == 3
+        assert stock_data['total_available'] == result['stock_available']
+
+
+class TestOutboxCleanup:
+    """Tests de la limpieza por retención."""
+
+    def test_cleanup_removes_only_old_published(self, db):
+        now = datetime.utcnow()
+        payload = {'product_sku': 'SKU-1', 'change_type': 'sale', 'previous_quantity': 1, 'new_quantity': 0}
+        db.session.add_all([
+            InventoryOutboxEvent(product_sku='SKU-1', change_type='sale', payload=payload,
+                                 status='published', published_at=now - timedelta(hours=48)),
+            InventoryOutboxEvent(product_sku='SKU-1', change_type='sale', payload=payload,
+                                 status='published', published_at=now - timedelta(hours=1)),
+            InventoryOutboxEvent(product_sku='SKU-1', change_type='sale', payload=payload,
+                                 status='pending'),
+        ])
+        db.session.commit()
+
+        assert cleanup_published(retention_hours=24) == 1
+        assert InventoryOutboxEvent.query.count() == 2
+        assert get_outbox_backlog()['pending'] == 1
+
+
+class TestOutboxStatsEndpoint:
+    def test_outbox_stats(self, client, db):
+        response = client.get('/websocket/outbox-stats')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['pending'] == 0
+        assert data['relay'] is None
@@ -0,0 +1,170 @@
+"""
+Tests para el protocolo v2 (deltas con secuencia) de actualizaciones de stock.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from src.websockets import websocket_manager
+from src.websockets.websocket_manager import InventoryNotifier
+from src.websockets.stock_protocol import (
+    StockSequenceTracker,
+    build_snapshots,
+    protocol_room,
+    compact_stock,
+    diff_compact,
+    encode_message,
+    sequence_tracker,
+    msgpack,
+    ENCODING_JSON,
+    ENCODING_MSGPACK
+)
+
+
+def _stock_data(available, reserved=0):
+    return {
+        'product_sku': 'JER-001',
+        'total_available': available - reserved,
+        'total_physical': available,
+        'total_reserved': reserved,
+        'distribution_centers': [
+            {
+                'distribution_center_id': 1,
+                'distribution_center_code': 'DC-001',
+                'distribution_center_name': 'Centro Bogotá',
+                'city': 'Bogotá',
+                'quantity_available': available - reserved,
+                'quantity_physical': available,
+                'quantity_reserved': reserved,
+                'is_low_stock': False,
+                'is_out_of_stock': False
+            }
+        ]
+    }
+
+
+@pytest.fixture(autouse=True)
+def reset_tracker():
+    sequence_tracker.reset()
+    yield
+    sequence_tracker.reset()
+
+
+class TestCompactAndDiff:
+    """Tests del formato compacto y el cálculo de deltas."""
+
+    def test_compact_stock_uses_short_keys(self):
+        compact = compact_stock(_stock_data(100, 10))
+
+        assert compact['ta'] == 90
+        assert compact['tr'] == 10
+        assert compact['c']['1'] == {
+            'k': 'DC-001', 'a': 90, 'p': 100, 'r': 10, 'l': False, 'o': False
+        }
+
+    def test_diff_only_changed_fields(self):
+        previous = compact_stock(_stock_data(100, 10))
+        current = compact_stock(_stock_data(100, 20))
+
+        delta = diff_compact(previous, current)
+
+        assert delta == {'ta': 80, 'tr': 20, 'c': {'1': {'a': 80, 'r': 20}}}
+
+    def test_diff_removed_center(self):
+        previous = compact_stock(_stock_data(100))
+        current = dict(previous, c={})
+
+        assert diff_compact(previous, current) == {'c': {'1': None}}
+
+    def test_diff_no_changes(self):
+        compact = compact_stock(_stock_data(100))
+
+        assert diff_compact(compact, compact) == {}
+
+    def test_diff_ignores_totals_missing_from_current(self):
+        previous = compact_stock(_stock_data(100))
+        current = dict(previous)
+        del current['tp']
+
+        assert diff_compact(previous, current) == {}
+
+
+class TestStockSequenceTracker:
+    """Tests del tracker de secuencias por SKU."""
+
+    def test_untracked_sku_is_ignored(self):
+        tracker = StockSequenceTracker()
+
+        assert tracker.advance('JER-001', compact_stock(_stock_data(100))) is None
+
+    def test_sequence_is_monotonic_and_skips_noop(self):
+        tracker = StockSequenceTracker()
+        tracker.seed('JER-001', compact_stock(_stock_data(100)), ENCODING_JSON)
+
+        first = tracker.advance('JER-001', compact_stock(_stock_data(90)))
+        noop = tracker.advance('JER-001', compact_stock(_stock_data(90)))
+        second = tracker.advance('jer-001', compact_stock(_stock_data(80)))
+
+        assert first[0] == 1
+        assert noop is None
+        assert second[0] == 2
+        assert second[2] == [ENCODING_JSON]
+        assert tracker.snapshot('JER-001')[0] == 2
+
+    def test_partial_update_keeps_previous_totals(self):
+        tracker = StockSequenceTracker()
+        tracker.seed('JER-001', compact_stock(_stock_data(100)), ENCODING_JSON)
+        partial = compact_stock(_stock_data(90))
+        del partial['tp']
+
+        seq, delta, _ = tracker.advance('JER-001', partial)
+
+        assert 'tp' not in delta
+        assert tracker.snapshot('JER-001')[1]['tp'] == 100
+
+
+@pytest.mark.skipif(msgpack is None, reason="msgpack no instalado")
+def test_encode_message_msgpack_roundtrip():
+    message = {'v': 2, 'sku': 'JER-001', 'seq': 3, 'd': {'ta': 5}}
+
+    encoded = encode_message(message, ENCODING_MSGPACK)
+
+    assert isinstance(encoded, bytes)
+    assert msgpack.unpackb(encoded, raw=False) == message
+    assert encode_message(message, ENCODING_JSON) is message
+
+
+class TestProtocolEmission:
+    """Tests de snapshots, deltas y resync emitidos por InventoryNotifier."""
+
+    def test_build_snapshots_seeds_from_db(self, app, sample_inventory):
+        snapshots = build_snapshots(['jer-001', 'NOPE-001'], ENCODING_JSON)
+
+        assert snapshots['JER-001']['seq'] == 0
+        assert snapshots['JER-001']['s']['ta'] == 90
+        assert snapshots['NOPE-001'] == {'seq': 0, 's': {'c': {}}}
+
+    def test_delta_emitted_only_for_tracked_skus(self, app, sample_inventory):
+        build_snapshots(['JER-001'], ENCODING_JSON)
+
+        with patch.object(websocket_manager, 'socketio') as mock_socketio:
+            InventoryNotifier.notify_stock_change('JER-001', _stock_data(100, 30), 'reservation')
+            InventoryNotifier.notify_stock_change('VAC-001', _stock_data(100, 30), 'reservation')
+
+        delta_calls = [c for c in mock_socketio.emit.call_args_list if c[0][0] == 'stock_delta']
+        assert len(delta_calls) == 1
+        message = delta_calls[0][0][1]
+        assert delta_calls[0][1]['room'] == protocol_room('JER-001', ENCODING_JSON)
+        assert message['seq'] == 1
+        assert message['d']['ta'] == 70
+        assert 'k' not in message['d']['c']['1']
+
+    def test_resync_returns_last_broadcast_state(self, app, sample_inventory):
+        build_snapshots(['JER-001'], ENCODING_JSON)
+
+        with patch.object(websocket_manager, 'socketio'):
+            InventoryNotifier.notify_stock_change('JER-001', _stock_data(100, 30), 'reservation')
+
+        snapshot = build_snapshots(['JER-001'])['JER-001']
+        assert snapshot['seq'] == 1
+        assert snapshot['s']['tr'] == 30
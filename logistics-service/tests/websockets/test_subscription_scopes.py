@@ -0,0 +1,248 @@
+"""
+Tests para suscripciones por alcance (centro, categoría y tipo de evento).
+"""
+
+import pytest
+import socketio
+from unittest.mock import patch, Mock
+
+from src.websockets import websocket_manager
+from src.websockets.websocket_manager import InventoryNotifier
+from src.websockets.subscription_scopes import (
+    affected_center_ids,
+    resolve_categories,
+    rooms_for_event,
+    rooms_for_subscription,
+    scope_registry,
+    scope_room
+)
+from src.services.catalog_service_client import CatalogServiceClient
+
+
+@pytest.fixture(autouse=True)
+def reset_registry():
+    scope_registry.reset()
+    yield
+    scope_registry.reset()
+
+
+class TestScopeRooms:
+    """Tests del cálculo de rooms por suscripción y por evento."""
+
+    def test_subscription_without_filters_is_wildcard(self):
+        assert rooms_for_subscription() == ['scope_dc:*|cat:*|ev:*']
+
+    def test_subscription_cartesian_product(self):
+        rooms = rooms_for_subscription([1], ['vacunas '], ['low_stock', 'out_of_stock'])
+
+        assert rooms == [
+            'scope_dc:1|cat:VACUNAS|ev:low_stock',
+            'scope_dc:1|cat:VACUNAS|ev:out_of_stock',
+        ]
+
+    def test_subscription_invalid_event_type(self):
+        with pytest.raises(ValueError):
+            rooms_for_subscription(event_types=['bogus'])
+
+    def test_event_rooms_cover_every_matching_subscription(self):
+        rooms = set(rooms_for_event([1], 'Vacunas', 'low_stock'))
+
+        assert len(rooms) == 8
+        for subscription in (
+            rooms_for_subscription(),
+            rooms_for_subscription([1]),
+            rooms_for_subscription(categories=['Vacunas']),
+            rooms_for_subscription(event_types=['low_stock']),
+            rooms_for_subscription([1], ['Vacunas'], ['low_stock']),
+        ):
+            assert set(subscription) & rooms
+
+        assert not set(rooms_for_subscription([2])) & rooms
+        assert not set(rooms_for_subscription(event_types=['out_of_stock'])) & rooms
+
+    def test_event_rooms_unknown_category(self):
+        rooms = rooms_for_event([1], None, 'sale')
+
+        assert all('|cat:*|' in room for room in rooms)
+
+    def test_affected_center_ids(self):
+        assert affected_center_ids({'updated_center_ids': [1, 2]}) == [1, 2]
+        assert affected_center_ids({'updated_center_id': 3}) == [3]
+        assert affected_center_ids({
+            'distribution_centers': [{'distribution_center_id': 4}, {'distribution_center_id': 5}]
+        }) == [4, 5]
+
+
+class TestExactlyOnceDelivery:
+    """Cada suscriptor recibe el evento una sola vez aunque coincida con varios rooms."""
+
+    def test_overlapping_subscriptions_receive_once(self):
+        server = socketio.Server(async_mode='threading')
+        sent = []
+        server._send_eio_packet = lambda eio_sid, pkt: sent.append(eio_sid)
+
+        def join(eio_sid, rooms):
+            sid = server.manager.connect(eio_sid, '/')
+            for room in rooms:
+                server.manager.enter_room(sid, '/', room)
+
+        join('dc1-dashboard', rooms_for_subscription([1]))
+        join('dc1-and-vacunas', rooms_for_subscription([1]) + rooms_for_subscription(categories=['Vacunas']))
+        join('alerts-only', rooms_for_subscription(event_types=['low_stock', 'out_of_stock']))
+        join('dc2-dashboard', rooms_for_subscription([2]))
+
+        server.emit('stock_updated', {'x': 1}, to=rooms_for_event([1], 'Vacunas', 'low_stock'))
+
+        assert sorted(sent) == ['alerts-only', 'dc1-and-vacunas', 'dc1-dashboard']
+
+
+class TestNotifierRouting:
+    """Tests del enrutamiento de InventoryNotifier por alcance."""
+
+    @patch.object(websocket_manager, 'socketio')
+    def test_categories_not_resolved_without_category_scopes(self, mock_socketio):
+        with patch('src.services.catalog_service_client.CatalogServiceClient.get_product_categories') as mock_lookup:
+            InventoryNotifier.notify_stock_change('JER-001', {'updated_center_id': 1}, 'sale')
+
+        mock_lookup.assert_not_called()
+        rooms = mock_socketio.emit.call_args[1]['to']
+        assert scope_room(1, '*', 'sale') in rooms
+
+    @patch.object(websocket_manager, 'socketio')
+    def test_category_rooms_when_category_scopes_exist(self, mock_socketio):
+        scope_registry.add(rooms_for_subscription(categories=['Vacunas']))
+
+        with patch('src.services.catalog_service_client.CatalogServiceClient.get_product_categories',
+                   return_value={'VAC-001': 'Vacunas'}):
+            InventoryNotifier.notify_stock_change('VAC-001', {'updated_center_id': 1}, 'sale')
+
+        rooms = mock_socketio.emit.call_args[1]['to']
+        assert scope_room(1, 'VACUNAS', 'sale') in rooms
+
+    @patch.object(websocket_manager, 'socketio')
+    def test_request_thread_does_not_wait_for_catalog(self, mock_socketio, app):
+        scope_registry.add(rooms_for_subscription(categories=['Vacunas']))
+        lookups = []
+        threads = []
+        defer = InventoryNotifier._emit_when_categorized
+
+        def lookup(skus, fetch_missing=True, prefetch=True):
+            lookups.append(fetch_missing)
+            return {'VAC-001': 'Vacunas'} if fetch_missing else {}
+
+        with app.test_request_context(), \
+             patch('src.services.catalog_service_client.CatalogServiceClient.get_product_categories',
+                   side_effect=lookup), \
+             patch.object(InventoryNotifier, '_emit_when_categorized',
+                          side_effect=lambda changes: threads.append(defer(changes))):
+            InventoryNotifier.notify_stock_change('VAC-001', {'updated_center_id': 1}, 'sale')
+            threads[0].join(timeout=5)
+
+        # El request solo miró el caché; el hilo consultó el catálogo y emitió
+        # también al room de la categoría
+        assert lookups == [False, True]
+        assert mock_socketio.emit.call_count == 1
+        rooms = mock_socketio.emit.call_args[1]['to']
+        assert scope_room(1, 'VACUNAS', 'sale') in rooms
+        assert scope_room(1, '*', 'sale') in rooms
+
+    @patch.object(websocket_manager, 'socketio')
+    def test_batch_in_request_emits_cached_skus_and_defers_the_rest(self, mock_socketio, app):
+        scope_registry.add(rooms_for_subscription(categories=['Vacunas']))
+        changes = [
+            {'product_sku': 'VAC-001', 'change_type': 'sale', 'stock_data': {'updated_center_id': 1}},
+            {'product_sku': 'JER-001', 'change_type': 'sale', 'stock_data': {'updated_center_id': 1}},
+        ]
+
+        with app.test_request_context(), \
+             patch('src.services.catalog_service_client.CatalogServiceClient.get_product_categories',
+                   return_value={'VAC-001': 'Vacunas'}), \
+             patch.object(InventoryNotifier, '_emit_when_categorized') as mock_defer:
+            InventoryNotifier.notify_stock_changes_batch(changes)
+
+        mock_defer.assert_called_once_with([changes[1]])
+        emitted = [c[0][1]['product_sku'] for c in mock_socketio.emit.call_args_list if c[0][0] == 'stock_updated']
+        assert emitted == ['VAC-001']
+
+
+class TestScopeRegistryLifecycle:
+    """Tests del conteo de suscripciones por categoría al suscribirse y desconectarse."""
+
+    def test_disconnect_releases_category_scopes(self, app):
+        socket_client = websocket_manager.socketio.test_client(app)
+        socket_client.emit('subscribe_scope', {'categories': ['Vacunas']})
+        socket_client.emit('subscribe_scope', {'categories': ['Vacunas']})
+        assert scope_registry.has_category_scopes()
+
+        socket_client.emit('unsubscribe_scope', {'categories': ['Vacunas']})
+        assert not scope_registry.has_category_scopes()
+
+        socket_client.emit('subscribe_scope', {'categories': ['Vacunas'], 'event_types': ['low_stock']})
+        socket_client.disconnect()
+        assert not scope_registry.has_category_scopes()
+
+
+class TestCatalogCategoryCache:
+    """Tests del caché de categorías del cliente de catálogo."""
+
+    @staticmethod
+    def _batch_response(products, not_found=()):
+        response = Mock(status_code=200)
+        response.json.return_value = {'products': products, 'not_found': list(not_found)}
+        return response
+
+    def test_categories_are_cached(self):
+        client = CatalogServiceClient()
+        response = self._batch_response({'VAC-001': {'sku': 'VAC-001', 'category': 'Vacunas'}})
+
+        with patch.object(client.session, 'post', return_value=response) as mock_post:
+            first = client.get_product_categories(['vac-001'])
+            second = client.get_product_categories(['VAC-001'])
+
+        assert first == second == {'VAC-001': 'Vacunas'}
+        assert mock_post.call_count == 1
+
+    def test_missing_skus_resolved_in_one_batch_call(self):
+        client = CatalogServiceClient()
+        response = self._batch_response({
+            'VAC-001': {'sku': 'VAC-001', 'category': 'Vacunas'},
+            'JER-001': {'sku': 'JER-001', 'category': 'Jeringas'},
+        }, not_found=['NOPE'])
+
+        with patch.object(client.session, 'post', return_value=response) as mock_post:
+            result = client.get_product_categories(['VAC-001', 'JER-001', 'NOPE'])
+
+        assert result == {'VAC-001': 'Vacunas', 'JER-001': 'Jeringas', 'NOPE': None}
+        assert mock_post.call_count == 1
+        assert sorted(mock_post.call_args[1]['json']['skus']) == ['JER-001', 'NOPE', 'VAC-001']
+
+    def test_not_found_is_cached_as_none(self):
+        client = CatalogServiceClient()
+
+        with patch.object(client.session, 'post', return_value=self._batch_response({}, ['NOPE'])) as mock_post:
+            client.get_product_categories(['NOPE'])
+            result = client.get_product_categories(['NOPE'])
+
+        assert result == {'NOPE': None}
+        assert mock_post.call_count == 1
+
+    def test_errors_are_not_cached(self):
+        import requests
+        client = CatalogServiceClient()
+
+        with patch.object(client.session, 'post', side_effect=requests.exceptions.ConnectionError()):
+            assert client.get_product_categories(['VAC-001']) == {'VAC-001': None}
+        assert client._category_cache == {}
+
+    def test_non_blocking_lookup_prefetches_in_background(self):
+        client = CatalogServiceClient()
+
+        with patch.object(client, '_prefetch_categories') as mock_prefetch, \
+             patch.object(client.session, 'post') as mock_post:
+            assert client.get_product_categories(['VAC-001'], fetch_missing=False) == {}
+
+        mock_post.assert_not_called()
+        mock_prefetch.assert_called_once_with(['VAC-001'])
+
+    def test_resolve_categories_skips_lookup_without_scopes(self):
+        assert resolve_categories(['VAC-001']) == {}
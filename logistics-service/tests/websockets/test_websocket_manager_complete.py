@@ -143,19 +143,17 @@ class TestInventoryNotifier:
             change_type='update'
         )
         
-        # Verificar que se llamó emit dos veces (room específico + global)
-        assert mock_socketio.emit.call_count == 2
-        
-        # Verificar primer llamado (room específico)
-        first_call = mock_socketio.emit.call_args_list[0]
-        assert first_call[0][0] == 'stock_updated'
-        assert 'product_sku' in first_call[0][1]
-        assert first_call[0][1]['product_sku'] == 'JER-001'
-        assert first_call[1]['room'] == 'product_JER-001'
-        
-        # Verificar segundo llamado (room global)
-        second_call = mock_socketio.emit.call_args_list[1]
-        assert second_call[1]['room'] == 'all_inventory_updates'
+        # Un solo emit a room específico + global + rooms de alcance
+        assert mock_socketio.emit.call_count == 1
+        
+        call = mock_socketio.emit.call_args_list[0]
+        assert call[0][0] == 'stock_updated'
+        assert 'product_sku' in call[0][1]
+        assert call[0][1]['product_sku'] == 'JER-001'
+        rooms = call[1]['to']
+        assert rooms[0] == 'product_JER-001'
+        assert rooms[1] == 'all_inventory_updates'
+        assert 'scope_dc:*|cat:*|ev:update' in rooms
 
     @patch('src.websockets.websocket_manager.socketio')
     def test_notify_stock_change_payload_structure(self, mock_socketio):
@@ -244,8 +242,8 @@ class TestInventoryNotifier:
         
         InventoryNotifier.notify_multiple_stock_changes(changes)
         
-        # Debe llamar emit múltiples veces (2 por cada cambio: room específico + global)
-        expected_calls = len(changes) * 2
+        # Un emit por cambio (room específico + global + alcance en la misma llamada)
+        expected_calls = len(changes)
         assert mock_socketio.emit.call_count == expected_calls
 
 
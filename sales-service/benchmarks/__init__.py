@@ -0,0 +1,6 @@
+"""
+Benchmarks del servicio de ventas.
+
+Se ejecutan desde la raíz del servicio, p. ej.:
+    python -m benchmarks.bench_orders_batch
+"""
@@ -0,0 +1,207 @@
+"""
+Benchmark: latencia de checkout (POST /orders) con pedidos de 30 líneas.
+
+Levanta dos servidores HTTP locales que hacen de catálogo y logística (con una
+latencia fija por petición) y mide p50/p99 de POST /orders con:
+
+- serie: validación anterior, un GET de producto y uno de stock por línea,
+  cada uno con requests.get (conexión nueva por llamada)
+- paralelo, caché fría: productos en paralelo sobre la sesión compartida y
+  el stock de todos los SKUs en una llamada; la caché de productos se vacía
+  antes de cada pedido
+- paralelo, caché caliente: igual, con los productos ya en caché (TTL vigente)
+- paralelo, revalidación: caché vencida, el catálogo responde 304 por ETag
+
+Uso:
+    python -m benchmarks.bench_checkout --orders 50 --lines 30 --latency-ms 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from src.main import create_app
+from src.session import db
+from src.models.customer import Customer
+from src.services import integration_service
+from src.services.integration_service import IntegrationService, get_product_cache, shutdown_integration
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    """Catálogo y logística mínimos: responden lo que consume IntegrationService."""
+
+    protocol_version = 'HTTP/1.1'
+    latency = 0.005
+    requests_served = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=None, headers=None):
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _count(self):
+        time.sleep(self.latency)
+        with _StandIn.lock:
+            _StandIn.requests_served += 1
+
+    def do_GET(self):
+        self._count()
+        url = urlparse(self.path)
+        if url.path.startswith('/products/'):
+            sku = url.path.rsplit('/', 1)[1]
+            etag = f'"{sku}-v1"'
+            if self.headers.get('If-None-Match') == etag:
+                return self._send(304, headers={'ETag': etag})
+            return self._send(200, {'sku': sku, 'name': f'Producto {sku}', 'unit_price': 1000.0,
+                                    'is_active': True}, {'ETag': etag})
+
+        query = parse_qs(url.query)
+        skus = query['product_skus'][0].split(',') if 'product_skus' in query else query['product_sku']
+        products = [
+            {'product_sku': sku, 'total_physical_stock': 500, 'total_reserved_in_carts': 0,
+             'total_available_for_purchase': 500,
+             'distribution_centers': [{'distribution_center_code': 'CEDIS-BOG', 'available_for_purchase': 500}]}
+            for sku in skus
+        ]
+        self._send(200, products[0] if len(products) == 1 else {'products': products,
+                                                                 'total_products': len(products)})
+
+    def do_POST(self):
+        self._count()
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self._send(200, {'items_reserved': []})
+
+
+def _serial_validate(self, items, preferred_distribution_center=None):
+    """Validación anterior: dos requests.get por línea, en serie."""
+    validated_items = []
+    for item in items:
+        product = requests.get(f"{self.catalog_service_url}/products/{item['product_sku']}",
+                               timeout=self.timeout).json()
+        stock = requests.get(f"{self.logistics_service_url}/cart/stock/realtime",
+                             params={'product_sku': item['product_sku']}, timeout=self.timeout).json()
+        stock_info = self._evaluate_stock(item['product_sku'], item['quantity'], stock, preferred_distribution_center)
+        validated_items.append({
+            'product_sku': item['product_sku'],
+            'product_name': product.get('name'),
+            'quantity': item['quantity'],
+            'unit_price': product.get('unit_price', 0.0),
+            'stock_confirmed': True,
+            'distribution_center_code': stock_info['selected_distribution_center'],
+            'product_data': product,
+            'stock_data': stock_info
+        })
+    return validated_items
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def run(orders, lines, latency_ms):
+    _StandIn.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ['CATALOG_SERVICE_URL'] = base_url
+    os.environ['LOGISTICS_SERVICE_URL'] = base_url
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench_checkout.db')
+    app = create_app(config={
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+    })
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+        customer = Customer(document_type='NIT', document_number='900123456', business_name='Farmacia Bench',
+                            customer_type='farmacia', city='Bogotá', is_active=True)
+        db.session.add(customer)
+        db.session.commit()
+        customer_id = customer.id
+
+    def checkout(n):
+        return client.post('/orders', json={
+            'customer_id': customer_id,
+            'seller_id': 'SELLER-B',
+            'items': [{'product_sku': f'SKU-{(n * 7 + line) % 400:03d}', 'quantity': 2} for line in range(lines)]
+        })
+
+    def measure(before_each=None):
+        timings, served = [], []
+        for n in range(orders):
+            if before_each:
+                before_each()
+            start_served = _StandIn.requests_served
+            started = time.perf_counter()
+            response = checkout(n)
+            timings.append((time.perf_counter() - started) * 1000)
+            served.append(_StandIn.requests_served - start_served)
+            assert response.status_code == 201, response.get_json()
+        return {
+            'p50': _percentile(timings, 0.5),
+            'p99': _percentile(timings, 0.99),
+            'calls': statistics.mean(served),
+        }
+
+    def expire_cache():
+        cache = get_product_cache()
+        for sku, (product, etag, _) in list(cache._entries.items()):
+            cache._entries[sku] = (product, etag, 0)
+
+    results = {}
+    with patch.object(IntegrationService, 'validate_order_items', _serial_validate):
+        results['serial'] = measure()
+
+    shutdown_integration()
+    results['cold'] = measure(before_each=shutdown_integration)
+    shutdown_integration()
+    for n in range(orders):
+        checkout(n)
+    results['warm'] = measure()
+    results['revalidate'] = measure(before_each=expire_cache)
+
+    server.shutdown()
+    shutdown_integration()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--orders', type=int, default=50)
+    parser.add_argument('--lines', type=int, default=30)
+    parser.add_argument('--latency-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    results = run(args.orders, args.lines, args.latency_ms)
+    print(f"{args.orders} pedidos de {args.lines} líneas, latencia de catálogo/logística "
+          f"{args.latency_ms} ms, {integration_service._max_workers()} hilos")
+    labels = {
+        'serial': 'serie (2 GET por línea, sin keep-alive)',
+        'cold': 'paralelo + stock por lotes, caché fría',
+        'warm': 'paralelo + stock por lotes, caché caliente',
+        'revalidate': 'paralelo + stock por lotes, revalidación ETag',
+    }
+    for name, r in results.items():
+        print(f"  {labels[name]}: p50 {r['p50']:.1f} ms, p99 {r['p99']:.1f} ms, "
+              f"{r['calls']:.0f} llamadas HTTP por pedido")
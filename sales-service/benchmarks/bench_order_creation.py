@@ -0,0 +1,152 @@
+"""
+Prueba de carga: creación concurrente de órdenes.
+
+Con catálogo y logística simulados (ver bench_checkout) y una base SQLite en
+archivo, varios hilos crean órdenes a la vez:
+
+- numeración anterior (COUNT(*) de las órdenes del día + 1) vía POST /orders:
+  los checkouts simultáneos obtienen el mismo número y fallan por la
+  restricción única
+- contador por día vía POST /orders
+- POST /orders/bulk: cada hilo envía sus órdenes en un solo lote
+
+Reporta órdenes creadas, fallidas, órdenes/s y p50/p99 por petición.
+
+Uso:
+    python -m benchmarks.bench_order_creation --threads 8 --orders 25 --lines 10
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import ThreadingHTTPServer
+from unittest.mock import patch
+
+from sqlalchemy.exc import IntegrityError
+
+from benchmarks.bench_checkout import _StandIn, _percentile
+from src.commands.create_order import CreateOrder
+from src.main import create_app
+from src.models.customer import Customer
+from src.models.order import Order
+from src.services.integration_service import shutdown_integration
+from src.session import db
+
+
+def _count_based_order_number(self):
+    """Numeración anterior: cuenta las órdenes del día."""
+    today = datetime.utcnow().strftime('%Y%m%d')
+    count = Order.query.filter(Order.order_number.like(f'ORD-{today}-%')).count()
+    return f'ORD-{today}-{str(count + 1).zfill(4)}'
+
+
+def _order(customer_id, n, lines):
+    return {
+        'customer_id': customer_id,
+        'seller_id': 'SELLER-LOAD',
+        'items': [{'product_sku': f'SKU-{(n + line) % 200:03d}', 'quantity': 1} for line in range(lines)]
+    }
+
+
+def _run(app, threads, orders, lines, customer_id, bulk):
+    timings, statuses = [], []
+    lock = threading.Lock()
+
+    def worker(thread):
+        client = app.test_client()
+        payloads = [_order(customer_id, thread * orders + n, lines) for n in range(orders)]
+        requests_ = [('/orders/bulk', {'orders': payloads})] if bulk else [('/orders', p) for p in payloads]
+        for url, payload in requests_:
+            started = time.perf_counter()
+            try:
+                response = client.post(url, json=payload)
+            except IntegrityError:
+                # TESTING propaga la excepción: número de orden duplicado
+                response = None
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                timings.append(elapsed)
+                if response is None:
+                    statuses.append(False)
+                elif bulk:
+                    body = response.get_json(silent=True) or {}
+                    statuses.extend(r['status'] == 'created' for r in body.get('results', []))
+                else:
+                    statuses.append(response.status_code == 201)
+
+    with app.app_context():
+        before = Order.query.count()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    seconds = time.perf_counter() - started
+    with app.app_context():
+        stored = Order.query.count() - before
+
+    return {
+        'created': sum(statuses),
+        'failed': len(statuses) - sum(statuses),
+        'stored': stored,
+        'orders_per_second': stored / seconds,
+        'p50': _percentile(timings, 0.5),
+        'p99': _percentile(timings, 0.99),
+    }
+
+
+def run(threads, orders, lines, latency_ms):
+    _StandIn.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ['CATALOG_SERVICE_URL'] = os.environ['LOGISTICS_SERVICE_URL'] = \
+        f"http://127.0.0.1:{server.server_address[1]}"
+
+    results = {}
+    for name in ['count', 'counter', 'bulk']:
+        shutdown_integration()
+        path = os.path.join(tempfile.mkdtemp(), f'bench_orders_{name}.db')
+        app = create_app(config={
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        })
+        with app.app_context():
+            db.create_all()
+            customer = Customer(document_type='NIT', document_number='900555000', business_name='Hospital Carga',
+                                customer_type='hospital', city='Bogotá', is_active=True)
+            db.session.add(customer)
+            db.session.commit()
+            customer_id = customer.id
+
+        if name == 'count':
+            with patch.object(CreateOrder, '_generate_order_number', _count_based_order_number):
+                results[name] = _run(app, threads, orders, lines, customer_id, bulk=False)
+        else:
+            results[name] = _run(app, threads, orders, lines, customer_id, bulk=name == 'bulk')
+
+    server.shutdown()
+    shutdown_integration()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--orders', type=int, default=25, help='órdenes por hilo')
+    parser.add_argument('--lines', type=int, default=10)
+    parser.add_argument('--latency-ms', type=float, default=2)
+    args = parser.parse_args()
+
+    results = run(args.threads, args.orders, args.lines, args.latency_ms)
+    print(f"{args.threads} hilos x {args.orders} órdenes de {args.lines} líneas")
+    labels = {
+        'count': 'POST /orders, numeración por COUNT(*)',
+        'counter': 'POST /orders, contador por día',
+        'bulk': 'POST /orders/bulk (un lote por hilo)',
+    }
+    for name, r in results.items():
+        print(f"  {labels[name]}: {r['stored']} creadas, {r['failed']} fallidas, "
+              f"{r['orders_per_second']:.0f} órdenes/s, p50 {r['p50']:.1f} ms, p99 {r['p99']:.1f} ms por petición")
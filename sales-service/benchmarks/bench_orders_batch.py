@@ -0,0 +1,142 @@
+"""
+Benchmark: latencia de POST /orders/batch para 1.000 órdenes.
+
+Compara, sobre una base SQLite con N órdenes de C clientes y I ítems cada una:
+- orm: carga de objetos Order + to_dict(include_items=True, include_customer=True)
+  (implementación anterior, reproducida aquí: ítems `lazy='dynamic'`, cliente
+  y vendedor lazy, 2-3 consultas extra por orden)
+- batch: GetOrdersBatch (3 consultas + serialización por columnas)
+- endpoint: POST /orders/batch completo (incluye jsonify)
+
+Uso:
+    python -m benchmarks.bench_orders_batch --orders 1000 --items 5 --customers 100 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from src.main import create_app
+from src.session import db
+from src.models.customer import Customer
+from src.models.order import Order
+from src.models.order_item import OrderItem
+from src.entities.salesperson import Salesperson
+from src.commands.get_orders_batch import GetOrdersBatch
+
+
+def _seed(orders, items, customers):
+    salesperson = Salesperson(employee_id='SELLER-B', first_name='Ana', last_name='Ruiz',
+                              email='ana.ruiz@medisupply.com', is_active=True)
+    db.session.add(salesperson)
+    db.session.flush()
+
+    now = datetime.utcnow()
+    db.session.execute(Customer.__table__.insert(), [
+        {
+            'document_type': 'NIT', 'document_number': f'900{n:06d}', 'business_name': f'Cliente {n}',
+            'customer_type': 'farmacia', 'city': 'Bogotá', 'latitude': Decimal('4.65'),
+            'longitude': Decimal('-74.05'), 'credit_limit': Decimal('1000000'), 'credit_days': 30,
+            'salesperson_id': salesperson.id if n % 2 else None, 'is_active': True,
+            'created_at': now, 'updated_at': now
+        }
+        for n in range(customers)
+    ])
+    customer_ids = db.session.execute(db.select(Customer.id)).scalars().all()
+
+    db.session.execute(Order.__table__.insert(), [
+        {
+            'order_number': f'ORD-B-{n:06d}', 'customer_id': customer_ids[n % len(customer_ids)],
+            'seller_id': 'SELLER-B', 'order_date': now - timedelta(minutes=n), 'status': 'confirmed',
+            'subtotal': Decimal('1000.00'), 'discount_amount': Decimal('0.00'), 'tax_amount': Decimal('190.00'),
+            'total_amount': Decimal('1190.00'), 'delivery_latitude': Decimal('4.68250000'),
+            'delivery_longitude': Decimal('-74.05430000'), 'created_at': now, 'updated_at': now
+        }
+        for n in range(orders)
+    ])
+    order_ids = db.session.execute(db.select(Order.id)).scalars().all()
+
+    db.session.execute(OrderItem.__table__.insert(), [
+        {
+            'order_id': order_id, 'product_sku': f'SKU-{line:03d}', 'product_name': f'Producto {line}',
+            'quantity': line + 1, 'unit_price': Decimal('100.00'), 'discount_percentage': Decimal('0.00'),
+            'discount_amount': Decimal('0.00'), 'tax_percentage': Decimal('19.00'), 'tax_amount': Decimal('19.00'),
+            'subtotal': Decimal('100.00'), 'total': Decimal('119.00'), 'stock_confirmed': True, 'created_at': now
+        }
+        for order_id in order_ids for line in range(items)
+    ])
+    db.session.commit()
+    return order_ids
+
+
+def _orm(order_ids):
+    orders = db.session.query(Order).filter(Order.id.in_(order_ids)).all()
+    return [order.to_dict(include_items=True, include_customer=True) for order in orders]
+
+
+def _measure(fn, repeat):
+    statements = []
+
+    def count(*_):
+        statements.append(1)
+
+    timings = []
+    for _ in range(repeat):
+        db.session.expire_all()
+        statements.clear()
+        event.listen(db.engine, 'before_cursor_execute', count)
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+        event.remove(db.engine, 'before_cursor_execute', count)
+    return statistics.median(timings), len(statements)
+
+
+def run(orders, items, customers, repeat):
+    path = os.path.join(tempfile.mkdtemp(), 'bench_orders_batch.db')
+    app = create_app(config={
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+    })
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        order_ids = _seed(orders, items, customers)
+
+        results = {
+            'orm': _measure(lambda: _orm(order_ids), repeat),
+            'batch': _measure(lambda: GetOrdersBatch(order_ids).execute(), repeat),
+            'endpoint': _measure(lambda: client.post('/orders/batch', json={'order_ids': order_ids}), repeat),
+        }
+        db.session.expire_all()
+        assert sorted(_orm(order_ids), key=lambda o: o['id']) == \
+            sorted(GetOrdersBatch(order_ids).execute()['orders'], key=lambda o: o['id'])
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--orders', type=int, default=1000)
+    parser.add_argument('--items', type=int, default=5)
+    parser.add_argument('--customers', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.orders, args.items, args.customers, args.repeat)
+    print(f"{args.orders} órdenes x {args.items} ítems, {args.customers} clientes (mediana de {args.repeat})")
+    labels = {
+        'orm': 'ORM + to_dict (anterior)',
+        'batch': 'GetOrdersBatch (3 consultas, columnar)',
+        'endpoint': 'POST /orders/batch (con jsonify)',
+    }
+    for name, (ms, queries) in results.items():
+        print(f"  {labels[name]}: {ms:.1f} ms, {queries} consultas")
@@ -0,0 +1,106 @@
+"""
+Benchmark: exportaciones del reporte de ventas (Excel, PDF, CSV).
+
+Para cada tamaño (filas de sales_daily_rollups en una base SQLite) mide el
+tiempo de generación en frío, el pico de memoria Python (tracemalloc, en una
+segunda pasada sin caché) y el tiempo servido desde la caché de exportaciones. Con escritura por streaming el
+pico de memoria debe mantenerse casi igual aunque crezcan las filas.
+
+Uso:
+    python -m benchmarks.bench_report_exports --rows 20000 100000 --repeat 3
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from src.commands.export_sales_report import ExportSalesReport
+from src.entities.salesperson import Salesperson
+from src.main import create_app
+from src.models.sales_daily_rollup import SalesDailyRollup
+from src.session import db
+
+SELLERS = 50
+PRODUCTS = 400
+CHUNK = 50000
+
+
+def _seed(rows):
+    now = datetime.utcnow()
+    db.session.execute(Salesperson.__table__.insert(), [
+        {'employee_id': f'EMP-{n:03d}', 'first_name': 'Vendedor', 'last_name': f'{n}',
+         'email': f'vendedor{n}@medisupply.com', 'territory': f'Territorio {n % 5}', 'is_active': True,
+         'role': 'salesperson', 'created_at': now, 'updated_at': now}
+        for n in range(SELLERS)
+    ])
+    per_day = SELLERS * PRODUCTS
+    for first in range(0, rows, CHUNK):
+        db.session.execute(SalesDailyRollup.__table__.insert(), [
+            {'day': date(2025, 1, 1) + timedelta(days=n // per_day), 'seller_id': f'EMP-{seller:03d}',
+             'status': 'delivered', 'product_sku': f'SKU-{sku:05d}', 'product_name': f'Producto {sku:05d}',
+             'quantity': 1 + n % 7, 'total': Decimal(1190 * (1 + n % 7)), 'item_count': 1, 'updated_at': now}
+            for n in range(first, min(first + CHUNK, rows))
+            for seller, sku in [(n % per_day // PRODUCTS, n % PRODUCTS)]
+        ])
+    db.session.commit()
+
+
+def _cold(export_format, cache_dir):
+    """Tiempo de la primera exportación y pico de memoria de una segunda con la caché vacía."""
+    started = time.perf_counter()
+    result = ExportSalesReport(export_format).execute()
+    elapsed = (time.perf_counter() - started) * 1000
+    size_mb = os.path.getsize(result['path']) / 1024 / 1024
+
+    for name in os.listdir(cache_dir):
+        os.remove(os.path.join(cache_dir, name))
+    tracemalloc.start()
+    ExportSalesReport(export_format).execute()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024, size_mb
+
+
+def run(rows, repeat):
+    cache_dir = tempfile.mkdtemp()
+    path = os.path.join(tempfile.mkdtemp(), 'bench_report_exports.db')
+    app = create_app(config={
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'EXPORT_CACHE_DIR': cache_dir,
+        'EXPORT_ASYNC_MIN_ROWS': rows + 1,
+        'EXPORT_PDF_MAX_ROWS': rows,
+    })
+    results = {}
+    with app.app_context():
+        _seed(rows)
+        for export_format in ['excel', 'pdf', 'csv']:
+            elapsed, peak_mb, size_mb = _cold(export_format, cache_dir)
+            cached = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                ExportSalesReport(export_format).execute()
+                cached.append((time.perf_counter() - started) * 1000)
+            results[export_format] = {'cold': elapsed, 'peak_mb': peak_mb, 'size_mb': size_mb,
+                                      'cached': statistics.median(cached)}
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        r = run(rows, args.repeat)
+        print(f"{rows:,} filas")
+        for export_format, x in r.items():
+            print(f"  {export_format}: {x['cold']:.0f} ms en frío, pico {x['peak_mb']:.1f} MB, "
+                  f"archivo {x['size_mb']:.1f} MB, desde caché {x['cached']:.1f} ms")
@@ -0,0 +1,144 @@
+"""
+Benchmark: /reports/sales-by-salesperson y /reports/sales-by-product.
+
+Sobre una base SQLite con N filas de resumen (sales_daily_rollups con S
+vendedores, P productos y los días necesarios) compara:
+
+- regroup: GetSalesSummaryReport + reagrupación en Python de los blueprints
+  anteriores (reproducida aquí; la de productos revisaba la lista de
+  vendedores en cada fila)
+- sql: GetSalesBySalespersonReport / GetSalesByProductReport (GROUP BY por
+  nivel y armado en una pasada)
+- endpoint: GET completo (incluye jsonify)
+
+Uso:
+    python -m benchmarks.bench_sales_grouped_reports --rows 100000 --sellers 100 --products 500 --repeat 3
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from src.commands.get_sales_by_product_report import GetSalesByProductReport
+from src.commands.get_sales_by_salesperson_report import GetSalesBySalespersonReport
+from src.commands.get_sales_summary_report import GetSalesSummaryReport
+from src.entities.salesperson import Salesperson
+from src.main import create_app
+from src.models.sales_daily_rollup import SalesDailyRollup
+from src.session import db
+
+CHUNK = 50000
+
+
+def _seed(rows, sellers, products):
+    now = datetime.utcnow()
+    db.session.execute(Salesperson.__table__.insert(), [
+        {'employee_id': f'EMP-{n:04d}', 'first_name': 'Vendedor', 'last_name': f'{n}',
+         'email': f'vendedor{n}@medisupply.com', 'territory': f'Territorio {n % 5}', 'is_active': True,
+         'role': 'salesperson', 'created_at': now, 'updated_at': now}
+        for n in range(sellers)
+    ])
+    per_day = sellers * products
+    for first in range(0, rows, CHUNK):
+        db.session.execute(SalesDailyRollup.__table__.insert(), [
+            {'day': date(2025, 1, 1) + timedelta(days=n // per_day), 'seller_id': f'EMP-{seller:04d}',
+             'status': 'delivered', 'product_sku': f'SKU-{sku:05d}', 'product_name': f'Producto {sku:05d}',
+             'quantity': 1 + (seller + sku) % 7, 'total': Decimal(1190 * (1 + (seller + sku) % 7)), 'item_count': 1}
+            for n in range(first, min(first + CHUNK, rows))
+            for seller, sku in [(n % per_day // products, n % products)]
+        ])
+    db.session.commit()
+
+
+def _regroup_by_salesperson():
+    """Blueprint anterior de /sales-by-salesperson."""
+    result = GetSalesSummaryReport().execute()
+    salesperson_summary = {}
+    for item in result['summary']:
+        emp_id = item['employee_id']
+        if emp_id not in salesperson_summary:
+            salesperson_summary[emp_id] = {
+                'employee_id': emp_id, 'vendedor': item['vendedor'], 'region': item['region'],
+                'territory': item['territory'], 'total_ventas': 0, 'total_valor': 0.0, 'productos_vendidos': []
+            }
+        salesperson_summary[emp_id]['total_ventas'] += item['volumen_ventas']
+        salesperson_summary[emp_id]['total_valor'] += item['valor_total']
+        salesperson_summary[emp_id]['productos_vendidos'].append({
+            'product_sku': item['product_sku'], 'product_name': item['product_name'],
+            'cantidad': item['volumen_ventas'], 'valor': item['valor_total']
+        })
+    return list(salesperson_summary.values())
+
+
+def _regroup_by_product():
+    """Blueprint anterior de /sales-by-product."""
+    result = GetSalesSummaryReport().execute()
+    product_summary = {}
+    for item in result['summary']:
+        sku = item['product_sku']
+        if sku not in product_summary:
+            product_summary[sku] = {
+                'product_sku': sku, 'product_name': item['product_name'],
+                'total_cantidad': 0, 'total_valor': 0.0, 'vendedores': []
+            }
+        product_summary[sku]['total_cantidad'] += item['volumen_ventas']
+        product_summary[sku]['total_valor'] += item['valor_total']
+        if item['employee_id'] not in [v['employee_id'] for v in product_summary[sku]['vendedores']]:
+            product_summary[sku]['vendedores'].append({'employee_id': item['employee_id'], 'vendedor': item['vendedor']})
+    return list(product_summary.values())
+
+
+def _timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def run(rows, sellers, products, repeat):
+    path = os.path.join(tempfile.mkdtemp(), 'bench_sales_grouped_reports.db')
+    app = create_app(config={
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+    })
+    client = app.test_client()
+    results = {}
+    with app.app_context():
+        _seed(rows, sellers, products)
+
+        regroup_ms, old = _timed(_regroup_by_salesperson, repeat)
+        sql_ms, new = _timed(lambda: GetSalesBySalespersonReport().execute()['salespersons'], repeat)
+        endpoint_ms, _ = _timed(lambda: client.get('/reports/sales-by-salesperson'), repeat)
+        assert {(s['employee_id'], s['total_ventas']) for s in old} == {(s['employee_id'], s['total_ventas']) for s in new}
+        results['salesperson'] = {'regroup': regroup_ms, 'sql': sql_ms, 'endpoint': endpoint_ms, 'groups': len(new)}
+
+        regroup_ms, old = _timed(_regroup_by_product, repeat)
+        sql_ms, new = _timed(lambda: GetSalesByProductReport().execute()['products'], repeat)
+        endpoint_ms, _ = _timed(lambda: client.get('/reports/sales-by-product'), repeat)
+        assert {(p['product_sku'], p['total_cantidad'], len(p['vendedores'])) for p in old} == \
+            {(p['product_sku'], p['total_cantidad'], len(p['vendedores'])) for p in new}
+        results['product'] = {'regroup': regroup_ms, 'sql': sql_ms, 'endpoint': endpoint_ms, 'groups': len(new)}
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--sellers', type=int, default=100)
+    parser.add_argument('--products', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    r = run(args.rows, args.sellers, args.products, args.repeat)
+    print(f"{args.rows:,} filas de resumen ({args.sellers} vendedores, {args.products} productos)")
+    for label, title in [('salesperson', 'por vendedor'), ('product', 'por producto')]:
+        x = r[label]
+        print(f"  {title} ({x['groups']:,} grupos): reagrupar {x['regroup']:.0f} ms, "
+              f"SQL {x['sql']:.0f} ms, endpoint {x['endpoint']:.0f} ms")
@@ -0,0 +1,197 @@
+"""
+Benchmark: reportes de ventas servidos desde sales_daily_rollups.
+
+Sobre una base SQLite con N ítems de pedido (por defecto 5 millones, 10 por
+orden, 2 años, 20 vendedores, 500 productos) compara:
+
+- join: consulta anterior de GetSalesSummaryReport (orders × order_items ×
+  salespersons ⟕ salesperson_goals, con extract() de mes/año y
+  func.date(order_date); reproducida aquí con el mismo formato de filas)
+- rollups: GetSalesSummaryReport actual (rangos de fechas sobre los rollups)
+- endpoint: GET /reports/sales-summary completo
+
+Mide además el backfill (RebuildSalesRollups) y el costo del mantenimiento
+incremental al confirmar una orden de 10 líneas.
+
+Uso:
+    python -m benchmarks.bench_sales_rollups --items 5000000 --repeat 3
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from sqlalchemy import extract, func
+
+from src.commands.get_sales_summary_report import GetSalesSummaryReport
+from src.commands.rebuild_sales_rollups import RebuildSalesRollups
+from src.entities.salesperson import Salesperson
+from src.entities.salesperson_goal import SalespersonGoal
+from src.main import create_app
+from src.models.customer import Customer
+from src.models.order import Order
+from src.models.order_item import OrderItem
+from src.services.sales_rollups import init_sales_rollups, shutdown_sales_rollups
+from src.session import db
+
+SELLERS = 20
+PRODUCTS = 500
+CHUNK = 50000
+START = datetime(2024, 1, 1)
+
+
+def _seed(items, items_per_order):
+    now = datetime.utcnow()
+    db.session.add(Customer(document_type='NIT', document_number='900000001', business_name='Cliente',
+                            customer_type='hospital', city='Bogotá', is_active=True))
+    db.session.execute(Salesperson.__table__.insert(), [
+        {'employee_id': f'EMP-{n:03d}', 'first_name': 'Vendedor', 'last_name': f'{n}',
+         'email': f'vendedor{n}@medisupply.com', 'territory': f'Territorio {n % 5}', 'is_active': True,
+         'role': 'salesperson', 'created_at': now, 'updated_at': now}
+        for n in range(SELLERS)
+    ])
+    db.session.execute(SalespersonGoal.__table__.insert(), [
+        {'id_vendedor': f'EMP-{n:03d}', 'id_producto': f'SKU-{(n * 37 + k) % PRODUCTS:04d}',
+         'region': ['Norte', 'Sur', 'Este', 'Oeste'][k % 4], 'trimestre': 'Q4', 'valor_objetivo': 1000.0,
+         'tipo': 'unidades' if k % 2 else 'monetario', 'created_at': now, 'updated_at': now}
+        for n in range(SELLERS) for k in range(20)
+    ])
+    db.session.commit()
+
+    rng = random.Random(7)
+    orders = items // items_per_order
+    span = (datetime(2025, 12, 31) - START).total_seconds()
+    for first in range(0, orders, CHUNK):
+        ids = range(first + 1, min(first + CHUNK, orders) + 1)
+        db.session.execute(Order.__table__.insert(), [
+            {'id': order_id, 'order_number': f'ORD-R-{order_id:07d}', 'customer_id': 1,
+             'seller_id': f'EMP-{order_id % SELLERS:03d}', 'status': rng.choices(['delivered', 'confirmed', 'cancelled'], [90, 8, 2])[0],
+             'order_date': START + timedelta(seconds=rng.random() * span), 'subtotal': Decimal('0'),
+             'total_amount': Decimal('0'), 'created_at': now, 'updated_at': now}
+            for order_id in ids
+        ])
+        db.session.execute(OrderItem.__table__.insert(), [
+            {'order_id': order_id, 'product_sku': f'SKU-{sku:04d}', 'product_name': f'Producto {sku:04d}',
+             'quantity': quantity, 'unit_price': Decimal('1000.00'), 'subtotal': Decimal(1000 * quantity),
+             'total': Decimal(1190 * quantity), 'stock_confirmed': True, 'created_at': now}
+            for order_id in ids
+            for sku, quantity in ((rng.randrange(PRODUCTS), rng.randint(1, 20)) for _ in range(items_per_order))
+        ])
+        db.session.commit()
+    return orders
+
+
+def _join_report(month=None, year=None):
+    """Consulta anterior: join completo y filtros extract() no indexables."""
+    query = db.session.query(
+        func.date(Order.order_date).label('fecha'),
+        Salesperson.employee_id,
+        Salesperson.first_name, Salesperson.last_name, Salesperson.territory, SalespersonGoal.region,
+        OrderItem.product_sku, OrderItem.product_name, SalespersonGoal.tipo.label('tipo_objetivo'),
+        SalespersonGoal.valor_objetivo, func.sum(OrderItem.quantity).label('volumen_ventas'),
+        func.sum(OrderItem.total).label('valor_total')
+    ).select_from(Order)\
+     .join(OrderItem, Order.id == OrderItem.order_id)\
+     .join(Salesperson, Order.seller_id == Salesperson.employee_id)\
+     .outerjoin(SalespersonGoal, (SalespersonGoal.id_vendedor == Salesperson.employee_id) &
+                (SalespersonGoal.id_producto == OrderItem.product_sku))
+    if month:
+        query = query.filter(extract('month', Order.order_date) == month)
+    if year:
+        query = query.filter(extract('year', Order.order_date) == year)
+    rows = query.group_by(
+        func.date(Order.order_date), Salesperson.employee_id, Salesperson.first_name, Salesperson.last_name,
+        Salesperson.territory, SalespersonGoal.region, OrderItem.product_sku, OrderItem.product_name,
+        SalespersonGoal.tipo, SalespersonGoal.valor_objetivo
+    ).order_by(func.date(Order.order_date).desc(), Salesperson.employee_id).all()
+    # Mismo formato de filas que el reporte actual (SQLite devuelve la fecha como texto)
+    return [
+        GetSalesSummaryReport._format_row(SimpleNamespace(**{**row._mapping, 'fecha': date.fromisoformat(row.fecha)}))
+        for row in rows
+    ]
+
+
+def _timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def _commit_orders(count, lines):
+    started = time.perf_counter()
+    for n in range(count):
+        order = Order(order_number=f'ORD-W-{time.perf_counter_ns()}-{n}', customer_id=1, seller_id='EMP-001',
+                      subtotal=Decimal('0'), total_amount=Decimal('0'))
+        db.session.add(order)
+        db.session.flush()
+        db.session.add_all([
+            OrderItem(order_id=order.id, product_sku=f'SKU-{line:04d}', product_name=f'Producto {line:04d}',
+                      quantity=1, unit_price=Decimal('1000'), subtotal=Decimal('1000'), total=Decimal('1190'))
+            for line in range(lines)
+        ])
+        db.session.commit()
+    return (time.perf_counter() - started) * 1000 / count
+
+
+def run(items, items_per_order, repeat):
+    path = os.path.join(tempfile.mkdtemp(), 'bench_sales_rollups.db')
+    app = create_app(config={
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+    })
+    client = app.test_client()
+    results = {}
+    with app.app_context():
+        shutdown_sales_rollups()
+        started = time.perf_counter()
+        orders = _seed(items, items_per_order)
+        results['seed_s'] = time.perf_counter() - started
+        init_sales_rollups()
+
+        started = time.perf_counter()
+        rebuilt = RebuildSalesRollups().execute()
+        results['rebuild_s'] = time.perf_counter() - started
+        results['rollup_rows'] = rebuilt['rows']
+        results['orders'] = orders
+
+        for label, filters in [('mes', {'month': 11, 'year': 2025}), ('año', {'year': 2025})]:
+            join_ms, rows = _timed(lambda: _join_report(**filters), repeat)
+            rollup_ms, report = _timed(lambda: GetSalesSummaryReport(**filters).execute(), repeat)
+            query = '&'.join(f'{key}={value}' for key, value in filters.items())
+            endpoint_ms, _ = _timed(lambda: client.get(f'/reports/sales-summary?{query}'), repeat)
+            assert sorted(rows, key=repr) == sorted(report['summary'], key=repr)
+            results[label] = {'join': join_ms, 'rollups': rollup_ms, 'endpoint': endpoint_ms, 'rows': len(rows)}
+
+        shutdown_sales_rollups()
+        results['commit_without'] = _commit_orders(200, 10)
+        init_sales_rollups()
+        results['commit_with'] = _commit_orders(200, 10)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=5000000)
+    parser.add_argument('--items-per-order', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    r = run(args.items, args.items_per_order, args.repeat)
+    print(f"{args.items:,} ítems en {r['orders']:,} órdenes (carga {r['seed_s']:.0f} s)")
+    print(f"  backfill RebuildSalesRollups: {r['rebuild_s']:.1f} s, {r['rollup_rows']:,} filas de rollup")
+    for label in ['mes', 'año']:
+        x = r[label]
+        print(f"  reporte por {label} ({x['rows']:,} filas): join {x['join']:.0f} ms, "
+              f"rollups {x['rollups']:.0f} ms, endpoint {x['endpoint']:.0f} ms")
+    print(f"  commit de una orden de 10 líneas: {r['commit_without']:.2f} ms sin rollups, "
+          f"{r['commit_with']:.2f} ms con rollups")
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from src.commands.create_order import CreateOrder
+from src.commands.create_orders_bulk import CreateOrdersBulk
 from src.commands.get_orders import GetOrders
 from src.commands.get_order_by_id import GetOrderById
 from src.commands.get_orders_batch import GetOrdersBatch
@@ -85,6 +86,51 @@ def create_order():
     return jsonify(order), 201
 
 
+@orders_bp.route('/bulk', methods=['POST'])
+def create_orders_bulk():
+    """
+    Crea varias órdenes en una sola petición (p. ej. carga de pedidos de un hospital).
+    
+    Todas las órdenes se validan con consultas compartidas (clientes, productos
+    y stock) y las válidas se insertan juntas en una transacción. El stock que
+    comprometen las primeras órdenes del lote se descuenta para las siguientes.
+    Las órdenes creadas cuya reserva de inventario falló se listan en
+    'reservation_failed' (la orden queda creada).
+    
+    Cuerpo de la Petición:
+        orders (list, requerido): Órdenes con el mismo formato que POST /orders (máximo 100)
+    
+    Retorna:
+        201: Todas las órdenes creadas
+        207: Algunas órdenes creadas; ver 'results'
+        400: Ninguna orden creada o body inválido
+        500: Error de base de datos (no se crea ninguna)
+    
+    Ejemplo de Respuesta:
+        {
+            "results": [
+                {"index": 0, "status": "created", "order": {...}, "inventory_reserved": true},
+                {"index": 1, "status": "failed", "error": "Insufficient stock ...", "status_code": 400}
+            ],
+            "created": 1,
+            "failed": 1,
+            "reservation_failed": []
+        }
+    """
+    data = request.get_json(silent=True) or {}
+    
+    result = CreateOrdersBulk(data.get('orders')).execute()
+    
+    if not result['failed']:
+        status_code = 201
+    elif result['created']:
+        status_code = 207
+    else:
+        status_code = 400
+    
+    return jsonify(result), status_code
+
+
 @orders_bp.route('', methods=['GET'])
 def get_orders():
     """
@@ -226,7 +272,8 @@ def get_orders_batch():
         - Las órdenes se retornan con detalles completos (include_items=True, include_customer=True)
         - Si algún ID no existe, se incluye en el array 'not_found'
         - Se eliminan IDs duplicados automáticamente
-        - El orden de las órdenes retornadas puede no coincidir con el orden de los IDs solicitados
+        - Las órdenes se retornan en el orden de los IDs solicitados
+        - Órdenes, ítems y clientes se cargan con 3 consultas en total, sin importar cuántos IDs se pidan
     """
     try:
         # Validar que el request tiene JSON
@@ -2,10 +2,12 @@
 Blueprint for sales reports endpoints.
 Provides aggregated reports and analytics for sales data.
 """
-import os
 from datetime import datetime
-from flask import Blueprint, request, jsonify, send_file, abort
+from flask import Blueprint, Response, request, jsonify, send_file, stream_with_context, abort
 from src.commands.get_sales_summary_report import GetSalesSummaryReport
+from src.commands.get_sales_by_salesperson_report import GetSalesBySalespersonReport
+from src.commands.get_sales_by_product_report import GetSalesByProductReport
+from src.commands.export_sales_report import ExportSalesReport, GetReportExportJob
 from src.errors.errors import ApiError, ValidationError
 
 reports_bp = Blueprint('reports', __name__, url_prefix='/reports')
@@ -188,7 +190,7 @@ def get_sales_by_salesperson():
             year = int(year)
         
         # Execute command
-        command = GetSalesSummaryReport(
+        command = GetSalesBySalespersonReport(
             from_date=from_date,
             to_date=to_date,
             region=region,
@@ -197,37 +199,7 @@ def get_sales_by_salesperson():
             year=year
         )
         
-        result = command.execute()
-        
-        # Group by salesperson
-        salesperson_summary = {}
-        for item in result['summary']:
-            emp_id = item['employee_id']
-            if emp_id not in salesperson_summary:
-                salesperson_summary[emp_id] = {
-                    'employee_id': emp_id,
-                    'vendedor': item['vendedor'],
-                    'region': item['region'],
-                    'territory': item['territory'],
-                    'total_ventas': 0,
-                    'total_valor': 0.0,
-                    'productos_vendidos': []
-                }
-            
-            salesperson_summary[emp_id]['total_ventas'] += item['volumen_ventas']
-            salesperson_summary[emp_id]['total_valor'] += item['valor_total']
-            salesperson_summary[emp_id]['productos_vendidos'].append({
-                'product_sku': item['product_sku'],
-                'product_name': item['product_name'],
-                'cantidad': item['volumen_ventas'],
-                'valor': item['valor_total']
-            })
-        
-        return jsonify({
-            'salespersons': list(salesperson_summary.values()),
-            'total_salespersons': len(salesperson_summary),
-            'filters_applied': result['filters_applied']
-        }), 200
+        return jsonify(command.execute()), 200
     
     except ValidationError as e:
         return jsonify({
@@ -280,7 +252,7 @@ def get_sales_by_product():
             year = int(year)
         
         # Execute command
-        command = GetSalesSummaryReport(
+        command = GetSalesByProductReport(
             from_date=from_date,
             to_date=to_date,
             region=region,
@@ -289,36 +261,7 @@ def get_sales_by_product():
             year=year
         )
         
-        result = command.execute()
-        
-        # Group by product
-        product_summary = {}
-        for item in result['summary']:
-            sku = item['product_sku']
-            if sku not in product_summary:
-                product_summary[sku] = {
-                    'product_sku': sku,
-                    'product_name': item['product_name'],
-                    'total_cantidad': 0,
-                    'total_valor': 0.0,
-                    'vendedores': []
-                }
-            
-            product_summary[sku]['total_cantidad'] += item['volumen_ventas']
-            product_summary[sku]['total_valor'] += item['valor_total']
-            
-            # Add unique salespersons
-            if item['employee_id'] not in [v['employee_id'] for v in product_summary[sku]['vendedores']]:
-                product_summary[sku]['vendedores'].append({
-                    'employee_id': item['employee_id'],
-                    'vendedor': item['vendedor']
-                })
-        
-        return jsonify({
-            'products': list(product_summary.values()),
-            'total_products': len(product_summary),
-            'filters_applied': result['filters_applied']
-        }), 200
+        return jsonify(command.execute()), 200
     
     except ValidationError as e:
         return jsonify({
@@ -343,23 +286,94 @@ def health_check():
             '/reports/sales-by-salesperson',
             '/reports/sales-by-product',
             '/reports/export/excel',
-            '/reports/export/pdf'
+            '/reports/export/pdf',
+            '/reports/export/csv',
+            '/reports/export/jobs/<job_id>'
         ]
     }), 200
 
 
+def _export_filters():
+    """
+    Read and validate the /sales-summary query parameters for the exports.
+    
+    Returns:
+        Dictionary of GetSalesSummaryReport keyword arguments
+    """
+    from_date = request.args.get('from_date')
+    to_date = request.args.get('to_date')
+    
+    # Validate date formats
+    if from_date:
+        try:
+            datetime.strptime(from_date, '%Y-%m-%d')
+        except ValueError:
+            raise ValidationError('from_date must be in YYYY-MM-DD format')
+    
+    if to_date:
+        try:
+            datetime.strptime(to_date, '%Y-%m-%d')
+        except ValueError:
+            raise ValidationError('to_date must be in YYYY-MM-DD format')
+    
+    # Get month and year
+    month = request.args.get('month')
+    year = request.args.get('year')
+    
+    if month:
+        try:
+            month = int(month)
+        except ValueError:
+            raise ValidationError('Month must be a valid integer (1-12)')
+    
+    if year:
+        try:
+            year = int(year)
+        except ValueError:
+            raise ValidationError('Year must be a valid integer')
+    
+    return {
+        'from_date': from_date,
+        'to_date': to_date,
+        'region': request.args.get('region'),
+        'territory': request.args.get('territory'),
+        'product_sku': request.args.get('product_sku'),
+        'employee_id': request.args.get('employee_id'),
+        'month': month,
+        'year': year,
+        'order_status': request.args.get('order_status')
+    }
+
+
+def _export_response(export_format: str):
+    """Send the export file, or 202 with the background job for large exports."""
+    result = ExportSalesReport(export_format, **_export_filters()).execute()
+    
+    if result['status'] != 'ready':
+        return jsonify(result), 202
+    
+    return send_file(
+        result['path'],
+        as_attachment=True,
+        download_name=result['download_name'],
+        mimetype=result['mimetype']
+    )
+
+
 @reports_bp.route('/export/excel', methods=['GET'])
 def export_sales_summary_excel():
     """
     Export sales summary report to Excel file.
     
-    Uses the same query parameters as /sales-summary endpoint.
+    Uses the same query parameters as /sales-summary endpoint. Identical
+    exports over unchanged data are served from the export cache.
     
     Query Parameters:
         Same as /sales-summary endpoint
         
     Returns:
         200: Excel file download
+        202: Large export queued as a background job (see /export/jobs/<job_id>)
         400: Validation error
         500: Server error
     
@@ -367,77 +381,7 @@ def export_sales_summary_excel():
         GET /reports/export/excel?region=Andina&month=11&year=2025
     """
     try:
-        # Import here to avoid circular imports
-        from src.services.export_service import ReportExportService
-        
-        # Get query parameters (same as sales-summary)
-        from_date = request.args.get('from_date')
-        to_date = request.args.get('to_date')
-        region = request.args.get('region')
-        territory = request.args.get('territory')
-        product_sku = request.args.get('product_sku')
-        employee_id = request.args.get('employee_id')
-        order_status = request.args.get('order_status')
-        
-        # Validate date formats
-        if from_date:
-            try:
-                datetime.strptime(from_date, '%Y-%m-%d')
-            except ValueError:
-                raise ValidationError('from_date must be in YYYY-MM-DD format')
-        
-        if to_date:
-            try:
-                datetime.strptime(to_date, '%Y-%m-%d')
-            except ValueError:
-                raise ValidationError('to_date must be in YYYY-MM-DD format')
-        
-        # Get month and year
-        month = request.args.get('month')
-        year = request.args.get('year')
-        
-        if month:
-            try:
-                month = int(month)
-            except ValueError:
-                raise ValidationError('Month must be a valid integer (1-12)')
-        
-        if year:
-            try:
-                year = int(year)
-            except ValueError:
-                raise ValidationError('Year must be a valid integer')
-        
-        # Execute command to get data
-        command = GetSalesSummaryReport(
-            from_date=from_date,
-            to_date=to_date,
-            region=region,
-            territory=territory,
-            product_sku=product_sku,
-            employee_id=employee_id,
-            month=month,
-            year=year,
-            order_status=order_status
-        )
-        
-        result = command.execute()
-        
-        # Export to Excel
-        export_service = ReportExportService()
-        filepath = export_service.export_to_excel(result, result.get('filters_applied', {}))
-        
-        # Send file and cleanup
-        def cleanup_file():
-            export_service.cleanup_file(filepath)
-        
-        filename = os.path.basename(filepath)
-        return send_file(
-            filepath,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
+        return _export_response('excel')
         
     except ValidationError as e:
         return jsonify({
@@ -457,13 +401,15 @@ def export_sales_summary_pdf():
     """
     Export sales summary report to PDF file.
     
-    Uses the same query parameters as /sales-summary endpoint.
+    Uses the same query parameters as /sales-summary endpoint. Identical
+    exports over unchanged data are served from the export cache.
     
     Query Parameters:
         Same as /sales-summary endpoint
         
     Returns:
         200: PDF file download
+        202: Large export queued as a background job (see /export/jobs/<job_id>)
         400: Validation error
         500: Server error
     
@@ -471,72 +417,42 @@ def export_sales_summary_pdf():
         GET /reports/export/pdf?region=Andina&month=11&year=2025
     """
     try:
-        # Import here to avoid circular imports
-        from src.services.export_service import ReportExportService
-        
-        # Get query parameters (same as sales-summary)
-        from_date = request.args.get('from_date')
-        to_date = request.args.get('to_date')
-        region = request.args.get('region')
-        territory = request.args.get('territory')
-        product_sku = request.args.get('product_sku')
-        employee_id = request.args.get('employee_id')
-        order_status = request.args.get('order_status')
+        return _export_response('pdf')
         
-        # Validate date formats
-        if from_date:
-            try:
-                datetime.strptime(from_date, '%Y-%m-%d')
-            except ValueError:
-                raise ValidationError('from_date must be in YYYY-MM-DD format')
-        
-        if to_date:
-            try:
-                datetime.strptime(to_date, '%Y-%m-%d')
-            except ValueError:
-                raise ValidationError('to_date must be in YYYY-MM-DD format')
-        
-        # Get month and year
-        month = request.args.get('month')
-        year = request.args.get('year')
-        
-        if month:
-            try:
-                month = int(month)
-            except ValueError:
-                raise ValidationError('Month must be a valid integer (1-12)')
-        
-        if year:
-            try:
-                year = int(year)
-            except ValueError:
-                raise ValidationError('Year must be a valid integer')
-        
-        # Execute command to get data
-        command = GetSalesSummaryReport(
-            from_date=from_date,
-            to_date=to_date,
-            region=region,
-            territory=territory,
-            product_sku=product_sku,
-            employee_id=employee_id,
-            month=month,
-            year=year,
-            order_status=order_status
-        )
+    except ValidationError as e:
+        return jsonify({
+            'error': str(e),
+            'error_type': 'validation_error'
+        }), 400
         
-        result = command.execute()
+    except Exception as e:
+        return jsonify({
+            'error': f'Error generating PDF export: {str(e)}',
+            'error_type': 'server_error'
+        }), 500
+
+
+@reports_bp.route('/export/csv', methods=['GET'])
+def export_sales_summary_csv():
+    """
+    Export sales summary report to CSV, streamed while the rows are read.
+    
+    Query Parameters:
+        Same as /sales-summary endpoint
         
-        # Export to PDF
-        export_service = ReportExportService()
-        filepath = export_service.export_to_pdf(result, result.get('filters_applied', {}))
+    Returns:
+        200: CSV file download (chunked)
+        400: Validation error
+        500: Server error
+    """
+    try:
+        chunks = ExportSalesReport('csv', **_export_filters()).stream_csv()
+        filename = f'reporte_ventas_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
         
-        filename = os.path.basename(filepath)
-        return send_file(
-            filepath,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/pdf'
+        return Response(
+            stream_with_context(chunks),
+            mimetype='text/csv; charset=utf-8',
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
         )
         
     except ValidationError as e:
@@ -547,6 +463,51 @@ def export_sales_summary_pdf():
         
     except Exception as e:
         return jsonify({
-            'error': f'Error generating PDF export: {str(e)}',
+            'error': f'Error generating CSV export: {str(e)}',
             'error_type': 'server_error'
         }), 500
+
+
+@reports_bp.route('/export/jobs/<job_id>', methods=['GET'])
+def get_export_job(job_id):
+    """
+    Get the status of a background export.
+    
+    Returns:
+        200: Job status; download_url is set once completed
+        404: Job not found
+    """
+    try:
+        return jsonify(GetReportExportJob(job_id).execute()), 200
+        
+    except ApiError as e:
+        return jsonify({
+            'error': str(e),
+            'error_type': 'api_error'
+        }), e.status_code
+
+
+@reports_bp.route('/export/jobs/<job_id>/download', methods=['GET'])
+def download_export_job(job_id):
+    """
+    Download the file of a completed background export.
+    
+    Returns:
+        200: File download
+        404: Job not found or file expired from the export cache
+        409: Job not completed yet
+    """
+    try:
+        result = GetReportExportJob(job_id).download()
+        return send_file(
+            result['path'],
+            as_attachment=True,
+            download_name=result['download_name'],
+            mimetype=result['mimetype']
+        )
+        
+    except ApiError as e:
+        return jsonify({
+            'error': str(e),
+            'error_type': 'api_error'
+        }), e.status_code
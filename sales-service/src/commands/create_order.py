@@ -9,6 +9,7 @@ from src.models.customer import Customer
 from src.session import db
 from src.errors.errors import ValidationError, NotFoundError
 from src.services.integration_service import IntegrationService
+from src.services.order_numbering import allocate_order_numbers
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +71,10 @@ class CreateOrder:
         customer_id = self.data['customer_id']
         customer = Customer.query.filter_by(id=customer_id).first()
         
+        return self._check_customer(customer, customer_id)
+    
+    def _check_customer(self, customer, customer_id):
+        """Raise if the customer does not exist or is not active."""
         if not customer:
             raise NotFoundError(f"Customer with ID {customer_id} not found")
         
@@ -88,6 +93,12 @@ class CreateOrder:
             preferred_distribution_center
         )
         
+        return self._apply_item_terms(validated_items)
+    
+    def _apply_item_terms(self, validated_items):
+        """Copy discount and tax percentages from the request items."""
+        items = self.data['items']
+        
         for i, item in enumerate(items):
             validated_items[i]['discount_percentage'] = item.get('discount_percentage', 0.0)
             validated_items[i]['tax_percentage'] = item.get('tax_percentage', 19.0)
@@ -128,8 +139,17 @@ class CreateOrder:
     
     def _create_order(self, customer, totals):
         """Create order record."""
-        order = Order(
-            order_number=self._generate_order_number(),
+        order = Order(**self._order_values(customer, totals, self._generate_order_number()))
+        
+        db.session.add(order)
+        db.session.flush()  # Get order ID
+        
+        return order
+    
+    def _order_values(self, customer, totals, order_number):
+        """Column values of the order record."""
+        return dict(
+            order_number=order_number,
             customer_id=customer.id,
             # Customer snapshot - datos del cliente al momento de crear la orden
             customer_business_name=customer.business_name,
@@ -159,50 +179,42 @@ class CreateOrder:
             preferred_distribution_center=self.data.get('preferred_distribution_center'),
             notes=self.data.get('notes')
         )
-        
-        db.session.add(order)
-        db.session.flush()  # Get order ID
-        
-        return order
     
     def _create_order_items(self, order, validated_items):
         """Create order item records."""
         for item_data in validated_items:
-            # Use item's distribution center or fall back to order's preferred center
-            distribution_center = (
-                item_data.get('distribution_center_code') or 
-                order.preferred_distribution_center or 
-                'CEDIS-BOG'  # Default fallback
-            )
-            
-            order_item = OrderItem(
-                order_id=order.id,
-                product_sku=item_data['product_sku'],
-                product_name=item_data['product_name'],
-                quantity=item_data['quantity'],
-                unit_price=item_data['unit_price'],
-                discount_percentage=item_data.get('discount_percentage', 0.0),
-                tax_percentage=item_data.get('tax_percentage', 19.0),
-                distribution_center_code=distribution_center,
-                stock_confirmed=item_data.get('stock_confirmed', False),
-                stock_confirmation_date=datetime.utcnow()
-            )
-            
+            db.session.add(OrderItem(**self._item_values(order.id, order.preferred_distribution_center, item_data)))
+    
+    def _item_values(self, order_id, preferred_distribution_center, item_data):
+        """Column values of an order item, including its calculated totals."""
+        # Use item's distribution center or fall back to order's preferred center
+        distribution_center = (
+            item_data.get('distribution_center_code') or 
+            preferred_distribution_center or 
+            'CEDIS-BOG'  # Default fallback
+        )
+        discount_percentage = item_data.get('discount_percentage', 0.0)
+        tax_percentage = item_data.get('tax_percentage', 19.0)
+        
+        return dict(
+            order_id=order_id,
+            product_sku=item_data['product_sku'],
+            product_name=item_data['product_name'],
+            quantity=item_data['quantity'],
+            unit_price=item_data['unit_price'],
+            discount_percentage=discount_percentage,
+            tax_percentage=tax_percentage,
+            distribution_center_code=distribution_center,
+            stock_confirmed=item_data.get('stock_confirmed', False),
+            stock_confirmation_date=datetime.utcnow(),
             # Calculate item totals
-            order_item.calculate_totals()
-            
-            db.session.add(order_item)
+            **OrderItem.compute_totals(item_data['unit_price'], item_data['quantity'],
+                                       discount_percentage, tax_percentage)
+        )
     
     def _generate_order_number(self):
-        """Generate unique order number."""
-        today = datetime.utcnow().strftime('%Y%m%d')
-        
-        count = Order.query.filter(
-            Order.order_number.like(f'ORD-{today}-%')
-        ).count()
-        
-        sequence = str(count + 1).zfill(4)
-        return f'ORD-{today}-{sequence}'
+        """Generate unique order number from the per-day counter (see order_numbering)."""
+        return allocate_order_numbers(1)[0]
     
     def _parse_delivery_date(self, delivery_date_str):
         """Parse delivery date string to datetime object."""
@@ -230,7 +242,14 @@ class CreateOrder:
         Diferencia con cart_reservations:
         - cart_reservations: Reservas temporales (15 min) mientras el usuario navega
         - inventory.quantity_reserved: Reservas permanentes de órdenes confirmadas
+        
+        Returns:
+            bool: True si logistics confirmó la reserva
         """
+        return self._reserve_inventory(order.order_number, validated_items)
+    
+    def _reserve_inventory(self, order_number, validated_items):
+        """Reserva en logistics-service los items de la orden `order_number`."""
         try:
             logistics_url = os.getenv('LOGISTICS_SERVICE_URL', 'http://localhost:3002')
             url = f"{logistics_url}/inventory/reserve-for-order"
@@ -247,7 +266,7 @@ class CreateOrder:
             response = requests.post(
                 url,
                 json={
-                    'order_id': order.order_number,
+                    'order_id': order_number,
                     'items': items_to_reserve
                 },
                 timeout=5
@@ -257,33 +276,36 @@ class CreateOrder:
                 result = response.json()
                 items_reserved = len(result.get('items_reserved', []))
                 logger.info(
-                    f"✅ Inventario reservado exitosamente para orden {order.order_number}: "
+                    f"✅ Inventario reservado exitosamente para orden {order_number}: "
                     f"{items_reserved} items"
                 )
+                return True
             else:
                 # Si falla la reserva, loguear pero NO fallar la orden
                 # La orden ya está creada y confirmada
                 logger.error(
                     f"❌ Error reservando inventario (status {response.status_code}): "
-                    f"Orden {order.order_number}. Response: {response.text}"
+                    f"Orden {order_number}. Response: {response.text}"
                 )
         
         except requests.exceptions.Timeout:
             logger.error(
-                f"❌ Timeout al reservar inventario para orden {order.order_number}. "
+                f"❌ Timeout al reservar inventario para orden {order_number}. "
                 "La orden fue creada pero el inventario no se actualizó."
             )
         
         except requests.exceptions.ConnectionError:
             logger.error(
                 f"❌ No se pudo conectar al servicio de logística para reservar inventario. "
-                f"Orden {order.order_number} creada pero inventario no actualizado."
+                f"Orden {order_number} creada pero inventario no actualizado."
             )
         
         except Exception as e:
             logger.error(
-                f"❌ Error inesperado al reservar inventario para orden {order.order_number}: {str(e)}"
+                f"❌ Error inesperado al reservar inventario para orden {order_number}: {str(e)}"
             )
+        
+        return False
     
     def _clear_cart_reservations(self):
         """
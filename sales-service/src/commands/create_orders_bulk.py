@@ -0,0 +1,226 @@
+"""
+Creación de muchas órdenes en una sola petición (cargas de clientes hospitalarios).
+
+Valida todas las órdenes con consultas compartidas: un IN para los clientes,
+una consulta por producto distinto (en paralelo y con caché) y el stock de
+todos los SKUs en una llamada. Las órdenes válidas se insertan con INSERT
+multi-fila en una sola transacción, con números de orden reservados de una vez
+del contador del día. Devuelve el resultado de cada orden en el orden recibido.
+
+Ya confirmadas, cada orden reserva su inventario en logística y libera las
+reservas de carrito de su cliente (como POST /orders), en paralelo en el pool
+de integración. Una reserva fallida no deshace la orden: se informa en su
+resultado (`inventory_reserved`) y en `reservation_failed`.
+"""
+
+import logging
+from collections import defaultdict
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.commands.create_order import CreateOrder
+from src.errors.errors import ApiError, DatabaseError, ValidationError
+from src.models.customer import Customer
+from src.models.order import Order
+from src.models.order_item import OrderItem
+from src.services.integration_service import IntegrationService
+from src.services.order_numbering import allocate_order_numbers
+from src.services.order_serializer import load_orders_with_details
+from src.services.sales_rollups import capture_new_orders
+from src.session import db
+
+logger = logging.getLogger(__name__)
+
+MAX_BULK_ORDERS = 100
+
+
+class CreateOrdersBulk:
+    """Crea un lote de órdenes; cada una tiene el mismo formato que POST /orders."""
+
+    def __init__(self, orders):
+        self.orders = orders
+        self.integration_service = IntegrationService()
+
+    def execute(self):
+        """
+        Returns:
+            dict: {
+                'results': [{'index', 'status': 'created', 'order', 'inventory_reserved'} |
+                            {'index', 'status': 'failed', 'error', 'status_code'}],
+                'created': int,
+                'failed': int,
+                'reservation_failed': [índices de órdenes creadas sin reserva de inventario]
+            }
+
+        Raises:
+            ValidationError: Si el lote no es una lista válida
+            DatabaseError: Si falla la inserción (no se crea ninguna orden)
+        """
+        if not isinstance(self.orders, list) or not self.orders:
+            raise ValidationError("Field 'orders' must be a non-empty list")
+        if len(self.orders) > MAX_BULK_ORDERS:
+            raise ValidationError(f"At most {MAX_BULK_ORDERS} orders per request")
+
+        outcomes = {}
+        commands = {}
+        for index, data in enumerate(self.orders):
+            if not isinstance(data, dict):
+                outcomes[index] = ValidationError("Each order must be a JSON object")
+                continue
+            command = CreateOrder(data)
+            try:
+                command._validate_required_fields()
+                self.integration_service._check_item_fields(data['items'])
+            except ApiError as e:
+                outcomes[index] = e
+                continue
+            commands[index] = command
+
+        accepted = self._validate(commands, outcomes)
+        created, reserved = self._insert(accepted) if accepted else ({}, {})
+
+        results = []
+        for index in range(len(self.orders)):
+            if index in created:
+                results.append({
+                    'index': index,
+                    'status': 'created',
+                    'order': created[index],
+                    'inventory_reserved': reserved[index]
+                })
+            else:
+                error = outcomes[index]
+                results.append({
+                    'index': index,
+                    'status': 'failed',
+                    'error': error.message,
+                    'status_code': error.status_code
+                })
+
+        reservation_failed = sorted(index for index, ok in reserved.items() if not ok)
+        logger.info(
+            f"📦 Lote de órdenes: {len(created)} creadas, {len(results) - len(created)} con error, "
+            f"{len(reservation_failed)} sin reserva de inventario"
+        )
+        return {
+            'results': results,
+            'created': len(created),
+            'failed': len(results) - len(created),
+            'reservation_failed': reservation_failed
+        }
+
+    def _validate(self, commands, outcomes):
+        """
+        Valida clientes e items de todas las órdenes con consultas compartidas.
+
+        El stock comprometido por las órdenes aceptadas se descuenta para las
+        siguientes (del total y del centro elegido), como si se hubieran
+        creado una tras otra.
+
+        Returns:
+            list: (index, command, customer, validated_items, totals) de las órdenes válidas
+        """
+        if not commands:
+            return []
+
+        customer_ids = {command.data['customer_id'] for command in commands.values()}
+        customers = {
+            customer.id: customer
+            for customer in Customer.query.filter(Customer.id.in_(customer_ids)).all()
+        }
+        lookups = self.integration_service.prefetch_items(
+            [item['product_sku'] for command in commands.values() for item in command.data['items']],
+            [command.data.get('preferred_distribution_center') for command in commands.values()]
+        )
+
+        consumed = defaultdict(lambda: defaultdict(int))
+        accepted = []
+        for index, command in commands.items():
+            try:
+                customer = command._check_customer(customers.get(command.data['customer_id']),
+                                                   command.data['customer_id'])
+                validated_items = command._apply_item_terms(
+                    self.integration_service.validate_prefetched_items(
+                        command.data['items'],
+                        command.data.get('preferred_distribution_center'),
+                        lookups,
+                        consumed
+                    )
+                )
+            except ApiError as e:
+                outcomes[index] = e
+                continue
+
+            for item in validated_items:
+                consumed[item['product_sku'].upper()][item['distribution_center_code']] += item['quantity']
+            accepted.append((index, command, customer, validated_items,
+                             command._calculate_order_totals(validated_items)))
+
+        return accepted
+
+    def _insert(self, accepted):
+        """
+        Inserta órdenes e items con INSERT multi-fila en una transacción.
+
+        Returns:
+            tuple: (index -> orden serializada (con items y cliente),
+                    index -> si se reservó el inventario)
+        """
+        try:
+            order_numbers = allocate_order_numbers(len(accepted))
+            # RETURNING sin orden garantizado: se empareja por número de orden
+            ids_by_number = {number: order_id for order_id, number in db.session.execute(
+                insert(Order).returning(Order.id, Order.order_number),
+                [
+                    command._order_values(customer, totals, order_number)
+                    for (_, command, customer, _, totals), order_number in zip(accepted, order_numbers)
+                ]
+            )}
+            order_ids = [ids_by_number[number] for number in order_numbers]
+            db.session.execute(insert(OrderItem), [
+                command._item_values(order_id, command.data.get('preferred_distribution_center'), item)
+                for (_, command, _, validated_items, _), order_id in zip(accepted, order_ids)
+                for item in validated_items
+            ])
+            # INSERT Core: registrar las órdenes para los rollups de ventas
+            capture_new_orders(order_ids)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"❌ Error insertando lote de {len(accepted)} órdenes: {str(e)}")
+            raise DatabaseError(f"Error creating orders: {str(e)}")
+
+        reserved = self._reserve_inventory(accepted, order_numbers)
+
+        orders = {order['id']: order for order in load_orders_with_details(order_ids)}
+        return (
+            {index: orders[order_id] for (index, *_), order_id in zip(accepted, order_ids)},
+            reserved
+        )
+
+    def _reserve_inventory(self, accepted, order_numbers):
+        """
+        Reserva el inventario de cada orden confirmada y limpia las reservas de
+        carrito de su cliente, en paralelo.
+
+        Returns:
+            dict: index -> True si logística confirmó la reserva
+        """
+        outcomes = self.integration_service._run_concurrently([
+            (_reserve_and_clear_cart, (command, order_number, validated_items))
+            for (_, command, _, validated_items, _), order_number in zip(accepted, order_numbers)
+        ])
+        reserved = {}
+        for (index, *_), order_number, (ok, error) in zip(accepted, order_numbers, outcomes):
+            if error is not None:
+                logger.error(f"❌ Error reservando inventario para orden {order_number}: {str(error)}")
+            reserved[index] = bool(ok)
+        return reserved
+
+
+def _reserve_and_clear_cart(command, order_number, validated_items):
+    """Mismos pasos que CreateOrder tras el commit: reserva y limpieza del carrito."""
+    reserved = command._reserve_inventory(order_number, validated_items)
+    command._clear_cart_reservations()
+    return reserved
@@ -0,0 +1,275 @@
+"""
+Commands to export the sales summary report to Excel, PDF and CSV.
+
+Exports are streamed from the report query into the file and cached by
+(format, filter hash, data version): a repeated export with unchanged data
+is served from disk. Exports above EXPORT_ASYNC_MIN_ROWS rollup rows run as
+background jobs (ReportExportJob) and are downloaded from the job link. A
+job still queued or running after EXPORT_JOB_TIMEOUT_SECONDS (e.g. its
+worker died) is marked failed and an identical export starts a new one.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator
+
+from flask import current_app
+
+from src.commands.get_sales_summary_report import GetSalesSummaryReport
+from src.errors.errors import ConflictError, NotFoundError, ValidationError
+from src.models.report_export_job import (
+    ReportExportJob, ACTIVE_STATUSES, STATUS_COMPLETED, STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING
+)
+from src.services.export_service import ExportCache, ReportExportService, get_export_cache
+from src.session import db
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    'excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'pdf': ('pdf', 'application/pdf'),
+    'csv': ('csv', 'text/csv'),
+}
+
+DEFAULT_CACHE_TTL_SECONDS = 900
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_ASYNC_MIN_ROWS = 20000
+DEFAULT_PDF_MAX_ROWS = 20000
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_JOB_TIMEOUT_SECONDS = 1800
+
+
+def _setting(key: str, default):
+    """app.config primero, luego variable de entorno."""
+    value = current_app.config.get(key)
+    if value is None:
+        value = os.getenv(key, default)
+    return value
+
+
+def _export_cache() -> ExportCache:
+    return get_export_cache(
+        _setting('EXPORT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'medisupply_report_exports')),
+        int(_setting('EXPORT_CACHE_TTL_SECONDS', DEFAULT_CACHE_TTL_SECONDS)),
+        int(_setting('EXPORT_CACHE_MAX_BYTES', DEFAULT_CACHE_MAX_BYTES))
+    )
+
+
+def _expire_if_stale(job: ReportExportJob) -> bool:
+    """
+    Marks a queued/running job as failed when it exceeded EXPORT_JOB_TIMEOUT_SECONDS
+    (from started_at, or created_at while queued). Does not commit.
+
+    Returns:
+        True if the job was expired
+    """
+    if job.status not in ACTIVE_STATUSES:
+        return False
+    timeout = int(_setting('EXPORT_JOB_TIMEOUT_SECONDS', DEFAULT_JOB_TIMEOUT_SECONDS))
+    since = job.started_at if job.status == STATUS_RUNNING else job.created_at
+    if since is not None and datetime.utcnow() - since < timedelta(seconds=timeout):
+        return False
+
+    job.status = STATUS_FAILED
+    job.error = f"La exportación no terminó en {timeout} s; solicítela de nuevo"
+    job.finished_at = datetime.utcnow()
+    logger.warning(f"⚠️ Exportación {job.id} vencida ({job.format}), marcada como fallida")
+    return True
+
+
+def _download(path: str, export_format: str) -> Dict[str, Any]:
+    extension, mimetype = EXPORT_FORMATS[export_format]
+    return {
+        'status': 'ready',
+        'path': path,
+        'download_name': f'reporte_ventas_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}',
+        'mimetype': mimetype
+    }
+
+
+class ExportSalesReport:
+    """
+    Exports the sales summary report (same filters as GetSalesSummaryReport).
+
+    execute() returns either a ready file ({'status': 'ready', 'path', ...})
+    or, for large exports, the background job (ReportExportJob.to_dict()).
+    """
+
+    def __init__(self, export_format: str, **filters):
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError(f"Formato de exportación no soportado: {export_format}")
+        self.export_format = export_format
+        self.report = GetSalesSummaryReport(**filters)
+
+    def execute(self) -> Dict[str, Any]:
+        estimated_rows, version = self.report.get_data_version()
+        cache_key = self._cache_key(version)
+        extension, _ = EXPORT_FORMATS[self.export_format]
+
+        path = _export_cache().get(cache_key, extension)
+        if path:
+            logger.debug(f"📦 Exportación {self.export_format} servida desde caché ({cache_key})")
+            return _download(path, self.export_format)
+
+        if estimated_rows >= int(_setting('EXPORT_ASYNC_MIN_ROWS', DEFAULT_ASYNC_MIN_ROWS)):
+            return self._start_job(cache_key, estimated_rows)
+
+        return _download(self.render(cache_key), self.export_format)
+
+    def stream_csv(self) -> Iterator[str]:
+        """CSV chunks straight from the query cursor (filters are validated before the first chunk)."""
+        rows = self.report.iter_summary(int(_setting('EXPORT_STREAM_BATCH_SIZE', DEFAULT_BATCH_SIZE)))
+        return ReportExportService().iter_csv(rows)
+
+    def render(self, cache_key: str) -> str:
+        """Writes the export into the cache and returns its path."""
+        cache = _export_cache()
+        extension, _ = EXPORT_FORMATS[self.export_format]
+        temp_path = cache.temp_path(extension)
+        service = ReportExportService()
+        filters = self.report._get_applied_filters()
+        rows = self.report.iter_summary(int(_setting('EXPORT_STREAM_BATCH_SIZE', DEFAULT_BATCH_SIZE)))
+
+        try:
+            if self.export_format == 'excel':
+                count = service.write_excel(rows, self.report.get_totals(), filters, temp_path)
+            elif self.export_format == 'csv':
+                count = service.write_csv(rows, temp_path)
+            else:
+                count = service.write_pdf(rows, self.report.get_totals(), filters, temp_path,
+                                          max_rows=int(_setting('EXPORT_PDF_MAX_ROWS', DEFAULT_PDF_MAX_ROWS)))
+            path = cache.store(temp_path, cache_key, extension)
+        except Exception:
+            cache.discard(temp_path)
+            raise
+
+        logger.info(f"📊 Exportación {self.export_format} generada: {count} filas ({cache_key})")
+        return path
+
+    def _cache_key(self, version: str) -> str:
+        payload = json.dumps({
+            'format': self.export_format,
+            'filters': self.report._get_applied_filters(),
+            'version': version
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:40]
+
+    # ------------------------------------------------------------------
+    # Trabajos en segundo plano
+    # ------------------------------------------------------------------
+
+    def _start_job(self, cache_key: str, estimated_rows: int) -> Dict[str, Any]:
+        # Una exportación idéntica en curso se reutiliza en lugar de generarla
+        # dos veces; las vencidas se marcan fallidas y se genera de nuevo
+        active = ReportExportJob.query.filter(
+            ReportExportJob.cache_key == cache_key,
+            ReportExportJob.status.in_(ACTIVE_STATUSES)
+        ).order_by(ReportExportJob.created_at.desc()).all()
+        expired = [job for job in active if _expire_if_stale(job)]
+        if expired:
+            db.session.commit()
+        current = next((job for job in active if job not in expired), None)
+        if current is not None:
+            return current.to_dict()
+
+        job = ReportExportJob(
+            id=uuid.uuid4().hex,
+            format=self.export_format,
+            filters=self.report._get_applied_filters(),
+            cache_key=cache_key,
+            status=STATUS_QUEUED,
+            estimated_rows=estimated_rows
+        )
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.id
+
+        if self._run_async():
+            app = current_app._get_current_object()
+            thread = threading.Thread(
+                target=self._run_in_context,
+                args=(app, job_id),
+                name=f'report-export-{job_id[:8]}',
+                daemon=True
+            )
+            thread.start()
+            logger.info(f"🚀 Exportación {self.export_format} {job_id} lanzada en segundo plano ({estimated_rows} filas)")
+            return job.to_dict()
+
+        self.run(job_id)
+        return GetReportExportJob(job_id).execute()
+
+    def _run_async(self) -> bool:
+        enabled = current_app.config.get('EXPORT_ASYNC')
+        if enabled is None:
+            enabled = (
+                not current_app.config.get('TESTING', False)
+                and os.getenv('EXPORT_ASYNC', 'true').lower() in ['true', '1', 'yes']
+            )
+        return bool(enabled)
+
+    def _run_in_context(self, app, job_id: str):
+        with app.app_context():
+            self.run(job_id)
+
+    def run(self, job_id: str):
+        """Genera el archivo del trabajo y guarda el resultado."""
+        job = db.session.get(ReportExportJob, job_id)
+        job.status = STATUS_RUNNING
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+
+        try:
+            self.render(job.cache_key)
+            status, error = STATUS_COMPLETED, None
+        except Exception as e:
+            db.session.rollback()
+            logger.exception(f"❌ Error en la exportación {job_id}")
+            status, error = STATUS_FAILED, str(e)
+
+        job = db.session.get(ReportExportJob, job_id)
+        job.status = status
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+
+class GetReportExportJob:
+    """Obtiene el estado de una exportación en segundo plano."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+
+    def execute(self) -> Dict[str, Any]:
+        return self._job().to_dict()
+
+    def download(self) -> Dict[str, Any]:
+        """
+        Archivo de una exportación terminada.
+
+        Raises:
+            ConflictError: Si el trabajo aún no termina o falló
+            NotFoundError: Si el trabajo no existe o el archivo ya salió de la caché
+        """
+        job = self._job()
+        if job.status != STATUS_COMPLETED:
+            raise ConflictError(f"La exportación {self.job_id} no está lista (estado: {job.status})")
+
+        extension, _ = EXPORT_FORMATS[job.format]
+        path = _export_cache().get(job.cache_key, extension)
+        if path is None:
+            raise NotFoundError(f"El archivo de la exportación {self.job_id} expiró; solicite la exportación de nuevo")
+        return _download(path, job.format)
+
+    def _job(self) -> ReportExportJob:
+        job = db.session.get(ReportExportJob, self.job_id)
+        if job is None:
+            raise NotFoundError(f"Exportación {self.job_id} no encontrada")
+        if _expire_if_stale(job):
+            db.session.commit()
+        return job
@@ -6,8 +6,7 @@ optimizando la comunicación entre microservicios.
 """
 
 from typing import List, Dict, Any
-from src.models.order import Order
-from src.session import db
+from src.services.order_serializer import load_orders_with_details
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,6 +18,10 @@ class GetOrdersBatch:
     
     Retorna los detalles completos de las órdenes encontradas,
     junto con una lista de IDs no encontrados.
+    
+    Las órdenes, sus ítems y sus clientes se cargan con una consulta por
+    tabla (3 en total, sin importar el tamaño del lote) y se serializan por
+    columnas (ver src/services/order_serializer.py).
     """
     
     def __init__(self, order_ids: List[int]):
@@ -57,19 +60,11 @@ class GetOrdersBatch:
         
         logger.info(f"Fetching batch of {len(unique_order_ids)} orders")
         
-        # Consultar todas las órdenes en una sola query
-        orders = db.session.query(Order).filter(
-            Order.id.in_(unique_order_ids)
-        ).all()
-        
-        # Convertir a diccionario con detalles completos
-        orders_dict = [
-            order.to_dict(include_items=True, include_customer=True)
-            for order in orders
-        ]
+        # Órdenes, ítems y clientes en una consulta por tabla
+        orders_dict = load_orders_with_details(unique_order_ids)
         
         # Identificar IDs encontrados
-        found_ids = {order.id for order in orders}
+        found_ids = {order['id'] for order in orders_dict}
         
         # Identificar IDs no encontrados
         not_found_ids = [
@@ -0,0 +1,83 @@
+"""
+Command to get the sales report grouped by product.
+Aggregates the daily sales rollups per product and salesperson in SQL.
+"""
+from decimal import Decimal
+from typing import Any, Dict
+from sqlalchemy import func
+from src.session import db
+from src.models.sales_daily_rollup import SalesDailyRollup
+from src.entities.salesperson import Salesperson
+from src.commands.get_sales_summary_report import GetSalesSummaryReport
+
+
+class GetSalesByProductReport(GetSalesSummaryReport):
+    """
+    Command to generate the sales report grouped by product.
+
+    Accepts the same filters as GetSalesSummaryReport. The query returns one
+    row per product and salesperson, so each salesperson appears once per
+    product without deduplicating in Python. Goals are not joined, so a
+    product with several goals is counted once.
+    """
+
+    def execute(self) -> Dict[str, Any]:
+        """
+        Execute the product report query.
+
+        Returns:
+            Dictionary with the products, their salespersons and the applied filters
+        """
+        query = db.session.query(
+            SalesDailyRollup.product_sku.label('product_sku'),
+            Salesperson.employee_id.label('employee_id'),
+            Salesperson.first_name.label('first_name'),
+            Salesperson.last_name.label('last_name'),
+            func.min(SalesDailyRollup.product_name).label('product_name'),
+            func.sum(SalesDailyRollup.quantity).label('cantidad'),
+            func.sum(SalesDailyRollup.total).label('valor')
+        ).select_from(SalesDailyRollup)\
+         .join(Salesperson, SalesDailyRollup.seller_id == Salesperson.employee_id)
+
+        query = self._apply_filters(query)
+
+        rows = query.group_by(
+            SalesDailyRollup.product_sku,
+            Salesperson.employee_id,
+            Salesperson.first_name,
+            Salesperson.last_name
+        ).order_by(
+            SalesDailyRollup.product_sku,
+            Salesperson.employee_id
+        ).all()
+
+        products = {}
+        for row in rows:
+            entry = products.get(row.product_sku)
+            if entry is None:
+                entry = products[row.product_sku] = {
+                    'product_sku': row.product_sku,
+                    'product_name': row.product_name,
+                    'total_cantidad': 0,
+                    'total_valor': Decimal('0'),
+                    'vendedores': []
+                }
+
+            entry['total_cantidad'] += int(row.cantidad or 0)
+            entry['total_valor'] += row.valor or 0
+            entry['vendedores'].append({
+                'employee_id': row.employee_id,
+                'vendedor': f'{row.first_name} {row.last_name}'
+            })
+
+        for entry in products.values():
+            entry['total_valor'] = float(entry['total_valor'])
+
+        return {
+            'products': list(products.values()),
+            'total_products': len(products),
+            'filters_applied': self._get_applied_filters()
+        }
+
+    def _region_criterion(self):
+        return self._goal_in_region()
@@ -0,0 +1,108 @@
+"""
+Command to get the sales report grouped by salesperson.
+Aggregates the daily sales rollups per salesperson and product in SQL.
+"""
+from decimal import Decimal
+from typing import Any, Dict, Iterable
+from sqlalchemy import func
+from src.session import db
+from src.models.sales_daily_rollup import SalesDailyRollup
+from src.entities.salesperson import Salesperson
+from src.entities.salesperson_goal import SalespersonGoal
+from src.commands.get_sales_summary_report import GetSalesSummaryReport
+
+
+class GetSalesBySalespersonReport(GetSalesSummaryReport):
+    """
+    Command to generate the sales report grouped by salesperson.
+
+    Accepts the same filters as GetSalesSummaryReport. The query returns one
+    row per salesperson and product; salesperson totals are added up in a
+    single pass. Goals are not joined, so a product with several goals is
+    counted once.
+    """
+
+    def execute(self) -> Dict[str, Any]:
+        """
+        Execute the salesperson report query.
+
+        Returns:
+            Dictionary with the salespersons, their products and the applied filters
+        """
+        query = db.session.query(
+            Salesperson.employee_id.label('employee_id'),
+            Salesperson.first_name.label('first_name'),
+            Salesperson.last_name.label('last_name'),
+            Salesperson.territory.label('territory'),
+            SalesDailyRollup.product_sku.label('product_sku'),
+            func.min(SalesDailyRollup.product_name).label('product_name'),
+            func.sum(SalesDailyRollup.quantity).label('cantidad'),
+            func.sum(SalesDailyRollup.total).label('valor')
+        ).select_from(SalesDailyRollup)\
+         .join(Salesperson, SalesDailyRollup.seller_id == Salesperson.employee_id)
+
+        query = self._apply_filters(query)
+
+        rows = query.group_by(
+            Salesperson.employee_id,
+            Salesperson.first_name,
+            Salesperson.last_name,
+            Salesperson.territory,
+            SalesDailyRollup.product_sku
+        ).order_by(
+            Salesperson.employee_id,
+            SalesDailyRollup.product_sku
+        ).all()
+
+        salespersons = {}
+        for row in rows:
+            entry = salespersons.get(row.employee_id)
+            if entry is None:
+                entry = salespersons[row.employee_id] = {
+                    'employee_id': row.employee_id,
+                    'vendedor': f'{row.first_name} {row.last_name}',
+                    'region': None,
+                    'territory': row.territory,
+                    'total_ventas': 0,
+                    'total_valor': Decimal('0'),
+                    'productos_vendidos': []
+                }
+
+            entry['total_ventas'] += int(row.cantidad or 0)
+            entry['total_valor'] += row.valor or 0
+            entry['productos_vendidos'].append({
+                'product_sku': row.product_sku,
+                'product_name': row.product_name,
+                'cantidad': int(row.cantidad or 0),
+                'valor': float(row.valor or 0)
+            })
+
+        regions = self._regions(salespersons)
+        for employee_id, entry in salespersons.items():
+            entry['region'] = regions.get(employee_id)
+            entry['total_valor'] = float(entry['total_valor'])
+
+        return {
+            'salespersons': list(salespersons.values()),
+            'total_salespersons': len(salespersons),
+            'filters_applied': self._get_applied_filters()
+        }
+
+    def _region_criterion(self):
+        return self._goal_in_region()
+
+    def _regions(self, employee_ids: Iterable[str]) -> Dict[str, str]:
+        """Region of each salesperson, taken from their goals (first alphabetically)."""
+        if self.region:
+            return {employee_id: self.region for employee_id in employee_ids}
+
+        employee_ids = list(employee_ids)
+        if not employee_ids:
+            return {}
+
+        return dict(
+            db.session.query(SalespersonGoal.id_vendedor, func.min(SalespersonGoal.region))
+            .filter(SalespersonGoal.id_vendedor.in_(employee_ids))
+            .group_by(SalespersonGoal.id_vendedor)
+            .all()
+        )
@@ -1,12 +1,12 @@
 """
 Command to get sales summary report with aggregated data.
-Combines orders, order items, salespersons, and goals for comprehensive sales analysis.
+Combines the daily sales rollups, salespersons, and goals for comprehensive sales analysis.
 """
-from typing import List, Dict, Any, Optional
-from sqlalchemy import func, extract, text
+from datetime import date, datetime
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from sqlalchemy import and_, exists, false, func, or_
 from src.session import db
-from src.models.order import Order
-from src.models.order_item import OrderItem
+from src.models.sales_daily_rollup import SalesDailyRollup
 from src.entities.salesperson import Salesperson
 from src.entities.salesperson_goal import SalespersonGoal
 from src.errors.errors import ValidationError
@@ -17,8 +17,8 @@ class GetSalesSummaryReport:
     Command to generate sales summary report with aggregated metrics.
     
     Combines:
-    - Order data (date, status)
-    - Order items (products, quantities, values)
+    - Daily sales rollups (date, status, products, quantities, values),
+      maintained with each order change instead of scanning orders × items
     - Salesperson information (name, region, territory)
     - Goals (targets for products and amounts)
     
@@ -60,26 +60,104 @@ class GetSalesSummaryReport:
         Returns:
             Dictionary with summary data and metadata
         """
-        # Build base query with joins - INCLUIR SalespersonGoal para agrupar por región y tipo
+        # Execute query
+        results = self._summary_query().all()
+        
+        # Format results
+        summary_data = [self._format_row(row) for row in results]
+        
+        # Calculate totals
+        totals = self._calculate_totals(summary_data)
+        
+        return {
+            'summary': summary_data,
+            'totals': totals,
+            'filters_applied': self._get_applied_filters(),
+            'total_records': len(summary_data)
+        }
+    
+    def iter_summary(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the summary rows one by one, fetching them in batches.
+        
+        Uses a server-side cursor where the driver supports it, so exports
+        keep a bounded number of rows in memory. Filters are validated when
+        called, before the first row is requested.
+        """
+        query = self._summary_query()
+        return (self._format_row(row) for row in query.yield_per(batch_size))
+    
+    def get_totals(self) -> Dict[str, Any]:
+        """Same totals as execute(), aggregated in SQL over the grouped rows."""
+        grouped = self._summary_query().order_by(None).subquery()
+        row = db.session.query(
+            func.sum(grouped.c.volumen_ventas),
+            func.sum(grouped.c.valor_total),
+            func.count(func.distinct(grouped.c.employee_id)),
+            func.count(func.distinct(grouped.c.product_sku)),
+            func.count(func.distinct(grouped.c.region))
+        ).one()
+        
+        return {
+            'total_volumen_ventas': int(row[0] or 0),
+            'total_valor_total': round(float(row[1] or 0), 2),
+            'unique_salespersons': row[2],
+            'unique_products': row[3],
+            'unique_regions': row[4]
+        }
+    
+    def get_data_version(self) -> Tuple[int, str]:
+        """
+        Cheap fingerprint of the data behind the report.
+        
+        Covers the rollup rows in the filtered range plus salespersons and
+        goals (names, regions and targets come from them). For the rollups it
+        also includes max(id) and the sums of the aggregated columns: an
+        upsert that commits after a newer one keeps its older updated_at, but
+        still changes the sums.
+        
+        Returns:
+            Tuple (rollup rows in range, version string); the row count is an
+            estimate of the report size
+        """
+        rollups = self._apply_rollup_filters(db.session.query(
+            func.count(SalesDailyRollup.id),
+            func.max(SalesDailyRollup.updated_at),
+            func.max(SalesDailyRollup.id),
+            func.sum(SalesDailyRollup.quantity),
+            func.sum(SalesDailyRollup.total),
+            func.sum(SalesDailyRollup.item_count)
+        )).one()
+        salespersons = db.session.query(func.count(Salesperson.id), func.max(Salesperson.updated_at)).one()
+        goals = db.session.query(
+            func.count(SalespersonGoal.id), func.max(SalespersonGoal.fecha_actualizacion)
+        ).one()
+        
+        version = '|'.join(':'.join(str(value) for value in row) for row in (rollups, salespersons, goals))
+        return rollups[0], version
+    
+    def _summary_query(self):
+        """Grouped and ordered report query (one row per summary line)."""
+        # Build base query over the rollups - INCLUIR SalespersonGoal para agrupar por región y tipo
         query = db.session.query(
-            func.date(Order.order_date).label('fecha'),
+            SalesDailyRollup.day.label('fecha'),
             Salesperson.employee_id.label('employee_id'),
-            func.concat(Salesperson.first_name, ' ', Salesperson.last_name).label('vendedor'),
+            Salesperson.first_name.label('first_name'),
+            Salesperson.last_name.label('last_name'),
             Salesperson.territory.label('territory'),
             SalespersonGoal.region.label('region'),
-            OrderItem.product_sku.label('product_sku'),
-            OrderItem.product_name.label('product_name'),
+            SalesDailyRollup.product_sku.label('product_sku'),
+            SalesDailyRollup.product_name.label('product_name'),
             SalespersonGoal.tipo.label('tipo_objetivo'),
             SalespersonGoal.valor_objetivo.label('valor_objetivo'),
-            func.sum(OrderItem.quantity).label('volumen_ventas'),
-            func.sum(OrderItem.total).label('valor_total')
-        ).select_from(Order)\
-         .join(OrderItem, Order.id == OrderItem.order_id)\
-         .join(Salesperson, Order.seller_id == Salesperson.employee_id)\
+            func.sum(SalesDailyRollup.quantity).label('volumen_ventas'),
+            func.sum(SalesDailyRollup.total).label('valor_total')
+        ).select_from(SalesDailyRollup)\
+         .join(Salesperson, SalesDailyRollup.seller_id == Salesperson.employee_id)\
          .outerjoin(
              SalespersonGoal,
              (SalespersonGoal.id_vendedor == Salesperson.employee_id) &
-             (SalespersonGoal.id_producto == OrderItem.product_sku)
+             (SalespersonGoal.id_producto == SalesDailyRollup.product_sku)
          )
         
         # Apply filters
@@ -87,131 +165,170 @@ class GetSalesSummaryReport:
         
         # Group by - INCLUIR región y tipo de objetivo
         query = query.group_by(
-            func.date(Order.order_date),
+            SalesDailyRollup.day,
             Salesperson.employee_id,
             Salesperson.first_name,
             Salesperson.last_name,
             Salesperson.territory,
             SalespersonGoal.region,
-            OrderItem.product_sku,
-            OrderItem.product_name,
+            SalesDailyRollup.product_sku,
+            SalesDailyRollup.product_name,
             SalespersonGoal.tipo,
             SalespersonGoal.valor_objetivo
         )
         
         # Order by date and salesperson
         query = query.order_by(
-            func.date(Order.order_date).desc(),
+            SalesDailyRollup.day.desc(),
             Salesperson.employee_id,
             SalespersonGoal.region,
             SalespersonGoal.tipo
         )
         
-        # Execute query
-        results = query.all()
+        return query
+    
+    @staticmethod
+    def _format_row(row) -> Dict[str, Any]:
+        """Format one grouped row of the report."""
+        item = {
+            'fecha': row.fecha.isoformat() if row.fecha else None,
+            'employee_id': row.employee_id,
+            'vendedor': f'{row.first_name} {row.last_name}',
+            'region': row.region,
+            'territory': row.territory,
+            'product_sku': row.product_sku,
+            'product_name': row.product_name,
+            'tipo_objetivo': row.tipo_objetivo,
+            'volumen_ventas': int(row.volumen_ventas) if row.volumen_ventas else 0,
+            'valor_total': float(row.valor_total) if row.valor_total else 0.0,
+            'valor_objetivo': float(row.valor_objetivo) if row.valor_objetivo else None,
+        }
         
-        # Format results
-        summary_data = []
-        for row in results:
-            # Handle fecha - SQLite returns string, PostgreSQL returns date
-            if row.fecha:
-                if isinstance(row.fecha, str):
-                    fecha_str = row.fecha
-                else:
-                    fecha_str = row.fecha.isoformat()
-            else:
-                fecha_str = None
-            
-            item = {
-                'fecha': fecha_str,
-                'employee_id': row.employee_id,
-                'vendedor': row.vendedor,
-                'region': row.region,
-                'territory': row.territory,
-                'product_sku': row.product_sku,
-                'product_name': row.product_name,
-                'tipo_objetivo': row.tipo_objetivo,
-                'volumen_ventas': int(row.volumen_ventas) if row.volumen_ventas else 0,
-                'valor_total': float(row.valor_total) if row.valor_total else 0.0,
-                'valor_objetivo': float(row.valor_objetivo) if row.valor_objetivo else None,
-            }
-            
-            # Calculate achievement percentage based on tipo_objetivo
-            if row.valor_objetivo:
-                if row.tipo_objetivo == 'unidades' and row.volumen_ventas:
-                    item['cumplimiento_porcentaje'] = round(
-                        (float(row.volumen_ventas) / float(row.valor_objetivo)) * 100, 2
-                    )
-                elif row.tipo_objetivo == 'monetario' and row.valor_total:
-                    item['cumplimiento_porcentaje'] = round(
-                        (float(row.valor_total) / float(row.valor_objetivo)) * 100, 2
-                    )
-                else:
-                    item['cumplimiento_porcentaje'] = None
+        # Calculate achievement percentage based on tipo_objetivo
+        if row.valor_objetivo:
+            if row.tipo_objetivo == 'unidades' and row.volumen_ventas:
+                item['cumplimiento_porcentaje'] = round(
+                    (float(row.volumen_ventas) / float(row.valor_objetivo)) * 100, 2
+                )
+            elif row.tipo_objetivo == 'monetario' and row.valor_total:
+                item['cumplimiento_porcentaje'] = round(
+                    (float(row.valor_total) / float(row.valor_objetivo)) * 100, 2
+                )
             else:
                 item['cumplimiento_porcentaje'] = None
-            
-            summary_data.append(item)
-        
-        # Calculate totals
-        totals = self._calculate_totals(summary_data)
+        else:
+            item['cumplimiento_porcentaje'] = None
         
-        return {
-            'summary': summary_data,
-            'totals': totals,
-            'filters_applied': self._get_applied_filters(),
-            'total_records': len(summary_data)
-        }
+        return item
     
     def _apply_filters(self, query):
-        """Apply all filters to the query."""
+        """
+        Apply all filters to the query.
+        
+        Dates are compared as ranges on the rollup day so the index can be used.
+        """
+        query = self._apply_rollup_filters(query)
+        
+        # Region filter - ahora sí funciona porque SalespersonGoal está en el JOIN
+        if self.region:
+            query = query.filter(self._region_criterion())
+        
+        # Territory filter
+        if self.territory:
+            query = query.filter(Salesperson.territory == self.territory)
+        
+        return query
+    
+    def _apply_rollup_filters(self, query):
+        """Apply the filters on SalesDailyRollup columns (no joins needed)."""
         
-        # Date range filter
+        # Date range filter (both ends inclusive)
         if self.from_date:
-            try:
-                query = query.filter(Order.order_date >= self.from_date)
-            except Exception:
-                raise ValidationError('Invalid from_date format. Use YYYY-MM-DD')
+            query = query.filter(SalesDailyRollup.day >= self._parse_date(self.from_date, 'from_date'))
         
         if self.to_date:
-            try:
-                query = query.filter(Order.order_date <= self.to_date)
-            except Exception:
-                raise ValidationError('Invalid to_date format. Use YYYY-MM-DD')
+            query = query.filter(SalesDailyRollup.day <= self._parse_date(self.to_date, 'to_date'))
         
         # Month/Year filter
         if self.month:
             if not 1 <= self.month <= 12:
                 raise ValidationError('Month must be between 1 and 12')
-            query = query.filter(extract('month', Order.order_date) == self.month)
         
         if self.year:
             if self.year < 2000 or self.year > 2100:
                 raise ValidationError('Invalid year')
-            query = query.filter(extract('year', Order.order_date) == self.year)
         
-        # Region filter - ahora sí funciona porque SalespersonGoal está en el JOIN
-        if self.region:
-            query = query.filter(SalespersonGoal.region == self.region)
-        
-        # Territory filter
-        if self.territory:
-            query = query.filter(Salesperson.territory == self.territory)
+        if self.month or self.year:
+            periods = self._period_ranges()
+            if not periods:
+                return query.filter(false())
+            query = query.filter(or_(*[
+                and_(SalesDailyRollup.day >= start, SalesDailyRollup.day < end)
+                for start, end in periods
+            ]))
         
         # Product SKU filter
         if self.product_sku:
-            query = query.filter(OrderItem.product_sku == self.product_sku)
+            query = query.filter(SalesDailyRollup.product_sku == self.product_sku)
         
         # Employee ID filter
         if self.employee_id:
-            query = query.filter(Salesperson.employee_id == self.employee_id)
+            query = query.filter(SalesDailyRollup.seller_id == self.employee_id)
         
         # Order status filter
         if self.order_status:
-            query = query.filter(Order.status == self.order_status)
+            query = query.filter(SalesDailyRollup.status == self.order_status)
         
         return query
     
+    def _region_criterion(self):
+        """Region filter over the joined SalespersonGoal."""
+        return SalespersonGoal.region == self.region
+    
+    def _goal_in_region(self):
+        """
+        Region filter for queries without the SalespersonGoal join.
+        
+        Keeps the rollup rows whose seller has a goal for the product in the
+        region, without repeating them once per matching goal.
+        """
+        return exists().where(
+            SalespersonGoal.id_vendedor == SalesDailyRollup.seller_id,
+            SalespersonGoal.id_producto == SalesDailyRollup.product_sku,
+            SalespersonGoal.region == self.region
+        )
+    
+    @staticmethod
+    def _parse_date(value: str, field: str) -> date:
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            raise ValidationError(f'Invalid {field} format. Use YYYY-MM-DD')
+    
+    def _period_ranges(self) -> List[Tuple[date, date]]:
+        """
+        Half-open [start, end) day ranges for the month/year filters.
+        
+        A month without a year covers that month of every year with sales.
+        """
+        if self.year and self.month:
+            years = [self.year]
+        elif self.year:
+            return [(date(self.year, 1, 1), date(self.year + 1, 1, 1))]
+        else:
+            first, last = db.session.query(
+                func.min(SalesDailyRollup.day), func.max(SalesDailyRollup.day)
+            ).one()
+            if first is None:
+                return []
+            years = range(first.year, last.year + 1)
+        
+        return [
+            (date(year, self.month, 1),
+             date(year + self.month // 12, self.month % 12 + 1, 1))
+            for year in years
+        ]
+    
     def _calculate_totals(self, summary_data: List[Dict]) -> Dict[str, Any]:
         """Calculate total aggregates from summary data."""
         if not summary_data:
@@ -0,0 +1,108 @@
+"""
+Command to rebuild the daily sales rollups from orders and order items.
+
+Used for the initial backfill and to repair the rollups after manual data
+changes. Each month is rebuilt in its own transaction (DELETE + grouped
+INSERT ... SELECT); run it with low order traffic, since orders committed
+while a month is being rebuilt may be counted twice or missed.
+"""
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import DateTime, delete, func, insert, literal, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.errors.errors import DatabaseError, ValidationError
+from src.models.order import Order
+from src.models.order_item import OrderItem
+from src.models.sales_daily_rollup import SalesDailyRollup
+from src.session import db
+
+
+def _parse_date(value, field: str) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValidationError(f'{field} must be in YYYY-MM-DD format')
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+class RebuildSalesRollups:
+    """
+    Recalculates sales_daily_rollups for a date range (both ends inclusive).
+
+    Without dates, the range covers every order in the database.
+    """
+
+    def __init__(self, from_date=None, to_date=None):
+        self.from_date = _parse_date(from_date, 'from_date')
+        self.to_date = _parse_date(to_date, 'to_date')
+        if self.from_date and self.to_date and self.from_date > self.to_date:
+            raise ValidationError('from_date must be before or equal to to_date')
+
+    def execute(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dictionary with the rebuilt range, months processed and rollup rows written
+
+        Raises:
+            DatabaseError: If a month fails (previous months stay rebuilt)
+        """
+        first, last = db.session.query(func.min(Order.order_date), func.max(Order.order_date)).one()
+        start = self.from_date or (first.date() if first else None)
+        end = self.to_date or (last.date() if last else None)
+        if start is None or end is None:
+            return {'from_date': None, 'to_date': None, 'months': 0, 'rows': 0}
+
+        months, rows = 0, 0
+        month_start = start
+        while month_start <= end:
+            month_end = min(_next_month(month_start), end + timedelta(days=1))
+            rows += self._rebuild(month_start, month_end)
+            months += 1
+            month_start = month_end
+
+        return {
+            'from_date': start.isoformat(),
+            'to_date': end.isoformat(),
+            'months': months,
+            'rows': rows
+        }
+
+    def _rebuild(self, start: date, end: date) -> int:
+        """Rebuilds the rollups of [start, end) in one transaction."""
+        day = func.date(Order.order_date)
+        grouped = select(
+            day, Order.seller_id, Order.status, OrderItem.product_sku, OrderItem.product_name,
+            func.sum(OrderItem.quantity), func.sum(OrderItem.total), func.count(OrderItem.id),
+            literal(datetime.utcnow(), DateTime)
+        ).select_from(Order)\
+         .join(OrderItem, OrderItem.order_id == Order.id)\
+         .where(Order.order_date >= datetime.combine(start, datetime.min.time()))\
+         .where(Order.order_date < datetime.combine(end, datetime.min.time()))\
+         .group_by(day, Order.seller_id, Order.status, OrderItem.product_sku, OrderItem.product_name)
+
+        try:
+            db.session.execute(
+                delete(SalesDailyRollup)
+                .where(SalesDailyRollup.day >= start)
+                .where(SalesDailyRollup.day < end)
+            )
+            result = db.session.execute(
+                insert(SalesDailyRollup).from_select(
+                    ['day', 'seller_id', 'status', 'product_sku', 'product_name',
+                     'quantity', 'total', 'item_count', 'updated_at'],
+                    grouped
+                )
+            )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise DatabaseError(f"Error rebuilding sales rollups from {start} to {end}: {str(e)}")
+
+        return result.rowcount
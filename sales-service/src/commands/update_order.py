@@ -12,6 +12,7 @@ from src.session import db
 from src.models.order import Order
 from src.models.order_item import OrderItem
 from src.errors.errors import NotFoundError, ApiError, ValidationError, DatabaseError
+from src.services.sales_rollups import capture_orders
 
 
 class UpdateOrder:
@@ -300,6 +301,8 @@ class UpdateOrder:
         
         # Delete all existing items
         try:
+            # El DELETE masivo no pasa por el flush: guardar antes la contribución a los rollups
+            capture_orders([order.id])
             OrderItem.query.filter_by(order_id=order.id).delete()
         except SQLAlchemyError as e:
             raise DatabaseError(f"Error deleting existing items: {str(e)}")
@@ -1,4 +1,6 @@
+import atexit
 import os
+import click
 from flask import Flask, jsonify
 from flask_cors import CORS
 from src.session import db, init_db
@@ -10,6 +12,9 @@ from src.blueprints.salespersons import salespersons_bp
 from src.blueprints.visit_files import visit_files_bp, files_bp
 from src.blueprints.salesperson_goals import salesperson_goals_bp
 from src.blueprints.reports import reports_bp
+from src.commands.rebuild_sales_rollups import RebuildSalesRollups
+from src.services.integration_service import shutdown_integration
+from src.services.sales_rollups import init_sales_rollups
 
 
 def create_app(config=None):
@@ -38,11 +43,17 @@ def create_app(config=None):
     
     init_db(app)
     
+    # Mantener sales_daily_rollups en la misma transacción que las órdenes
+    init_sales_rollups()
+    
     # Configurar CORS para permitir conexiones desde aplicación Android
     CORS(app)
     
     register_error_handlers(app)
     
+    # Cerrar la sesión HTTP y el pool de consultas a catálogo/logística al salir
+    atexit.register(shutdown_integration)
+    
     app.register_blueprint(customers_bp)
     app.register_blueprint(orders_bp)
     app.register_blueprint(visits_bp)
@@ -52,6 +63,15 @@ def create_app(config=None):
     app.register_blueprint(salesperson_goals_bp)  # Blueprint para objetivos de vendedores
     app.register_blueprint(reports_bp)  # Blueprint para reportes e informes
     
+    @app.cli.command('rebuild-sales-rollups')
+    @click.option('--from-date', default=None, help='Fecha inicial (YYYY-MM-DD)')
+    @click.option('--to-date', default=None, help='Fecha final, inclusive (YYYY-MM-DD)')
+    def rebuild_sales_rollups(from_date, to_date):
+        """Recalcula sales_daily_rollups desde las órdenes (backfill)."""
+        result = RebuildSalesRollups(from_date, to_date).execute()
+        click.echo(f"📊 Rollups de ventas {result['from_date']} → {result['to_date']}: "
+                   f"{result['months']} meses, {result['rows']} filas")
+    
     @app.route('/health', methods=['GET'])
     def health():
         return jsonify({
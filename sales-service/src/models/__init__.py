@@ -2,5 +2,8 @@ from .customer import Customer
 from .order import Order
 from .order_item import OrderItem
 from .commercial_condition import CommercialCondition
+from .order_number_counter import OrderNumberCounter
+from .sales_daily_rollup import SalesDailyRollup
+from .report_export_job import ReportExportJob
 
-__all__ = ['Customer', 'Order', 'OrderItem', 'CommercialCondition']
+__all__ = ['Customer', 'Order', 'OrderItem', 'CommercialCondition', 'OrderNumberCounter', 'SalesDailyRollup', 'ReportExportJob']
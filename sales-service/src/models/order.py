@@ -20,7 +20,7 @@ class Order(db.Model):
     
     seller_id = db.Column(db.String(50), nullable=False)  # ID del vendedor desde sistema externo
     seller_name = db.Column(db.String(100))
-    order_date = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    order_date = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     status = db.Column(db.String(50), default='pending', nullable=False)  # pending, confirmed, processing, shipped, delivered, cancelled
     subtotal = db.Column(db.Numeric(15, 2), nullable=False)
     discount_amount = db.Column(db.Numeric(15, 2), default=0.0)
@@ -9,7 +9,7 @@ class OrderItem(db.Model):
     __tablename__ = 'order_items'
     
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
     product_sku = db.Column(db.String(50), nullable=False, index=True)
     product_name = db.Column(db.String(200), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
@@ -52,28 +52,47 @@ class OrderItem(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
     
-    def calculate_totals(self):
-        """Calculate discount, tax, and total amounts."""
+    @staticmethod
+    def compute_totals(unit_price, quantity, discount_percentage, tax_percentage):
+        """
+        Calculate discount, subtotal, tax and total amounts for a line.
+        
+        Returns:
+            dict: discount_amount, subtotal, tax_amount and total as Decimal
+        """
         # Ensure all values are Decimal for consistent calculations
-        unit_price = Decimal(str(self.unit_price)) if not isinstance(self.unit_price, Decimal) else self.unit_price
-        quantity = Decimal(str(self.quantity)) if not isinstance(self.quantity, Decimal) else self.quantity
-        discount_pct = Decimal(str(self.discount_percentage)) if not isinstance(self.discount_percentage, Decimal) else self.discount_percentage
-        tax_pct = Decimal(str(self.tax_percentage)) if not isinstance(self.tax_percentage, Decimal) else self.tax_percentage
+        unit_price = Decimal(str(unit_price)) if not isinstance(unit_price, Decimal) else unit_price
+        quantity = Decimal(str(quantity)) if not isinstance(quantity, Decimal) else quantity
+        discount_pct = Decimal(str(discount_percentage)) if not isinstance(discount_percentage, Decimal) else discount_percentage
+        tax_pct = Decimal(str(tax_percentage)) if not isinstance(tax_percentage, Decimal) else tax_percentage
         
         # Calculate discount amount
         if discount_pct and discount_pct > 0:
-            self.discount_amount = (unit_price * quantity * discount_pct) / Decimal('100')
+            discount_amount = (unit_price * quantity * discount_pct) / Decimal('100')
         else:
-            self.discount_amount = Decimal('0.0')
+            discount_amount = Decimal('0.0')
         
         # Calculate subtotal after discount
-        self.subtotal = (unit_price * quantity) - self.discount_amount
+        subtotal = (unit_price * quantity) - discount_amount
         
         # Calculate tax amount
         if tax_pct and tax_pct > 0:
-            self.tax_amount = (self.subtotal * tax_pct) / Decimal('100')
+            tax_amount = (subtotal * tax_pct) / Decimal('100')
         else:
-            self.tax_amount = Decimal('0.0')
+            tax_amount = Decimal('0.0')
         
         # Calculate total
-        self.total = self.subtotal + self.tax_amount
+        return {
+            'discount_amount': discount_amount,
+            'subtotal': subtotal,
+            'tax_amount': tax_amount,
+            'total': subtotal + tax_amount
+        }
+    
+    def calculate_totals(self):
+        """Calculate discount, tax, and total amounts."""
+        totals = self.compute_totals(self.unit_price, self.quantity, self.discount_percentage, self.tax_percentage)
+        self.discount_amount = totals['discount_amount']
+        self.subtotal = totals['subtotal']
+        self.tax_amount = totals['tax_amount']
+        self.total = totals['total']
@@ -0,0 +1,13 @@
+from src.session import db
+
+
+class OrderNumberCounter(db.Model):
+    """Último consecutivo de número de orden asignado por día (ORD-YYYYMMDD-NNNN)."""
+    
+    __tablename__ = 'order_number_counters'
+    
+    day = db.Column(db.String(8), primary_key=True)  # YYYYMMDD
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<OrderNumberCounter {self.day}: {self.last_value}>'
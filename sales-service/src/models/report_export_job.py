@@ -0,0 +1,49 @@
+from datetime import datetime
+from src.session import db
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_COMPLETED = 'completed'
+STATUS_FAILED = 'failed'
+
+ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+
+
+class ReportExportJob(db.Model):
+    """
+    Exportación de reporte de ventas generada en segundo plano.
+
+    El archivo queda en la caché de exportaciones bajo cache_key; el estado se
+    guarda aquí para que cualquier worker pueda responder la consulta y la descarga.
+    """
+
+    __tablename__ = 'report_export_jobs'
+
+    id = db.Column(db.String(32), primary_key=True)
+    format = db.Column(db.String(10), nullable=False)  # excel, pdf
+    filters = db.Column(db.JSON, nullable=False, default=dict)
+    cache_key = db.Column(db.String(64), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default=STATUS_QUEUED, index=True)
+    estimated_rows = db.Column(db.Integer)
+    error = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'format': self.format,
+            'filters': self.filters or {},
+            'status': self.status,
+            'estimated_rows': self.estimated_rows,
+            'error': self.error,
+            'download_url': f'/reports/export/jobs/{self.id}/download' if self.status == STATUS_COMPLETED else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<ReportExportJob {self.id} {self.format}: {self.status}>'
@@ -0,0 +1,32 @@
+from datetime import datetime
+from src.session import db
+
+
+class SalesDailyRollup(db.Model):
+    """
+    Ventas agregadas por día, vendedor, estado de la orden y producto.
+
+    Se actualiza en la misma transacción que crea, modifica o elimina órdenes
+    (ver src/services/sales_rollups.py) y se recalcula con RebuildSalesRollups.
+    """
+    
+    __tablename__ = 'sales_daily_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'seller_id', 'product_sku', 'status', 'product_name',
+                            name='uq_sales_daily_rollups_key'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    seller_id = db.Column(db.String(50), nullable=False, index=True)
+    status = db.Column(db.String(50), nullable=False)
+    product_sku = db.Column(db.String(50), nullable=False, index=True)
+    product_name = db.Column(db.String(200), nullable=False)
+    quantity = db.Column(db.BigInteger, nullable=False, default=0)
+    total = db.Column(db.Numeric(18, 2), nullable=False, default=0)
+    item_count = db.Column(db.Integer, nullable=False, default=0)  # Líneas de pedido agregadas
+    # Último cambio de la fila; con el conteo, max(id) y las sumas forma la versión de datos de las exportaciones
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f'<SalesDailyRollup {self.day} {self.seller_id} {self.product_sku}: qty={self.quantity}>'
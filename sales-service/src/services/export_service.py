@@ -1,204 +1,331 @@
 """
 Export service for sales reports.
-Handles PDF and Excel export functionality.
+Handles PDF, Excel and CSV export functionality.
+
+Rows are consumed from an iterator (GetSalesSummaryReport.iter_summary) and
+written as they arrive: Excel uses openpyxl write-only mode, PDF pages are
+drawn directly on the canvas and CSV is yielded in chunks, so memory does not
+grow with the number of rows. Finished files are kept in ExportCache.
 """
+import csv
+import io
 import os
 import tempfile
+import threading
+import time
+import uuid
+import warnings
 from datetime import datetime
-from typing import Dict, List, Any
-import pandas as pd
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
-from reportlab.lib.pagesizes import letter, A4
+from typing import Any, Dict, Iterable, Iterator, Optional
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.table import Table as ExcelTable, TableColumn, TableStyleInfo
+from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.colors import HexColor
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
 
 
+def _money(value) -> str:
+    return f"${value:,.2f}" if value is not None else ""
+
+
+def _number(value) -> str:
+    return f"{value:,.2f}" if value is not None else ""
+
+
+def _percentage(value) -> str:
+    return f"{value:.2f}%" if value is not None else ""
+
+
+# (clave del resumen, encabezado, ancho en Excel, formato)
+EXCEL_COLUMNS = [
+    ('fecha', 'Fecha', 12, None),
+    ('vendedor', 'Vendedor', 25, None),
+    ('region', 'Región', 12, None),
+    ('territory', 'Territorio', 15, None),
+    ('product_sku', 'SKU Producto', 16, None),
+    ('product_name', 'Nombre Producto', 40, None),
+    ('volumen_ventas', 'Volumen Ventas', 16, None),
+    ('valor_total', 'Valor Total', 18, _money),
+    ('valor_objetivo', 'Objetivo', 16, _number),
+    ('tipo_objetivo', 'Tipo Objetivo', 15, None),
+    ('cumplimiento_porcentaje', 'Cumplimiento %', 16, _percentage),
+]
+
+CSV_COLUMNS = [
+    ('fecha', 'Fecha'),
+    ('employee_id', 'ID Vendedor'),
+    ('vendedor', 'Vendedor'),
+    ('region', 'Región'),
+    ('territory', 'Territorio'),
+    ('product_sku', 'SKU Producto'),
+    ('product_name', 'Nombre Producto'),
+    ('volumen_ventas', 'Volumen Ventas'),
+    ('valor_total', 'Valor Total'),
+    ('valor_objetivo', 'Objetivo'),
+    ('tipo_objetivo', 'Tipo Objetivo'),
+    ('cumplimiento_porcentaje', 'Cumplimiento %'),
+]
+
+# Encabezados y anchos relativos de la tabla de detalle del PDF
+PDF_HEADERS = ['Fecha', 'Vendedor', 'Región', 'Producto', 'Cantidad', 'Valor', 'Objetivo', 'Cumpl.%']
+PDF_WIDTHS = [55, 95, 45, 75, 45, 70, 65, 48]
+PDF_ROW_HEIGHT = 14
+PDF_HEADER_HEIGHT = 20
+
+CSV_CHUNK_ROWS = 500
+
+
+class _Counter:
+    """Iterator wrapper that counts the rows it yields."""
+
+    def __init__(self, rows: Iterable):
+        self.rows = iter(rows)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = next(self.rows)
+        self.count += 1
+        return row
+
+
+class ExportCache:
+    """
+    Caché en disco de exportaciones terminadas.
+
+    Cada archivo se guarda como <clave>.<extensión>; la clave incluye el hash
+    de los filtros y la versión de los datos, así que un cambio en las ventas
+    produce otra clave. Los archivos vencen a los ttl_seconds de creados y,
+    por encima de max_bytes, se borran los usados hace más tiempo.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: int = 900, max_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def settings(self):
+        return self.directory, self.ttl_seconds, self.max_bytes
+
+    def path(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, f'{key}.{extension}')
+
+    def get(self, key: str, extension: str) -> Optional[str]:
+        """Ruta del archivo si existe y no ha vencido (lo marca como usado)."""
+        path = self.path(key, extension)
+        try:
+            created = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+
+        now = time.time()
+        if now - created > self.ttl_seconds:
+            self.discard(path)
+            return None
+
+        os.utime(path, (now, created))  # atime = último uso, mtime = creación
+        return path
+
+    def temp_path(self, extension: str) -> str:
+        """Archivo temporal en el mismo directorio (para publicarlo con os.replace)."""
+        return os.path.join(self.directory, f'.{uuid.uuid4().hex}.{extension}.part')
+
+    def store(self, temp_path: str, key: str, extension: str) -> str:
+        """Publica un archivo terminado bajo su clave y aplica TTL y cuota."""
+        path = self.path(key, extension)
+        os.replace(temp_path, path)
+        self.prune(keep=path)
+        return path
+
+    def prune(self, keep: Optional[str] = None):
+        """Borra archivos vencidos y, si se supera la cuota, los menos usados."""
+        now = time.time()
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime > self.ttl_seconds:
+                    # Vencidos, incluidos temporales huérfanos de exportaciones interrumpidas
+                    self.discard(entry.path)
+                elif not entry.name.startswith('.'):
+                    entries.append((stat.st_atime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path != keep:
+                    self.discard(path)
+                    total -= size
+
+    def get_stats(self) -> Dict[str, Any]:
+        files = [entry for entry in os.scandir(self.directory) if entry.is_file() and not entry.name.startswith('.')]
+        return {
+            'directory': self.directory,
+            'files': len(files),
+            'bytes': sum(entry.stat().st_size for entry in files),
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl_seconds
+        }
+
+    @staticmethod
+    def discard(path: str):
+        """Borra un archivo de la caché (o un temporal) si existe."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+_export_cache = None
+_export_cache_lock = threading.Lock()
+
+
+def get_export_cache(directory: str, ttl_seconds: int, max_bytes: int) -> ExportCache:
+    """Caché de exportaciones compartida (se recrea si cambia la configuración)."""
+    global _export_cache
+
+    with _export_cache_lock:
+        if _export_cache is None or _export_cache.settings != (directory, ttl_seconds, max_bytes):
+            _export_cache = ExportCache(directory, ttl_seconds, max_bytes)
+        return _export_cache
+
+
 class ReportExportService:
-    """Service for exporting sales reports to PDF and Excel."""
-    
+    """Service for exporting sales reports to PDF, Excel and CSV."""
+
     def __init__(self):
         self.temp_dir = tempfile.gettempdir()
-    
+
     def export_to_excel(self, report_data: Dict[str, Any], filters: Dict[str, Any] = None) -> str:
         """
-        Export report data to Excel file.
-        
-        Args:
-            report_data: Dictionary containing summary, totals, etc.
-            filters: Applied filters information
-            
+        Export an already computed report (GetSalesSummaryReport.execute) to Excel.
+
         Returns:
             str: Path to the created Excel file
         """
-        # Prepare data
-        df = pd.DataFrame(report_data.get('summary', []))
-        
-        if df.empty:
-            # Create empty dataframe with headers
-            df = pd.DataFrame(columns=[
-                'Fecha', 'Vendedor', 'Región', 'Territorio', 'SKU Producto', 
-                'Nombre Producto', 'Volumen Ventas', 'Valor Total', 
-                'Objetivo', 'Tipo Objetivo', 'Cumplimiento %'
-            ])
-        else:
-            # Rename columns to Spanish
-            column_mapping = {
-                'fecha': 'Fecha',
-                'vendedor': 'Vendedor',
-                'region': 'Región',
-                'territory': 'Territorio',
-                'product_sku': 'SKU Producto',
-                'product_name': 'Nombre Producto',
-                'volumen_ventas': 'Volumen Ventas',
-                'valor_total': 'Valor Total',
-                'valor_objetivo': 'Objetivo',
-                'tipo_objetivo': 'Tipo Objetivo',
-                'cumplimiento_porcentaje': 'Cumplimiento %'
-            }
-            
-            # Select and rename columns
-            available_cols = [col for col in column_mapping.keys() if col in df.columns]
-            df = df[available_cols].rename(columns=column_mapping)
-            
-            # Format numeric columns
-            if 'Valor Total' in df.columns:
-                df['Valor Total'] = df['Valor Total'].apply(lambda x: f"${x:,.2f}" if pd.notnull(x) else "")
-            if 'Objetivo' in df.columns:
-                df['Objetivo'] = df['Objetivo'].apply(lambda x: f"{x:,.2f}" if pd.notnull(x) else "")
-            if 'Cumplimiento %' in df.columns:
-                df['Cumplimiento %'] = df['Cumplimiento %'].apply(lambda x: f"{x:.2f}%" if pd.notnull(x) else "")
-        
-        # Create Excel file
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'reporte_ventas_{timestamp}.xlsx'
-        filepath = os.path.join(self.temp_dir, filename)
-        
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            # Write main data
-            df.to_excel(writer, sheet_name='Reporte de Ventas', index=False, startrow=4)
-            
-            # Get workbook and worksheet
-            workbook = writer.book
-            worksheet = writer.sheets['Reporte de Ventas']
-            
-            # Add header information
-            self._add_excel_header(worksheet, filters, report_data.get('totals', {}))
-            
-            # Format the table
-            self._format_excel_table(worksheet, df, start_row=5)
-        
+        filepath = os.path.join(self.temp_dir, f'reporte_ventas_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx')
+        self.write_excel(report_data.get('summary', []), report_data.get('totals', {}), filters, filepath)
         return filepath
-    
-    def _add_excel_header(self, worksheet, filters: Dict, totals: Dict):
-        """Add header information to Excel worksheet."""
-        # Title
-        worksheet['A1'] = 'REPORTE DE VENTAS - MEDISUPPLY'
-        worksheet['A1'].font = Font(size=16, bold=True)
-        
-        # Date
-        worksheet['A2'] = f'Generado el: {datetime.now().strftime("%d/%m/%Y %H:%M")}'
-        worksheet['A2'].font = Font(size=10, italic=True)
-        
-        # Filters applied
+
+    def export_to_pdf(self, report_data: Dict[str, Any], filters: Dict[str, Any] = None) -> str:
+        """
+        Export an already computed report (GetSalesSummaryReport.execute) to PDF.
+
+        Returns:
+            str: Path to the created PDF file
+        """
+        filepath = os.path.join(self.temp_dir, f'reporte_ventas_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf')
+        self.write_pdf(report_data.get('summary', []), report_data.get('totals', {}), filters, filepath)
+        return filepath
+
+    def write_excel(self, rows: Iterable[Dict[str, Any]], totals: Dict[str, Any],
+                    filters: Dict[str, Any], filepath: str) -> int:
+        """
+        Write the report to an Excel file in write-only mode.
+
+        Rows are written as plain values while they are read; the alternate
+        row colors come from an Excel table style instead of per-cell fills,
+        and column widths are fixed up front because write-only sheets cannot
+        be revisited.
+
+        Returns:
+            int: Number of data rows written
+        """
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet('Reporte de Ventas')
+        for index, (_, _, width, _) in enumerate(EXCEL_COLUMNS, 1):
+            worksheet.column_dimensions[get_column_letter(index)].width = width
+
+        def styled(value, **style):
+            cell = WriteOnlyCell(worksheet, value=value)
+            for name, attribute in style.items():
+                setattr(cell, name, attribute)
+            return cell
+
+        header_lines = [
+            [styled('REPORTE DE VENTAS - MEDISUPPLY', font=Font(size=16, bold=True))],
+            [styled(f'Generado el: {datetime.now().strftime("%d/%m/%Y %H:%M")}', font=Font(size=10, italic=True))],
+        ]
         if filters:
             filter_text = "Filtros aplicados: " + ", ".join([f"{k}: {v}" for k, v in filters.items()])
-            worksheet['A3'] = filter_text
-            worksheet['A3'].font = Font(size=10, color="666666")
-        
-        # Summary totals - show in separate area
+            header_lines.append([styled(filter_text, font=Font(size=10, color="666666"))])
+        header_lines.append([])
+
+        # Summary totals
         if totals:
-            col = 'H'  # Start from column H
-            worksheet[f'{col}1'] = 'RESUMEN'
-            worksheet[f'{col}1'].font = Font(size=12, bold=True)
-            
-            row = 2
-            for key, value in totals.items():
-                label = self._format_total_label(key)
-                if isinstance(value, (int, float)):
-                    if 'valor' in key.lower():
-                        formatted_value = f"${value:,.2f}"
-                    else:
-                        formatted_value = f"{value:,}"
-                else:
-                    formatted_value = str(value)
-                
-                worksheet[f'{col}{row}'] = f"{label}: {formatted_value}"
-                worksheet[f'{col}{row}'].font = Font(size=10)
-                row += 1
-    
-    def _format_total_label(self, key: str) -> str:
-        """Format total labels in Spanish."""
-        labels = {
-            'total_volumen_ventas': 'Total Unidades',
-            'total_valor_total': 'Total Ventas',
-            'unique_salespersons': 'Vendedores',
-            'unique_products': 'Productos',
-            'unique_regions': 'Regiones'
-        }
-        return labels.get(key, key.replace('_', ' ').title())
-    
-    def _format_excel_table(self, worksheet, df, start_row: int):
-        """Apply formatting to the Excel table."""
-        if df.empty:
-            return
-            
-        # Header row formatting
+            header_lines.append([styled('RESUMEN', font=Font(size=12, bold=True))])
+            header_lines += [
+                [styled(f"{self._format_total_label(key)}: {self._format_total_value(key, value)}", font=Font(size=10))]
+                for key, value in totals.items()
+            ]
+            header_lines.append([])
+
+        # Table header
         header_fill = PatternFill(start_color="4CAF50", end_color="4CAF50", fill_type="solid")
         header_font = Font(color="FFFFFF", bold=True)
-        
-        for col_num, column_title in enumerate(df.columns, 1):
-            cell = worksheet.cell(row=start_row, column=col_num)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
-        
-        # Data rows - alternate colors
-        light_fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
-        
-        for row_num in range(start_row + 1, start_row + len(df) + 1):
-            if (row_num - start_row) % 2 == 0:
-                for col_num in range(1, len(df.columns) + 1):
-                    worksheet.cell(row=row_num, column=col_num).fill = light_fill
-        
-        # Auto-adjust column widths
-        for col in worksheet.columns:
-            max_length = 0
-            column = col[0].column_letter
-            for cell in col:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column].width = adjusted_width
-    
-    def export_to_pdf(self, report_data: Dict[str, Any], filters: Dict[str, Any] = None) -> str:
+        center = Alignment(horizontal="center")
+        header_lines.append([
+            styled(header, fill=header_fill, font=header_font, alignment=center)
+            for _, header, _, _ in EXCEL_COLUMNS
+        ])
+        for line in header_lines:
+            worksheet.append(line)
+
+        count = 0
+        for count, item in enumerate(rows, 1):
+            worksheet.append([
+                formatter(item.get(key)) if formatter else item.get(key)
+                for key, _, _, formatter in EXCEL_COLUMNS
+            ])
+
+        if count:
+            header_row = len(header_lines)
+            # Write-only sheets cannot read the header cells back: name the columns here
+            table = ExcelTable(
+                displayName='ReporteVentas',
+                ref=f'A{header_row}:{get_column_letter(len(EXCEL_COLUMNS))}{header_row + count}',
+                tableColumns=[TableColumn(id=index, name=header) for index, (_, header, _, _) in enumerate(EXCEL_COLUMNS, 1)]
+            )
+            table.tableStyleInfo = TableStyleInfo(name='TableStyleLight15', showRowStripes=True)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)  # openpyxl always warns in write-only mode
+                worksheet.add_table(table)
+
+        workbook.save(filepath)
+        return count
+
+    def write_pdf(self, rows: Iterable[Dict[str, Any]], totals: Dict[str, Any],
+                  filters: Dict[str, Any], filepath: str, max_rows: Optional[int] = None) -> int:
         """
-        Export report data to PDF file.
-        
-        Args:
-            report_data: Dictionary containing summary, totals, etc.
-            filters: Applied filters information
-            
+        Write the report to a PDF file, drawing the detail table page by page.
+
+        Only the current page is held in memory (finished pages are kept as
+        compressed streams by reportlab). With max_rows the detail stops there
+        and a note points to the Excel/CSV exports.
+
         Returns:
-            str: Path to the created PDF file
+            int: Number of data rows written
         """
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'reporte_ventas_{timestamp}.pdf'
-        filepath = os.path.join(self.temp_dir, filename)
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(filepath, pagesize=A4, topMargin=0.5*inch)
-        
-        # Container for elements
-        elements = []
-        
-        # Styles
+        page_width, page_height = A4
+        margin = 0.5 * inch
+        available_width = page_width - 2 * margin
+        pdf = canvas.Canvas(filepath, pagesize=A4)
         styles = getSampleStyleSheet()
         title_style = ParagraphStyle(
             'CustomTitle',
@@ -208,39 +335,21 @@ class ReportExportService:
             spaceAfter=20,
             alignment=1  # Center
         )
-        
-        # Title
-        title = Paragraph("REPORTE DE VENTAS - MEDISUPPLY", title_style)
-        elements.append(title)
-        
-        # Date and filters info
-        date_text = f"Generado el: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
-        elements.append(Paragraph(date_text, styles['Normal']))
-        elements.append(Spacer(1, 12))
-        
+
+        # Title, date, filters and summary totals
+        elements = [
+            Paragraph("REPORTE DE VENTAS - MEDISUPPLY", title_style),
+            Paragraph(f"Generado el: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal']),
+            Spacer(1, 12)
+        ]
         if filters:
             filter_text = "Filtros aplicados: " + ", ".join([f"<b>{k}:</b> {v}" for k, v in filters.items()])
-            elements.append(Paragraph(filter_text, styles['Normal']))
-            elements.append(Spacer(1, 12))
-        
-        # Summary totals
-        totals = report_data.get('totals', {})
+            elements += [Paragraph(filter_text, styles['Normal']), Spacer(1, 12)]
         if totals:
-            elements.append(Paragraph("<b>RESUMEN EJECUTIVO</b>", styles['Heading2']))
-            
-            summary_data = []
-            for key, value in totals.items():
-                label = self._format_total_label(key)
-                if isinstance(value, (int, float)):
-                    if 'valor' in key.lower():
-                        formatted_value = f"${value:,.2f}"
-                    else:
-                        formatted_value = f"{value:,}"
-                else:
-                    formatted_value = str(value)
-                summary_data.append([label, formatted_value])
-            
-            summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
+            summary_table = Table(
+                [[self._format_total_label(key), self._format_total_value(key, value)] for key, value in totals.items()],
+                colWidths=[3*inch, 2*inch]
+            )
             summary_table.setStyle(TableStyle([
                 ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
                 ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
@@ -250,69 +359,155 @@ class ReportExportService:
                 ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
                 ('GRID', (0, 0), (-1, -1), 1, colors.black)
             ]))
-            elements.append(summary_table)
-            elements.append(Spacer(1, 20))
-        
-        # Main data table
-        summary_data = report_data.get('summary', [])
-        if summary_data:
-            elements.append(Paragraph("<b>DETALLE DE VENTAS</b>", styles['Heading2']))
-            
-            # Prepare table data
-            headers = ['Fecha', 'Vendedor', 'Región', 'Producto', 'Cantidad', 'Valor', 'Objetivo', 'Cumpl.%']
-            table_data = [headers]
-            
-            for item in summary_data:
-                row = [
-                    item.get('fecha', '')[:10] if item.get('fecha') else '',
-                    item.get('vendedor', '')[:20] if item.get('vendedor') else '',
-                    item.get('region', ''),
-                    item.get('product_sku', ''),
-                    str(item.get('volumen_ventas', 0)),
-                    f"${item.get('valor_total', 0):,.0f}",
-                    str(item.get('valor_objetivo', '') or ''),
-                    f"{item.get('cumplimiento_porcentaje', 0):.1f}%" if item.get('cumplimiento_porcentaje') else ''
-                ]
-                table_data.append(row)
-            
-            # Create table
-            table = Table(table_data, repeatRows=1)
-            table.setStyle(TableStyle([
-                # Header styling
-                ('BACKGROUND', (0, 0), (-1, 0), HexColor('#4CAF50')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                
-                # Data styling
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                
-                # Alternating row colors
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-            ]))
-            
-            elements.append(table)
-        else:
+            elements += [Paragraph("<b>RESUMEN EJECUTIVO</b>", styles['Heading2']), summary_table, Spacer(1, 20)]
+
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
             elements.append(Paragraph("No se encontraron datos para los filtros aplicados.", styles['Normal']))
-        
-        # Build PDF
-        doc.build(elements)
-        
-        return filepath
-    
+        else:
+            elements.append(Paragraph("<b>DETALLE DE VENTAS</b>", styles['Heading2']))
+
+        y = page_height - margin
+        for element in elements:
+            _, height = element.wrapOn(pdf, available_width, y - margin)
+            element.drawOn(pdf, margin, y - height)
+            y -= height + element.getSpaceAfter()
+
+        count = 0
+        if first is not None:
+            scale = available_width / sum(PDF_WIDTHS)
+            widths = [width * scale for width in PDF_WIDTHS]
+            y = self._draw_pdf_header(pdf, margin, y, widths)
+
+            for count, item in enumerate(self._chain(first, rows), 1):
+                if max_rows is not None and count > max_rows:
+                    count -= 1
+                    if y - 2 * PDF_ROW_HEIGHT < margin:
+                        pdf.showPage()
+                        y = page_height - margin
+                    pdf.setFont('Helvetica-Oblique', 9)
+                    pdf.drawString(margin, y - PDF_ROW_HEIGHT,
+                                   f"Se muestran las primeras {max_rows:,} filas; exporte a Excel o CSV para ver el detalle completo.")
+                    break
+
+                if y - PDF_ROW_HEIGHT < margin:
+                    pdf.showPage()
+                    y = self._draw_pdf_header(pdf, margin, page_height - margin, widths)
+
+                background = colors.white if count % 2 else colors.lightgrey
+                self._draw_pdf_row(pdf, margin, y, widths, self._pdf_values(item), background)
+                y -= PDF_ROW_HEIGHT
+
+        pdf.save()
+        return count
+
+    def iter_csv(self, rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """
+        Yield the report as CSV text in chunks of CSV_CHUNK_ROWS rows.
+
+        Starts with a UTF-8 BOM so Excel opens the accents correctly.
+        """
+        buffer = io.StringIO()
+        buffer.write('\ufeff')
+        writer = csv.writer(buffer)
+        writer.writerow([header for _, header in CSV_COLUMNS])
+
+        for count, item in enumerate(rows, 1):
+            writer.writerow([item.get(key) for key, _ in CSV_COLUMNS])
+            if count % CSV_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def write_csv(self, rows: Iterable[Dict[str, Any]], filepath: str) -> int:
+        """
+        Write the report to a CSV file.
+
+        Returns:
+            int: Number of data rows written
+        """
+        counter = _Counter(rows)
+        with open(filepath, 'w', encoding='utf-8', newline='') as output:
+            for chunk in self.iter_csv(counter):
+                output.write(chunk)
+        return counter.count
+
+    def _format_total_label(self, key: str) -> str:
+        """Format total labels in Spanish."""
+        labels = {
+            'total_volumen_ventas': 'Total Unidades',
+            'total_valor_total': 'Total Ventas',
+            'unique_salespersons': 'Vendedores',
+            'unique_products': 'Productos',
+            'unique_regions': 'Regiones'
+        }
+        return labels.get(key, key.replace('_', ' ').title())
+
+    @staticmethod
+    def _format_total_value(key: str, value) -> str:
+        if isinstance(value, (int, float)):
+            return f"${value:,.2f}" if 'valor' in key.lower() else f"{value:,}"
+        return str(value)
+
+    @staticmethod
+    def _pdf_values(item: Dict[str, Any]):
+        return [
+            item.get('fecha', '')[:10] if item.get('fecha') else '',
+            item.get('vendedor', '')[:20] if item.get('vendedor') else '',
+            item.get('region') or '',
+            item.get('product_sku') or '',
+            str(item.get('volumen_ventas', 0)),
+            f"${item.get('valor_total', 0):,.0f}",
+            str(item.get('valor_objetivo', '') or ''),
+            f"{item.get('cumplimiento_porcentaje', 0):.1f}%" if item.get('cumplimiento_porcentaje') else ''
+        ]
+
+    @staticmethod
+    def _fit(text: str, font: str, size: int, width: float) -> str:
+        """Cut text that does not fit in the column."""
+        while text and stringWidth(text, font, size) > width - 4:
+            text = text[:-1]
+        return text
+
+    def _draw_pdf_header(self, pdf, x: float, y: float, widths) -> float:
+        pdf.setFillColor(HexColor('#4CAF50'))
+        pdf.rect(x, y - PDF_HEADER_HEIGHT, sum(widths), PDF_HEADER_HEIGHT, stroke=0, fill=1)
+        pdf.setFillColor(colors.whitesmoke)
+        pdf.setFont('Helvetica-Bold', 10)
+        self._draw_pdf_cells(pdf, x, y, widths, PDF_HEADERS, PDF_HEADER_HEIGHT, 'Helvetica-Bold', 10)
+        return y - PDF_HEADER_HEIGHT
+
+    def _draw_pdf_row(self, pdf, x: float, y: float, widths, values, background):
+        pdf.setFillColor(background)
+        pdf.rect(x, y - PDF_ROW_HEIGHT, sum(widths), PDF_ROW_HEIGHT, stroke=0, fill=1)
+        pdf.setFillColor(colors.black)
+        pdf.setFont('Helvetica', 8)
+        self._draw_pdf_cells(pdf, x, y, widths, values, PDF_ROW_HEIGHT, 'Helvetica', 8)
+
+    def _draw_pdf_cells(self, pdf, x: float, y: float, widths, values, height: float, font: str, size: int):
+        pdf.setStrokeColor(colors.black)
+        for width, value in zip(widths, values):
+            pdf.rect(x, y - height, width, height, stroke=1, fill=0)
+            pdf.drawCentredString(x + width / 2, y - height + (height - size) / 2 + 1,
+                                  self._fit(str(value), font, size, width))
+            x += width
+
+    @staticmethod
+    def _chain(first, rest):
+        yield first
+        yield from rest
+
     def cleanup_file(self, filepath: str) -> bool:
         """
         Clean up temporary file.
-        
+
         Args:
             filepath: Path to file to delete
-            
+
         Returns:
             bool: True if file was deleted successfully
         """
@@ -322,4 +517,4 @@ class ReportExportService:
                 return True
             return False
         except Exception:
-            return False
\ No newline at end of file
+            return False
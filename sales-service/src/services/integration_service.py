@@ -1,6 +1,129 @@
 import requests
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from src.errors.errors import ExternalServiceError, ValidationError
+from src.services.ttl_cache import TTLCache
+
+# Máximo de SKUs por llamada a /cart/stock/realtime (viajan en la query string)
+STOCK_BATCH_SIZE = 100
+
+
+class ProductCache:
+    """
+    Caché en memoria de productos del catálogo con TTL y revalidación por ETag.
+
+    Mientras una entrada está vigente se sirve sin llamar al catálogo; al vencer
+    se revalida con If-None-Match y un 304 la renueva sin volver a transferir
+    el producto. Se descartan las entradas menos usadas por encima de max_entries.
+    Con ttl_seconds <= 0 no guarda nada.
+    """
+
+    def __init__(self, ttl_seconds=30, max_entries=5000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._cache = TTLCache(ttl_seconds, max_entries)  # sku -> (producto, etag)
+
+    def lookup(self, sku):
+        """
+        Busca un producto en caché.
+
+        Returns:
+            tuple: (producto, etag, vigente); (None, None, False) si no está
+        """
+        entry, fresh = self._cache.lookup(sku)
+        if entry is None:
+            return None, None, False
+        product, etag = entry
+        return product, etag, fresh
+
+    def store(self, sku, product, etag):
+        """Guarda (o renueva tras un 304) el producto por ttl_seconds."""
+        self._cache.put(sku, (product, etag))
+
+    def invalidate(self, sku):
+        self._cache.invalidate(sku)
+
+    def get_stats(self):
+        stats = self._cache.get_stats()
+        return {
+            'entries': stats['entries'],
+            'hits': stats['hits'],
+            'revalidations': stats['stale_hits'],
+            'misses': stats['misses']
+        }
+
+
+_http_session = None
+_executor = None
+_product_cache = None
+_globals_lock = threading.Lock()
+
+
+def _max_workers():
+    return max(int(os.getenv('INTEGRATION_MAX_WORKERS', '8')), 1)
+
+
+def get_http_session():
+    """
+    Sesión HTTP compartida con catálogo y logística.
+
+    Reutiliza conexiones keep-alive entre peticiones; el pool admite tantas
+    conexiones por host como hilos de consulta (INTEGRATION_MAX_WORKERS).
+    """
+    global _http_session
+
+    with _globals_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=_max_workers())
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _http_session = session
+        return _http_session
+
+
+def get_integration_executor():
+    """
+    Pool de hilos para consultar catálogo y logística en paralelo.
+
+    Returns:
+        ThreadPoolExecutor o None si INTEGRATION_MAX_WORKERS <= 1 (consultas en serie)
+    """
+    global _executor
+
+    with _globals_lock:
+        if _executor is None and _max_workers() > 1:
+            _executor = ThreadPoolExecutor(max_workers=_max_workers(), thread_name_prefix='integration')
+        return _executor
+
+
+def get_product_cache():
+    """Caché de productos del catálogo (CATALOG_CACHE_TTL_SECONDS, CATALOG_CACHE_MAX_ENTRIES)."""
+    global _product_cache
+
+    with _globals_lock:
+        if _product_cache is None:
+            _product_cache = ProductCache(
+                ttl_seconds=int(os.getenv('CATALOG_CACHE_TTL_SECONDS', '30')),
+                max_entries=int(os.getenv('CATALOG_CACHE_MAX_ENTRIES', '5000'))
+            )
+        return _product_cache
+
+
+def shutdown_integration():
+    """Cierra la sesión HTTP y el pool de hilos y vacía la caché de productos."""
+    global _http_session, _executor, _product_cache
+
+    with _globals_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        if _http_session is not None:
+            _http_session.close()
+        _http_session = None
+        _executor = None
+        _product_cache = None
 
 
 class IntegrationService:
@@ -13,34 +136,44 @@ class IntegrationService:
         self.logistics_service_url = os.getenv('LOGISTICS_SERVICE_URL', 'http://localhost:3002')
         self.timeout = int(os.getenv('EXTERNAL_SERVICE_TIMEOUT', '3'))  # 3 segundos según HU-102
     
+    def _get(self, service, base_url, path, **kwargs):
+        """GET sobre la sesión compartida, traduciendo timeouts y errores de conexión."""
+        try:
+            return get_http_session().get(f"{base_url}{path}", timeout=self.timeout, **kwargs)
+        except requests.exceptions.Timeout:
+            raise ExternalServiceError(
+                f"{service.capitalize()} service timeout - request took longer than {self.timeout} seconds",
+                payload={'service': service, 'timeout': self.timeout}
+            )
+        except requests.exceptions.ConnectionError:
+            raise ExternalServiceError(
+                f"Cannot connect to {service} service",
+                payload={'service': service, 'url': base_url}
+            )
+    
     def get_product_by_sku(self, sku):
         """
         Obtiene información del producto desde catalog-service.
         
+        Se sirve desde la caché de productos mientras esté vigente y se
+        revalida con ETag al vencer.
+        
         Args:
             sku (str): SKU del producto
-            
+        
         Returns:
             dict: Información del producto
-            
+        
         Raises:
             ExternalServiceError: Si el servicio de catálogo no está disponible
             ValidationError: Si el producto no se encuentra o está inactivo
         """
         try:
-            url = f"{self.catalog_service_url}/products/{sku}"
-            response = requests.get(url, timeout=self.timeout)
-            
-            if response.status_code == 404:
-                raise ValidationError(f"Product with SKU '{sku}' not found in catalog")
-            
-            if response.status_code != 200:
-                raise ExternalServiceError(
-                    f"Catalog service returned status {response.status_code}",
-                    payload={'service': 'catalog', 'status_code': response.status_code}
-                )
+            cache = get_product_cache()
+            product, etag, fresh = cache.lookup(sku)
             
-            product = response.json()
+            if not fresh:
+                product = self._fetch_product(sku, product, etag, cache)
             
             # Validar que el producto esté activo
             if not product.get('is_active', False):
@@ -49,18 +182,8 @@ class IntegrationService:
                     payload={'sku': sku, 'is_active': False}
                 )
             
-            return product
-            
-        except requests.exceptions.Timeout:
-            raise ExternalServiceError(
-                "Catalog service timeout - request took longer than 3 seconds",
-                payload={'service': 'catalog', 'timeout': self.timeout}
-            )
-        except requests.exceptions.ConnectionError:
-            raise ExternalServiceError(
-                "Cannot connect to catalog service",
-                payload={'service': 'catalog', 'url': self.catalog_service_url}
-            )
+            return dict(product)
+        
         except (ValidationError, ExternalServiceError):
             raise
         except Exception as e:
@@ -69,6 +192,29 @@ class IntegrationService:
                 payload={'service': 'catalog', 'error': str(e)}
             )
     
+    def _fetch_product(self, sku, cached_product, etag, cache):
+        """Descarga (o revalida con If-None-Match) el producto y actualiza la caché."""
+        headers = {'If-None-Match': etag} if etag and cached_product is not None else {}
+        response = self._get('catalog', self.catalog_service_url, f"/products/{sku}", headers=headers)
+        
+        if response.status_code == 304 and cached_product is not None:
+            cache.store(sku, cached_product, etag)
+            return cached_product
+        
+        if response.status_code == 404:
+            cache.invalidate(sku)
+            raise ValidationError(f"Product with SKU '{sku}' not found in catalog")
+        
+        if response.status_code != 200:
+            raise ExternalServiceError(
+                f"Catalog service returned status {response.status_code}",
+                payload={'service': 'catalog', 'status_code': response.status_code}
+            )
+        
+        product = response.json()
+        cache.store(sku, product, response.headers.get('ETag'))
+        return product
+    
     def check_stock_availability(self, product_sku, quantity, distribution_center_code=None):
         """
         Verifica disponibilidad de stock en logistics-service.
@@ -80,23 +226,22 @@ class IntegrationService:
             product_sku (str): SKU del producto
             quantity (int): Cantidad requerida
             distribution_center_code (str, optional): Centro de distribución preferido
-            
+        
         Returns:
             dict: Información de stock con estado de disponibilidad
-            
+        
         Raises:
             ExternalServiceError: Si el servicio de logística no está disponible
             ValidationError: Si hay stock insuficiente
         """
         try:
             # Usar endpoint de stock en tiempo real que considera reservas de carrito
-            url = f"{self.logistics_service_url}/cart/stock/realtime"
             params = {'product_sku': product_sku}
             
             if distribution_center_code:
                 params['distribution_center_id'] = distribution_center_code
             
-            response = requests.get(url, params=params, timeout=self.timeout)
+            response = self._get('logistics', self.logistics_service_url, '/cart/stock/realtime', params=params)
             
             if response.status_code != 200:
                 raise ExternalServiceError(
@@ -104,70 +249,54 @@ class IntegrationService:
                     payload={'service': 'logistics', 'status_code': response.status_code}
                 )
             
-            stock_data = response.json()
-            
-            # Obtener stock real disponible (considerando reservas de carrito)
-            total_available = stock_data.get('total_available_for_purchase', 0)
+            return self._evaluate_stock(product_sku, quantity, response.json(), distribution_center_code)
+        
+        except (ValidationError, ExternalServiceError):
+            raise
+        except Exception as e:
+            raise ExternalServiceError(
+                f"Unexpected error calling logistics service: {str(e)}",
+                payload={'service': 'logistics', 'error': str(e)}
+            )
+    
+    def get_realtime_stock(self, product_skus, distribution_center_code=None):
+        """
+        Consulta el stock en tiempo real de varios SKUs en una sola llamada
+        (parámetro product_skus de /cart/stock/realtime).
+        
+        Args:
+            product_skus (list): SKUs a consultar
+            distribution_center_code (str, optional): Centro de distribución preferido
+        
+        Returns:
+            dict: Datos de stock por SKU en mayúsculas; los SKUs sin inventario no aparecen
+        
+        Raises:
+            ExternalServiceError: Si el servicio de logística no está disponible
+        """
+        try:
+            params = {'product_skus': ','.join(product_skus)}
             
-            # Verificar si hay suficiente stock
-            if total_available < quantity:
-                raise ValidationError(
-                    f"Insufficient stock for product '{product_sku}'. Required: {quantity}, Available for purchase: {total_available}",
-                    payload={
-                        'product_sku': product_sku,
-                        'required_quantity': quantity,
-                        'available_for_purchase': total_available,
-                        'physical_stock': stock_data.get('total_physical_stock', 0),
-                        'reserved_in_carts': stock_data.get('total_reserved_in_carts', 0),
-                        'distribution_centers': stock_data.get('distribution_centers', [])
-                    }
-                )
+            if distribution_center_code:
+                params['distribution_center_id'] = distribution_center_code
             
-            # Encontrar el mejor centro de distribución (preferir el que tiene más stock o el especificado)
-            distribution_centers = stock_data.get('distribution_centers', [])
-            selected_center = None
+            response = self._get('logistics', self.logistics_service_url, '/cart/stock/realtime', params=params)
             
-            if distribution_center_code:
-                # Intentar usar el centro preferido
-                for center in distribution_centers:
-                    if center.get('distribution_center_code') == distribution_center_code:
-                        # Usar available_for_purchase en lugar de quantity_available
-                        if center.get('available_for_purchase', 0) >= quantity:
-                            selected_center = center
-                            break
-            
-            if not selected_center and distribution_centers:
-                # Seleccionar centro con mayor stock disponible para compra
-                distribution_centers_sorted = sorted(
-                    distribution_centers,
-                    key=lambda x: x.get('available_for_purchase', 0),
-                    reverse=True
+            if response.status_code != 200:
+                raise ExternalServiceError(
+                    f"Logistics service returned status {response.status_code}",
+                    payload={'service': 'logistics', 'status_code': response.status_code}
                 )
-                for center in distribution_centers_sorted:
-                    if center.get('available_for_purchase', 0) >= quantity:
-                        selected_center = center
-                        break
             
+            stock_data = response.json()
+            # Con un solo SKU logística responde el objeto del producto en vez de la lista
+            products = stock_data['products'] if 'products' in stock_data else [stock_data]
             return {
-                'product_sku': product_sku,
-                'required_quantity': quantity,
-                'total_available': total_available,
-                'stock_confirmed': True,
-                'selected_distribution_center': selected_center.get('distribution_center_code') if selected_center else None,
-                'distribution_centers': distribution_centers
+                product['product_sku'].upper(): product
+                for product in products if product.get('product_sku')
             }
-            
-        except requests.exceptions.Timeout:
-            raise ExternalServiceError(
-                "Logistics service timeout - request took longer than 3 seconds",
-                payload={'service': 'logistics', 'timeout': self.timeout}
-            )
-        except requests.exceptions.ConnectionError:
-            raise ExternalServiceError(
-                "Cannot connect to logistics service",
-                payload={'service': 'logistics', 'url': self.logistics_service_url}
-            )
-        except (ValidationError, ExternalServiceError):
+        
+        except ExternalServiceError:
             raise
         except Exception as e:
             raise ExternalServiceError(
@@ -175,13 +304,146 @@ class IntegrationService:
                 payload={'service': 'logistics', 'error': str(e)}
             )
     
-    def validate_order_items(self, items, preferred_distribution_center=None):
+    def _evaluate_stock(self, product_sku, quantity, stock_data, distribution_center_code=None):
         """
-        Valida todos los items de la orden (existencia del producto y disponibilidad de stock).
+        Verifica que el stock alcance para la cantidad y elige el centro de distribución.
+        
+        Raises:
+            ValidationError: Si hay stock insuficiente
+        """
+        # Obtener stock real disponible (considerando reservas de carrito)
+        total_available = stock_data.get('total_available_for_purchase', 0)
+        
+        # Verificar si hay suficiente stock
+        if total_available < quantity:
+            raise ValidationError(
+                f"Insufficient stock for product '{product_sku}'. Required: {quantity}, Available for purchase: {total_available}",
+                payload={
+                    'product_sku': product_sku,
+                    'required_quantity': quantity,
+                    'available_for_purchase': total_available,
+                    'physical_stock': stock_data.get('total_physical_stock', 0),
+                    'reserved_in_carts': stock_data.get('total_reserved_in_carts', 0),
+                    'distribution_centers': stock_data.get('distribution_centers', [])
+                }
+            )
+        
+        # Encontrar el mejor centro de distribución (preferir el que tiene más stock o el especificado)
+        distribution_centers = stock_data.get('distribution_centers', [])
+        selected_center = None
+        
+        if distribution_center_code:
+            # Intentar usar el centro preferido
+            for center in distribution_centers:
+                if center.get('distribution_center_code') == distribution_center_code:
+                    # Usar available_for_purchase en lugar de quantity_available
+                    if center.get('available_for_purchase', 0) >= quantity:
+                        selected_center = center
+                        break
+        
+        if not selected_center and distribution_centers:
+            # Seleccionar centro con mayor stock disponible para compra
+            distribution_centers_sorted = sorted(
+                distribution_centers,
+                key=lambda x: x.get('available_for_purchase', 0),
+                reverse=True
+            )
+            for center in distribution_centers_sorted:
+                if center.get('available_for_purchase', 0) >= quantity:
+                    selected_center = center
+                    break
+        
+        return {
+            'product_sku': product_sku,
+            'required_quantity': quantity,
+            'total_available': total_available,
+            'stock_confirmed': True,
+            'selected_distribution_center': selected_center.get('distribution_center_code') if selected_center else None,
+            'distribution_centers': distribution_centers
+        }
+    
+    def _run_concurrently(self, calls):
+        """
+        Ejecuta [(función, args)] en el pool compartido.
+        
+        Returns:
+            list: (resultado, excepción) por llamada, en el mismo orden
+        """
+        executor = get_integration_executor()
+        
+        if executor is None or len(calls) == 1:
+            outcomes = []
+            for function, args in calls:
+                try:
+                    outcomes.append((function(*args), None))
+                except Exception as e:
+                    outcomes.append((None, e))
+            return outcomes
+        
+        futures = [executor.submit(function, *args) for function, args in calls]
+        outcomes = []
+        for future in futures:
+            error = future.exception()
+            outcomes.append((None, error) if error else (future.result(), None))
+        return outcomes
+    
+    def _check_item_fields(self, items):
+        for item in items:
+            product_sku = item.get('product_sku')
+            quantity = item.get('quantity', 0)
+            
+            if not product_sku:
+                raise ValidationError("Product SKU is required for all items")
+            
+            if quantity <= 0:
+                raise ValidationError(f"Invalid quantity for product '{product_sku}': {quantity}")
+    
+    def prefetch_items(self, skus, distribution_center_codes=(None,)):
+        """
+        Consulta en paralelo los productos distintos (con caché) y el stock de
+        todos los SKUs, en una llamada por cada STOCK_BATCH_SIZE SKUs y centro.
         
         Args:
-            items (list): Lista de items de la orden con product_sku y quantity
+            skus (list): SKUs a consultar
+            distribution_center_codes (iterable): Centros preferidos de las órdenes
+            
+        Returns:
+            dict: {'products': {sku: (producto, error)},
+                   'stock': {centro: (stock por SKU, error)}}
+        """
+        skus = list(dict.fromkeys(skus))
+        centers = list(dict.fromkeys(distribution_center_codes))
+        stock_batches = [
+            (center, skus[i:i + STOCK_BATCH_SIZE])
+            for center in centers for i in range(0, len(skus), STOCK_BATCH_SIZE)
+        ]
+        
+        outcomes = self._run_concurrently(
+            [(self.get_product_by_sku, (sku,)) for sku in skus] +
+            [(self.get_realtime_stock, (batch, center)) for center, batch in stock_batches]
+        )
+        
+        stock = {center: ({}, None) for center in centers}
+        for (center, _), (stock_by_sku, error) in zip(stock_batches, outcomes[len(skus):]):
+            found, stock_error = stock[center]
+            if error:
+                stock[center] = (found, stock_error or error)
+            else:
+                found.update(stock_by_sku)
+        
+        return {'products': dict(zip(skus, outcomes[:len(skus)])), 'stock': stock}
+    
+    def validate_prefetched_items(self, items, preferred_distribution_center, lookups, consumed=None):
+        """
+        Valida los items de una orden contra consultas ya hechas con prefetch_items.
+        
+        Args:
+            items (list): Items de la orden con product_sku y quantity
             preferred_distribution_center (str, optional): Centro de distribución preferido
+            lookups (dict): Resultado de prefetch_items
+            consumed (dict, optional): SKU (en mayúsculas) -> {código de centro: cantidad}
+                ya comprometida por otras órdenes del mismo lote; se descuenta del total
+                y del `available_for_purchase` de cada centro
             
         Returns:
             list: Items validados con información del producto y confirmación de stock
@@ -190,27 +452,39 @@ class IntegrationService:
             ValidationError: Si algún item es inválido o tiene stock insuficiente
             ExternalServiceError: Si los servicios externos no están disponibles
         """
+        self._check_item_fields(items)
+        stock_by_sku, stock_error = lookups['stock'][preferred_distribution_center]
         validated_items = []
         
         for item in items:
-            product_sku = item.get('product_sku')
+            product_sku = item['product_sku']
             quantity = item.get('quantity', 0)
             
-            if not product_sku:
-                raise ValidationError("Product SKU is required for all items")
-            
-            if quantity <= 0:
-                raise ValidationError(f"Invalid quantity for product '{product_sku}': {quantity}")
+            product, product_error = lookups['products'][product_sku]
+            if product_error:
+                raise product_error
+            if stock_error:
+                raise stock_error
             
-            # Obtener información del producto desde el catálogo
-            product = self.get_product_by_sku(product_sku)
+            stock_data = stock_by_sku.get(product_sku.upper(), {})
+            used = (consumed or {}).get(product_sku.upper())
+            if used:
+                stock_data = dict(stock_data)
+                stock_data['total_available_for_purchase'] = (
+                    stock_data.get('total_available_for_purchase', 0) - sum(used.values())
+                )
+                stock_data['distribution_centers'] = [
+                    {
+                        **center,
+                        'available_for_purchase': (
+                            center.get('available_for_purchase', 0)
+                            - used.get(center.get('distribution_center_code'), 0)
+                        )
+                    }
+                    for center in stock_data.get('distribution_centers', [])
+                ]
             
-            # Verificar disponibilidad de stock
-            stock_info = self.check_stock_availability(
-                product_sku,
-                quantity,
-                preferred_distribution_center
-            )
+            stock_info = self._evaluate_stock(product_sku, quantity, stock_data, preferred_distribution_center)
             
             validated_items.append({
                 'product_sku': product_sku,
@@ -224,3 +498,30 @@ class IntegrationService:
             })
         
         return validated_items
+    
+    def validate_order_items(self, items, preferred_distribution_center=None):
+        """
+        Valida todos los items de la orden (existencia del producto y disponibilidad de stock).
+        
+        Los productos distintos se consultan en paralelo (con caché) y el stock
+        de todos los SKUs en una llamada por cada STOCK_BATCH_SIZE SKUs. Los
+        errores se reportan en el orden de los items, como en la validación
+        item por item.
+        
+        Args:
+            items (list): Lista de items de la orden con product_sku y quantity
+            preferred_distribution_center (str, optional): Centro de distribución preferido
+            
+        Returns:
+            list: Items validados con información del producto y confirmación de stock
+            
+        Raises:
+            ValidationError: Si algún item es inválido o tiene stock insuficiente
+            ExternalServiceError: Si los servicios externos no están disponibles
+        """
+        self._check_item_fields(items)
+        lookups = self.prefetch_items(
+            [item['product_sku'] for item in items],
+            [preferred_distribution_center]
+        )
+        return self.validate_prefetched_items(items, preferred_distribution_center, lookups)
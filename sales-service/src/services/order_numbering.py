@@ -0,0 +1,66 @@
+"""
+Asignación de números de orden (ORD-YYYYMMDD-NNNN) desde un contador por día.
+
+El consecutivo vive en una fila de order_number_counters que se incrementa con
+un UPDATE ... RETURNING atómico: dos checkouts simultáneos nunca obtienen el
+mismo número y no hay que contar las órdenes del día. La fila del día se crea
+la primera vez partiendo del mayor número ya usado ese día.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.exc import IntegrityError
+
+from src.models.order import Order
+from src.models.order_number_counter import OrderNumberCounter
+from src.session import db
+
+
+def _increment(day: str, count: int) -> Optional[int]:
+    return db.session.execute(
+        update(OrderNumberCounter)
+        .where(OrderNumberCounter.day == day)
+        .values(last_value=OrderNumberCounter.last_value + count)
+        .returning(OrderNumberCounter.last_value)
+    ).scalar()
+
+
+def _last_used(day: str) -> int:
+    """Mayor consecutivo ya usado en el día (órdenes creadas antes del contador)."""
+    last_number = db.session.execute(
+        db.select(Order.order_number)
+        .where(Order.order_number.like(f'ORD-{day}-%'))
+        .order_by(func.length(Order.order_number).desc(), Order.order_number.desc())
+        .limit(1)
+    ).scalar()
+    if last_number is None:
+        return 0
+    suffix = last_number.rsplit('-', 1)[-1]
+    return int(suffix) if suffix.isdigit() else 0
+
+
+def allocate_order_numbers(count: int = 1, now: Optional[datetime] = None) -> List[str]:
+    """
+    Reserva `count` números de orden consecutivos del día.
+
+    Se ejecuta dentro de la transacción de la orden: la fila del contador
+    queda bloqueada hasta el commit, así que un rollback no deja huecos.
+
+    Returns:
+        Números de orden en orden ascendente
+    """
+    day = (now or datetime.utcnow()).strftime('%Y%m%d')
+    last = _increment(day, count)
+
+    if last is None:
+        try:
+            with db.session.begin_nested():
+                last = _last_used(day) + count
+                db.session.execute(insert(OrderNumberCounter).values(day=day, last_value=last))
+        except IntegrityError:
+            # Otra transacción creó la fila del día primero
+            last = _increment(day, count)
+
+    return [f'ORD-{day}-{str(value).zfill(4)}' for value in range(last - count + 1, last + 1)]
@@ -0,0 +1,210 @@
+"""
+Serialización por columnas de órdenes, ítems y clientes.
+
+Produce los mismos diccionarios que Order.to_dict(include_items=True,
+include_customer=True), pero a partir de filas de consultas por conjuntos
+(sin cargar objetos ORM): cada columna se convierte una sola vez con un
+conversor memoizado, de modo que valores repetidos (19.00 de IVA, la misma
+fecha de creación, el mismo cliente en varias órdenes) no se vuelven a pasar
+por float(Decimal) ni isoformat().
+"""
+
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from src.entities.salesperson import Salesperson
+from src.models.customer import Customer
+from src.models.order import Order
+from src.models.order_item import OrderItem
+from src.session import db
+
+
+def _memoized(convert: Callable) -> Callable[[Sequence], List]:
+    """Convierte una columna completa calculando cada valor distinto una sola vez."""
+    def convert_column(values: Sequence) -> List:
+        cache = {}
+        result = []
+        append = result.append
+        for value in values:
+            try:
+                append(cache[value])
+            except KeyError:
+                converted = cache[value] = convert(value)
+                append(converted)
+        return result
+    return convert_column
+
+
+def _raw(values: Sequence) -> Sequence:
+    return values
+
+
+def _or(default):
+    return lambda values: [value or default for value in values]
+
+
+_money = _memoized(lambda value: float(value) if value else 0.0)
+_coordinate = _memoized(lambda value: float(value) if value else None)
+_iso = _memoized(lambda value: value.isoformat() if value else None)
+_iso_or_blank = _memoized(lambda value: value.isoformat() if value else '')
+_tax_percentage = _memoized(lambda value: float(value) if value else 19.0)
+
+# (clave del diccionario, columna, conversor) en el orden de Order.to_dict
+ORDER_FIELDS: List[Tuple[str, object, Callable]] = [
+    ('id', Order.id, _raw),
+    ('order_number', Order.order_number, _raw),
+    ('customer_id', Order.customer_id, _raw),
+    ('customer_business_name', Order.customer_business_name, _or('')),
+    ('customer_document_number', Order.customer_document_number, _or('')),
+    ('customer_contact_name', Order.customer_contact_name, _or('')),
+    ('customer_contact_phone', Order.customer_contact_phone, _or('')),
+    ('customer_contact_email', Order.customer_contact_email, _or('')),
+    ('seller_id', Order.seller_id, _raw),
+    ('seller_name', Order.seller_name, _or('')),
+    ('order_date', Order.order_date, _iso),
+    ('status', Order.status, _raw),
+    ('subtotal', Order.subtotal, _money),
+    ('discount_amount', Order.discount_amount, _money),
+    ('tax_amount', Order.tax_amount, _money),
+    ('total_amount', Order.total_amount, _money),
+    ('payment_terms', Order.payment_terms, _or('')),
+    ('payment_method', Order.payment_method, _or('')),
+    ('delivery_address', Order.delivery_address, _or('')),
+    ('delivery_neighborhood', Order.delivery_neighborhood, _or('')),
+    ('delivery_city', Order.delivery_city, _or('')),
+    ('delivery_department', Order.delivery_department, _or('')),
+    ('delivery_latitude', Order.delivery_latitude, _coordinate),
+    ('delivery_longitude', Order.delivery_longitude, _coordinate),
+    ('delivery_date', Order.delivery_date, _iso),
+    ('preferred_distribution_center', Order.preferred_distribution_center, _or('CEDIS-BOG')),
+    ('notes', Order.notes, _or('')),
+    ('created_at', Order.created_at, _iso),
+    ('updated_at', Order.updated_at, _iso),
+]
+
+# Mismo orden que OrderItem.to_dict
+ITEM_FIELDS: List[Tuple[str, object, Callable]] = [
+    ('id', OrderItem.id, _raw),
+    ('order_id', OrderItem.order_id, _raw),
+    ('product_sku', OrderItem.product_sku, _raw),
+    ('product_name', OrderItem.product_name, _raw),
+    ('quantity', OrderItem.quantity, _raw),
+    ('unit_price', OrderItem.unit_price, _money),
+    ('discount_percentage', OrderItem.discount_percentage, _money),
+    ('discount_amount', OrderItem.discount_amount, _money),
+    ('tax_percentage', OrderItem.tax_percentage, _tax_percentage),
+    ('tax_amount', OrderItem.tax_amount, _money),
+    ('subtotal', OrderItem.subtotal, _money),
+    ('total', OrderItem.total, _money),
+    ('distribution_center_code', OrderItem.distribution_center_code, _or('CEDIS-BOG')),
+    ('stock_confirmed', OrderItem.stock_confirmed, _raw),
+    ('stock_confirmation_date', OrderItem.stock_confirmation_date, _iso_or_blank),
+    ('created_at', OrderItem.created_at, _iso),
+]
+
+# Mismo orden que Customer.to_dict (sin el vendedor, que se agrega aparte)
+CUSTOMER_FIELDS: List[Tuple[str, object, Callable]] = [
+    ('id', Customer.id, _raw),
+    ('document_type', Customer.document_type, _raw),
+    ('document_number', Customer.document_number, _raw),
+    ('business_name', Customer.business_name, _raw),
+    ('trade_name', Customer.trade_name, _raw),
+    ('customer_type', Customer.customer_type, _raw),
+    ('contact_name', Customer.contact_name, _raw),
+    ('contact_email', Customer.contact_email, _raw),
+    ('contact_phone', Customer.contact_phone, _raw),
+    ('address', Customer.address, _raw),
+    ('neighborhood', Customer.neighborhood, _raw),
+    ('city', Customer.city, _raw),
+    ('department', Customer.department, _raw),
+    ('country', Customer.country, _raw),
+    ('latitude', Customer.latitude, _coordinate),
+    ('longitude', Customer.longitude, _coordinate),
+    ('credit_limit', Customer.credit_limit, _money),
+    ('credit_days', Customer.credit_days, _raw),
+    ('salesperson_id', Customer.salesperson_id, _raw),
+    ('is_active', Customer.is_active, _raw),
+    ('created_at', Customer.created_at, _iso),
+    ('updated_at', Customer.updated_at, _iso),
+]
+
+SALESPERSON_COLUMNS = [
+    Salesperson.id, Salesperson.employee_id, Salesperson.first_name, Salesperson.last_name,
+    Salesperson.email, Salesperson.phone, Salesperson.territory,
+]
+
+
+def rows_to_dicts(rows: Sequence[Sequence], fields: List[Tuple[str, object, Callable]]) -> List[Dict]:
+    """
+    Convierte filas (tuplas en el orden de `fields`) a diccionarios,
+    transformando columna por columna.
+    """
+    if not rows:
+        return []
+    keys = [key for key, _, _ in fields]
+    columns = zip(*rows)
+    converted = [convert(column) for (_, _, convert), column in zip(fields, columns)]
+    return [dict(zip(keys, values)) for values in zip(*converted)]
+
+
+def _select(fields):
+    return db.select(*[column for _, column, _ in fields])
+
+
+def load_orders_with_details(order_ids: Iterable[int]) -> List[Dict]:
+    """
+    Carga y serializa órdenes con ítems y cliente en tres consultas, sin
+    importar cuántas órdenes sean: órdenes, ítems de todas ellas y clientes
+    (con su vendedor) distintos.
+
+    Returns:
+        Órdenes en el orden de `order_ids` (las inexistentes se omiten)
+    """
+    order_ids = list(order_ids)
+    if not order_ids:
+        return []
+
+    order_rows = db.session.execute(_select(ORDER_FIELDS).where(Order.id.in_(order_ids))).all()
+    if not order_rows:
+        return []
+    orders = rows_to_dicts(order_rows, ORDER_FIELDS)
+    found_ids = [order['id'] for order in orders]
+
+    item_rows = db.session.execute(
+        _select(ITEM_FIELDS)
+        .where(OrderItem.order_id.in_(found_ids))
+        .order_by(OrderItem.order_id, OrderItem.id)
+    ).all()
+    items_by_order: Dict[int, List[Dict]] = {order_id: [] for order_id in found_ids}
+    for item in rows_to_dicts(item_rows, ITEM_FIELDS):
+        items_by_order[item['order_id']].append(item)
+
+    customer_ids = {order['customer_id'] for order in orders}
+    customer_rows = db.session.execute(
+        db.select(*[column for _, column, _ in CUSTOMER_FIELDS], *SALESPERSON_COLUMNS)
+        .outerjoin(Salesperson, Salesperson.id == Customer.salesperson_id)
+        .where(Customer.id.in_(customer_ids))
+    ).all()
+    width = len(CUSTOMER_FIELDS)
+    customers = rows_to_dicts([row[:width] for row in customer_rows], CUSTOMER_FIELDS)
+    customers_by_id = {}
+    for customer, row in zip(customers, customer_rows):
+        salesperson_id, employee_id, first_name, last_name, email, phone, territory = row[width:]
+        customer['salesperson'] = None if salesperson_id is None else {
+            'id': salesperson_id,
+            'employee_id': employee_id,
+            'full_name': f"{first_name} {last_name}",
+            'email': email,
+            'phone': phone,
+            'territory': territory
+        }
+        customers_by_id[customer['id']] = customer
+
+    by_id = {}
+    for order in orders:
+        order['items'] = items_by_order[order['id']]
+        customer = customers_by_id.get(order['customer_id'])
+        if customer is not None:
+            order['customer'] = customer
+        by_id[order['id']] = order
+
+    return [by_id[order_id] for order_id in dict.fromkeys(order_ids) if order_id in by_id]
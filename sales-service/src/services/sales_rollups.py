@@ -0,0 +1,218 @@
+"""
+Mantenimiento incremental de sales_daily_rollups.
+
+Antes del primer cambio de una orden en la transacción se guarda su
+contribución a los rollups (día, vendedor, estado, producto). Antes del commit
+se vuelve a calcular para las mismas órdenes y la diferencia se aplica con un
+upsert por clave en la misma transacción, así que los reportes nunca ven una
+orden sin su rollup ni al revés.
+
+Los cambios por ORM (alta, edición y borrado de órdenes e items) se detectan
+en before_flush. Las escrituras Core que no pasan por el flush (INSERT
+multi-fila, DELETE masivos) deben registrarse con capture_orders o
+capture_new_orders.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable
+
+from sqlalchemy import delete, event, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.models.order import Order
+from src.models.order_item import OrderItem
+from src.models.sales_daily_rollup import SalesDailyRollup
+from src.session import db
+
+logger = logging.getLogger(__name__)
+
+# Estado por sesión (session.info), se descarta al terminar la transacción
+_CAPTURED = 'sales_rollups.captured'
+_BEFORE = 'sales_rollups.before'
+_NEW_ORDERS = 'sales_rollups.new_orders'
+
+# Campos que cambian la contribución de una orden o de un item
+_ORDER_FIELDS = ('order_date', 'seller_id', 'status')
+_ITEM_FIELDS = ('order_id', 'product_sku', 'product_name', 'quantity', 'total')
+
+_KEY_COLUMNS = ('day', 'seller_id', 'product_sku', 'status', 'product_name')
+
+
+def _contributions(connection, order_ids):
+    """Cantidad, valor y líneas por clave de rollup de las órdenes dadas."""
+    totals = defaultdict(lambda: [0, Decimal('0'), 0])
+    if not order_ids:
+        return totals
+
+    rows = connection.execute(
+        select(Order.order_date, Order.seller_id, Order.status, OrderItem.product_sku,
+               OrderItem.product_name, OrderItem.quantity, OrderItem.total)
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .where(Order.id.in_(sorted(order_ids)))
+    )
+    for order_date, seller_id, status, product_sku, product_name, quantity, total in rows:
+        bucket = totals[(order_date.date(), seller_id, product_sku, status, product_name)]
+        bucket[0] += quantity
+        bucket[1] += total or 0
+        bucket[2] += 1
+    return totals
+
+
+def capture_orders(order_ids: Iterable[int], session=None):
+    """
+    Guarda la contribución actual de las órdenes antes de modificarlas.
+
+    Solo la primera captura de cada orden en la transacción cuenta. Llamar
+    antes de escrituras que no pasan por el flush (p. ej. Query.delete()).
+    """
+    session = session if session is not None else db.session()
+    captured = session.info.setdefault(_CAPTURED, set())
+    pending = {order_id for order_id in order_ids if order_id is not None} - captured
+    if not pending:
+        return
+
+    before = session.info.setdefault(_BEFORE, defaultdict(lambda: [0, Decimal('0'), 0]))
+    for key, (quantity, total, lines) in _contributions(session.connection(), pending).items():
+        bucket = before[key]
+        bucket[0] += quantity
+        bucket[1] += total
+        bucket[2] += lines
+    captured.update(pending)
+
+
+def capture_new_orders(order_ids: Iterable[int], session=None):
+    """Registra órdenes insertadas en esta transacción sin pasar por el ORM."""
+    session = session if session is not None else db.session()
+    session.info.setdefault(_CAPTURED, set()).update(order_ids)
+
+
+def _changed(obj, fields):
+    attrs = inspect(obj).attrs
+    return any(attrs[field].history.has_changes() for field in fields)
+
+
+def _before_flush(session, flush_context, instances):
+    order_ids = set()
+    new_orders = session.info.setdefault(_NEW_ORDERS, [])
+
+    for obj in session.new:
+        if isinstance(obj, Order):
+            new_orders.append(obj)
+        elif isinstance(obj, OrderItem):
+            order_ids.add(obj.order_id if obj.order_id is not None else
+                          obj.order.id if obj.order is not None else None)
+
+    for obj in session.dirty:
+        if isinstance(obj, Order) and _changed(obj, _ORDER_FIELDS):
+            order_ids.add(obj.id)
+        elif isinstance(obj, OrderItem) and _changed(obj, _ITEM_FIELDS):
+            order_ids.add(obj.order_id)
+            order_ids.update(inspect(obj).attrs.order_id.history.deleted)
+
+    for obj in session.deleted:
+        if isinstance(obj, Order):
+            order_ids.add(obj.id)
+        elif isinstance(obj, OrderItem):
+            order_ids.add(obj.order_id)
+
+    if order_ids:
+        capture_orders(order_ids, session)
+
+
+def _after_flush(session, flush_context):
+    # Las órdenes nuevas no contribuían antes de la transacción
+    new_orders = session.info.pop(_NEW_ORDERS, None)
+    if new_orders:
+        capture_new_orders([order.id for order in new_orders if order.id is not None], session)
+
+
+def _before_commit(session):
+    # El commit hace su flush después de este evento: adelantarlo para capturar todo
+    session.flush()
+    apply_pending(session)
+
+
+def _after_transaction_end(session, transaction):
+    if transaction.parent is None:
+        for key in (_CAPTURED, _BEFORE, _NEW_ORDERS):
+            session.info.pop(key, None)
+
+
+def _upsert_statement(dialect_name):
+    insert = postgresql.insert if dialect_name == 'postgresql' else sqlite.insert
+    table = SalesDailyRollup.__table__
+    statement = insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=list(_KEY_COLUMNS),
+        set_={
+            **{
+                column: table.c[column] + statement.excluded[column]
+                for column in ('quantity', 'total', 'item_count')
+            },
+            'updated_at': statement.excluded.updated_at
+        }
+    )
+
+
+def apply_pending(session=None):
+    """
+    Aplica a sales_daily_rollups la diferencia de las órdenes capturadas.
+
+    Las claves se actualizan en orden para que dos transacciones concurrentes
+    bloqueen las filas en la misma secuencia. Se borran las filas que quedan
+    sin líneas.
+    """
+    session = session if session is not None else db.session()
+    captured = session.info.pop(_CAPTURED, set())
+    before = session.info.pop(_BEFORE, {})
+    if not captured:
+        return
+
+    connection = session.connection()
+    after = _contributions(connection, captured)
+    rows = []
+    now = datetime.utcnow()
+    for key in sorted(set(before) | set(after)):
+        old = before.get(key, (0, Decimal('0'), 0))
+        new = after.get(key, (0, Decimal('0'), 0))
+        delta = (new[0] - old[0], new[1] - old[1], new[2] - old[2])
+        if any(delta):
+            rows.append(dict(zip(_KEY_COLUMNS, key), quantity=delta[0], total=delta[1], item_count=delta[2],
+                             updated_at=now))
+
+    if not rows:
+        return
+
+    connection.execute(_upsert_statement(connection.dialect.name), rows)
+    if any(row['item_count'] < 0 for row in rows):
+        connection.execute(
+            delete(SalesDailyRollup)
+            .where(SalesDailyRollup.item_count <= 0)
+            .where(SalesDailyRollup.day.in_(sorted({row['day'] for row in rows})))
+        )
+    logger.debug(f"📊 Rollups de ventas: {len(rows)} claves actualizadas para {len(captured)} órdenes")
+
+
+_LISTENERS = (
+    ('before_flush', _before_flush),
+    ('after_flush', _after_flush),
+    ('before_commit', _before_commit),
+    ('after_transaction_end', _after_transaction_end),
+)
+
+
+def init_sales_rollups():
+    """Registra los eventos de sesión que mantienen los rollups (idempotente)."""
+    for name, listener in _LISTENERS:
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+
+
+def shutdown_sales_rollups():
+    """Quita los eventos de sesión (benchmarks y cargas masivas)."""
+    for name, listener in _LISTENERS:
+        if event.contains(db.session, name, listener):
+            event.remove(db.session, name, listener)
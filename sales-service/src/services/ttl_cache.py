@@ -0,0 +1,70 @@
+"""
+LRU en memoria, thread-safe, con TTL. Base de los cachés de proceso del
+servicio; cada uno solo define qué guarda y cómo lo invalida.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Descarta las entradas menos usadas por encima de max_entries. Las
+    entradas vencidas se conservan para poder revalidarlas (p. ej. con ETag):
+    `lookup` indica si siguen vigentes. Con ttl_seconds <= 0 no guarda nada.
+    """
+
+    def __init__(self, ttl_seconds, max_entries):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # clave -> (valor, vence_en)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        """
+        Busca una clave.
+
+        Returns:
+            tuple: (valor, vigente); (None, False) si no está
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+
+            self._entries.move_to_end(key)
+            value, expires_at = entry
+            fresh = time.monotonic() < expires_at
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return value, fresh
+
+    def put(self, key, value):
+        """Guarda (o renueva) el valor por ttl_seconds."""
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses
+            }
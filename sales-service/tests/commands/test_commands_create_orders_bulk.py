@@ -0,0 +1,172 @@
+"""
+Tests para CreateOrdersBulk: validación compartida e inserción multi-fila.
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlalchemy import event
+
+from src.commands.create_orders_bulk import CreateOrdersBulk
+from src.errors.errors import ValidationError
+from src.models.order import Order
+from src.models.order_item import OrderItem
+from src.services.integration_service import shutdown_integration
+
+AVAILABLE = {'JER-001': 30, 'VAC-001': 10}
+
+
+def _product(sku):
+    if sku not in AVAILABLE:
+        raise ValidationError(f"Product with SKU '{sku}' not found in catalog")
+    return {'sku': sku, 'name': f'Producto {sku}', 'unit_price': 1000.0, 'is_active': True}
+
+
+def _stock(skus, center=None):
+    return {
+        sku: {
+            'product_sku': sku,
+            'total_available_for_purchase': AVAILABLE[sku],
+            'distribution_centers': [{'distribution_center_code': 'CEDIS-BOG', 'available_for_purchase': AVAILABLE[sku]}]
+        }
+        for sku in skus if sku in AVAILABLE
+    }
+
+
+@pytest.fixture
+def integration():
+    shutdown_integration()
+    with patch('src.services.integration_service.IntegrationService.get_product_by_sku', side_effect=_product) as product, \
+            patch('src.services.integration_service.IntegrationService.get_realtime_stock', side_effect=_stock) as stock, \
+            patch('src.commands.create_order.requests.post') as reserve:
+        reserve.return_value.status_code = 200
+        reserve.return_value.json.return_value = {'items_reserved': []}
+        yield product, stock, reserve
+    shutdown_integration()
+
+
+def _order(customer_id, *lines, **extra):
+    return {
+        'customer_id': customer_id,
+        'seller_id': 'SELLER-001',
+        'items': [{'product_sku': sku, 'quantity': quantity} for sku, quantity in lines],
+        **extra
+    }
+
+
+class TestCreateOrdersBulk:
+
+    def test_creates_valid_orders_and_reports_failures(self, db, sample_customer, integration):
+        product, stock, reserve = integration
+        orders = [
+            _order(sample_customer.id, ('JER-001', 10), ('VAC-001', 4), notes='Primera'),
+            _order(sample_customer.id, ('JER-001', 15)),
+            _order(sample_customer.id, ('JER-001', 10)),       # ya no alcanza: quedan 5
+            _order(99999, ('JER-001', 1)),
+            _order(sample_customer.id, ('NOPE-1', 1)),
+            {'customer_id': sample_customer.id, 'seller_id': 'SELLER-001'},
+        ]
+
+        result = CreateOrdersBulk(orders).execute()
+
+        assert (result['created'], result['failed']) == (2, 4)
+        assert [r['status'] for r in result['results']] == ['created', 'created', 'failed', 'failed', 'failed', 'failed']
+        assert 'Insufficient stock' in result['results'][2]['error']
+        assert result['results'][3]['status_code'] == 404
+        assert "'items' is required" in result['results'][5]['error']
+
+        first = result['results'][0]['order']
+        assert first['notes'] == 'Primera'
+        assert [item['quantity'] for item in first['items']] == [10, 4]
+        assert first['customer']['id'] == sample_customer.id
+        assert first['order_number'].endswith('-0001')
+        assert result['results'][1]['order']['order_number'].endswith('-0002')
+
+        assert product.call_count == 3  # un lookup por SKU distinto
+        assert stock.call_count == 1
+        assert reserve.call_count == 2
+        assert Order.query.count() == 2
+        assert OrderItem.query.count() == 3
+        assert float(Order.query.get(first['id']).total_amount) == pytest.approx(14000 * 1.19)
+
+    def test_validates_quantities_per_distribution_center(self, db, sample_customer, integration):
+        product, stock, _ = integration
+        # 30 en total, pero ningún centro tiene más de 20
+        stock.side_effect = lambda skus, center=None: {'JER-001': {
+            'product_sku': 'JER-001',
+            'total_available_for_purchase': 30,
+            'distribution_centers': [
+                {'distribution_center_code': 'CEDIS-BOG', 'available_for_purchase': 20},
+                {'distribution_center_code': 'CEDIS-MED', 'available_for_purchase': 10},
+            ]
+        }}
+
+        result = CreateOrdersBulk([
+            _order(sample_customer.id, ('JER-001', 15)),
+            _order(sample_customer.id, ('JER-001', 8)),
+        ]).execute()
+
+        centers = [r['order']['items'][0]['distribution_center_code'] for r in result['results']]
+        assert centers == ['CEDIS-BOG', 'CEDIS-MED']
+
+    def test_reports_failed_reservations_and_clears_carts(self, db, sample_customer, integration):
+        _, _, post = integration
+
+        def logistics(url, json=None, timeout=None):
+            response = Mock(text='error')
+            if url.endswith('/cart/clear'):
+                response.status_code = 200
+                response.json.return_value = {'cleared_count': 1}
+            else:
+                # La reserva de la segunda orden falla
+                response.status_code = 500 if json['items'][0]['quantity'] == 2 else 200
+                response.json.return_value = {'items_reserved': []}
+            return response
+
+        post.side_effect = logistics
+        orders = [
+            _order(sample_customer.id, ('JER-001', 1), user_id='u1', session_id='s1'),
+            _order(sample_customer.id, ('JER-001', 2), user_id='u2', session_id='s2'),
+        ]
+
+        result = CreateOrdersBulk(orders).execute()
+
+        assert result['created'] == 2
+        assert [r['inventory_reserved'] for r in result['results']] == [True, False]
+        assert result['reservation_failed'] == [1]
+        cleared = sorted(call.kwargs['json']['user_id'] for call in post.call_args_list
+                         if call.args[0].endswith('/cart/clear'))
+        assert cleared == ['u1', 'u2']
+
+    def test_orders_and_items_use_one_insert_each(self, db, sample_customer, integration):
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        CreateOrdersBulk([_order(sample_customer.id, ('JER-001', 1), ('VAC-001', 1)) for _ in range(5)]).execute()
+
+        inserts = [s for s in statements if s.startswith('INSERT INTO orders') or s.startswith('INSERT INTO order_items')]
+        assert len(inserts) == 2
+        assert OrderItem.query.count() == 10
+
+    def test_rejects_invalid_batches(self, db):
+        with pytest.raises(ValidationError):
+            CreateOrdersBulk([]).execute()
+        with pytest.raises(ValidationError):
+            CreateOrdersBulk([{}] * 101).execute()
+
+
+class TestCreateOrdersBulkEndpoint:
+
+    def test_status_codes(self, client, sample_customer, integration):
+        response = client.post('/orders/bulk', json={'orders': [_order(sample_customer.id, ('VAC-001', 2))]})
+        assert response.status_code == 201
+
+        response = client.post('/orders/bulk', json={'orders': [
+            _order(sample_customer.id, ('VAC-001', 2)), _order(sample_customer.id, ('NOPE-1', 2))
+        ]})
+        assert response.status_code == 207
+
+        response = client.post('/orders/bulk', json={'orders': [_order(sample_customer.id, ('NOPE-1', 2))]})
+        assert response.status_code == 400
+        assert client.post('/orders/bulk', json={}).status_code == 400
@@ -0,0 +1,158 @@
+"""
+Tests for ExportSalesReport and GetReportExportJob commands and the export endpoints.
+"""
+import io
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from openpyxl import load_workbook
+from src.commands.export_sales_report import ExportSalesReport, GetReportExportJob
+from src.entities.salesperson import Salesperson
+from src.errors.errors import ConflictError, NotFoundError, ValidationError
+from src.models.order import Order
+from src.models.order_item import OrderItem
+from src.models.report_export_job import ReportExportJob
+from src.models.sales_daily_rollup import SalesDailyRollup
+
+
+@pytest.fixture
+def export_app(app, tmp_path):
+    app.config.update({'EXPORT_CACHE_DIR': str(tmp_path), 'EXPORT_ASYNC_MIN_ROWS': 1000})
+    return app
+
+
+@pytest.fixture
+def sales(db, sample_customer):
+    db.session.add(Salesperson(employee_id='EMP-X-001', first_name='Juan', last_name='Pérez',
+                               email='juan.x@test.com', territory='Norte', is_active=True))
+    for n, day in enumerate([datetime(2025, 11, 14), datetime(2025, 11, 15)]):
+        order = Order(order_number=f'ORD-X-{n}', customer_id=sample_customer.id, seller_id='EMP-X-001',
+                      status='confirmed', subtotal=Decimal('0'), total_amount=Decimal('0'), order_date=day)
+        db.session.add(order)
+        db.session.flush()
+        db.session.add(OrderItem(order_id=order.id, product_sku='MED-001', product_name='Ibuprofeno',
+                                 quantity=n + 1, unit_price=Decimal('100'), subtotal=Decimal('100'),
+                                 total=Decimal('119.00')))
+    db.session.commit()
+
+
+def _add_order(db, customer_id, number):
+    order = Order(order_number=number, customer_id=customer_id, seller_id='EMP-X-001', status='confirmed',
+                  subtotal=Decimal('0'), total_amount=Decimal('0'), order_date=datetime(2025, 11, 16))
+    db.session.add(order)
+    db.session.flush()
+    db.session.add(OrderItem(order_id=order.id, product_sku='MED-002', product_name='Acetaminofén', quantity=1,
+                             unit_price=Decimal('1'), subtotal=Decimal('1'), total=Decimal('1')))
+    db.session.commit()
+
+
+class TestExportSalesReport:
+
+    def test_excel_is_cached_until_the_data_changes(self, export_app, db, sales, sample_customer):
+        first = ExportSalesReport('excel', month=11, year=2025).execute()
+        assert first['status'] == 'ready'
+        assert ExportSalesReport('excel', month=11, year=2025).execute()['path'] == first['path']
+        assert ExportSalesReport('excel', year=2025).execute()['path'] != first['path']
+
+        _add_order(db, sample_customer.id, 'ORD-X-NEW')
+        changed = ExportSalesReport('excel', month=11, year=2025).execute()
+        assert changed['path'] != first['path']
+
+        sheet = load_workbook(changed['path']).active
+        rows = [row for row in sheet.iter_rows(values_only=True) if row[0] in ('Fecha', '2025-11-16', '2025-11-15')]
+        assert rows[0][:3] == ('Fecha', 'Vendedor', 'Región')
+        assert [row[0] for row in rows[1:]] == ['2025-11-16', '2025-11-15']
+
+    def test_large_export_runs_as_job(self, export_app, db, sales):
+        export_app.config['EXPORT_ASYNC_MIN_ROWS'] = 1
+
+        job = ExportSalesReport('pdf').execute()
+
+        assert job['status'] == 'completed'
+        assert job['download_url'] == f"/reports/export/jobs/{job['job_id']}/download"
+        download = GetReportExportJob(job['job_id']).download()
+        with open(download['path'], 'rb') as pdf:
+            assert pdf.read(4) == b'%PDF'
+        assert download['mimetype'] == 'application/pdf'
+
+    def test_late_update_with_older_timestamp_changes_version(self, export_app, db, sales):
+        report = ExportSalesReport('csv', month=11, year=2025).report
+        _, before = report.get_data_version()
+
+        # Upsert que confirma después de otro más nuevo: su updated_at es menor
+        rollup = SalesDailyRollup.query.order_by(SalesDailyRollup.updated_at).first()
+        rollup.quantity += 3
+        rollup.updated_at = rollup.updated_at - timedelta(minutes=5)
+        db.session.commit()
+
+        assert report.get_data_version()[1] != before
+
+    def test_stale_job_is_failed_and_restarted(self, export_app, db, sales):
+        export_app.config['EXPORT_ASYNC_MIN_ROWS'] = 1
+        export = ExportSalesReport('csv')
+        cache_key = export._cache_key(export.report.get_data_version()[1])
+        long_ago = datetime.utcnow() - timedelta(hours=2)
+        db.session.add(ReportExportJob(id='stuck-job', format='csv', filters={}, cache_key=cache_key,
+                                       status='running', created_at=long_ago, started_at=long_ago))
+        db.session.commit()
+
+        job = export.execute()
+
+        assert job['job_id'] != 'stuck-job'
+        assert job['status'] == 'completed'
+        stuck = GetReportExportJob('stuck-job').execute()
+        assert stuck['status'] == 'failed'
+        assert 'no terminó' in stuck['error']
+
+    def test_recent_running_job_is_reused(self, export_app, db, sales):
+        export_app.config['EXPORT_ASYNC_MIN_ROWS'] = 1
+        export = ExportSalesReport('csv')
+        cache_key = export._cache_key(export.report.get_data_version()[1])
+        db.session.add(ReportExportJob(id='busy-job', format='csv', filters={}, cache_key=cache_key,
+                                       status='running', started_at=datetime.utcnow()))
+        db.session.commit()
+
+        assert export.execute()['job_id'] == 'busy-job'
+
+    def test_job_errors(self, export_app, db):
+        with pytest.raises(NotFoundError):
+            GetReportExportJob('missing').execute()
+
+        db.session.add(ReportExportJob(id='queued-job', format='excel', filters={}, cache_key='k', status='queued'))
+        db.session.commit()
+        with pytest.raises(ConflictError):
+            GetReportExportJob('queued-job').download()
+
+        with pytest.raises(ValidationError):
+            ExportSalesReport('docx')
+
+
+class TestExportEndpoints:
+
+    def test_csv_is_streamed(self, export_app, client, sales):
+        response = client.get('/reports/export/csv?month=11&year=2025')
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        lines = response.get_data(as_text=True).lstrip('﻿').splitlines()
+        assert lines[0].startswith('Fecha,ID Vendedor,Vendedor')
+        assert [line.split(',')[0] for line in lines[1:]] == ['2025-11-15', '2025-11-14']
+
+    def test_excel_download_and_validation(self, export_app, client, sales):
+        response = client.get('/reports/export/excel?year=2025')
+        assert response.status_code == 200
+        assert load_workbook(io.BytesIO(response.data)).sheetnames == ['Reporte de Ventas']
+
+        assert client.get('/reports/export/csv?month=13').status_code == 400
+        assert client.get('/reports/export/pdf?from_date=15-11-2025').status_code == 400
+
+    def test_large_export_returns_job_link(self, export_app, client, sales):
+        export_app.config['EXPORT_ASYNC_MIN_ROWS'] = 1
+
+        response = client.get('/reports/export/excel')
+        assert response.status_code == 202
+        job = response.get_json()
+
+        assert client.get(f"/reports/export/jobs/{job['job_id']}").get_json()['status'] == 'completed'
+        assert client.get(job['download_url']).status_code == 200
+        assert client.get('/reports/export/jobs/missing/download').status_code == 404
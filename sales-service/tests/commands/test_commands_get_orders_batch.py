@@ -0,0 +1,90 @@
+"""
+Tests para GetOrdersBatch: carga por conjuntos y serialización por columnas.
+"""
+
+from contextlib import contextmanager
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from src.commands.get_orders_batch import GetOrdersBatch
+from src.models.order import Order
+from src.models.order_item import OrderItem
+
+
+@contextmanager
+def count_queries(db):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def _create_orders(db, customers, count, items_per_order=3):
+    orders = []
+    for n in range(count):
+        customer = customers[n % len(customers)]
+        order = Order(
+            order_number=f'ORD-BATCH-{n:04d}',
+            customer_id=customer.id,
+            seller_id='SELLER-001',
+            status='confirmed',
+            subtotal=Decimal('1000.00'),
+            tax_amount=Decimal('190.00'),
+            total_amount=Decimal('1190.00'),
+            delivery_latitude=Decimal('4.68250000') if n % 2 else None,
+            delivery_longitude=Decimal('-74.05430000') if n % 2 else None,
+        )
+        db.session.add(order)
+        db.session.flush()
+        for line in range(items_per_order):
+            db.session.add(OrderItem(
+                order_id=order.id, product_sku=f'SKU-{line}', product_name=f'Producto {line}',
+                quantity=line + 1, unit_price=Decimal('100.00'), tax_percentage=Decimal('19.00'),
+                subtotal=Decimal('100.00'), total=Decimal('119.00')
+            ))
+        orders.append(order)
+    db.session.commit()
+    return orders
+
+
+class TestGetOrdersBatch:
+
+    def test_matches_to_dict_serialization(self, db, sample_order, sample_customer, sample_salesperson):
+        sample_customer.salesperson_id = sample_salesperson.id
+        db.session.commit()
+        expected = sample_order.to_dict(include_items=True, include_customer=True)
+
+        result = GetOrdersBatch([sample_order.id]).execute()
+
+        assert result['orders'] == [expected]
+        assert result['orders'][0]['customer']['salesperson']['full_name'] == 'Juan Pérez'
+
+    def test_query_count_is_constant_and_order_is_preserved(self, db, sample_customer, sample_customer_2):
+        orders = _create_orders(db, [sample_customer, sample_customer_2], 30)
+        ids = [order.id for order in orders]
+        db.session.expire_all()
+
+        with count_queries(db) as small:
+            GetOrdersBatch(ids[:3]).execute()
+        with count_queries(db) as large:
+            result = GetOrdersBatch(list(reversed(ids)) + [ids[0], 99999]).execute()
+
+        assert len(small) == len(large) == 3
+        assert [order['id'] for order in result['orders']] == list(reversed(ids))
+        assert (result['total'], result['not_found'], result['requested']) == (30, [99999], 31)
+        assert all(len(order['items']) == 3 for order in result['orders'])
+        assert result['orders'][0]['items'][0]['tax_percentage'] == 19.0
+
+    def test_empty_batch_does_not_query(self, db):
+        with count_queries(db) as statements:
+            result = GetOrdersBatch([]).execute()
+
+        assert result == {'orders': [], 'total': 0, 'not_found': [], 'requested': 0}
+        assert statements == []
@@ -0,0 +1,94 @@
+"""
+Tests for GetSalesBySalespersonReport and GetSalesByProductReport commands.
+"""
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from src.commands.get_sales_by_product_report import GetSalesByProductReport
+from src.commands.get_sales_by_salesperson_report import GetSalesBySalespersonReport
+from src.models.order import Order
+from src.models.order_item import OrderItem
+from src.entities.salesperson import Salesperson
+from src.entities.salesperson_goal import SalespersonGoal, GoalType, Region, Quarter
+
+
+@pytest.fixture
+def grouped_sales(db, sample_customer):
+    """Two salespersons, MED-001 sold on two days with goals in two regions."""
+    db.session.add_all([
+        Salesperson(employee_id='EMP-G-001', first_name='Juan', last_name='Pérez',
+                    email='juan.g@test.com', territory='Norte', is_active=True),
+        Salesperson(employee_id='EMP-G-002', first_name='Ana', last_name='Ruiz',
+                    email='ana.g@test.com', territory='Sur', is_active=True),
+        SalespersonGoal(id_vendedor='EMP-G-001', id_producto='MED-001', region=Region.NORTE.value,
+                        trimestre=Quarter.Q4.value, valor_objetivo=100.0, tipo=GoalType.UNIDADES.value),
+        SalespersonGoal(id_vendedor='EMP-G-001', id_producto='MED-001', region=Region.SUR.value,
+                        trimestre=Quarter.Q4.value, valor_objetivo=5000.0, tipo=GoalType.MONETARIO.value),
+    ])
+
+    sales = [
+        ('EMP-G-001', datetime(2025, 11, 14), [('MED-001', 10), ('MED-002', 1)]),
+        ('EMP-G-001', datetime(2025, 11, 15), [('MED-001', 5)]),
+        ('EMP-G-002', datetime(2025, 11, 15), [('MED-001', 2)]),
+    ]
+    for n, (seller_id, day, lines) in enumerate(sales):
+        order = Order(order_number=f'ORD-G-{n}', customer_id=sample_customer.id, seller_id=seller_id,
+                      status='confirmed', subtotal=Decimal('0'), total_amount=Decimal('0'), order_date=day)
+        db.session.add(order)
+        db.session.flush()
+        for sku, quantity in lines:
+            db.session.add(OrderItem(order_id=order.id, product_sku=sku, product_name=f'Producto {sku}',
+                                     quantity=quantity, unit_price=Decimal('100.00'),
+                                     subtotal=Decimal(100 * quantity), total=Decimal(119 * quantity)))
+    db.session.commit()
+
+
+class TestGetSalesBySalespersonReport:
+    """Test suite for GetSalesBySalespersonReport command."""
+
+    def test_groups_products_per_salesperson_once(self, grouped_sales):
+        result = GetSalesBySalespersonReport().execute()
+
+        assert result['total_salespersons'] == 2
+        juan, ana = result['salespersons']
+        assert (juan['employee_id'], juan['vendedor'], juan['region'], juan['territory']) == \
+            ('EMP-G-001', 'Juan Pérez', 'Norte', 'Norte')
+        assert (juan['total_ventas'], juan['total_valor']) == (16, pytest.approx(16 * 119))
+        assert [(p['product_sku'], p['cantidad']) for p in juan['productos_vendidos']] == [
+            ('MED-001', 15), ('MED-002', 1)
+        ]
+        assert (ana['region'], ana['total_ventas']) == (None, 2)
+
+    def test_region_filter_does_not_repeat_sales_per_goal(self, grouped_sales):
+        result = GetSalesBySalespersonReport(region='Sur', month=11, year=2025).execute()
+
+        assert [(s['employee_id'], s['region'], s['total_ventas']) for s in result['salespersons']] == [
+            ('EMP-G-001', 'Sur', 15)
+        ]
+        assert result['filters_applied'] == {'month': 11, 'year': 2025, 'region': 'Sur'}
+
+
+class TestGetSalesByProductReport:
+    """Test suite for GetSalesByProductReport command."""
+
+    def test_groups_salespersons_per_product_once(self, grouped_sales):
+        result = GetSalesByProductReport().execute()
+
+        assert result['total_products'] == 2
+        med1, med2 = result['products']
+        assert (med1['product_sku'], med1['product_name'], med1['total_cantidad']) == \
+            ('MED-001', 'Producto MED-001', 17)
+        assert med1['total_valor'] == pytest.approx(17 * 119)
+        assert med1['vendedores'] == [
+            {'employee_id': 'EMP-G-001', 'vendedor': 'Juan Pérez'},
+            {'employee_id': 'EMP-G-002', 'vendedor': 'Ana Ruiz'},
+        ]
+        assert (med2['product_sku'], med2['total_cantidad']) == ('MED-002', 1)
+
+    def test_filters(self, grouped_sales):
+        assert GetSalesByProductReport(from_date='2025-11-15').execute()['products'][0]['total_cantidad'] == 7
+        assert GetSalesByProductReport(product_sku='MED-002').execute()['total_products'] == 1
+        assert GetSalesByProductReport(region='Norte').execute()['products'][0]['vendedores'] == [
+            {'employee_id': 'EMP-G-001', 'vendedor': 'Juan Pérez'}
+        ]
+        assert GetSalesByProductReport(year=2024).execute()['total_products'] == 0
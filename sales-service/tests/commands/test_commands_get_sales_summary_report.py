@@ -250,3 +250,22 @@ class TestGetSalesSummaryReport:
             assert 'unique_salespersons' in totals
             assert 'unique_products' in totals
             assert 'unique_regions' in totals
+    
+    def test_date_filters_use_whole_days(self, setup_test_data, app):
+        """Test that to_date includes its day and month without year matches any year."""
+        with app.app_context():
+            assert GetSalesSummaryReport(from_date='2025-11-15', to_date='2025-11-15').execute()['total_records'] == 2
+            assert GetSalesSummaryReport(to_date='2025-11-14').execute()['total_records'] == 0
+            assert GetSalesSummaryReport(month=11).execute()['total_records'] == 2
+            assert GetSalesSummaryReport(month=10).execute()['total_records'] == 0
+            assert GetSalesSummaryReport(year=2025).execute()['total_records'] == 2
+    
+    def test_report_follows_order_changes(self, setup_test_data, db, app):
+        """Test that the report reflects status changes through the rollups."""
+        with app.app_context():
+            order = Order.query.filter_by(order_number='ORD-2025-TEST-001').one()
+            order.status = 'cancelled'
+            db.session.commit()
+            
+            assert GetSalesSummaryReport(order_status='confirmed').execute()['total_records'] == 0
+            assert GetSalesSummaryReport(order_status='cancelled').execute()['total_records'] == 2
@@ -0,0 +1,62 @@
+"""
+Tests para RebuildSalesRollups: backfill de los rollups diarios de ventas.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from src.commands.rebuild_sales_rollups import RebuildSalesRollups
+from src.errors.errors import ValidationError
+from src.models.order import Order
+from src.models.order_item import OrderItem
+from src.models.sales_daily_rollup import SalesDailyRollup
+from src.services.sales_rollups import init_sales_rollups, shutdown_sales_rollups
+
+
+@pytest.fixture
+def orders_without_rollups(db, sample_customer):
+    """Órdenes de oct-dic 2025 creadas sin mantener los rollups (datos previos)."""
+    shutdown_sales_rollups()
+    try:
+        for n, day in enumerate([datetime(2025, 10, 31, 23), datetime(2025, 11, 1), datetime(2025, 12, 5)]):
+            order = Order(order_number=f'ORD-B-{n}', customer_id=sample_customer.id, seller_id='EMP-001',
+                          subtotal=Decimal('0'), total_amount=Decimal('0'), order_date=day)
+            db.session.add(order)
+            db.session.flush()
+            db.session.add(OrderItem(order_id=order.id, product_sku='MED-001', product_name='Producto',
+                                     quantity=n + 1, unit_price=Decimal('10'), subtotal=Decimal('10'),
+                                     total=Decimal('11.90')))
+        db.session.commit()
+    finally:
+        init_sales_rollups()
+
+
+class TestRebuildSalesRollups:
+
+    def test_backfills_every_month_with_orders(self, db, orders_without_rollups):
+        assert db.session.query(SalesDailyRollup).count() == 0
+
+        result = RebuildSalesRollups().execute()
+
+        assert result == {'from_date': '2025-10-31', 'to_date': '2025-12-05', 'months': 3, 'rows': 3}
+        assert [(row.day, row.quantity) for row in db.session.query(SalesDailyRollup).order_by('day')] == [
+            (date(2025, 10, 31), 1), (date(2025, 11, 1), 2), (date(2025, 12, 5), 3)
+        ]
+
+    def test_range_only_rewrites_those_days(self, db, orders_without_rollups):
+        RebuildSalesRollups().execute()
+        db.session.query(SalesDailyRollup).update({'quantity': 99})
+        db.session.commit()
+
+        result = RebuildSalesRollups('2025-11-01', '2025-11-30').execute()
+
+        assert (result['months'], result['rows']) == (1, 1)
+        assert [row.quantity for row in db.session.query(SalesDailyRollup).order_by('day')] == [99, 2, 99]
+
+    def test_invalid_dates(self, db):
+        with pytest.raises(ValidationError):
+            RebuildSalesRollups(from_date='01/11/2025')
+        with pytest.raises(ValidationError):
+            RebuildSalesRollups(from_date='2025-12-01', to_date='2025-11-01')
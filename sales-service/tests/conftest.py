@@ -22,12 +22,14 @@ from src.entities.salesperson_goal import SalespersonGoal, GoalType, Region, Qua
 
 
 @pytest.fixture(scope='function')
-def app():
+def app(tmp_path):
     """Create and configure a test Flask application."""
     config = {
         'TESTING': True,
         'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
-        'SQLALCHEMY_TRACK_MODIFICATIONS': False
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        # Los archivos de visitas subidos en tests no deben ensuciar el repo
+        'UPLOAD_FOLDER': str(tmp_path / 'uploads')
     }
     
     app = create_app(config=config)
@@ -0,0 +1,80 @@
+"""
+Tests para ExportCache y los escritores por streaming de ReportExportService.
+"""
+
+import os
+import time
+
+from openpyxl import load_workbook
+
+from src.services.export_service import ExportCache, ReportExportService
+
+
+def _store(cache, key, size):
+    temp_path = cache.temp_path('xlsx')
+    with open(temp_path, 'wb') as output:
+        output.write(b'x' * size)
+    return cache.store(temp_path, key, 'xlsx')
+
+
+def _rows(count):
+    for n in range(count):
+        yield {'fecha': '2025-11-15', 'employee_id': 'EMP-001', 'vendedor': 'Juan Pérez', 'region': 'Norte',
+               'territory': 'Norte', 'product_sku': f'MED-{n:05d}', 'product_name': 'Ibuprofeno',
+               'volumen_ventas': n, 'valor_total': n * 1.5, 'valor_objetivo': None, 'tipo_objetivo': None,
+               'cumplimiento_porcentaje': None}
+
+
+class TestExportCache:
+
+    def test_expired_entries_are_not_served(self, tmp_path):
+        cache = ExportCache(str(tmp_path), ttl_seconds=60)
+        path = _store(cache, 'a', 10)
+        assert cache.get('a', 'xlsx') == path
+
+        os.utime(path, (time.time() - 120, time.time() - 120))
+        assert cache.get('a', 'xlsx') is None
+        assert not os.path.exists(path)
+
+    def test_quota_evicts_least_recently_used(self, tmp_path):
+        cache = ExportCache(str(tmp_path), ttl_seconds=60, max_bytes=250)
+        old, used = _store(cache, 'old', 100), _store(cache, 'used', 100)
+        os.utime(old, (time.time() - 30, time.time() - 30))
+        os.utime(used, (time.time() - 40, time.time() - 40))
+        cache.get('used', 'xlsx')
+
+        _store(cache, 'new', 100)
+
+        assert cache.get('old', 'xlsx') is None
+        assert cache.get('used', 'xlsx') and cache.get('new', 'xlsx')
+        assert cache.get_stats()['files'] == 2
+
+
+class TestReportExportService:
+
+    def test_excel_write_only(self, tmp_path):
+        path = str(tmp_path / 'report.xlsx')
+
+        count = ReportExportService().write_excel(_rows(3), {'total_valor_total': 4.5}, {'year': 2025}, path)
+
+        values = [row for row in load_workbook(path).active.iter_rows(values_only=True)]
+        assert count == 3
+        assert values[-1][:2] == ('2025-11-15', 'Juan Pérez')
+        assert values[-1][7] == '$3.00'
+        assert ('Total Ventas: $4.50',) == values[5][:1]
+
+    def test_pdf_stops_at_max_rows(self, tmp_path):
+        path = str(tmp_path / 'report.pdf')
+
+        count = ReportExportService().write_pdf(_rows(500), {}, {}, path, max_rows=120)
+
+        assert count == 120
+        with open(path, 'rb') as pdf:
+            assert pdf.read(4) == b'%PDF'
+
+    def test_csv_chunks(self):
+        chunks = list(ReportExportService().iter_csv(_rows(1001)))
+
+        assert len(chunks) == 3
+        assert chunks[0].startswith('﻿Fecha,ID Vendedor')
+        assert sum(chunk.count('\n') for chunk in chunks) == 1002
@@ -1,12 +1,20 @@
 import pytest
 from unittest.mock import Mock, patch
-from src.services.integration_service import IntegrationService
+from src.services.integration_service import IntegrationService, get_product_cache, shutdown_integration
 from src.errors.errors import ExternalServiceError, ValidationError
 
 
+@pytest.fixture(autouse=True)
+def reset_integration():
+    """Sesión, pool y caché de productos nuevos en cada test."""
+    shutdown_integration()
+    yield
+    shutdown_integration()
+
+
 class TestIntegrationService:
     
-    @patch('src.services.integration_service.requests.get')
+    @patch('src.services.integration_service.requests.Session.get')
     def test_get_product_by_sku_success(self, mock_get):
         """Test successful product retrieval from catalog service."""
         mock_response = Mock()
@@ -26,7 +34,7 @@ class TestIntegrationService:
         assert result['is_active'] is True
         assert 'unit_price' in result
     
-    @patch('src.services.integration_service.requests.get')
+    @patch('src.services.integration_service.requests.Session.get')
     def test_get_product_not_found(self, mock_get):
         """Test product not found raises ValidationError."""
         mock_response = Mock()
@@ -38,7 +46,7 @@ class TestIntegrationService:
         with pytest.raises(ValidationError):
             service.get_product_by_sku('NONEXISTENT')
     
-    @patch('src.services.integration_service.requests.get')
+    @patch('src.services.integration_service.requests.Session.get')
     def test_check_stock_availability_success(self, mock_get):
         """Test successful stock check."""
         mock_response = Mock()
@@ -64,7 +72,7 @@ class TestIntegrationService:
         assert result['total_available'] == 100
         assert result['selected_distribution_center'] == 'DC-001'
     
-    @patch('src.services.integration_service.requests.get')
+    @patch('src.services.integration_service.requests.Session.get')
     def test_check_stock_with_preferred_center(self, mock_get):
         """Test stock check with preferred distribution center."""
         mock_response = Mock()
@@ -95,8 +103,8 @@ class TestIntegrationService:
         assert result['selected_distribution_center'] == 'DC-002'
     
     @patch('src.services.integration_service.IntegrationService.get_product_by_sku')
-    @patch('src.services.integration_service.IntegrationService.check_stock_availability')
-    def test_validate_order_items_success(self, mock_check_stock, mock_get_product):
+    @patch('src.services.integration_service.IntegrationService.get_realtime_stock')
+    def test_validate_order_items_success(self, mock_get_stock, mock_get_product):
         """Test successful validation of order items."""
         mock_get_product.return_value = {
             'sku': 'JER-001',
@@ -105,10 +113,11 @@ class TestIntegrationService:
             'is_active': True
         }
         
-        mock_check_stock.return_value = {
-            'stock_confirmed': True,
-            'total_available': 100,
-            'selected_distribution_center': 'DC-001'
+        mock_get_stock.return_value = {
+            'JER-001': {
+                'total_available_for_purchase': 100,
+                'distribution_centers': [{'distribution_center_code': 'DC-001', 'available_for_purchase': 100}]
+            }
         }
         
         service = IntegrationService()
@@ -120,8 +129,8 @@ class TestIntegrationService:
         assert result[0]['stock_confirmed'] is True
     
     @patch('src.services.integration_service.IntegrationService.get_product_by_sku')
-    @patch('src.services.integration_service.IntegrationService.check_stock_availability')
-    def test_validate_order_items_multiple_products(self, mock_check_stock, mock_get_product):
+    @patch('src.services.integration_service.IntegrationService.get_realtime_stock')
+    def test_validate_order_items_multiple_products(self, mock_get_stock, mock_get_product):
         """Test validation of multiple order items."""
         def get_product_side_effect(sku):
             return {
@@ -131,15 +140,17 @@ class TestIntegrationService:
                 'is_active': True
             }
         
-        def check_stock_side_effect(sku, quantity, center=None):
+        def get_stock_side_effect(skus, center=None):
             return {
-                'stock_confirmed': True,
-                'total_available': 100,
-                'selected_distribution_center': 'DC-001'
+                sku: {
+                    'total_available_for_purchase': 100,
+                    'distribution_centers': [{'distribution_center_code': 'DC-001', 'available_for_purchase': 100}]
+                }
+                for sku in skus
             }
         
         mock_get_product.side_effect = get_product_side_effect
-        mock_check_stock.side_effect = check_stock_side_effect
+        mock_get_stock.side_effect = get_stock_side_effect
         
         service = IntegrationService()
         items = [
@@ -150,3 +161,110 @@ class TestIntegrationService:
         
         assert len(result) == 2
         assert all(item['stock_confirmed'] for item in result)
+        mock_get_stock.assert_called_once()
+
+
+def _response(status_code, body=None, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.json.return_value = body
+    response.headers = headers or {}
+    return response
+
+
+class TestProductCache:
+    
+    @patch('src.services.integration_service.requests.Session.get')
+    def test_fresh_entries_skip_the_catalog(self, mock_get):
+        """Mientras la entrada está vigente no se vuelve a llamar al catálogo."""
+        mock_get.return_value = _response(200, {'sku': 'JER-001', 'is_active': True}, {'ETag': '"v1"'})
+        service = IntegrationService()
+        
+        first = service.get_product_by_sku('JER-001')
+        first['name'] = 'modificado'
+        second = service.get_product_by_sku('JER-001')
+        
+        assert mock_get.call_count == 1
+        assert 'name' not in second
+    
+    @patch('src.services.integration_service.requests.Session.get')
+    def test_expired_entries_are_revalidated_with_etag(self, mock_get):
+        """Al vencer se envía If-None-Match y un 304 reutiliza el producto guardado."""
+        mock_get.return_value = _response(200, {'sku': 'JER-001', 'name': 'Jeringa', 'is_active': True},
+                                          {'ETag': '"v1"'})
+        service = IntegrationService()
+        service.get_product_by_sku('JER-001')
+        
+        mock_get.return_value = _response(304)
+        with patch('src.services.ttl_cache.time.monotonic', return_value=10 ** 9):
+            product = service.get_product_by_sku('JER-001')
+        
+        assert product['name'] == 'Jeringa'
+        assert mock_get.call_count == 2
+        assert mock_get.call_args.kwargs['headers'] == {'If-None-Match': '"v1"'}
+        assert get_product_cache().get_stats()['revalidations'] == 1
+    
+    @patch('src.services.integration_service.requests.Session.get')
+    def test_not_found_is_not_cached(self, mock_get):
+        mock_get.return_value = _response(404)
+        service = IntegrationService()
+        
+        for _ in range(2):
+            with pytest.raises(ValidationError):
+                service.get_product_by_sku('NONEXISTENT')
+        
+        assert mock_get.call_count == 2
+
+
+class TestValidateOrderItemsBatch:
+    
+    @patch('src.services.integration_service.requests.Session.get')
+    def test_one_stock_call_for_all_items(self, mock_get):
+        """El stock de todos los SKUs se pide en una llamada y los productos repetidos una vez."""
+        def fake_get(url, params=None, headers=None, timeout=None):
+            if url.endswith('/cart/stock/realtime'):
+                return _response(200, {'products': [
+                    {'product_sku': sku, 'total_available_for_purchase': 50,
+                     'distribution_centers': [{'distribution_center_code': 'DC-001', 'available_for_purchase': 50}]}
+                    for sku in params['product_skus'].split(',') if sku != 'VAC-001'
+                ]})
+            sku = url.rsplit('/', 1)[1]
+            return _response(200, {'sku': sku, 'name': sku, 'unit_price': 10.0, 'is_active': True})
+        mock_get.side_effect = fake_get
+        service = IntegrationService()
+        
+        items = [{'product_sku': f'SKU-{n:02d}', 'quantity': 5} for n in range(30)]
+        items.append({'product_sku': 'SKU-00', 'quantity': 45})
+        result = service.validate_order_items(items)
+        
+        stock_calls = [c for c in mock_get.call_args_list if c.args[0].endswith('/cart/stock/realtime')]
+        assert len(stock_calls) == 1
+        assert mock_get.call_count == 31
+        assert [item['product_sku'] for item in result] == [item['product_sku'] for item in items]
+        assert all(item['distribution_center_code'] == 'DC-001' for item in result)
+        
+        with pytest.raises(ValidationError) as error:
+            service.validate_order_items([{'product_sku': 'SKU-01', 'quantity': 1},
+                                          {'product_sku': 'VAC-001', 'quantity': 1}])
+        assert 'Insufficient stock' in error.value.message
+    
+    @patch('src.services.integration_service.IntegrationService.get_product_by_sku')
+    @patch('src.services.integration_service.IntegrationService.get_realtime_stock')
+    def test_errors_follow_item_order(self, mock_get_stock, mock_get_product):
+        """Con consultas en paralelo se reporta el primer item inválido, como en serie."""
+        def get_product_side_effect(sku):
+            if sku != 'JER-001':
+                raise ValidationError(f"Product with SKU '{sku}' not found in catalog")
+            return {'sku': sku, 'is_active': True}
+        mock_get_product.side_effect = get_product_side_effect
+        mock_get_stock.side_effect = ExternalServiceError("Cannot connect to logistics service")
+        service = IntegrationService()
+        
+        with pytest.raises(ValidationError) as error:
+            service.validate_order_items([{'product_sku': 'BAD-1', 'quantity': 1},
+                                          {'product_sku': 'BAD-2', 'quantity': 1}])
+        assert 'BAD-1' in error.value.message
+        
+        with pytest.raises(ExternalServiceError):
+            service.validate_order_items([{'product_sku': 'JER-001', 'quantity': 1},
+                                          {'product_sku': 'BAD-2', 'quantity': 1}])
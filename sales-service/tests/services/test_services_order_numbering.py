@@ -0,0 +1,37 @@
+"""
+Tests para la asignación de números de orden desde el contador por día.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+from src.models.order import Order
+from src.models.order_number_counter import OrderNumberCounter
+from src.services.order_numbering import allocate_order_numbers
+
+DAY = datetime(2025, 10, 13, 9, 30)
+
+
+def test_consecutive_numbers_without_counting_orders(db):
+    assert allocate_order_numbers(now=DAY) == ['ORD-20251013-0001']
+    assert allocate_order_numbers(3, now=DAY) == ['ORD-20251013-0002', 'ORD-20251013-0003', 'ORD-20251013-0004']
+    assert allocate_order_numbers(now=datetime(2025, 10, 14)) == ['ORD-20251014-0001']
+    assert db.session.get(OrderNumberCounter, '20251013').last_value == 4
+
+
+def test_counter_starts_after_existing_orders_of_the_day(db, sample_customer):
+    for number in ['ORD-20251013-0009', 'ORD-20251013-0010', 'ORD-20251012-0042']:
+        db.session.add(Order(order_number=number, customer_id=sample_customer.id, seller_id='SELLER-001',
+                             subtotal=Decimal('1.00'), total_amount=Decimal('1.19')))
+    db.session.commit()
+
+    assert allocate_order_numbers(2, now=DAY) == ['ORD-20251013-0011', 'ORD-20251013-0012']
+
+
+def test_rollback_releases_numbers(db):
+    allocate_order_numbers(now=DAY)
+    db.session.commit()
+    allocate_order_numbers(now=DAY)
+    db.session.rollback()
+
+    assert allocate_order_numbers(now=DAY) == ['ORD-20251013-0002']
@@ -0,0 +1,102 @@
+"""
+Tests para el mantenimiento incremental de sales_daily_rollups.
+
+Después de cada cambio, los rollups deben coincidir con los que se obtienen
+recalculándolos desde las órdenes.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import insert
+
+from src.commands.delete_order import DeleteOrder
+from src.commands.rebuild_sales_rollups import RebuildSalesRollups
+from src.commands.update_order import UpdateOrder
+from src.models.order import Order
+from src.models.order_item import OrderItem
+from src.models.sales_daily_rollup import SalesDailyRollup
+from src.services.sales_rollups import capture_new_orders
+
+
+def _rollups(db):
+    return sorted(
+        (row.day.isoformat(), row.seller_id, row.status, row.product_sku, row.product_name,
+         row.quantity, float(row.total), row.item_count)
+        for row in db.session.query(SalesDailyRollup).all()
+    )
+
+
+def _assert_consistent(db):
+    incremental = _rollups(db)
+    RebuildSalesRollups().execute()
+    assert incremental == _rollups(db)
+    return incremental
+
+
+def _create_order(db, customer, number, lines, day=datetime(2025, 11, 15, 10), status='pending'):
+    order = Order(order_number=number, customer_id=customer.id, seller_id='EMP-001', status=status,
+                  subtotal=Decimal('0'), total_amount=Decimal('0'), order_date=day)
+    db.session.add(order)
+    db.session.flush()
+    for sku, quantity in lines:
+        db.session.add(OrderItem(order_id=order.id, product_sku=sku, product_name=f'Producto {sku}',
+                                 quantity=quantity, unit_price=Decimal('100.00'),
+                                 subtotal=Decimal(100 * quantity), total=Decimal(119 * quantity)))
+    db.session.commit()
+    return order
+
+
+class TestSalesRollups:
+
+    def test_created_orders_are_aggregated_by_day_seller_status_and_product(self, db, sample_customer):
+        _create_order(db, sample_customer, 'ORD-R-1', [('MED-001', 2), ('MED-002', 1)])
+        _create_order(db, sample_customer, 'ORD-R-2', [('MED-001', 3)], day=datetime(2025, 11, 15, 18))
+        _create_order(db, sample_customer, 'ORD-R-3', [('MED-001', 1)], day=datetime(2025, 11, 16, 8))
+
+        assert _assert_consistent(db) == [
+            ('2025-11-15', 'EMP-001', 'pending', 'MED-001', 'Producto MED-001', 5, 595.0, 2),
+            ('2025-11-15', 'EMP-001', 'pending', 'MED-002', 'Producto MED-002', 1, 119.0, 1),
+            ('2025-11-16', 'EMP-001', 'pending', 'MED-001', 'Producto MED-001', 1, 119.0, 1),
+        ]
+
+    def test_status_change_item_replacement_and_delete(self, db, sample_customer):
+        kept = _create_order(db, sample_customer, 'ORD-R-1', [('MED-001', 2)])
+        deleted = _create_order(db, sample_customer, 'ORD-R-2', [('MED-001', 4), ('MED-002', 1)])
+
+        UpdateOrder(kept.id, {'status': 'confirmed'}).execute()
+        UpdateOrder(kept.id, {'items': [{'product_sku': 'MED-003', 'quantity': 7, 'unit_price': 50.0}]}).execute()
+        DeleteOrder(deleted.id).execute()
+
+        rollups = _assert_consistent(db)
+        assert [(row[2], row[3], row[5]) for row in rollups] == [('confirmed', 'MED-003', 7)]
+
+    def test_rollback_leaves_rollups_untouched(self, db, sample_customer):
+        order = _create_order(db, sample_customer, 'ORD-R-1', [('MED-001', 2)])
+        before = _rollups(db)
+
+        order.status = 'cancelled'
+        db.session.add(OrderItem(order_id=order.id, product_sku='MED-009', product_name='Producto MED-009',
+                                 quantity=1, unit_price=Decimal('1'), subtotal=Decimal('1'), total=Decimal('1')))
+        db.session.flush()
+        db.session.rollback()
+
+        _create_order(db, sample_customer, 'ORD-R-2', [('MED-001', 1)])
+        assert [row[5] for row in _assert_consistent(db)] == [before[0][5] + 1]
+
+    def test_core_inserts_are_registered_explicitly(self, db, sample_customer):
+        order_id = db.session.execute(insert(Order).returning(Order.id), [{
+            'order_number': 'ORD-R-CORE', 'customer_id': sample_customer.id, 'seller_id': 'EMP-002',
+            'status': 'pending', 'subtotal': Decimal('0'), 'total_amount': Decimal('0'),
+            'order_date': datetime(2025, 11, 20), 'created_at': datetime(2025, 11, 20),
+            'updated_at': datetime(2025, 11, 20),
+        }]).scalar_one()
+        db.session.execute(insert(OrderItem), [{
+            'order_id': order_id, 'product_sku': 'MED-001', 'product_name': 'Producto MED-001', 'quantity': 3,
+            'unit_price': Decimal('1'), 'subtotal': Decimal('3'), 'total': Decimal('3'),
+            'stock_confirmed': False, 'created_at': datetime(2025, 11, 20),
+        }])
+        capture_new_orders([order_id])
+        db.session.commit()
+
+        assert [(row[1], row[5]) for row in _assert_consistent(db)] == [('EMP-002', 3)]
@@ -0,0 +1,35 @@
+"""
+Tests para el LRU con TTL compartido por los cachés del servicio.
+"""
+
+from unittest.mock import patch
+
+from src.services.ttl_cache import TTLCache
+
+
+class TestTTLCache:
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(ttl_seconds=60, max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.lookup('a')
+        cache.put('c', 3)
+
+        assert cache.lookup('b') == (None, False)
+        assert cache.lookup('a') == (1, True)
+
+    def test_expired_entries_are_kept_as_stale(self):
+        cache = TTLCache(ttl_seconds=60, max_entries=10)
+        cache.put('a', 1)
+
+        with patch('src.services.ttl_cache.time.monotonic', return_value=10 ** 9):
+            assert cache.lookup('a') == (1, False)
+
+        assert cache.get_stats() == {'entries': 1, 'hits': 0, 'stale_hits': 1, 'misses': 0}
+
+    def test_non_positive_ttl_stores_nothing(self):
+        cache = TTLCache(ttl_seconds=0, max_entries=10)
+        cache.put('a', 1)
+
+        assert cache.lookup('a') == (None, False)